@@ -0,0 +1,99 @@
+"""asset_change_log
+
+Per-asset dirty tracking for the daily pipeline.
+
+Creates:
+  asset_change_seq  - Monotonic sequence stamped on bar content changes.
+  asset_change_log  - One row per (id, venue_id, tf, alignment_source) of
+                      price_bars_multi_tf_u: max bar ts, plus the row count
+                      and md5 content hash of the bars re-ingested since the
+                      previous recording (not the whole history), and the
+                      change_seq of the last run that changed the content.
+                      Written by run_all_bar_builders.
+  stage_watermark   - Per (stage, id) change_seq last processed by a
+                      downstream stage (emas, amas, returns_*).
+
+Note: All comments use ASCII only (Windows cp1252 compatibility).
+
+Revision ID: c2d3e4f5a6b7
+Revises: b1c2d3e4f5a6
+Create Date: 2026-10-16
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+# -- Revision identifiers --------------------------------------------------
+revision: str = "c2d3e4f5a6b7"
+down_revision: Union[str, Sequence[str], None] = "b1c2d3e4f5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    conn.execute(text("CREATE SEQUENCE IF NOT EXISTS public.asset_change_seq"))
+
+    # ------------------------------------------------------------------
+    # asset_change_log
+    # change_seq / changed_at / run_id move only when content_hash
+    # differs from the stored hash; max_ingested_at and checked_at move
+    # on every re-check.  MAX(max_ingested_at) is the "since" cursor for
+    # the next recording pass.
+    # ------------------------------------------------------------------
+    conn.execute(
+        text("""
+        CREATE TABLE IF NOT EXISTS public.asset_change_log (
+            id                  INTEGER      NOT NULL,
+            venue_id            INTEGER      NOT NULL,
+            tf                  TEXT         NOT NULL,
+            alignment_source    TEXT         NOT NULL,
+            max_ts              TIMESTAMPTZ  NULL,
+            n_range_bars        BIGINT       NOT NULL,
+            content_hash        TEXT         NOT NULL,
+            max_ingested_at     TIMESTAMPTZ  NOT NULL,
+            change_seq          BIGINT       NOT NULL,
+            run_id              TEXT         NULL,
+            changed_at          TIMESTAMPTZ  NOT NULL DEFAULT now(),
+            checked_at          TIMESTAMPTZ  NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, venue_id, tf, alignment_source)
+        )
+        """)
+    )
+    conn.execute(
+        text("""
+        CREATE INDEX IF NOT EXISTS ix_asset_change_log_id_seq
+        ON public.asset_change_log (id, change_seq)
+        """)
+    )
+    conn.execute(
+        text("""
+        CREATE INDEX IF NOT EXISTS ix_asset_change_log_ingested
+        ON public.asset_change_log (max_ingested_at)
+        """)
+    )
+
+    # ------------------------------------------------------------------
+    # stage_watermark
+    # ------------------------------------------------------------------
+    conn.execute(
+        text("""
+        CREATE TABLE IF NOT EXISTS public.stage_watermark (
+            stage               TEXT         NOT NULL,
+            id                  INTEGER      NOT NULL,
+            last_change_seq     BIGINT       NOT NULL,
+            updated_at          TIMESTAMPTZ  NOT NULL DEFAULT now(),
+            PRIMARY KEY (stage, id)
+        )
+        """)
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(text("DROP TABLE IF EXISTS public.stage_watermark"))
+    conn.execute(text("DROP TABLE IF EXISTS public.asset_change_log"))
+    conn.execute(text("DROP SEQUENCE IF EXISTS public.asset_change_seq"))
@@ -42,6 +42,7 @@ Environment variables
 EXECUTOR_DB_URL      SQLAlchemy database URL (required on VM)
 KRAKEN_SYMBOLS       Comma-separated Kraken v2 symbols, e.g. "BTC/USD,ETH/USD"
 COINBASE_PRODUCT_IDS Comma-separated Coinbase product IDs, e.g. "BTC-USD,ETH-USD"
+TICK_RECORD_DIR      Optional directory for the binary tick recorder (replay input)
 
 Usage
 -----
@@ -76,7 +77,8 @@ except ImportError as _exc:
 try:
     from ta_lab2.executor.paper_executor import PaperExecutor
     from ta_lab2.executor.price_cache import PriceCache
-    from ta_lab2.executor.stop_monitor import StopMonitor
+    from ta_lab2.executor.stop_monitor import StopMonitor, load_asset_symbol_map
+    from ta_lab2.executor.tick_recorder import TickRecorder
     from ta_lab2.executor.ws_feeds import start_all_feeds
 except ImportError as _exc:
     sys.exit(
@@ -453,12 +455,17 @@ def main(argv: list[str] | None = None) -> None:
     coinbase_ids_raw = os.environ.get("COINBASE_PRODUCT_IDS", "")
     kraken_symbols = [s.strip() for s in kraken_symbols_raw.split(",") if s.strip()]
     coinbase_product_ids = [s.strip() for s in coinbase_ids_raw.split(",") if s.strip()]
+    # Optional tick capture for offline replay (ta_lab2.executor.replay)
+    tick_record_dir = os.environ.get("TICK_RECORD_DIR", "")
+    recorder = TickRecorder(tick_record_dir) if tick_record_dir else None
 
     feed_threads = start_all_feeds(
         price_cache=price_cache,
         kraken_symbols=kraken_symbols or None,
         coinbase_product_ids=coinbase_product_ids or None,
         logger=logger,
+        asset_symbols=load_asset_symbol_map(engine),
+        recorder=recorder,
     )
     logger.info(
         "executor_service: %d WebSocket feed thread(s) started", len(feed_threads)
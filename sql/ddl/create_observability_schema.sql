@@ -57,6 +57,31 @@ CREATE TABLE IF NOT EXISTS observability.metrics_2026_03
 CREATE INDEX IF NOT EXISTS idx_metrics_name_time ON observability.metrics(metric_name, recorded_at DESC);
 CREATE INDEX IF NOT EXISTS idx_metrics_labels ON observability.metrics USING GIN(labels);
 
+-- Metric rollups table (written by BufferedMetricsCollector)
+-- One row per (metric, labels, bucket) per flush. Rows for the same bucket
+-- from several flushes/processes are merged at query time.
+-- Histograms carry a mergeable log-bucket sketch (observability/sketch.py).
+CREATE TABLE IF NOT EXISTS observability.metric_rollups (
+    id BIGSERIAL PRIMARY KEY,
+    metric_name VARCHAR(255) NOT NULL,
+    metric_type VARCHAR(50) NOT NULL,  -- 'counter', 'gauge', 'histogram'
+    bucket_start TIMESTAMPTZ NOT NULL,
+    bucket_seconds INTEGER NOT NULL,
+    labels JSONB,
+    sample_count BIGINT NOT NULL,
+    value_sum DOUBLE PRECISION,
+    value_min DOUBLE PRECISION,
+    value_max DOUBLE PRECISION,
+    value_last DOUBLE PRECISION,
+    sketch JSONB,
+    flushed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT valid_rollup_type CHECK (metric_type IN ('counter', 'gauge', 'histogram'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_metric_rollups_name_time ON observability.metric_rollups(metric_name, bucket_start DESC);
+CREATE INDEX IF NOT EXISTS idx_metric_rollups_labels ON observability.metric_rollups USING GIN(labels);
+
 -- Spans table for distributed tracing (OpenTelemetry)
 -- Stores trace spans with parent-child relationships
 CREATE TABLE IF NOT EXISTS observability.spans (
@@ -113,5 +138,6 @@ CREATE INDEX IF NOT EXISTS idx_alerts_acknowledged ON observability.alerts(ackno
 COMMENT ON SCHEMA observability IS 'Observability infrastructure: metrics, traces, workflows, alerts';
 COMMENT ON TABLE observability.workflow_state IS 'Tracks workflow lifecycle across orchestrator, memory, and ta_lab2';
 COMMENT ON TABLE observability.metrics IS 'Time-series metrics (counter, gauge, histogram) partitioned by month';
+COMMENT ON TABLE observability.metric_rollups IS 'Per-interval metric aggregates with histogram sketches from BufferedMetricsCollector';
 COMMENT ON TABLE observability.spans IS 'OpenTelemetry distributed tracing spans with parent-child relationships';
 COMMENT ON TABLE observability.alerts IS 'Alert events with acknowledgement tracking for operational monitoring';
@@ -13,7 +13,8 @@ Interpretation:
     - MFE large positive: trade had large unrealized gain (consider trailing stop)
 
 Public API:
-    compute_mae_mfe     -- MAE/MFE per trade, appended as columns to trades_df
+    compute_mae_mfe     -- MAE/MFE per trade (single or multi-asset), appended
+                           as columns to trades_df
     _load_close_prices  -- helper to load close price Series from features
 
 Usage:
@@ -21,13 +22,17 @@ Usage:
 
     close = _load_close_prices(engine, asset_id=1, start_ts=t0, end_ts=t1, tf='1D')
     trades_with_mfe = compute_mae_mfe(trades_df, close)
+
+    # Multi-asset trade table (trades_df has an asset_id column)
+    trades_with_mfe = compute_mae_mfe(trades_df, {1: close_btc, 1027: close_eth})
 """
 
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import Any, Mapping, Union
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
@@ -37,7 +42,7 @@ logger = logging.getLogger(__name__)
 
 def compute_mae_mfe(
     trades_df: pd.DataFrame,
-    close_series: pd.Series,
+    close_series: Union[pd.Series, Mapping[Any, pd.Series]],
 ) -> pd.DataFrame:
     """
     Compute Maximum Adverse Excursion (MAE) and Maximum Favorable Excursion (MFE)
@@ -49,6 +54,11 @@ def compute_mae_mfe(
         Short MAE = entry_price / max(window) - 1.0   (negative = adverse)
         Short MFE = entry_price / min(window) - 1.0   (positive = favorable)
 
+    The window is every close with entry_ts <= ts <= exit_ts.  Entry/exit
+    timestamps are mapped to integer positions with ``searchsorted`` and the
+    window min/max of all trades are read from a sparse table in O(1) per
+    trade, so cost is O(n_bars log n_bars + n_trades) per asset.
+
     Parameters
     ----------
     trades_df : pd.DataFrame
@@ -57,9 +67,13 @@ def compute_mae_mfe(
         - exit_ts    : exit timestamp (tz-aware or tz-naive; NaT for open trades)
         - entry_price: float, the price at trade entry
         - direction  : str, 'long' or 'short' (case-insensitive)
-    close_series : pd.Series
+        - asset_id   : required only when close_series is keyed by asset
+    close_series : pd.Series or mapping of asset_id -> pd.Series
         Close prices indexed by tz-naive timestamps, sorted ascending.
         Must cover the time range of all closed trades for accurate results.
+        For multi-asset trade tables pass a dict keyed by asset_id, or a
+        Series with an (asset_id, ts) MultiIndex; trades whose asset_id has
+        no prices get None.
 
     Returns
     -------
@@ -74,94 +88,166 @@ def compute_mae_mfe(
     are set to None. The function does NOT modify trades_df in place.
     """
     result = trades_df.copy()
-    mae_values: list[Optional[float]] = []
-    mfe_values: list[Optional[float]] = []
+    n = len(result)
+    if n == 0:
+        result["mae"] = pd.Series(dtype=object)
+        result["mfe"] = pd.Series(dtype=object)
+        return result
+
+    entry_ns = _to_naive_ns(result["entry_ts"])
+    exit_ns = _to_naive_ns(result["exit_ts"])
+    entry_price = result["entry_price"].to_numpy(dtype=float)
+    direction = result["direction"].astype(str).str.lower().to_numpy()
+    is_long = direction == "long"
+    is_short = direction == "short"
+
+    unknown = ~(is_long | is_short)
+    if unknown.any():
+        for d in pd.unique(direction[unknown]):
+            logger.warning(
+                "compute_mae_mfe: unknown direction '%s' — setting mae/mfe to None",
+                d,
+            )
 
-    for _, row in result.iterrows():
-        exit_ts = row.get("exit_ts")
+    lo_px = np.full(n, np.nan)
+    hi_px = np.full(n, np.nan)
+    has_window = np.zeros(n, dtype=bool)
+    closed = exit_ns != _NAT_NS
 
-        # Skip open trades (exit_ts is NaT or None)
-        if exit_ts is None or (hasattr(exit_ts, "isnot") or pd.isnull(exit_ts)):
-            mae_values.append(None)
-            mfe_values.append(None)
-            continue
+    if isinstance(close_series, pd.Series) and close_series.index.nlevels == 1:
+        groups = [(np.arange(n), close_series)]
+    else:
+        groups = _group_by_asset(result, close_series)
 
-        entry_ts = row["entry_ts"]
-        entry_price = float(row["entry_price"])
-        direction = str(row["direction"]).lower()
-
-        # Normalize to tz-naive Timestamps for .loc[] slicing against close_series
-        entry_ts_naive = _to_naive_timestamp(entry_ts)
-        exit_ts_naive = _to_naive_timestamp(exit_ts)
-
-        # Slice the window of prices for this trade
-        try:
-            window = close_series.loc[entry_ts_naive:exit_ts_naive]
-        except Exception as exc:
-            logger.debug(
-                "compute_mae_mfe: window slice failed for entry=%s exit=%s: %s",
-                entry_ts_naive,
-                exit_ts_naive,
-                exc,
-            )
-            mae_values.append(None)
-            mfe_values.append(None)
+    for rows, close in groups:
+        rows = rows[closed[rows] & ~unknown[rows]]
+        if len(rows) == 0 or close.empty:
             continue
-
-        if window.empty:
-            logger.debug(
-                "compute_mae_mfe: empty window for entry=%s exit=%s",
-                entry_ts_naive,
-                exit_ts_naive,
-            )
-            mae_values.append(None)
-            mfe_values.append(None)
+        ts_ns, values = _close_arrays(close)
+        start = np.searchsorted(ts_ns, entry_ns[rows], side="left")
+        stop = np.searchsorted(ts_ns, exit_ns[rows], side="right")
+        ok = stop > start
+        rows, start, stop = rows[ok], start[ok], stop[ok]
+        if len(rows) == 0:
             continue
+        mins, maxs = _range_min_max(values, start, stop)
+        lo_px[rows] = mins
+        hi_px[rows] = maxs
+        has_window[rows] = True
+
+    if (closed & ~unknown & ~has_window).any():
+        logger.debug(
+            "compute_mae_mfe: %d closed trades have an empty price window",
+            int((closed & ~unknown & ~has_window).sum()),
+        )
 
-        if direction == "long":
-            mae = float(window.min() / entry_price - 1.0)
-            mfe = float(window.max() / entry_price - 1.0)
-        elif direction == "short":
-            mae = float(entry_price / window.max() - 1.0)
-            mfe = float(entry_price / window.min() - 1.0)
-        else:
-            logger.warning(
-                "compute_mae_mfe: unknown direction '%s' — setting mae/mfe to None",
-                direction,
-            )
-            mae_values.append(None)
-            mfe_values.append(None)
-            continue
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mae = np.where(is_long, lo_px / entry_price, entry_price / hi_px) - 1.0
+        mfe = np.where(is_long, hi_px / entry_price, entry_price / lo_px) - 1.0
+    mae[~has_window] = np.nan
+    mfe[~has_window] = np.nan
+
+    if has_window.any():
+        result["mae"] = mae
+        result["mfe"] = mfe
+    else:
+        result["mae"] = [None] * n
+        result["mfe"] = [None] * n
+    return result
 
-        mae_values.append(mae)
-        mfe_values.append(mfe)
 
-    result["mae"] = mae_values
-    result["mfe"] = mfe_values
-    return result
+# ---------------------------------------------------------------------------
+# Vectorized helpers
+# ---------------------------------------------------------------------------
 
+_NAT_NS = np.iinfo(np.int64).min
 
-def _to_naive_timestamp(ts) -> pd.Timestamp:
-    """
-    Convert a timestamp (tz-aware or tz-naive) to a tz-naive pd.Timestamp.
 
-    CRITICAL: close_series is indexed by tz-naive timestamps. Slicing with
-    tz-aware timestamps causes TypeError. This helper ensures compatibility.
+def _to_naive_ns(values: pd.Series) -> np.ndarray:
+    """Timestamps as tz-naive UTC int64 nanoseconds (NaT/None -> _NAT_NS)."""
+    ts = pd.to_datetime(values, utc=True).dt.tz_localize(None)
+    return ts.to_numpy(dtype="datetime64[ns]").view(np.int64)
 
-    Parameters
-    ----------
-    ts : timestamp-like
-        Any value accepted by pd.Timestamp(): datetime, string, numpy datetime64, etc.
 
-    Returns
-    -------
-    pd.Timestamp
-        Tz-naive Timestamp (UTC wall-clock time preserved; only tzinfo stripped).
+def _close_arrays(close: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted (ts_ns, close) arrays from a close Series."""
+    if not close.index.is_monotonic_increasing:
+        close = close.sort_index()
+    idx = pd.DatetimeIndex(close.index)
+    if idx.tz is not None:
+        idx = idx.tz_convert("UTC").tz_localize(None)
+    return (
+        idx.to_numpy(dtype="datetime64[ns]").view(np.int64),
+        close.to_numpy(dtype=float),
+    )
+
+
+def _group_by_asset(
+    trades: pd.DataFrame, close_by_asset
+) -> list[tuple[np.ndarray, pd.Series]]:
+    """Split trade row positions by asset_id, paired with that asset's closes."""
+    if "asset_id" not in trades.columns:
+        raise ValueError(
+            "compute_mae_mfe: trades_df needs an 'asset_id' column when "
+            "close prices are keyed by asset"
+        )
+    if isinstance(close_by_asset, pd.Series):
+        close_by_asset = {
+            key: s.droplevel(0)
+            for key, s in close_by_asset.groupby(level=0, sort=False)
+        }
+    codes, assets = pd.factorize(trades["asset_id"])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(assets) + 1))
+    groups = []
+    for k, asset in enumerate(assets):
+        close = close_by_asset.get(asset)
+        if close is None:
+            logger.debug("compute_mae_mfe: no close prices for asset_id=%s", asset)
+            continue
+        groups.append((order[bounds[k] : bounds[k + 1]], close))
+    return groups
+
+
+def _range_min_max(
+    values: np.ndarray, start: np.ndarray, stop: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    NaN-skipping min and max of ``values[start:stop]`` for every range.
+
+    Builds a sparse table (level k holds the min/max of each run of 2**k
+    values) and answers each query with two overlapping power-of-two blocks.
+    All ranges must be non-empty.  All-NaN ranges return NaN.
     """
-    ts_pd = pd.Timestamp(ts)
-    if ts_pd.tzinfo is not None:
-        ts_pd = ts_pd.tz_convert("UTC").tz_localize(None)
-    return ts_pd
+    n = len(values)
+    lengths = stop - start
+    n_levels = int(lengths.max()).bit_length()
+    tab_min = np.full((n_levels, n), np.nan)
+    tab_max = np.full((n_levels, n), np.nan)
+    tab_min[0] = values
+    tab_max[0] = values
+    for k in range(1, n_levels):
+        half = 1 << (k - 1)
+        width = n - (1 << k) + 1
+        np.fmin(
+            tab_min[k - 1, :width],
+            tab_min[k - 1, half : half + width],
+            out=tab_min[k, :width],
+        )
+        np.fmax(
+            tab_max[k - 1, :width],
+            tab_max[k - 1, half : half + width],
+            out=tab_max[k, :width],
+        )
+
+    level = np.log2(lengths).astype(np.int64)
+    # Guard against float rounding at exact powers of two
+    level -= (1 << level) > lengths
+    level += (1 << (level + 1)) <= lengths
+    tail = stop - (1 << level)
+    mins = np.fmin(tab_min[level, start], tab_min[level, tail])
+    maxs = np.fmax(tab_max[level, start], tab_max[level, tail])
+    return mins, maxs
 
 
 def _load_close_prices(
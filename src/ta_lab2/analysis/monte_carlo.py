@@ -10,22 +10,37 @@ This answers: "Is the observed Sharpe ratio robust, or could it be luck?"
 A narrow CI (lo near hi) indicates consistency; a wide CI indicates high
 path-dependence.
 
+Resampling is batched: each call draws an (n_samples x n) index matrix and
+evaluates every sample with array ops, in chunks of bounded size.  Besides
+i.i.d. resampling, moving-block and stationary (Politis-Romano) bootstraps
+are available for autocorrelated return series.
+
 Public API:
     monte_carlo_trades   -- resample trade PnL to get 95% Sharpe CI
     monte_carlo_returns  -- resample daily returns to get 95% Sharpe CI
+    monte_carlo_many     -- Sharpe/CAGR/max-drawdown CIs for many strategies
+    bootstrap_indices    -- (n_samples, n) resampling index matrix
+    bootstrap_metrics    -- per-sample Sharpe/CAGR/max-drawdown distributions
 
 Usage:
     from ta_lab2.analysis.monte_carlo import monte_carlo_trades, monte_carlo_returns
 
     result = monte_carlo_trades(trades_df, n_samples=1000, seed=42)
     print(result['mc_sharpe_lo'], result['mc_sharpe_hi'])
+
+    # Whole leaderboard, stationary bootstrap with mean block length 10
+    table = monte_carlo_many(
+        returns_by_strategy, n_samples=10_000, method="stationary", block_size=10
+    )
 """
 
 from __future__ import annotations
 
 import logging
 import math
+from typing import Any, Mapping, Optional
 
+import numba as nb
 import numpy as np
 import pandas as pd
 
@@ -40,11 +55,19 @@ _MIN_TRADES: int = 10
 # Minimum returns observations required for monte_carlo_returns()
 _MIN_RETURNS: int = 30
 
+# Resampling methods accepted by bootstrap_indices()
+_METHODS = ("iid", "block", "stationary")
+
+# Target number of resampled values held in memory per chunk
+_CHUNK_ELEMS: int = 1 << 22
+
 
 def monte_carlo_trades(
     trades_df: pd.DataFrame,
     n_samples: int = 1000,
     seed: int = 42,
+    method: str = "iid",
+    block_size: Optional[int] = None,
 ) -> dict:
     """
     Monte Carlo Sharpe ratio confidence interval via trade PnL resampling.
@@ -65,6 +88,11 @@ def monte_carlo_trades(
         Number of bootstrap resamples. Default 1000.
     seed : int
         Random seed for ``numpy.random.default_rng`` reproducibility. Default 42.
+    method : str
+        Resampling scheme: 'iid' (default), 'block' or 'stationary'.
+        See ``bootstrap_indices``.
+    block_size : int or None
+        (Mean) block length for the block methods. Default ``n ** (1/3)``.
 
     Returns
     -------
@@ -103,7 +131,9 @@ def monte_carlo_trades(
         )
         return _none_result(n_samples=n_samples, n_trades=n_trades)
 
-    sharpe_arr = _bootstrap_sharpe(pnl_arr, n_trades, n_samples, seed)
+    sharpe_arr = _bootstrap_sharpe(
+        pnl_arr, n_trades, n_samples, seed, method=method, block_size=block_size
+    )
 
     if len(sharpe_arr) == 0:
         logger.warning(
@@ -137,6 +167,8 @@ def monte_carlo_returns(
     returns_series: pd.Series,
     n_samples: int = 1000,
     seed: int = 42,
+    method: str = "iid",
+    block_size: Optional[int] = None,
 ) -> dict:
     """
     Monte Carlo Sharpe ratio confidence interval via daily return resampling.
@@ -153,6 +185,11 @@ def monte_carlo_returns(
         Number of bootstrap resamples. Default 1000.
     seed : int
         Random seed for reproducibility. Default 42.
+    method : str
+        Resampling scheme: 'iid' (default), 'block' or 'stationary'.
+        Block methods preserve short-range autocorrelation of the returns.
+    block_size : int or None
+        (Mean) block length for the block methods. Default ``n ** (1/3)``.
 
     Returns
     -------
@@ -179,7 +216,9 @@ def monte_carlo_returns(
         )
         return _none_result(n_samples=n_samples, n_trades=n_obs)
 
-    sharpe_arr = _bootstrap_sharpe(returns_arr, n_obs, n_samples, seed)
+    sharpe_arr = _bootstrap_sharpe(
+        returns_arr, n_obs, n_samples, seed, method=method, block_size=block_size
+    )
 
     if len(sharpe_arr) == 0:
         logger.warning(
@@ -209,6 +248,180 @@ def monte_carlo_returns(
     }
 
 
+def monte_carlo_many(
+    returns_by_strategy: Mapping[Any, Any],
+    n_samples: int = 1000,
+    seed: int = 42,
+    method: str = "iid",
+    block_size: Optional[int] = None,
+    periods_per_year: float = 365.0,
+    min_obs: int = _MIN_RETURNS,
+) -> pd.DataFrame:
+    """
+    Bootstrap Sharpe, CAGR and max-drawdown CIs for many strategies at once.
+
+    Strategies with the same number of observations share one index matrix
+    per chunk, so a leaderboard of similar-length return series costs a few
+    large array passes instead of one Python loop per sample.  Each
+    strategy gets the same resampling draws as when bootstrapped alone with
+    the same seed, whatever else is in the batch.
+
+    Parameters
+    ----------
+    returns_by_strategy : mapping
+        Strategy key -> 1-D array-like of decimal returns (daily returns or
+        per-trade PnL). NaN values are dropped.
+    n_samples : int
+        Number of bootstrap resamples. Default 1000.
+    seed : int
+        Random seed for reproducibility. Default 42.
+    method : str
+        'iid' (default), 'block' or 'stationary'. See ``bootstrap_indices``.
+    block_size : int or None
+        (Mean) block length for the block methods. Default ``n ** (1/3)``.
+    periods_per_year : float
+        Annualization for Sharpe and CAGR. Default 365 (calendar days).
+    min_obs : int
+        Strategies with fewer observations get None CIs. Default 30.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per strategy (index = strategy key) with columns
+        n_obs, mc_n_samples, mc_sharpe_lo/median/hi, mc_cagr_lo/median/hi
+        and mc_max_dd_lo/median/hi (2.5th / 50th / 97.5th percentiles).
+        Sharpe percentiles skip zero-std samples, as in monte_carlo_returns.
+    """
+    cleaned = {}
+    for key, values in returns_by_strategy.items():
+        arr = np.asarray(values, dtype=float).ravel()
+        cleaned[key] = arr[~np.isnan(arr)]
+
+    by_length: dict[int, list[Any]] = {}
+    for key, arr in cleaned.items():
+        by_length.setdefault(len(arr), []).append(key)
+
+    rows: dict[Any, dict] = {}
+    for n, keys in by_length.items():
+        if n < max(min_obs, 2):
+            for key in keys:
+                rows[key] = _none_many_row(n_samples, n)
+            continue
+        panel = np.stack([cleaned[key] for key in keys])
+        dist = _bootstrap_panel(
+            panel,
+            n_samples,
+            seed,
+            method=method,
+            block_size=block_size,
+            periods_per_year=periods_per_year,
+        )
+        for i, key in enumerate(keys):
+            rows[key] = _summarize(
+                dist["sharpe"][i], dist["cagr"][i], dist["max_drawdown"][i], n
+            )
+
+    columns = list(_none_many_row(0, 0))
+    out = pd.DataFrame.from_dict(
+        {key: rows[key] for key in cleaned}, orient="index", columns=columns
+    )
+    out.index.name = "strategy"
+    return out
+
+
+def bootstrap_indices(
+    n: int,
+    n_samples: int,
+    method: str = "iid",
+    block_size: Optional[int] = None,
+    seed: Any = 42,
+) -> np.ndarray:
+    """
+    Draw an (n_samples, n) matrix of resampling positions into a length-n series.
+
+    Parameters
+    ----------
+    n : int
+        Length of the series being resampled (and of each sample).
+    n_samples : int
+        Number of bootstrap samples (rows).
+    method : str
+        - 'iid'        : positions drawn independently with replacement
+        - 'block'      : circular moving-block bootstrap, fixed blocks of
+                         ``block_size`` consecutive positions
+        - 'stationary' : stationary bootstrap (Politis & Romano 1994), blocks
+                         of geometric length with mean ``block_size``
+    block_size : int or None
+        (Mean) block length for the block methods. Default ``n ** (1/3)``.
+    seed : int or numpy.random.Generator
+        Seed for ``numpy.random.default_rng``, or a generator to draw from.
+
+    Returns
+    -------
+    np.ndarray
+        int64 array of shape (n_samples, n) with values in [0, n).
+    """
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {_METHODS}, got {method!r}")
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    if method == "iid":
+        return rng.integers(0, n, size=(n_samples, n))
+
+    b = _resolve_block_size(n, block_size)
+    if method == "block":
+        n_blocks = -(-n // b)
+        starts = rng.integers(0, n, size=(n_samples, n_blocks))
+        idx = (starts[:, :, None] + np.arange(b)) % n
+        return idx.reshape(n_samples, n_blocks * b)[:, :n]
+
+    # Stationary: each position starts a new block with probability 1/b,
+    # otherwise continues the previous block (wrapping around the series).
+    starts = rng.integers(0, n, size=(n_samples, n))
+    new_block = rng.random((n_samples, n)) < 1.0 / b
+    new_block[:, 0] = True
+    pos = np.arange(n)
+    block_start = np.maximum.accumulate(np.where(new_block, pos, 0), axis=1)
+    return (np.take_along_axis(starts, block_start, axis=1) + pos - block_start) % n
+
+
+def bootstrap_metrics(
+    values: np.ndarray,
+    n_samples: int = 1000,
+    seed: int = 42,
+    method: str = "iid",
+    block_size: Optional[int] = None,
+    periods_per_year: float = 365.0,
+) -> dict[str, np.ndarray]:
+    """
+    Per-sample bootstrap distributions of Sharpe, CAGR and max drawdown.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1-D decimal returns (NaN-free).
+    n_samples, seed, method, block_size :
+        As in ``bootstrap_indices``.
+    periods_per_year : float
+        Annualization for Sharpe and CAGR. Default 365.
+
+    Returns
+    -------
+    dict
+        'sharpe', 'cagr', 'max_drawdown' -> float arrays of length n_samples.
+        Sharpe is NaN for zero-std samples; max drawdown is a negative
+        fraction measured from the starting capital.
+    """
+    dist = _bootstrap_panel(
+        np.asarray(values, dtype=float)[None, :],
+        n_samples,
+        seed,
+        method=method,
+        block_size=block_size,
+        periods_per_year=periods_per_year,
+    )
+    return {name: arr[0] for name, arr in dist.items()}
+
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
@@ -219,6 +432,8 @@ def _bootstrap_sharpe(
     sample_size: int,
     n_samples: int,
     seed: int,
+    method: str = "iid",
+    block_size: Optional[int] = None,
 ) -> np.ndarray:
     """
     Bootstrap Sharpe ratio distribution via resampling with replacement.
@@ -233,6 +448,8 @@ def _bootstrap_sharpe(
         Number of bootstrap iterations.
     seed : int
         Seed for numpy.random.default_rng.
+    method, block_size :
+        Resampling scheme, see ``bootstrap_indices``.
 
     Returns
     -------
@@ -240,18 +457,139 @@ def _bootstrap_sharpe(
         Array of annualized Sharpe ratios (one per valid sample).
         Samples where std == 0 are excluded (empty array if all zero-std).
     """
-    rng = np.random.default_rng(seed)
-    sharpe_list: list[float] = []
+    values = np.asarray(values, dtype=float)[:sample_size]
+    sharpe = _bootstrap_panel(
+        values[None, :],
+        n_samples,
+        seed,
+        method=method,
+        block_size=block_size,
+        sharpe_only=True,
+    )["sharpe"][0]
+    return sharpe[~np.isnan(sharpe)]
+
+
+def _resolve_block_size(n: int, block_size: Optional[int]) -> int:
+    if block_size is None:
+        block_size = round(n ** (1.0 / 3.0))
+    return int(min(max(1, block_size), n))
+
+
+def _bootstrap_panel(
+    panel: np.ndarray,
+    n_samples: int,
+    seed: int,
+    method: str = "iid",
+    block_size: Optional[int] = None,
+    periods_per_year: float = 365.0,
+    sharpe_only: bool = False,
+) -> dict[str, np.ndarray]:
+    """
+    Bootstrap distributions for k equal-length series sharing index draws.
 
-    for _ in range(n_samples):
-        sample = rng.choice(values, size=sample_size, replace=True)
-        std = sample.std(ddof=1)
-        if std == 0:
-            continue
-        sharpe = sample.mean() / std * _ANNUALIZATION_FACTOR
-        sharpe_list.append(float(sharpe))
+    Index matrices are drawn in chunks of ``_CHUNK_ELEMS // n`` samples --
+    a size that depends only on n, so a series gets the same draws whether
+    it is bootstrapped alone or in a batch.  The gathered (k, chunk, n)
+    block is further split over series to stay within the same budget.
 
-    return np.array(sharpe_list)
+    Returns
+    -------
+    dict
+        'sharpe', 'cagr', 'max_drawdown' -> (k, n_samples) float arrays
+        ('sharpe' only when ``sharpe_only``).
+    """
+    k, n = panel.shape
+    rng = np.random.default_rng(seed)
+    names = ("sharpe",) if sharpe_only else ("sharpe", "cagr", "max_drawdown")
+    out = {name: np.empty((k, n_samples)) for name in names}
+    sample_chunk = max(1, _CHUNK_ELEMS // n)
+    for lo in range(0, n_samples, sample_chunk):
+        hi = min(lo + sample_chunk, n_samples)
+        idx = bootstrap_indices(
+            n, hi - lo, method=method, block_size=block_size, seed=rng
+        )
+        series_chunk = max(1, _CHUNK_ELEMS // idx.size)
+        for s0 in range(0, k, series_chunk):
+            s1 = min(s0 + series_chunk, k)
+            metrics = _sample_metrics(
+                panel[s0:s1, idx], periods_per_year, sharpe_only=sharpe_only
+            )
+            for name, arr in metrics.items():
+                out[name][s0:s1, lo:hi] = arr
+    return out
+
+
+def _sample_metrics(
+    samples: np.ndarray, periods_per_year: float, sharpe_only: bool = False
+) -> dict[str, np.ndarray]:
+    """Sharpe / CAGR / max drawdown along the last axis of resampled returns."""
+    n = samples.shape[-1]
+    mean = samples.mean(axis=-1, keepdims=True)
+    dev = samples - mean
+    std = np.sqrt((dev * dev).sum(axis=-1) / (n - 1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(
+            std == 0, np.nan, mean[..., 0] / std * math.sqrt(periods_per_year)
+        )
+    if sharpe_only:
+        return {"sharpe": sharpe}
+
+    final, max_dd = _equity_stats(samples.reshape(-1, n))
+    final = final.reshape(sharpe.shape)
+    max_dd = max_dd.reshape(sharpe.shape)
+    with np.errstate(invalid="ignore"):
+        cagr = np.where(
+            final > 0,
+            np.power(np.maximum(final, 0.0), periods_per_year / n) - 1.0,
+            -1.0,
+        )
+    return {"sharpe": sharpe, "cagr": cagr, "max_drawdown": max_dd}
+
+
+@nb.njit(cache=True)
+def _equity_stats(samples: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Final equity and max drawdown of each row compounded from 1.0."""
+    n_rows, n = samples.shape
+    final = np.empty(n_rows)
+    max_dd = np.empty(n_rows)
+    for i in range(n_rows):
+        equity = 1.0
+        peak = 1.0
+        worst = 0.0
+        for j in range(n):
+            equity *= 1.0 + samples[i, j]
+            if equity > peak:
+                peak = equity
+            elif equity / peak - 1.0 < worst:
+                worst = equity / peak - 1.0
+        final[i] = equity
+        max_dd[i] = worst
+    return final, max_dd
+
+
+def _summarize(
+    sharpe: np.ndarray, cagr: np.ndarray, max_dd: np.ndarray, n_obs: int
+) -> dict:
+    """Percentile summary row for monte_carlo_many()."""
+    row = _none_many_row(len(sharpe), n_obs)
+    valid = sharpe[~np.isnan(sharpe)]
+    row["mc_n_samples"] = len(valid)
+    if len(valid):
+        lo, med, hi = np.percentile(valid, [2.5, 50.0, 97.5])
+        row.update(mc_sharpe_lo=lo, mc_sharpe_median=med, mc_sharpe_hi=hi)
+    for name, arr in (("cagr", cagr), ("max_dd", max_dd)):
+        lo, med, hi = np.percentile(arr, [2.5, 50.0, 97.5])
+        row.update({f"mc_{name}_lo": lo, f"mc_{name}_median": med, f"mc_{name}_hi": hi})
+    return row
+
+
+def _none_many_row(n_samples: int, n_obs: int) -> dict:
+    """monte_carlo_many() row with all CI values set to None."""
+    row: dict = {"n_obs": n_obs, "mc_n_samples": n_samples}
+    for name in ("sharpe", "cagr", "max_dd"):
+        for q in ("lo", "median", "hi"):
+            row[f"mc_{name}_{q}"] = None
+    return row
 
 
 def _none_result(n_samples: int, n_trades: int) -> dict:
@@ -0,0 +1,744 @@
+# -*- coding: utf-8 -*-
+"""
+Panel IC engine: Spearman or Pearson IC for many assets x features x horizons.
+
+Vectorized counterpart of ``batch_compute_ic`` and ``compute_ic_by_regime``
+for an (asset x time x feature) panel on a shared bar grid.  Every statistic
+is built from whole-array rank passes instead of per-feature ``spearmanr`` /
+``rolling().rank()`` calls:
+
+- point IC: average ranks (NaN-omitting) of feature and forward return over
+  each pair's complete rows, then a Pearson correlation of the ranks;
+- rolling IC: pandas ``rolling(window).rank()`` semantics via ``window``
+  comparison passes, then windowed rank sums (exact in float64 -- ranks are
+  multiples of 1/2) for the rolling correlation;
+- turnover: rank autocorrelation of each feature's non-NaN sequence;
+- regime IC: each label's rows are compacted per (asset, feature) and run
+  through the same passes.
+
+``method="pearson"`` skips the ranking: point IC is a demeaned (two-pass)
+covariance of the raw values and rolling IC a rolling correlation of the
+column-centred values.  Turnover stays a rank autocorrelation either way.
+
+Features are processed in chunks so peak memory stays bounded by
+``_CHUNK_ELEMS`` elements per working array.
+
+Semantics match the per-asset functions in ``ic.py`` (boundary masking,
+``min_obs``, constant-series guards, IC-IR with >= 5 rolling values).  A
+bar missing for an asset is NaN in its close/feature rows; rolling windows
+and forward-return horizons count grid bars, as a per-asset series would.
+
+Public API:
+    panel_forward_returns -- (return_type, horizon, asset, time) forward returns
+    rolling_rank_ic       -- rolling Spearman IC along the time axis
+    panel_compute_ic      -- IC table for every asset/feature/horizon/return type
+    panel_ic_by_regime    -- IC table split by a per-bar regime label
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm, rankdata
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_HORIZONS: list[int] = [1, 2, 3, 5, 10, 20, 60]
+_DEFAULT_RETURN_TYPES: list[str] = ["arith", "log"]
+
+_NS_PER_DAY = 86_400 * 10**9
+
+# Upper bound on (asset x time x feature) elements per working array.
+_CHUNK_ELEMS = 1 << 22
+
+_METHODS = ("spearman", "pearson")
+
+# Rolling variance below this fraction of the raw sum of squares is treated
+# as zero (constant window; raw Pearson values do not cancel exactly).
+_VAR_EPS = 1e-12
+
+_RESULT_COLUMNS = [
+    "asset_id",
+    "feature",
+    "horizon",
+    "return_type",
+    "ic",
+    "ic_t_stat",
+    "ic_p_value",
+    "ic_ir",
+    "ic_ir_t_stat",
+    "turnover",
+    "n_obs",
+]
+
+
+# ---------------------------------------------------------------------------
+# Rank kernels (time is axis -2 throughout: (..., time, column))
+# ---------------------------------------------------------------------------
+
+
+def _rank_corr(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Spearman correlation along axis -2 over rows where both are non-NaN.
+
+    Returns (corr, n).  corr is NaN when either side is constant (zero rank
+    variance) or fewer than 2 rows remain.  Rank sums are exact in float64.
+    """
+    valid = ~(np.isnan(x) | np.isnan(y))
+    rx = rankdata(np.where(valid, x, np.nan), axis=-2, nan_policy="omit")
+    ry = rankdata(np.where(valid, y, np.nan), axis=-2, nan_policy="omit")
+    rx = np.where(valid, rx, 0.0)
+    ry = np.where(valid, ry, 0.0)
+    n = valid.sum(axis=-2)
+    # sum of ranks is n(n+1)/2, so the centred sums need only the raw sums
+    c = n * (n + 1.0) ** 2 / 4.0
+    sxy = (rx * ry).sum(axis=-2) - c
+    sxx = (rx * rx).sum(axis=-2) - c
+    syy = (ry * ry).sum(axis=-2) - c
+    with np.errstate(all="ignore"):
+        corr = sxy / np.sqrt(sxx * syy)
+    corr[~((sxx > 0) & (syy > 0))] = np.nan
+    return np.clip(corr, -1.0, 1.0), n
+
+
+def _pearson_corr(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pearson correlation along axis -2 over rows where both are non-NaN.
+
+    Each column is demeaned over its complete rows before the cross
+    products, so large levels do not cancel.  Returns (corr, n); corr is NaN
+    when either side is constant or fewer than 2 rows remain.
+    """
+    valid = ~(np.isnan(x) | np.isnan(y))
+    n = valid.sum(axis=-2)
+
+    def _centred(a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        with np.errstate(all="ignore"):
+            mean = np.where(valid, a, 0.0).sum(axis=-2) / n
+        hi = np.where(valid, a, -np.inf).max(axis=-2)
+        lo = np.where(valid, a, np.inf).min(axis=-2)
+        return np.where(valid, a - mean[..., None, :], 0.0), hi > lo
+
+    dx, varies_x = _centred(x)
+    dy, varies_y = _centred(y)
+    sxy = (dx * dy).sum(axis=-2)
+    sxx = (dx * dx).sum(axis=-2)
+    syy = (dy * dy).sum(axis=-2)
+    with np.errstate(all="ignore"):
+        corr = sxy / np.sqrt(sxx * syy)
+    corr[~(varies_x & varies_y & (sxx > 0) & (syy > 0))] = np.nan
+    return np.clip(corr, -1.0, 1.0), n
+
+
+def _centre(x: np.ndarray) -> np.ndarray:
+    """x minus its column mean over non-NaN rows (axis -2)."""
+    present = ~np.isnan(x)
+    with np.errstate(all="ignore"):
+        mean = np.where(present, x, 0.0).sum(axis=-2) / present.sum(axis=-2)
+    return x - mean[..., None, :]
+
+
+def _check_method(method: str) -> None:
+    if method not in _METHODS:
+        raise ValueError(f"method must be one of {_METHODS}, got {method!r}")
+
+
+def _window_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing ``window``-row sums along axis -2 (partial at the start)."""
+    c = np.cumsum(x, axis=-2)
+    out = c.copy()
+    out[..., window:, :] -= c[..., :-window, :]
+    return out
+
+
+def _rolling_rank(x: np.ndarray, window: int) -> np.ndarray:
+    """``Series.rolling(window).rank()`` along axis -2 (average ties).
+
+    NaN unless all ``window`` rows are present.  One comparison pass per
+    window offset, so memory stays at the size of ``x``.
+    """
+    n = x.shape[-2]
+    out = np.full(x.shape, np.nan)
+    if n < window:
+        return out
+    cur = x[..., window - 1 :, :]
+    less = np.zeros(cur.shape)
+    equal = np.zeros(cur.shape)
+    for k in range(window):
+        prev = x[..., window - 1 - k : n - k, :]
+        less += prev < cur
+        equal += prev == cur
+    present = _window_sum((~np.isnan(x)).astype(float), window)[..., window - 1 :, :]
+    out[..., window - 1 :, :] = np.where(
+        present == window, less + (equal + 1.0) / 2.0, np.nan
+    )
+    return out
+
+
+def _rolling_corr(rx: np.ndarray, ry: np.ndarray, window: int) -> np.ndarray:
+    """``rx.rolling(window).corr(ry)`` along axis -2 (all rows required)."""
+    valid = ~(np.isnan(rx) | np.isnan(ry))
+    rx = np.where(valid, rx, 0.0)
+    ry = np.where(valid, ry, 0.0)
+    n = _window_sum(valid.astype(float), window)
+    sx = _window_sum(rx, window)
+    sy = _window_sum(ry, window)
+    sxx = _window_sum(rx * rx, window)
+    syy = _window_sum(ry * ry, window)
+    sxy = _window_sum(rx * ry, window)
+    with np.errstate(all="ignore"):
+        vx = n * sxx - sx * sx
+        vy = n * syy - sy * sy
+        corr = (n * sxy - sx * sy) / np.sqrt(vx * vy)
+    corr[(n < window) | ~(vx > _VAR_EPS * n * sxx) | ~(vy > _VAR_EPS * n * syy)] = (
+        np.nan
+    )
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_rank_ic(feature, fwd_ret, window: int = 63) -> np.ndarray:
+    """
+    Rolling Spearman IC along the time axis (axis -2).
+
+    Same values as ``compute_rolling_ic`` (pandas rolling rank, then rolling
+    correlation of the ranks) for every column at once.
+
+    Parameters
+    ----------
+    feature : array-like
+        (..., time, n_features) feature values, train-window sliced.
+    fwd_ret : array-like
+        Forward returns broadcastable to ``feature`` (e.g. (..., time, 1)),
+        with boundary bars already nulled.
+    window : int
+        Rolling window size in bars.
+
+    Returns
+    -------
+    np.ndarray
+        Rolling IC, NaN until ``2 * window - 1`` complete rows are available.
+    """
+    feature = np.asarray(feature, dtype=float)
+    fwd_ret = np.asarray(fwd_ret, dtype=float)
+    return _rolling_corr(
+        _rolling_rank(feature, window), _rolling_rank(fwd_ret, window), window
+    )
+
+
+def _ic_ir(rolling_ic: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """IC-IR and its t-stat over axis -2 (NaN with < 5 values or zero std)."""
+    valid = ~np.isnan(rolling_ic)
+    n = valid.sum(axis=-2)
+    with np.errstate(all="ignore"):
+        mean = np.where(valid, rolling_ic, 0.0).sum(axis=-2) / n
+        dev = np.where(valid, rolling_ic - mean[..., None, :], 0.0)
+        std = np.sqrt((dev * dev).sum(axis=-2) / (n - 1))
+        ic_ir = mean / std
+        ic_ir_tstat = mean * np.sqrt(n) / std
+    bad = (n < 5) | ~(std > 0)
+    ic_ir[bad] = np.nan
+    ic_ir_tstat[bad] = np.nan
+    return ic_ir, ic_ir_tstat
+
+
+def _turnover(feat: np.ndarray, min_obs: int) -> np.ndarray:
+    """``compute_feature_turnover`` of every (..., time, column) series."""
+    present = ~np.isnan(feat)
+    order = np.argsort(~present, axis=-2, kind="stable")
+    seq = np.take_along_axis(feat, order, axis=-2)  # non-NaN first, in order
+    count = present.sum(axis=-2)
+    pos = np.arange(feat.shape[-2] - 1)[:, None]
+    pair = pos < (count - 1)[..., None, :]
+    rho, _ = _rank_corr(
+        np.where(pair, seq[..., :-1, :], np.nan),
+        np.where(pair, seq[..., 1:, :], np.nan),
+    )
+    turnover = 1.0 - rho
+    turnover[count < min_obs] = np.nan
+    return turnover
+
+
+# ---------------------------------------------------------------------------
+# Forward returns
+# ---------------------------------------------------------------------------
+
+
+def _forward_returns(close: np.ndarray, horizon: int, log: bool) -> np.ndarray:
+    """Forward returns along axis -2 (``close.shift(-horizon)`` per column)."""
+    ahead = np.full(close.shape, np.nan)
+    if horizon < close.shape[-2]:
+        ahead[..., : close.shape[-2] - horizon, :] = close[..., horizon:, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if log:
+            return np.log(ahead) - np.log(close)
+        return ahead / close - 1.0
+
+
+def panel_forward_returns(
+    close,
+    horizons: Optional[Sequence[int]] = None,
+    return_types: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """
+    Forward returns for every (return_type, horizon) on an (asset, time) panel.
+
+    Equivalent to ``compute_forward_returns`` on each asset's row of the
+    grid (a NaN close yields NaN returns; it is not skipped).
+
+    Parameters
+    ----------
+    close : array-like
+        (n_assets, n_bars) close prices.
+    horizons : list[int], optional
+        Forward horizons. Default [1, 2, 3, 5, 10, 20, 60].
+    return_types : list[str], optional
+        'arith' and/or 'log'. Default ['arith', 'log'].
+
+    Returns
+    -------
+    np.ndarray
+        (n_return_types, n_horizons, n_assets, n_bars).
+    """
+    horizons = list(_DEFAULT_HORIZONS if horizons is None else horizons)
+    return_types = list(_DEFAULT_RETURN_TYPES if return_types is None else return_types)
+    close = np.asarray(close, dtype=float)[..., None]
+    return np.stack(
+        [
+            np.stack(
+                [_forward_returns(close, h, rt == "log")[..., 0] for h in horizons]
+            )
+            for rt in return_types
+        ]
+    )
+
+
+# ---------------------------------------------------------------------------
+# Core: one chunk of columns
+# ---------------------------------------------------------------------------
+
+
+def _ic_block(
+    feat: np.ndarray,
+    fwd: np.ndarray,
+    horizons_k: Sequence[int],
+    ts_ns: np.ndarray,
+    in_train: np.ndarray,
+    train_end_ns: np.ndarray,
+    n_train: np.ndarray,
+    *,
+    rolling_window: int,
+    tf_days_nominal: int,
+    min_obs: int,
+    method: str = "spearman",
+) -> dict[str, np.ndarray]:
+    """IC statistics for one chunk.
+
+    feat is (A, T, C); fwd is (K, A, T, 1 or C) with horizons_k[k] the
+    horizon of slice k.  ts_ns, in_train and train_end_ns broadcast against
+    (A, T, C); n_train against (A, C).  Returns (K, A, C) arrays plus an
+    (A, C) turnover.
+    """
+    if method == "pearson":
+        corr, rolling_input = _pearson_corr, _centre
+    else:
+        corr = _rank_corr
+
+        def rolling_input(x: np.ndarray) -> np.ndarray:
+            return _rolling_rank(x, rolling_window)
+
+    feat_train = np.where(in_train, feat, np.nan)
+    n_feat = (~np.isnan(feat_train)).sum(axis=-2)
+    has_rolling = (n_train >= rolling_window + 5) & (n_feat >= rolling_window + 5)
+    feat_roll = rolling_input(feat_train) if has_rolling.any() else None
+
+    shape = (len(horizons_k),) + n_feat.shape
+    out = {
+        key: np.full(shape, np.nan)
+        for key in ("ic", "ic_t_stat", "ic_p_value", "ic_ir", "ic_ir_t_stat")
+    }
+    out["n_obs"] = np.zeros(shape, dtype=np.int64)
+
+    for k, horizon in enumerate(horizons_k):
+        # Boundary masking: bar_ts + horizon * tf_days > train_end => look-ahead
+        boundary = ts_ns + horizon * tf_days_nominal * _NS_PER_DAY > train_end_ns
+        fwd_train = np.where(in_train & ~boundary, fwd[k], np.nan)
+
+        ic, n_obs = corr(feat_train, fwd_train)
+        ic[n_obs < min_obs] = np.nan
+        with np.errstate(invalid="ignore"):
+            t_stat = ic * np.sqrt(n_obs - 2.0) / np.sqrt(np.maximum(1.0 - ic**2, 1e-15))
+        out["ic"][k] = ic
+        out["ic_t_stat"][k] = t_stat
+        out["ic_p_value"][k] = 2.0 * (1.0 - norm.cdf(np.abs(t_stat)))
+        out["n_obs"][k] = n_obs
+
+        if feat_roll is not None:
+            rolling_ic = _rolling_corr(
+                feat_roll, rolling_input(fwd_train), rolling_window
+            )
+            ic_ir, ic_ir_tstat = _ic_ir(rolling_ic)
+            out["ic_ir"][k] = np.where(has_rolling, ic_ir, np.nan)
+            out["ic_ir_t_stat"][k] = np.where(has_rolling, ic_ir_tstat, np.nan)
+
+    out["turnover"] = _turnover(feat, min_obs)
+    return out
+
+
+def _chunk_size(n_assets: int, n_bars: int, feature_chunk: Optional[int]) -> int:
+    if feature_chunk is not None:
+        return max(1, int(feature_chunk))
+    return max(1, _CHUNK_ELEMS // max(1, n_assets * n_bars))
+
+
+def _per_asset_ns(value, n_assets: int) -> np.ndarray:
+    """Scalar or per-asset timestamps -> (n_assets, 1, 1) int64 ns (UTC)."""
+    if isinstance(value, (pd.Timestamp, str)) or np.ndim(value) == 0:
+        values = [value] * n_assets
+    else:
+        values = list(value)
+        if len(values) != n_assets:
+            raise ValueError(
+                f"expected {n_assets} per-asset timestamps, got {len(values)}"
+            )
+    return np.array([pd.Timestamp(v).value for v in values], dtype=np.int64)[
+        :, None, None
+    ]
+
+
+def _prepare(features, ts, asset_ids, feature_names):
+    feats = np.asarray(features, dtype=float)
+    if feats.ndim != 3:
+        raise ValueError(
+            f"features must be (n_assets, n_bars, n_features), got {feats.shape}"
+        )
+    n_assets, n_bars, n_features = feats.shape
+    ts = pd.DatetimeIndex(ts)
+    if len(ts) != n_bars:
+        raise ValueError(f"ts has {len(ts)} bars, features have {n_bars}")
+    asset_ids = list(range(n_assets)) if asset_ids is None else list(asset_ids)
+    if feature_names is None:
+        feature_names = [f"f{j}" for j in range(n_features)]
+    feature_names = list(feature_names)
+    if len(asset_ids) != n_assets or len(feature_names) != n_features:
+        raise ValueError("asset_ids / feature_names do not match features shape")
+    return feats, ts.as_unit("ns").asi8[None, :, None], asset_ids, feature_names
+
+
+def _to_frame(
+    stats: dict[str, np.ndarray],
+    asset_ids: list,
+    feature_names: list[str],
+    horizons: list[int],
+    return_types: list[str],
+) -> pd.DataFrame:
+    """(K, A, F) arrays (K = return_type-major) -> long table, asset-major."""
+    n_r, n_h = len(return_types), len(horizons)
+    n_a, n_f = len(asset_ids), len(feature_names)
+
+    def _long(arr: np.ndarray) -> np.ndarray:
+        # (R*H, A, F) -> (A, F, R, H) -> flat
+        return arr.reshape(n_r, n_h, n_a, n_f).transpose(2, 3, 0, 1).ravel()
+
+    grid = np.indices((n_a, n_f, n_r, n_h)).reshape(4, -1)
+    frame = pd.DataFrame(
+        {
+            "asset_id": np.asarray(asset_ids, dtype=object)[grid[0]],
+            "feature": np.asarray(feature_names, dtype=object)[grid[1]],
+            "horizon": np.asarray(horizons)[grid[3]],
+            "return_type": np.asarray(return_types, dtype=object)[grid[2]],
+            "ic": _long(stats["ic"]),
+            "ic_t_stat": _long(stats["ic_t_stat"]),
+            "ic_p_value": _long(stats["ic_p_value"]),
+            "ic_ir": _long(stats["ic_ir"]),
+            "ic_ir_t_stat": _long(stats["ic_ir_t_stat"]),
+            "turnover": np.repeat(stats["turnover"].ravel(), n_r * n_h),
+            "n_obs": _long(stats["n_obs"]),
+        }
+    )
+    return frame[_RESULT_COLUMNS]
+
+
+# ---------------------------------------------------------------------------
+# Main public API
+# ---------------------------------------------------------------------------
+
+
+def panel_compute_ic(
+    features,
+    close,
+    ts,
+    train_start,
+    train_end,
+    *,
+    asset_ids: Optional[Sequence] = None,
+    feature_names: Optional[Sequence[str]] = None,
+    horizons: Optional[list[int]] = None,
+    return_types: Optional[list[str]] = None,
+    rolling_window: int = 63,
+    tf_days_nominal: int = 1,
+    min_obs: int = 20,
+    feature_chunk: Optional[int] = None,
+    forward_returns: Optional[np.ndarray] = None,
+    method: str = "spearman",
+) -> pd.DataFrame:
+    """
+    Compute the IC table for every asset, feature, horizon and return type.
+
+    Same statistics as ``batch_compute_ic`` run per asset (point IC with
+    t-stat/p-value, IC-IR from the rolling IC, turnover, n_obs).
+
+    Parameters
+    ----------
+    features : array-like
+        (n_assets, n_bars, n_features) feature values on a shared bar grid.
+    close : array-like or None
+        (n_assets, n_bars) close prices; may be None when ``forward_returns``
+        is given.
+    ts : DatetimeIndex-like
+        (n_bars,) UTC bar timestamps of the grid.
+    train_start, train_end : Timestamp or per-asset sequence
+        Evaluation window (inclusive).  REQUIRED, as in ``compute_ic``.
+    asset_ids, feature_names : sequence, optional
+        Labels for the output table. Default 0..n-1 and f0..fn-1.
+    horizons : list[int], optional
+        Forward horizons. Default [1, 2, 3, 5, 10, 20, 60].
+    return_types : list[str], optional
+        Return type(s). Default ['arith', 'log'].
+    rolling_window : int
+        Window size for rolling IC. Default 63.
+    tf_days_nominal : int
+        Nominal calendar days per bar for boundary masking. Default 1.
+    min_obs : int
+        Minimum observations for IC computation. Default 20.
+    feature_chunk : int, optional
+        Features per pass; default sized to bound memory.
+    forward_returns : np.ndarray, optional
+        Precomputed (n_return_types, n_horizons, n_assets, n_bars) forward
+        returns. Default ``panel_forward_returns(close, ...)``.
+    method : str
+        'spearman' (rank IC, default) or 'pearson' (IC of the raw values;
+        rolling IC and IC-IR likewise).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (asset_id, feature, return_type, horizon). Columns:
+        asset_id, feature, horizon, return_type, ic, ic_t_stat, ic_p_value,
+        ic_ir, ic_ir_t_stat, turnover, n_obs.
+    """
+    _check_method(method)
+    horizons = list(_DEFAULT_HORIZONS if horizons is None else horizons)
+    return_types = list(_DEFAULT_RETURN_TYPES if return_types is None else return_types)
+    feats, ts_ns, asset_ids, feature_names = _prepare(
+        features, ts, asset_ids, feature_names
+    )
+    n_assets, n_bars, n_features = feats.shape
+    if n_features == 0 or n_assets == 0:
+        return pd.DataFrame(columns=_RESULT_COLUMNS)
+
+    if forward_returns is None:
+        forward_returns = panel_forward_returns(close, horizons, return_types)
+    fwd = np.asarray(forward_returns, dtype=float).reshape(-1, n_assets, n_bars, 1)
+
+    start_ns = _per_asset_ns(train_start, n_assets)
+    end_ns = _per_asset_ns(train_end, n_assets)
+    in_train = (ts_ns >= start_ns) & (ts_ns <= end_ns)
+    n_train = in_train.sum(axis=-2)
+    horizons_k = horizons * len(return_types)
+
+    chunk = _chunk_size(n_assets, n_bars, feature_chunk)
+    parts: list[dict[str, np.ndarray]] = []
+    for j0 in range(0, n_features, chunk):
+        parts.append(
+            _ic_block(
+                feats[:, :, j0 : j0 + chunk],
+                fwd,
+                horizons_k,
+                ts_ns,
+                in_train,
+                end_ns,
+                n_train,
+                rolling_window=rolling_window,
+                tf_days_nominal=tf_days_nominal,
+                min_obs=min_obs,
+                method=method,
+            )
+        )
+    stats = {key: np.concatenate([p[key] for p in parts], axis=-1) for key in parts[0]}
+    return _to_frame(stats, asset_ids, feature_names, horizons, return_types)
+
+
+def panel_ic_by_regime(
+    features,
+    close,
+    ts,
+    regimes,
+    train_start,
+    train_end,
+    *,
+    regime_col: str = "trend_state",
+    asset_ids: Optional[Sequence] = None,
+    feature_names: Optional[Sequence[str]] = None,
+    horizons: Optional[list[int]] = None,
+    return_types: Optional[list[str]] = None,
+    rolling_window: int = 63,
+    tf_days_nominal: int = 1,
+    min_obs_per_regime: int = 30,
+    min_obs: int = 20,
+    feature_chunk: Optional[int] = None,
+    method: str = "spearman",
+) -> pd.DataFrame:
+    """
+    IC table broken down by a per-bar regime label, for the whole panel.
+
+    For each label, the bars where it is active (inside the train window,
+    with feature and close present) are compacted per (asset, feature) and
+    evaluated exactly as ``compute_ic_by_regime`` does: forward returns over
+    the regime's own bars, train window spanning its first..last bar, and
+    labels with fewer than ``min_obs_per_regime`` bars skipped.  An (asset,
+    feature) with no evaluable label falls back to full-sample IC with
+    regime_label='all'.
+
+    Parameters
+    ----------
+    features, close, ts, train_start, train_end
+        As in ``panel_compute_ic`` (close is required here).
+    regimes : array-like
+        (n_assets, n_bars) regime labels on the grid; None/NaN = no label.
+    regime_col : str
+        Name recorded in the ``regime_col`` output column.
+    min_obs_per_regime : int
+        Minimum bars for a regime subset to be evaluated. Default 30.
+    Other parameters
+        As in ``panel_compute_ic``.
+
+    Returns
+    -------
+    pd.DataFrame
+        ``panel_compute_ic`` columns plus ``regime_col`` and ``regime_label``;
+        rows ordered by asset, feature, label (first appearance), return
+        type, horizon.
+    """
+    _check_method(method)
+    horizons = list(_DEFAULT_HORIZONS if horizons is None else horizons)
+    return_types = list(_DEFAULT_RETURN_TYPES if return_types is None else return_types)
+    feats, ts_ns, asset_ids, feature_names = _prepare(
+        features, ts, asset_ids, feature_names
+    )
+    n_assets, n_bars, n_features = feats.shape
+    close = np.asarray(close, dtype=float).reshape(n_assets, n_bars, 1)
+    labels = np.asarray(regimes, dtype=object).reshape(n_assets, n_bars)
+
+    start_ns = _per_asset_ns(train_start, n_assets)
+    end_ns = _per_asset_ns(train_end, n_assets)
+    in_window = ((ts_ns >= start_ns) & (ts_ns <= end_ns))[:, :, 0]
+    codes, uniques = pd.factorize(np.where(in_window, labels, None).ravel())
+    codes = codes.reshape(n_assets, n_bars)
+
+    # Per-asset first appearance of each label orders the output like
+    # compute_ic_by_regime's unique() loop.
+    first_seen = np.full((n_assets, len(uniques)), n_bars)
+    for u in range(len(uniques)):
+        hit = codes == u
+        first_seen[:, u] = np.where(hit.any(axis=1), hit.argmax(axis=1), n_bars)
+
+    horizons_k = horizons * len(return_types)
+    ts_full = np.broadcast_to(ts_ns, (n_assets, n_bars, 1))
+    chunk = _chunk_size(n_assets, n_bars, feature_chunk)
+    frames: list[pd.DataFrame] = []
+    covered = np.zeros((n_assets, n_features), dtype=bool)
+
+    for u, label in enumerate(uniques):
+        for j0 in range(0, n_features, chunk):
+            feat = feats[:, :, j0 : j0 + chunk]
+            keep = (codes == u)[:, :, None] & ~np.isnan(feat) & ~np.isnan(close)
+            count = keep.sum(axis=1)
+            ok = count >= min_obs_per_regime
+            if not ok.any():
+                continue
+
+            order = np.argsort(~keep, axis=1, kind="stable")
+            tail = np.arange(n_bars)[None, :, None] >= count[:, None, :]
+            feat_c = np.where(tail, np.nan, np.take_along_axis(feat, order, axis=1))
+            close_c = np.take_along_axis(
+                np.broadcast_to(close, feat.shape), order, axis=1
+            )
+            close_c = np.where(tail, np.nan, close_c)
+            ts_c = np.take_along_axis(
+                np.broadcast_to(ts_full, feat.shape), order, axis=1
+            )
+            last = np.maximum(count - 1, 0)[:, None, :]
+            end_c = np.take_along_axis(ts_c, last, axis=1)
+
+            fwd = np.stack(
+                [
+                    _forward_returns(close_c, h, rt == "log")
+                    for rt in return_types
+                    for h in horizons
+                ]
+            )
+            stats = _ic_block(
+                feat_c,
+                fwd,
+                horizons_k,
+                ts_c,
+                ~tail,
+                end_c,
+                count,
+                rolling_window=rolling_window,
+                tf_days_nominal=tf_days_nominal,
+                min_obs=min_obs,
+                method=method,
+            )
+            names = feature_names[j0 : j0 + chunk]
+            frame = _to_frame(stats, asset_ids, names, horizons, return_types)
+            keep_rows = np.repeat(ok.ravel(), len(horizons_k))
+            frame = frame[keep_rows]
+            frame["regime_label"] = str(label)
+            a_idx = np.repeat(np.arange(n_assets), len(names) * len(horizons_k))
+            frame["_order"] = first_seen[a_idx[keep_rows], u]
+            frames.append(frame)
+            covered[:, j0 : j0 + chunk] |= ok
+
+    if not covered.all():
+        if len(uniques):
+            logger.warning(
+                "panel_ic_by_regime: %d (asset, feature) pairs have no regime with "
+                ">= %d obs -- falling back to full-sample IC",
+                int((~covered).sum()),
+                min_obs_per_regime,
+            )
+        base = panel_compute_ic(
+            feats,
+            close[:, :, 0],
+            ts,
+            train_start,
+            train_end,
+            asset_ids=asset_ids,
+            feature_names=feature_names,
+            horizons=horizons,
+            return_types=return_types,
+            rolling_window=rolling_window,
+            tf_days_nominal=tf_days_nominal,
+            min_obs=min_obs,
+            feature_chunk=feature_chunk,
+            method=method,
+        )
+        base = base[np.repeat(~covered.ravel(), len(horizons_k))].copy()
+        base["regime_label"] = "all"
+        base["_order"] = -1
+        frames.append(base)
+
+    if not frames:
+        return pd.DataFrame(columns=_RESULT_COLUMNS + ["regime_col", "regime_label"])
+    result = pd.concat(frames, ignore_index=True)
+    result["regime_col"] = regime_col
+    a_pos = {a: i for i, a in enumerate(asset_ids)}
+    f_pos = {f: i for i, f in enumerate(feature_names)}
+    result["_a"] = result["asset_id"].map(a_pos)
+    result["_f"] = result["feature"].map(f_pos)
+    result = result.sort_values(["_a", "_f", "_order"], kind="stable")
+    return result.drop(columns=["_a", "_f", "_order"]).reset_index(drop=True)[
+        _RESULT_COLUMNS + ["regime_col", "regime_label"]
+    ]
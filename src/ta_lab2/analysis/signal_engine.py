@@ -0,0 +1,923 @@
+"""
+Native signal backtest engine (compiled, column-batched, vectorbt-free).
+
+Simulates boolean entry/exit signals against a price series for many signal
+sets at once: signals and sizes are (n_bars x n_columns) matrices and every
+column is an independent single-asset portfolio.  Order semantics replicate
+``vectorbt.Portfolio.from_signals`` with the defaults used across ta_lab2 so
+results are interchangeable (see tests/backtests/test_native_engine_parity.py):
+
+- long-only, short-only or both directions (``entries``/``exits`` mapped per
+  direction, or explicit long/short signal pairs); opposite entries reverse
+- no accumulation; conflicting entry+exit on a bar are ignored
+- ``size`` in units; inf means "all available cash", NaN skips the entry
+- proportional fees and slippage (slippage applied to the fill price)
+- hard / trailing stop-loss and take-profit against the entry close, checked
+  before user signals each bar using open/high/low when given; stop exits
+  fill at the stop price without slippage (vectorbt's ``stoplimit``)
+
+Beyond vectorbt:
+
+- time stops (``time_stop`` bars after the fill)
+- funding: per-bar rate charged on the open notional at each close (longs
+  pay positive rates, shorts receive; see funding_adjuster)
+- inf size on short entries/reversals sizes the short from available cash
+  (vectorbt raises instead)
+
+Signals execute on the bar they appear on; shift them by one bar beforehand
+for next-bar execution (``stack_signals(shift=1)``).
+
+Public API
+----------
+SimResult        -- value/cash/position matrices, trade counts and records
+NativePortfolio  -- single-column SimResult view with the vbt.Portfolio subset
+                    used by analysis/ (value, returns, trades, sharpe_ratio, ...)
+simulate_signals -- run the compiled engine
+simulate_batch   -- dispatch a CostModel run to the engine (or vectorbt)
+stack_signals    -- list of per-param Series -> aligned 2-D arrays
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence, Tuple
+
+import numba as nb
+import numpy as np
+import pandas as pd
+
+# vectorbt float tolerances (vectorbt.utils.math_) and default min_size
+_REL_TOL = 1e-9
+_ABS_TOL = 1e-12
+_MIN_SIZE = 1e-8
+
+_LONG = 0
+_SHORT = 1
+
+TRADE_FIELDS = (
+    "col",
+    "size",
+    "entry_idx",
+    "entry_price",
+    "entry_fees",
+    "exit_idx",
+    "exit_price",
+    "exit_fees",
+    "pnl",
+    "return",
+    "direction",  # 0 = long, 1 = short
+    "status",  # 0 = open, 1 = closed
+)
+
+_DIRECTIONS = ("longonly", "shortonly", "both")
+
+
+# =============================================================================
+# Result containers
+# =============================================================================
+
+
+@dataclass
+class SimResult:
+    """Per-column simulation output (rows = bars, columns = signal sets)."""
+
+    value: np.ndarray  # (T, N) portfolio value after each bar
+    returns: np.ndarray  # (T, N) simple returns; row 0 is vs init_cash
+    position: np.ndarray  # (T, N) signed units held after each bar
+    trade_count: np.ndarray  # (N,) closed trade legs + open trade at end
+    init_cash: float = 1_000.0
+    cash: Optional[np.ndarray] = None  # (T, N)
+    funding_paid: Optional[np.ndarray] = None  # (N,) net funding paid
+    trades: Optional[pd.DataFrame] = None  # TRADE_FIELDS, when recorded
+
+    @property
+    def n_columns(self) -> int:
+        return self.value.shape[1]
+
+    def column(self, j: int) -> "SimResult":
+        """Single-column view of column ``j`` (trade records re-indexed to 0)."""
+        trades = self.trades
+        if trades is not None:
+            trades = trades[trades["col"] == j].assign(col=0.0).reset_index(drop=True)
+        return SimResult(
+            value=self.value[:, j : j + 1],
+            returns=self.returns[:, j : j + 1],
+            position=self.position[:, j : j + 1],
+            trade_count=self.trade_count[j : j + 1],
+            init_cash=self.init_cash,
+            cash=None if self.cash is None else self.cash[:, j : j + 1],
+            funding_paid=(
+                None if self.funding_paid is None else self.funding_paid[j : j + 1]
+            ),
+            trades=trades,
+        )
+
+    def total_return(self) -> np.ndarray:
+        return self.value[-1] / self.init_cash - 1.0
+
+    def max_drawdown(self) -> np.ndarray:
+        peak = np.maximum.accumulate(self.value, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.nanmin(self.value / peak - 1.0, axis=0)
+
+    def sharpe_ratio(self, periods_per_year: float = 365.0) -> np.ndarray:
+        """Annualized Sharpe of bar returns (ddof=1, as vectorbt)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                self.returns.mean(axis=0)
+                / self.returns.std(axis=0, ddof=1)
+                * np.sqrt(periods_per_year)
+            )
+
+
+class _NativeTrades:
+    """Trade-record view mirroring the parts of vbt's Trades used in ta_lab2."""
+
+    def __init__(self, records: pd.DataFrame, index: pd.Index) -> None:
+        self._records = records
+        self._index = index
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def win_rate(self) -> float:
+        n = len(self._records)
+        return float((self._records["pnl"] > 0).sum() / n) if n else np.nan
+
+    @property
+    def records(self) -> pd.DataFrame:
+        return self._records
+
+    @property
+    def records_readable(self) -> pd.DataFrame:
+        r = self._records
+        return pd.DataFrame(
+            {
+                "Exit Trade Id": np.arange(len(r)),
+                "Column": r["col"].astype(int).to_numpy(),
+                "Size": r["size"].to_numpy(),
+                "Entry Timestamp": self._index[r["entry_idx"].astype(int)],
+                "Avg Entry Price": r["entry_price"].to_numpy(),
+                "Entry Fees": r["entry_fees"].to_numpy(),
+                "Exit Timestamp": self._index[r["exit_idx"].astype(int)],
+                "Avg Exit Price": r["exit_price"].to_numpy(),
+                "Exit Fees": r["exit_fees"].to_numpy(),
+                "PnL": r["pnl"].to_numpy(),
+                "Return": r["return"].to_numpy(),
+                "Direction": np.where(r["direction"] == _LONG, "Long", "Short"),
+                "Status": np.where(r["status"] == 1, "Closed", "Open"),
+            }
+        )
+
+
+class NativePortfolio:
+    """
+    Single-column engine result exposing the vbt.Portfolio methods that
+    analysis/ consumes, so callers work unchanged without vectorbt.
+    """
+
+    def __init__(
+        self, sim: SimResult, index: pd.Index, periods_per_year: float = 365.0
+    ) -> None:
+        if sim.n_columns != 1:
+            raise ValueError("NativePortfolio wraps a single-column SimResult")
+        self.sim = sim
+        self.index = index
+        self.periods_per_year = periods_per_year
+        records = sim.trades if sim.trades is not None else _empty_trades()
+        self.trades = _NativeTrades(records, index)
+
+    def value(self) -> pd.Series:
+        return pd.Series(self.sim.value[:, 0], index=self.index)
+
+    def returns(self) -> pd.Series:
+        return pd.Series(self.sim.returns[:, 0], index=self.index)
+
+    def assets(self) -> pd.Series:
+        return pd.Series(self.sim.position[:, 0], index=self.index)
+
+    def cash(self) -> pd.Series:
+        return pd.Series(self.sim.cash[:, 0], index=self.index)
+
+    def total_return(self) -> float:
+        return float(self.sim.total_return()[0])
+
+    def max_drawdown(self) -> float:
+        return float(self.sim.max_drawdown()[0])
+
+    def sharpe_ratio(self) -> float:
+        return float(self.sim.sharpe_ratio(self.periods_per_year)[0])
+
+
+def _empty_trades() -> pd.DataFrame:
+    return pd.DataFrame({f: pd.Series(dtype=float) for f in TRADE_FIELDS})
+
+
+# =============================================================================
+# Numba kernel
+# =============================================================================
+
+
+@nb.njit(cache=True)
+def _is_close(a: float, b: float) -> bool:
+    if np.isnan(a) or np.isnan(b) or np.isinf(a) or np.isinf(b):
+        return False
+    if a == b:
+        return True
+    return abs(a - b) <= max(_REL_TOL * max(abs(a), abs(b)), _ABS_TOL)
+
+
+@nb.njit(cache=True)
+def _is_close_or_less(a: float, b: float) -> bool:
+    return _is_close(a, b) or a < b
+
+
+@nb.njit(cache=True)
+def _is_less(a: float, b: float) -> bool:
+    return not _is_close(a, b) and a < b
+
+
+@nb.njit(cache=True)
+def _add(a: float, b: float) -> float:
+    """a + b snapped to 0 when the sum is numerically zero (vectorbt add_nb)."""
+    if np.sign(a) != np.sign(b):
+        if _is_close(abs(a), abs(b)):
+            return 0.0
+    elif _is_close(a + b, 0.0):
+        return 0.0
+    return a + b
+
+
+@nb.njit(cache=True)
+def _buy(cash, pos, size, price, fees, slippage):
+    """Buy/cover ``size`` units; returns (filled, cash, pos, size, price, fees)."""
+    adj = price * (1.0 + slippage)
+    if cash <= 0 or np.isnan(size) or _is_close(size, 0.0):
+        return False, cash, pos, 0.0, adj, 0.0
+    req = size * adj
+    req_fees = req * fees
+    total = req + req_fees
+    if _is_close_or_less(total, cash):
+        final, paid, spent = size, req_fees, total
+    else:
+        max_req = cash / (1.0 + fees)
+        if max_req <= 0:
+            return False, cash, pos, 0.0, adj, 0.0
+        final, paid, spent = max_req / adj, cash - max_req, cash
+    if _is_less(final, _MIN_SIZE):
+        return False, cash, pos, 0.0, adj, 0.0
+    return True, _add(cash, -spent), _add(pos, final), final, adj, paid
+
+
+@nb.njit(cache=True)
+def _sell(cash, pos, size, price, fees, slippage, close_only):
+    """Sell/short ``size`` units; returns (filled, cash, pos, size, price, fees)."""
+    adj = price * (1.0 - slippage)
+    if np.isnan(size):
+        return False, cash, pos, 0.0, adj, 0.0
+    if close_only:
+        if pos <= 0:
+            return False, cash, pos, 0.0, adj, 0.0
+        size = min(pos, size)
+    elif np.isinf(size):
+        # all-cash short: close any long, then short what free cash covers
+        long_size = max(pos, 0.0)
+        free = _add(cash, long_size * adj * (1.0 - fees))
+        if free <= 0:
+            if pos <= 0:
+                return False, cash, pos, 0.0, adj, 0.0
+            size = long_size
+        else:
+            size = _add(long_size, free / (adj * (1.0 + fees)))
+    if _is_close(size, 0.0) or _is_less(size, _MIN_SIZE):
+        return False, cash, pos, 0.0, adj, 0.0
+    acq = size * adj
+    paid = acq * fees
+    net = _add(acq, -paid)
+    if net < 0:
+        return False, cash, pos, 0.0, adj, 0.0
+    return True, cash + net, _add(pos, -size), size, adj, paid
+
+
+@nb.njit(cache=True)
+def _stop_price(pos, ref_price, stop, open_, low, high, hit_below):
+    """Stop fill price for this bar or NaN (vectorbt get_stop_price_nb)."""
+    if (pos > 0 and hit_below) or (pos < 0 and not hit_below):
+        px = ref_price * (1.0 - stop)
+        if open_ <= px:
+            return open_
+        if low <= px <= high:
+            return px
+        return np.nan
+    px = ref_price * (1.0 + stop)
+    if px <= open_:
+        return open_
+    if low <= px <= high:
+        return px
+    return np.nan
+
+
+@nb.njit(cache=True)
+def _write_trade(
+    records,
+    rec_n,
+    col,
+    size,
+    entry_i,
+    entry_price,
+    entry_fees,
+    exit_i,
+    exit_price,
+    exit_fees,
+    direction,
+    status,
+):
+    if records.shape[0] == 0:
+        return
+    entry_val = size * entry_price
+    diff = _add(size * exit_price, -entry_val)
+    if diff != 0 and direction == _SHORT:
+        diff = -diff
+    pnl = diff - entry_fees - exit_fees
+    r = rec_n[0]
+    records[r, 0] = col
+    records[r, 1] = size
+    records[r, 2] = entry_i
+    records[r, 3] = entry_price
+    records[r, 4] = entry_fees
+    records[r, 5] = exit_i
+    records[r, 6] = exit_price
+    records[r, 7] = exit_fees
+    records[r, 8] = pnl
+    records[r, 9] = pnl / entry_val
+    records[r, 10] = direction
+    records[r, 11] = status
+    rec_n[0] = r + 1
+
+
+@nb.njit(cache=True)
+def _book_fill(tr, is_buy, size, price, paid, i, col, records, rec_n):
+    """
+    Update the open-trade state ``tr`` = [direction (-1 flat), entry_idx,
+    size, gross, fees] with a fill; returns the number of trades closed.
+    """
+    if tr[0] < 0:
+        tr[0] = _LONG if is_buy else _SHORT
+        tr[1] = i
+        tr[2] = 0.0
+        tr[3] = 0.0
+        tr[4] = 0.0
+    if (tr[0] == _LONG) == is_buy:
+        tr[2] += size
+        tr[3] += size * price
+        tr[4] += paid
+        return 0
+    if _is_close_or_less(size, tr[2]):
+        full = _is_close(size, tr[2])
+        exit_size = tr[2] if full else size
+        _write_trade(
+            records,
+            rec_n,
+            col,
+            exit_size,
+            tr[1],
+            tr[3] / tr[2],
+            exit_size / tr[2] * tr[4],
+            i,
+            price,
+            paid,
+            tr[0],
+            1,
+        )
+        if full:
+            tr[0] = -1.0
+        else:
+            frac = (tr[2] - size) / tr[2]
+            tr[2] *= frac
+            tr[3] *= frac
+            tr[4] *= frac
+        return 1
+    # reversal: close the whole trade, open the remainder the other way
+    closed_fees = tr[2] / size * paid
+    _write_trade(
+        records,
+        rec_n,
+        col,
+        tr[2],
+        tr[1],
+        tr[3] / tr[2],
+        tr[4],
+        i,
+        price,
+        closed_fees,
+        tr[0],
+        1,
+    )
+    tr[2] = size - tr[2]
+    tr[3] = tr[2] * price
+    tr[4] = paid - closed_fees
+    tr[1] = i
+    tr[0] = 1.0 - tr[0]
+    return 1
+
+
+@nb.njit(cache=True)
+def _simulate_kernel(
+    close,
+    open_,
+    high,
+    low,
+    long_entries,
+    long_exits,
+    short_entries,
+    short_exits,
+    size,
+    fees,
+    slippage,
+    sl_stop,
+    sl_trail,
+    tp_stop,
+    time_stop,
+    funding,
+    init_cash,
+    value,
+    cash_out,
+    position,
+    trade_count,
+    funding_paid,
+    records,
+    rec_n,
+):
+    n_bars, n_cols = long_entries.shape
+    tr = np.empty(5)
+    for j in range(n_cols):
+        cj = j if close.shape[1] > 1 else 0
+        oj = j if open_.shape[1] > 1 else 0
+        hj = j if high.shape[1] > 1 else 0
+        lj = j if low.shape[1] > 1 else 0
+        fj = j if funding.shape[1] > 1 else 0
+        sl = sl_stop[j]
+        tp = tp_stop[j]
+        trail = sl_trail[j]
+        tstop = time_stop[j]
+
+        cash = init_cash
+        pos = 0.0
+        last_px = np.nan
+        tr[0] = -1.0
+        n_trades = 0
+        paid_funding = 0.0
+        sl_price = np.nan
+        tp_price = np.nan
+        entry_i = -1
+
+        for i in range(n_bars):
+            px = close[i, cj]
+            if not np.isnan(px):
+                last_px = px
+
+                le = long_entries[i, j]
+                lx = long_exits[i, j]
+                se = short_entries[i, j]
+                sx = short_exits[i, j]
+                order_px = px
+                order_slip = slippage
+                forced = False
+
+                if pos != 0:
+                    stop_px = np.nan
+                    if not np.isnan(sl) or not np.isnan(tp):
+                        o = open_[i, oj]
+                        h = high[i, hj]
+                        lo = low[i, lj]
+                        if np.isnan(o):
+                            o = px
+                        if np.isnan(lo):
+                            lo = min(o, px)
+                        if np.isnan(h):
+                            h = max(o, px)
+                        if not np.isnan(sl):
+                            stop_px = _stop_price(pos, sl_price, sl, o, lo, h, True)
+                        if np.isnan(stop_px) and not np.isnan(tp):
+                            stop_px = _stop_price(pos, tp_price, tp, o, lo, h, False)
+                        if not np.isnan(sl) and trail:
+                            if pos > 0 and h > sl_price:
+                                sl_price = h
+                            elif pos < 0 and lo < sl_price:
+                                sl_price = lo
+                    if not np.isnan(stop_px):
+                        forced = True
+                        order_px = stop_px
+                        order_slip = 0.0
+                    elif tstop > 0 and i - entry_i >= tstop:
+                        forced = True
+                    if forced:
+                        le = False
+                        se = False
+                        lx = pos > 0
+                        sx = pos < 0
+
+                if not forced and (le or se):
+                    if le and lx:
+                        le = False
+                        lx = False
+                    if se and sx:
+                        se = False
+                        sx = False
+                    if le and se:
+                        le = False
+                        se = False
+
+                sz = size[i, j]
+                prev_pos = pos
+                filled = False
+                is_buy = False
+                fill_size = 0.0
+                fill_px = 0.0
+                paid = 0.0
+                if pos > 0:
+                    if se:
+                        qty = pos if np.isnan(sz) else pos + sz
+                        filled, cash, pos, fill_size, fill_px, paid = _sell(
+                            cash, pos, qty, order_px, fees, order_slip, False
+                        )
+                    elif lx:
+                        filled, cash, pos, fill_size, fill_px, paid = _sell(
+                            cash, pos, pos, order_px, fees, order_slip, True
+                        )
+                elif pos < 0:
+                    if le:
+                        qty = -pos if np.isnan(sz) else -pos + sz
+                        is_buy = True
+                        filled, cash, pos, fill_size, fill_px, paid = _buy(
+                            cash, pos, qty, order_px, fees, order_slip
+                        )
+                    elif sx:
+                        is_buy = True
+                        filled, cash, pos, fill_size, fill_px, paid = _buy(
+                            cash, pos, -pos, order_px, fees, order_slip
+                        )
+                elif le:
+                    is_buy = True
+                    filled, cash, pos, fill_size, fill_px, paid = _buy(
+                        cash, pos, sz, order_px, fees, order_slip
+                    )
+                elif se:
+                    filled, cash, pos, fill_size, fill_px, paid = _sell(
+                        cash, pos, sz, order_px, fees, order_slip, False
+                    )
+
+                if filled:
+                    n_trades += _book_fill(
+                        tr, is_buy, fill_size, fill_px, paid, i, j, records, rec_n
+                    )
+                    if pos == 0:
+                        sl_price = np.nan
+                        tp_price = np.nan
+                        entry_i = -1
+                    elif prev_pos == 0 or np.sign(pos) != np.sign(prev_pos):
+                        sl_price = px
+                        tp_price = px
+                        entry_i = i
+
+                if pos != 0:
+                    rate = funding[i, fj]
+                    if not np.isnan(rate) and rate != 0:
+                        flow = pos * px * rate
+                        cash -= flow
+                        paid_funding += flow
+
+            value[i, j] = cash if pos == 0 else cash + pos * last_px
+            cash_out[i, j] = cash
+            position[i, j] = pos
+
+        if tr[0] >= 0 and _is_less(-tr[2], 0.0):
+            n_trades += 1
+            _write_trade(
+                records,
+                rec_n,
+                j,
+                tr[2],
+                tr[1],
+                tr[3] / tr[2],
+                tr[4],
+                n_bars - 1,
+                close[n_bars - 1, cj],
+                0.0,
+                tr[0],
+                0,
+            )
+        trade_count[j] = n_trades
+        funding_paid[j] = paid_funding
+
+
+@nb.njit(cache=True)
+def _returns_kernel(value: np.ndarray, init_cash: float, out: np.ndarray) -> None:
+    n_bars, n_cols = value.shape
+    for j in range(n_cols):
+        prev = init_cash
+        for i in range(n_bars):
+            cur = value[i, j]
+            if prev == 0:
+                out[i, j] = 0.0 if cur == 0 else np.sign(cur) * np.inf
+            else:
+                out[i, j] = (cur - prev) / prev
+            prev = cur
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+
+def _as_2d(arr: Any, dtype: Any) -> np.ndarray:
+    out = np.asarray(arr, dtype=dtype)
+    if out.ndim == 0:
+        out = out.reshape(1, 1)
+    return out[:, None] if out.ndim == 1 else out
+
+
+def _rows(arr: Any, n_bars: int, name: str) -> np.ndarray:
+    """(T,) / (T, 1) / (T, N) float input, or None -> (T, 1) NaN."""
+    if arr is None:
+        return np.full((n_bars, 1), np.nan)
+    out = _as_2d(arr, np.float64)
+    if out.shape == (1, 1):
+        return np.full((n_bars, 1), out[0, 0])
+    if out.shape[0] != n_bars:
+        raise ValueError(f"{name} has {out.shape[0]} rows, expected {n_bars}")
+    return np.ascontiguousarray(out)
+
+
+def _per_column(arr: Any, n_cols: int, dtype: Any, name: str) -> np.ndarray:
+    out = np.asarray(arr, dtype=dtype).reshape(-1)
+    if out.size == 1:
+        return np.full(n_cols, out[0], dtype=dtype)
+    if out.size != n_cols:
+        raise ValueError(f"{name} has {out.size} values, expected 1 or {n_cols}")
+    return out
+
+
+def simulate_signals(
+    close: Any,
+    entries: Any = None,
+    exits: Any = None,
+    size: Any = None,
+    *,
+    short_entries: Any = None,
+    short_exits: Any = None,
+    direction: str = "longonly",
+    fees: float = 0.0,
+    slippage: float = 0.0,
+    sl_stop: Any = np.nan,
+    sl_trail: Any = False,
+    tp_stop: Any = np.nan,
+    time_stop: Any = 0,
+    funding_rate: Any = None,
+    open: Any = None,  # noqa: A002 -- mirrors vectorbt's keyword
+    high: Any = None,
+    low: Any = None,
+    init_cash: float = 1_000.0,
+    record_trades: bool = False,
+) -> SimResult:
+    """
+    Simulate signal portfolios with the compiled engine.
+
+    Args:
+        close: (T,) shared price series or (T, N) per-column prices.
+        entries: (T,) or (T, N) boolean entries (long entries when
+            short_entries/short_exits are given).
+        exits: (T,) or (T, N) boolean exits (long exits in long/short mode).
+        size: Units per entry, broadcastable to (T, N).  None or inf means
+            "all available cash"; NaN skips the entry.
+        short_entries: Optional explicit short entries; enables long/short
+            mode in which ``direction`` is ignored.
+        short_exits: Optional explicit short exits.
+        direction: How entries/exits map to orders: "longonly" (enter/exit
+            long), "shortonly" (enter/exit short) or "both" (entries go long,
+            exits go short, each reversing the other side).
+        fees: Proportional fee per fill (decimal, e.g. 0.001 = 10 bps).
+        slippage: Proportional price slippage per signal fill (decimal).
+        sl_stop: Stop-loss distance from the entry close (fraction), scalar or
+            per column; NaN disables.
+        sl_trail: Trail the stop behind the running high (long) / low (short).
+        tp_stop: Take-profit distance from the entry close; NaN disables.
+        time_stop: Exit at the close ``time_stop`` bars after the entry fill;
+            0 disables.
+        funding_rate: Per-bar funding rate (decimal), scalar, (T,) or (T, N).
+            Each close, ``position * close * rate`` is debited from cash.
+        open, high, low: Optional OHLC used to resolve stop fills; missing
+            values fall back to close.
+        init_cash: Starting cash per column.
+        record_trades: Also return per-trade records in ``SimResult.trades``.
+
+    Returns:
+        SimResult.
+    """
+    c = _as_2d(close, np.float64)
+    n_bars = c.shape[0]
+
+    if short_entries is not None or short_exits is not None:
+        signals = [entries, exits, short_entries, short_exits]
+    elif direction == "longonly":
+        signals = [entries, exits, None, None]
+    elif direction == "shortonly":
+        signals = [None, None, entries, exits]
+    elif direction == "both":
+        signals = [entries, None, exits, None]
+    else:
+        raise ValueError(f"direction must be one of {_DIRECTIONS}, got {direction!r}")
+
+    shapes = [_as_2d(s, np.bool_).shape for s in signals if s is not None]
+    try:
+        shape = np.broadcast_shapes((n_bars, 1), *shapes)
+    except ValueError:
+        raise ValueError(f"signal shapes do not broadcast: {shapes}") from None
+    if shape[0] != n_bars or c.shape[1] not in (1, shape[1]):
+        raise ValueError(f"close {c.shape} does not broadcast to signals {shape}")
+    n_cols = shape[1]
+    le, lx, se, sx = (
+        np.zeros(shape, np.bool_)
+        if s is None
+        else np.ascontiguousarray(np.broadcast_to(_as_2d(s, np.bool_), shape))
+        for s in signals
+    )
+
+    if size is None:
+        sz = np.full(shape, np.inf)
+    else:
+        sz = np.ascontiguousarray(np.broadcast_to(_as_2d(size, np.float64), shape))
+
+    sl = _per_column(sl_stop, n_cols, np.float64, "sl_stop")
+    tp = _per_column(tp_stop, n_cols, np.float64, "tp_stop")
+    if (sl < 0).any() or (tp < 0).any():
+        raise ValueError("sl_stop and tp_stop must be 0 or greater")
+    trail = _per_column(sl_trail, n_cols, np.bool_, "sl_trail")
+    tstop = _per_column(time_stop, n_cols, np.int64, "time_stop")
+    fund = _rows(0.0 if funding_rate is None else funding_rate, n_bars, "funding")
+
+    value = np.empty(shape)
+    cash = np.empty(shape)
+    position = np.empty(shape)
+    trades = np.zeros(n_cols, dtype=np.int64)
+    funding_paid = np.zeros(n_cols)
+    cap = n_cols * (n_bars + 1) if record_trades else 0
+    records = np.empty((cap, len(TRADE_FIELDS)))
+    rec_n = np.zeros(1, dtype=np.int64)
+
+    _simulate_kernel(
+        np.ascontiguousarray(c),
+        _rows(open, n_bars, "open"),
+        _rows(high, n_bars, "high"),
+        _rows(low, n_bars, "low"),
+        le,
+        lx,
+        se,
+        sx,
+        sz,
+        float(fees),
+        float(slippage),
+        sl,
+        trail,
+        tp,
+        tstop,
+        fund,
+        float(init_cash),
+        value,
+        cash,
+        position,
+        trades,
+        funding_paid,
+        records,
+        rec_n,
+    )
+    returns = np.empty_like(value)
+    _returns_kernel(value, float(init_cash), returns)
+
+    trade_df = None
+    if record_trades:
+        trade_df = pd.DataFrame(records[: rec_n[0]], columns=list(TRADE_FIELDS))
+        trade_df = trade_df.sort_values(["col", "entry_idx"], kind="stable")
+        trade_df = trade_df.reset_index(drop=True)
+    return SimResult(
+        value=value,
+        returns=returns,
+        position=position,
+        trade_count=trades,
+        init_cash=float(init_cash),
+        cash=cash,
+        funding_paid=funding_paid,
+        trades=trade_df,
+    )
+
+
+def simulate_batch(
+    close: pd.Series,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    size: Optional[np.ndarray],
+    cost: Any,
+    *,
+    init_cash: float = 1_000.0,
+    engine: str = "auto",
+    **kwargs: Any,
+) -> SimResult:
+    """
+    Evaluate every column of a signal matrix against one price series.
+
+    Args:
+        close: Price series (length T).
+        entries: (T, N) boolean entries (already shifted for next-bar fills).
+        exits: (T, N) boolean exits.
+        size: (T, N) unit sizes (inf = all cash) or None.
+        cost: Object with ``to_vbt_kwargs()`` (costs.CostModel or
+            vbt_runner.CostModel) supplying ``fees`` and ``slippage``.
+        init_cash: Starting cash per column.
+        engine: "auto"/"numba" (compiled engine) or "vbt" (one multi-column
+            vectorbt portfolio; for cross-checking).
+        **kwargs: Further simulate_signals options (direction, stops, ...).
+
+    Returns:
+        SimResult.
+    """
+    kw = cost.to_vbt_kwargs()
+    if engine in ("auto", "numba"):
+        return simulate_signals(
+            np.asarray(close, dtype=np.float64),
+            entries,
+            exits,
+            size,
+            fees=kw.get("fees", 0.0),
+            slippage=kw.get("slippage", 0.0),
+            init_cash=init_cash,
+            **kwargs,
+        )
+    if engine != "vbt":
+        raise ValueError(f"Unknown engine '{engine}'")
+
+    import vectorbt as vbt  # deferred: only needed for cross-checks
+
+    pf = vbt.Portfolio.from_signals(
+        close,
+        entries=np.asarray(entries, dtype=np.bool_),
+        exits=np.asarray(exits, dtype=np.bool_),
+        size=None if size is None else np.asarray(size, dtype=np.float64),
+        **kw,
+        **kwargs,
+        init_cash=init_cash,
+        freq="D",
+    )
+    n_cols = np.asarray(entries).shape[1]
+
+    def _mat(obj: Any) -> np.ndarray:
+        return np.asarray(obj, dtype=np.float64).reshape(len(close), n_cols)
+
+    return SimResult(
+        value=_mat(pf.value()),
+        returns=_mat(pf.returns()),
+        position=_mat(pf.assets()),
+        trade_count=np.asarray(pf.trades.count(), dtype=np.int64).reshape(n_cols),
+        init_cash=float(init_cash),
+        cash=_mat(pf.cash()),
+    )
+
+
+def stack_signals(
+    signals: Sequence[Tuple[pd.Series, pd.Series, Optional[pd.Series]]],
+    rows: Any = slice(None),
+    *,
+    shift: int = 1,
+) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Stack per-parameter (entries, exits, size) Series into 2-D arrays.
+
+    Args:
+        signals: One (entries, exits, size) triple per column.
+        rows: Positional row selector applied before shifting (e.g. test_idx).
+        shift: Bars to delay signals by (1 = next-bar execution); shifted-in
+            rows are False.
+
+    Returns:
+        (entries, exits, size) arrays of shape (T, N); size is None when no
+        column supplies one, otherwise inf marks "all cash" columns.
+    """
+
+    def _bools(s: pd.Series) -> np.ndarray:
+        a = np.asarray(s.iloc[rows], dtype=np.bool_)
+        if shift > 0:
+            a = np.concatenate([np.zeros(min(shift, len(a)), np.bool_), a[:-shift]])
+        return a
+
+    e = np.column_stack([_bools(en) for en, _, _ in signals])
+    x = np.column_stack([_bools(ex) for _, ex, _ in signals])
+    if all(sz is None for _, _, sz in signals):
+        return e, x, None
+    sz = np.column_stack(
+        [
+            np.full(e.shape[0], np.inf)
+            if s is None
+            else np.asarray(s.iloc[rows], dtype=np.float64)
+            for _, _, s in signals
+        ]
+    )
+    return e, x, sz
@@ -1,9 +1,14 @@
 # src/ta_lab2/analysis/stop_simulator.py
 """
-Stop-loss simulation sweep: hard stop, trailing stop, time-stop via vectorbt 0.28.1.
+Stop-loss simulation sweep: hard stop, trailing stop, time-stop.
+
+Runs on vectorbt 0.28.1 when installed, else on the native signal engine
+(ta_lab2.analysis.signal_engine), which reproduces vectorbt's fills; pass
+``engine="native"`` / ``"vbt"`` to force either.
 
 This is a pure simulation library -- no DB reads, no CLI, no reports.
-All functions return vectorbt Portfolio objects or DataFrames.
+All functions return Portfolio objects (vbt.Portfolio or NativePortfolio)
+or DataFrames.
 
 Usage:
     from ta_lab2.analysis.stop_simulator import sweep_stops, STOP_THRESHOLDS
@@ -18,6 +23,8 @@ from typing import List, Optional
 import numpy as np
 import pandas as pd
 
+from ta_lab2.analysis.signal_engine import NativePortfolio, simulate_signals
+
 try:
     import vectorbt as vbt
 except ImportError:  # pragma: no cover
@@ -67,11 +74,70 @@ class StopScenarioResult:
 # ---------------------------------------------------------------------------
 
 
-def _require_vbt() -> None:
-    if vbt is None:
+def _resolve_engine(engine: str) -> str:
+    """'auto' -> 'vbt' when vectorbt is installed, else 'native'."""
+    if engine == "auto":
+        return "native" if vbt is None else "vbt"
+    if engine not in ("vbt", "native"):
+        raise ValueError(f"engine must be 'auto', 'vbt' or 'native', got {engine!r}")
+    if engine == "vbt" and vbt is None:
         raise ImportError(
-            "vectorbt is required for stop_simulator; `pip install vectorbt`"
+            "vectorbt is required for engine='vbt'; `pip install vectorbt`"
         )
+    return engine
+
+
+def _run_portfolio(
+    price: pd.Series,
+    entries: pd.Series,
+    exits: pd.Series,
+    fee_bps: float,
+    engine: str,
+    sl_stop: float = np.nan,
+    sl_trail: bool = False,
+):
+    """Long-only portfolio on ``price`` with the shared sweep settings."""
+    if _resolve_engine(engine) == "native":
+        sim = simulate_signals(
+            price.to_numpy(dtype=float),
+            entries.to_numpy(dtype=bool),
+            exits.to_numpy(dtype=bool),
+            fees=fee_bps / 1e4,
+            sl_stop=sl_stop,
+            sl_trail=sl_trail,
+            init_cash=1000.0,
+            record_trades=True,
+        )
+        return NativePortfolio(sim, price.index)
+
+    stop_kwargs = {} if np.isnan(sl_stop) else dict(sl_stop=sl_stop, sl_trail=sl_trail)
+    return vbt.Portfolio.from_signals(
+        price,
+        entries=entries,
+        exits=exits,
+        **stop_kwargs,
+        direction="longonly",
+        freq="D",
+        init_cash=1000.0,
+        fees=fee_bps / 1e4,
+    )
+
+
+def _time_exits(entries: pd.Series, exits: pd.Series, n_bars: int) -> pd.Series:
+    """Exits OR-ed with a forced exit ``n_bars`` after each entry signal."""
+    n = len(entries)
+
+    # Vectorized: find all entry indices, add n_bars offset, clip to array bounds
+    entry_indices = np.where(entries.values)[0]  # shape (n_entries,)
+    time_exit_indices = np.clip(entry_indices + n_bars, 0, n - 1)
+
+    # Build time-exit boolean array
+    time_exits_arr = np.zeros(n, dtype=bool)
+    if len(time_exit_indices) > 0:
+        time_exits_arr[time_exit_indices] = True
+
+    # Combine with original exits: fire on whichever comes first
+    return exits | pd.Series(time_exits_arr, index=entries.index, dtype=bool)
 
 
 def _strip_tz(price: pd.Series) -> pd.Series:
@@ -115,9 +181,10 @@ def simulate_hard_stop(
     exits: pd.Series,
     sl_pct: float,
     fee_bps: float = DEFAULT_FEE_BPS,
+    engine: str = "auto",
 ):
     """
-    Simulate a hard (fixed) stop-loss using vectorbt.
+    Simulate a hard (fixed) stop-loss.
 
     Parameters
     ----------
@@ -131,26 +198,16 @@ def simulate_hard_stop(
         Stop-loss threshold as a fraction (e.g. 0.05 = 5%).
     fee_bps : float
         Round-trip fee in basis points.
+    engine : str
+        "auto" (vectorbt if installed, else native), "vbt" or "native".
 
     Returns
     -------
-    vbt.Portfolio
+    vbt.Portfolio or NativePortfolio
     """
-    _require_vbt()
     price = _strip_tz(price)
     entries, exits = _coerce_signals(price, entries, exits)
-
-    return vbt.Portfolio.from_signals(
-        price,
-        entries=entries,
-        exits=exits,
-        sl_stop=sl_pct,
-        sl_trail=False,
-        direction="longonly",
-        freq="D",
-        init_cash=1000.0,
-        fees=fee_bps / 1e4,
-    )
+    return _run_portfolio(price, entries, exits, fee_bps, engine, sl_stop=sl_pct)
 
 
 def simulate_trailing_stop(
@@ -159,9 +216,10 @@ def simulate_trailing_stop(
     exits: pd.Series,
     sl_pct: float,
     fee_bps: float = DEFAULT_FEE_BPS,
+    engine: str = "auto",
 ):
     """
-    Simulate a trailing stop-loss using vectorbt.
+    Simulate a trailing stop-loss.
 
     Parameters
     ----------
@@ -175,25 +233,17 @@ def simulate_trailing_stop(
         Trailing stop distance as a fraction (e.g. 0.05 = 5%).
     fee_bps : float
         Round-trip fee in basis points.
+    engine : str
+        "auto" (vectorbt if installed, else native), "vbt" or "native".
 
     Returns
     -------
-    vbt.Portfolio
+    vbt.Portfolio or NativePortfolio
     """
-    _require_vbt()
     price = _strip_tz(price)
     entries, exits = _coerce_signals(price, entries, exits)
-
-    return vbt.Portfolio.from_signals(
-        price,
-        entries=entries,
-        exits=exits,
-        sl_stop=sl_pct,
-        sl_trail=True,
-        direction="longonly",
-        freq="D",
-        init_cash=1000.0,
-        fees=fee_bps / 1e4,
+    return _run_portfolio(
+        price, entries, exits, fee_bps, engine, sl_stop=sl_pct, sl_trail=True
     )
 
 
@@ -203,12 +253,14 @@ def simulate_time_stop(
     exits: pd.Series,
     n_bars: int,
     fee_bps: float = DEFAULT_FEE_BPS,
+    engine: str = "auto",
 ):
     """
     Simulate a time-based stop using custom exit signal arrays.
 
     vectorbt 0.28.1 has no native time-stop parameter. We build a custom exit
-    array that fires n_bars after each entry, then OR it with the original exits.
+    array that fires n_bars after each entry signal, then OR it with the
+    original exits (both engines use these exits so results are identical).
 
     Parameters
     ----------
@@ -222,38 +274,17 @@ def simulate_time_stop(
         Number of bars after which to force an exit.
     fee_bps : float
         Round-trip fee in basis points.
+    engine : str
+        "auto" (vectorbt if installed, else native), "vbt" or "native".
 
     Returns
     -------
-    vbt.Portfolio
+    vbt.Portfolio or NativePortfolio
     """
-    _require_vbt()
     price = _strip_tz(price)
     entries, exits = _coerce_signals(price, entries, exits)
-
-    n = len(price)
-
-    # Vectorized: find all entry indices, add n_bars offset, clip to array bounds
-    entry_indices = np.where(entries.values)[0]  # shape (n_entries,)
-    time_exit_indices = np.clip(entry_indices + n_bars, 0, n - 1)
-
-    # Build time-exit boolean array
-    time_exits_arr = np.zeros(n, dtype=bool)
-    if len(time_exit_indices) > 0:
-        time_exits_arr[time_exit_indices] = True
-
-    # Combine with original exits: fire on whichever comes first
-    combined_exits = exits | pd.Series(time_exits_arr, index=price.index, dtype=bool)
-
-    return vbt.Portfolio.from_signals(
-        price,
-        entries=entries,
-        exits=combined_exits,
-        direction="longonly",
-        freq="D",
-        init_cash=1000.0,
-        fees=fee_bps / 1e4,
-    )
+    combined_exits = _time_exits(entries, exits, n_bars)
+    return _run_portfolio(price, entries, combined_exits, fee_bps, engine)
 
 
 # ---------------------------------------------------------------------------
@@ -323,11 +354,11 @@ def extract_scenario_metrics(
     baseline_return: float,
 ) -> StopScenarioResult:
     """
-    Extract scenario metrics from a vbt.Portfolio into a StopScenarioResult.
+    Extract scenario metrics from a portfolio into a StopScenarioResult.
 
     Parameters
     ----------
-    pf : vbt.Portfolio
+    pf : vbt.Portfolio or NativePortfolio
         Executed portfolio object.
     stop_type : str
         One of "hard", "trailing", "time".
@@ -340,7 +371,8 @@ def extract_scenario_metrics(
     -------
     StopScenarioResult
     """
-    sharpe = float(pf.sharpe_ratio(freq=365))
+    # Daily bars: vbt annualizes with freq="D" (365 days/year) set at build time
+    sharpe = float(pf.sharpe_ratio())
     max_dd = float(pf.max_drawdown())
     total_return = float(pf.total_return())
     trade_count = int(pf.trades.count())
@@ -381,6 +413,7 @@ def sweep_stops(
     thresholds: Optional[List[float]] = None,
     time_bars: Optional[List[int]] = None,
     fee_bps: float = DEFAULT_FEE_BPS,
+    engine: str = "auto",
 ) -> pd.DataFrame:
     """
     Sweep hard stop, trailing stop, and time-stop across threshold ranges.
@@ -399,6 +432,10 @@ def sweep_stops(
         Bar counts for time-stop. Defaults to TIME_STOP_BARS.
     fee_bps : float
         Round-trip fee in basis points.
+    engine : str
+        "auto" (vectorbt if installed, else native), "vbt" or "native".  The
+        native engine runs the baseline and every scenario as columns of a
+        single simulation.
 
     Returns
     -------
@@ -407,7 +444,7 @@ def sweep_stops(
                  win_rate, avg_recovery_bars, opportunity_cost.
         Sorted by (stop_type, threshold).
     """
-    _require_vbt()
+    engine = _resolve_engine(engine)
 
     if thresholds is None:
         thresholds = STOP_THRESHOLDS
@@ -421,39 +458,47 @@ def sweep_stops(
     if not _has_any_entries(entries):
         return pd.DataFrame(columns=_RESULT_COLUMNS)
 
-    # Baseline (no stop) for opportunity cost
     price_clean = _strip_tz(price)
-    pf_baseline = vbt.Portfolio.from_signals(
-        price_clean,
-        entries=entries,
-        exits=exits,
-        direction="longonly",
-        freq="D",
-        init_cash=1000.0,
-        fees=fee_bps / 1e4,
+    entries.index = exits.index = price_clean.index
+
+    # (stop_type, threshold, exits, sl_stop, sl_trail); first row = baseline
+    scenarios = (
+        [("baseline", np.nan, exits, np.nan, False)]
+        + [("hard", sl, exits, sl, False) for sl in thresholds]
+        + [("trailing", sl, exits, sl, True) for sl in thresholds]
+        + [
+            ("time", float(n), _time_exits(entries, exits, n), np.nan, False)
+            for n in time_bars
+        ]
     )
-    baseline_return = float(pf_baseline.total_return())
-
-    results: list[StopScenarioResult] = []
-
-    # Hard stops
-    for sl_pct in thresholds:
-        pf = simulate_hard_stop(price, entries, exits, sl_pct, fee_bps=fee_bps)
-        results.append(extract_scenario_metrics(pf, "hard", sl_pct, baseline_return))
 
-    # Trailing stops
-    for sl_pct in thresholds:
-        pf = simulate_trailing_stop(price, entries, exits, sl_pct, fee_bps=fee_bps)
-        results.append(
-            extract_scenario_metrics(pf, "trailing", sl_pct, baseline_return)
+    if engine == "native":
+        sim = simulate_signals(
+            price_clean.to_numpy(dtype=float),
+            entries.to_numpy(dtype=bool),
+            np.column_stack([sc[2].to_numpy(dtype=bool) for sc in scenarios]),
+            fees=fee_bps / 1e4,
+            sl_stop=[sc[3] for sc in scenarios],
+            sl_trail=[sc[4] for sc in scenarios],
+            init_cash=1000.0,
+            record_trades=True,
         )
+        portfolios = [
+            NativePortfolio(sim.column(j), price_clean.index)
+            for j in range(len(scenarios))
+        ]
+    else:
+        portfolios = [
+            _run_portfolio(price_clean, entries, ex, fee_bps, engine, sl, trail)
+            for _, _, ex, sl, trail in scenarios
+        ]
 
-    # Time stops
-    for n_bars in time_bars:
-        pf = simulate_time_stop(price, entries, exits, n_bars, fee_bps=fee_bps)
-        results.append(
-            extract_scenario_metrics(pf, "time", float(n_bars), baseline_return)
-        )
+    # Baseline (no stop) for opportunity cost
+    baseline_return = float(portfolios[0].total_return())
+    results: list[StopScenarioResult] = [
+        extract_scenario_metrics(pf, sc[0], sc[1], baseline_return)
+        for sc, pf in zip(scenarios[1:], portfolios[1:])
+    ]
 
     # Build DataFrame
     df = pd.DataFrame(
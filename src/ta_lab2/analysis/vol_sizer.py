@@ -7,9 +7,11 @@ Provides:
 - compute_realized_vol_position: realized-vol (rolling std) position sizing,
   with optional GARCH blend support (Phase 81)
 - run_vol_sized_backtest: vectorbt wrapper with integrated vol-sizing at entry,
-  with optional per-bar GARCH blend support (Phase 81)
+  with optional per-bar GARCH blend support (Phase 81); runs on the native
+  signal engine when vectorbt is not installed
 - worst_n_day_returns: tail-risk characterization (flat dict of worst-N-day means)
-- compute_comparison_metrics: comprehensive flat metrics dict from a vbt.Portfolio
+- compute_comparison_metrics: comprehensive flat metrics dict from a portfolio
+  (vbt.Portfolio or NativePortfolio)
 """
 
 from __future__ import annotations
@@ -35,6 +37,7 @@ from ta_lab2.analysis.performance import (
     sharpe,
     sortino,
 )
+from ta_lab2.analysis.signal_engine import NativePortfolio, simulate_signals
 
 
 # ---------------------------------------------------------------------------
@@ -172,6 +175,8 @@ def run_vol_sized_backtest(
     garch_vol_series: Optional[pd.Series] = None,
     garch_mode: str = "sizing_only",
     garch_blend_weight: float = 1.0,
+    engine: str = "auto",
+    direction: str = "longonly",
 ) -> "vbt.Portfolio":
     """
     Run a vectorbt backtest with vol-sized position at each entry bar.
@@ -181,9 +186,10 @@ def run_vol_sized_backtest(
     price:
         Asset close price series (DatetimeIndex, UTC).
     entries:
-        Boolean Series of entry signals (True = enter long).
+        Boolean Series of entry signals (True = enter; long by default, see
+        ``direction``).
     exits:
-        Boolean Series of exit signals (True = exit long).
+        Boolean Series of exit signals (True = exit; see ``direction``).
     vol_series:
         Volatility measure series aligned to price index.
         If vol_type='atr': dollar ATR (e.g. atr_14 from features).
@@ -210,16 +216,25 @@ def run_vol_sized_backtest(
         ``"sizing_and_limits"``, or ``"advisory"`` (log only, no blend).
     garch_blend_weight:
         Weight on the GARCH estimate in [0.0, 1.0].  Default 1.0.
+    engine:
+        ``"auto"`` (vectorbt if installed, else native), ``"vbt"`` or
+        ``"native"`` (ta_lab2.analysis.signal_engine; identical fills).
+    direction:
+        ``"longonly"`` (default), ``"shortonly"`` or ``"both"``, as in
+        vectorbt's ``from_signals``; passed to either engine.
 
     Returns
     -------
-    vbt.Portfolio
-        Vectorbt portfolio object.
+    vbt.Portfolio or NativePortfolio
+        Portfolio object.
     """
-    if vbt is None:
+    if engine == "auto":
+        engine = "native" if vbt is None else "vbt"
+    if engine not in ("vbt", "native"):
+        raise ValueError(f"engine must be 'auto', 'vbt' or 'native', got {engine!r}")
+    if engine == "vbt" and vbt is None:
         raise ImportError(
-            "vectorbt is required for run_vol_sized_backtest; "
-            "please `pip install vectorbt`."
+            "vectorbt is required for engine='vbt'; please `pip install vectorbt`."
         )
 
     # Compute vol percentage
@@ -273,7 +288,7 @@ def run_vol_sized_backtest(
         entries=entries.to_numpy().astype(bool),
         exits=exits.to_numpy().astype(bool),
         size=size_array,
-        direction="longonly",
+        direction=direction,
         freq="D",
         init_cash=init_cash,
         fees=fee_bps / 1e4,
@@ -281,6 +296,13 @@ def run_vol_sized_backtest(
     if sl_stop is not None:
         pf_kwargs["sl_stop"] = sl_stop
 
+    if engine == "native":
+        pf_kwargs.pop("freq")
+        sim = simulate_signals(
+            price_no_tz.to_numpy(dtype=float), **pf_kwargs, record_trades=True
+        )
+        return NativePortfolio(sim, price_no_tz.index)
+
     return vbt.Portfolio.from_signals(price_no_tz, **pf_kwargs)
 
 
@@ -352,12 +374,12 @@ def compute_comparison_metrics(
     returns_series: Optional[pd.Series] = None,
 ) -> Dict[str, float]:
     """
-    Extract a flat comparison metrics dict from a vectorbt Portfolio.
+    Extract a flat comparison metrics dict from a vectorbt-style Portfolio.
 
     Parameters
     ----------
     portfolio:
-        A vbt.Portfolio object from run_vol_sized_backtest or similar.
+        A vbt.Portfolio or NativePortfolio from run_vol_sized_backtest or similar.
     returns_series:
         Optional override for portfolio returns (defaults to portfolio.returns()).
 
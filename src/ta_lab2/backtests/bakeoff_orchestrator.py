@@ -16,6 +16,7 @@ Exports
 -------
 BakeoffConfig           - Configuration dataclass for a bake-off run
 StrategyResult          - Per-strategy result (aggregated across folds)
+SignalCache             - Per-asset memo of signal_fn outputs shared by folds/costs
 BakeoffOrchestrator     - Main orchestrator class with .run() entry point
 cost_scenario_label     - Convert CostModel to descriptive label string
 build_t1_series         - Build label-end (t1) Series for CV splitters
@@ -27,6 +28,8 @@ load_universal_ic_weights   - Universal IC-IR weights from feature_selection.yam
 load_per_asset_ic_weights   - Per-asset IC-IR weight matrix from ic_results
 run_purged_kfold_backtest - Run one strategy through purged K-fold CV
 run_cpcv_backtest       - Run one strategy through CPCV for PBO analysis
+run_purged_kfold_backtest_batch - Purged K-fold for a whole param grid, one portfolio per fold
+run_cpcv_backtest_batch - CPCV for a whole param grid, one portfolio per fold
 
 BakeoffOrchestrator.run() parameters (Phase 82 additions)
 ---------------------------------------------------------
@@ -56,12 +59,14 @@ data_loader_kwargs : dict, optional
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import math
 import multiprocessing
 import os
 import warnings
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
@@ -79,6 +84,7 @@ from ta_lab2.backtests.costs import (  # noqa: F401 -- re-exported for callers
 )
 from ta_lab2.backtests.cv import CPCVSplitter, PurgedKFoldSplitter
 from ta_lab2.backtests.psr import compute_dsr, compute_psr
+from ta_lab2.backtests.signal_engine import simulate_batch, stack_signals
 
 try:
     import vectorbt as vbt
@@ -120,6 +126,10 @@ class BakeoffConfig:
     # CPCV control: 0=run all, -1=skip CPCV, N=top N params by PKF sharpe
     cpcv_top_n: int = 0
 
+    # Evaluate all pending params of a strategy in one multi-column portfolio
+    # per (fold, cost) instead of one portfolio per param set
+    batch_params: bool = False
+
     def get_cost_matrix(self) -> List[CostModel]:
         if self.spot_only:
             return [c for c in self.cost_matrix if c.funding_bps_day == 0.0]
@@ -223,6 +233,9 @@ def _bakeoff_asset_worker(task: BakeoffAssetTask) -> List[Dict[str, Any]]:
 
         t1_series = build_t1_series(df.index, holding_bars=1)
         all_results: List[StrategyResult] = []
+        # One signal per (strategy, params) for this asset, reused by every
+        # cost scenario and fold (PKF and CPCV)
+        signal_cache = SignalCache()
 
         # Inject per-asset weighted strategy variant if weights provided
         strategies = dict(task.strategies)
@@ -242,6 +255,19 @@ def _bakeoff_asset_worker(task: BakeoffAssetTask) -> List[Dict[str, Any]]:
             )
 
             pkf_collected: list = []
+            pkf_batch: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            if config.batch_params:
+                pkf_batch = _batch_cv_results(
+                    df,
+                    signal_fn,
+                    [(p, c) for p in param_grid for c in config.get_cost_matrix()],
+                    t1_series,
+                    config,
+                    signal_cache,
+                    "purged_kfold",
+                    strategy_name=strategy_name,
+                    existing_keys=task.existing_keys,
+                )
             for params in param_grid:
                 for cost in config.get_cost_matrix():
                     scenario_label = cost_scenario_label(cost)
@@ -253,13 +279,21 @@ def _bakeoff_asset_worker(task: BakeoffAssetTask) -> List[Dict[str, Any]]:
                         scenario_label,
                         "purged_kfold",
                     )
-                    if task.existing_keys and pkf_key in task.existing_keys:
+                    if _skip_existing(pkf_key, task.existing_keys, config):
                         continue
 
                     try:
-                        pkf_result = run_purged_kfold_backtest(
-                            df, signal_fn, params, t1_series, cost, config
-                        )
+                        pkf_result = pkf_batch.get((params_json, scenario_label))
+                        if pkf_result is None:
+                            pkf_result = run_purged_kfold_backtest(
+                                df,
+                                signal_fn,
+                                params,
+                                t1_series,
+                                cost,
+                                config,
+                                signal_cache=signal_cache,
+                            )
                     except Exception as e:
                         logger.error(
                             f"  Worker asset_id={task.asset_id}: pkf failed "
@@ -316,6 +350,24 @@ def _bakeoff_asset_worker(task: BakeoffAssetTask) -> List[Dict[str, Any]]:
                 )
                 cpcv_candidates = set(ranked[:cpcv_top_n])
 
+            cpcv_batch: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            if config.batch_params:
+                cpcv_batch = _batch_cv_results(
+                    df,
+                    signal_fn,
+                    [
+                        (p, c)
+                        for p, pj, c, _, _ in pkf_collected
+                        if cpcv_top_n <= 0 or pj in cpcv_candidates
+                    ],
+                    t1_series,
+                    config,
+                    signal_cache,
+                    "cpcv",
+                    strategy_name=strategy_name,
+                    existing_keys=task.existing_keys,
+                )
+
             for params, params_json, cost, scenario_label, _ in pkf_collected:
                 if cpcv_top_n > 0 and params_json not in cpcv_candidates:
                     continue
@@ -326,13 +378,21 @@ def _bakeoff_asset_worker(task: BakeoffAssetTask) -> List[Dict[str, Any]]:
                     scenario_label,
                     "cpcv",
                 )
-                if task.existing_keys and cpcv_key in task.existing_keys:
+                if _skip_existing(cpcv_key, task.existing_keys, config):
                     continue
 
                 try:
-                    cpcv_result = run_cpcv_backtest(
-                        df, signal_fn, params, t1_series, cost, config
-                    )
+                    cpcv_result = cpcv_batch.get((params_json, scenario_label))
+                    if cpcv_result is None:
+                        cpcv_result = run_cpcv_backtest(
+                            df,
+                            signal_fn,
+                            params,
+                            t1_series,
+                            cost,
+                            config,
+                            signal_cache=signal_cache,
+                        )
                 except Exception as e:
                     logger.error(
                         f"  Worker asset_id={task.asset_id}: cpcv failed "
@@ -382,7 +442,10 @@ def _bakeoff_asset_worker(task: BakeoffAssetTask) -> List[Dict[str, Any]]:
                 )
 
         n_results = len(all_results)
-        logger.info(f"Worker asset_id={task.asset_id}: completed {n_results} results")
+        logger.info(
+            f"Worker asset_id={task.asset_id}: completed {n_results} results "
+            f"(signals generated={signal_cache.misses}, reused={signal_cache.hits})"
+        )
         return [
             {
                 "asset_id": sr.asset_id,
@@ -446,6 +509,74 @@ class StrategyResult:
     pbo_prob: float = float("nan")
 
 
+class SignalCache:
+    """Memoize signal_fn outputs across folds, cost scenarios and CV methods.
+
+    Signals depend only on (signal_fn, params, data), yet the bake-off loop
+    runs strategy x params x cost x fold and previously regenerated them on
+    the full frame for every fold. The cache computes each (entries, exits,
+    size) triple once; folds slice it by position.
+
+    Keys are (signal_fn, params JSON, data fingerprint). The fingerprint is
+    a hash of the frame (values + index), computed once per DataFrame object.
+    A failing signal_fn is cached too, so the exception is re-raised to each
+    fold without re-running the function.
+
+    Parameters
+    ----------
+    max_entries : int
+        LRU bound on cached signal sets (each holds up to three len(df) Series).
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._store: OrderedDict[tuple, Any] = OrderedDict()
+        self._df_ref: Optional[pd.DataFrame] = None
+        self._df_fp: str = ""
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """Content hash of df (memoized per DataFrame object)."""
+        if df is not self._df_ref:
+            try:
+                hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+                self._df_fp = hashlib.blake2b(
+                    hashed.tobytes() + ",".join(map(str, df.columns)).encode(),
+                    digest_size=16,
+                ).hexdigest()
+            except TypeError:  # unhashable cell values (lists, dicts)
+                self._df_fp = f"id:{id(df)}"
+            self._df_ref = df
+        return self._df_fp
+
+    def get(
+        self, df: pd.DataFrame, signal_fn: Callable, params: Dict[str, Any]
+    ) -> Tuple[pd.Series, pd.Series, Optional[pd.Series]]:
+        """Return signal_fn(df, **params), generating it at most once."""
+        key = (
+            signal_fn,
+            json.dumps(params, sort_keys=True, default=str),
+            self.fingerprint(df),
+        )
+        if key in self._store:
+            self.hits += 1
+            self._store.move_to_end(key)
+            value = self._store[key]
+        else:
+            self.misses += 1
+            try:
+                value = signal_fn(df, **params)
+            except Exception as e:
+                value = e
+            self._store[key] = value
+            if len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
@@ -1085,33 +1216,31 @@ def _run_single_fold(
     cost: CostModel,
     config: BakeoffConfig,
     fold_idx: int,
+    signal_cache: Optional[SignalCache] = None,
 ) -> Optional[FoldMetric]:
     """
     Execute one fold of walk-forward backtest.
 
     Parameters on train_idx are FIXED (no re-optimization within fold).
     Signal generation is run on FULL df (parameters are fixed), then
-    restricted to test window for evaluation.
+    restricted to test window for evaluation. With signal_cache, the full-df
+    signals are generated once and shared by every fold and cost scenario.
     """
-    if vbt is None:
-        raise ImportError("vectorbt is required; pip install vectorbt")
-
     if len(test_idx) < 10:
         logger.warning(f"Fold {fold_idx}: test set too small ({len(test_idx)} bars)")
         return None
 
     # Generate signals on full df (fixed params, no leakage in label generation)
     try:
-        entries, exits, size = signal_fn(df, **params)
+        if signal_cache is not None:
+            entries, exits, size = signal_cache.get(df, signal_fn, params)
+        else:
+            entries, exits, size = signal_fn(df, **params)
     except Exception as e:
         logger.warning(f"Fold {fold_idx}: signal_fn failed: {e}")
         return None
 
     # Restrict to test window for evaluation
-    test_index = df.index[test_idx]
-    test_start = test_index[0]
-    test_end = test_index[-1]
-
     d_test = df.iloc[test_idx]
     e_in = entries.iloc[test_idx].astype(bool)
     e_out = exits.iloc[test_idx].astype(bool)
@@ -1126,21 +1255,66 @@ def _run_single_fold(
     e_out = e_out.shift(1, fill_value=False).astype(np.bool_)
 
     try:
-        pf = vbt.Portfolio.from_signals(
-            d_test[config.price_col],
-            entries=e_in.to_numpy(),
-            exits=e_out.to_numpy(),
-            size=None if sz is None else sz.to_numpy(),
-            **cost.to_vbt_kwargs(),
-            init_cash=1_000.0,
-            freq="D",
-        )
+        if vbt is None:
+            # Native engine: identical fills, no vectorbt install needed
+            sim = simulate_batch(
+                d_test[config.price_col],
+                e_in.to_numpy()[:, None],
+                e_out.to_numpy()[:, None],
+                None if sz is None else sz.to_numpy()[:, None],
+                cost,
+            )
+            equity = pd.Series(sim.value[:, 0], index=d_test.index)
+            ret_series = pd.Series(sim.returns[:, 0], index=d_test.index)
+            trade_count = int(sim.trade_count[0])
+        else:
+            pf = vbt.Portfolio.from_signals(
+                d_test[config.price_col],
+                entries=e_in.to_numpy(),
+                exits=e_out.to_numpy(),
+                size=None if sz is None else sz.to_numpy(),
+                **cost.to_vbt_kwargs(),
+                init_cash=1_000.0,
+                freq="D",
+            )
+            equity, ret_series = pf.value(), pf.returns()
+            trade_count = int(pf.trades.count())
     except Exception as e:
-        logger.warning(f"Fold {fold_idx}: vectorbt failed: {e}")
+        logger.warning(f"Fold {fold_idx}: portfolio simulation failed: {e}")
         return None
 
-    equity = pf.value()
-    ret_series = pf.returns()
+    return _fold_metric(
+        df,
+        train_idx,
+        test_idx,
+        fold_idx,
+        equity,
+        ret_series,
+        e_in,
+        e_out,
+        trade_count,
+        cost,
+        config,
+    )
+
+
+def _fold_metric(
+    df: pd.DataFrame,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    fold_idx: int,
+    equity: pd.Series,
+    ret_series: pd.Series,
+    e_in: pd.Series,
+    e_out: pd.Series,
+    trade_count: int,
+    cost: CostModel,
+    config: BakeoffConfig,
+) -> Optional[FoldMetric]:
+    """FoldMetric from one test-window equity curve (shared by single/batch)."""
+    test_index = df.index[test_idx]
+    test_start = test_index[0]
+    test_end = test_index[-1]
     oos_returns = ret_series.tolist()
 
     # Deduct perps funding costs post-hoc (CostModel.to_vbt_kwargs doesn't pass funding)
@@ -1177,8 +1351,6 @@ def _run_single_fold(
         float(np.sqrt(config.freq_per_year) * ret_np.mean() / std) if std > 0 else 0.0
     )
 
-    trade_count = int(pf.trades.count())
-
     return FoldMetric(
         fold_idx=fold_idx,
         train_start=str(df.index[train_idx[0]].date()) if len(train_idx) > 0 else "",
@@ -1194,6 +1366,228 @@ def _run_single_fold(
     )
 
 
+def _run_batch_fold(
+    df: pd.DataFrame,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    signals: List[Tuple[pd.Series, pd.Series, Optional[pd.Series]]],
+    cost: CostModel,
+    config: BakeoffConfig,
+    fold_idx: int,
+) -> List[Optional[FoldMetric]]:
+    """
+    Execute one fold for many param sets with a single multi-column portfolio.
+
+    Column j of the portfolio is signals[j]; the returned list is aligned with
+    signals and each entry equals what _run_single_fold returns for that
+    param set (same engine: vectorbt when installed, else native).
+    """
+    if not signals:
+        return []
+    if len(test_idx) < 10:
+        logger.warning(f"Fold {fold_idx}: test set too small ({len(test_idx)} bars)")
+        return [None] * len(signals)
+
+    d_test = df.iloc[test_idx]
+    e_in, e_out, sz = stack_signals(signals, test_idx, shift=1)
+    try:
+        sim = simulate_batch(
+            d_test[config.price_col],
+            e_in,
+            e_out,
+            sz,
+            cost,
+            engine="numba" if vbt is None else "vbt",
+        )
+    except Exception as e:
+        logger.warning(f"Fold {fold_idx}: batch portfolio failed: {e}")
+        return [None] * len(signals)
+
+    return [
+        _fold_metric(
+            df,
+            train_idx,
+            test_idx,
+            fold_idx,
+            pd.Series(sim.value[:, j], index=d_test.index),
+            pd.Series(sim.returns[:, j], index=d_test.index),
+            pd.Series(e_in[:, j], index=d_test.index),
+            pd.Series(e_out[:, j], index=d_test.index),
+            int(sim.trade_count[j]),
+            cost,
+            config,
+        )
+        for j in range(len(signals))
+    ]
+
+
+def _run_folds_batch(
+    df: pd.DataFrame,
+    splits: Any,
+    signal_fn: Callable,
+    param_grid: Sequence[Dict[str, Any]],
+    cost: CostModel,
+    config: BakeoffConfig,
+    signal_cache: Optional[SignalCache],
+) -> List[List[FoldMetric]]:
+    """Per-param fold metric lists for every (train_idx, test_idx) split."""
+    signals: List[Tuple[pd.Series, pd.Series, Optional[pd.Series]]] = []
+    valid: List[int] = []
+    for k, params in enumerate(param_grid):
+        try:
+            if signal_cache is not None:
+                signals.append(signal_cache.get(df, signal_fn, params))
+            else:
+                signals.append(signal_fn(df, **params))
+            valid.append(k)
+        except Exception as e:
+            logger.warning(f"signal_fn failed for params={params}: {e}")
+
+    per_param: List[List[FoldMetric]] = [[] for _ in param_grid]
+    for fold_idx, (train_idx, test_idx) in enumerate(splits):
+        fms = _run_batch_fold(df, train_idx, test_idx, signals, cost, config, fold_idx)
+        for k, fm in zip(valid, fms):
+            if fm is not None:
+                per_param[k].append(fm)
+    return per_param
+
+
+def run_purged_kfold_backtest_batch(
+    df: pd.DataFrame,
+    signal_fn: Callable,
+    param_grid: Sequence[Dict[str, Any]],
+    t1_series: pd.Series,
+    cost: CostModel,
+    config: BakeoffConfig,
+    signal_cache: Optional[SignalCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Purged K-fold CV for every param set of a grid at once.
+
+    Each fold runs one portfolio whose columns are the param sets, instead of
+    one portfolio per param set, on the same engine as
+    run_purged_kfold_backtest (vectorbt when installed, else native).
+
+    Returns
+    -------
+    list of dict
+        One result per entry of param_grid, in order, in the same format as
+        run_purged_kfold_backtest.
+    """
+    embargo_frac = config.embargo_bars / len(df) if len(df) > 0 else 0.01
+    splitter = PurgedKFoldSplitter(
+        n_splits=config.n_folds,
+        t1_series=t1_series,
+        embargo_frac=embargo_frac,
+    )
+    per_param = _run_folds_batch(
+        df,
+        splitter.split(np.arange(len(df))),
+        signal_fn,
+        param_grid,
+        cost,
+        config,
+        signal_cache,
+    )
+    return [
+        _aggregate_fold_metrics(fms, config.n_folds, config.embargo_bars)
+        for fms in per_param
+    ]
+
+
+def run_cpcv_backtest_batch(
+    df: pd.DataFrame,
+    signal_fn: Callable,
+    param_grid: Sequence[Dict[str, Any]],
+    t1_series: pd.Series,
+    cost: CostModel,
+    config: BakeoffConfig,
+    signal_cache: Optional[SignalCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    CPCV for every param set of a grid at once (see run_purged_kfold_backtest_batch).
+
+    Returns one run_cpcv_backtest-format dict (including pbo_prob) per param set.
+    """
+    embargo_frac = config.embargo_bars / len(df) if len(df) > 0 else 0.01
+    splitter = CPCVSplitter(
+        n_splits=config.n_folds,
+        n_test_splits=config.cpcv_n_test_splits,
+        t1_series=t1_series,
+        embargo_frac=embargo_frac,
+    )
+    n_combos = splitter.get_n_splits()
+    per_param = _run_folds_batch(
+        df,
+        splitter.split(np.arange(len(df))),
+        signal_fn,
+        param_grid,
+        cost,
+        config,
+        signal_cache,
+    )
+    results = []
+    for fms in per_param:
+        result = _aggregate_fold_metrics(fms, n_combos, config.embargo_bars)
+        result["pbo_prob"] = _pbo_estimate(fms)
+        results.append(result)
+    return results
+
+
+def _skip_existing(key: Tuple[str, str, str, str], existing_keys: set, config) -> bool:
+    """True when ``key`` is already persisted and the run must not overwrite it."""
+    return not config.overwrite and key in existing_keys
+
+
+def _batch_cv_results(
+    df: pd.DataFrame,
+    signal_fn: Callable,
+    jobs: Sequence[Tuple[Dict[str, Any], CostModel]],
+    t1_series: pd.Series,
+    config: BakeoffConfig,
+    signal_cache: Optional[SignalCache],
+    cv_method: str,
+    *,
+    strategy_name: str = "",
+    existing_keys: Optional[set] = None,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Precompute CV results for (params, cost) jobs, batching params per cost.
+
+    Jobs whose (strategy_name, params, cost, cv_method) key is in
+    ``existing_keys`` are skipped unless ``config.overwrite`` is set.
+
+    Returns {(params_json, scenario_label): result}. Costs whose batch fails
+    are left out so callers fall back to the per-param path.
+    """
+    run_batch = (
+        run_purged_kfold_backtest_batch
+        if cv_method == "purged_kfold"
+        else run_cpcv_backtest_batch
+    )
+    existing_keys = existing_keys or set()
+    by_cost: Dict[str, Tuple[CostModel, List[Dict[str, Any]]]] = {}
+    for params, cost in jobs:
+        label = cost_scenario_label(cost)
+        key = (strategy_name, json.dumps(params, sort_keys=True), label, cv_method)
+        if _skip_existing(key, existing_keys, config):
+            continue
+        by_cost.setdefault(label, (cost, []))[1].append(params)
+
+    out: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for label, (cost, params_list) in by_cost.items():
+        try:
+            results = run_batch(
+                df, signal_fn, params_list, t1_series, cost, config, signal_cache
+            )
+        except Exception as e:
+            logger.error(f"  batched {cv_method} failed for {label}: {e}")
+            continue
+        for params, result in zip(params_list, results):
+            out[(json.dumps(params, sort_keys=True), label)] = result
+    return out
+
+
 def run_purged_kfold_backtest(
     df: pd.DataFrame,
     signal_fn: Callable,
@@ -1201,6 +1595,7 @@ def run_purged_kfold_backtest(
     t1_series: pd.Series,
     cost: CostModel,
     config: BakeoffConfig,
+    signal_cache: Optional[SignalCache] = None,
 ) -> Dict[str, Any]:
     """
     Run one strategy through purged K-fold CV.
@@ -1219,6 +1614,10 @@ def run_purged_kfold_backtest(
         Cost scenario to apply.
     config : BakeoffConfig
         Run configuration.
+    signal_cache : SignalCache, optional
+        Shared signal memo (e.g. one per asset across params x costs). When
+        omitted, a cache local to this call still generates signals only once
+        across its folds.
 
     Returns
     -------
@@ -1233,12 +1632,22 @@ def run_purged_kfold_backtest(
         embargo_frac=embargo_frac,
     )
 
+    if signal_cache is None:
+        signal_cache = SignalCache(max_entries=1)
     fold_metrics: List[FoldMetric] = []
     X_dummy = np.arange(len(df))
 
     for fold_idx, (train_idx, test_idx) in enumerate(splitter.split(X_dummy)):
         fm = _run_single_fold(
-            df, train_idx, test_idx, signal_fn, params, cost, config, fold_idx
+            df,
+            train_idx,
+            test_idx,
+            signal_fn,
+            params,
+            cost,
+            config,
+            fold_idx,
+            signal_cache=signal_cache,
         )
         if fm is not None:
             fold_metrics.append(fm)
@@ -1253,12 +1662,13 @@ def run_cpcv_backtest(
     t1_series: pd.Series,
     cost: CostModel,
     config: BakeoffConfig,
+    signal_cache: Optional[SignalCache] = None,
 ) -> Dict[str, Any]:
     """
     Run one strategy through CPCV (C(n_folds, 2) combinations) for PBO analysis.
 
-    Parameters match run_purged_kfold_backtest. Returns same dict format
-    plus pbo_prob (Probability of Backtest Overfitting estimate).
+    Parameters (including signal_cache) match run_purged_kfold_backtest.
+    Returns same dict format plus pbo_prob (Probability of Backtest Overfitting estimate).
     """
     embargo_frac = config.embargo_bars / len(df) if len(df) > 0 else 0.01
     splitter = CPCVSplitter(
@@ -1268,6 +1678,8 @@ def run_cpcv_backtest(
         embargo_frac=embargo_frac,
     )
 
+    if signal_cache is None:
+        signal_cache = SignalCache(max_entries=1)
     fold_metrics: List[FoldMetric] = []
     X_dummy = np.arange(len(df))
 
@@ -1276,24 +1688,35 @@ def run_cpcv_backtest(
 
     for fold_idx, (train_idx, test_idx) in enumerate(splitter.split(X_dummy)):
         fm = _run_single_fold(
-            df, train_idx, test_idx, signal_fn, params, cost, config, fold_idx
+            df,
+            train_idx,
+            test_idx,
+            signal_fn,
+            params,
+            cost,
+            config,
+            fold_idx,
+            signal_cache=signal_cache,
         )
         if fm is not None:
             fold_metrics.append(fm)
 
     result = _aggregate_fold_metrics(fold_metrics, n_combos, config.embargo_bars)
+    result["pbo_prob"] = _pbo_estimate(fold_metrics)
+    return result
+
 
-    # PBO estimate: fraction of CPCV combinations where strategy underperforms
-    # the median (simple approximation without full path-matrix construction)
+def _pbo_estimate(fold_metrics: List[FoldMetric]) -> float:
+    """
+    PBO estimate: fraction of CPCV combinations where strategy underperforms
+    the median (simple approximation without full path-matrix construction).
+    """
     all_sharpes = [fm.sharpe for fm in fold_metrics]
     if len(all_sharpes) >= 2:
         median_sharpe = float(np.median(all_sharpes))
         n_below = sum(1 for s in all_sharpes if s < median_sharpe)
-        result["pbo_prob"] = n_below / len(all_sharpes)
-    else:
-        result["pbo_prob"] = float("nan")
-
-    return result
+        return n_below / len(all_sharpes)
+    return float("nan")
 
 
 def _aggregate_fold_metrics(
@@ -1485,6 +1908,7 @@ class BakeoffOrchestrator:
                 continue
 
             t1_series = build_t1_series(df.index, holding_bars=1)
+            signal_cache = SignalCache()
 
             # Batch-load existing keys for dedup (1 query per asset vs N per tuple)
             existing_keys: set = set()
@@ -1499,6 +1923,23 @@ class BakeoffOrchestrator:
 
                 # --- Phase 1: Run all PKF backtests ---
                 pkf_collected: list = []
+                pkf_batch: Dict[Tuple[str, str], Dict[str, Any]] = {}
+                if self.config.batch_params:
+                    pkf_batch = _batch_cv_results(
+                        df,
+                        signal_fn,
+                        [
+                            (p, c)
+                            for p in param_grid
+                            for c in self.config.get_cost_matrix()
+                        ],
+                        t1_series,
+                        self.config,
+                        signal_cache,
+                        "purged_kfold",
+                        strategy_name=strategy_name,
+                        existing_keys=existing_keys,
+                    )
                 for params in param_grid:
                     for cost in self.config.get_cost_matrix():
                         scenario_label = cost_scenario_label(cost)
@@ -1511,7 +1952,7 @@ class BakeoffOrchestrator:
                             scenario_label,
                             "purged_kfold",
                         )
-                        if existing_keys and pkf_key in existing_keys:
+                        if _skip_existing(pkf_key, existing_keys, self.config):
                             logger.debug(
                                 f"  Skipping {strategy_name}/{scenario_label}/purged_kfold (exists)"
                             )
@@ -1522,9 +1963,17 @@ class BakeoffOrchestrator:
                             f"  purged_kfold: {strategy_name} / {scenario_label}"
                         )
                         try:
-                            pkf_result = run_purged_kfold_backtest(
-                                df, signal_fn, params, t1_series, cost, self.config
-                            )
+                            pkf_result = pkf_batch.get((params_json, scenario_label))
+                            if pkf_result is None:
+                                pkf_result = run_purged_kfold_backtest(
+                                    df,
+                                    signal_fn,
+                                    params,
+                                    t1_series,
+                                    cost,
+                                    self.config,
+                                    signal_cache=signal_cache,
+                                )
                         except Exception as e:
                             logger.error(
                                 f"  purged_kfold failed for {strategy_name}/{scenario_label}: {e}"
@@ -1588,6 +2037,24 @@ class BakeoffOrchestrator:
                         f"{len(cpcv_candidates)}/{len(param_sharpes)} param sets"
                     )
 
+                cpcv_batch: Dict[Tuple[str, str], Dict[str, Any]] = {}
+                if self.config.batch_params:
+                    cpcv_batch = _batch_cv_results(
+                        df,
+                        signal_fn,
+                        [
+                            (p, c)
+                            for p, pj, c, _, _ in pkf_collected
+                            if cpcv_top_n <= 0 or pj in cpcv_candidates
+                        ],
+                        t1_series,
+                        self.config,
+                        signal_cache,
+                        "cpcv",
+                        strategy_name=strategy_name,
+                        existing_keys=existing_keys,
+                    )
+
                 for params, params_json, cost, scenario_label, _ in pkf_collected:
                     # Filter to top-N params when cpcv_top_n > 0
                     if cpcv_top_n > 0 and params_json not in cpcv_candidates:
@@ -1599,7 +2066,7 @@ class BakeoffOrchestrator:
                         scenario_label,
                         "cpcv",
                     )
-                    if existing_keys and cpcv_key in existing_keys:
+                    if _skip_existing(cpcv_key, existing_keys, self.config):
                         logger.debug(
                             f"  Skipping {strategy_name}/{scenario_label}/cpcv (exists)"
                         )
@@ -1607,9 +2074,17 @@ class BakeoffOrchestrator:
 
                     logger.info(f"  cpcv: {strategy_name} / {scenario_label}")
                     try:
-                        cpcv_result = run_cpcv_backtest(
-                            df, signal_fn, params, t1_series, cost, self.config
-                        )
+                        cpcv_result = cpcv_batch.get((params_json, scenario_label))
+                        if cpcv_result is None:
+                            cpcv_result = run_cpcv_backtest(
+                                df,
+                                signal_fn,
+                                params,
+                                t1_series,
+                                cost,
+                                self.config,
+                                signal_cache=signal_cache,
+                            )
                     except Exception as e:
                         logger.error(
                             f"  cpcv failed for {strategy_name}/{scenario_label}: {e}"
@@ -1711,6 +2186,7 @@ class BakeoffOrchestrator:
             "min_bars": self.config.min_bars,
             "overwrite": self.config.overwrite,
             "cpcv_top_n": self.config.cpcv_top_n,
+            "batch_params": self.config.batch_params,
         }
 
         # Pre-load existing keys for all assets (batch, not per-asset)
@@ -105,12 +105,9 @@ def compute_funding_payments(
     if funding_rates.empty:
         return pd.Series(np.zeros(len(pos)), index=pos_index, name="funding_payment")
 
-    rate_index = _strip_tz(funding_rates.index)
-    rates = funding_rates.copy()
-    rates.index = rate_index
-
-    # Align funding rates to position_timeline: forward-fill within bar window
-    aligned_rates = rates.reindex(pos_index, method="ffill")
+    aligned_rates = pd.Series(
+        align_funding_rates(funding_rates, pos_index), index=pos_index
+    )
 
     # Payment = position_value * aligned_funding_rate
     payments = pos * aligned_rates
@@ -128,6 +125,33 @@ def compute_funding_payments(
     return payments
 
 
+def align_funding_rates(funding_rates: pd.Series, index: pd.Index) -> np.ndarray:
+    """
+    Forward-fill settlement funding rates onto a bar index.
+
+    Shared by ``compute_funding_payments`` (post-simulation) and the native
+    signal engine, which charges the aligned rates in-loop
+    (``simulate_signals(funding_rate=...)``).
+
+    Parameters
+    ----------
+    funding_rates:
+        Funding rate at each settlement (index = DatetimeIndex, any tz).
+    index:
+        Bar index to align to (any tz).
+
+    Returns
+    -------
+    np.ndarray
+        Rate per bar (NaN before the first settlement).
+    """
+    if funding_rates.empty:
+        return np.zeros(len(index))
+    rates = funding_rates.copy()
+    rates.index = _strip_tz(funding_rates.index)
+    return rates.reindex(_strip_tz(index), method="ffill").to_numpy(dtype=float)
+
+
 # ---------------------------------------------------------------------------
 # DB access helpers
 # ---------------------------------------------------------------------------
@@ -37,6 +37,7 @@ def run_multi_strategy(
     cost: CostModel,
     price_col: str = "close",
     freq_per_year: int = 365,
+    batched: bool = False,
 ) -> MultiResult:
     """
     Orchestrate backtests for multiple strategies.
@@ -56,6 +57,9 @@ def run_multi_strategy(
         Column used as the price series for vectorbt.
     freq_per_year : int
         Trading periods per year for annualized metrics (365 for daily crypto).
+    batched : bool
+        Evaluate each strategy's whole param grid in one multi-column
+        portfolio per split (see vbt_runner.sweep_grid).
 
     Returns
     -------
@@ -80,6 +84,7 @@ def run_multi_strategy(
             cost=cost,
             price_col=price_col,
             freq_per_year=freq_per_year,
+            batched=batched,
         )
         t = bundle.table.copy()
         t.insert(0, "strategy", strat_name)
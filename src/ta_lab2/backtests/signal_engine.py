@@ -0,0 +1,25 @@
+"""
+Native signal backtest engine, re-exported for the backtests layer.
+
+The engine lives in ta_lab2.analysis.signal_engine so analysis modules
+(vol_sizer, stop_simulator) can use it without importing backtests; the
+walk-forward runners and existing callers keep importing it from here.
+"""
+
+from ta_lab2.analysis.signal_engine import (
+    TRADE_FIELDS,
+    NativePortfolio,
+    SimResult,
+    simulate_batch,
+    simulate_signals,
+    stack_signals,
+)
+
+__all__ = [
+    "TRADE_FIELDS",
+    "NativePortfolio",
+    "SimResult",
+    "simulate_batch",
+    "simulate_signals",
+    "stack_signals",
+]
@@ -2,7 +2,9 @@
 """
 Vectorbt-based runner for fast research & sweeps.
 
-Requires: vectorbt, numpy, pandas
+Requires: numpy, pandas; vectorbt optional.
+Without vectorbt every path runs on the native engine in ``signal_engine``,
+which reproduces vectorbt's from_signals fills.
 """
 
 from __future__ import annotations
@@ -17,6 +19,8 @@ try:
 except ImportError:  # pragma: no cover
     vbt = None  # type: ignore[assignment]
 
+from ta_lab2.backtests.signal_engine import simulate_batch, stack_signals
+
 
 # ---------- Protocols & dataclasses ----------
 
@@ -100,9 +104,40 @@ def _sharpe(returns: pd.Series, rf: float = 0.0, freq_per_year: int = 252) -> fl
     return float(np.sqrt(freq_per_year) * mu / sig)
 
 
+def _metrics_row(
+    split_name: str,
+    equity: pd.Series,
+    ret_series: pd.Series,
+    trades: int,
+    freq_per_year: int,
+) -> ResultRow:
+    """Core metrics for one equity curve; params are filled by the caller."""
+    total_return = float(equity.iloc[-1] / equity.iloc[0] - 1.0)
+    cagr = _cagr(equity, freq_per_year=freq_per_year)
+    mdd = _max_drawdown(equity)
+    return ResultRow(
+        split=split_name,
+        params={},
+        trades=trades,
+        total_return=total_return,
+        cagr=cagr,
+        mdd=mdd,
+        mar=float(cagr / abs(mdd)) if mdd != 0 else 0.0,
+        sharpe=_sharpe(ret_series, rf=0.0, freq_per_year=freq_per_year),
+        equity_last=float(equity.iloc[-1]),
+    )
+
+
 # ---------- core API ----------
 
 
+def _batch_engine(engine: str = "auto") -> str:
+    """Engine for simulate_batch; "auto" matches run_vbt_on_split (vbt if installed)."""
+    if engine == "auto":
+        return "numba" if vbt is None else "vbt"
+    return engine
+
+
 def run_vbt_on_split(
     df: pd.DataFrame,
     entries: pd.Series,
@@ -113,7 +148,7 @@ def run_vbt_on_split(
     price_col: str = "close",
     freq_per_year: int = 365,  # BTC daily; change for intraday
 ) -> ResultRow:
-    """Run vectorbt on a single time split and compute core metrics."""
+    """Run vectorbt (or the native engine) on one time split; compute core metrics."""
     # Slice window
     d = df.loc[split.start : split.end]
 
@@ -131,6 +166,22 @@ def run_vbt_on_split(
     if size is not None:
         sz = size.loc[split.start : split.end].astype(float)
 
+    if vbt is None:
+        sim = simulate_batch(
+            d[price_col],
+            e_in.to_numpy()[:, None],
+            e_out.to_numpy()[:, None],
+            None if sz is None else sz.to_numpy()[:, None],
+            cost,
+        )
+        return _metrics_row(
+            split.name,
+            pd.Series(sim.value[:, 0], index=d.index),
+            pd.Series(sim.returns[:, 0], index=d.index),
+            int(sim.trade_count[0]),
+            freq_per_year,
+        )
+
     # Build portfolio (pass NumPy arrays to avoid pandas dtype warnings)
     pf = vbt.Portfolio.from_signals(
         d[price_col],
@@ -142,28 +193,50 @@ def run_vbt_on_split(
         freq="D",
     )
 
-    equity = pf.value()
-    ret_series = pf.returns()
-    trades = int(pf.trades.count())
-    total_return = float(equity.iloc[-1] / equity.iloc[0] - 1.0)
-    cagr = _cagr(equity, freq_per_year=freq_per_year)
-    mdd = _max_drawdown(equity)
-    mar = float(cagr / abs(mdd)) if mdd != 0 else 0.0
-    sharpe = _sharpe(ret_series, rf=0.0, freq_per_year=freq_per_year)
-    equity_last = float(equity.iloc[-1])  # explicit last equity
+    return _metrics_row(
+        split.name,
+        pf.value(),
+        pf.returns(),
+        int(pf.trades.count()),
+        freq_per_year,
+    )
 
-    return ResultRow(
-        split=split.name,
-        params={},  # filled by caller in sweep
-        trades=trades,
-        total_return=total_return,
-        cagr=cagr,
-        mdd=mdd,
-        mar=mar,
-        sharpe=sharpe,
-        equity_last=equity_last,
+
+def run_batch_on_split(
+    df: pd.DataFrame,
+    signals: List[Tuple[pd.Series, pd.Series, Optional[pd.Series]]],
+    cost: CostModel,
+    split: Split,
+    price_col: str = "close",
+    freq_per_year: int = 365,
+    engine: str = "auto",
+) -> List[ResultRow]:
+    """
+    Evaluate many signal sets on one split with a single multi-column portfolio.
+
+    Each (entries, exits, size) triple becomes one column; signals must share
+    ``df``'s index.  Returns one ResultRow per triple, identical to calling
+    ``run_vbt_on_split`` on each in turn: ``engine="auto"`` picks the same
+    engine it does (vectorbt when installed, else the native engine).
+    """
+    rows = df.index.slice_indexer(split.start, split.end)
+    d = df.iloc[rows]
+    e_in, e_out, sz = stack_signals(signals, rows, shift=1)
+    sim = simulate_batch(
+        d[price_col], e_in, e_out, sz, cost, engine=_batch_engine(engine)
     )
 
+    out: List[ResultRow] = []
+    for j in range(sim.n_columns):
+        equity = pd.Series(sim.value[:, j], index=d.index)
+        ret_series = pd.Series(sim.returns[:, j], index=d.index)
+        out.append(
+            _metrics_row(
+                split.name, equity, ret_series, int(sim.trade_count[j]), freq_per_year
+            )
+        )
+    return out
+
 
 def sweep_grid(
     df: pd.DataFrame,
@@ -173,23 +246,44 @@ def sweep_grid(
     cost: CostModel,
     price_col: str = "close",
     freq_per_year: int = 365,
+    batched: bool = False,
+    engine: str = "auto",
 ) -> ResultBundle:
-    if vbt is None:
-        raise ImportError(
-            "vectorbt is required for ta_lab2.backtests; please `pip install vectorbt` "
-            "to use the backtest runner."
-        )
-    """Run many parameter sets across many splits; return a tidy table."""
+    """
+    Run many parameter sets across many splits; return a tidy table.
+
+    With ``batched=True`` every parameter set's signals are generated once,
+    stacked column-wise and evaluated in one multi-column portfolio per split,
+    on vectorbt when installed and on the native engine otherwise, like the
+    unbatched loop (``engine`` forces "vbt" or "numba").  Rows come back in
+    the same params-major order as the unbatched loop.
+    """
     rows: List[ResultRow] = []
-    for params in param_grid:
-        entries, exits, size = signal_func(df, **params)
-        for split in splits:
-            row = run_vbt_on_split(
-                df, entries, exits, size, cost, split, price_col, freq_per_year
+    if batched:
+        params_list = [dict(p) for p in param_grid]
+        split_list = list(splits)
+        signals = [signal_func(df, **params) for params in params_list]
+        per_split = [
+            run_batch_on_split(
+                df, signals, cost, split, price_col, freq_per_year, engine
             )
-            # attach params for this run
-            row.params = dict(params)
-            rows.append(row)
+            for split in split_list
+        ]
+        for i, params in enumerate(params_list):
+            for split_rows in per_split:
+                row = split_rows[i]
+                row.params = dict(params)
+                rows.append(row)
+    else:
+        for params in param_grid:
+            entries, exits, size = signal_func(df, **params)
+            for split in splits:
+                row = run_vbt_on_split(
+                    df, entries, exits, size, cost, split, price_col, freq_per_year
+                )
+                # attach params for this run
+                row.params = dict(params)
+                rows.append(row)
 
     table = pd.DataFrame(
         [
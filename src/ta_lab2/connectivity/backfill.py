@@ -0,0 +1,556 @@
+# src/ta_lab2/connectivity/backfill.py
+"""
+Concurrent, resumable history backfill over paginated exchange endpoints.
+
+The single-page primitives (``ExchangeInterface.get_historical_klines``, the
+perps ``fetch_*_funding`` functions) each return at most one page -- 1000
+Binance klines, 200 Bybit settlements, 50 Aevo rows. This module turns them
+into a full-history backfill:
+
+- A job's [start, end] range is cut into windows of ``page_limit`` bars, so
+  windows are independent and can be fetched concurrently. A window whose
+  page comes back full while there is room for more rows is continued from
+  the last row (or, for venues that return newest-first, from the oldest row
+  backwards).
+- Requests run on an asyncio loop. Each venue/dataset gets its own token
+  bucket (``integrations.economic.rate_limiter.RateLimiter``) and its own
+  pool of workers, so a slow venue never holds up the others.
+- Fetched rows are buffered and handed to the job's ``write`` callable in
+  bulk (one upsert per ``flush_rows``); writes to the same sink are
+  serialised.
+- A watermark per (venue, dataset, symbol, tf) only advances over the
+  contiguous prefix of windows that have been written, so an interrupted or
+  partly failed run resumes exactly where the gap starts. In the final window
+  it stops at the newest fetched row, so a row that was not yet published
+  when the run ended is fetched by the next one.
+
+HTTP calls stay synchronous (``requests``) and run on a thread pool sized to
+the total number of workers; the event loop does the scheduling, rate
+limiting and bookkeeping.
+
+Usage:
+    from ta_lab2.connectivity.backfill import kline_job, run_backfill, DbWatermarks
+
+    job = kline_job(get_exchange("binance"), "binance", "BTC/USDT", "1h",
+                    start_ms=1_500_000_000_000, write=my_upsert)
+    results = run_backfill([job], DbWatermarks(engine))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+
+import requests
+from sqlalchemy import text
+
+from ta_lab2.integrations.economic.rate_limiter import RateLimiter
+
+from .base import ExchangeInterface
+from .exceptions import APIError, ConnectionError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+# (max_tokens, refill_period seconds) per "venue:dataset" (or plain venue).
+DEFAULT_RATE_LIMITS: dict[str, tuple[int, float]] = {
+    "binance:klines": (20, 1.0),  # klines weigh 2 of 6000/min
+    "binance:funding": (50, 30.0),  # fapi fundingRate: 500 / 5 min
+    "aster:funding": (50, 30.0),  # mirrors Binance Futures
+    "bybit:funding": (10, 1.0),
+    "hyperliquid": (10, 10.0),  # /info costs 20 of 1200 weight/min
+    "dydx:funding": (10, 1.0),
+    "aevo:funding": (5, 1.0),
+    "coinbase:klines": (10, 1.0),
+    "bitfinex:klines": (30, 60.0),  # candles: 30 req/min
+}
+_FALLBACK_RATE_LIMIT = (5, 1.0)
+
+# Maximum rows a single kline request returns, per venue.
+KLINE_PAGE_LIMITS: dict[str, int] = {
+    "binance": 1000,
+    "hyperliquid": 5000,
+    "coinbase": 350,
+    "bitfinex": 10000,
+}
+# Venues whose kline endpoint returns the newest rows of a window first.
+KLINE_NEWEST_FIRST = {"coinbase", "bitfinex"}
+
+INTERVAL_MS: dict[str, int] = {
+    "1m": 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "4h": 4 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "1d": 86_400_000,
+}
+
+
+# ---------------------------------------------------------------------------
+# Jobs and results
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class BackfillJob:
+    """One (venue, dataset, symbol, tf) history to backfill.
+
+    Attributes:
+        venue: Venue name, also the default rate-limit/worker group.
+        dataset: 'klines', 'funding', ...
+        symbol: Symbol as stored (watermark key).
+        tf: Bar or settlement timeframe (watermark key).
+        step_ms: Spacing of consecutive rows.
+        start_ms: Earliest timestamp to fetch (inclusive).
+        end_ms: Latest timestamp to fetch (inclusive).
+        page_limit: Maximum rows one request returns.
+        fetch: ``fetch(lo_ms, hi_ms) -> rows`` -- one request for [lo, hi].
+            Must raise on failure (an empty page means "no data").
+        ts_ms: Row -> timestamp in ms.
+        write: Bulk upsert, ``write(rows) -> n_written``.
+        newest_first: True when a full page holds the newest rows of the
+            requested range, so pagination continues backwards.
+    """
+
+    venue: str
+    dataset: str
+    symbol: str
+    tf: str
+    step_ms: int
+    start_ms: int
+    end_ms: int
+    page_limit: int
+    fetch: Callable[[int, int], list]
+    ts_ms: Callable[[Any], int]
+    write: Callable[[list], int]
+    newest_first: bool = False
+
+    @property
+    def key(self) -> tuple[str, str, str, str]:
+        return (self.venue, self.dataset, self.symbol, self.tf)
+
+    def windows(self, start_ms: int) -> list[tuple[int, int]]:
+        """Inclusive [lo, hi] windows of ``page_limit`` steps from ``start_ms``."""
+        span = self.page_limit * self.step_ms
+        return [
+            (lo, min(lo + span - 1, self.end_ms))
+            for lo in range(start_ms, self.end_ms + 1, span)
+        ]
+
+
+class BackfillResult(NamedTuple):
+    venue: str
+    dataset: str
+    symbol: str
+    tf: str
+    requests: int
+    rows_fetched: int
+    rows_written: int
+    watermark_ms: int | None
+    failed_windows: int
+    error: str | None
+
+
+# ---------------------------------------------------------------------------
+# Watermarks
+# ---------------------------------------------------------------------------
+
+
+class MemoryWatermarks:
+    """In-process watermark store (tests, dry runs)."""
+
+    def __init__(self, initial: dict | None = None):
+        self.values: dict[tuple, int] = dict(initial or {})
+
+    def get(self, key: tuple) -> int | None:
+        return self.values.get(key)
+
+    def set(self, key: tuple, watermark_ms: int) -> None:
+        self.values[key] = watermark_ms
+
+
+_WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    venue           TEXT            NOT NULL,
+    dataset         TEXT            NOT NULL,
+    symbol          TEXT            NOT NULL,
+    tf              TEXT            NOT NULL,
+    watermark_ms    BIGINT          NOT NULL,
+    updated_at      TIMESTAMPTZ     NOT NULL DEFAULT now(),
+    PRIMARY KEY (venue, dataset, symbol, tf)
+)
+"""
+
+
+class DbWatermarks:
+    """Watermarks persisted in ``public.backfill_watermarks``.
+
+    ``watermark_ms`` is the last timestamp up to which every window since the
+    job start has been written; a rerun starts at ``watermark_ms + 1``.
+    """
+
+    def __init__(self, engine, table: str = "public.backfill_watermarks"):
+        self.engine = engine
+        self.table = table
+        with engine.begin() as conn:
+            conn.execute(text(_WATERMARK_DDL.format(table=table)))
+
+    def get(self, key: tuple) -> int | None:
+        venue, dataset, symbol, tf = key
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text(
+                    f"SELECT watermark_ms FROM {self.table} "
+                    "WHERE venue = :v AND dataset = :d AND symbol = :s AND tf = :tf"
+                ),
+                {"v": venue, "d": dataset, "s": symbol, "tf": tf},
+            ).fetchone()
+        return None if row is None else int(row[0])
+
+    def set(self, key: tuple, watermark_ms: int) -> None:
+        venue, dataset, symbol, tf = key
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"""
+                    INSERT INTO {self.table}
+                        (venue, dataset, symbol, tf, watermark_ms, updated_at)
+                    VALUES (:v, :d, :s, :tf, :wm, now())
+                    ON CONFLICT (venue, dataset, symbol, tf) DO UPDATE
+                    SET watermark_ms = EXCLUDED.watermark_ms,
+                        updated_at = EXCLUDED.updated_at
+                    """
+                ),
+                {"v": venue, "d": dataset, "s": symbol, "tf": tf, "wm": watermark_ms},
+            )
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Rate limits, 5xx and connection problems are retried; 4xx are not."""
+    if isinstance(exc, (RateLimitError, ConnectionError)):
+        return True
+    if type(exc) is APIError:  # raised by handle_api_errors for 5xx
+        return True
+    if isinstance(exc, requests.HTTPError):
+        status = exc.response.status_code if exc.response is not None else 0
+        return status == 429 or status >= 500
+    return isinstance(exc, (requests.RequestException, OSError))
+
+
+async def acquire_async(limiter: RateLimiter, tokens: int = 1) -> None:
+    """Non-blocking ``RateLimiter.acquire`` for coroutines."""
+    while not limiter.acquire(tokens, blocking=False):
+        deficit = tokens - limiter.available_tokens
+        await asyncio.sleep(max(deficit, 0.0) / limiter.refill_rate)
+
+
+class _JobState:
+    """Window bookkeeping for one job (lives on the event loop)."""
+
+    def __init__(self, job: BackfillJob, windows: list[tuple[int, int]], wm):
+        self.job = job
+        self.windows = windows
+        self.done: dict[int, list] = {}
+        self.next_idx = 0  # first window not yet moved to ``pending``
+        self.pending: list = []
+        self.pending_hi: int | None = None
+        self.watermark = wm
+        self.requests = 0
+        self.fetched = 0
+        self.written = 0
+        self.failed: list[int] = []
+        self.error: str | None = None
+        self.remaining = len(windows)
+
+
+class BackfillEngine:
+    """Runs backfill jobs concurrently across venues.
+
+    Args:
+        watermarks: Store with ``get(key)`` / ``set(key, ms)``.
+        rate_limits: "venue:dataset" or "venue" -> (max_tokens, refill_period).
+        workers_per_venue: Concurrent requests per venue.
+        flush_rows: Buffered rows per job before a bulk write.
+        max_retries: Retries of a transient failure, with exponential backoff.
+        backoff: First retry delay in seconds.
+    """
+
+    def __init__(
+        self,
+        watermarks,
+        *,
+        rate_limits: dict[str, tuple[int, float]] | None = None,
+        workers_per_venue: int = 4,
+        flush_rows: int = 5000,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        self.watermarks = watermarks
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.workers_per_venue = workers_per_venue
+        self.flush_rows = flush_rows
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._limiters: dict[str, RateLimiter] = {}
+
+    def limiter(self, venue: str, dataset: str) -> RateLimiter:
+        key = f"{venue}:{dataset}"
+        if key not in self.rate_limits:
+            key = venue
+        if key not in self._limiters:
+            max_tokens, period = self.rate_limits.get(key, _FALLBACK_RATE_LIMIT)
+            self._limiters[key] = RateLimiter(max_tokens, period)
+        return self._limiters[key]
+
+    async def run(self, jobs: list[BackfillJob]) -> list[BackfillResult]:
+        loop = asyncio.get_running_loop()
+        venues = sorted({job.venue for job in jobs})
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, self.workers_per_venue * len(venues)),
+            thread_name_prefix="backfill",
+        )
+        sink_locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        async def in_thread(fn, *args):
+            return await loop.run_in_executor(pool, fn, *args)
+
+        states: list[_JobState] = []
+        queues: dict[str, asyncio.Queue] = {v: asyncio.Queue() for v in venues}
+        for job in jobs:
+            wm = await in_thread(self.watermarks.get, job.key)
+            start = job.start_ms if wm is None else max(job.start_ms, wm + 1)
+            state = _JobState(
+                job, job.windows(start) if start <= job.end_ms else [], wm
+            )
+            states.append(state)
+            for idx in range(len(state.windows)):
+                queues[job.venue].put_nowait((state, idx))
+            logger.info(
+                "backfill %s %s %s %s: %d windows from %s",
+                *job.key,
+                len(state.windows),
+                start,
+            )
+
+        async def flush(state: _JobState) -> None:
+            job = state.job
+            rows, hi = state.pending, state.pending_hi
+            state.pending, state.pending_hi = [], None
+            if rows:
+                async with sink_locks[id(job.write)]:
+                    state.written += await in_thread(job.write, rows)
+            if hi is not None:
+                await in_thread(self.watermarks.set, job.key, hi)
+                state.watermark = hi
+
+        async def complete(state: _JobState, idx: int, rows: list | None) -> None:
+            state.remaining -= 1
+            if rows is None:
+                state.failed.append(idx)
+            else:
+                state.done[idx] = rows
+            # move the contiguous prefix of finished windows into ``pending``
+            while state.next_idx in state.done:
+                window_rows = state.done.pop(state.next_idx)
+                state.pending.extend(window_rows)
+                lo, hi = state.windows[state.next_idx]
+                if hi == state.job.end_ms:
+                    # the range end may be ahead of the newest published row:
+                    # stop at the last row fetched so a late one is retried
+                    hi = max(map(state.job.ts_ms, window_rows), default=lo - 1)
+                state.pending_hi = hi
+                state.next_idx += 1
+            if len(state.pending) >= self.flush_rows or (
+                state.remaining == 0 and state.pending_hi is not None
+            ):
+                await flush(state)
+            if state.remaining == 0 and state.done:
+                # windows after a failed one: write them (upserts are
+                # idempotent) but leave the watermark at the gap
+                leftover = [r for i in sorted(state.done) for r in state.done[i]]
+                state.done.clear()
+                async with sink_locks[id(state.job.write)]:
+                    state.written += await in_thread(state.job.write, leftover)
+
+        async def fetch_window(state: _JobState, lo: int, hi: int) -> list:
+            job = state.job
+            limiter = self.limiter(job.venue, job.dataset)
+            rows: dict[int, Any] = {}
+            cur_lo, cur_hi = lo, hi
+            while cur_lo <= cur_hi:
+                for attempt in range(self.max_retries + 1):
+                    await acquire_async(limiter)
+                    state.requests += 1
+                    try:
+                        page = await in_thread(job.fetch, cur_lo, cur_hi)
+                        break
+                    except Exception as exc:
+                        if attempt == self.max_retries or not _is_transient(exc):
+                            raise
+                        logger.warning(
+                            "backfill %s %s %s: %s -- retry %d",
+                            job.venue,
+                            job.dataset,
+                            job.symbol,
+                            exc,
+                            attempt + 1,
+                        )
+                        await asyncio.sleep(self.backoff * 2**attempt)
+                stamps = [(job.ts_ms(r), r) for r in page or []]
+                stamps = [(t, r) for t, r in stamps if cur_lo <= t <= cur_hi]
+                rows.update(stamps)
+                if len(stamps) < job.page_limit:
+                    break
+                # a full page: continue past its last row, unless the next row
+                # (one step further) would already fall outside the window
+                if job.newest_first:
+                    edge = min(t for t, _ in stamps)
+                    if edge - job.step_ms < cur_lo:
+                        break
+                    cur_hi = edge - 1
+                else:
+                    edge = max(t for t, _ in stamps)
+                    if edge + job.step_ms > cur_hi:
+                        break
+                    cur_lo = edge + 1
+            return [rows[t] for t in sorted(rows)]
+
+        async def worker(queue: asyncio.Queue) -> None:
+            while True:
+                try:
+                    state, idx = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                lo, hi = state.windows[idx]
+                try:
+                    rows = await fetch_window(state, lo, hi)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning(
+                        "backfill %s %s %s window %d-%d failed: %s",
+                        state.job.venue,
+                        state.job.dataset,
+                        state.job.symbol,
+                        lo,
+                        hi,
+                        exc,
+                    )
+                    state.error = str(exc)
+                    rows = None
+                else:
+                    state.fetched += len(rows)
+                await complete(state, idx, rows)
+
+        t0 = time.monotonic()
+        try:
+            await asyncio.gather(
+                *(
+                    worker(queues[v])
+                    for v in venues
+                    for _ in range(self.workers_per_venue)
+                )
+            )
+        finally:
+            pool.shutdown(wait=False)
+
+        results = []
+        for s in states:
+            results.append(
+                BackfillResult(
+                    *s.job.key,
+                    requests=s.requests,
+                    rows_fetched=s.fetched,
+                    rows_written=s.written,
+                    watermark_ms=s.watermark,
+                    failed_windows=len(s.failed),
+                    error=s.error,
+                )
+            )
+            logger.info(
+                "backfill %s %s %s %s: requests=%d fetched=%d written=%d failed=%d",
+                *s.job.key,
+                s.requests,
+                s.fetched,
+                s.written,
+                len(s.failed),
+            )
+        logger.info("backfill: %d jobs in %.1fs", len(jobs), time.monotonic() - t0)
+        return results
+
+
+def run_backfill(jobs: list[BackfillJob], watermarks, **kwargs) -> list[BackfillResult]:
+    """Synchronous entry point: ``asyncio.run(BackfillEngine(...).run(jobs))``."""
+    return asyncio.run(BackfillEngine(watermarks, **kwargs).run(jobs))
+
+
+# ---------------------------------------------------------------------------
+# Kline jobs over ExchangeInterface venues
+# ---------------------------------------------------------------------------
+
+
+def kline_job(
+    exchange: ExchangeInterface,
+    venue: str,
+    pair: str,
+    interval: str,
+    start_ms: int,
+    write: Callable[[list], int],
+    end_ms: int | None = None,
+) -> BackfillJob:
+    """Backfill job paging ``exchange.get_historical_klines``.
+
+    Rows are the adapter's ``[ts_s, open, high, low, close, volume]`` lists.
+
+    Args:
+        exchange: Adapter instance (``get_exchange(venue)``).
+        venue: Venue name; must support windowed history (KLINE_PAGE_LIMITS).
+        pair: Pair as the adapter expects it, e.g. 'BTC/USDT'.
+        interval: Bar interval, e.g. '1h'.
+        start_ms: First bar open time to fetch.
+        write: Bulk upsert for the kline rows.
+        end_ms: Last bar open time; default the last closed bar.
+
+    Raises:
+        ValueError: Venue without start/end kline pagination, or unknown interval.
+    """
+    if venue not in KLINE_PAGE_LIMITS:
+        raise ValueError(
+            f"Venue '{venue}' has no windowed kline history endpoint; "
+            f"supported: {sorted(KLINE_PAGE_LIMITS)}"
+        )
+    if interval not in INTERVAL_MS:
+        raise ValueError(f"Interval '{interval}' is not supported for backfill.")
+    step = INTERVAL_MS[interval]
+    if end_ms is None:
+        end_ms = int(time.time() * 1000) // step * step - 1
+
+    def fetch(lo_ms: int, hi_ms: int) -> list:
+        return exchange.get_historical_klines(
+            pair, interval, lo_ms // 1000, hi_ms // 1000
+        )
+
+    return BackfillJob(
+        venue=venue,
+        dataset="klines",
+        symbol=pair,
+        tf=interval,
+        step_ms=step,
+        start_ms=start_ms,
+        end_ms=end_ms,
+        page_limit=KLINE_PAGE_LIMITS[venue],
+        fetch=fetch,
+        ts_ms=lambda row: int(row[0]) * 1000,
+        write=write,
+        newest_first=venue in KLINE_NEWEST_FIRST,
+    )
@@ -0,0 +1,558 @@
+"""
+Binary COPY bulk writer shared by the bar, EMA, AMA, CTF and feature writers.
+
+Streams a DataFrame into Postgres with ``COPY ... FROM STDIN (FORMAT binary)``
+instead of rendering it to CSV text (``df.to_csv`` into a ``StringIO``) or
+sending per-row ``executemany`` parameters.  Every column is first converted
+once to wire-ready NumPy buffers (about the size of the frame's own data,
+with repeated text values stored once), and each chunk of rows is then
+encoded from those buffers into one pre-sized byte array.  Peak memory is
+therefore the converted columns plus a single chunk of wire bytes, rather
+than a full text copy of the frame on top of it.
+
+Rows land in a uniquely named temp staging table whose column types are
+derived from the DataFrame dtypes, then move to the target with one
+``INSERT ... SELECT ... ON CONFLICT`` statement.  Rows repeating a conflict
+key are collapsed first (last row wins for DO UPDATE, first for DO NOTHING),
+as the per-row executemany path it replaces did, since a single INSERT
+cannot update the same target row twice.  Table and column names are
+quoted identifiers (a schema-qualified target is split on "."), so they are
+matched case-sensitively.  Postgres applies the usual
+assignment casts (float8 -> numeric, int8 -> int4, ...) on that INSERT, and
+text columns are cast explicitly when the target column is not a string type.
+``stamp_cols`` (e.g. ingested_at) are set to now() on insert and only on
+updates that change a row, so they track when its content last changed.
+
+Public API
+----------
+CopyStats           dataclass -- rows, bytes and timings of one bulk write
+DEFAULT_CHUNK_ROWS  int       -- rows encoded per COPY chunk
+staging_types       dict      -- Postgres staging type chosen per column
+encode_copy_binary  iterator  -- PGCOPY byte chunks for a DataFrame
+copy_upsert         CopyStats -- staging COPY + INSERT on an open DBAPI connection
+bulk_upsert         CopyStats -- copy_upsert in its own transaction on an Engine
+"""
+
+from __future__ import annotations
+
+import logging
+import struct
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CopyStats",
+    "DEFAULT_CHUNK_ROWS",
+    "staging_types",
+    "encode_copy_binary",
+    "copy_upsert",
+    "bulk_upsert",
+]
+
+# =============================================================================
+# Wire format constants
+# =============================================================================
+
+_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_HEADER = _SIGNATURE + struct.pack("!ii", 0, 0)  # flags, header extension
+_TRAILER = struct.pack("!h", -1)
+
+# Postgres binary timestamps/dates count from 2000-01-01
+_PG_EPOCH_US = 946_684_800_000_000
+_PG_EPOCH_DAYS = 10_957
+
+DEFAULT_CHUNK_ROWS = 50_000
+_READ_SIZE = 1 << 20
+_STAGING_PREFIX = "_bulk_copy_staging"
+
+_STRING_TYPES = ("text", "character", "varchar", "char", "name", "citext")
+
+
+# =============================================================================
+# Stats
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class CopyStats:
+    """
+    Throughput report for one bulk write.
+
+    Attributes:
+        table: Target table the rows were written to.
+        rows: Rows streamed through COPY.
+        bytes: Binary COPY payload size in bytes (header and trailer included).
+        copy_seconds: Wall time spent streaming the COPY.
+        seconds: Wall time of the whole write (staging, COPY and INSERT).
+        affected: Row count reported by the final INSERT (-1 if unknown).
+    """
+
+    table: str
+    rows: int = 0
+    bytes: int = 0
+    copy_seconds: float = 0.0
+    seconds: float = 0.0
+    affected: int = -1
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Rows written per second of total wall time."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def bytes_per_sec(self) -> float:
+        """COPY payload bytes streamed per second of COPY time."""
+        return self.bytes / self.copy_seconds if self.copy_seconds > 0 else 0.0
+
+
+# =============================================================================
+# Column preparation
+# =============================================================================
+
+
+@dataclass
+class _Column:
+    """Column converted once to wire-ready NumPy buffers.
+
+    Fixed-width columns keep a (n, width) uint8 big-endian payload matrix.
+    Text columns are dictionary-encoded: ``codes`` index into the UTF-8 bytes
+    of the distinct values (``flat`` sliced by ``starts``/``lens``), so
+    repeated labels such as tf or indicator names are encoded only once.
+    """
+
+    name: str
+    pg_type: str
+    null: np.ndarray
+    payload: Optional[np.ndarray] = None
+    codes: Optional[np.ndarray] = None
+    flat: Optional[np.ndarray] = None
+    starts: Optional[np.ndarray] = None
+    lens: Optional[np.ndarray] = None
+
+    def lengths(self, lo: int, hi: int) -> np.ndarray:
+        if self.payload is not None:
+            out = np.full(hi - lo, self.payload.shape[1], dtype=np.int64)
+        else:
+            codes = self.codes[lo:hi]
+            if len(self.lens):
+                out = self.lens[np.maximum(codes, 0)].astype(np.int64)
+            else:  # all-NULL column
+                out = np.zeros(hi - lo, dtype=np.int64)
+        out[self.null[lo:hi]] = -1
+        return out
+
+
+def _fixed(name: str, pg_type: str, values: np.ndarray, null: np.ndarray, be: str):
+    arr = np.ascontiguousarray(values, dtype=be)
+    payload = arr.view(np.uint8).reshape(len(arr), arr.dtype.itemsize)
+    return _Column(name, pg_type, np.asarray(null, dtype=bool), payload=payload)
+
+
+def _timestamps(name: str, s: pd.Series) -> _Column:
+    tz = isinstance(s.dtype, pd.DatetimeTZDtype)
+    if tz:
+        s = s.dt.tz_convert("UTC").dt.tz_localize(None)
+    null = s.isna().to_numpy()
+    us = s.to_numpy(dtype="datetime64[us]").view(np.int64) - _PG_EPOCH_US
+    us[null] = 0
+    return _fixed(name, "timestamptz" if tz else "timestamp", us, null, ">i8")
+
+
+def _text(name: str, s: pd.Series) -> _Column:
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    encoded = [str(u).encode("utf-8") for u in uniques]
+    lens = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    starts = np.cumsum(lens) - lens
+    flat = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return _Column(
+        name,
+        "text",
+        codes < 0,
+        codes=codes.astype(np.int64),
+        flat=flat,
+        starts=starts,
+        lens=lens,
+    )
+
+
+def _prepare(name: str, s: pd.Series) -> _Column:
+    """Map one Series onto a Postgres binary type and wire buffers."""
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return _prepare(name, s.astype(object))
+    if isinstance(dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_dtype(dtype):
+        return _timestamps(name, s)
+    if pd.api.types.is_bool_dtype(dtype):
+        null = s.isna().to_numpy()
+        vals = s.to_numpy(dtype=np.uint8, na_value=0)
+        return _fixed(name, "bool", vals, null, "u1")
+    if pd.api.types.is_integer_dtype(dtype):
+        null = s.isna().to_numpy()
+        size = np.dtype(dtype.numpy_dtype if hasattr(dtype, "numpy_dtype") else dtype)
+        if size.kind == "i" and size.itemsize == 2:
+            pg_type, be = "int2", ">i2"
+        elif size.kind == "i" and size.itemsize == 4:
+            pg_type, be = "int4", ">i4"
+        else:
+            pg_type, be = "int8", ">i8"
+        vals = s.to_numpy(dtype=np.int64, na_value=0)
+        return _fixed(name, pg_type, vals, null, be)
+    if pd.api.types.is_float_dtype(dtype):
+        vals = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        null = np.isnan(vals)
+        if np.dtype(getattr(dtype, "numpy_dtype", dtype)).itemsize == 4:
+            return _fixed(name, "float4", vals, null, ">f4")
+        return _fixed(name, "float8", vals, null, ">f8")
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        raise TypeError(f"Column {name!r}: timedelta columns are not supported")
+
+    # object / string columns: infer from the values
+    kind = pd.api.types.infer_dtype(s, skipna=True)
+    if kind in ("datetime", "datetime64"):
+        return _timestamps(name, pd.to_datetime(s, utc=True))
+    if kind == "date":
+        days = pd.to_datetime(s).to_numpy(dtype="datetime64[D]").view(np.int64)
+        null = s.isna().to_numpy()
+        days = np.where(null, 0, days - _PG_EPOCH_DAYS)
+        return _fixed(name, "date", days, null, ">i4")
+    if kind == "boolean":
+        return _prepare(name, s.astype("boolean"))
+    if kind == "integer":
+        return _prepare(name, s.astype("Int64"))
+    if kind in ("floating", "mixed-integer-float", "decimal"):
+        return _prepare(name, pd.to_numeric(s).astype("float64"))
+    return _text(name, s)
+
+
+def _prepare_frame(df: pd.DataFrame) -> list[_Column]:
+    return [_prepare(str(c), df[c]) for c in df.columns]
+
+
+def staging_types(df: pd.DataFrame) -> dict[str, str]:
+    """
+    Postgres type each DataFrame column is encoded as.
+
+    Args:
+        df: Frame that would be written.
+
+    Returns:
+        Mapping of column name -> staging type (int2/int4/int8/float4/float8,
+        bool, text, date, timestamp or timestamptz).
+    """
+    return {c.name: c.pg_type for c in _prepare_frame(df)}
+
+
+# =============================================================================
+# Encoder
+# =============================================================================
+
+
+def _scatter(buf: np.ndarray, pos: np.ndarray, mat: np.ndarray) -> None:
+    if len(pos):
+        buf[pos[:, None] + np.arange(mat.shape[1])] = mat
+
+
+def _encode_chunk(cols: list[_Column], lo: int, hi: int) -> np.ndarray:
+    n = hi - lo
+    lengths = [c.lengths(lo, hi) for c in cols]
+    sizes = np.full(n, 2, dtype=np.int64)
+    for ln in lengths:
+        sizes += 4 + np.maximum(ln, 0)
+    ends = np.cumsum(sizes)
+    buf = np.empty(int(ends[-1]), dtype=np.uint8)
+
+    pos = ends - sizes
+    count = np.full(n, len(cols), dtype=">i2").view(np.uint8).reshape(n, 2)
+    _scatter(buf, pos, count)
+    pos = pos + 2
+    for col, ln in zip(cols, lengths):
+        _scatter(buf, pos, ln.astype(">i4").view(np.uint8).reshape(n, 4))
+        pos += 4
+        valid = ln >= 0
+        if col.payload is not None:
+            _scatter(buf, pos[valid], col.payload[lo:hi][valid])
+        else:
+            codes = col.codes[lo:hi][valid]
+            lens = col.lens[codes]
+            total = int(lens.sum())
+            if total:
+                within = np.arange(total) - np.repeat(np.cumsum(lens) - lens, lens)
+                dst = np.repeat(pos[valid], lens) + within
+                buf[dst] = col.flat[np.repeat(col.starts[codes], lens) + within]
+        pos += np.maximum(ln, 0)
+    return buf
+
+
+def _iter_encoded(cols: list[_Column], n_rows: int, chunk_rows: int) -> Iterator[Any]:
+    yield _HEADER
+    for lo in range(0, n_rows, chunk_rows):
+        yield memoryview(_encode_chunk(cols, lo, min(lo + chunk_rows, n_rows)))
+    yield _TRAILER
+
+
+def encode_copy_binary(
+    df: pd.DataFrame, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[Any]:
+    """
+    Encode a DataFrame as a PGCOPY binary stream, one chunk at a time.
+
+    The first chunk is the file header and the last is the trailer; every
+    chunk in between carries up to ``chunk_rows`` encoded rows.  NaN, NaT,
+    None and pd.NA are written as NULL.
+
+    Args:
+        df: Frame to encode; column order is the COPY column order.
+        chunk_rows: Rows encoded per chunk.
+
+    Returns:
+        Iterator of bytes-like chunks.
+    """
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+    return _iter_encoded(_prepare_frame(df), len(df), chunk_rows)
+
+
+class _ChunkReader:
+    """File-like adapter so psycopg2 ``copy_expert`` can pull encoded chunks."""
+
+    def __init__(self, chunks: Iterator[Any]):
+        self._chunks = chunks
+        self._buf = memoryview(b"")
+        self.nbytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._buf:
+            nxt = next(self._chunks, None)
+            if nxt is None:
+                return b""
+            self._buf = memoryview(nxt).cast("B")
+            self.nbytes += len(self._buf)
+        if size is None or size < 0:
+            size = len(self._buf)
+        out, self._buf = self._buf[:size], self._buf[size:]
+        return bytes(out)
+
+
+# =============================================================================
+# Writers
+# =============================================================================
+
+
+def _quote_ident(name: str) -> str:
+    # minimal identifier quoting; doubles internal quotes
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_table(name: str) -> str:
+    """Quote each part of a (possibly schema-qualified) table name."""
+    return ".".join(_quote_ident(part) for part in name.split("."))
+
+
+def _copy(cur, table: str, columns: Sequence[str], chunks: Iterator[Any]) -> int:
+    """Stream binary chunks into ``table``; returns payload bytes sent."""
+    col_list = ", ".join(_quote_ident(c) for c in columns)
+    sql = f"COPY {table} ({col_list}) FROM STDIN WITH (FORMAT binary)"
+    if hasattr(cur, "copy_expert"):  # psycopg2
+        reader = _ChunkReader(chunks)
+        cur.copy_expert(sql, reader, size=_READ_SIZE)
+        return reader.nbytes
+    nbytes = 0  # psycopg v3
+    with cur.copy(sql) as cp:
+        for chunk in chunks:
+            nbytes += len(chunk)
+            cp.write(chunk)
+    return nbytes
+
+
+def _target_types(cur, target: str) -> dict[str, str]:
+    cur.execute(
+        """
+        SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+        FROM pg_attribute a
+        WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+        """,
+        (target,),
+    )
+    return {name: typ for name, typ in cur.fetchall()}
+
+
+def _select_expr(col: str, staging: str, target: Optional[str]) -> str:
+    col = _quote_ident(col)
+    if staging == "text" and target and not target.startswith(_STRING_TYPES):
+        return f"{col}::{target}"
+    return col
+
+
+def copy_upsert(
+    conn,
+    target: str,
+    df: pd.DataFrame,
+    conflict_cols: Optional[Sequence[str]] = None,
+    *,
+    update_cols: Optional[Sequence[str]] = None,
+    stamp_cols: Sequence[str] = (),
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> CopyStats:
+    """
+    Binary COPY ``df`` into a temp staging table, then INSERT into ``target``.
+
+    Runs inside the caller's transaction and does not commit, so a scoped
+    DELETE issued on the same connection stays atomic with the insert.  The
+    connection must not be in autocommit mode (the staging table is created
+    ``ON COMMIT DROP``).  Each call stages into its own table, so several
+    writes may share one session.
+
+    With ``conflict_cols``, rows repeating a key are dropped before the COPY:
+    the last one is kept for DO UPDATE (Postgres rejects updating one row
+    twice in a statement), the first for DO NOTHING.
+
+    Args:
+        conn: DBAPI connection (psycopg2 or psycopg v3), or a SQLAlchemy
+            pool-proxied connection such as ``Connection.connection``.
+        target: Schema-qualified target table (each part is quoted, so pass
+            names as stored, e.g. "public.my_table").
+        df: Rows to write; every column must exist in ``target``.
+        conflict_cols: ON CONFLICT key.  None writes a plain INSERT.
+        update_cols: Columns refreshed on conflict (default: every non-key
+            column).  An empty list turns the upsert into DO NOTHING.
+        stamp_cols: Columns set to now() on insert and when a conflicting
+            row's update_cols change; rows whose values are unchanged are
+            left alone.  Values for them in ``df`` are ignored.
+        chunk_rows: Rows encoded per COPY chunk.
+
+    Returns:
+        CopyStats for the write.
+    """
+    if df.empty:
+        return CopyStats(table=target, affected=0)
+
+    t0 = time.perf_counter()
+    stamps = [str(c) for c in stamp_cols]
+    df = df.drop(columns=[c for c in df.columns if str(c) in stamps])
+    columns = [str(c) for c in df.columns]
+    if conflict_cols:
+        if update_cols is None:
+            keys = set(conflict_cols)
+            update_cols = [c for c in columns if c not in keys]
+        update_cols = [c for c in update_cols if c not in stamps]
+        keep = "last" if update_cols else "first"
+        df = df.drop_duplicates(subset=list(conflict_cols), keep=keep)
+    prepared = _prepare_frame(df)
+    ddl = ", ".join(f"{_quote_ident(c.name)} {c.pg_type}" for c in prepared)
+    table = _quote_table(target)
+    staging = f"{_STAGING_PREFIX}_{uuid.uuid4().hex[:12]}"
+
+    cur = conn.cursor()
+    try:
+        cur.execute(f"CREATE TEMP TABLE {staging} ({ddl}) ON COMMIT DROP")
+
+        t_copy = time.perf_counter()
+        nbytes = _copy(
+            cur,
+            staging,
+            columns,
+            _iter_encoded(prepared, len(df), chunk_rows),
+        )
+        copy_seconds = time.perf_counter() - t_copy
+
+        types = _target_types(cur, table)
+        col_list = ", ".join(_quote_ident(c) for c in columns + stamps)
+        select = ", ".join(
+            [_select_expr(c.name, c.pg_type, types.get(c.name)) for c in prepared]
+            + ["now()"] * len(stamps)
+        )
+        alias = " AS _t" if stamps else ""
+        sql = f"INSERT INTO {table}{alias} ({col_list}) SELECT {select} FROM {staging}"
+        if conflict_cols:
+            conflict = ", ".join(_quote_ident(c) for c in conflict_cols)
+            if update_cols:
+                upd = [_quote_ident(c) for c in update_cols]
+                set_clause = ", ".join(
+                    [f"{c} = EXCLUDED.{c}" for c in upd]
+                    + [f"{_quote_ident(c)} = now()" for c in stamps]
+                )
+                sql += f" ON CONFLICT ({conflict}) DO UPDATE SET {set_clause}"
+                if stamps:
+                    old = ", ".join(f"_t.{c}" for c in upd)
+                    new = ", ".join(f"EXCLUDED.{c}" for c in upd)
+                    sql += f" WHERE ROW({old}) IS DISTINCT FROM ROW({new})"
+            else:
+                sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+        cur.execute(sql)
+        affected = cur.rowcount
+        cur.execute(f"DROP TABLE {staging}")
+    finally:
+        cur.close()
+
+    stats = CopyStats(
+        table=target,
+        rows=len(df),
+        bytes=nbytes,
+        copy_seconds=copy_seconds,
+        seconds=time.perf_counter() - t0,
+        affected=affected if affected is not None else -1,
+    )
+    logger.debug(
+        "binary COPY -> %s: %d rows, %d bytes, %.3fs (%.0f rows/s)",
+        target,
+        stats.rows,
+        stats.bytes,
+        stats.seconds,
+        stats.rows_per_sec,
+    )
+    return stats
+
+
+def bulk_upsert(
+    engine,
+    target: str,
+    df: pd.DataFrame,
+    conflict_cols: Optional[Sequence[str]] = None,
+    *,
+    update_cols: Optional[Sequence[str]] = None,
+    stamp_cols: Sequence[str] = (),
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> CopyStats:
+    """
+    copy_upsert() on a fresh raw connection, committed as one transaction.
+
+    Args:
+        engine: SQLAlchemy engine.
+        target: Schema-qualified target table.
+        df: Rows to write.
+        conflict_cols: ON CONFLICT key (None for a plain INSERT).
+        update_cols: Columns refreshed on conflict (default: non-key columns).
+        stamp_cols: Columns set to now() on insert and on changing updates.
+        chunk_rows: Rows encoded per COPY chunk.
+
+    Returns:
+        CopyStats for the write.
+    """
+    if df.empty:
+        return CopyStats(table=target, affected=0)
+
+    raw_conn = engine.raw_connection()
+    try:
+        stats = copy_upsert(
+            raw_conn,
+            target,
+            df,
+            conflict_cols,
+            update_cols=update_cols,
+            stamp_cols=stamp_cols,
+            chunk_rows=chunk_rows,
+        )
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+    return stats
@@ -15,6 +15,7 @@ connect           conn -- open a psycopg connection with autocommit=True
 execute           None -- execute a SQL statement
 fetchall          list -- execute and return all rows
 fetchone          row  -- execute and return the first row (or None)
+is_undefined_object bool -- error is a missing table / column (SQLSTATE 42P01 / 42703)
 """
 
 from __future__ import annotations
@@ -119,3 +120,18 @@ def fetchone(
     row = cur.fetchone()
     cur.close()
     return row
+
+
+# undefined_table, undefined_column
+_UNDEFINED_OBJECT_SQLSTATES = frozenset({"42P01", "42703"})
+
+
+def is_undefined_object(exc: BaseException) -> bool:
+    """True if ``exc`` is a missing-table or missing-column error.
+
+    Accepts a driver exception (psycopg ``sqlstate`` / psycopg2 ``pgcode``)
+    or a SQLAlchemy DBAPIError wrapping one (``.orig``).
+    """
+    err = getattr(exc, "orig", None) or exc
+    code = getattr(err, "sqlstate", None) or getattr(err, "pgcode", None)
+    return code in _UNDEFINED_OBJECT_SQLSTATES
@@ -43,7 +43,7 @@ from ta_lab2.executor.signal_reader import (
 from ta_lab2.paper_trading.canonical_order import CanonicalOrder
 from ta_lab2.paper_trading.paper_order_logger import PaperOrderLogger
 from ta_lab2.risk.macro_gate_evaluator import MacroGateEvaluator
-from ta_lab2.risk.risk_engine import RiskEngine
+from ta_lab2.risk.risk_engine import RiskEngine, RiskStateSnapshot
 from ta_lab2.trading.order_manager import FillData, OrderManager
 
 if TYPE_CHECKING:
@@ -477,6 +477,12 @@ class PaperExecutor:
         # Step 3: get latest signal per asset
         latest_per_asset = SignalReader.get_latest_signal_per_asset(signals)
 
+        # One risk-state read per cycle: every order below is gated against
+        # the same snapshot instead of re-reading dim_risk_state per order.
+        # get_snapshot() reloads it if risk state changed through the engine
+        # (e.g. the daily loss check above) or it is older than max age.
+        risk_snapshot = self.risk_engine.get_snapshot()
+
         with self.engine.connect() as conn:
             for asset_id, signal in latest_per_asset.items():
                 result = self._process_asset_signal(
@@ -485,6 +491,7 @@ class PaperExecutor:
                     signal=signal,
                     config=config,
                     dry_run=dry_run,
+                    risk_snapshot=risk_snapshot,
                 )
                 if result.get("skipped_no_delta") or result.get("skipped_meta_filter"):
                     counts["skipped_no_delta"] += 1
@@ -550,10 +557,14 @@ class PaperExecutor:
         signal: dict,
         config: ExecutorConfig,
         dry_run: bool,
+        risk_snapshot: Optional[RiskStateSnapshot] = None,
     ) -> dict:
         """
         Signal -> CanonicalOrder -> paper_orders -> orders -> fill -> position.
 
+        ``risk_snapshot`` (from RiskEngine.get_snapshot()) is passed to the
+        risk gate; None makes check_order() read live state.
+
         Returns a result dict with keys: skipped_no_delta, rejected,
         order_generated, fill_processed.
         """
@@ -711,6 +722,7 @@ class PaperExecutor:
             strategy_id=config.config_id,
             current_position_value=current_position_value,
             portfolio_value=portfolio_value,
+            snapshot=risk_snapshot,
         )
         if not risk_result.allowed:
             self.logger.info(
@@ -1,99 +1,322 @@
 """
-PriceCache - Thread-safe real-time price store for WebSocket feed consumers.
+PriceCache - Array-backed real-time price store for WebSocket feeds.
 
 Used by the VM executor (Phase 113) to share live tick prices from all three
 WebSocket feeds (Hyperliquid, Kraken, Coinbase) with the stop monitor and
 position sizer.
 
-All arithmetic uses Decimal for financial precision. Per-symbol timestamps
-enable staleness detection: if a symbol's last-update age exceeds
-max_age_seconds (default 120 s), the price is considered stale and should
-not be trusted for stop/TP decisions.
+Storage layout
+--------------
+Every key (a symbol string or an integer ``asset_id``) resolves to a *slot*:
+an index into preallocated float64 arrays holding the last price and the
+wall-clock time of the last update, plus an optional per-slot ring of the
+most recent ticks (``history=N``).  ``bind(symbol, asset_id)`` makes a symbol
+an alias of the asset's slot, so ticks normalised to an asset by
+``ws_feeds.FeedHub`` and lookups by ``dim_assets`` symbol hit the same slot.
 
-Exports: PriceCache
+Writes do no Decimal conversion: the writer stores the price first and the
+timestamp second, and readers load the timestamp first, so a reader never
+pairs a fresh timestamp with an older price.  Each slot is expected to have
+one writer (the feed hub's event loop).  Writers take a buffer lock that is
+only ever contended while the arrays grow: growth copies the old arrays and
+swaps them in under that lock, so a concurrent tick cannot land in the
+discarded arrays.  Readers take no lock.  Decimal conversion happens on read
+in ``get()`` (position sizing, stop fills), not per tick.
+
+Per-symbol timestamps enable staleness detection: if a symbol's last-update
+age exceeds max_age_seconds (default 120 s), the price is considered stale
+and should not be trusted for stop/TP decisions.
+
+Every update is also published to subscribed tick listeners (e.g. the
+StopMonitor trigger book) as ``listener(symbol, price, received_at)`` where
+``price`` is the float tick and ``received_at`` is the ``time.monotonic()``
+reading taken when the tick arrived, so consumers can measure tick-to-action
+latency.
+
+Exports: PriceCache, TickListener
 """
 
 from __future__ import annotations
 
+import logging
 import threading
-from datetime import datetime, timezone
+import time
 from decimal import Decimal
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+__all__ = ["PriceCache", "TickListener"]
+
+logger = logging.getLogger(__name__)
+
+#: Tick callback: ``(symbol, price, received_at_monotonic) -> None``.
+TickListener = Callable[[str, float, float], None]
+
+
+class _Buffers(NamedTuple):
+    """Slot arrays, swapped as one object when the cache grows."""
+
+    px: np.ndarray  # (capacity,) last price, NaN until first update
+    ts: np.ndarray  # (capacity,) epoch seconds of last update, 0.0 = never
+    hist_px: np.ndarray  # (capacity * history,) tick rings, slot-major
+    hist_ts: np.ndarray  # (capacity * history,)
 
-__all__ = ["PriceCache"]
+
+def _alloc(capacity: int, history: int) -> _Buffers:
+    return _Buffers(
+        px=np.full(capacity, np.nan),
+        ts=np.zeros(capacity),
+        hist_px=np.full(capacity * history, np.nan),
+        hist_ts=np.zeros(capacity * history),
+    )
 
 
 class PriceCache:
-    """Thread-safe last-price cache keyed by symbol string.
+    """Last-price cache keyed by symbol string or asset_id.
 
-    All write and read operations acquire an RLock so that WebSocket callback
-    threads and the synchronous executor/stop-monitor thread can coexist
-    safely.
+    Symbols are stored as given (e.g. "BTC" from Hyperliquid, "BTC/USD" from
+    a raw Kraken feed) unless they are aliased to an asset with ``bind()``.
+    ``ws_feeds.FeedHub`` normalises venue symbols before writing: the primary
+    venue's BTC ticks land in the BTC slot, other venues' in their own
+    ``"<venue>:BTC"`` slots.
 
-    Symbols are stored exactly as received from the exchange (e.g. "BTC" from
-    Hyperliquid, "BTC/USD" from Kraken, "BTC-USD" from Coinbase).  Callers
-    are responsible for normalising symbols before lookup.
+    Parameters
+    ----------
+    history : int
+        Ticks kept per slot in a ring buffer (0 disables history).
+    capacity : int
+        Initial number of slots; the arrays double when exhausted.
 
     Example::
 
-        cache = PriceCache()
+        cache = PriceCache(history=64)
+        cache.bind("BTC", 1)
         cache.update("BTC", 95_000.5)
-        price = cache.get("BTC")                    # Decimal('95000.5')
+        price = cache.get(1)                        # Decimal('95000.5')
         price, age = cache.get_with_age("BTC")      # (Decimal('95000.5'), 0.02)
         cache.is_stale("BTC", max_age_seconds=120)  # False
+        ts, px = cache.history("BTC")               # oldest tick first
+        cache.subscribe(lambda sym, px, t: print(sym, px))
     """
 
-    def __init__(self) -> None:
-        self._prices: dict[str, Decimal] = {}
-        self._timestamps: dict[str, datetime] = {}
-        self._lock = threading.RLock()
+    def __init__(self, history: int = 0, capacity: int = 256) -> None:
+        if history < 0:
+            raise ValueError(f"history must be >= 0, got {history}")
+        self._history = int(history)
+        self._buf = _alloc(max(int(capacity), 1), self._history)
+        self._slots: dict[str | int, int] = {}
+        # Append-only, indexed by slot
+        self._names: list[str] = []
+        self._asset_ids: list[int | None] = []
+        self._hist_n: list[int] = []  # ticks written per slot (ring cursor)
+        # Serialises slot allocation; never taken per tick
+        self._alloc_lock = threading.Lock()
+        # Taken per tick around the array stores and by growth around the
+        # copy + swap, so no tick is written to arrays being replaced
+        self._buf_lock = threading.Lock()
+        # Copy-on-write so updates can iterate without a lock
+        self._listeners: tuple[TickListener, ...] = ()
+
+    # ------------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------------
+
+    def slot(self, key: str | int) -> int:
+        """Return the slot index for *key*, allocating one on first sight.
+
+        Integer keys are asset_ids; string keys are symbols.
+        """
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        with self._alloc_lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                if isinstance(key, str):
+                    slot = self._new_slot(key, None)
+                else:
+                    slot = self._new_slot(str(key), int(key))
+                self._slots[key] = slot
+            return slot
+
+    def bind(self, symbol: str, asset_id: int) -> int:
+        """Alias *symbol* to *asset_id* so both keys share one slot.
+
+        A symbol that already has prices keeps them: its slot becomes the
+        asset's slot.  Returns the slot index.
+
+        Raises
+        ------
+        ValueError
+            If *symbol* and *asset_id* are already bound to different slots.
+        """
+        asset_id = int(asset_id)
+        with self._alloc_lock:
+            by_sym = self._slots.get(symbol)
+            by_asset = self._slots.get(asset_id)
+            if by_sym is not None and by_asset is not None and by_sym != by_asset:
+                raise ValueError(
+                    f"symbol {symbol!r} and asset_id={asset_id} already map to "
+                    "different slots"
+                )
+            slot = by_asset if by_asset is not None else by_sym
+            if slot is None:
+                slot = self._new_slot(symbol, asset_id)
+            else:
+                self._names[slot] = symbol
+                self._asset_ids[slot] = asset_id
+            self._slots[asset_id] = slot
+            self._slots[symbol] = slot
+            return slot
+
+    def asset_id(self, key: str | int) -> int | None:
+        """Return the asset_id bound to *key*, or ``None`` if unbound/unknown."""
+        slot = self._slots.get(key)
+        return None if slot is None else self._asset_ids[slot]
+
+    def _new_slot(self, name: str, asset_id: int | None) -> int:
+        """Allocate the next slot (caller holds ``_alloc_lock``)."""
+        slot = len(self._names)
+        if slot >= len(self._buf.px):
+            grown = _alloc(2 * len(self._buf.px), self._history)
+            with self._buf_lock:
+                for old, new in zip(self._buf, grown):
+                    new[: len(old)] = old
+                self._buf = grown
+        self._asset_ids.append(asset_id)
+        self._hist_n.append(0)
+        self._names.append(name)
+        return slot
 
     # ------------------------------------------------------------------
     # Write
     # ------------------------------------------------------------------
 
-    def update(self, symbol: str, price: float) -> None:
-        """Update the latest price for *symbol*.
+    def update(self, symbol: str | int, price: float) -> None:
+        """Update the latest price for *symbol* (a symbol or asset_id).
 
-        Converts *price* via ``Decimal(str(price))`` to avoid float
-        representation artefacts (e.g. 95000.5 → Decimal('95000.5') not
-        Decimal('95000.4999999...')).
+        May be called from any WebSocket callback thread; see ``update_slot``.
+        """
+        slot = self._slots.get(symbol)
+        if slot is None:
+            slot = self.slot(symbol)
+        self.update_slot(slot, price)
 
-        Thread-safe; may be called from any WebSocket callback thread.
+    def update_slot(self, slot: int, price: float) -> None:
+        """Store a tick for a slot resolved earlier with ``slot()``/``bind()``.
+
+        This is the feed hot path: no dict lookup, no Decimal, and only the
+        buffer lock, which is contended only while the arrays grow.
+        Subscribed listeners run synchronously on the calling thread after
+        the price is stored; listener errors are logged and never propagate
+        into the feed.
         """
-        with self._lock:
-            self._prices[symbol] = Decimal(str(price))
-            self._timestamps[symbol] = datetime.now(timezone.utc)
+        received_at = time.monotonic()
+        value = float(price)
+        now = time.time()
+        with self._buf_lock:
+            buf = self._buf
+            buf.px[slot] = value
+            buf.ts[slot] = now  # after the price: see module docstring
+            h = self._history
+            if h:
+                n = self._hist_n[slot]
+                pos = slot * h + n % h
+                buf.hist_px[pos] = value
+                buf.hist_ts[pos] = now
+                self._hist_n[slot] = n + 1
+        if self._listeners:
+            symbol = self._names[slot]
+            for listener in self._listeners:
+                try:
+                    listener(symbol, value, received_at)
+                except Exception as exc:  # noqa: BLE001
+                    logger.exception(
+                        "PriceCache: tick listener failed for %s: %s", symbol, exc
+                    )
+
+    # ------------------------------------------------------------------
+    # Tick subscription
+    # ------------------------------------------------------------------
+
+    def subscribe(self, listener: TickListener) -> None:
+        """Register *listener* to be called on every update."""
+        with self._alloc_lock:
+            if listener not in self._listeners:
+                self._listeners = self._listeners + (listener,)
+
+    def unsubscribe(self, listener: TickListener) -> None:
+        """Remove *listener*; unknown listeners are ignored."""
+        with self._alloc_lock:
+            self._listeners = tuple(cb for cb in self._listeners if cb != listener)
 
     # ------------------------------------------------------------------
     # Read — single price
     # ------------------------------------------------------------------
 
-    def get(self, symbol: str) -> Decimal | None:
-        """Return the latest price for *symbol*, or ``None`` if not available."""
-        with self._lock:
-            return self._prices.get(symbol)
+    def _read(self, key: str | int) -> tuple[float, float] | None:
+        """Return ``(price, epoch_ts)`` for *key*, or ``None`` if never priced."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        buf = self._buf
+        ts = float(buf.ts[slot])  # timestamp first: see module docstring
+        if ts == 0.0:
+            return None
+        return float(buf.px[slot]), ts
+
+    def get(self, symbol: str | int) -> Decimal | None:
+        """Return the latest price for *symbol*, or ``None`` if not available.
+
+        The float tick is converted via ``Decimal(str(price))`` to avoid
+        float representation artefacts (95000.5 → Decimal('95000.5')).
+        """
+        rec = self._read(symbol)
+        return None if rec is None else Decimal(str(rec[0]))
 
-    def get_with_age(self, symbol: str) -> tuple[Decimal | None, float]:
+    def get_float(self, symbol: str | int) -> float | None:
+        """Return the latest price for *symbol* as a float, or ``None``."""
+        rec = self._read(symbol)
+        return None if rec is None else rec[0]
+
+    def get_with_age(self, symbol: str | int) -> tuple[Decimal | None, float]:
         """Return ``(price, age_seconds)`` for *symbol*.
 
         Returns ``(None, inf)`` if the symbol has no price record.
 
         ``age_seconds`` is how many seconds have elapsed since the last
-        ``update()`` call for this symbol.
+        update for this symbol.
+        """
+        rec = self._read(symbol)
+        if rec is None:
+            return None, float("inf")
+        return Decimal(str(rec[0])), time.time() - rec[1]
+
+    def history(self, symbol: str | int) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(epoch_ts, prices)`` of the buffered ticks, oldest first.
+
+        Both arrays are empty when history is disabled or the symbol is
+        unknown.  The ring holds at most ``history`` ticks.
         """
-        with self._lock:
-            price = self._prices.get(symbol)
-            ts = self._timestamps.get(symbol)
-            if price is None or ts is None:
-                return None, float("inf")
-            age = (datetime.now(timezone.utc) - ts).total_seconds()
-            return price, age
+        slot = self._slots.get(symbol)
+        if slot is None or not self._history:
+            return np.empty(0), np.empty(0)
+        h = self._history
+        n = self._hist_n[slot]
+        if n <= h:
+            order = np.arange(n)
+        else:
+            order = (np.arange(h) + n) % h
+        order += slot * h
+        buf = self._buf
+        return buf.hist_ts[order], buf.hist_px[order]
 
     # ------------------------------------------------------------------
     # Staleness helpers
     # ------------------------------------------------------------------
 
-    def is_stale(self, symbol: str, max_age_seconds: float = 120.0) -> bool:
+    def is_stale(self, symbol: str | int, max_age_seconds: float = 120.0) -> bool:
         """Return ``True`` if the price for *symbol* is older than *max_age_seconds*.
 
         Also returns ``True`` when the symbol has no price record at all
@@ -109,13 +332,10 @@ class PriceCache:
         seen); only symbols that were once updated but have gone stale are
         returned.
         """
-        with self._lock:
-            now = datetime.now(timezone.utc)
-            stale: list[str] = []
-            for sym, ts in self._timestamps.items():
-                if (now - ts).total_seconds() > max_age_seconds:
-                    stale.append(sym)
-            return stale
+        n = len(self._names)
+        ts = self._buf.ts[:n]
+        stale = np.flatnonzero((ts > 0.0) & (time.time() - ts > max_age_seconds))
+        return [self._names[i] for i in stale]
 
     # ------------------------------------------------------------------
     # Introspection
@@ -123,14 +343,12 @@ class PriceCache:
 
     def all_symbols(self) -> list[str]:
         """Return a snapshot list of all symbols that have a price record."""
-        with self._lock:
-            return list(self._prices.keys())
+        n = len(self._names)
+        return [self._names[i] for i in np.flatnonzero(self._buf.ts[:n] > 0.0)]
 
     def __len__(self) -> int:
-        with self._lock:
-            return len(self._prices)
+        n = len(self._names)
+        return int(np.count_nonzero(self._buf.ts[:n]))
 
     def __repr__(self) -> str:  # pragma: no cover
-        with self._lock:
-            n = len(self._prices)
-        return f"PriceCache({n} symbols)"
+        return f"PriceCache({len(self)} symbols)"
@@ -1,10 +1,22 @@
 """
 StopMonitor - Real-time stop-loss and take-profit monitor for open positions.
 
-Runs as a daemon thread that polls the PriceCache every ~1 second.  For any
-open position that has a stop_price or take_profit price set (recorded on the
-associated orders row), it compares the live price from PriceCache and triggers
-a close order when the threshold is crossed.
+Runs as a daemon thread driven by PriceCache tick events.  For any open
+position that has a stop_price or take_profit price set (recorded on the
+associated orders row), the levels are kept in a per-symbol ``TriggerBook``
+sorted by price; each tick published by ``PriceCache.update`` only touches the
+levels it crosses, and crossed levels are queued to the monitor thread, which
+triggers a close order.  Stop-fill latency is therefore bounded by the
+WebSocket feed rather than a poll interval, and tick cost does not grow with
+the number of resting orders.
+
+The open-order snapshot is still reloaded from DB every
+``_POSITION_REFRESH_INTERVAL`` seconds (and right after a trigger); each
+reload rebuilds the book and checks it against the cached prices, which also
+catches levels already crossed before the order was loaded.
+
+Tick-to-trigger latency (tick receipt in PriceCache -> trigger start) is
+recorded and exposed via ``StopMonitor.latency_stats()``.
 
 Trigger logic
 -------------
@@ -24,24 +36,28 @@ On trigger, StopMonitor:
 
 Thread-safety
 -------------
-* PriceCache is RLock-protected (all reads are safe from any thread).
+* PriceCache reads are lock-free and safe from any thread.
 * DB writes go through ``OrderManager`` which uses ``engine.begin()``
   (atomic per operation).
-* A set ``_pending_triggers`` tracks in-flight asset_ids so that two
-  concurrent iterations cannot double-trigger the same position.  The set
-  is protected by a ``threading.Lock``.
+* Tick listeners run on the WebSocket feed threads; they only pop crossed
+  levels from the (locked) TriggerBook and enqueue them.  All DB work runs on
+  the monitor thread.
+* A set ``_pending_triggers`` tracks in-flight asset_ids so that a book
+  rebuild cannot re-add a position whose trigger is queued or executing.
+  The set is protected by a ``threading.Lock``.
 
 Symbol resolution
 -----------------
-Asset symbols are loaded once at startup via ``_load_asset_symbol_map``:
+Asset symbols are loaded once at startup via ``load_asset_symbol_map``:
 ``SELECT id, symbol FROM public.dim_assets``
 
-Exports: StopMonitor
+Exports: StopMonitor, load_asset_symbol_map
 """
 
 from __future__ import annotations
 
 import logging
+import queue
 import threading
 import time
 import uuid
@@ -53,10 +69,11 @@ from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
 from ta_lab2.executor.price_cache import PriceCache
+from ta_lab2.executor.trigger_book import LatencyTracker, Trigger, TriggerBook
 from ta_lab2.notifications import telegram
 from ta_lab2.trading.order_manager import FillData, OrderManager
 
-__all__ = ["StopMonitor"]
+__all__ = ["StopMonitor", "load_asset_symbol_map"]
 
 logger = logging.getLogger(__name__)
 
@@ -68,9 +85,10 @@ _DEFAULT_SLIPPAGE_BPS = Decimal("5")  # 0.05 %
 _POSITION_REFRESH_INTERVAL = 10.0  # seconds
 
 
-def _load_asset_symbol_map(engine: Engine) -> dict[int, str]:
+def load_asset_symbol_map(engine: Engine) -> dict[int, str]:
     """Load id -> symbol mapping from dim_assets.
 
+    Also used by the executor service to map feed symbols to asset ids.
     Returns an empty dict on failure (non-fatal; symbol will show as 'id=N').
     """
     sql = text("SELECT id, symbol FROM public.dim_assets ORDER BY id")
@@ -79,7 +97,7 @@ def _load_asset_symbol_map(engine: Engine) -> dict[int, str]:
             rows = conn.execute(sql).fetchall()
         return {int(r.id): str(r.symbol) for r in rows}
     except Exception as exc:  # noqa: BLE001
-        logger.warning("StopMonitor: could not load dim_assets symbol map: %s", exc)
+        logger.warning("could not load dim_assets symbol map: %s", exc)
         return {}
 
 
@@ -105,7 +123,8 @@ class StopMonitor(threading.Thread):
     price_cache : PriceCache
         Shared thread-safe price cache populated by WebSocket feeds.
     poll_interval_secs : float
-        How often to scan all open positions, in seconds.  Default 1.0.
+        Longest wait for a tick-driven trigger before the monitor thread
+        wakes up to refresh the order cache, in seconds.  Default 1.0.
     slippage_bps : Decimal
         Slippage applied to each triggered fill, in basis points.  Default 5.
     strategy_id : int
@@ -146,24 +165,41 @@ class StopMonitor(threading.Thread):
         self._open_orders: list[dict[str, Any]] = []
         self._last_order_refresh: float = 0.0
 
+        # Sorted stop/TP levels per symbol, fed by PriceCache ticks.  The lock
+        # makes a rebuild atomic with respect to ticks (no double fire).
+        self._book = TriggerBook()
+        self._book_lock = threading.Lock()
+        # (trigger, tick price, tick monotonic time or None for sweeps)
+        self._triggers: queue.Queue[tuple[Trigger, Decimal, float | None]] = (
+            queue.Queue()
+        )
+        self._latency = LatencyTracker()
+
     # ------------------------------------------------------------------
     # Public control API
     # ------------------------------------------------------------------
 
     def start(self) -> "StopMonitor":  # type: ignore[override]
         """Start the monitor thread and return self (for chaining)."""
-        self._symbol_map = _load_asset_symbol_map(self.engine)
+        self._symbol_map = load_asset_symbol_map(self.engine)
         logger.info("StopMonitor: loaded %d asset symbols", len(self._symbol_map))
+        self.price_cache.subscribe(self._on_tick)
         super().start()
         logger.info(
-            "StopMonitor: daemon thread started (poll=%.1fs)", self.poll_interval
+            "StopMonitor: daemon thread started (event-driven, refresh wait=%.1fs)",
+            self.poll_interval,
         )
         return self
 
     def stop(self) -> None:
         """Signal the monitor thread to exit on its next iteration."""
+        self.price_cache.unsubscribe(self._on_tick)
         self._stop_event.set()
 
+    def latency_stats(self) -> dict[str, float]:
+        """Tick-to-trigger latency summary (see ``LatencyTracker.snapshot``)."""
+        return self._latency.snapshot()
+
     # ------------------------------------------------------------------
     # Main loop
     # ------------------------------------------------------------------
@@ -173,12 +209,10 @@ class StopMonitor(threading.Thread):
         logger.info("StopMonitor: entering run loop")
         while not self._stop_event.is_set():
             try:
-                self._check_all_positions()
+                self._maybe_refresh_orders()
+                self._process_triggers(timeout=self.poll_interval)
             except Exception as exc:  # noqa: BLE001
-                logger.exception(
-                    "StopMonitor: unhandled error in _check_all_positions: %s", exc
-                )
-            self._stop_event.wait(timeout=self.poll_interval)
+                logger.exception("StopMonitor: unhandled error in run loop: %s", exc)
         logger.info("StopMonitor: run loop exited cleanly")
 
     # ------------------------------------------------------------------
@@ -199,6 +233,39 @@ class StopMonitor(threading.Thread):
             )
         except Exception as exc:  # noqa: BLE001
             logger.warning("StopMonitor: order cache refresh failed: %s", exc)
+            return
+        self._rebuild_book()
+
+    def _rebuild_book(self) -> None:
+        """Rebuild the trigger book from the order cache, then sweep it once
+        against the cached prices (levels crossed while unloaded fire now)."""
+        with self._book_lock:
+            with self._pending_lock:
+                pending = set(self._pending_triggers)
+            self._book.clear()
+            for order in self._open_orders:
+                asset_id = order["asset_id"]
+                if asset_id in pending:
+                    continue
+                self._book.add(
+                    order["order_id"],
+                    self._symbol_map.get(asset_id, f"id={asset_id}"),
+                    is_long=order["side"] == "buy",
+                    stop_price=order["stop_price"],
+                    tp_price=order["tp_price"],
+                    group=asset_id,
+                    payload=order,
+                )
+            for symbol in self._book.symbols():
+                price = self.price_cache.get(symbol)
+                if price is None:
+                    logger.debug(
+                        "StopMonitor: no price in cache for symbol=%s, "
+                        "waiting for ticks",
+                        symbol,
+                    )
+                    continue
+                self._enqueue(self._book.on_price(symbol, float(price)), price, None)
 
     def _load_open_stop_tp_orders(self) -> list[dict[str, Any]]:
         """Load orders with stop or TP prices that are still open (not filled/cancelled).
@@ -261,80 +328,64 @@ class StopMonitor(threading.Thread):
         return result
 
     # ------------------------------------------------------------------
-    # Check loop
+    # Tick-driven triggering
     # ------------------------------------------------------------------
 
-    def _check_all_positions(self) -> None:
-        """Scan cached open stop/TP orders against PriceCache prices."""
-        self._maybe_refresh_orders()
+    def _on_tick(self, symbol: str, price: float, received_at: float) -> None:
+        """PriceCache listener (feed thread): queue any crossed levels."""
+        with self._book_lock:
+            fired = self._book.on_price(symbol, price)
+            if fired:
+                self._enqueue(fired, Decimal(str(price)), received_at)
 
-        for order in self._open_orders:
-            asset_id = order["asset_id"]
-            symbol = self._symbol_map.get(asset_id, f"id={asset_id}")
-
-            # Skip assets already being triggered
+    def _enqueue(
+        self, fired: list[Trigger], price: Decimal, received_at: float | None
+    ) -> None:
+        for trig in fired:
             with self._pending_lock:
-                if asset_id in self._pending_triggers:
+                if trig.group in self._pending_triggers:
                     continue
+                self._pending_triggers.add(trig.group)
+            self._triggers.put((trig, price, received_at))
 
-            price = self.price_cache.get(symbol)
-            if price is None:
-                logger.debug(
-                    "StopMonitor: no price in cache for symbol=%s (asset_id=%s), skipping",
-                    symbol,
-                    asset_id,
-                )
-                continue
+    def _process_triggers(self, timeout: float) -> int:
+        """Execute queued triggers, waiting up to *timeout* for the first.
 
-            trigger_type = self._detect_trigger(order, price)
-            if trigger_type is None:
-                continue
+        Returns the number of triggers executed.
+        """
+        try:
+            item = self._triggers.get(timeout=timeout)
+        except queue.Empty:
+            return 0
+        n = 0
+        while item is not None:
+            self._execute_trigger(*item)
+            n += 1
+            try:
+                item = self._triggers.get_nowait()
+            except queue.Empty:
+                item = None
+        return n
 
-            # Mark as pending before spawning trigger to prevent race
+    def _execute_trigger(
+        self, trig: Trigger, price: Decimal, received_at: float | None
+    ) -> None:
+        if received_at is not None:
+            self._latency.record(time.monotonic() - received_at)
+        try:
+            self._trigger_stop_tp(trig.payload, price, trig.symbol, trig.trigger_type)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception(
+                "StopMonitor: trigger failed for asset_id=%s trigger=%s: %s",
+                trig.group,
+                trig.trigger_type,
+                exc,
+            )
+            # Re-arm on the next refresh
+            self._last_order_refresh = 0.0
+        finally:
             with self._pending_lock:
-                self._pending_triggers.add(asset_id)
-
-            try:
-                self._trigger_stop_tp(order, price, symbol, trigger_type)
-            except Exception as exc:  # noqa: BLE001
-                logger.exception(
-                    "StopMonitor: trigger failed for asset_id=%s trigger=%s: %s",
-                    asset_id,
-                    trigger_type,
-                    exc,
-                )
-            finally:
-                with self._pending_lock:
-                    self._pending_triggers.discard(asset_id)
-
-    def _detect_trigger(self, order: dict[str, Any], price: Decimal) -> str | None:
-        """Return 'STOP', 'TP', or None based on current price vs thresholds.
-
-        Convention:
-          - side='buy' means a LONG position (opened via buy order).
-          - side='sell' means a SHORT position (opened via sell order).
-        For a long:  STOP triggers when price <= stop_price
-                     TP triggers when price >= tp_price
-        For a short: STOP triggers when price >= stop_price
-                     TP triggers when price <= tp_price
-        """
-        is_long = order["side"] == "buy"
-        stop_price = order["stop_price"]
-        tp_price = order["tp_price"]
-
-        if stop_price is not None:
-            if is_long and price <= stop_price:
-                return "STOP"
-            if not is_long and price >= stop_price:
-                return "STOP"
-
-        if tp_price is not None:
-            if is_long and price >= tp_price:
-                return "TP"
-            if not is_long and price <= tp_price:
-                return "TP"
-
-        return None
+                self._pending_triggers.discard(trig.group)
 
     # ------------------------------------------------------------------
     # Trigger execution
@@ -0,0 +1,226 @@
+"""
+tick_recorder - Append-only, memory-mapped binary log of normalised feed ticks.
+
+``FeedHub`` (see ``ws_feeds``) writes every normalised tick to a
+``TickRecorder`` when one is attached; ``executor.replay`` feeds a recorded
+session back into ``PriceCache``/``StopMonitor`` without network access.
+
+File format
+-----------
+One file per UTC day, ``ticks_YYYYMMDD.bin``:
+
+* a 32-byte header — magic ``b"TALTICK1"``, format version (u32), record
+  size (u32), committed record count (u64), 8 pad bytes;
+* fixed 32-byte little-endian records matching ``TICK_DTYPE``:
+  ``ts`` (f8, epoch seconds at ingest), ``price`` (f8), ``asset_id`` (i4,
+  -1 when the symbol is not bound to an asset), ``venue`` (u1, index into
+  ``VENUES``), ``symbol`` (11-byte ASCII, NUL padded).
+
+The file is grown in ``chunk_records`` steps and written through ``mmap``;
+the header count is bumped after each record, so a reader (or a crash)
+never sees a partially written tick.  ``close()`` truncates the file to the
+committed records.  ``read_ticks`` returns a zero-copy ``np.memmap`` view.
+
+Exports: TickRecorder, TICK_DTYPE, VENUES, read_ticks, load_ticks
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+__all__ = ["TickRecorder", "TICK_DTYPE", "VENUES", "read_ticks", "load_ticks"]
+
+logger = logging.getLogger(__name__)
+
+TICK_DTYPE = np.dtype(
+    [
+        ("ts", "<f8"),
+        ("price", "<f8"),
+        ("asset_id", "<i4"),
+        ("venue", "u1"),
+        ("symbol", "S11"),
+    ]
+)
+
+#: Venue codes stored in the ``venue`` field.
+VENUES = ("", "hyperliquid", "kraken", "coinbase")
+
+_MAGIC = b"TALTICK1"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIQ8x")
+_RECORD = struct.Struct("<ddiB11s")
+_COUNT_OFFSET = 16  # byte offset of the record count inside the header
+
+
+def _day_path(directory: Path, ts: float) -> tuple[Path, float]:
+    """Return the file for the UTC day containing *ts* and that day's end."""
+    day = datetime.fromtimestamp(ts, tz=timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    end = (day + timedelta(days=1)).timestamp()
+    return directory / f"ticks_{day:%Y%m%d}.bin", end
+
+
+class TickRecorder:
+    """Append normalised ticks to per-day memory-mapped files.
+
+    Parameters
+    ----------
+    directory : str | Path
+        Output directory (created if missing).  Re-opening a day that
+        already has a file appends after its committed records.
+    chunk_records : int
+        Records added each time a file has to grow.
+
+    Example::
+
+        with TickRecorder("/data/ticks") as rec:
+            rec.record("BTC", 95_000.5, asset_id=1, venue="kraken")
+        ticks = load_ticks("/data/ticks")
+    """
+
+    def __init__(self, directory: str | Path, chunk_records: int = 1 << 16) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._chunk = max(int(chunk_records), 1)
+        self._venue_codes = {name: i for i, name in enumerate(VENUES)}
+        self._file = None
+        self._mm: mmap.mmap | None = None
+        self._day_end = float("-inf")
+        self._count = 0
+        self._capacity = 0
+        self.n_recorded = 0
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        symbol: str,
+        price: float,
+        asset_id: int | None = None,
+        venue: str = "",
+        ts: float | None = None,
+    ) -> None:
+        """Append one tick; *ts* defaults to the current epoch time."""
+        if ts is None:
+            ts = time.time()
+        if not (self._day_end - 86400.0 <= ts < self._day_end):
+            self._open_day(ts)
+        if self._count == self._capacity:
+            self._grow()
+        _RECORD.pack_into(
+            self._mm,
+            _HEADER.size + self._count * _RECORD.size,
+            ts,
+            price,
+            -1 if asset_id is None else asset_id,
+            self._venue_codes.get(venue, 0),
+            symbol.encode("ascii", "replace")[:11],
+        )
+        self._count += 1
+        struct.pack_into("<Q", self._mm, _COUNT_OFFSET, self._count)
+        self.n_recorded += 1
+
+    def flush(self) -> None:
+        """Flush mapped pages to disk."""
+        if self._mm is not None:
+            self._mm.flush()
+
+    def close(self) -> None:
+        """Flush, truncate the current file to its committed records, close."""
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        self._file.truncate(_HEADER.size + self._count * _RECORD.size)
+        self._file.close()
+        self._mm = self._file = None
+        self._day_end = float("-inf")
+
+    def __enter__(self) -> "TickRecorder":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _open_day(self, ts: float) -> None:
+        self.close()
+        path, self._day_end = _day_path(self.directory, ts)
+        if path.exists() and path.stat().st_size >= _HEADER.size:
+            self._file = open(path, "r+b")
+            self._count = _read_header(self._file.read(_HEADER.size), path)
+        else:
+            self._file = open(path, "w+b")
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION, _RECORD.size, 0))
+            self._count = 0
+        self._file.flush()
+        self._capacity = (os.path.getsize(path) - _HEADER.size) // _RECORD.size
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        logger.info("TickRecorder: writing %s (%d existing ticks)", path, self._count)
+
+    def _grow(self) -> None:
+        self._mm.flush()
+        self._mm.close()
+        self._capacity = self._count + self._chunk
+        self._file.truncate(_HEADER.size + self._capacity * _RECORD.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+
+# ---------------------------------------------------------------------------
+# Read
+# ---------------------------------------------------------------------------
+
+
+def _read_header(raw: bytes, path: Path) -> int:
+    magic, version, rec_size, count = _HEADER.unpack(raw)
+    if magic != _MAGIC or version != _VERSION or rec_size != _RECORD.size:
+        raise ValueError(f"{path} is not a version-{_VERSION} tick file")
+    return count
+
+
+def read_ticks(path: str | Path) -> np.ndarray:
+    """Return the committed ticks of one day file as a read-only memmap."""
+    path = Path(path)
+    with open(path, "rb") as fh:
+        count = _read_header(fh.read(_HEADER.size), path)
+    if count == 0:
+        return np.empty(0, dtype=TICK_DTYPE)
+    return np.memmap(
+        path, dtype=TICK_DTYPE, mode="r", offset=_HEADER.size, shape=(count,)
+    )
+
+
+def load_ticks(
+    directory: str | Path,
+    start: float | None = None,
+    end: float | None = None,
+) -> np.ndarray:
+    """Load every day file in *directory*, sorted by ``ts``.
+
+    *start*/*end* (epoch seconds) filter to ``start <= ts < end``.
+    """
+    parts = [read_ticks(p) for p in sorted(Path(directory).glob("ticks_*.bin"))]
+    if not parts:
+        return np.empty(0, dtype=TICK_DTYPE)
+    ticks = np.concatenate(parts)
+    mask = np.ones(len(ticks), dtype=bool)
+    if start is not None:
+        mask &= ticks["ts"] >= start
+    if end is not None:
+        mask &= ticks["ts"] < end
+    ticks = ticks[mask]
+    return ticks[np.argsort(ticks["ts"], kind="stable")]
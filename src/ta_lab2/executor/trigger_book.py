@@ -0,0 +1,262 @@
+"""
+TriggerBook - Per-symbol sorted stop/TP levels for event-driven triggering.
+
+Used by StopMonitor: instead of scanning every open order on every poll, each
+order's stop and take-profit levels are kept in two price-sorted books per
+symbol and a tick only touches the levels it crosses.
+
+* **below book** -- levels that fire when price <= level
+  (long stop-loss, short take-profit)
+* **above book** -- levels that fire when price >= level
+  (long take-profit, short stop-loss)
+
+A tick that crosses nothing costs one bisect per book, so per-tick CPU no
+longer grows with the number of resting orders (only a firing tick pays a
+linear pass to drop the fired groups' other levels).  Levels are compared as
+floats (converted once when the order is added); the original Decimal levels
+travel with the order payload.
+
+Orders are grouped (StopMonitor groups by asset_id, i.e. by position): when
+any level of a group fires, every level of the group is removed, so one
+position is closed once even if it has several resting stop/TP orders.  If a
+tick crosses both a stop and a TP of the same group, the stop wins.
+
+LatencyTracker keeps a rolling window of tick-to-trigger latencies.
+
+Exports: TriggerBook, Trigger, LatencyTracker
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Hashable
+
+__all__ = ["TriggerBook", "Trigger", "LatencyTracker"]
+
+STOP = "STOP"
+TP = "TP"
+
+
+@dataclass(frozen=True)
+class Trigger:
+    """A fired stop/TP level."""
+
+    order_id: str
+    group: Hashable
+    symbol: str
+    trigger_type: str  # "STOP" or "TP"
+    level: Decimal
+    payload: Any = field(default=None, compare=False)
+
+
+@dataclass
+class _Level:
+    seq: int
+    order_id: str
+    group: Hashable
+    trigger_type: str
+    level: Decimal
+    payload: Any
+
+
+class _SideBook:
+    """Levels sorted ascending by price; parallel key/level lists for bisect."""
+
+    __slots__ = ("keys", "levels")
+
+    def __init__(self) -> None:
+        self.keys: list[tuple[float, int]] = []
+        self.levels: list[_Level] = []
+
+    def add(self, price: float, lvl: _Level) -> None:
+        key = (price, lvl.seq)
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.levels.insert(i, lvl)
+
+    def pop_at_or_above(self, price: float) -> list[_Level]:
+        i = bisect.bisect_left(self.keys, (price, -1))
+        fired = self.levels[i:]
+        del self.keys[i:], self.levels[i:]
+        return fired
+
+    def pop_at_or_below(self, price: float) -> list[_Level]:
+        i = bisect.bisect_right(self.keys, (price, float("inf")))
+        fired = self.levels[:i]
+        del self.keys[:i], self.levels[:i]
+        return fired
+
+    def remove_groups(self, groups: set) -> None:
+        keep = [j for j, lvl in enumerate(self.levels) if lvl.group not in groups]
+        if len(keep) != len(self.levels):
+            self.keys = [self.keys[j] for j in keep]
+            self.levels = [self.levels[j] for j in keep]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class TriggerBook:
+    """Thread-safe per-symbol stop/TP trigger book.
+
+    Example::
+
+        book = TriggerBook()
+        book.add("o1", "BTC", is_long=True, stop_price=Decimal("90000"),
+                 tp_price=Decimal("110000"), group=1)
+        book.on_price("BTC", 95_000.0)   # []
+        book.on_price("BTC", 89_990.0)   # [Trigger(order_id='o1', trigger_type='STOP', ...)]
+    """
+
+    def __init__(self) -> None:
+        self._below: dict[str, _SideBook] = {}
+        self._above: dict[str, _SideBook] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        order_id: str,
+        symbol: str,
+        is_long: bool,
+        stop_price: Decimal | None,
+        tp_price: Decimal | None,
+        group: Hashable = None,
+        payload: Any = None,
+    ) -> None:
+        """Add an order's stop and/or TP level.
+
+        Long stop / short TP go to the below book; long TP / short stop go to
+        the above book.  ``group`` defaults to ``order_id``.
+        """
+        group = order_id if group is None else group
+        with self._lock:
+            for trigger_type, level in ((STOP, stop_price), (TP, tp_price)):
+                if level is None:
+                    continue
+                fires_below = is_long == (trigger_type == STOP)
+                books = self._below if fires_below else self._above
+                side = books.get(symbol)
+                if side is None:
+                    side = books[symbol] = _SideBook()
+                side.add(
+                    float(level),
+                    _Level(
+                        next(self._seq), order_id, group, trigger_type, level, payload
+                    ),
+                )
+
+    def remove_group(self, group: Hashable) -> None:
+        """Remove every level belonging to ``group``."""
+        with self._lock:
+            for books in (self._below, self._above):
+                for side in books.values():
+                    side.remove_groups({group})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._below.clear()
+            self._above.clear()
+
+    # ------------------------------------------------------------------
+    # Tick handling
+    # ------------------------------------------------------------------
+
+    def on_price(self, symbol: str, price: float) -> list[Trigger]:
+        """Pop and return the levels crossed by ``price`` (one per group)."""
+        with self._lock:
+            below = self._below.get(symbol)
+            above = self._above.get(symbol)
+            fired: list[_Level] = []
+            if below is not None and below.levels:
+                fired += below.pop_at_or_above(price)
+            if above is not None and above.levels:
+                fired += above.pop_at_or_below(price)
+            if not fired:
+                return []
+
+            # One trigger per group: STOP before TP, then order of insertion
+            fired.sort(key=lambda lvl: (lvl.trigger_type != STOP, lvl.seq))
+            winners: dict[Hashable, _Level] = {}
+            for lvl in fired:
+                winners.setdefault(lvl.group, lvl)
+            groups = set(winners)
+            for side in (below, above):
+                if side is not None:
+                    side.remove_groups(groups)
+
+        return [
+            Trigger(
+                lvl.order_id,
+                lvl.group,
+                symbol,
+                lvl.trigger_type,
+                lvl.level,
+                lvl.payload,
+            )
+            for lvl in winners.values()
+        ]
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def symbols(self) -> list[str]:
+        """Symbols with at least one resting level."""
+        with self._lock:
+            return sorted(
+                {s for s, b in self._below.items() if b}
+                | {s for s, b in self._above.items() if b}
+            )
+
+    def __len__(self) -> int:
+        """Number of resting levels (an order with stop and TP counts twice)."""
+        with self._lock:
+            return sum(len(b) for b in self._below.values()) + sum(
+                len(b) for b in self._above.values()
+            )
+
+
+class LatencyTracker:
+    """Rolling window of latency samples (seconds) with summary statistics."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._max = max(self._max, seconds)
+
+    def snapshot(self) -> dict[str, float]:
+        """Return count plus last/mean/p50/p99/max in milliseconds.
+
+        ``count`` and ``max_ms`` cover all samples; the rest cover the
+        rolling window.  Empty trackers report ``count=0`` only.
+        """
+        with self._lock:
+            if not self._samples:
+                return {"count": 0}
+            ordered = sorted(self._samples)
+            n = len(ordered)
+            return {
+                "count": self._count,
+                "last_ms": self._samples[-1] * 1e3,
+                "mean_ms": sum(ordered) / n * 1e3,
+                "p50_ms": ordered[(n - 1) // 2] * 1e3,
+                "p99_ms": ordered[min(n - 1, int(0.99 * n))] * 1e3,
+                "max_ms": self._max * 1e3,
+            }
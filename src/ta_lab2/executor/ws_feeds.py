@@ -1,38 +1,52 @@
 """
 ws_feeds - WebSocket feed managers for Hyperliquid, Kraken, and Coinbase.
 
-Each feed runs in a dedicated daemon thread and writes live tick prices into a
-shared PriceCache instance.  The main executor thread is never blocked.
+``FeedHub`` multiplexes every venue on a single ``asyncio`` event loop in one
+daemon thread and writes live tick prices into a shared PriceCache instance.
+The main executor thread is never blocked.
+
+Symbols are normalised at ingest: each venue symbol ("BTC", "BTC/USD",
+"BTC-USD") is split once into base ticker and quote currency.  Pairs quoted
+in anything but the hub's ``quote`` currency (default USD) are dropped.  The
+primary venue (Hyperliquid when enabled) writes the base ticker's slot,
+which is the asset's slot when the hub is given the ``dim_assets`` id ->
+symbol map; every other venue writes its own ``"<venue>:<base>"`` slot (see
+``venue_key``), so stops and sizing never read another venue's price.  The
+mapping is memoised per venue, so the per-tick cost is one dict lookup plus
+``PriceCache.update_slot``.  ``FeedHub.metrics()`` reports ingest counts,
+tick rate, last-tick age, exchange-to-ingest lag and reconnects per venue.
 
 Feed overview
 -------------
-* **Hyperliquid** — Uses the official ``hyperliquid-python-sdk``
-  ``WebsocketManager`` (threading-based, NOT asyncio).  Subscribes to the
-  ``allMids`` channel which delivers all mid prices in a single push.  The SDK
-  pings the server every 50 s; there is no application-level reconnection —
-  monitor ``PriceCache.is_stale()`` externally.
-
-* **Kraken** — Uses ``websockets 16.0`` with the ``async for websocket in
-  connect(...)`` infinite-iterator pattern which provides automatic exponential
-  backoff reconnection.  Subscribes to the ``ticker`` channel on the v2 public
-  endpoint ``wss://ws.kraken.com/v2``.
-
-* **Coinbase** — Uses the same ``websockets`` pattern against
+* **Hyperliquid** — ``allMids`` subscription on ``wss://api.hyperliquid.xyz/ws``
+  (all mid prices in a single push).  ``start_hl_feed`` keeps the older
+  ``hyperliquid-python-sdk`` ``WebsocketManager`` path (threading-based, no
+  application-level reconnection).
+
+* **Kraken** — ``ticker`` channel on the v2 public endpoint
+  ``wss://ws.kraken.com/v2``.
+
+* **Coinbase** — ``ticker`` channel on
   ``wss://advanced-trade-ws.coinbase.com``.  CRITICAL: subscribe message must
   be sent within 5 s of connect or the server closes the connection.
 
-Both async feeds run inside a freshly created ``asyncio`` event loop that lives
-in its own daemon thread — no interference with any outer event loop.
+All hub connections use ``websockets 16.0``'s ``async for websocket in
+connect(...)`` infinite-iterator pattern, which provides automatic
+exponential backoff reconnection.  The standalone ``start_kraken_feed`` /
+``start_coinbase_feed`` helpers run one venue each in a freshly created event
+loop in its own daemon thread.
 
 Dependencies
 ------------
-* ``hyperliquid-python-sdk`` (pip install hyperliquid-python-sdk)
 * ``websockets >= 16.0`` (pip install "websockets>=16.0")
+* ``hyperliquid-python-sdk`` (pip install hyperliquid-python-sdk) — only for
+  ``start_hl_feed``
 
 If either package is absent the corresponding feed is skipped and a warning is
 logged; the others continue unaffected.
 
-Exports: start_hl_feed, start_kraken_feed, start_coinbase_feed, start_all_feeds
+Exports: FeedHub, normalize_symbol, split_symbol, venue_key, start_hl_feed,
+start_kraken_feed, start_coinbase_feed, start_all_feeds
 """
 
 from __future__ import annotations
@@ -41,14 +55,21 @@ import asyncio
 import json
 import logging
 import threading
-from typing import TYPE_CHECKING
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterable, Mapping
 
 from ta_lab2.executor.price_cache import PriceCache
-
-if TYPE_CHECKING:
-    pass
+from ta_lab2.executor.tick_recorder import TickRecorder
+from ta_lab2.executor.trigger_book import LatencyTracker
 
 __all__ = [
+    "FeedHub",
+    "normalize_symbol",
+    "split_symbol",
+    "venue_key",
     "start_hl_feed",
     "start_kraken_feed",
     "start_coinbase_feed",
@@ -59,9 +80,13 @@ __all__ = [
 # Constants
 # ---------------------------------------------------------------------------
 
+_HL_WS_URL = "wss://api.hyperliquid.xyz/ws"
 _KRAKEN_WS_URL = "wss://ws.kraken.com/v2"
 _COINBASE_WS_URL = "wss://advanced-trade-ws.coinbase.com"
 
+# Venue tickers that differ from the dim_assets symbol
+_BASE_ALIASES = {"XBT": "BTC", "XDG": "DOGE"}
+
 # ---------------------------------------------------------------------------
 # Hyperliquid feed (SDK WebsocketManager — threading-based)
 # ---------------------------------------------------------------------------
@@ -355,6 +380,435 @@ def start_coinbase_feed(
     return t
 
 
+# ---------------------------------------------------------------------------
+# Symbol normalisation and message parsers
+# ---------------------------------------------------------------------------
+
+
+def split_symbol(symbol: str) -> tuple[str, str | None]:
+    """Split a venue symbol into ``(base, quote)``.
+
+    ``"BTC/USD"`` (Kraken) and ``"BTC-USD"`` (Coinbase) give
+    ``("BTC", "USD")``; a bare Hyperliquid perp name such as ``"BTC"`` has no
+    quote (``None``).  Kraken's legacy ``XBT`` maps to ``BTC``.
+    """
+    base, sep, quote = symbol.replace("/", "-").partition("-")
+    base = base.upper()
+    return _BASE_ALIASES.get(base, base), (quote.upper() if sep else None)
+
+
+def normalize_symbol(symbol: str) -> str:
+    """Return the base ticker for a venue symbol (see ``split_symbol``)."""
+    return split_symbol(symbol)[0]
+
+
+def venue_key(venue: str, base: str) -> str:
+    """PriceCache key of a non-primary venue's price for *base*."""
+    return f"{venue}:{base}"
+
+
+def _iso_to_epoch(value: str | None) -> float | None:
+    """Parse an RFC 3339 timestamp (nanosecond fractions allowed) to epoch s."""
+    if not value:
+        return None
+    head, _, frac = value.rstrip("Z").partition(".")
+    try:
+        ts = datetime.fromisoformat(head + "+00:00").timestamp()
+    except ValueError:
+        return None
+    return ts + float("0." + frac) if frac.isdigit() else ts
+
+
+# Each parser maps one decoded message to
+# (exchange_epoch_ts or None, iterable of (venue_symbol, price)).
+_Parsed = tuple[float | None, Iterable[tuple[str, Any]]]
+
+
+def _parse_hl(msg: dict) -> _Parsed:  # type: ignore[type-arg]
+    if msg.get("channel") != "allMids":
+        return None, ()
+    return None, msg["data"]["mids"].items()
+
+
+def _parse_kraken(msg: dict) -> _Parsed:  # type: ignore[type-arg]
+    if msg.get("channel") != "ticker":
+        return None, ()
+    items = msg.get("data", [])
+    ts = _iso_to_epoch(items[0].get("timestamp")) if items else None
+    return ts, ((item["symbol"], item["last"]) for item in items)
+
+
+def _parse_coinbase(msg: dict) -> _Parsed:  # type: ignore[type-arg]
+    if msg.get("channel") != "ticker":
+        return None, ()
+    return _iso_to_epoch(msg.get("timestamp")), (
+        (ticker["product_id"], ticker["price"])
+        for event in msg.get("events", [])
+        for ticker in event.get("tickers", [])
+    )
+
+
+_PARSERS: dict[str, Callable[[dict], _Parsed]] = {  # type: ignore[type-arg]
+    "hyperliquid": _parse_hl,
+    "kraken": _parse_kraken,
+    "coinbase": _parse_coinbase,
+}
+
+
+# ---------------------------------------------------------------------------
+# FeedHub — all venues on one asyncio loop
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class _VenueStats:
+    """Ingest counters for one venue (written only by the hub loop)."""
+
+    messages: int = 0
+    ticks: int = 0
+    errors: int = 0
+    reconnects: int = 0
+    unmapped: int = 0  # distinct venue symbols with no bound asset_id
+    rejected: int = 0  # distinct venue symbols quoted in another currency
+    connected: bool = False
+    last_tick: float = 0.0  # time.monotonic() of the last tick
+    lag: LatencyTracker = field(default_factory=LatencyTracker)
+    # (monotonic, ticks) samples for rate_per_sec
+    samples: deque[tuple[float, int]] = field(default_factory=deque)
+
+
+class FeedHub:
+    """Multiplex Hyperliquid, Kraken and Coinbase feeds on one event loop.
+
+    Parameters
+    ----------
+    price_cache : PriceCache
+        Shared cache written on every tick.
+    asset_symbols : Mapping[int, str] | None
+        ``dim_assets`` id -> symbol map.  Each pair is bound in the cache so
+        primary-venue symbols normalise straight to the asset's slot.
+        Symbols absent from the map are still cached under their base ticker
+        and counted as ``unmapped``.
+    kraken_symbols : list[str] | None
+        Kraken v2 symbols, e.g. ``["BTC/USD", "ETH/USD"]``; ``None`` or
+        ``[]`` skips Kraken.
+    coinbase_product_ids : list[str] | None
+        Coinbase product IDs, e.g. ``["BTC-USD"]``; ``None`` or ``[]`` skips
+        Coinbase.
+    hyperliquid : bool
+        Subscribe to Hyperliquid ``allMids`` (default True).
+    quote : str
+        Quote currency accepted from venues that send one ("BTC/USD"); pairs
+        in any other quote are dropped and counted as ``rejected``.
+    primary_venue : str | None
+        Venue whose ticks write the base ticker / asset slot read by
+        StopMonitor and PositionSizer.  Other venues write
+        ``venue_key(venue, base)`` slots.  Defaults to the first configured
+        venue (Hyperliquid when enabled).
+    rate_window : int
+        Seconds of history behind ``rate_per_sec`` in ``metrics()``.
+    recorder : TickRecorder | None
+        When given, every normalised tick is also appended to the recorder
+        (see ``executor.replay`` for offline playback).  Only primary-venue
+        ticks are recorded with their asset_id.
+    logger : logging.Logger | None
+        Logger to use.  Defaults to the module logger.
+
+    Example::
+
+        hub = FeedHub(cache, asset_symbols={1: "BTC"}, kraken_symbols=["BTC/USD"])
+        hub.start()
+        hub.metrics()["kraken"]["rate_per_sec"]
+        hub.stop()
+    """
+
+    def __init__(
+        self,
+        price_cache: PriceCache,
+        asset_symbols: Mapping[int, str] | None = None,
+        kraken_symbols: list[str] | None = None,
+        coinbase_product_ids: list[str] | None = None,
+        hyperliquid: bool = True,
+        quote: str = "USD",
+        primary_venue: str | None = None,
+        rate_window: int = 10,
+        recorder: TickRecorder | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.price_cache = price_cache
+        self.quote = quote.upper()
+        self.recorder = recorder
+        self._log = logger or logging.getLogger(__name__)
+        for asset_id, symbol in (asset_symbols or {}).items():
+            price_cache.bind(symbol, asset_id)
+
+        # venue -> (url, subscribe messages sent right after connect)
+        self._venues: dict[str, tuple[str, list[str]]] = {}
+        if hyperliquid:
+            self._venues["hyperliquid"] = (
+                _HL_WS_URL,
+                [
+                    json.dumps(
+                        {"method": "subscribe", "subscription": {"type": "allMids"}}
+                    )
+                ],
+            )
+        if kraken_symbols:
+            self._venues["kraken"] = (
+                _KRAKEN_WS_URL,
+                [
+                    json.dumps(
+                        {
+                            "method": "subscribe",
+                            "params": {"channel": "ticker", "symbol": kraken_symbols},
+                        }
+                    )
+                ],
+            )
+        if coinbase_product_ids:
+            self._venues["coinbase"] = (
+                _COINBASE_WS_URL,
+                [
+                    json.dumps(
+                        {
+                            "type": "subscribe",
+                            "product_ids": coinbase_product_ids,
+                            "channel": "ticker",
+                        }
+                    )
+                ],
+            )
+
+        if primary_venue is None:
+            primary_venue = next(iter(self._venues), None)
+        elif primary_venue not in self._venues:
+            raise ValueError(
+                f"primary_venue={primary_venue!r} is not a configured venue "
+                f"{list(self._venues)}"
+            )
+        self.primary_venue = primary_venue
+
+        # venue -> {venue symbol: PriceCache slot, or -1 if rejected},
+        # filled on first sight
+        self._routes: dict[str, dict[str, int]] = {v: {} for v in self._venues}
+        # slot -> (base symbol, asset_id) for the recorder
+        self._slot_meta: dict[int, tuple[str, int | None]] = {}
+        self._stats = {v: _VenueStats() for v in self._venues}
+        self._rate_window = rate_window
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None  # type: ignore[type-arg]
+        self._thread: threading.Thread | None = None
+
+    @property
+    def venues(self) -> list[str]:
+        """Names of the configured venues."""
+        return list(self._venues)
+
+    # ------------------------------------------------------------------
+    # Ingest (hot path)
+    # ------------------------------------------------------------------
+
+    def ingest(self, venue: str, msg: dict) -> int:  # type: ignore[type-arg]
+        """Write every tick in one decoded *venue* message to the cache.
+
+        Returns the number of ticks written.
+        """
+        stats = self._stats[venue]
+        stats.messages += 1
+        exchange_ts, items = _PARSERS[venue](msg)
+        routes = self._routes[venue]
+        update = self.price_cache.update_slot
+        recorder = self.recorder
+        n = 0
+        for symbol, price in items:
+            slot = routes.get(symbol)
+            if slot is None:
+                slot = self._route(venue, symbol)
+            if slot < 0:
+                continue
+            px = float(price)
+            update(slot, px)
+            if recorder is not None:
+                base, asset_id = self._slot_meta[slot]
+                recorder.record(base, px, asset_id, venue)
+            n += 1
+        if n:
+            stats.ticks += n
+            stats.last_tick = time.monotonic()
+            if exchange_ts is not None:
+                stats.lag.record(max(time.time() - exchange_ts, 0.0))
+        return n
+
+    def _route(self, venue: str, symbol: str) -> int:
+        """Resolve and memoise the cache slot for a new venue symbol.
+
+        Returns -1 (memoised too) for a pair quoted in another currency.
+        """
+        base, quote = split_symbol(symbol)
+        if quote is not None and quote != self.quote:
+            self._stats[venue].rejected += 1
+            self._routes[venue][symbol] = -1
+            return -1
+        cache = self.price_cache
+        asset_id = cache.asset_id(base)
+        if asset_id is None:
+            self._stats[venue].unmapped += 1
+        if venue == self.primary_venue:
+            slot = cache.slot(base)
+        else:
+            # Own slot per venue: never overwrites the primary asset price
+            slot = cache.slot(venue_key(venue, base))
+            asset_id = None
+        self._slot_meta[slot] = (base, asset_id)
+        self._routes[venue][symbol] = slot
+        return slot
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _sample_rates(self, now: float | None = None) -> None:
+        """Record a (time, ticks) sample per venue for ``rate_per_sec``."""
+        now = time.monotonic() if now is None else now
+        for stats in self._stats.values():
+            stats.samples.append((now, stats.ticks))
+            while now - stats.samples[0][0] > self._rate_window:
+                stats.samples.popleft()
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Per-venue ingest metrics.
+
+        ``rate_per_sec`` is the tick rate over the last ``rate_window``
+        seconds (0.0 until two samples exist); ``last_tick_age_s`` is
+        ``inf`` before the first tick; ``lag`` summarises exchange-timestamp
+        to ingest latency (see ``LatencyTracker.snapshot``) for venues whose
+        messages carry a timestamp.
+        """
+        now = time.monotonic()
+        out: dict[str, dict[str, Any]] = {}
+        for venue, stats in self._stats.items():
+            samples = list(stats.samples)
+            rate = 0.0
+            if len(samples) >= 2 and samples[-1][0] > samples[0][0]:
+                rate = (samples[-1][1] - samples[0][1]) / (
+                    samples[-1][0] - samples[0][0]
+                )
+            out[venue] = {
+                "connected": stats.connected,
+                "messages": stats.messages,
+                "ticks": stats.ticks,
+                "errors": stats.errors,
+                "reconnects": stats.reconnects,
+                "unmapped": stats.unmapped,
+                "rejected": stats.rejected,
+                "symbols": len(self._routes[venue]),
+                "rate_per_sec": rate,
+                "last_tick_age_s": (
+                    now - stats.last_tick if stats.last_tick else float("inf")
+                ),
+                "lag": stats.lag.snapshot(),
+            }
+        return out
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    async def _venue_loop(
+        self,
+        venue: str,
+        connect: Callable[[str], Any],
+        closed_exc: type[BaseException] | tuple[()],
+    ) -> None:
+        """One venue connection with auto-reconnect."""
+        url, subscribe_msgs = self._venues[venue]
+        stats = self._stats[venue]
+        self._log.info("FeedHub: connecting %s (%s)", venue, url)
+        async for websocket in connect(url):
+            stats.connected = True
+            try:
+                # Subscribe IMMEDIATELY — Coinbase closes the connection
+                # after 5 s with no subscription.
+                for msg in subscribe_msgs:
+                    await websocket.send(msg)
+                async for raw in websocket:
+                    try:
+                        self.ingest(venue, json.loads(raw))
+                    except Exception:
+                        stats.errors += 1
+                        self._log.exception(
+                            "FeedHub: %s message parse error (non-fatal)", venue
+                        )
+            except closed_exc:
+                self._log.warning(
+                    "FeedHub: %s connection closed; reconnecting...", venue
+                )
+            except Exception:
+                self._log.exception("FeedHub: %s feed error; reconnecting...", venue)
+            finally:
+                stats.connected = False
+            stats.reconnects += 1
+
+    async def _sampler(self) -> None:
+        while True:
+            self._sample_rates()
+            await asyncio.sleep(1.0)
+
+    async def run(self, connect: Callable[[str], Any] | None = None) -> None:
+        """Run every venue connection on the current event loop until cancelled.
+
+        *connect* defaults to ``websockets.connect``; it is called with the
+        venue URL and must return an async iterator of connections.
+        """
+        try:
+            import websockets  # type: ignore[import-untyped]
+        except ImportError:
+            if connect is None:
+                self._log.warning(
+                    "websockets not installed; feed hub disabled. "
+                    "Install with: pip install 'websockets>=16.0'"
+                )
+                return
+            closed_exc: type[BaseException] | tuple[()] = ()
+        else:
+            connect = connect or websockets.connect
+            closed_exc = websockets.ConnectionClosed
+        await asyncio.gather(
+            self._sampler(),
+            *(self._venue_loop(v, connect, closed_exc) for v in self._venues),
+        )
+
+    def start(self) -> threading.Thread:
+        """Start the hub's event loop in a daemon thread and return the thread."""
+
+        def _run() -> None:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            self._task = loop.create_task(self.run())
+            try:
+                loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                self._log.exception("FeedHub thread error")
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=_run, daemon=True, name="feed-hub")
+        self._thread.start()
+        self._log.info("FeedHub daemon thread started (venues=%s)", self.venues)
+        return self._thread
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel all venue connections and join the hub thread."""
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
 # ---------------------------------------------------------------------------
 # Convenience: start all configured feeds
 # ---------------------------------------------------------------------------
@@ -365,14 +819,16 @@ def start_all_feeds(
     kraken_symbols: list[str] | None = None,
     coinbase_product_ids: list[str] | None = None,
     logger: logging.Logger | None = None,
+    asset_symbols: Mapping[int, str] | None = None,
+    recorder: TickRecorder | None = None,
 ) -> list[threading.Thread]:
-    """Start all configured WebSocket feeds.
+    """Start all configured WebSocket feeds on one ``FeedHub`` event loop.
 
     Hyperliquid is always started (primary exchange for VM execution).
     Kraken and Coinbase are started only when their symbol lists are
     provided and non-empty.
 
-    All threads are daemon threads: they die automatically when the main
+    The hub thread is a daemon thread: it dies automatically when the main
     process exits, so no explicit cleanup is needed for normal shutdown.
 
     Parameters
@@ -387,35 +843,35 @@ def start_all_feeds(
         Pass ``None`` or ``[]`` to skip the Coinbase feed.
     logger:
         Logger to use.  Defaults to the module logger.
+    asset_symbols:
+        Optional ``dim_assets`` id -> symbol map used to normalise venue
+        symbols to asset_ids (see ``FeedHub``).
+    recorder:
+        Optional ``TickRecorder`` capturing every normalised tick.
 
     Returns
     -------
     list[threading.Thread]
-        All daemon threads that were started (1–3 threads).
+        The hub's daemon thread.
     """
     log = logger or logging.getLogger(__name__)
-    threads: list[threading.Thread] = []
-
-    # Hyperliquid — always started
-    threads.append(start_hl_feed(price_cache, log))
-
-    # Kraken — only when symbols provided
-    if kraken_symbols:
-        threads.append(start_kraken_feed(price_cache, kraken_symbols, log))
-    else:
+    if not kraken_symbols:
         log.debug("Kraken feed skipped (no symbols provided)")
-
-    # Coinbase — only when product IDs provided
-    if coinbase_product_ids:
-        threads.append(start_coinbase_feed(price_cache, coinbase_product_ids, log))
-    else:
+    if not coinbase_product_ids:
         log.debug("Coinbase feed skipped (no product IDs provided)")
 
+    hub = FeedHub(
+        price_cache,
+        asset_symbols=asset_symbols,
+        kraken_symbols=kraken_symbols,
+        coinbase_product_ids=coinbase_product_ids,
+        recorder=recorder,
+        logger=log,
+    )
+    thread = hub.start()
     log.info(
-        "start_all_feeds: %d feed thread(s) started "
-        "(HL=always, Kraken=%s, Coinbase=%s)",
-        len(threads),
+        "start_all_feeds: feed hub started (HL=always, Kraken=%s, Coinbase=%s)",
         bool(kraken_symbols),
         bool(coinbase_product_ids),
     )
-    return threads
+    return [thread]
@@ -23,6 +23,7 @@ WMA Convention:
 from __future__ import annotations
 
 import math
+from typing import Optional
 
 import numpy as np
 import pandas as pd
@@ -295,3 +296,211 @@ def compute_ama(
         raise ValueError(
             f"Unknown indicator '{indicator}'. Expected one of: KAMA, DEMA, TEMA, HMA."
         )
+
+
+# =============================================================================
+# Incremental State (resume from checkpoint)
+# =============================================================================
+#
+# State vectors are flat float arrays so they can be persisted as
+# DOUBLE PRECISION[]; element 0 is always the number of closes consumed.
+#   KAMA: [n_seen, kama_last, *last min(n_seen, er_period - 1) closes]
+#   DEMA: [n_seen, ema1, old_wt1, ema2, old_wt2]
+#   TEMA: [n_seen, ema1, old_wt1, ema2, old_wt2, ema3, old_wt3]
+#   HMA:  [n_seen, *last min(n_seen, period + sqrt_period - 2) closes]
+# old_wt mirrors pandas' adjust=False ewm bookkeeping (1.0 after an observed
+# value, decayed across NaN gaps), which keeps resumed values bit-identical.
+
+
+def _tail(arr: np.ndarray, k: int) -> np.ndarray:
+    """Last k elements of arr (empty for k <= 0)."""
+    return arr[max(0, len(arr) - k) :] if k > 0 else arr[:0]
+
+
+def _pandas_alpha(alpha: float) -> float:
+    """Effective alpha pandas applies for ewm(alpha=...) (round-trips via com)."""
+    com = 1.0 / alpha - 1
+    return 1.0 / (1.0 + com)
+
+
+def _ewm_resume(
+    values: np.ndarray, weighted: float, old_wt: float, alpha: float
+) -> tuple[np.ndarray, float, float]:
+    """Continue pandas ewm(adjust=False, ignore_na=False).mean() over values."""
+    old_wt_factor = 1.0 - alpha
+    out = np.empty(len(values))
+    for i, cur in enumerate(values):
+        is_observation = cur == cur
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = old_wt * weighted + alpha * cur
+                    weighted /= old_wt + alpha
+                old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted
+    return out, weighted, old_wt
+
+
+def _ewm_last_state(values: np.ndarray, alpha: float) -> tuple[float, float]:
+    """(weighted, old_wt) after pandas ewm over values (vectorised)."""
+    if len(values) == 0:
+        return np.nan, 1.0
+    weighted = float(pd.Series(values).ewm(alpha=alpha, adjust=False).mean().iloc[-1])
+    old_wt = 1.0
+    if weighted == weighted:
+        # Decay across trailing NaNs since the last observation
+        for v in values[::-1]:
+            if v == v:
+                break
+            old_wt *= 1.0 - _pandas_alpha(alpha)
+    return weighted, old_wt
+
+
+def _hma_lookback(period: int) -> int:
+    return period + max(2, int(math.sqrt(period))) - 2
+
+
+def ama_state(
+    close: np.ndarray,
+    indicator: str,
+    params: dict,
+    ama: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Recursion state after consuming a close history (see resume_ama).
+
+    Args:
+        close: Full close history up to and including the checkpoint row.
+        indicator: One of "KAMA", "DEMA", "TEMA", "HMA" (case-insensitive).
+        params: Canonical params dict for the indicator.
+        ama: Optional precomputed AMA values for close (avoids recomputing KAMA).
+
+    Returns:
+        Flat float64 state vector.
+    """
+    close = np.asarray(close, dtype=float)
+    n = float(len(close))
+    ind = indicator.upper()
+
+    if ind == "KAMA":
+        er_period = params["er_period"]
+        if ama is None:
+            ama = compute_kama(
+                close, er_period, params["fast_period"], params["slow_period"]
+            )[0]
+        last = float(ama[-1]) if len(ama) else np.nan
+        return np.concatenate([[n, last], _tail(close, er_period - 1)])
+
+    if ind in ("DEMA", "TEMA"):
+        alpha = 2.0 / (params["period"] + 1)
+        state = [n]
+        stage = pd.Series(close)
+        for _ in range(2 if ind == "DEMA" else 3):
+            w, ow = _ewm_last_state(stage.to_numpy(), alpha)
+            state += [w, ow]
+            stage = stage.ewm(alpha=alpha, adjust=False).mean()
+        return np.array(state, dtype=float)
+
+    if ind == "HMA":
+        return np.concatenate([[n], _tail(close, _hma_lookback(params["period"]))])
+
+    raise ValueError(
+        f"Unknown indicator '{indicator}'. Expected one of: KAMA, DEMA, TEMA, HMA."
+    )
+
+
+def resume_ama(
+    close_new: np.ndarray,
+    indicator: str,
+    params: dict,
+    state: np.ndarray,
+) -> tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+    """
+    Compute AMA values for new closes continuing from a saved state.
+
+    Equivalent to the tail of compute_ama() over the full history: warmup
+    guards use the global row index and KAMA/DEMA/TEMA recursions continue
+    from the stored values instead of re-seeding.
+
+    Args:
+        close_new: Closes after the checkpoint.
+        indicator: One of "KAMA", "DEMA", "TEMA", "HMA" (case-insensitive).
+        params: Canonical params dict for the indicator.
+        state: State vector from ama_state() or a previous resume_ama().
+
+    Returns:
+        Tuple of (ama, er_or_none, new_state).
+    """
+    close_new = np.asarray(close_new, dtype=float)
+    state = np.asarray(state, dtype=float)
+    n_seen = int(state[0])
+    n_total = float(n_seen + len(close_new))
+    ind = indicator.upper()
+
+    if ind == "KAMA":
+        er_period = params["er_period"]
+        fast_period, slow_period = params["fast_period"], params["slow_period"]
+        tail = state[2:]
+        arr = np.concatenate([tail, close_new])
+        k = len(tail)
+
+        if n_seen < er_period:
+            # Not yet seeded: tail holds the whole history
+            kama_all, er_all = compute_kama(arr, er_period, fast_period, slow_period)
+            kama, er = kama_all[k:], er_all[k:]
+        else:
+            fast_sc = 2.0 / (fast_period + 1)
+            slow_sc = 2.0 / (slow_period + 1)
+            kama = np.empty(len(close_new))
+            er = np.empty(len(close_new))
+            prev = state[1]
+            for j, i in enumerate(range(k, len(arr))):
+                direction = abs(arr[i] - arr[i - er_period + 1])
+                volatility = np.sum(np.abs(np.diff(arr[i - er_period + 1 : i + 1])))
+                er[j] = direction / volatility if volatility != 0 else 0.0
+                sc = (er[j] * (fast_sc - slow_sc) + slow_sc) ** 2
+                prev = prev + sc * (arr[i] - prev)
+                kama[j] = prev
+
+        last = kama[-1] if len(kama) else state[1]
+        new_state = np.concatenate([[n_total, last], _tail(arr, er_period - 1)])
+        return kama, er, new_state
+
+    if ind in ("DEMA", "TEMA"):
+        period = params["period"]
+        alpha = _pandas_alpha(2.0 / (period + 1))
+        n_stages = 2 if ind == "DEMA" else 3
+        stages = []
+        new_state = [n_total]
+        values = close_new
+        for s in range(n_stages):
+            values, w, ow = _ewm_resume(
+                values, state[1 + 2 * s], state[2 + 2 * s], alpha
+            )
+            stages.append(values)
+            new_state += [w, ow]
+
+        if ind == "DEMA":
+            ama = 2 * stages[0] - stages[1]
+            warmup = 2 * period - 1
+        else:
+            ama = 3 * stages[0] - 3 * stages[1] + stages[2]
+            warmup = 3 * period - 1
+        # Explicit warmup guard on the global row index
+        ama[: max(0, warmup - n_seen)] = np.nan
+        return ama, None, np.array(new_state, dtype=float)
+
+    if ind == "HMA":
+        period = params["period"]
+        tail = state[1:]
+        arr = np.concatenate([tail, close_new])
+        hma = compute_hma(pd.Series(arr), period).to_numpy()[len(tail) :]
+        new_state = np.concatenate([[n_total], _tail(arr, _hma_lookback(period))])
+        return hma, None, new_state
+
+    raise ValueError(
+        f"Unknown indicator '{indicator}'. Expected one of: KAMA, DEMA, TEMA, HMA."
+    )
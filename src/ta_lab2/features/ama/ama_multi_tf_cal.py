@@ -28,12 +28,13 @@ from typing import Optional
 import pandas as pd
 from sqlalchemy import Engine, text
 
+from ta_lab2.features.ama.ama_params import ALL_AMA_PARAMS
 from ta_lab2.features.ama.base_ama_feature import (
     AMAFeatureConfig,
     BaseAMAFeature,
     TFSpec,
 )
-from ta_lab2.features.ama.ama_params import ALL_AMA_PARAMS
+from ta_lab2.features.feature_utils import ROW_HASH_SQL
 
 logger = logging.getLogger(__name__)
 
@@ -86,9 +87,17 @@ class CalUSAMAFeature(BaseAMAFeature):
     # =========================================================================
 
     def preload_all_bars(
-        self, engine: Engine, asset_id: int, venue_id: int = 1
+        self,
+        engine: Engine,
+        asset_id: int,
+        venue_id: int = 1,
+        since: Optional[dict[str, pd.Timestamp]] = None,
     ) -> None:
-        """Load bars for ALL TFs and venues in a single query and cache."""
+        """Load bars for ALL TFs and venues in a single query and cache.
+
+        TFs in ``since`` load only bars at or after their resume checkpoint.
+        """
+        self._bars_since = dict(since or {})
         params: dict = {"id": asset_id}
         alignment_filter = ""
         if self.config.alignment_source:
@@ -97,9 +106,11 @@ class CalUSAMAFeature(BaseAMAFeature):
 
         sql = text(
             f"""
-            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end
-            FROM {self.bars_schema}.{self.bars_table}
+            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end,
+                   {ROW_HASH_SQL} AS row_hash
+            FROM {self.bars_schema}.{self.bars_table} b
             WHERE id = :id {alignment_filter}
+            {self._since_filter(since, params)}
             ORDER BY venue_id, tf, "timestamp"
             """
         )
@@ -151,7 +162,8 @@ class CalUSAMAFeature(BaseAMAFeature):
         where_sql = " AND ".join(where_clauses)
         sql = text(
             f"""
-            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end
+            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end,
+                   {ROW_HASH_SQL} AS row_hash
             FROM {self.bars_schema}.{self.bars_table}
             WHERE {where_sql}
             ORDER BY "timestamp"
@@ -304,9 +316,17 @@ class CalISOAMAFeature(BaseAMAFeature):
     # =========================================================================
 
     def preload_all_bars(
-        self, engine: Engine, asset_id: int, venue_id: int = 1
+        self,
+        engine: Engine,
+        asset_id: int,
+        venue_id: int = 1,
+        since: Optional[dict[str, pd.Timestamp]] = None,
     ) -> None:
-        """Load bars for ALL TFs and venues in a single query and cache."""
+        """Load bars for ALL TFs and venues in a single query and cache.
+
+        TFs in ``since`` load only bars at or after their resume checkpoint.
+        """
+        self._bars_since = dict(since or {})
         params: dict = {"id": asset_id}
         alignment_filter = ""
         if self.config.alignment_source:
@@ -315,9 +335,11 @@ class CalISOAMAFeature(BaseAMAFeature):
 
         sql = text(
             f"""
-            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end
-            FROM {self.bars_schema}.{self.bars_table}
+            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end,
+                   {ROW_HASH_SQL} AS row_hash
+            FROM {self.bars_schema}.{self.bars_table} b
             WHERE id = :id {alignment_filter}
+            {self._since_filter(since, params)}
             ORDER BY venue_id, tf, "timestamp"
             """
         )
@@ -369,7 +391,8 @@ class CalISOAMAFeature(BaseAMAFeature):
         where_sql = " AND ".join(where_clauses)
         sql = text(
             f"""
-            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end
+            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end,
+                   {ROW_HASH_SQL} AS row_hash
             FROM {self.bars_schema}.{self.bars_table}
             WHERE {where_sql}
             ORDER BY "timestamp"
@@ -39,12 +39,13 @@ from typing import Optional
 import pandas as pd
 from sqlalchemy import Engine, text
 
+from ta_lab2.features.ama.ama_params import ALL_AMA_PARAMS
 from ta_lab2.features.ama.base_ama_feature import (
     AMAFeatureConfig,
     BaseAMAFeature,
     TFSpec,
 )
-from ta_lab2.features.ama.ama_params import ALL_AMA_PARAMS
+from ta_lab2.features.feature_utils import ROW_HASH_SQL
 
 logger = logging.getLogger(__name__)
 
@@ -169,12 +170,15 @@ class MultiTFAMAFeature(BaseAMAFeature):
         engine: Engine,
         asset_id: int,
         venue_id: int = 1,
+        since: Optional[dict[str, pd.Timestamp]] = None,
     ) -> None:
         """
         Load bars for ALL TFs in a single query and cache.
 
-        Call before the TF loop to avoid per-TF DB queries.
+        Call before the TF loop to avoid per-TF DB queries.  TFs in ``since``
+        load only bars at or after their resume checkpoint.
         """
+        self._bars_since = dict(since or {})
         params: dict = {"id": asset_id, "venue_id": venue_id}
         alignment_filter = ""
         if self.config.alignment_source:
@@ -183,9 +187,11 @@ class MultiTFAMAFeature(BaseAMAFeature):
 
         sql = text(
             f"""
-            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end
-            FROM {self.bars_schema}.{self.bars_table}
+            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end,
+                   {ROW_HASH_SQL} AS row_hash
+            FROM {self.bars_schema}.{self.bars_table} b
             WHERE id = :id AND venue_id = :venue_id {alignment_filter}
+            {self._since_filter(since, params)}
             ORDER BY tf, "timestamp"
             """
         )
@@ -240,12 +246,16 @@ class MultiTFAMAFeature(BaseAMAFeature):
         if start_ts is not None:
             where_clauses.append('"timestamp" >= :start_ts')
             params["start_ts"] = start_ts
+        if self.config.alignment_source:
+            where_clauses.append("alignment_source = :alignment_source")
+            params["alignment_source"] = self.config.alignment_source
 
         where_sql = " AND ".join(where_clauses)
 
         sql = text(
             f"""
-            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end
+            SELECT id, venue_id, "timestamp" AS ts, tf, tf_days, is_partial_end AS roll, close, is_partial_end,
+                   {ROW_HASH_SQL} AS row_hash
             FROM {self.bars_schema}.{self.bars_table}
             WHERE {where_sql}
             ORDER BY "timestamp"
@@ -30,10 +30,15 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 from sqlalchemy import Engine, text
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from ta_lab2.features.ama.ama_computations import compute_ama
+from ta_lab2.db.binary_copy import copy_upsert
+from ta_lab2.features.ama.ama_computations import ama_state, compute_ama, resume_ama
 from ta_lab2.features.ama.ama_params import AMAParamSet
+from ta_lab2.features.feature_utils import (
+    ROW_HASH_SQL,
+    checkpoint_fingerprint,
+    source_range,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -100,8 +105,7 @@ class BaseAMAFeature(ABC):
     Common patterns provided by base:
     - compute_for_asset_tf(): Orchestrate AMA computation for all param_sets
     - add_derivatives(): Compute d1, d2, d1_roll, d2_roll per group
-    - write_to_db(): Scoped DELETE + INSERT with column filtering
-    - _pg_upsert(): ON CONFLICT DO UPDATE insert helper
+    - write_to_db(): Scoped DELETE + binary COPY upsert with column filtering
     - _get_table_columns(): Query information_schema for actual columns
     - _get_pk_columns(): Returns AMA PK columns
 
@@ -120,6 +124,11 @@ class BaseAMAFeature(ABC):
         self.engine = engine
         self.config = config
         self._bars_cache: Optional[pd.DataFrame] = None
+        # TFs whose cached bars start at a resume checkpoint (preload since=).
+        self._bars_since: dict[str, pd.Timestamp] = {}
+        # Recursion checkpoints produced by compute_for_asset_tf (one per
+        # param_set and TF); persisted by the refresher for --from-state runs.
+        self.checkpoints: list[dict] = []
 
     # =========================================================================
     # Abstract Methods (subclasses MUST override)
@@ -190,6 +199,9 @@ class BaseAMAFeature(ABC):
         param_sets: list[AMAParamSet],
         start_ts: Optional[pd.Timestamp] = None,
         venue_id: int = 1,
+        resume_states: Optional[dict] = None,
+        context: Optional[pd.DataFrame] = None,
+        src_range: Optional[tuple[int, int]] = None,
     ) -> pd.DataFrame:
         """
         Compute AMA values + derivatives for all param_sets on one (asset_id, tf, venue_id).
@@ -202,6 +214,17 @@ class BaseAMAFeature(ABC):
         4. Call add_derivatives() to compute d1, d2, d1_roll, d2_roll
         5. Return combined DataFrame
 
+        Resume-from-state: when src_range is given (the TF passed
+        resumable_tfs()) and resume_states holds a checkpoint for EVERY
+        param_set, only rows after each checkpoint are computed via
+        resume_ama(); the bars only need to start at the checkpoint row.
+        Otherwise all param_sets are recomputed in full, since write_to_db()
+        deletes per (id, tf) from the batch's minimum ts.
+
+        Whenever the full history is loaded (start_ts is None) or a resume
+        succeeds, a checkpoint at the last canonical row is appended to
+        self.checkpoints.
+
         Args:
             engine: SQLAlchemy engine.
             asset_id: Asset ID.
@@ -210,6 +233,13 @@ class BaseAMAFeature(ABC):
             param_sets: Which AMAParamSet instances to compute.
             start_ts: Optional incremental start timestamp (inclusive).
             venue_id: Venue identifier (FK to dim_venues). Default 1 (CMC_AGG).
+            resume_states: Optional {(indicator, params_hash): {"ckpt_ts",
+                "state_vec", "src_hash"}} checkpoints for this TF.
+            context: Already-written rows (ts, roll, ama, indicator,
+                params_hash) at or before the checkpoints, used to continue
+                d1/d2 across the resume boundary.
+            src_range: Source range (row count, row-hash sum) of the bars up
+                to the checkpoint, from resumable_tfs().
 
         Returns:
             DataFrame with columns: id, venue_id, ts, tf, indicator, params_hash,
@@ -239,13 +269,75 @@ class BaseAMAFeature(ABC):
         # Sort ascending — required for correct diff() derivatives
         bars = bars.sort_values("ts").reset_index(drop=True)
 
+        ts_i8 = pd.DatetimeIndex(bars["ts"]).as_unit("ns").asi8
+        close_arr = bars["close"].to_numpy(dtype=float)
+        canonical_rows = np.flatnonzero(~bars["roll"].to_numpy(dtype=bool))
+        ckpt_row = int(canonical_rows[-1]) if canonical_rows.size else -1
+
+        resume_from = None
+        if src_range is not None:
+            resume_from = self._match_resume_states(
+                param_sets, resume_states, context, ts_i8, bars["roll"]
+            )
+            if resume_from is None:
+                logger.info(
+                    "Resume state unusable for asset_id=%s tf=%s; full recompute",
+                    asset_id,
+                    tf,
+                )
+                # The cached bars may start at the checkpoint: reload them all.
+                cache = self._bars_cache
+                if tf in self._bars_since:
+                    self._bars_cache = None
+                try:
+                    return self.compute_for_asset_tf(
+                        engine, asset_id, tf, tf_days, param_sets, venue_id=venue_id
+                    )
+                finally:
+                    self._bars_cache = cache
+        row_hash = (
+            bars["row_hash"].to_numpy(dtype=np.int64)
+            if "row_hash" in bars.columns
+            else None
+        )
+
         all_rows: list[pd.DataFrame] = []
 
         for ps in param_sets:
             try:
-                ama_values, er_values = compute_ama(
-                    bars["close"], ps.indicator, ps.params
-                )
+                if resume_from is not None:
+                    r, state = resume_from[(ps.indicator, ps.params_hash)]
+                    ama_head, er_head, ckpt_state = resume_ama(
+                        close_arr[r + 1 : ckpt_row + 1],
+                        ps.indicator,
+                        ps.params,
+                        state,
+                    )
+                    ama_tail, er_tail, _ = resume_ama(
+                        close_arr[ckpt_row + 1 :], ps.indicator, ps.params, ckpt_state
+                    )
+                    ama_values = pd.Series(np.concatenate([ama_head, ama_tail]))
+                    er_values = (
+                        pd.Series(np.concatenate([er_head, er_tail]))
+                        if er_head is not None
+                        else None
+                    )
+                    rows = slice(r + 1, None)
+                else:
+                    ama_values, er_values = compute_ama(
+                        bars["close"], ps.indicator, ps.params
+                    )
+                    ckpt_state = (
+                        ama_state(
+                            close_arr[: ckpt_row + 1],
+                            ps.indicator,
+                            ps.params,
+                            ama=ama_values.to_numpy()[: ckpt_row + 1],
+                        )
+                        if ckpt_row >= 0
+                        else None
+                    )
+                    rows = slice(None)
             except Exception as exc:
                 logger.warning(
                     "compute_ama failed for asset_id=%s tf=%s indicator=%s params_hash=%s: %s",
@@ -257,14 +349,42 @@ class BaseAMAFeature(ABC):
                 )
                 continue
 
+            if (
+                (start_ts is None or resume_from is not None)
+                and row_hash is not None
+                and ckpt_state is not None
+                and not np.isnan(close_arr[ckpt_row])
+            ):
+                if resume_from is not None:
+                    r0 = resume_from[(ps.indicator, ps.params_hash)][0]
+                    ckpt_range = source_range(
+                        row_hash[r0 + 1 : ckpt_row + 1], src_range
+                    )
+                else:
+                    ckpt_range = source_range(row_hash[: ckpt_row + 1])
+                self.checkpoints.append(
+                    {
+                        "id": asset_id,
+                        "venue_id": venue_id,
+                        "tf": tf,
+                        "indicator": ps.indicator,
+                        "params_hash": ps.params_hash,
+                        "ckpt_ts": bars["ts"].iloc[ckpt_row],
+                        "state_vec": [float(v) for v in ckpt_state],
+                        "src_hash": checkpoint_fingerprint(ckpt_range),
+                    }
+                )
+
+            bars_out = bars.iloc[rows]
+
             # ts column: use .tolist() to preserve tz-awareness on Windows
-            ts_list = bars["ts"].tolist()
+            ts_list = bars_out["ts"].tolist()
 
             # er column: NULL (NaN) for non-KAMA indicators
             if er_values is not None:
                 er_list = er_values.tolist()
             else:
-                er_list = [np.nan] * len(bars)
+                er_list = [np.nan] * len(bars_out)
 
             df_ps = pd.DataFrame(
                 {
@@ -275,7 +395,7 @@ class BaseAMAFeature(ABC):
                     "indicator": ps.indicator,
                     "params_hash": ps.params_hash,
                     "tf_days": tf_days,
-                    "roll": bars["roll"].tolist(),
+                    "roll": bars_out["roll"].tolist(),
                     "ama": ama_values.tolist(),
                     "er": er_list,
                 }
@@ -286,13 +406,196 @@ class BaseAMAFeature(ABC):
         if not all_rows:
             return pd.DataFrame()
 
+        if resume_from is not None:
+            # Prepend already-written rows so d1/d2 continue across the
+            # checkpoint, then drop them again after add_derivatives().
+            ctx = context[["indicator", "params_hash", "ts", "roll", "ama"]].copy()
+            ctx["ts"] = pd.to_datetime(ctx["ts"], utc=True)
+            ctx = ctx.assign(
+                id=asset_id, venue_id=venue_id, tf=tf, tf_days=tf_days, _ctx=True
+            )
+            all_rows.insert(0, ctx)
+
         df_combined = pd.concat(all_rows, ignore_index=True)
 
         # Add derivatives
         df_combined = self.add_derivatives(df_combined)
 
+        if "_ctx" in df_combined.columns:
+            df_combined = (
+                df_combined[df_combined["_ctx"].isna()]
+                .drop(columns="_ctx")
+                .reset_index(drop=True)
+            )
+
         return df_combined
 
+    def _match_resume_states(
+        self,
+        param_sets: list[AMAParamSet],
+        resume_states: Optional[dict],
+        context: Optional[pd.DataFrame],
+        ts_i8: np.ndarray,
+        roll: pd.Series,
+    ) -> Optional[dict]:
+        """
+        Locate resume checkpoints for all param_sets of one (asset, tf).
+
+        The source history up to the checkpoints is validated beforehand by
+        resumable_tfs(); here each checkpoint row must be loaded and canonical.
+
+        Returns:
+            {(indicator, params_hash): (checkpoint row, state_vec)} when every
+            param_set can resume, else None (full recompute).
+        """
+        if not resume_states or context is None or context.empty:
+            return None
+
+        roll_arr = roll.to_numpy(dtype=bool)
+        matched: dict = {}
+        for ps in param_sets:
+            key = (ps.indicator, ps.params_hash)
+            st = resume_states.get(key)
+            if st is None:
+                return None
+            ckpt_i8 = pd.Timestamp(st["ckpt_ts"]).as_unit("ns").value
+            r = int(np.searchsorted(ts_i8, ckpt_i8))
+            if r >= len(ts_i8) or ts_i8[r] != ckpt_i8 or roll_arr[r]:
+                return None
+            has_ctx = (context["indicator"] == ps.indicator) & (
+                context["params_hash"] == ps.params_hash
+            )
+            if not has_ctx.any():
+                return None
+            matched[key] = (r, np.asarray(st["state_vec"], dtype=float))
+        return matched
+
+    def resumable_tfs(
+        self,
+        engine: Engine,
+        asset_id: int,
+        venue_id: int,
+        param_sets: list[AMAParamSet],
+        recursion_states: dict,
+        context: Optional[pd.DataFrame] = None,
+    ) -> dict[str, tuple[pd.Timestamp, tuple[int, int]]]:
+        """
+        TFs of one (asset, venue) whose recursion checkpoints can be resumed.
+
+        A TF qualifies when every param_set has a checkpoint at one shared ts
+        and fingerprint, already-written context rows exist for each, and the
+        fingerprint still matches the source range (row count, row-hash sum)
+        of the bars up to the checkpoint, recomputed in Postgres. Restating
+        any bar at or before the checkpoint therefore forces a full recompute.
+
+        Returns:
+            {tf: (ckpt_ts, src_range)}. Pass ckpt_ts to preload_all_bars()
+            (since=) and compute_for_asset_tf() (start_ts=), and src_range to
+            compute_for_asset_tf().
+        """
+        if context is None or context.empty:
+            return {}
+        ps_keys = [(ps.indicator, ps.params_hash) for ps in param_sets]
+        candidates: dict[str, tuple[pd.Timestamp, str]] = {}
+        for tf, states in recursion_states.items():
+            if not ps_keys or any(k not in states for k in ps_keys):
+                continue
+            ckpts = {
+                (pd.Timestamp(states[k]["ckpt_ts"]), states[k]["src_hash"])
+                for k in ps_keys
+            }
+            tf_ctx = context[context["tf"] == tf]
+            written = set(zip(tf_ctx["indicator"], tf_ctx["params_hash"]))
+            if len(ckpts) == 1 and written.issuperset(ps_keys):
+                candidates[tf] = ckpts.pop()
+        if not candidates:
+            return {}
+
+        ranges = self._read_checkpoint_ranges(
+            engine,
+            asset_id,
+            venue_id,
+            {tf: ckpt_ts for tf, (ckpt_ts, _) in candidates.items()},
+        )
+        valid: dict[str, tuple[pd.Timestamp, tuple[int, int]]] = {}
+        for tf, (ckpt_ts, src_hash) in candidates.items():
+            src_range = ranges.get(tf)
+            if src_range is None or checkpoint_fingerprint(src_range) != src_hash:
+                logger.info(
+                    "Source bars restated before checkpoint for asset_id=%s tf=%s;"
+                    " full recompute",
+                    asset_id,
+                    tf,
+                )
+                continue
+            valid[tf] = (ckpt_ts, src_range)
+        return valid
+
+    def _read_checkpoint_ranges(
+        self,
+        engine: Engine,
+        asset_id: int,
+        venue_id: int,
+        ckpts: dict[str, pd.Timestamp],
+    ) -> dict[str, tuple[int, int]]:
+        """
+        Source range of each TF's bars up to its checkpoint, computed in Postgres.
+
+        TFs whose checkpoint ts is no longer a canonical bar are omitted.
+        """
+        tfs = list(ckpts)
+        params: dict = {
+            "id": asset_id,
+            "venue_id": venue_id,
+            "c_tfs": tfs,
+            "c_ts": [pd.Timestamp(ckpts[tf]).to_pydatetime() for tf in tfs],
+        }
+        alignment_filter = ""
+        if self.config.alignment_source:
+            alignment_filter = "AND b.alignment_source = :alignment_source"
+            params["alignment_source"] = self.config.alignment_source
+
+        sql = text(
+            f"""
+            SELECT c.tf, COUNT(*) AS n, SUM({ROW_HASH_SQL}) AS s
+            FROM unnest(CAST(:c_tfs AS text[]), CAST(:c_ts AS timestamptz[]))
+                 AS c(tf, ckpt_ts)
+            JOIN {self.bars_schema}.{self.bars_table} b
+              ON b.tf = c.tf AND b."timestamp" <= c.ckpt_ts
+            WHERE b.id = :id AND b.venue_id = :venue_id {alignment_filter}
+            GROUP BY c.tf
+            HAVING bool_or(b."timestamp" = c.ckpt_ts AND NOT b.is_partial_end)
+            """
+        )
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(sql, params).fetchall()
+        except Exception as exc:
+            logger.warning(
+                "_read_checkpoint_ranges: failed for asset_id=%s — %s", asset_id, exc
+            )
+            return {}
+        return {tf: (int(n), int(s)) for tf, n, s in rows}
+
+    @staticmethod
+    def _since_filter(since: Optional[dict[str, pd.Timestamp]], params: dict) -> str:
+        """
+        SQL keeping bars of each TF in ``since`` at or after its bound.
+
+        The query must alias the bars table ``b``; other TFs keep all rows.
+        """
+        if not since:
+            return ""
+        tfs = list(since)
+        params["since_tfs"] = tfs
+        params["since_ts"] = [pd.Timestamp(since[tf]).to_pydatetime() for tf in tfs]
+        return (
+            'AND b."timestamp" >= COALESCE(('
+            "SELECT s.ts FROM unnest(CAST(:since_tfs AS text[]), "
+            "CAST(:since_ts AS timestamptz[])) AS s(tf, ts) "
+            "WHERE s.tf = b.tf), '-infinity'::timestamptz)"
+        )
+
     # =========================================================================
     # Concrete: Derivative Computation
     # =========================================================================
@@ -366,7 +669,8 @@ class BaseAMAFeature(ABC):
         1. Filter df columns to actual DB columns via _get_table_columns()
         2. For each unique tf in the batch:
            a. DELETE WHERE id IN (...) AND tf = ...
-           b. INSERT via _pg_upsert() with ON CONFLICT DO UPDATE as safety net
+        3. Binary COPY upsert (ON CONFLICT DO UPDATE as safety net) in the
+           same transaction as the DELETEs
 
         This avoids UniqueViolation on re-runs while maintaining clean incremental
         writes (existing rows for newer ts not in this batch are NOT deleted).
@@ -398,14 +702,18 @@ class BaseAMAFeature(ABC):
 
         # Stamp alignment_source on df_write after column filtering.
         # The source DataFrame never has this column; we add it here so that
-        # to_sql() includes it in the INSERT and the ON CONFLICT logic uses it.
+        # the COPY includes it in the INSERT and the ON CONFLICT logic uses it.
         if self.config.alignment_source:
             df_write["alignment_source"] = self.config.alignment_source
 
-        unique_ids = df_write["id"].unique().tolist()
         unique_tfs = df_write["tf"].unique().tolist()
 
-        total_rows = 0
+        # Deduplicate on PK columns to prevent CardinalityViolation
+        # ("ON CONFLICT DO UPDATE command cannot affect row a second time")
+        pk_cols = self._get_pk_columns()
+        pk_overlap = [c for c in pk_cols if c in df_write.columns]
+        if pk_overlap:
+            df_write = df_write.drop_duplicates(subset=pk_overlap, keep="last")
 
         with engine.begin() as conn:
             for tf in unique_tfs:
@@ -453,67 +761,13 @@ class BaseAMAFeature(ABC):
                     )
                     conn.execute(delete_sql, {"tf": tf, "min_ts": min_ts})
 
-            # INSERT the full batch (all tfs) using _pg_upsert safety net
-            # We use to_sql with the custom _pg_upsert method
-            _ = unique_ids  # referenced above to keep linter happy
-
-        # Deduplicate on PK columns to prevent CardinalityViolation
-        # ("ON CONFLICT DO UPDATE command cannot affect row a second time")
-        pk_cols = self._get_pk_columns()
-        pk_overlap = [c for c in pk_cols if c in df_write.columns]
-        if pk_overlap:
-            df_write = df_write.drop_duplicates(subset=pk_overlap, keep="last")
-
-        # Now use to_sql for the actual insert (needs its own connection)
-        rows = df_write.to_sql(
-            table,
-            engine,
-            schema=schema,
-            if_exists="append",
-            index=False,
-            method=self._pg_upsert,
-            chunksize=10000,
-        )
-        total_rows = int(rows) if rows is not None else len(df_write)
-
-        return total_rows
-
-    def _pg_upsert(self, pd_table, conn, keys, data_iter):
-        """
-        Custom insert method for pandas to_sql: INSERT ... ON CONFLICT DO UPDATE.
-
-        Used as the `method` argument to DataFrame.to_sql(). Provides a safety
-        net for concurrent writes — the scoped DELETE in write_to_db handles
-        most duplicates, but ON CONFLICT ensures correctness under any scenario.
-
-        Args:
-            pd_table: pandas SQLTable object (provides .table for reflected metadata).
-            conn: SQLAlchemy connection (within transaction).
-            keys: List of column names.
-            data_iter: Iterator of row tuples.
-
-        Returns:
-            Number of rows affected.
-        """
-        data = [dict(zip(keys, row)) for row in data_iter]
-        if not data:
-            return 0
-
-        stmt = pg_insert(pd_table.table).values(data)
-
-        pk_cols = self._get_pk_columns()
-        update_dict = {key: stmt.excluded[key] for key in keys if key not in pk_cols}
-
-        if update_dict:
-            upsert_stmt = stmt.on_conflict_do_update(
-                index_elements=pk_cols,
-                set_=update_dict,
+            # Binary COPY upsert on the same connection: ON CONFLICT is the
+            # safety net for concurrent writers, the DELETE handles re-runs.
+            stats = copy_upsert(
+                conn.connection, f"{schema}.{table}", df_write, pk_overlap
             )
-        else:
-            upsert_stmt = stmt.on_conflict_do_nothing(index_elements=pk_cols)
 
-        result = conn.execute(upsert_stmt)
-        return result.rowcount
+        return stats.affected if stats.affected >= 0 else len(df_write)
 
     # =========================================================================
     # Concrete: Helpers
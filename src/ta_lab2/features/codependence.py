@@ -0,0 +1,461 @@
+"""
+Panel codependence engine: pairwise metrics for every pair of a set of series.
+
+Computes the same four metrics as ``compute_codependence`` in
+``scripts/features/codependence_feature`` (Pearson, distance correlation,
+k-NN mutual information, variation of information) for many pairs at once:
+
+- Distance covariance uses the O(n log n) algorithm in ``microstructure``
+  (no n x n distance matrices).
+- Per-asset work -- sort order, y ranks, distance row sums, self distance
+  covariance, centring for Pearson, quantile codes and their entropy -- is
+  done once per (asset, length) and reused by every pair of that asset.
+  Pairs whose aligned windows contain NaNs are prepared from their common
+  non-NaN rows instead, as before.
+- Pairs are split into blocks and fanned out over a process pool; the
+  series and the prepared assets are shipped once per worker.
+
+Alignment follows ``compute_codependence``: both series are cut to their
+shortest length (most recent bars) and then to rows where both are finite.
+
+The k-NN mutual information reproduces ``pairwise_mi`` (sklearn's
+``mutual_info_regression`` with ``random_state=42``) exactly: the scaling and
+tie-breaking noise only depend on one series and its length, so they are part
+of the per-asset preparation, and the Kraskov neighbour counts come from a
+compiled sweep over the sorted marginals instead of KD-trees.
+
+Public API:
+    AssetPrep, prepare_series(values, n_bins=10) -> AssetPrep
+    pair_codependence(x, y, n_bins=10, min_obs=30) -> dict
+    codependence_panel(series, pairs=None, workers=1, ...) -> pd.DataFrame
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import log
+from typing import NamedTuple
+
+import numba as nb
+import numpy as np
+import pandas as pd
+from scipy.special import digamma
+from sklearn.preprocessing import scale
+
+from ta_lab2.features.microstructure import (
+    _abs_dev_row_sums,
+    _dcov_cross_term,
+    _dense_ranks,
+    dcor_from_dcov,
+    quantile_encode,
+    shannon_entropy,
+)
+
+__all__ = [
+    "METRIC_COLUMNS",
+    "AssetPrep",
+    "codependence_panel",
+    "pair_codependence",
+    "prepare_series",
+]
+
+logger = logging.getLogger(__name__)
+
+METRIC_COLUMNS = [
+    "pearson_corr",
+    "distance_corr",
+    "mutual_info",
+    "variation_of_info",
+    "n_obs",
+]
+
+# Pairs per task handed to a pool worker.
+_DEFAULT_BLOCK_SIZE = 2000
+
+# Neighbours of the k-NN (Kraskov) MI estimator, as in ``pairwise_mi``.
+_MI_NEIGHBORS = 3
+
+
+class AssetPrep(NamedTuple):
+    """Per-asset quantities shared by every pair the asset takes part in."""
+
+    values: np.ndarray  # NaN-free observations
+    order: np.ndarray  # ascending argsort of values
+    ranks: np.ndarray  # dense ranks of values
+    row_sums: np.ndarray  # sum_j |x_i - x_j|
+    dcov_self: float  # squared distance covariance with itself
+    z: np.ndarray  # centred, unit-norm values (Pearson = z_a @ z_b)
+    codes: np.ndarray  # quantile_encode(values, n_bins)
+    entropy: float  # shannon_entropy(codes)
+    mi_x: np.ndarray  # scaled + noised as the MI feature (first asset of a pair)
+    mi_x_order: np.ndarray
+    mi_y: np.ndarray  # scaled + noised as the MI target (second asset)
+    mi_y_order: np.ndarray
+
+
+def prepare_series(values: np.ndarray, n_bins: int = 10) -> AssetPrep:
+    """Precompute the per-asset part of every codependence metric.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        1-D NaN-free observations.
+    n_bins : int
+        Number of quantile bins for the variation of information.
+
+    Returns
+    -------
+    AssetPrep
+    """
+    x = np.ascontiguousarray(values, dtype=np.float64).ravel()
+    n = len(x)
+    order = np.argsort(x, kind="mergesort")
+    ranks = _dense_ranks(x)
+    row_sums = _abs_dev_row_sums(x, order)
+
+    xs = x[order]
+    cross = _dcov_cross_term(xs, xs, ranks[order])
+    total = row_sums.sum()
+    dcov_self = float(
+        cross / n**2 - 2.0 * (row_sums @ row_sums) / n**3 + total * total / n**4
+    )
+
+    dev = x - x.mean()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = dev / np.sqrt(dev @ dev)
+
+    codes = quantile_encode(x, n_bins=n_bins)
+    mi_x, mi_y = _mi_inputs(x)
+    return AssetPrep(
+        values=x,
+        order=order,
+        ranks=ranks,
+        row_sums=row_sums,
+        dcov_self=dcov_self,
+        z=z,
+        codes=codes,
+        entropy=shannon_entropy(codes),
+        mi_x=mi_x,
+        mi_x_order=np.argsort(mi_x, kind="mergesort"),
+        mi_y=mi_y,
+        mi_y_order=np.argsort(mi_y, kind="mergesort"),
+    )
+
+
+def _mi_inputs(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """x as ``mutual_info_regression(..., random_state=42)`` sees it.
+
+    sklearn scales the feature and the target by their standard deviation
+    and adds 1e-10-scale noise: the feature gets the first n normals of
+    ``RandomState(42)``, the target the next n.
+    """
+    n = len(x)
+    rng = np.random.RandomState(42)
+    feature = scale(x.reshape(-1, 1), with_mean=False)
+    means = np.maximum(1, np.mean(np.abs(feature), axis=0))
+    feature += 1e-10 * means * rng.standard_normal(size=(n, 1))
+    target = scale(x, with_mean=False)
+    target += (
+        1e-10 * np.maximum(1, np.mean(np.abs(target))) * rng.standard_normal(size=n)
+    )
+    return feature.ravel(), target
+
+
+@nb.njit(cache=True)
+def _knn_radius(x: np.ndarray, y: np.ndarray, x_order: np.ndarray, k: int):
+    """Chebyshev distance of every point to its k-th nearest neighbour.
+
+    Sweeps outwards from each point along the x-sorted order and stops once
+    the x gap alone reaches the current k-th best distance.
+    """
+    n = len(x)
+    out = np.empty(n)
+    best = np.empty(k)
+    for p in range(n):
+        i = x_order[p]
+        xi = x[i]
+        yi = y[i]
+        for m in range(k):
+            best[m] = np.inf
+        lo = p - 1
+        hi = p + 1
+        while lo >= 0 or hi < n:
+            dlo = abs(x[x_order[lo]] - xi) if lo >= 0 else np.inf
+            dhi = abs(x[x_order[hi]] - xi) if hi < n else np.inf
+            if dlo <= dhi:
+                j = x_order[lo]
+                dx = dlo
+                lo -= 1
+            else:
+                j = x_order[hi]
+                dx = dhi
+                hi += 1
+            if dx >= best[k - 1]:
+                break
+            d = max(dx, abs(y[j] - yi))
+            if d < best[k - 1]:
+                m = k - 1
+                while m > 0 and best[m - 1] > d:
+                    best[m] = best[m - 1]
+                    m -= 1
+                best[m] = d
+        out[i] = best[k - 1]
+    return out
+
+
+@nb.njit(cache=True)
+def _count_within(v: np.ndarray, order: np.ndarray, radius: np.ndarray):
+    """For every point, the number of other points with ``|v_j - v_i| <= r_i``."""
+    n = len(v)
+    out = np.empty(n)
+    for p in range(n):
+        i = order[p]
+        vi = v[i]
+        r = radius[i]
+        c = 0
+        q = p - 1
+        while q >= 0 and abs(v[order[q]] - vi) <= r:
+            c += 1
+            q -= 1
+        q = p + 1
+        while q < n and abs(v[order[q]] - vi) <= r:
+            c += 1
+            q += 1
+        out[i] = c
+    return out
+
+
+def _ksg_mi(pa: AssetPrep, pb: AssetPrep, k: int = _MI_NEIGHBORS) -> float:
+    """Kraskov MI of (a as feature, b as target); equals ``pairwise_mi``."""
+    n = len(pa.mi_x)
+    if n < k + 1:
+        return 0.0
+    radius = np.nextafter(_knn_radius(pa.mi_x, pb.mi_y, pa.mi_x_order, k), 0)
+    nx = _count_within(pa.mi_x, pa.mi_x_order, radius)
+    ny = _count_within(pb.mi_y, pb.mi_y_order, radius)
+    mi = digamma(n) + digamma(k) - np.mean(digamma(nx + 1)) - np.mean(digamma(ny + 1))
+    return float(max(0, mi))
+
+
+def _encoded_mi(codes_a: np.ndarray, codes_b: np.ndarray, n_bins: int) -> float:
+    """``sklearn.metrics.mutual_info_score`` of two code arrays, via bincount."""
+    joint = np.bincount(codes_a * n_bins + codes_b, minlength=n_bins * n_bins)
+    joint = joint.reshape(n_bins, n_bins)
+    pi = joint.sum(axis=1)
+    pj = joint.sum(axis=0)
+    if np.count_nonzero(pi) == 1 or np.count_nonzero(pj) == 1:
+        return 0.0
+    nzx, nzy = np.nonzero(joint)
+    nz_val = joint[nzx, nzy]
+    n = float(joint.sum())
+    contingency_nm = nz_val / n
+    outer = pi[nzx].astype(np.int64) * pj[nzy].astype(np.int64)
+    log_outer = -np.log(outer) + 2.0 * log(n)
+    mi = contingency_nm * (np.log(nz_val) - log(n)) + contingency_nm * log_outer
+    mi = np.where(np.abs(mi) < np.finfo(mi.dtype).eps, 0.0, mi)
+    return float(max(mi.sum(), 0.0))
+
+
+def _metrics_from_preps(pa: AssetPrep, pb: AssetPrep, n_bins: int) -> tuple:
+    """(pearson, dcor, mi, vi) for two prepared series of equal length."""
+    n = len(pa.values)
+    order = pa.order
+    cross = _dcov_cross_term(pa.values[order], pb.values[order], pb.ranks[order])
+    dcov_xy = (
+        cross / n**2
+        - 2.0 * (pa.row_sums @ pb.row_sums) / n**3
+        + pa.row_sums.sum() * pb.row_sums.sum() / n**4
+    )
+    dcor = dcor_from_dcov(dcov_xy, pa.dcov_self, pb.dcov_self)
+
+    # np.corrcoef clips to [-1, 1]; NaN when either series is constant
+    pearson = float(np.clip(pa.z @ pb.z, -1.0, 1.0))
+
+    mi = _ksg_mi(pa, pb)
+
+    mi_codes = _encoded_mi(pa.codes, pb.codes, n_bins)
+    vi = float(max(pa.entropy + pb.entropy - 2.0 * mi_codes, 0.0))
+    return pearson, dcor, mi, vi
+
+
+def _nan_metrics(n_obs: int) -> tuple:
+    return np.nan, np.nan, np.nan, np.nan, n_obs
+
+
+def _masked_pair(x: np.ndarray, y: np.ndarray, n_bins: int, min_obs: int) -> tuple:
+    """Metrics for a pair aligned to the shortest length and common non-NaN rows."""
+    min_len = min(len(x), len(y))
+    x = x[len(x) - min_len :]
+    y = y[len(y) - min_len :]
+    mask = ~(np.isnan(x) | np.isnan(y))
+    n_obs = int(mask.sum())
+    if n_obs < min_obs:
+        return _nan_metrics(n_obs)
+    pa = prepare_series(x[mask], n_bins)
+    pb = prepare_series(y[mask], n_bins)
+    return (*_metrics_from_preps(pa, pb, n_bins), n_obs)
+
+
+def pair_codependence(
+    x: np.ndarray, y: np.ndarray, n_bins: int = 10, min_obs: int = 30
+) -> dict:
+    """All codependence metrics for a single pair of series.
+
+    Parameters
+    ----------
+    x, y : np.ndarray
+        1-D return series; aligned to the most recent ``min(len)`` bars and
+        to rows where both are finite.
+    n_bins : int
+        Quantile bins for the variation of information.
+    min_obs : int
+        Fewer common observations than this gives NaN metrics.
+
+    Returns
+    -------
+    dict
+        Keys: pearson_corr, distance_corr, mutual_info, variation_of_info,
+        n_obs.
+    """
+    values = _masked_pair(
+        np.asarray(x, dtype=np.float64).ravel(),
+        np.asarray(y, dtype=np.float64).ravel(),
+        n_bins,
+        min_obs,
+    )
+    return dict(zip(METRIC_COLUMNS, values))
+
+
+# ---------------------------------------------------------------------------
+# Panel driver (state lives in module globals so pool workers receive it once)
+# ---------------------------------------------------------------------------
+
+_SERIES: dict[int, np.ndarray] = {}
+_FINITE_TAIL: dict[int, int] = {}
+_PREPS: dict[tuple[int, int], AssetPrep] = {}
+_N_BINS = 10
+_MIN_OBS = 30
+
+
+def _finite_tail(values: np.ndarray) -> int:
+    """Number of trailing finite values."""
+    bad = np.flatnonzero(~np.isfinite(values))
+    return len(values) if len(bad) == 0 else len(values) - 1 - int(bad[-1])
+
+
+def _init_state(
+    series: dict[int, np.ndarray],
+    preps: dict[tuple[int, int], AssetPrep],
+    n_bins: int,
+    min_obs: int,
+) -> None:
+    global _SERIES, _FINITE_TAIL, _PREPS, _N_BINS, _MIN_OBS
+    _SERIES = series
+    _FINITE_TAIL = {k: _finite_tail(v) for k, v in series.items()}
+    _PREPS = dict(preps)
+    _N_BINS = n_bins
+    _MIN_OBS = min_obs
+
+
+def _prep(asset_id: int, length: int) -> AssetPrep:
+    key = (asset_id, length)
+    prep = _PREPS.get(key)
+    if prep is None:
+        prep = prepare_series(_SERIES[asset_id][-length:], _N_BINS)
+        _PREPS[key] = prep
+    return prep
+
+
+def _pair_metrics(id_a: int, id_b: int) -> tuple:
+    x = _SERIES[id_a]
+    y = _SERIES[id_b]
+    min_len = min(len(x), len(y))
+    if _FINITE_TAIL[id_a] < min_len or _FINITE_TAIL[id_b] < min_len:
+        return _masked_pair(x, y, _N_BINS, _MIN_OBS)
+    if min_len < _MIN_OBS:
+        return _nan_metrics(min_len)
+    pa = _prep(id_a, min_len)
+    pb = _prep(id_b, min_len)
+    return (*_metrics_from_preps(pa, pb, _N_BINS), min_len)
+
+
+def _run_block(block: list[tuple[int, int]]) -> list[tuple]:
+    """Metrics for a block of pairs. Module-level for process-pool pickling."""
+    return [_pair_metrics(a, b) for a, b in block]
+
+
+def codependence_panel(
+    series: dict[int, np.ndarray],
+    pairs: list[tuple[int, int]] | None = None,
+    *,
+    workers: int = 1,
+    block_size: int = _DEFAULT_BLOCK_SIZE,
+    n_bins: int = 10,
+    min_obs: int = 30,
+) -> pd.DataFrame:
+    """Codependence metrics for many asset pairs.
+
+    Parameters
+    ----------
+    series : dict[int, np.ndarray]
+        Asset id -> 1-D chronological return series (may contain NaNs).
+    pairs : list[tuple[int, int]], optional
+        Pairs to compute. Default: every (id_a, id_b) with id_a < id_b.
+    workers : int
+        Process-pool size. 1 computes in-process.
+    block_size : int
+        Pairs per pool task.
+    n_bins : int
+        Quantile bins for the variation of information.
+    min_obs : int
+        Pairs with fewer common observations get NaN metrics.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns id_a, id_b, pearson_corr, distance_corr, mutual_info,
+        variation_of_info, n_obs; one row per pair, in ``pairs`` order.
+    """
+    series = {
+        int(k): np.ascontiguousarray(v, dtype=np.float64).ravel()
+        for k, v in series.items()
+    }
+    if pairs is None:
+        pairs = list(combinations(sorted(series), 2))
+    columns = ["id_a", "id_b", *METRIC_COLUMNS]
+    if not pairs:
+        return pd.DataFrame(columns=columns)
+
+    # Prepare each NaN-free asset once at its full length; other lengths are
+    # prepared lazily (once per worker) when a pair needs them.
+    used = {i for pair in pairs for i in pair}
+    preps = {
+        (i, len(series[i])): prepare_series(series[i], n_bins)
+        for i in sorted(used)
+        if len(series[i]) >= min_obs and np.isfinite(series[i]).all()
+    }
+
+    blocks = [pairs[i : i + block_size] for i in range(0, len(pairs), block_size)]
+    results: list[tuple] = []
+    if workers <= 1 or len(blocks) == 1:
+        _init_state(series, preps, n_bins, min_obs)
+        for block in blocks:
+            results.extend(_run_block(block))
+            logger.info("  progress: %d/%d pairs", len(results), len(pairs))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(blocks)),
+            initializer=_init_state,
+            initargs=(series, preps, n_bins, min_obs),
+        ) as pool:
+            for block_result in pool.map(_run_block, blocks):
+                results.extend(block_result)
+                logger.info("  progress: %d/%d pairs", len(results), len(pairs))
+
+    df = pd.DataFrame(results, columns=METRIC_COLUMNS)
+    df.insert(0, "id_b", [b for _, b in pairs])
+    df.insert(0, "id_a", [a for a, _ in pairs])
+    df["n_obs"] = df["n_obs"].astype(np.int64)
+    return df
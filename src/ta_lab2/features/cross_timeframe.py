@@ -12,12 +12,12 @@ This module provides:
       - _load_indicators_batch: batch-load all indicator columns from a source table
       - _align_timeframes: align base and reference timeframe DataFrames via merge_asof
       - _get_table_columns: introspect ctf fact table columns
-      - _write_to_db: scoped DELETE + to_sql INSERT into public.ctf
+      - _write_to_db: scoped DELETE + binary COPY INSERT into public.ctf
       - _compute_one_source: per (base_tf, ref_tf, source_table, indicator) computation
       - compute_for_ids: top-level orchestrator over all YAML combos
 
 Module-level helpers (vectorized rolling computations):
-  - _compute_slope: rolling polyfit slope
+  - _compute_slope: rolling OLS slope (shared rolling_ols kernel)
   - _compute_divergence: (base - ref) / rolling_std z-score
   - _compute_agreement: rolling fraction of sign-matching bars
   - _compute_crossover: sign-change detection for directional indicators
@@ -54,6 +54,8 @@ try:
 except ImportError:  # pragma: no cover
     yaml = None  # type: ignore[assignment]
 
+from ta_lab2.db.binary_copy import copy_upsert
+from ta_lab2.features.rolling_ols import rolling_slope
 from ta_lab2.features.polars_feature_ops import (
     HAVE_POLARS,
     normalize_timestamps_for_polars,
@@ -74,11 +76,14 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 
-def _compute_slope(series: pd.Series, window: int) -> pd.Series:
-    """Compute vectorized rolling OLS slope via polyfit (raw=True for speed).
+def _compute_slope(
+    series: pd.Series, window: int, groups: Optional[np.ndarray] = None
+) -> pd.Series:
+    """Compute rolling OLS slope over a bar-index window.
 
-    Follows the expression_engine.py _slope pattern. Uses a fixed x-array
-    (0..window-1) to avoid recomputing per window.
+    Thin wrapper over :func:`ta_lab2.features.rolling_ols.rolling_slope`
+    (cumulative-sum kernel, no per-window Python call).  Windows shorter
+    than ``window`` at the start of the series regress on 0..m-1.
 
     Parameters
     ----------
@@ -86,30 +91,17 @@ def _compute_slope(series: pd.Series, window: int) -> pd.Series:
         Time-ordered series of values to compute slope over.
     window:
         Number of bars in the rolling window (slope_window from composite_params).
+    groups:
+        Optional contiguous per-row labels (e.g. asset id); windows restart at
+        each label change so several assets can be computed in one call.
 
     Returns
     -------
     pd.Series of the same index, containing the rolling slope at each point.
-    NaN for positions without sufficient data (< 2 bars).
+    NaN for positions without sufficient data (< 2 bars) or with a NaN in
+    the window.
     """
-    series = series.astype(float)
-    n = int(window)
-    x = np.arange(n, dtype=float)
-    x_mean = x.mean()
-    x_denom = ((x - x_mean) ** 2).sum()
-
-    def _apply(arr: np.ndarray) -> float:
-        if len(arr) < n:
-            xi = np.arange(len(arr), dtype=float)
-            xi_mean = xi.mean()
-            xi_denom = ((xi - xi_mean) ** 2).sum()
-            if xi_denom == 0:
-                return float("nan")
-            return float(np.dot(arr - arr.mean(), xi - xi_mean) / xi_denom)
-        y_mean = arr.mean()
-        return float(np.dot(arr - y_mean, x - x_mean) / x_denom)
-
-    return series.rolling(window=n, min_periods=2).apply(_apply, raw=True)
+    return rolling_slope(series.astype(float), int(window), 2, groups)
 
 
 def _compute_divergence(
@@ -866,7 +858,7 @@ class CTFFeature:
         ref_tf: str,
         indicator_ids: list[int],
     ) -> int:
-        """Write CTF computation results to public.ctf using scoped DELETE + INSERT.
+        """Write CTF computation results to public.ctf using scoped DELETE + COPY.
 
         The DELETE scope is: (id, venue_id, base_tf, ref_tf, indicator_id, alignment_source).
         This ensures idempotent re-runs without duplicates.
@@ -921,25 +913,17 @@ class CTFFeature:
                     "as_": self.config.alignment_source,
                 },
             )
-
-        # INSERT via to_sql (append mode after DELETE)
-        df.to_sql(
-            "ctf",
-            self.engine,
-            schema="public",
-            if_exists="append",
-            index=False,
-            method="multi",
-            chunksize=10000,
-        )
+            # INSERT via binary COPY in the same transaction as the DELETE
+            stats = copy_upsert(conn.connection, "public.ctf", df)
 
         rows_written = len(df)
         logger.info(
-            "_write_to_db: base_tf=%s ref_tf=%s indicators=%s rows=%d",
+            "_write_to_db: base_tf=%s ref_tf=%s indicators=%s rows=%d (%.0f rows/s)",
             base_tf,
             ref_tf,
             indicator_ids,
             rows_written,
+            stats.rows_per_sec,
         )
         return rows_written
 
@@ -1034,12 +1018,19 @@ class CTFFeature:
                 )
                 continue
 
+            # Slope for every asset in one vectorized pass; windows restart
+            # at each asset boundary (stable sort keeps per-asset bar order)
+            aligned = aligned.reset_index(drop=True)
+            by_id = aligned.sort_values("id", kind="stable")
+            aligned["slope"] = _compute_slope(
+                by_id["base_value"], slope_window, by_id["id"].to_numpy()
+            )
+
             # Per-asset computation to avoid cross-asset contamination
             asset_frames: list[pd.DataFrame] = []
             for asset_id in aligned["id"].unique():
                 df_a = aligned[aligned["id"] == asset_id].copy()
 
-                df_a["slope"] = _compute_slope(df_a["base_value"], slope_window)
                 df_a["divergence"] = _compute_divergence(
                     df_a["base_value"], df_a["ref_value"], divergence_zscore_window
                 )
@@ -5,12 +5,14 @@ This module provides reusable utilities for feature computation modules:
 - Null handling strategies (skip, forward_fill, interpolate)
 - Feature normalization (z-score)
 - Data quality validation (minimum data points, outlier detection)
+- Source-history fingerprints for incremental (resume-from-state) refreshes
 
 Used by BaseFeature and concrete feature implementations (returns, volatility, TA).
 """
 
 from __future__ import annotations
 
+import hashlib
 from typing import Optional
 
 import numpy as np
@@ -22,6 +24,10 @@ __all__ = [
     "add_zscore",
     "validate_min_data_points",
     "flag_outliers",
+    "ROW_HASH_SQL",
+    "history_fingerprint",
+    "source_range",
+    "checkpoint_fingerprint",
 ]
 
 
@@ -271,3 +277,94 @@ def flag_outliers(
 
     # Should never reach here due to validation above
     return pd.Series(False, index=series.index)
+
+
+# =============================================================================
+# Incremental State
+# =============================================================================
+
+
+# Per-row content hash of a source bar row, evaluated in Postgres on the raw
+# "timestamp"/close bytes (independent of session TimeZone / float output).
+# Summed over the rows at or before a checkpoint it gives a source range the
+# database can recompute without shipping the history (see source_range).
+ROW_HASH_SQL = (
+    "('x' || substr(md5(int8send((extract(epoch FROM \"timestamp\") * 1000000)::bigint)"
+    " || COALESCE(float8send(close), ''::bytea)), 1, 8))::bit(32)::bigint"
+)
+
+
+def history_fingerprint(*arrays: np.ndarray) -> str:
+    """
+    Hash the exact bytes of one or more arrays.
+
+    Building block of checkpoint_fingerprint.
+
+    Args:
+        *arrays: Arrays to hash (converted to contiguous float64 / int64)
+
+    Returns:
+        Hex digest (32 chars)
+
+    Examples:
+        >>> a = np.array([1.0, 2.0])
+        >>> history_fingerprint(a) == history_fingerprint(a.copy())
+        True
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        a = np.asarray(arr)
+        a = np.ascontiguousarray(
+            a, dtype=np.int64 if a.dtype.kind in "iumM" else np.float64
+        )
+        h.update(len(a).to_bytes(8, "little"))
+        h.update(a.tobytes())
+    return h.hexdigest()
+
+
+def source_range(
+    row_hashes: np.ndarray, base: tuple[int, int] = (0, 0)
+) -> tuple[int, int]:
+    """
+    Extend a source range (row count, sum of per-row hashes) by more rows.
+
+    A range summarises every source row at or before a checkpoint. Postgres
+    computes it with COUNT(*) / SUM(ROW_HASH_SQL); a resumed refresh extends
+    the validated range with the row hashes of the rows it loaded after the
+    checkpoint, so the history before it is never shipped.
+
+    Args:
+        row_hashes: ROW_HASH_SQL values of the new rows
+        base: Range of the rows before them
+
+    Returns:
+        (row count, hash sum)
+
+    Examples:
+        >>> source_range(np.array([3, 4]), base=(1, 5))
+        (3, 12)
+    """
+    h = np.asarray(row_hashes, dtype=np.int64)
+    return base[0] + int(h.size), base[1] + int(h.sum())
+
+
+def checkpoint_fingerprint(*ranges: tuple[int, int]) -> str:
+    """
+    Fingerprint of the source rows at or before a recursion checkpoint.
+
+    Stored alongside recursion checkpoints: if it changes, upstream data was
+    restated and the checkpoint must not be resumed from. Each source series
+    contributes its range (see source_range), so inserted or deleted rows and
+    a value restated anywhere before the checkpoint change the fingerprint.
+
+    Args:
+        *ranges: (row count, hash sum) per source series
+
+    Returns:
+        Hex digest (32 chars)
+
+    Examples:
+        >>> checkpoint_fingerprint((3, 12)) == checkpoint_fingerprint((3, 13))
+        False
+    """
+    return history_fingerprint(np.array(ranges, dtype=np.int64).ravel())
@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 
 from ta_lab2.features.indicators import _ema, _sma, _tr, _ensure_series, _return
+from ta_lab2.features.rolling_ols import rolling_wma
 
 __all__ = [
     "ichimoku",
@@ -39,15 +40,7 @@ def _tp(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
 
 def _wma(s: pd.Series, n: int) -> pd.Series:
     """Weighted moving average with linear weights 1..n."""
-    weights = np.arange(1, n + 1, dtype=float)
-    total = weights.sum()
-
-    def _wma_window(x: np.ndarray) -> float:
-        if len(x) < n:
-            return np.nan
-        return float(np.dot(x[-n:], weights) / total)
-
-    return s.astype(float).rolling(n, min_periods=n).apply(_wma_window, raw=True)
+    return rolling_wma(s.astype(float), n, min_periods=n)
 
 
 # -------------------------
@@ -22,6 +22,7 @@ from typing import Optional
 import pandas as pd
 from sqlalchemy import Engine, text
 
+from ta_lab2.db.binary_copy import bulk_upsert
 from ta_lab2.features.m_tf.ema_operations import (
     compute_derivatives,
     compute_rolling_derivatives_canonical,
@@ -257,8 +258,9 @@ class BaseEMAFeature(ABC):
         """
         Write EMA results to database with batch upsert via temp table + COPY.
 
-        Uses temp table → COPY FROM → INSERT...SELECT...ON CONFLICT for fast
-        bulk upserts against large target tables (ema_multi_tf_u has 55M+ rows).
+        Streams the frame through binary COPY into a temp staging table, then
+        INSERT...SELECT...ON CONFLICT for fast bulk upserts against large
+        target tables (ema_multi_tf_u has 55M+ rows). See ta_lab2.db.binary_copy.
 
         Args:
             df: DataFrame with EMA results
@@ -279,58 +281,8 @@ class BaseEMAFeature(ABC):
             df_write["alignment_source"] = self.config.alignment_source
 
         target = f"{self.config.output_schema}.{self.config.output_table}"
-        pk_cols = self._get_pk_columns()
-        all_cols = list(df_write.columns)
-        update_cols = [c for c in all_cols if c not in pk_cols]
-
-        # Use raw psycopg2 connection for COPY performance
-        raw_conn = self.engine.raw_connection()
-        try:
-            cur = raw_conn.cursor()
-
-            # 1. Create temp table matching target schema
-            cur.execute(f"""
-                CREATE TEMP TABLE _ema_staging (LIKE {target} INCLUDING DEFAULTS)
-                ON COMMIT DROP
-            """)
-
-            # 2. COPY DataFrame into temp table via CSV buffer
-            import io
-
-            buf = io.StringIO()
-            df_write.to_csv(buf, index=False, header=False, na_rep="\\N")
-            buf.seek(0)
-            col_list = ", ".join(all_cols)
-            cur.copy_expert(
-                f"COPY _ema_staging ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
-                buf,
-            )
-
-            # 3. Batch upsert from staging → target
-            if update_cols:
-                set_clause = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
-                cur.execute(f"""
-                    INSERT INTO {target} ({col_list})
-                    SELECT {col_list} FROM _ema_staging
-                    ON CONFLICT ({", ".join(pk_cols)}) DO UPDATE SET
-                        {set_clause}
-                """)
-            else:
-                cur.execute(f"""
-                    INSERT INTO {target} ({col_list})
-                    SELECT {col_list} FROM _ema_staging
-                    ON CONFLICT ({", ".join(pk_cols)}) DO NOTHING
-                """)
-
-            n_rows = cur.rowcount
-            raw_conn.commit()
-        except Exception:
-            raw_conn.rollback()
-            raise
-        finally:
-            raw_conn.close()
-
-        return n_rows if n_rows >= 0 else len(df_write)
+        stats = bulk_upsert(self.engine, target, df_write, self._get_pk_columns())
+        return stats.affected if stats.affected >= 0 else len(df_write)
 
     def _get_pk_columns(self) -> list[str]:
         """Extract primary key column names from output schema definition.
@@ -31,10 +31,7 @@ from ta_lab2.features.m_tf.base_ema_feature import (
 )
 from ta_lab2.features.m_tf.polars_helpers import read_sql_polars
 from ta_lab2.features.ema import filter_ema_periods_by_obs_count
-from ta_lab2.features.m_tf.polars_ema_operations import (
-    compute_bar_ema_numpy,
-    compute_dual_ema_numpy,
-)
+from ta_lab2.features.m_tf.polars_ema_operations import compute_ema_batch
 
 logger = logging.getLogger(__name__)
 
@@ -202,8 +199,8 @@ class CalendarEMAFeature(BaseEMAFeature):
         """
         Compute calendar EMAs for single TF.
 
-        Vectorized: uses compute_bar_ema_numpy + compute_dual_ema_numpy
-        to replace Python for-loops with pure numpy operations.
+        Vectorized: compute_ema_batch runs every period of an (id, tf) in
+        one compiled pass instead of a Python loop per period.
 
         Implements dual EMA logic:
         - ema: daily-space, seeded once, continuous daily updates
@@ -245,96 +242,62 @@ class CalendarEMAFeature(BaseEMAFeature):
                 continue
             df_id = df_id.sort_values("ts").reset_index(drop=True)
 
-            # Canonical closes for this ID+TF
-            df_closes = df_id[df_id["ts"].isin(close_set)].copy()
-            if df_closes.empty:
+            # Canonical closes for this ID+TF (rows of the daily grid)
+            canon_pos = np.flatnonzero(df_id["ts"].isin(close_set).to_numpy())
+            if canon_pos.size == 0:
                 continue
-            df_closes = df_closes.sort_values("ts").reset_index(drop=True)
 
-            close_px_arr = df_closes["close"].astype(float).to_numpy()
-            close_ts_arr = df_closes["ts"].to_numpy()
+            close_arr = df_id["close"].astype(float).to_numpy()
+            ts_arr = df_id["ts"].to_numpy()
 
             # Filter periods by observation count
-            valid_periods = filter_ema_periods_by_obs_count(periods, len(close_px_arr))
+            valid_periods = filter_ema_periods_by_obs_count(periods, canon_pos.size)
+            if not valid_periods:
+                continue
 
+            # Get alpha from lookup or compute
+            alphas_daily = []
             for period in valid_periods:
-                # Get alpha from lookup or compute
                 alpha_daily = alpha_map.get((tf, period))
                 if alpha_daily is None:
                     effective_days = max(1, tf_spec.tf_days * period)
                     alpha_daily = 2.0 / (effective_days + 1.0)
+                alphas_daily.append(alpha_daily)
+
+            # All periods in one compiled pass (bar EMA + dual EMA)
+            batch = compute_ema_batch(
+                close_arr,
+                close_arr[canon_pos],
+                canon_pos,
+                valid_periods,
+                alphas_daily,
+            )
 
-                # Compute bar EMA on canonical closes using numpy
-                bar_ema_on_closes = compute_bar_ema_numpy(
-                    close_px_arr, period=period, min_periods=period
-                )
-
-                valid_mask = ~np.isnan(bar_ema_on_closes)
-                if not valid_mask.any():
-                    continue
+            # Roll flags
+            roll_all = ~batch.canonical_mask
 
-                first_valid_idx = int(np.argmax(valid_mask))
-                first_valid_close_ts = pd.Timestamp(
-                    close_ts_arr[first_valid_idx]
-                ).tz_convert("UTC")
+            # is_partial_end: True for rows after the last canonical close
+            is_partial_all = ts_arr > ts_arr[canon_pos[-1]]
 
+            for j, period in enumerate(valid_periods):
                 # Output frame starts at first valid canonical close
-                out_mask = df_id["ts"] >= first_valid_close_ts
-                if not out_mask.any():
+                first_valid = int(batch.first_valid[j])
+                if first_valid < 0:
                     continue
-
-                ts_out = df_id.loc[out_mask, "ts"].to_numpy()
-                close_out = df_id.loc[out_mask, "close"].astype(float).to_numpy()
-                n_out = len(ts_out)
-
-                # Build canonical mask and canonical EMA values for the output range
-                canonical_mask_out = np.zeros(n_out, dtype=bool)
-                canonical_ema_out = np.full(n_out, np.nan, dtype=np.float64)
-
-                # Map bar EMA values to output positions
-                canon_ts_to_ema = {}
-                for i in range(len(close_ts_arr)):
-                    if not np.isnan(bar_ema_on_closes[i]):
-                        canon_ts_to_ema[close_ts_arr[i]] = bar_ema_on_closes[i]
-
-                for i in range(n_out):
-                    ts_val = ts_out[i]
-                    if ts_val in canon_ts_to_ema:
-                        canonical_mask_out[i] = True
-                        canonical_ema_out[i] = canon_ts_to_ema[ts_val]
-
-                # Compute dual EMA using numpy (replaces two Python for-loops)
-                alpha_bar = 2.0 / (period + 1.0)
-                ema_bar_arr, ema_arr = compute_dual_ema_numpy(
-                    close_out,
-                    canonical_mask_out,
-                    canonical_ema_out,
-                    alpha_daily,
-                    alpha_bar,
-                )
-
-                # Roll flags
-                roll_out = ~canonical_mask_out
-
-                # is_partial_end: True for rows after the last canonical close
-                last_canon_ts = close_ts_arr[-1] if len(close_ts_arr) > 0 else None
-                if last_canon_ts is not None:
-                    is_partial = ts_out > last_canon_ts
-                else:
-                    is_partial = np.ones(n_out, dtype=bool)
+                sl = slice(first_valid, None)
 
                 df_out = pd.DataFrame(
                     {
                         "id": int(id_),
                         "tf": tf,
-                        "ts": ts_out,
+                        "ts": ts_arr[sl],
                         "period": int(period),
                         "venue_id": int(venue_id),
                         "tf_days": tf_spec.tf_days,
-                        "roll": roll_out,
-                        "ema": ema_arr,
-                        "ema_bar": ema_bar_arr,
-                        "is_partial_end": is_partial,
+                        "roll": roll_all[sl],
+                        "ema": batch.ema[sl, j],
+                        "ema_bar": batch.ema_bar[sl, j],
+                        "is_partial_end": is_partial_all[sl],
                     }
                 )
 
@@ -32,8 +32,8 @@ from ta_lab2.features.m_tf.base_ema_feature import (
 )
 from ta_lab2.features.m_tf.polars_helpers import read_sql_polars
 from ta_lab2.features.m_tf.polars_ema_operations import (
-    compute_bar_ema_numpy,
-    compute_dual_ema_numpy,
+    compute_ema_batch,
+    positions_on_grid,
 )
 
 logger = logging.getLogger(__name__)
@@ -215,9 +215,9 @@ class CalendarAnchorEMAFeature(BaseEMAFeature):
             if bars_id.empty:
                 continue
 
-            # Process each period
+            # Get alpha from lookup or fallback
+            alphas_daily = []
             for period in periods:
-                # Get alpha from lookup or fallback
                 alpha_daily = alpha_map.get((tf_spec.tf, period))
                 if alpha_daily is None:
                     alpha_daily = self._alpha_daily_equivalent(tf_spec.tf_days, period)
@@ -225,21 +225,22 @@ class CalendarAnchorEMAFeature(BaseEMAFeature):
                         f"Alpha not in lookup for ({tf_spec.tf}, {period}), "
                         f"using fallback: {alpha_daily:.8f}"
                     )
+                alphas_daily.append(alpha_daily)
+
+            # All periods in one pass
+            df_out = self._build_one_id_tf(
+                daily=df_id,
+                bars_tf=bars_id,
+                periods=periods,
+                alphas_daily=alphas_daily,
+            )
 
-                df_out = self._build_one_id_tf_period(
-                    daily=df_id,
-                    bars_tf=bars_id,
-                    period=period,
-                    alpha_daily=alpha_daily,
-                )
-
-                if not df_out.empty:
-                    df_out["id"] = int(id_)
-                    df_out["tf"] = tf_spec.tf
-                    df_out["period"] = int(period)
-                    df_out["tf_days"] = tf_spec.tf_days
-                    df_out["venue_id"] = int(venue_id)
-                    out_frames.append(df_out)
+            if not df_out.empty:
+                df_out["id"] = int(id_)
+                df_out["tf"] = tf_spec.tf
+                df_out["tf_days"] = tf_spec.tf_days
+                df_out["venue_id"] = int(venue_id)
+                out_frames.append(df_out)
 
         if not out_frames:
             return pd.DataFrame()
@@ -390,18 +391,18 @@ class CalendarAnchorEMAFeature(BaseEMAFeature):
         self._alpha_lookup = df
         return df
 
-    def _build_one_id_tf_period(
+    def _build_one_id_tf(
         self,
         daily: pd.DataFrame,
         bars_tf: pd.DataFrame,
-        period: int,
-        alpha_daily: float,
+        periods: list[int],
+        alphas_daily: list[float],
     ) -> pd.DataFrame:
         """
-        Build full daily-grid output for single (id, tf, period).
+        Build full daily-grid output for single (id, tf), all periods.
 
-        Vectorized with numpy: compute_bar_ema_numpy + compute_dual_ema_numpy
-        replace pd.Series.iloc[i] loops (~100x faster for large series).
+        Vectorized with compute_ema_batch: bar EMA + dual EMA for every period
+        in one compiled pass instead of one numpy loop per period.
         """
         df = daily[["ts", "close"]].copy()
         df["ts"] = pd.to_datetime(df["ts"], utc=True)
@@ -422,82 +423,56 @@ class CalendarAnchorEMAFeature(BaseEMAFeature):
             .sort_values("ts")
             .reset_index(drop=True)
         )
+        if not periods:
+            return pd.DataFrame()
 
-        canonical_ts = canon_b["ts"].drop_duplicates().sort_values()
-
-        # Roll flags
-        canonical_ts_set = set(canonical_ts.tolist())
-        is_canonical_day = df["ts"].isin(canonical_ts_set)
-        roll = (~is_canonical_day).to_numpy().astype(bool)
-        canonical_mask = ~roll
-
-        # Canonical bar EMA at anchored closes using numpy
-        canon_close_arr = canon_b["close"].astype(float).to_numpy()
-        canon_ema_arr = compute_bar_ema_numpy(
-            canon_close_arr, period=period, min_periods=period
+        # Canonical anchored closes mapped onto the daily grid
+        grid_ts = pd.DatetimeIndex(df["ts"])
+        canon_ts = pd.DatetimeIndex(canon_b["ts"])
+        canon_grid_pos = positions_on_grid(
+            grid_ts.as_unit("ns").asi8, canon_ts.as_unit("ns").asi8
         )
 
-        # Build canonical EMA map: ts -> ema_close
-        canon_ts_arr = canon_b["ts"].values
-        canon_ema_map = {}
-        for i in range(len(canon_ts_arr)):
-            if not np.isnan(canon_ema_arr[i]):
-                canon_ema_map[canon_ts_arr[i]] = canon_ema_arr[i]
-
-        # Build arrays for compute_dual_ema_numpy
-        n = len(df)
-        close_arr = df["close"].astype(float).to_numpy()
-        ts_arr = df["ts"].values
-
-        # Map canonical EMA values onto daily grid
-        canonical_ema_values = np.full(n, np.nan, dtype=np.float64)
-        for i in range(n):
-            if canonical_mask[i] and ts_arr[i] in canon_ema_map:
-                canonical_ema_values[i] = canon_ema_map[ts_arr[i]]
-
-        # Compute dual EMA using numpy
-        alpha_bar = 2.0 / (period + 1.0)
-        ema_bar_arr, ema_arr = compute_dual_ema_numpy(
-            close_arr,
-            canonical_mask=canonical_mask,
-            canonical_ema_values=canonical_ema_values,
-            alpha_daily=alpha_daily,
-            alpha_bar=alpha_bar,
+        batch = compute_ema_batch(
+            df["close"].astype(float).to_numpy(),
+            canon_b["close"].astype(float).to_numpy(),
+            canon_grid_pos,
+            periods,
+            alphas_daily,
         )
 
+        # Roll flags
+        roll = ~grid_ts.isin(canon_ts)
+
         # is_partial_end: True for rows after the last canonical close
-        last_canon_ts = canonical_ts.max() if len(canonical_ts) > 0 else None
-        if last_canon_ts is not None:
-            is_partial = (df["ts"] > last_canon_ts).to_numpy()
+        if len(canon_ts) > 0:
+            is_partial = grid_ts > canon_ts.max()
         else:
-            is_partial = np.ones(n, dtype=bool)
-
-        out = pd.DataFrame(
-            {
-                "ts": df["ts"],
-                "roll": roll.astype(bool),
-                "ema": ema_arr,
-                "ema_bar": ema_bar_arr,
-                "is_partial_end": is_partial,
-            }
-        )
+            is_partial = np.ones(len(df), dtype=bool)
+
+        frames = []
+        for j, period in enumerate(periods):
+            # Filter pre-seed rows: only output from first valid ema_bar onward
+            first_valid = int(batch.first_valid[j])
+            if first_valid < 0:
+                continue
+            sl = slice(first_valid, None)
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "ts": grid_ts[sl],
+                        "period": int(period),
+                        "roll": roll[sl],
+                        "ema": batch.ema[sl, j],
+                        "ema_bar": batch.ema_bar[sl, j],
+                        "is_partial_end": is_partial[sl],
+                    }
+                )
+            )
 
-        # Filter pre-seed rows: only output from first valid ema_bar onward
-        has_ema_bar = out["ema_bar"].notna()
-        if not has_ema_bar.any():
+        if not frames:
             return pd.DataFrame()
-        first_valid = has_ema_bar.idxmax()
-        out = out.loc[first_valid:].reset_index(drop=True)
-
-        return out[
-            [
-                "ts",
-                "roll",
-                "ema",
-                "ema_bar",
-                "is_partial_end",
-            ]
-        ]
+        return pd.concat(frames, ignore_index=True)
 
     def _alpha_daily_equivalent(self, tf_days: int, period: int) -> float:
         """
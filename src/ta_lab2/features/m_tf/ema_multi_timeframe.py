@@ -30,9 +30,16 @@ from ta_lab2.features.m_tf.base_ema_feature import (
     TFSpec,
 )
 from ta_lab2.features.ema import filter_ema_periods_by_obs_count
+from ta_lab2.features.feature_utils import (
+    ROW_HASH_SQL,
+    checkpoint_fingerprint,
+    source_range,
+)
 from ta_lab2.features.m_tf.polars_ema_operations import (
-    compute_bar_ema_numpy,
-    compute_dual_ema_numpy,
+    EMABatchResult,
+    compute_ema_batch,
+    positions_on_grid,
+    resume_ema_batch,
 )
 from ta_lab2.time.dim_timeframe import list_tfs, get_tf_days
 from ta_lab2.io import _get_marketdata_engine as _get_engine
@@ -40,6 +47,27 @@ from ta_lab2.io import _get_marketdata_engine as _get_engine
 logger = logging.getLogger(__name__)
 
 
+def _since_clause(since: Optional[dict], params: dict) -> str:
+    """
+    SQL keeping rows of each (id, venue_id) in ``since`` at or after its bound.
+
+    The query must alias its table ``b``; other (id, venue_id) keep all rows.
+    """
+    if not since:
+        return ""
+    keys = list(since)
+    params["since_ids"] = [k[0] for k in keys]
+    params["since_venues"] = [k[1] for k in keys]
+    params["since_ts"] = [since[k].to_pydatetime() for k in keys]
+    return (
+        'AND b."timestamp" >= COALESCE(('
+        "SELECT s.ts FROM unnest(CAST(:since_ids AS integer[]), "
+        "CAST(:since_venues AS integer[]), CAST(:since_ts AS timestamptz[])) "
+        "AS s(id, venue_id, ts) "
+        "WHERE s.id = b.id AND s.venue_id = b.venue_id), '-infinity'::timestamptz)"
+    )
+
+
 # =============================================================================
 # Multi-TF EMA Feature Implementation
 # =============================================================================
@@ -84,6 +112,18 @@ class MultiTFEMAFeature(BaseEMAFeature):
         self._daily_data_cache: Optional[pd.DataFrame] = None
         self._bar_closes_cache: Optional[pd.DataFrame] = None
 
+        # Resume-from-state: checkpoints keyed by (id, venue_id, tf) -> period,
+        # the validated ones with their source ranges, and the per-(id,
+        # venue_id) bound the source rows were loaded from
+        self._resume_state: Optional[dict] = None
+        self._valid_ckpts: dict = {}
+        self._since: dict[tuple[int, int], pd.Timestamp] = {}
+        self._end: Optional[str] = None
+        self._bars_end: Optional[str] = None
+        self._full_cache: dict = {}
+        self.checkpoints: list[dict] = []
+        self.resumed_keys: set[tuple[int, int, str]] = set()
+
     # =========================================================================
     # Abstract Method Implementations
     # =========================================================================
@@ -97,8 +137,24 @@ class MultiTFEMAFeature(BaseEMAFeature):
         """
         Load daily closes for all IDs.
 
+        With resume state, checkpoints are validated first and each (id,
+        venue_id) with a valid one is loaded only from its earliest checkpoint.
+
         Returns: DataFrame with id, ts, close (normalized)
         """
+        self._end = end
+        self._validate_resume_state(ids)
+        daily = self._normalize_daily(self._read_daily(ids, end, self._since))
+        self._daily_data_cache = daily
+        return daily
+
+    def _read_daily(
+        self,
+        ids: list[int],
+        end: Optional[str],
+        since: Optional[dict] = None,
+    ) -> pd.DataFrame:
+        """Daily rows (with ROW_HASH_SQL as row_hash) from price_bars_1d."""
         # Load directly from price_histories to avoid config-file dependency
         # (load_cmc_ohlcv_daily requires configs/default.yaml for table resolution)
         where = ["id = ANY(:ids)", "timestamp >= :start"]
@@ -109,18 +165,14 @@ class MultiTFEMAFeature(BaseEMAFeature):
 
         sql = text(
             f"SELECT id, timestamp AS ts, open, high, low, close, volume, "
-            f"venue_id "
-            f"FROM public.price_bars_1d "
-            f"WHERE {' AND '.join(where)} "
+            f"venue_id, {ROW_HASH_SQL} AS row_hash "
+            f"FROM public.price_bars_1d b "
+            f"WHERE {' AND '.join(where)} {_since_clause(since, params)} "
             f"ORDER BY id, venue_id, timestamp"
         )
 
         with self.engine.connect() as conn:
-            daily = pd.read_sql(sql, conn, params=params)
-
-        daily = self._normalize_daily(daily)
-        self._daily_data_cache = daily
-        return daily
+            return pd.read_sql(sql, conn, params=params)
 
     def get_tf_specs(self) -> List[TFSpec]:
         """Load TF specs from dim_timeframe (tf_day family)."""
@@ -188,7 +240,7 @@ class MultiTFEMAFeature(BaseEMAFeature):
         """
         Compute multi-TF EMAs for single TF.
 
-        Vectorized: uses compute_bar_ema_numpy for bar EMA, numpy for preview.
+        Vectorized: compute_ema_batch runs all periods in one compiled pass.
 
         Logic:
         1. Load/generate canonical bar closes (persisted or synthetic)
@@ -221,149 +273,178 @@ class MultiTFEMAFeature(BaseEMAFeature):
         )
 
         for asset_id, venue_id in id_venue_pairs:
-            df_id = daily[
-                (daily["id"] == asset_id) & (daily["venue_id"] == venue_id)
-            ].copy()
-            if df_id.empty:
-                continue
-
-            # Get bars for this (ID, venue_id) (persisted or synthetic)
+            key = (int(asset_id), int(venue_id), tf_spec.tf)
+            df_id = daily[(daily["id"] == asset_id) & (daily["venue_id"] == venue_id)]
             if not bars_all.empty:
                 bars_id = bars_all[
                     (bars_all["id"] == asset_id) & (bars_all["venue_id"] == venue_id)
-                ].copy()
+                ]
             else:
                 bars_id = pd.DataFrame()
 
-            if bars_id.empty:
-                # Fallback to synthetic bars
-                bars_id = self._synthetic_tf_day_bars_from_daily(
-                    df_id_daily=df_id,
-                    tf=tf_spec.tf,
-                    tf_days=tf_spec.tf_days,
-                )
-
-            if bars_id.empty:
-                continue
-
-            # Prepare daily data
-            df_id = df_id.sort_values("ts").reset_index(drop=True)
-            # Canonical closes
-            closes = bars_id[["time_close", "close_bar", "bar_seq"]].copy()
-            closes = closes.rename(columns={"time_close": "ts"})
-            closes["ts"] = pd.to_datetime(closes["ts"], utc=True)
-
-            # Daily grid with canonical markers
-            grid = df_id[["ts", "close"]].merge(
-                closes[["ts", "close_bar", "bar_seq"]],
-                on="ts",
-                how="left",
-            )
+            partial = key[:2] in self._since
+            out = self._compute_key(key, tf_spec, periods, df_id, bars_id, partial)
+            if out is None:
+                # Loaded from a resume bound, but this TF cannot resume
+                logger.info("No usable checkpoint for %s; full recompute", key)
+                df_id, bars_id = self._full_history(key)
+                out = self._compute_key(key, tf_spec, periods, df_id, bars_id, False)
+            frames.extend(out)
 
-            # Bar-close series in bar order
-            df_closes = (
-                closes[["ts", "close_bar", "bar_seq"]]
-                .sort_values("bar_seq")
-                .reset_index(drop=True)
-            )
+        if not frames:
+            return pd.DataFrame()
 
-            # Filter periods by observation count
-            valid_periods = filter_ema_periods_by_obs_count(periods, len(df_closes))
+        result = pd.concat(frames, ignore_index=True)
+        result["ts"] = pd.to_datetime(result["ts"], utc=True)
+        result = result.sort_values(["id", "venue_id", "tf", "period", "ts"])
 
-            # Pre-extract numpy arrays for the grid
-            grid_close_arr = grid["close"].astype(float).to_numpy()
-            n_grid = len(grid)
+        return result
 
-            for p in valid_periods:
-                # Compute bar-space EMA on canonical closes
-                bar_close_arr = df_closes["close_bar"].astype(float).to_numpy()
-                bar_ema_arr = compute_bar_ema_numpy(
-                    bar_close_arr, period=p, min_periods=p
-                )
+    def _compute_key(
+        self,
+        key: tuple[int, int, str],
+        tf_spec: TFSpec,
+        periods: list[int],
+        df_id: pd.DataFrame,
+        bars_id: pd.DataFrame,
+        partial: bool,
+    ) -> Optional[list[pd.DataFrame]]:
+        """
+        EMA frames (one per period) for one (id, venue_id, tf).
 
-                valid_mask = ~np.isnan(bar_ema_arr)
-                if not valid_mask.any():
-                    continue
-
-                bar_ts = df_closes["ts"].values
-                valid_idx = np.where(valid_mask)[0]
-                bar_ts_valid = bar_ts[valid_idx]
-                bar_ema_valid = bar_ema_arr[valid_idx]
-
-                # Build canonical mask and EMA values on daily grid
-                bar_ts_set = set(pd.DatetimeIndex(bar_ts_valid).tz_localize("UTC"))
-                canon_ts_to_ema = {}
-                for i, ts_key in enumerate(
-                    pd.DatetimeIndex(bar_ts_valid).tz_localize("UTC")
-                ):
-                    canon_ts_to_ema[ts_key] = bar_ema_valid[i]
-
-                canonical_mask = np.zeros(n_grid, dtype=bool)
-                canonical_ema_values = np.full(n_grid, np.nan, dtype=np.float64)
-                grid_ts_list = grid["ts"].tolist()
-                for i in range(n_grid):
-                    ts_val = grid_ts_list[i]
-                    if ts_val in canon_ts_to_ema:
-                        canonical_mask[i] = True
-                        canonical_ema_values[i] = canon_ts_to_ema[ts_val]
-
-                # Compute dual EMA: ema_bar (bar alpha + reanchoring) + ema (daily alpha)
-                alpha_bar = 2.0 / (p + 1.0)
-                alpha_daily = 2.0 / (tf_spec.tf_days * p + 1.0)
-
-                ema_bar_out, ema_out = compute_dual_ema_numpy(
-                    grid_close_arr,
-                    canonical_mask,
-                    canonical_ema_values,
-                    alpha_daily,
-                    alpha_bar,
-                )
+        ``partial`` means the rows start at a resume bound rather than at the
+        first bar; None is returned when such rows cannot be resumed.
+        """
+        if df_id.empty:
+            return [] if not partial else None
+
+        if bars_id.empty:
+            if partial:
+                return None
+            # Fallback to synthetic bars
+            bars_id = self._synthetic_tf_day_bars_from_daily(
+                df_id_daily=df_id.copy(),
+                tf=tf_spec.tf,
+                tf_days=tf_spec.tf_days,
+            )
 
-                # Drop rows before first valid ema_bar
-                valid_ema = ~np.isnan(ema_bar_out)
-                if not valid_ema.any():
-                    continue
+        if bars_id.empty:
+            return []
+
+        # Prepare daily data
+        df_id = df_id.sort_values("ts").reset_index(drop=True)
+        # Canonical closes
+        cols = ["time_close", "close_bar", "bar_seq"]
+        if "row_hash" in bars_id.columns:
+            cols.append("row_hash")
+        closes = bars_id[cols].rename(columns={"time_close": "ts"})
+        closes["ts"] = pd.to_datetime(closes["ts"], utc=True)
+
+        # Daily grid with canonical markers
+        grid = df_id[["ts", "close"]].merge(
+            closes[["ts", "close_bar", "bar_seq"]],
+            on="ts",
+            how="left",
+        )
 
-                first_valid = int(np.argmax(valid_ema))
-                sl = slice(first_valid, None)
+        # Bar-close series in bar order
+        df_closes = closes.sort_values("bar_seq").reset_index(drop=True)
+
+        # Map each canonical close onto the daily grid (-1 = off-grid)
+        grid_ts = pd.DatetimeIndex(grid["ts"])
+        bar_ts = pd.DatetimeIndex(pd.to_datetime(df_closes["ts"], utc=True))
+        grid_i8 = grid_ts.as_unit("ns").asi8
+        bar_i8 = bar_ts.as_unit("ns").asi8
+        bar_grid_pos = positions_on_grid(grid_i8, bar_i8)
+
+        grid_close = grid["close"].astype(float).to_numpy()
+        bar_close = df_closes["close_bar"].astype(float).to_numpy()
+
+        # With a validated checkpoint, only rows after it are computed
+        loc = self._locate_checkpoint(key, grid_i8, bar_i8)
+        n_bars = len(df_closes)
+        if loc is not None:
+            ckpt_row, ckpt_bar, _, bar_range = loc
+            n_bars += bar_range[0] - (ckpt_bar + 1)
+
+        # Filter periods by observation count
+        valid_periods = filter_ema_periods_by_obs_count(periods, n_bars)
+        if not valid_periods:
+            return [] if not partial else None
+
+        state = self._checkpoint_state(key, valid_periods) if loc else None
+        if state is None and partial:
+            return None
+
+        # All periods in one compiled pass:
+        # ema_bar (bar alpha + reanchoring) + ema (daily alpha).
+        alpha_daily = [2.0 / (tf_spec.tf_days * p + 1.0) for p in valid_periods]
+        if state is not None:
+            ema0, ema_bar0 = state
+            offset = ckpt_row + 1
+            new_pos = bar_grid_pos[ckpt_bar + 1 :]
+            batch = resume_ema_batch(
+                grid_close[offset:],
+                bar_close[ckpt_bar + 1 :],
+                np.where(new_pos >= 0, new_pos - offset, -1),
+                valid_periods,
+                alpha_daily,
+                ema0=ema0,
+                ema_bar0=ema_bar0,
+            )
+            self.resumed_keys.add(key)
+            prev = (loc, ema0, ema_bar0)
+        else:
+            offset = 0
+            batch = compute_ema_batch(
+                grid_close, bar_close, bar_grid_pos, valid_periods, alpha_daily
+            )
+            prev = None
+
+        if "row_hash" in df_id.columns and "row_hash" in df_closes.columns:
+            self._record_checkpoints(
+                key,
+                tf_spec.tf_days,
+                valid_periods,
+                batch,
+                offset,
+                prev,
+                grid_i8,
+                df_id["row_hash"].to_numpy(),
+                df_closes["row_hash"].to_numpy(),
+                bar_grid_pos,
+            )
 
-                grid_ts_slice = grid["ts"].iloc[first_valid:].tolist()
-                roll_arr = ~np.array([t in bar_ts_set for t in grid_ts_slice])
+        grid_ts = grid_ts[offset:]
+        roll_all = ~batch.canonical_mask
+        # is_partial_end: True for rows after the last canonical close
+        is_partial_all = grid_ts > bar_ts.max()
 
-                # is_partial_end: True for rows after the last canonical close
-                last_canon_ts = max(bar_ts_set) if bar_ts_set else None
-                is_partial_arr = np.array(
-                    [
-                        t > last_canon_ts if last_canon_ts else True
-                        for t in grid_ts_slice
-                    ]
-                )
+        frames = []
+        for j, p in enumerate(valid_periods):
+            # Drop rows before first valid ema_bar
+            first_valid = int(batch.first_valid[j])
+            if first_valid < 0:
+                continue
+            sl = slice(first_valid, None)
 
-                tmp = pd.DataFrame(
+            frames.append(
+                pd.DataFrame(
                     {
-                        "id": asset_id,
+                        "id": key[0],
                         "tf": tf_spec.tf,
-                        "ts": grid_ts_slice,
+                        "ts": grid_ts[sl],
                         "period": p,
                         "tf_days": tf_spec.tf_days,
-                        "venue_id": int(venue_id),
-                        "roll": roll_arr,
-                        "ema": ema_out[sl],
-                        "ema_bar": ema_bar_out[sl],
-                        "is_partial_end": is_partial_arr,
+                        "venue_id": key[1],
+                        "roll": roll_all[sl],
+                        "ema": batch.ema[sl, j],
+                        "ema_bar": batch.ema_bar[sl, j],
+                        "is_partial_end": is_partial_all[sl],
                     }
                 )
-
-                frames.append(tmp)
-
-        if not frames:
-            return pd.DataFrame()
-
-        result = pd.concat(frames, ignore_index=True)
-        result["ts"] = pd.to_datetime(result["ts"], utc=True)
-        result = result.sort_values(["id", "venue_id", "tf", "period", "ts"])
-
-        return result
+            )
+        return frames
 
     def get_output_schema(self) -> dict[str, str]:
         """Define output table schema for multi-TF EMAs (dual EMA)."""
@@ -382,6 +463,269 @@ class MultiTFEMAFeature(BaseEMAFeature):
             "PRIMARY KEY": "(id, venue_id, tf, ts, period)",
         }
 
+    # =========================================================================
+    # Resume-from-state
+    # =========================================================================
+
+    def set_resume_state(self, state: Optional[pd.DataFrame]) -> None:
+        """
+        Provide recursion checkpoints for compute_emas_for_tf to resume from.
+
+        Args:
+            state: Rows with id, venue_id, tf, period, ckpt_ts, ema, ema_bar,
+                src_hash (one per period). None/empty disables resuming.
+        """
+        self._resume_state = None
+        self._valid_ckpts = {}
+        self._since = {}
+        if state is None or state.empty:
+            return
+
+        resume: dict = {}
+        ckpt_i8 = pd.DatetimeIndex(pd.to_datetime(state["ckpt_ts"], utc=True))
+        ckpt_i8 = ckpt_i8.as_unit("ns").asi8
+        for row, ts_i8 in zip(state.itertuples(index=False), ckpt_i8):
+            key = (int(row.id), int(row.venue_id), str(row.tf))
+            resume.setdefault(key, {})[int(row.period)] = (
+                int(ts_i8),
+                float(row.ema),
+                float(row.ema_bar),
+                str(row.src_hash),
+            )
+        self._resume_state = resume
+
+    def _validate_resume_state(self, ids: list[int]) -> None:
+        """
+        Keep the checkpoints whose source history is unchanged.
+
+        A checkpoint is valid when all its periods share one checkpoint ts and
+        fingerprint, and the source ranges Postgres computes at that ts (daily
+        rows and canonical bars up to it) still match the fingerprint, so a
+        row inserted, deleted or restated anywhere before it invalidates it.
+        Each (id, venue_id) with a valid checkpoint is then loaded only from
+        its earliest one (self._since).
+        """
+        self._valid_ckpts = {}
+        self._since = {}
+        self._full_cache = {}
+        if not self._resume_state:
+            return
+
+        wanted = set(ids)
+        rows = []
+        for key, by_period in self._resume_state.items():
+            ckpts = {v[0] for v in by_period.values()}
+            hashes = {v[3] for v in by_period.values()}
+            if key[0] in wanted and len(ckpts) == 1 and len(hashes) == 1:
+                rows.append((*key, ckpts.pop(), hashes.pop()))
+        if not rows:
+            return
+
+        ckpts = pd.DataFrame(rows, columns=["id", "venue_id", "tf", "ckpt_i8", "hash"])
+        ranges = self._read_checkpoint_ranges(ckpts)
+        stored = {(r.id, r.venue_id, r.tf): r for r in ckpts.itertuples(index=False)}
+        for r in ranges.itertuples(index=False):
+            key = (int(r.id), int(r.venue_id), str(r.tf))
+            daily_range = (int(r.n_daily), int(r.s_daily))
+            bar_range = (int(r.n_bars), int(r.s_bars))
+            ckpt = stored[key]
+            if checkpoint_fingerprint(daily_range, bar_range) != ckpt.hash:
+                logger.info(
+                    "Source history restated before checkpoint for %s; full recompute",
+                    key,
+                )
+                continue
+            self._valid_ckpts[key] = (ckpt.ckpt_i8, daily_range, bar_range)
+            ts = pd.Timestamp(ckpt.ckpt_i8, tz="UTC")
+            self._since[key[:2]] = min(self._since.get(key[:2], ts), ts)
+
+    def _read_checkpoint_ranges(self, ckpts: pd.DataFrame) -> pd.DataFrame:
+        """
+        Source ranges at each checkpoint, computed in Postgres.
+
+        Args:
+            ckpts: id, venue_id, tf, ckpt_i8 per checkpoint
+
+        Returns:
+            id, venue_id, tf, n_daily, s_daily, n_bars, s_bars for every
+            checkpoint whose ts is still a daily row and a canonical bar
+        """
+        params: dict = {
+            "ids": sorted({int(i) for i in ckpts["id"]}),
+            "start": "2010-01-01",
+            "c_ids": [int(i) for i in ckpts["id"]],
+            "c_venues": [int(v) for v in ckpts["venue_id"]],
+            "c_tfs": [str(t) for t in ckpts["tf"]],
+            "c_ts": [
+                pd.Timestamp(int(t), tz="UTC").to_pydatetime() for t in ckpts["ckpt_i8"]
+            ],
+        }
+        alignment_filter = ""
+        if self.config.alignment_source:
+            alignment_filter = "AND b.alignment_source = :alignment_source"
+            params["alignment_source"] = self.config.alignment_source
+
+        # Daily ranges come from running sums (each row hashed once for all
+        # TFs); bar ranges from one aggregate per (venue_id, tf).
+        sql = text(
+            f"""
+            WITH c AS (
+                SELECT *
+                FROM unnest(
+                    CAST(:c_ids AS integer[]), CAST(:c_venues AS integer[]),
+                    CAST(:c_tfs AS text[]), CAST(:c_ts AS timestamptz[])
+                ) AS c(id, venue_id, tf, ckpt_ts)
+            ),
+            d AS (
+                SELECT id, venue_id, "timestamp",
+                       COUNT(*) OVER w AS n, SUM(h) OVER w AS s
+                FROM (
+                    SELECT id, venue_id, "timestamp", {ROW_HASH_SQL} AS h
+                    FROM public.price_bars_1d
+                    WHERE id = ANY(:ids) AND "timestamp" >= :start
+                ) x
+                WINDOW w AS (PARTITION BY id, venue_id ORDER BY "timestamp")
+            ),
+            b AS (
+                SELECT c.id, c.venue_id, c.tf, COUNT(*) AS n,
+                       SUM({ROW_HASH_SQL}) AS s,
+                       bool_or(b."timestamp" = c.ckpt_ts) AS at_ckpt
+                FROM c
+                JOIN {self.bars_schema}.{self.bars_table} b
+                  ON b.id = c.id AND b.venue_id = c.venue_id AND b.tf = c.tf
+                 AND b."timestamp" <= c.ckpt_ts
+                WHERE b.is_partial_end = FALSE {alignment_filter}
+                GROUP BY c.id, c.venue_id, c.tf
+            )
+            SELECT c.id, c.venue_id, c.tf,
+                   d.n AS n_daily, d.s AS s_daily, b.n AS n_bars, b.s AS s_bars
+            FROM c
+            JOIN d ON d.id = c.id AND d.venue_id = c.venue_id
+                  AND d."timestamp" = c.ckpt_ts
+            JOIN b ON b.id = c.id AND b.venue_id = c.venue_id AND b.tf = c.tf
+            WHERE b.at_ckpt
+            """
+        )
+        with self.engine.connect() as conn:
+            return pd.read_sql(sql, conn, params=params)
+
+    def _full_history(
+        self, key: tuple[int, int, str]
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """Daily rows and key's TF bars from the first bar (cached per id)."""
+        asset_id, venue_id, tf = key
+        if asset_id not in self._full_cache:
+            self._full_cache[asset_id] = (
+                self._normalize_daily(self._read_daily([asset_id], self._end)),
+                self._read_bar_closes([asset_id], self._bars_end),
+            )
+        daily, bars = self._full_cache[asset_id]
+        df_id = daily[daily["venue_id"] == venue_id]
+        if bars.empty:
+            return df_id, bars
+        return df_id, bars[(bars["venue_id"] == venue_id) & (bars["tf"] == tf)]
+
+    def _locate_checkpoint(
+        self,
+        key: tuple[int, int, str],
+        grid_i8: np.ndarray,
+        bar_i8: np.ndarray,
+    ) -> Optional[tuple[int, int, tuple[int, int], tuple[int, int]]]:
+        """
+        (grid row, bar index, daily range, bar range) of key's validated
+        checkpoint, or None when it has none or its row is not loaded.
+        """
+        if key not in self._valid_ckpts:
+            return None
+        ckpt_i8, daily_range, bar_range = self._valid_ckpts[key]
+        ckpt_row = int(np.searchsorted(grid_i8, ckpt_i8))
+        ckpt_bar = int(np.searchsorted(bar_i8, ckpt_i8))
+        if (
+            ckpt_row >= grid_i8.shape[0]
+            or grid_i8[ckpt_row] != ckpt_i8
+            or ckpt_bar >= bar_i8.shape[0]
+            or bar_i8[ckpt_bar] != ckpt_i8
+        ):
+            return None
+        return ckpt_row, ckpt_bar, daily_range, bar_range
+
+    def _checkpoint_state(
+        self, key: tuple[int, int, str], periods: list[int]
+    ) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        """(ema0, ema_bar0) when every period has a usable checkpoint."""
+        by_period = self._resume_state[key]
+        if any(p not in by_period for p in periods):
+            return None
+        ema0 = np.array([by_period[p][1] for p in periods], dtype=np.float64)
+        ema_bar0 = np.array([by_period[p][2] for p in periods], dtype=np.float64)
+        if np.isnan(ema0).any() or np.isnan(ema_bar0).any():
+            return None
+        return ema0, ema_bar0
+
+    def _record_checkpoints(
+        self,
+        key: tuple[int, int, str],
+        tf_days: int,
+        periods: list[int],
+        batch: EMABatchResult,
+        offset: int,
+        prev: Optional[tuple],
+        grid_i8: np.ndarray,
+        grid_hash: np.ndarray,
+        bar_hash: np.ndarray,
+        bar_grid_pos: np.ndarray,
+    ) -> None:
+        """
+        Append the checkpoint at the last on-grid canonical bar to self.checkpoints.
+
+        Its source ranges extend the resumed checkpoint's ranges (``prev``)
+        with the loaded rows after it, or cover the loaded rows when the
+        whole history was computed.
+        """
+        on_grid = np.flatnonzero(bar_grid_pos >= 0)
+        if on_grid.size == 0:
+            return
+        ckpt_bar = int(on_grid[-1])
+        ckpt_row = int(bar_grid_pos[ckpt_bar])
+
+        if prev is None:
+            daily_range = source_range(grid_hash[: ckpt_row + 1])
+            bar_range = source_range(bar_hash[: ckpt_bar + 1])
+        else:
+            (row0, bar0, range0_daily, range0_bar), _, _ = prev
+            if ckpt_row < row0:
+                return
+            daily_range = source_range(grid_hash[row0 + 1 : ckpt_row + 1], range0_daily)
+            bar_range = source_range(bar_hash[bar0 + 1 : ckpt_bar + 1], range0_bar)
+
+        if ckpt_row >= offset:
+            ema = batch.ema[ckpt_row - offset]
+            ema_bar = batch.ema_bar[ckpt_row - offset]
+        elif prev is not None and prev[0][0] == ckpt_row:
+            # No new canonical close since the stored checkpoint
+            ema, ema_bar = prev[1], prev[2]
+        else:
+            return
+
+        src_hash = checkpoint_fingerprint(daily_range, bar_range)
+        ckpt_ts = pd.Timestamp(int(grid_i8[ckpt_row]), tz="UTC")
+        for j, p in enumerate(periods):
+            if np.isnan(ema[j]) or np.isnan(ema_bar[j]):
+                continue
+            self.checkpoints.append(
+                {
+                    "id": key[0],
+                    "venue_id": key[1],
+                    "tf": key[2],
+                    "period": int(p),
+                    "tf_days": int(tf_days),
+                    "ckpt_ts": ckpt_ts,
+                    "ema": float(ema[j]),
+                    "ema_bar": float(ema_bar[j]),
+                    "src_hash": src_hash,
+                }
+            )
+
     # =========================================================================
     # Helper Methods (Module-specific)
     # =========================================================================
@@ -431,43 +775,11 @@ class MultiTFEMAFeature(BaseEMAFeature):
         Load bar closes for ALL TFs in a single query and cache.
 
         Call this before the TF loop to avoid 122 separate DB queries.
-        Subsequent calls to _load_bar_closes will use the cache.
+        Subsequent calls to _load_bar_closes will use the cache.  Each (id,
+        venue_id) with a valid resume checkpoint is loaded from its bound.
         """
-        end_ts = pd.to_datetime(end, utc=True) if end is not None else None
-
-        alignment_filter = ""
-        params: dict = {"ids": ids}
-        if self.config.alignment_source:
-            alignment_filter = "AND alignment_source = :alignment_source"
-            params["alignment_source"] = self.config.alignment_source
-        if end_ts is not None:
-            params["end_ts"] = end_ts
-
-        sql = f"""
-        SELECT
-          id,
-          tf,
-          bar_seq,
-          "timestamp" AS time_close,
-          close AS close_bar,
-          venue_id
-        FROM {self.bars_schema}.{self.bars_table}
-        WHERE id = ANY(:ids)
-          AND is_partial_end = FALSE
-          {alignment_filter}
-          {"" if end_ts is None else 'AND "timestamp" <= :end_ts'}
-        ORDER BY id, venue_id, tf, bar_seq
-        """
-
-        with self.engine.begin() as conn:
-            df = pd.read_sql_query(text(sql), conn, params=params)
-
-        if not df.empty:
-            df["time_close"] = pd.to_datetime(df["time_close"], utc=True)
-            df = df.sort_values(["id", "venue_id", "tf", "bar_seq"]).reset_index(
-                drop=True
-            )
-
+        self._bars_end = end
+        df = self._read_bar_closes(ids, end, self._since)
         self._bar_closes_cache = df
         logger.info(
             "Preloaded bar closes: %d rows across %d TFs",
@@ -493,15 +805,29 @@ class MultiTFEMAFeature(BaseEMAFeature):
             )
 
         # Fallback: per-TF query (backward compat for direct callers)
+        return self._read_bar_closes(ids, end, self._since, tf=tf)
+
+    def _read_bar_closes(
+        self,
+        ids: list[int],
+        end: Optional[str],
+        since: Optional[dict] = None,
+        tf: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Canonical bar closes (with ROW_HASH_SQL as row_hash), all TFs or one."""
         end_ts = pd.to_datetime(end, utc=True) if end is not None else None
 
         alignment_filter = ""
-        params: dict = {"tf": tf, "ids": ids}
+        params: dict = {"ids": ids}
         if self.config.alignment_source:
             alignment_filter = "AND alignment_source = :alignment_source"
             params["alignment_source"] = self.config.alignment_source
         if end_ts is not None:
             params["end_ts"] = end_ts
+        tf_filter = ""
+        if tf is not None:
+            tf_filter = "AND tf = :tf"
+            params["tf"] = tf
 
         sql = f"""
         SELECT
@@ -510,24 +836,27 @@ class MultiTFEMAFeature(BaseEMAFeature):
           bar_seq,
           "timestamp" AS time_close,
           close AS close_bar,
-          venue_id
-        FROM {self.bars_schema}.{self.bars_table}
-        WHERE tf = :tf
-          AND id = ANY(:ids)
+          venue_id,
+          {ROW_HASH_SQL} AS row_hash
+        FROM {self.bars_schema}.{self.bars_table} b
+        WHERE id = ANY(:ids)
           AND is_partial_end = FALSE
+          {tf_filter}
           {alignment_filter}
           {"" if end_ts is None else 'AND "timestamp" <= :end_ts'}
-        ORDER BY id, venue_id, bar_seq
+          {_since_clause(since, params)}
+        ORDER BY id, venue_id, tf, bar_seq
         """
 
         with self.engine.begin() as conn:
             df = pd.read_sql_query(text(sql), conn, params=params)
 
-        if df.empty:
-            return df
-
-        df["time_close"] = pd.to_datetime(df["time_close"], utc=True)
-        return df.sort_values(["id", "venue_id", "bar_seq"]).reset_index(drop=True)
+        if not df.empty:
+            df["time_close"] = pd.to_datetime(df["time_close"], utc=True)
+            df = df.sort_values(["id", "venue_id", "tf", "bar_seq"]).reset_index(
+                drop=True
+            )
+        return df
 
     def _synthetic_tf_day_bars_from_daily(
         self,
@@ -3,6 +3,10 @@
 All functions are pure (no DB/IO). Used by MicrostructureFeature and
 CodependenceFeature scripts.
 
+The rolling kernels (FFD, liquidity lambdas, rolling ADF, rolling entropy)
+are vectorized over windows -- no Python call per bar -- and accept either a
+1-D series or a 2-D ``(assets, time)`` panel, returning the same shape.
+
 Sections:
     1. Fractional Differentiation (MICRO-01)
     2. Liquidity Impact Measures (MICRO-02)
@@ -13,12 +17,53 @@ Sections:
 
 from __future__ import annotations
 
+import numba as nb
 import numpy as np
 import scipy.linalg
-import scipy.stats
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.feature_selection import mutual_info_regression
 from sklearn.metrics import mutual_info_score
 
+from ta_lab2.features.window_sums import block_window_sums, window_starts
+
+# Variance below this fraction of the raw sum of squares is treated as zero
+# (all-identical regressor values in a window).
+_VAR_EPS = 1e-12
+
+# Upper bound on elements materialized per chunk by the batched kernels
+# (rolling ADF design windows, rolling entropy windows).
+_CHUNK_ELEMS = 1 << 22
+
+
+# =========================================================
+# Helpers: (assets, time) panels and trailing-window sums
+# =========================================================
+
+
+def _as_rows(values) -> tuple[np.ndarray, bool]:
+    """View a 1-D series or 2-D (assets, time) panel as float64 rows."""
+    arr = np.asarray(values, dtype=np.float64)
+    if arr.ndim == 1:
+        return arr[None, :], True
+    if arr.ndim != 2:
+        raise ValueError(f"expected a 1-D series or 2-D panel, got shape {arr.shape}")
+    return arr, False
+
+
+def _trailing_sums(window: int, *arrays: np.ndarray) -> list[np.ndarray]:
+    """Sum of each (assets, time) array over every trailing ``window`` bars.
+
+    Uses the block-anchored cumulative sums of ``window_sums`` in one pass
+    over all arrays (stacked as columns).
+    """
+    n_assets, n = arrays[0].shape
+    stacked = np.concatenate(
+        [np.asarray(a, dtype=np.float64).T for a in arrays], axis=1
+    )
+    starts = window_starts(n, window)
+    total, _ = block_window_sums(stacked, starts, max(window, 1))
+    return [c.T for c in np.split(total, len(arrays), axis=1)]
+
 
 # =========================================================
 # Section 1: Fractional Differentiation (MICRO-01)
@@ -62,14 +107,16 @@ def frac_diff_ffd(
     """Apply FFD to a price (or log-price) series.
 
     Produces a fractionally differentiated series that preserves long-range
-    memory while achieving (or approaching) stationarity.
+    memory while achieving (or approaching) stationarity.  All bars are
+    filtered at once as a matrix product over a strided window view.
 
     Reference: Lopez de Prado (2018), Ch. 5, Section 5.4.
 
     Parameters
     ----------
     series : np.ndarray
-        1-D input series (e.g., close prices or log-close prices).
+        1-D input series (e.g., close prices or log-close prices), or a
+        2-D ``(assets, time)`` panel filtered row by row.
     d : float
         Fractional differentiation order.
     threshold : float
@@ -78,16 +125,19 @@ def frac_diff_ffd(
     Returns
     -------
     np.ndarray
-        Fractionally differentiated series. First ``(width - 1)`` values
-        are NaN where ``width = len(ffd_weights(d, threshold=threshold))``.
+        Fractionally differentiated series, same shape as ``series``. First
+        ``(width - 1)`` values are NaN where
+        ``width = len(ffd_weights(d, threshold=threshold))``.
     """
-    series = np.asarray(series, dtype=np.float64)
-    w = ffd_weights(d, size=len(series), threshold=threshold)
+    x, was_1d = _as_rows(series)
+    n = x.shape[1]
+    w = ffd_weights(d, size=n, threshold=threshold)
     width = len(w)
-    out = np.full(len(series), np.nan, dtype=np.float64)
-    for t in range(width - 1, len(series)):
-        out[t] = np.dot(w, series[t - width + 1 : t + 1][::-1])
-    return out
+    out = np.full(x.shape, np.nan, dtype=np.float64)
+    if n >= width:
+        # windows[:, k, j] = x[:, k + j]; the newest bar takes w[0]
+        out[:, width - 1 :] = sliding_window_view(x, width, axis=1) @ w[::-1]
+    return out[0] if was_1d else out
 
 
 def find_min_d(
@@ -96,19 +146,21 @@ def find_min_d(
     max_d: float = 1.0,
     n_steps: int = 20,
     adf_threshold: float = -2.9,
-) -> float:
+) -> float | np.ndarray:
     """Find the minimum fractional differentiation order achieving stationarity.
 
     Searches over d in [min_d, max_d] and returns the smallest d for which
     the Augmented Dickey-Fuller t-statistic is below ``adf_threshold``
-    (indicating stationarity).
+    (indicating stationarity).  For a panel, each candidate d is applied to
+    all still-unresolved assets in one FFD call.
 
     Reference: Lopez de Prado (2018), Ch. 5, Section 5.5.
 
     Parameters
     ----------
     close : np.ndarray
-        1-D close price array. Log is taken internally.
+        1-D close price array, or 2-D ``(assets, time)`` panel. Log is
+        taken internally.
     min_d : float
         Minimum d to test.
     max_d : float
@@ -121,25 +173,31 @@ def find_min_d(
 
     Returns
     -------
-    float
-        Minimum d that achieves stationarity. Returns ``max_d`` if no
-        tested d passes the ADF test.
+    float or np.ndarray
+        Minimum d that achieves stationarity (one per asset for a panel).
+        Returns ``max_d`` if no tested d passes the ADF test.
     """
-    close = np.asarray(close, dtype=np.float64)
+    close, was_1d = _as_rows(close)
     log_close = np.log(np.maximum(close, 1e-12))
-    d_values = np.linspace(min_d, max_d, n_steps)
-    for d in d_values:
-        ffd_series = frac_diff_ffd(log_close, d=d)
-        valid = ffd_series[~np.isnan(ffd_series)]
-        if len(valid) < 30:
-            continue
-        try:
-            t_stat = _adf_tstat(ffd_series[~np.isnan(ffd_series)])
-            if t_stat < adf_threshold:
-                return float(d)
-        except Exception:
-            continue
-    return float(max_d)
+    result = np.full(len(close), float(max_d))
+    pending = np.arange(len(close))
+    for d in np.linspace(min_d, max_d, n_steps):
+        if len(pending) == 0:
+            break
+        ffd_rows = frac_diff_ffd(log_close[pending], d=d)
+        passed = np.zeros(len(pending), dtype=bool)
+        for i, ffd_series in enumerate(ffd_rows):
+            valid = ffd_series[~np.isnan(ffd_series)]
+            if len(valid) < 30:
+                continue
+            try:
+                if _adf_tstat(valid) < adf_threshold:
+                    result[pending[i]] = d
+                    passed[i] = True
+            except Exception:
+                continue
+        pending = pending[~passed]
+    return float(result[0]) if was_1d else result
 
 
 # =========================================================
@@ -147,6 +205,47 @@ def find_min_d(
 # =========================================================
 
 
+def _price_inputs(close, volume) -> tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+    """Rows of close and volume plus bar-to-bar price change (first bar NaN)."""
+    close, was_1d = _as_rows(close)
+    volume, _ = _as_rows(volume)
+    if volume.shape != close.shape:
+        raise ValueError(
+            f"close and volume shapes differ: {close.shape} vs {volume.shape}"
+        )
+    delta_price = np.full(close.shape, np.nan, dtype=np.float64)
+    delta_price[:, 1:] = close[:, 1:] - close[:, :-1]
+    return close, volume, delta_price, was_1d
+
+
+def _rolling_pair_slope(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """Rolling OLS slope of y on x from windowed cumulative moments.
+
+    Matches ``scipy.stats.linregress(x[mask], y[mask]).slope`` per window
+    (mask = rows where both are non-NaN): NaN with fewer than 3 such rows,
+    all-identical x values, or a non-finite value in the window.  Values are
+    centred per asset first so the moment differences stay well conditioned.
+    """
+    present = ~(np.isnan(x) | np.isnan(y))
+    finite = present & np.isfinite(x) & np.isfinite(y)
+    n_fin = np.maximum(finite.sum(axis=1, keepdims=True), 1)
+    with np.errstate(invalid="ignore"):
+        cx = np.where(finite, x, 0.0).sum(axis=1, keepdims=True) / n_fin
+        cy = np.where(finite, y, 0.0).sum(axis=1, keepdims=True) / n_fin
+        x0 = np.where(finite, x - cx, 0.0)
+        y0 = np.where(finite, y - cy, 0.0)
+
+    cnt, n_bad, sx, sy, sxx, sxy = _trailing_sums(
+        window, present, present & ~finite, x0, y0, x0 * x0, x0 * y0
+    )
+    with np.errstate(all="ignore"):
+        ss_x = sxx - sx * sx / cnt
+        slope = (sxy - sx * sy / cnt) / ss_x
+    slope[(cnt < 2.5) | (n_bad > 0) | ~(ss_x > _VAR_EPS * sxx)] = np.nan
+    slope[:, :window] = np.nan
+    return slope
+
+
 def amihud_lambda(
     close: np.ndarray, volume: np.ndarray, window: int = 20
 ) -> np.ndarray:
@@ -161,39 +260,40 @@ def amihud_lambda(
     Parameters
     ----------
     close : np.ndarray
-        1-D close price array.
+        1-D close price array, or 2-D ``(assets, time)`` panel.
     volume : np.ndarray
-        1-D volume array (same length as close).
+        Volume array (same shape as close).
     window : int
         Rolling window size.
 
     Returns
     -------
     np.ndarray
-        Amihud lambda values. First ``window`` values are NaN.
-        Non-NaN values are non-negative.
+        Amihud lambda values, same shape as close. First ``window`` values
+        are NaN. Non-NaN values are non-negative.
     """
-    close = np.asarray(close, dtype=np.float64)
-    volume = np.asarray(volume, dtype=np.float64)
-    n = len(close)
-
-    ret = np.empty(n, dtype=np.float64)
-    ret[0] = np.nan
-    ret[1:] = np.abs(close[1:] / close[:-1] - 1.0)
-
-    # Dollar volume; guard against zero
-    dvol = np.abs(close * volume)
-    dvol = np.where(dvol == 0, np.nan, dvol)
-
-    ratio = ret / dvol
-
-    out = np.full(n, np.nan, dtype=np.float64)
-    for t in range(window, n):
-        chunk = ratio[t - window + 1 : t + 1]
-        valid = chunk[~np.isnan(chunk)]
-        if len(valid) > 0:
-            out[t] = np.mean(valid)
-    return out
+    close, volume, _, was_1d = _price_inputs(close, volume)
+
+    ret = np.full(close.shape, np.nan, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret[:, 1:] = np.abs(close[:, 1:] / close[:, :-1] - 1.0)
+
+        # Dollar volume; guard against zero
+        dvol = np.abs(close * volume)
+        dvol = np.where(dvol == 0, np.nan, dvol)
+        ratio = ret / dvol
+
+    # Rolling mean over the non-NaN ratios of each window
+    present = ~np.isnan(ratio)
+    finite = np.isfinite(ratio)
+    total, count, n_inf = _trailing_sums(
+        window, np.where(finite, ratio, 0.0), present, present & ~finite
+    )
+    with np.errstate(invalid="ignore"):
+        out = np.where(n_inf > 0, np.inf, total / count)
+    out[count < 0.5] = np.nan
+    out[:, :window] = np.nan
+    return out[0] if was_1d else out
 
 
 def kyle_lambda(close: np.ndarray, volume: np.ndarray, window: int = 20) -> np.ndarray:
@@ -208,43 +308,25 @@ def kyle_lambda(close: np.ndarray, volume: np.ndarray, window: int = 20) -> np.n
     Parameters
     ----------
     close : np.ndarray
-        1-D close price array.
+        1-D close price array, or 2-D ``(assets, time)`` panel.
     volume : np.ndarray
-        1-D volume array (same length as close).
+        Volume array (same shape as close).
     window : int
         Rolling window size for OLS regression.
 
     Returns
     -------
     np.ndarray
-        Kyle lambda (OLS slope) values. First ``window`` values are NaN.
+        Kyle lambda (OLS slope) values, same shape as close. First
+        ``window`` values are NaN.
     """
-    close = np.asarray(close, dtype=np.float64)
-    volume = np.asarray(volume, dtype=np.float64)
-    n = len(close)
-
-    delta_price = np.empty(n, dtype=np.float64)
-    delta_price[0] = np.nan
-    delta_price[1:] = close[1:] - close[:-1]
+    _, volume, delta_price, was_1d = _price_inputs(close, volume)
 
     # Signed volume: sign of price change * volume
-    sign = np.sign(delta_price)
-    signed_vol = sign * volume
-
-    out = np.full(n, np.nan, dtype=np.float64)
-    for t in range(window, n):
-        y = delta_price[t - window + 1 : t + 1]
-        x = signed_vol[t - window + 1 : t + 1]
-        mask = ~(np.isnan(y) | np.isnan(x))
-        if mask.sum() < 3:
-            continue
-        try:
-            result = scipy.stats.linregress(x[mask], y[mask])
-            out[t] = result.slope
-        except ValueError:
-            # All-identical x values in window (linregress cannot fit)
-            continue
-    return out
+    signed_vol = np.sign(delta_price) * volume
+
+    out = _rolling_pair_slope(signed_vol, delta_price, window)
+    return out[0] if was_1d else out
 
 
 def hasbrouck_lambda(
@@ -262,43 +344,25 @@ def hasbrouck_lambda(
     Parameters
     ----------
     close : np.ndarray
-        1-D close price array.
+        1-D close price array, or 2-D ``(assets, time)`` panel.
     volume : np.ndarray
-        1-D volume array (same length as close).
+        Volume array (same shape as close).
     window : int
         Rolling window size for OLS regression.
 
     Returns
     -------
     np.ndarray
-        Hasbrouck lambda (OLS slope) values. First ``window`` values are NaN.
+        Hasbrouck lambda (OLS slope) values, same shape as close. First
+        ``window`` values are NaN.
     """
-    close = np.asarray(close, dtype=np.float64)
-    volume = np.asarray(volume, dtype=np.float64)
-    n = len(close)
+    close, volume, delta_price, was_1d = _price_inputs(close, volume)
 
-    delta_price = np.empty(n, dtype=np.float64)
-    delta_price[0] = np.nan
-    delta_price[1:] = close[1:] - close[:-1]
-
-    sign = np.sign(delta_price)
     dvol = np.abs(close * volume)
-    signed_sqrt_dvol = sign * np.sqrt(np.maximum(dvol, 0.0))
-
-    out = np.full(n, np.nan, dtype=np.float64)
-    for t in range(window, n):
-        y = delta_price[t - window + 1 : t + 1]
-        x = signed_sqrt_dvol[t - window + 1 : t + 1]
-        mask = ~(np.isnan(y) | np.isnan(x))
-        if mask.sum() < 3:
-            continue
-        try:
-            result = scipy.stats.linregress(x[mask], y[mask])
-            out[t] = result.slope
-        except ValueError:
-            # All-identical x values in window (linregress cannot fit)
-            continue
-    return out
+    signed_sqrt_dvol = np.sign(delta_price) * np.sqrt(np.maximum(dvol, 0.0))
+
+    out = _rolling_pair_slope(signed_sqrt_dvol, delta_price, window)
+    return out[0] if was_1d else out
 
 
 # =========================================================
@@ -365,16 +429,46 @@ def _adf_tstat(log_prices: np.ndarray, lags: int = 1) -> float:
     return float(beta[0] / se_beta0)
 
 
+def _adf_tstat_from_gram(gram: np.ndarray, dof: int) -> np.ndarray:
+    """ADF t-statistics from centred Gram matrices of [dep, regressors].
+
+    ``gram[..., 0, 0]`` is the centred sum of squares of the dependent
+    variable, ``gram[..., 1:, 1:]`` that of the regressors (lagged level
+    first).  Centring absorbs the intercept (Frisch-Waugh), so the
+    coefficient, SSE and ``inv(X'X)[0, 0]`` equal those of the full
+    regression with a constant.  Singular windows give NaN.
+    """
+    xtx = gram[..., 1:, 1:]
+    xty = gram[..., 1:, 0]
+    p = xtx.shape[-1]
+    diag = np.diagonal(xtx, axis1=-2, axis2=-1)
+    # det <= prod(diag) for a PSD matrix; a tiny ratio means collinear columns
+    ok = np.linalg.det(xtx) > 1e-12 * np.prod(diag, axis=-1)
+    xtx = np.where(ok[..., None, None], xtx, np.eye(p))
+    xtx_inv = np.linalg.inv(xtx)
+    beta = np.einsum("...ij,...j->...i", xtx_inv, xty)
+    sse = np.maximum(gram[..., 0, 0] - np.einsum("...i,...i->...", xty, beta), 0.0)
+    var_beta0 = np.maximum(sse / dof * xtx_inv[..., 0, 0], 1e-20)
+    tstat = beta[..., 0] / np.sqrt(var_beta0)
+    tstat[~ok] = np.nan
+    return tstat
+
+
 def rolling_adf(log_prices: np.ndarray, window: int = 63, lags: int = 1) -> np.ndarray:
     """Rolling-window ADF t-statistic for detecting explosive behavior.
 
     Applying this to log-prices with a rolling window provides a proxy for
     the SADF (Supremum ADF) bubble detector from Phillips, Shi & Yu (2015).
 
+    Every window's regression is solved together: the ADF design rows are
+    built once, each window's centred Gram matrix comes from a strided view
+    (in bounded chunks), and the small normal-equation systems are inverted
+    as one batch.  Results match ``_adf_tstat`` applied window by window.
+
     Parameters
     ----------
     log_prices : np.ndarray
-        1-D array of log-prices.
+        1-D array of log-prices, or 2-D ``(assets, time)`` panel.
     window : int
         Rolling window size for the ADF test.
     lags : int
@@ -383,16 +477,40 @@ def rolling_adf(log_prices: np.ndarray, window: int = 63, lags: int = 1) -> np.n
     Returns
     -------
     np.ndarray
-        Rolling ADF t-statistics. First ``window`` values are NaN.
-        Values > ~1.5 may indicate explosive (bubble-like) behavior.
+        Rolling ADF t-statistics, same shape as ``log_prices``. First
+        ``window`` values are NaN. Values > ~1.5 may indicate explosive
+        (bubble-like) behavior.
     """
-    log_prices = np.asarray(log_prices, dtype=np.float64)
-    n = len(log_prices)
-    out = np.full(n, np.nan, dtype=np.float64)
-    for t in range(window, n):
-        segment = log_prices[t - window + 1 : t + 1]
-        out[t] = _adf_tstat(segment, lags=lags)
-    return out
+    y, was_1d = _as_rows(log_prices)
+    n_assets, n = y.shape
+    out = np.full(y.shape, np.nan, dtype=np.float64)
+
+    # Per window: m regression rows, lags + 2 columns (level, diffs, const)
+    m = window - 1 - lags
+    dof = m - (lags + 2)
+    if window < lags + 5 or dof <= 0 or n <= window:
+        return out[0] if was_1d else out
+
+    # Design rows j: [dy_j, y_j, dy_{j-1}, ..., dy_{j-lags}], as in _adf_tstat
+    dy = np.diff(y, axis=1)
+    n_dy = dy.shape[1]
+    cols = [dy[:, lags:], y[:, lags:-1]]
+    cols += [dy[:, lags - lag : n_dy - lag] for lag in range(1, lags + 1)]
+    design = np.stack(cols, axis=1)  # (assets, lags + 2, rows)
+
+    # Window k covers design rows k..k+m-1 and ends at bar t = k + window - 1;
+    # output starts at t = window (k = 1).
+    views = sliding_window_view(design, m, axis=2)  # (assets, cols, k, m)
+    n_win = views.shape[2]
+    chunk = max(1, _CHUNK_ELEMS // (n_assets * design.shape[1] * m))
+    for k0 in range(1, n_win, chunk):
+        k1 = min(k0 + chunk, n_win)
+        block = views[:, :, k0:k1, :]
+        dev = block - block.mean(axis=-1, keepdims=True)
+        gram = np.einsum("aikm,ajkm->akij", dev, dev)
+        with np.errstate(all="ignore"):
+            out[:, k0 + window - 1 : k1 + window - 1] = _adf_tstat_from_gram(gram, dof)
+    return out[0] if was_1d else out
 
 
 # =========================================================
@@ -486,6 +604,64 @@ def lempel_ziv_complexity(s: list) -> int:
     return c
 
 
+def _quantile_encode_rows(rows: np.ndarray, n_bins: int) -> np.ndarray:
+    """``quantile_encode`` applied to every row of a NaN-free 2-D array.
+
+    A value's symbol is the number of distinct quantile edges (excluding the
+    row minimum) strictly below it, clipped to the number of distinct bins --
+    the same result as ``np.searchsorted`` on the de-duplicated edges.
+    """
+    edges = np.quantile(rows, np.linspace(0, 1, n_bins + 1), axis=1).T
+    distinct = np.ones(edges.shape, dtype=bool)
+    distinct[:, 1:] = edges[:, 1:] != edges[:, :-1]
+    n_actual_bins = np.maximum(distinct.sum(axis=1) - 1, 1)
+    encoded = np.zeros(rows.shape, dtype=np.int64)
+    for k in range(1, n_bins + 1):
+        encoded += distinct[:, k, None] & (edges[:, k, None] < rows)
+    return np.minimum(encoded, n_actual_bins[:, None] - 1)
+
+
+def _shannon_entropy_rows(encoded: np.ndarray, n_bins: int) -> np.ndarray:
+    """``shannon_entropy`` of every row of a 2-D symbol array."""
+    counts = np.stack([(encoded == b).sum(axis=1) for b in range(n_bins)], axis=1)
+    p = counts / encoded.shape[1]
+    return -np.where(counts > 0, p * np.log(p + 1e-12), 0.0).sum(axis=1)
+
+
+@nb.njit(cache=True)
+def _lempel_ziv_rows(encoded: np.ndarray) -> np.ndarray:
+    """``lempel_ziv_complexity`` of every row of a 2-D symbol array."""
+    n_rows, n = encoded.shape
+    out = np.zeros(n_rows, dtype=np.float64)
+    for r in range(n_rows):
+        if n == 0:
+            continue
+        s = encoded[r]
+        c = 1
+        u = 1
+        v = 1
+        while u + v <= n:
+            # Is s[u:u+v] a substring starting before u?
+            found = False
+            for j in range(u):
+                match = True
+                for k in range(v):
+                    if s[j + k] != s[u + k]:
+                        match = False
+                        break
+                if match:
+                    found = True
+                    break
+            if found:
+                v += 1
+            else:
+                c += 1
+                u += v
+                v = 1
+        out[r] = c
+    return out
+
+
 def rolling_entropy(
     returns: np.ndarray, window: int = 50, n_bins: int = 10
 ) -> tuple[np.ndarray, np.ndarray]:
@@ -493,10 +669,14 @@ def rolling_entropy(
 
     CRITICAL: Entropy must be computed on RETURN series, not price levels.
 
+    Complete windows are encoded and scored together (batched quantiles and
+    a compiled LZ76 loop); windows containing NaNs drop them and fall back
+    to the scalar functions.
+
     Parameters
     ----------
     returns : np.ndarray
-        1-D return series.
+        1-D return series, or 2-D ``(assets, time)`` panel.
     window : int
         Rolling window size.
     n_bins : int
@@ -505,26 +685,46 @@ def rolling_entropy(
     Returns
     -------
     tuple[np.ndarray, np.ndarray]
-        (shannon_vals, lz_vals) both of shape ``(len(returns),)``.
+        (shannon_vals, lz_vals) both shaped like ``returns``.
         First ``window`` values are NaN.
         LZ complexity is normalized by ``log2(window)``.
     """
-    returns = np.asarray(returns, dtype=np.float64)
-    n = len(returns)
-    shannon_vals = np.full(n, np.nan, dtype=np.float64)
-    lz_vals = np.full(n, np.nan, dtype=np.float64)
+    x, was_1d = _as_rows(returns)
+    n_assets, n = x.shape
+    shannon_vals = np.full(x.shape, np.nan, dtype=np.float64)
+    lz_vals = np.full(x.shape, np.nan, dtype=np.float64)
     lz_norm = np.log2(max(window, 2))
 
-    for t in range(window, n):
-        chunk = returns[t - window + 1 : t + 1]
-        if np.all(np.isnan(chunk)):
-            continue
-        valid = chunk[~np.isnan(chunk)]
-        if len(valid) < 3:
-            continue
-        enc = quantile_encode(valid, n_bins=n_bins)
-        shannon_vals[t] = shannon_entropy(enc)
-        lz_vals[t] = lempel_ziv_complexity(enc.tolist()) / lz_norm
+    if n > window:
+        # Windows ending at t = window..n-1 (a strided view, no copy).  Only
+        # a time chunk of them is materialized at a time, flattened across
+        # assets, to bound memory on long panels.
+        views = sliding_window_view(x, window, axis=1)[:, 1:]
+        chunk = max(1, _CHUNK_ELEMS // (n_assets * window))
+        for c0 in range(0, n - window, chunk):
+            c1 = min(c0 + chunk, n - window)
+            windows = views[:, c0:c1].reshape(-1, window)
+            sh_flat = np.full(len(windows), np.nan)
+            lz_flat = np.full(len(windows), np.nan)
+            n_valid = window - np.isnan(windows).sum(axis=1)
+
+            complete = n_valid == window
+            if window >= 3 and complete.any():
+                enc = _quantile_encode_rows(windows[complete], n_bins)
+                sh_flat[complete] = _shannon_entropy_rows(enc, n_bins)
+                lz_flat[complete] = _lempel_ziv_rows(enc) / lz_norm
+
+            for i in np.flatnonzero(~complete & (n_valid >= 3)):
+                valid = windows[i][~np.isnan(windows[i])]
+                enc = quantile_encode(valid, n_bins=n_bins)
+                sh_flat[i] = shannon_entropy(enc)
+                lz_flat[i] = lempel_ziv_complexity(enc.tolist()) / lz_norm
+
+            shannon_vals[:, window + c0 : window + c1] = sh_flat.reshape(n_assets, -1)
+            lz_vals[:, window + c0 : window + c1] = lz_flat.reshape(n_assets, -1)
+
+    if was_1d:
+        return shannon_vals[0], lz_vals[0]
     return shannon_vals, lz_vals
 
 
@@ -533,6 +733,116 @@ def rolling_entropy(
 # =========================================================
 
 
+def _abs_dev_row_sums(x: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Row sums ``a_i = sum_j |x_i - x_j|`` from the ascending ``order`` of x."""
+    n = len(x)
+    xs = x[order]
+    k = np.arange(n)
+    prefix = np.cumsum(xs) - xs  # sum of values strictly before position k
+    total = xs.sum()
+    sums = np.empty(n, dtype=np.float64)
+    sums[order] = xs * k - prefix + (total - prefix - xs) - xs * (n - 1 - k)
+    return sums
+
+
+def _dense_ranks(y: np.ndarray) -> np.ndarray:
+    """0-based dense ranks of y (tied values share a rank)."""
+    _, inverse = np.unique(y, return_inverse=True)
+    return inverse.astype(np.int64).ravel()
+
+
+@nb.njit(cache=True)
+def _dcov_cross_term(xs: np.ndarray, ys: np.ndarray, y_rank: np.ndarray) -> float:
+    """``sum_ij |x_i - x_j| |y_i - y_j|`` for xs ascending, in O(n log n).
+
+    Huo & Szekely (2016): walking the points in x order, every earlier point
+    i contributes ``(x_j - x_i) * |y_j - y_i|``. Splitting the earlier points
+    by ``y_i <= y_j`` turns the absolute value into a sign, so only the
+    count and the sums of y, x and x*y over each side are needed. A Fenwick
+    tree keyed by the rank of y keeps those four sums.
+    """
+    n = len(xs)
+    size = 0
+    for j in range(n):
+        size = max(size, y_rank[j] + 1)
+    cnt = np.zeros(size + 1)
+    s_y = np.zeros(size + 1)
+    s_x = np.zeros(size + 1)
+    s_xy = np.zeros(size + 1)
+    tot_c = 0.0
+    tot_y = 0.0
+    tot_x = 0.0
+    tot_xy = 0.0
+    acc = 0.0
+    for j in range(n):
+        xj = xs[j]
+        yj = ys[j]
+        # Prefix query over ranks <= rank(y_j)
+        c = 0.0
+        sy = 0.0
+        sx = 0.0
+        sxy = 0.0
+        i = y_rank[j] + 1
+        while i > 0:
+            c += cnt[i]
+            sy += s_y[i]
+            sx += s_x[i]
+            sxy += s_xy[i]
+            i -= i & -i
+        le = c * xj * yj - xj * sy - yj * sx + sxy
+        gc = tot_c - c
+        gt = gc * xj * yj - xj * (tot_y - sy) - yj * (tot_x - sx) + (tot_xy - sxy)
+        acc += le - gt
+        # Insert point j
+        i = y_rank[j] + 1
+        while i <= size:
+            cnt[i] += 1.0
+            s_y[i] += yj
+            s_x[i] += xj
+            s_xy[i] += xj * yj
+            i += i & -i
+        tot_c += 1.0
+        tot_y += yj
+        tot_x += xj
+        tot_xy += xj * yj
+    return 2.0 * acc
+
+
+def distance_covariance(x: np.ndarray, y: np.ndarray) -> float:
+    """Squared sample distance covariance (V-statistic) in O(n log n).
+
+    Equal to ``(A * B).mean()`` of the double-centred distance matrices,
+    computed without materializing them: with row sums ``a_i`` and ``b_i``
+    of the distance matrices,
+
+        dCov^2 = S / n^2 - 2 * sum(a_i * b_i) / n^3 + sum(a) * sum(b) / n^4
+
+    where ``S = sum_ij a_ij * b_ij`` comes from ``_dcov_cross_term``.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        1-D array of observations.
+    y : np.ndarray
+        1-D array of observations (same length as x).
+
+    Returns
+    -------
+    float
+        Squared distance covariance. 0.0 for fewer than 2 observations.
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    n = len(x)
+    if n < 2:
+        return 0.0
+    order_x = np.argsort(x, kind="mergesort")
+    a = _abs_dev_row_sums(x, order_x)
+    b = _abs_dev_row_sums(y, np.argsort(y, kind="mergesort"))
+    cross = _dcov_cross_term(x[order_x], y[order_x], _dense_ranks(y)[order_x])
+    return float(cross / n**2 - 2.0 * (a @ b) / n**3 + a.sum() * b.sum() / n**4)
+
+
 def distance_correlation(x: np.ndarray, y: np.ndarray) -> float:
     """Szekely (2007) distance correlation.
 
@@ -540,6 +850,9 @@ def distance_correlation(x: np.ndarray, y: np.ndarray) -> float:
     between two random variables. Unlike Pearson correlation, dcor = 0
     implies independence (for finite-variance distributions).
 
+    The distance covariances come from ``distance_covariance`` (O(n log n)
+    time, O(n) memory) rather than from n x n distance matrices.
+
     Reference: Szekely, G. J., Rizzo, M. L. & Bakirov, N. K. (2007).
     "Measuring and testing dependence by correlation of distances."
     *Annals of Statistics*.
@@ -558,29 +871,15 @@ def distance_correlation(x: np.ndarray, y: np.ndarray) -> float:
     """
     x = np.asarray(x, dtype=np.float64).ravel()
     y = np.asarray(y, dtype=np.float64).ravel()
-    n = len(x)
-    if n < 2:
+    if len(x) < 2:
         return 0.0
+    return dcor_from_dcov(
+        distance_covariance(x, y), distance_covariance(x, x), distance_covariance(y, y)
+    )
 
-    # Distance matrices
-    a = np.abs(x[:, None] - x[None, :])
-    b = np.abs(y[:, None] - y[None, :])
-
-    # Double-centering
-    a_row = a.mean(axis=1, keepdims=True)
-    a_col = a.mean(axis=0, keepdims=True)
-    a_grand = a.mean()
-    A = a - a_row - a_col + a_grand
-
-    b_row = b.mean(axis=1, keepdims=True)
-    b_col = b.mean(axis=0, keepdims=True)
-    b_grand = b.mean()
-    B = b - b_row - b_col + b_grand
-
-    dcov2_xy = (A * B).mean()
-    dcov2_xx = (A * A).mean()
-    dcov2_yy = (B * B).mean()
 
+def dcor_from_dcov(dcov2_xy: float, dcov2_xx: float, dcov2_yy: float) -> float:
+    """Distance correlation from the three squared distance covariances."""
     denom = np.sqrt(dcov2_xx * dcov2_yy)
     if denom < 1e-20:
         return 0.0
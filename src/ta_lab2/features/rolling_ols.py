@@ -0,0 +1,173 @@
+"""
+Rolling OLS on a bar index, vectorized from (block-anchored) cumulative sums.
+
+Regresses each column on x = 0, 1, ..., m-1 over a trailing window of m bars
+(m = window, or fewer at the start of a series/group) and returns slope,
+intercept, R^2 and the slope t-statistic for every column in one pass --
+no Python call per window.
+
+NaN semantics match ``Series.rolling(window, min_periods).apply(f, raw=True)``
+with a NaN-propagating ``f`` (the implementations this replaces): a result is
+NaN when its window contains any NaN or has fewer than ``min_periods`` bars.
+
+Windows never cross group boundaries when ``groups`` is given (contiguous
+labels, e.g. asset ids of a frame sorted by id), so many assets can be
+computed in one call.  The windowed sums live in ``window_sums``.
+
+Public API:
+    rolling_ols(values, window, min_periods=2, groups=None) -> RollingOLS
+    rolling_slope(values, window, min_periods=2, groups=None)
+    rolling_wma(values, window, min_periods=1, groups=None)
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ta_lab2.features.window_sums import block_window_sums, window_starts
+
+__all__ = ["RollingOLS", "rolling_ols", "rolling_slope", "rolling_wma"]
+
+
+class RollingOLS(NamedTuple):
+    """Rolling regression outputs, each shaped like the input.
+
+    The intercept is the fitted value at the first bar of the window (x=0).
+    The t-statistic needs m >= 3 bars; it is +/-inf for an exact line.
+    """
+
+    slope: np.ndarray | pd.Series | pd.DataFrame
+    intercept: np.ndarray | pd.Series | pd.DataFrame
+    r2: np.ndarray | pd.Series | pd.DataFrame
+    tstat: np.ndarray | pd.Series | pd.DataFrame
+
+
+# ---------------------------------------------------------------------------
+# Core: windowed sums
+# ---------------------------------------------------------------------------
+
+
+def _as_2d(values) -> tuple[np.ndarray, bool]:
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 1:
+        return arr[:, None], True
+    if arr.ndim != 2:
+        raise ValueError(f"expected 1-D or 2-D values, got shape {arr.shape}")
+    return arr, False
+
+
+def _window_sums(y: np.ndarray, window: int, groups):
+    """Per-row window length m and sums Sy, Sky (k = local bar 0..m-1), Syy.
+
+    Also returns the NaN count per window and the per-column centre that was
+    subtracted from y before summing (added back by callers).
+    """
+    n = y.shape[0]
+    starts = window_starts(n, window, groups)
+    m = (np.arange(n) - starts + 1).astype(float)[:, None]
+
+    nan = np.isnan(y)
+    count = (~nan).sum(axis=0)
+    center = np.where(nan, 0.0, y).sum(axis=0) / np.maximum(count, 1)
+    yc = np.where(nan, 0.0, y - center)
+
+    block = max(window, 1)
+    sy, sky = block_window_sums(yc, starts, block, weighted=True)
+    syy, _ = block_window_sums(yc * yc, starts, block, weighted=False)
+    n_nan, _ = block_window_sums(nan.astype(float), starts, block, weighted=False)
+    return m, sy, sky, syy, n_nan, center
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def _wrap(values, arr: np.ndarray, was_1d: bool):
+    out = arr[:, 0] if was_1d else arr
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(out, index=values.index, columns=values.columns)
+    if isinstance(values, pd.Series):
+        return pd.Series(out, index=values.index, name=values.name)
+    return out
+
+
+def rolling_ols(
+    values,
+    window: int,
+    min_periods: int = 2,
+    groups=None,
+) -> RollingOLS:
+    """Rolling OLS of each column on the bar index.
+
+    Parameters
+    ----------
+    values:
+        Series, DataFrame or 1-D/2-D array, time-ordered along axis 0.
+    window:
+        Maximum number of bars per window.
+    min_periods:
+        Minimum bars in a window (at the start of a series/group).  At least 2.
+    groups:
+        Optional per-row labels; windows restart at every label change.
+
+    Returns
+    -------
+    RollingOLS of slope, intercept, r2, tstat shaped like ``values``.
+    """
+    window = int(window)
+    min_periods = max(2, int(min_periods))
+    y, was_1d = _as_2d(values)
+    m, sy, sky, syy, n_nan, center = _window_sums(y, window, groups)
+
+    sk = m * (m - 1.0) / 2.0
+    skk = (m - 1.0) * m * (2.0 * m - 1.0) / 6.0
+    with np.errstate(all="ignore"):
+        ss_x = skk - sk * sk / m
+        ss_xy = sky - sk * sy / m
+        ss_yy = np.maximum(syy - sy * sy / m, 0.0)
+        slope = ss_xy / ss_x
+        intercept = (sy - slope * sk) / m + center
+        r2 = np.where(
+            ss_yy > 0, np.minimum(ss_xy * ss_xy / (ss_x * ss_yy), 1.0), np.nan
+        )
+        ss_res = np.maximum(ss_yy - slope * ss_xy, 0.0)
+        tstat = slope / np.sqrt(ss_res / (m - 2.0) / ss_x)
+
+    invalid = (n_nan > 0) | (m < min_periods)
+    slope[invalid] = np.nan
+    intercept[invalid] = np.nan
+    r2[invalid] = np.nan
+    tstat[invalid | (m < 3)] = np.nan
+    return RollingOLS(
+        _wrap(values, slope, was_1d),
+        _wrap(values, intercept, was_1d),
+        _wrap(values, r2, was_1d),
+        _wrap(values, tstat, was_1d),
+    )
+
+
+def rolling_slope(values, window: int, min_periods: int = 2, groups=None):
+    """Rolling OLS slope only (see rolling_ols)."""
+    return rolling_ols(values, window, min_periods, groups).slope
+
+
+def rolling_wma(values, window: int, min_periods: int = 1, groups=None):
+    """Linearly weighted moving average, weights 1..window (newest heaviest).
+
+    A window shorter than ``window`` (series/group start) uses the newest
+    weights, i.e. window-m+1..window.
+    """
+    window = int(window)
+    y, was_1d = _as_2d(values)
+    m, sy, sky, _, n_nan, center = _window_sums(y, window, groups)
+    # weight of local bar k is k + (window - m + 1)
+    offset = window - m + 1.0
+    w_sum = m * (m - 1.0) / 2.0 + offset * m
+    with np.errstate(all="ignore"):
+        out = (sky + offset * sy) / w_sum + center
+    out[(n_nan > 0) | (m < max(1, int(min_periods)))] = np.nan
+    return _wrap(values, out, was_1d)
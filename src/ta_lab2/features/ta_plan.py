@@ -0,0 +1,756 @@
+"""
+Whole-frame Polars plan for the TA indicator set.
+
+Compiles the active ``dim_indicators`` rows into a single lazy query over the
+full multi-asset frame, instead of running every indicator once per
+(id, venue_id) group:
+
+- Order-dependent expressions (shift, diff, rolling windows, EWMs, cumulative
+  sums) run with ``.over(["id", "venue_id"])``, so groups never leak into each
+  other.
+- Intermediate series are graph nodes named after what they compute
+  (``ema(close,12)``, ``tr``, ``tp``, ``rmax(high,14)``, ...). Indicators
+  that need the same series share one node: the true range feeding ATR, ADX,
+  Keltner and Vortex, or the close EMAs shared by MACD, Keltner and Elder Ray,
+  are computed once.
+- Nodes are layered by dependency depth, each layer is one ``with_columns``,
+  and the query is collected once.
+
+Values follow the pandas implementations in ``indicators`` and
+``indicators_extended``: the same warm-up lengths, zero-denominator guards,
+and EWM behaviour across gaps. VIDYA, FRAMA and Aroon are recursive or argmax
+based; their inputs are built as expressions, and the recursion itself runs in
+a compiled kernel over the whole (sorted) column inside the plan.
+
+Public API:
+    TAPlan(columns, keys=("id", "venue_id"))
+    build_ta_plan(indicator_params, columns) -> TAPlan
+    compute_ta_polars(df, indicator_params) -> pd.DataFrame
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from collections.abc import Callable, Iterable
+
+import numba as nb
+import numpy as np
+import pandas as pd
+import polars as pl
+
+from ta_lab2.features.polars_feature_ops import (
+    pandas_to_polars_df,
+    polars_to_pandas_df,
+)
+
+__all__ = [
+    "TAPlan",
+    "build_ta_plan",
+    "compute_ta_polars",
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYS = ("id", "venue_id")
+
+# Prefix of the helper columns the plan adds (and drops before returning).
+_PREFIX = "__ta:"
+
+
+# ---------------------------------------------------------------------------
+# Compiled kernels (whole column, groups contiguous)
+# ---------------------------------------------------------------------------
+
+
+@nb.njit(cache=True)
+def _adaptive_ema(x: np.ndarray, alpha: np.ndarray, active: np.ndarray):
+    """EMA with a per-bar smoothing factor (VIDYA / FRAMA recursion).
+
+    Inactive bars (warm-up) are NaN; the first active bar after a NaN seeds
+    the average with the price, as in ``indicators_extended``. Every group
+    starts with at least one inactive bar, so groups never chain.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    for i in range(n):
+        if not active[i]:
+            continue
+        prev = out[i - 1] if i > 0 else np.nan
+        if np.isnan(prev):
+            out[i] = x[i]
+        else:
+            out[i] = alpha[i] * x[i] + (1.0 - alpha[i]) * prev
+    return out
+
+
+@nb.njit(cache=True)
+def _bars_since_extreme(x: np.ndarray, row: np.ndarray, window: int, sign: float):
+    """Bars since the first max (sign=1) or min (sign=-1) of a rolling window.
+
+    Equals ``len(w) - 1 - argmax(w)`` over ``rolling(window, min_periods=window)``
+    per group; NaN during warm-up or when the window contains a NaN. Uses a
+    monotone deque, so O(n) overall.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    dq = np.empty(n, np.int64)
+    head = 0
+    tail = 0
+    last_nan = -1
+    for i in range(n):
+        if row[i] == 0:
+            head = 0
+            tail = 0
+        v = x[i]
+        if np.isnan(v):
+            last_nan = i
+        else:
+            sv = sign * v
+            # pop strictly smaller values only: ties keep the earliest bar
+            while tail > head and sign * x[dq[tail - 1]] < sv:
+                tail -= 1
+            dq[tail] = i
+            tail += 1
+        lo = i - window + 1
+        while tail > head and dq[head] < lo:
+            head += 1
+        if row[i] >= window - 1 and last_nan < lo:
+            out[i] = i - dq[head]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+
+def _label(col: str) -> str:
+    return col.removeprefix(_PREFIX)
+
+
+def _nz(expr: pl.Expr) -> pl.Expr:
+    """Denominator guard: ``s.replace(0.0, np.nan)``."""
+    return pl.when(expr != 0.0).then(expr)
+
+
+class TAPlan:
+    """Deduplicated expression graph for a set of indicators.
+
+    Helper methods take and return column names. A node is added once per
+    distinct computation; asking for it again returns the existing column.
+    ``out`` registers a final (element-wise) output column; registering the
+    same name again replaces the expression but keeps the column position,
+    like assigning a DataFrame column twice.
+    """
+
+    def __init__(self, columns: Iterable[str], keys: Iterable[str] = DEFAULT_KEYS):
+        self.columns = set(columns)
+        self.keys = list(keys)
+        self.outputs: dict[str, pl.Expr] = {}
+        self._layers: list[dict[str, pl.Expr]] = []
+        self._depth: dict[str, int] = {}
+
+    # -- graph ---------------------------------------------------------------
+
+    def node(self, label: str, expr: pl.Expr, *, window: bool = False) -> str:
+        """Add ``expr`` as helper column ``label``; ``window`` runs it per group."""
+        name = _PREFIX + label
+        if name in self._depth:
+            return name
+        deps = [self._depth.get(c, -1) for c in expr.meta.root_names()]
+        depth = 1 + max(deps, default=-1)
+        if window:
+            expr = expr.over(self.keys)
+        while len(self._layers) <= depth:
+            self._layers.append({})
+        self._layers[depth][name] = expr.alias(name)
+        self._depth[name] = depth
+        return name
+
+    def out(self, name: str, expr: pl.Expr) -> None:
+        self.outputs[name] = expr.cast(pl.Float64)
+
+    def require(self, *cols: str) -> None:
+        missing = [c for c in cols if c not in self.columns]
+        if missing:
+            raise KeyError(f"Column '{missing[0]}' not found in DataFrame.")
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self._depth)
+
+    # -- inputs and element-wise nodes ---------------------------------------
+
+    def inp(self, col: str) -> str:
+        self.require(col)
+        return self.node(col, pl.col(col).cast(pl.Float64).fill_nan(None))
+
+    def row(self) -> str:
+        """Position of each bar within its group."""
+        return self.node("row", pl.int_range(pl.len(), dtype=pl.Int64), window=True)
+
+    def tr(self) -> str:
+        """True range; the first bar of a group is high - low."""
+        h, lo, pc = self.inp("high"), self.inp("low"), self.shift(self.inp("close"))
+        hh, ll, cc = pl.col(h), pl.col(lo), pl.col(pc)
+        return self.node(
+            "tr",
+            pl.max_horizontal((hh - ll).abs(), (hh - cc).abs(), (ll - cc).abs()),
+        )
+
+    def tp(self) -> str:
+        """Typical price (H+L+C)/3."""
+        h, lo, c = self.inp("high"), self.inp("low"), self.inp("close")
+        return self.node("tp", (pl.col(h) + pl.col(lo) + pl.col(c)) / 3.0)
+
+    def mfv(self) -> str:
+        """Money-flow volume shared by CMF and the Chaikin oscillator."""
+        h, lo, c = self.inp("high"), self.inp("low"), self.inp("close")
+        v = self.inp("volume")
+        hh, ll, cc = pl.col(h), pl.col(lo), pl.col(c)
+        mfm = ((cc - ll) - (hh - cc)) / _nz(hh - ll)
+        return self.node("mfv", mfm * pl.col(v))
+
+    def roc(self, src: str, n: int) -> str:
+        """Percent change over ``n`` bars, NaN when the base is 0."""
+        base = pl.col(self.shift(src, n))
+        return self.node(
+            f"roc({_label(src)},{n})", (pl.col(src) - base) / _nz(base) * 100.0
+        )
+
+    # -- per-group (windowed) nodes ------------------------------------------
+
+    def shift(self, src: str, n: int = 1) -> str:
+        return self.node(f"shift({_label(src)},{n})", pl.col(src).shift(n), window=True)
+
+    def diff(self, src: str, n: int = 1) -> str:
+        c = pl.col(src)
+        return self.node(f"diff({_label(src)},{n})", c - c.shift(n), window=True)
+
+    def ema(self, src: str, span: float | None = None, *, alpha: float | None = None):
+        """``ewm(span|alpha, adjust=False).mean()``; gaps carry the last value."""
+        label = (
+            f"ema({_label(src)},{span})"
+            if alpha is None
+            else (f"ewma({_label(src)},{alpha!r})")
+        )
+        expr = (
+            pl.col(src)
+            .fill_nan(None)
+            .ewm_mean(span=span, alpha=alpha, adjust=False, ignore_nulls=False)
+            .forward_fill()
+        )
+        return self.node(label, expr, window=True)
+
+    def _rolling(self, op: str, src: str, n: int, **kwargs) -> str:
+        args = "".join(f",{k}={v}" for k, v in kwargs.items())
+        c = pl.col(src).fill_nan(None)
+        expr = getattr(c, f"rolling_{op}")(n, min_samples=n, **kwargs)
+        return self.node(f"r{op}({_label(src)},{n}{args})", expr, window=True)
+
+    def sma(self, src: str, n: int) -> str:
+        return self._rolling("mean", src, n)
+
+    def rsum(self, src: str, n: int) -> str:
+        return self._rolling("sum", src, n)
+
+    def rstd(self, src: str, n: int, ddof: int = 1) -> str:
+        return self._rolling("std", src, n, ddof=ddof)
+
+    def _rolling_extreme(self, op: str, src: str, n: int) -> str:
+        """Rolling max/min, null whenever the window holds a null.
+
+        ``rolling_max``/``rolling_min`` can emit a value for a full-length
+        window that contains a null even with ``min_samples=n``; pandas (and
+        the indicators built on it) give NaN there.
+        """
+        c = pl.col(src).fill_nan(None)
+        nulls = c.is_null().cast(pl.Int32).rolling_sum(n, min_samples=n)
+        expr = pl.when(nulls == 0).then(getattr(c, f"rolling_{op}")(n))
+        return self.node(f"r{op}({_label(src)},{n})", expr, window=True)
+
+    def rmax(self, src: str, n: int) -> str:
+        return self._rolling_extreme("max", src, n)
+
+    def rmin(self, src: str, n: int) -> str:
+        return self._rolling_extreme("min", src, n)
+
+    def wma(self, src: str, n: int) -> str:
+        """Linear-weighted (1..n) moving average, full windows only.
+
+        Written as a sum of shifts: weighted ``rolling_sum`` rejects nulls,
+        and a null anywhere in the window must give a null, as in
+        ``rolling_wma``.
+        """
+        c = pl.col(src).fill_nan(None)
+        expr = pl.lit(0.0)
+        for k in range(1, n + 1):
+            expr = expr + float(k) * c.shift(n - k)
+        expr = expr / (n * (n + 1) / 2.0)
+        return self.node(f"wma({_label(src)},{n})", expr, window=True)
+
+    def cumsum(self, src: str) -> str:
+        return self.node(f"cumsum({_label(src)})", pl.col(src).cum_sum(), window=True)
+
+    # -- compiled kernels ----------------------------------------------------
+
+    def kernel(self, label: str, fn: Callable[..., np.ndarray], *srcs: str) -> str:
+        """Run ``fn(*numpy_columns)`` over whole columns (groups contiguous)."""
+
+        def _call(series: list[pl.Series]) -> pl.Series:
+            arrays = [np.ascontiguousarray(s.to_numpy()) for s in series]
+            return pl.Series(fn(*arrays), dtype=pl.Float64)
+
+        expr = pl.map_batches(list(srcs), _call, return_dtype=pl.Float64)
+        return self.node(label, expr.fill_nan(None))
+
+    # -- execution -----------------------------------------------------------
+
+    def apply(self, lf: pl.LazyFrame, ts_col: str = "ts") -> pl.LazyFrame:
+        """Sort by (keys, ts), add every layer, then the outputs."""
+        lf = lf.sort([*self.keys, ts_col])
+        for layer in self._layers:
+            lf = lf.with_columns(list(layer.values()))
+        if self.outputs:
+            lf = lf.with_columns(
+                [expr.alias(name) for name, expr in self.outputs.items()]
+            )
+        return lf.drop(list(self._depth))
+
+
+# ---------------------------------------------------------------------------
+# Indicator builders (parameter defaults and column names as in TAFeature)
+# ---------------------------------------------------------------------------
+
+
+def _sigma_str(n_sigma: float) -> str:
+    return str(int(n_sigma)) if n_sigma == int(n_sigma) else str(n_sigma)
+
+
+def _rsi(p: TAPlan, params: dict) -> None:
+    period = params.get("period", 14)
+    d = p.diff(p.inp("close"))
+    gain = p.node(f"gain({_label(d)})", pl.col(d).clip(lower_bound=0.0))
+    loss = p.node(f"loss({_label(d)})", (-pl.col(d)).clip(lower_bound=0.0))
+    avg_gain = pl.col(p.ema(gain, alpha=1 / period))
+    avg_loss = pl.col(p.ema(loss, alpha=1 / period))
+    p.out(f"rsi_{period}", 100.0 - 100.0 / (1.0 + avg_gain / _nz(avg_loss)))
+
+
+def _macd(p: TAPlan, params: dict) -> None:
+    fast = params.get("fast", 12)
+    slow = params.get("slow", 26)
+    signal = params.get("signal", 9)
+    c = p.inp("close")
+    ef, es = p.ema(c, fast), p.ema(c, slow)
+    line = p.node(f"macd({fast},{slow})", pl.col(ef) - pl.col(es))
+    sig = p.ema(line, signal)
+    p.out(f"macd_{fast}_{slow}", pl.col(line))
+    p.out(f"macd_signal_{signal}", pl.col(sig))
+    p.out(f"macd_hist_{fast}_{slow}_{signal}", pl.col(line) - pl.col(sig))
+
+
+def _stoch(p: TAPlan, params: dict) -> None:
+    k = params.get("k", 14)
+    d = params.get("d", 3)
+    c = p.inp("close")
+    hh, ll = pl.col(p.rmax(p.inp("high"), k)), pl.col(p.rmin(p.inp("low"), k))
+    k_line = p.node(f"stoch_k({k})", 100.0 * (pl.col(c) - ll) / (hh - ll))
+    p.out(f"stoch_k_{k}", pl.col(k_line))
+    p.out(f"stoch_d_{d}", pl.col(p.sma(k_line, d)))
+
+
+def _bollinger(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 20)
+    n_sigma = params.get("n_sigma", 2.0)
+    sigma_str = _sigma_str(n_sigma)
+    c = p.inp("close")
+    ma, std = pl.col(p.sma(c, window)), pl.col(p.rstd(c, window))
+    upper = ma + n_sigma * std
+    lower = ma - n_sigma * std
+    p.out(f"bb_ma_{window}", ma)
+    p.out(f"bb_up_{window}_{sigma_str}", upper)
+    p.out(f"bb_lo_{window}_{sigma_str}", lower)
+    p.out(f"bb_width_{window}", (upper - lower) / ma)
+
+
+def _atr(p: TAPlan, params: dict) -> None:
+    period = params.get("period", 14)
+    p.out(f"atr_{period}", pl.col(p.sma(p.tr(), period)))
+
+
+def _adx(p: TAPlan, params: dict) -> None:
+    period = params.get("period", 14)
+    up = pl.col(p.diff(p.inp("high")))
+    dn = -pl.col(p.diff(p.inp("low")))
+    plus_dm = p.node("plus_dm", pl.when((up > dn) & (up > 0)).then(up).otherwise(0.0))
+    minus_dm = p.node("minus_dm", pl.when((dn > up) & (dn > 0)).then(dn).otherwise(0.0))
+    atr_ = pl.col(p.sma(p.tr(), period))
+    plus_di = 100.0 * pl.col(p.rsum(plus_dm, period)) / atr_
+    minus_di = 100.0 * pl.col(p.rsum(minus_dm, period)) / atr_
+    dx = p.node(
+        f"dx({period})",
+        (plus_di - minus_di).abs() / _nz(plus_di + minus_di) * 100.0,
+    )
+    p.out(f"adx_{period}", pl.col(p.sma(dx, period)))
+
+
+def _ichimoku(p: TAPlan, params: dict) -> None:
+    tenkan = params.get("tenkan", 9)
+    kijun = params.get("kijun", 26)
+    senkou_b = params.get("senkou_b", 52)
+    h, lo, c = p.inp("high"), p.inp("low"), p.inp("close")
+
+    def _mid(n: int) -> pl.Expr:
+        return (pl.col(p.rmax(h, n)) + pl.col(p.rmin(lo, n))) / 2.0
+
+    tenkan_line, kijun_line = _mid(tenkan), _mid(kijun)
+    p.out("ichimoku_tenkan", tenkan_line)
+    p.out("ichimoku_kijun", kijun_line)
+    p.out("ichimoku_span_a", (tenkan_line + kijun_line) / 2.0)
+    p.out("ichimoku_span_b", _mid(senkou_b))
+    p.out("ichimoku_chikou", pl.col(p.shift(c, kijun)))
+
+
+def _willr(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 14)
+    c = p.inp("close")
+    hh = pl.col(p.rmax(p.inp("high"), window))
+    ll = pl.col(p.rmin(p.inp("low"), window))
+    p.out(f"willr_{window}", -100.0 * (hh - pl.col(c)) / _nz(hh - ll))
+
+
+def _keltner(p: TAPlan, params: dict) -> None:
+    ema_period = params.get("ema_period", 20)
+    atr_period = params.get("atr_period", 10)
+    multiplier = params.get("multiplier", 2.0)
+    p.require("high", "low")
+    mid = pl.col(p.ema(p.inp("close"), ema_period))
+    atr_val = pl.col(p.sma(p.tr(), atr_period))
+    upper = mid + multiplier * atr_val
+    lower = mid - multiplier * atr_val
+    p.out(f"kc_mid_{ema_period}", mid)
+    p.out(f"kc_upper_{ema_period}", upper)
+    p.out(f"kc_lower_{ema_period}", lower)
+    p.out(f"kc_width_{ema_period}", (upper - lower) / _nz(mid))
+
+
+def _cci(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 20)
+    tp = p.tp()
+    dev = p.node(f"tp_dev({window})", pl.col(tp) - pl.col(p.sma(tp, window)))
+    absdev = p.node(f"tp_absdev({window})", pl.col(dev).abs())
+    mean_dev = pl.col(p.sma(absdev, window))
+    p.out(f"cci_{window}", pl.col(dev) / (0.015 * _nz(mean_dev)))
+
+
+def _elder_ray(p: TAPlan, params: dict) -> None:
+    period = params.get("period", 13)
+    p.require("high", "low")
+    ema_close = pl.col(p.ema(p.inp("close"), period))
+    p.out(f"elder_bull_{period}", pl.col(p.inp("high")) - ema_close)
+    p.out(f"elder_bear_{period}", pl.col(p.inp("low")) - ema_close)
+
+
+def _force_index(p: TAPlan, params: dict) -> None:
+    smooth = params.get("smooth", 13)
+    p.require("volume")
+    fi_1 = p.node("fi_1", pl.col(p.diff(p.inp("close"))) * pl.col(p.inp("volume")))
+    p.out("fi_1", pl.col(fi_1))
+    p.out(f"fi_{smooth}", pl.col(p.ema(fi_1, smooth)))
+
+
+def _vwap(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 14)
+    p.require("high", "low", "volume")
+    v = p.inp("volume")
+    tp_vol = p.node("tp_vol", pl.col(p.tp()) * pl.col(v))
+    vwap_val = pl.col(p.rsum(tp_vol, window)) / _nz(pl.col(p.rsum(v, window)))
+    p.out(f"vwap_{window}", vwap_val)
+    p.out(f"vwap_dev_{window}", pl.col(p.inp("close")) / _nz(vwap_val) - 1.0)
+
+
+def _cmf(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 20)
+    p.require("high", "low", "volume")
+    mfv = p.mfv()
+    rolling_vol = pl.col(p.rsum(p.inp("volume"), window))
+    p.out(f"cmf_{window}", pl.col(p.rsum(mfv, window)) / _nz(rolling_vol))
+
+
+def _chaikin_osc(p: TAPlan, params: dict) -> None:
+    fast = params.get("fast", 3)
+    slow = params.get("slow", 10)
+    p.require("high", "low", "volume")
+    adl = p.cumsum(p.mfv())
+    p.out("chaikin_osc", pl.col(p.ema(adl, fast)) - pl.col(p.ema(adl, slow)))
+
+
+def _hurst(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 100)
+    max_lag = params.get("max_lag", 20)
+    out_col = f"hurst_{window}"
+    lags = list(range(2, max_lag + 1))
+    if len(lags) < 2 or max_lag > window - 2:
+        # the pandas inner function returns NaN for every window
+        p.require("close")
+        p.out(out_col, pl.lit(None, dtype=pl.Float64))
+        return
+
+    # Slope of log(std of lag-L differences) on log(L): std over the window is
+    # a rolling std of (x_t - x_{t-L}) over the last window - L bars, and the
+    # least-squares slope is a fixed linear combination of the log-stds.
+    c = p.inp("close")
+    log_lags = np.log(lags)
+    centred = log_lags - log_lags.mean()
+    coef = centred / (centred @ centred)
+    slope = pl.lit(0.0)
+    for lag, w in zip(lags, coef):
+        tau = pl.col(p.rstd(p.diff(c, lag), window - lag, ddof=0))
+        slope = slope + float(w) * (tau + 1e-16).log()
+    p.out(out_col, slope)
+
+
+def _vidya(p: TAPlan, params: dict) -> None:
+    cmo_period = params.get("cmo_period", 9)
+    vidya_period = params.get("vidya_period", 9)
+    k = 2.0 / (vidya_period + 1)
+    c = p.inp("close")
+    d = pl.col(p.diff(c))
+    up = p.node("diff_up", pl.when(d > 0).then(d).otherwise(0.0))
+    dn = p.node("diff_dn", pl.when(d < 0).then(-d).otherwise(0.0))
+    up_sum = pl.col(p.rsum(up, cmo_period))
+    dn_sum = pl.col(p.rsum(dn, cmo_period))
+    denom = up_sum + dn_sum
+    cmo = pl.when(denom == 0.0).then(0.0).otherwise((up_sum - dn_sum) / denom)
+    alpha = p.node(f"vidya_alpha({cmo_period},{vidya_period})", cmo.abs() * k)
+    active = p.node(f"from_bar({cmo_period})", pl.col(p.row()) >= cmo_period)
+    vid = p.kernel(
+        f"vidya({cmo_period},{vidya_period})", _adaptive_ema, c, alpha, active
+    )
+    p.out(f"vidya_{vidya_period}", pl.col(vid))
+
+
+def _frama(p: TAPlan, params: dict) -> None:
+    period = params.get("period", 16)
+    if period % 2 != 0:
+        period = period + 1  # Force even, as indicators_extended.frama does
+    half = period // 2
+    c = p.inp("close")
+
+    def _range(n: int) -> pl.Expr:
+        return pl.col(p.rmax(c, n)) - pl.col(p.rmin(c, n))
+
+    n2 = p.node(f"frama_n2({half})", _range(half) / half)
+    n1 = pl.col(p.shift(n2, half))
+    n2 = pl.col(n2)
+    n3 = _range(period) / period
+    denom = (n1 + n2).log() - n3.log()
+    d = (
+        pl.when((n1 + n2 <= 0) | (n3 <= 0))
+        .then(1.0)
+        .when(denom == 0.0)
+        .then(1.0)
+        .otherwise(math.log(2.0) / denom)
+    )
+    alpha = p.node(f"frama_alpha({period})", (-4.6 * (d - 1.0)).exp().clip(0.01, 1.0))
+    active = p.node(f"from_bar({period - 1})", pl.col(p.row()) >= period - 1)
+    fr = p.kernel(f"frama({period})", _adaptive_ema, c, alpha, active)
+    p.out(f"frama_{period}", pl.col(fr))
+
+
+def _aroon(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 25)
+    h, lo, row = p.inp("high"), p.inp("low"), p.row()
+    roll = window + 1  # N+1 rolling window
+
+    def _since_high(x, r):
+        return _bars_since_extreme(x, r, roll, 1.0)
+
+    def _since_low(x, r):
+        return _bars_since_extreme(x, r, roll, -1.0)
+
+    since_high = pl.col(p.kernel(f"since_max({_label(h)},{roll})", _since_high, h, row))
+    since_low = pl.col(p.kernel(f"since_min({_label(lo)},{roll})", _since_low, lo, row))
+    aroon_up = (window - since_high) / window * 100.0
+    aroon_dn = (window - since_low) / window * 100.0
+    p.out(f"aroon_up_{window}", aroon_up)
+    p.out(f"aroon_dn_{window}", aroon_dn)
+    p.out(f"aroon_osc_{window}", aroon_up - aroon_dn)
+
+
+def _trix(p: TAPlan, params: dict) -> None:
+    period = params.get("period", 15)
+    signal_period = params.get("signal_period", 9)
+    ema3 = p.ema(p.ema(p.ema(p.inp("close"), period), period), period)
+    prev = _nz(pl.col(p.shift(ema3)))
+    line = p.node(f"trix({period})", (pl.col(ema3) - prev) / prev * 100.0)
+    p.out(f"trix_{period}", pl.col(line))
+    p.out(f"trix_signal_{signal_period}", pl.col(p.ema(line, signal_period)))
+
+
+def _ultimate_osc(p: TAPlan, params: dict) -> None:
+    p1 = params.get("p1", 7)
+    p2 = params.get("p2", 14)
+    p3 = params.get("p3", 28)
+    h, lo, c = p.inp("high"), p.inp("low"), p.inp("close")
+    pc = pl.col(p.shift(c))
+    true_low = pl.min_horizontal(pl.col(lo), pc)
+    true_high = pl.max_horizontal(pl.col(h), pc)
+    bp = p.node("uo_bp", pl.col(c) - true_low)
+    tr = p.node("uo_tr", true_high - true_low)
+
+    def _avg(n: int) -> pl.Expr:
+        return pl.col(p.rsum(bp, n)) / _nz(pl.col(p.rsum(tr, n)))
+
+    p.out(
+        f"uo_{p1}_{p2}_{p3}",
+        100.0 * (4.0 * _avg(p1) + 2.0 * _avg(p2) + _avg(p3)) / 7.0,
+    )
+
+
+def _vortex(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 14)
+    h, lo = p.inp("high"), p.inp("low")
+    tr = p.tr()
+    vm_plus = p.node("vm_plus", (pl.col(h) - pl.col(p.shift(lo))).abs())
+    vm_minus = p.node("vm_minus", (pl.col(lo) - pl.col(p.shift(h))).abs())
+    sum_tr = _nz(pl.col(p.rsum(tr, window)))
+    p.out(f"vi_plus_{window}", pl.col(p.rsum(vm_plus, window)) / sum_tr)
+    p.out(f"vi_minus_{window}", pl.col(p.rsum(vm_minus, window)) / sum_tr)
+
+
+def _emv(p: TAPlan, params: dict) -> None:
+    window = params.get("window", 14)
+    p.require("high", "low", "volume")
+    h, lo, v = p.inp("high"), p.inp("low"), p.inp("volume")
+    hh, ll = pl.col(h), pl.col(lo)
+    midpoint_move = (hh + ll) / 2.0 - (pl.col(p.shift(h)) + pl.col(p.shift(lo))) / 2.0
+    box_ratio = (pl.col(v) / 1e6) / _nz(hh - ll)
+    emv_1 = p.node("emv_1", midpoint_move / _nz(box_ratio))
+    p.out("emv_1", pl.col(emv_1))
+    p.out(f"emv_{window}", pl.col(p.sma(emv_1, window)))
+
+
+def _mass_index(p: TAPlan, params: dict) -> None:
+    ema_period = params.get("ema_period", 9)
+    sum_period = params.get("sum_period", 25)
+    h, lo = p.inp("high"), p.inp("low")
+    hl = p.node("hl_range", pl.col(h) - pl.col(lo))
+    ema1 = p.ema(hl, ema_period)
+    ema2 = p.ema(ema1, ema_period)
+    ratio = p.node(f"mass_ratio({ema_period})", pl.col(ema1) / _nz(pl.col(ema2)))
+    p.out(f"mass_idx_{sum_period}", pl.col(p.rsum(ratio, sum_period)))
+
+
+def _kst(p: TAPlan, params: dict) -> None:
+    c = p.inp("close")
+    # Standard KST parameters: (roc_period, sma_period, weight)
+    kst_line = pl.lit(0.0)
+    for roc_period, sma_period, weight in (
+        (10, 10, 1),
+        (13, 13, 2),
+        (14, 14, 3),
+        (15, 9, 4),
+    ):
+        kst_line = kst_line + weight * pl.col(p.sma(p.roc(c, roc_period), sma_period))
+    line = p.node("kst", kst_line)
+    p.out("kst", pl.col(line))
+    p.out("kst_signal", pl.col(p.sma(line, 9)))
+
+
+def _coppock(p: TAPlan, params: dict) -> None:
+    roc_long = params.get("roc_long", 14)
+    roc_short = params.get("roc_short", 11)
+    wma_period = params.get("wma_period", 10)
+    c = p.inp("close")
+    combined = p.node(
+        f"coppock_roc({roc_long},{roc_short})",
+        pl.col(p.roc(c, roc_long)) + pl.col(p.roc(c, roc_short)),
+    )
+    p.out("coppock", pl.col(p.wma(combined, wma_period)))
+
+
+_BUILDERS: dict[str, Callable[[TAPlan, dict], None]] = {
+    "rsi": _rsi,
+    "macd": _macd,
+    "stoch": _stoch,
+    "bb": _bollinger,
+    "atr": _atr,
+    "adx": _adx,
+    # --- Phase 103 extended indicators ---
+    "ichimoku": _ichimoku,
+    "willr": _willr,
+    "keltner": _keltner,
+    "cci": _cci,
+    "elder_ray": _elder_ray,
+    "force_index": _force_index,
+    "vwap": _vwap,
+    "cmf": _cmf,
+    "chaikin_osc": _chaikin_osc,
+    "hurst": _hurst,
+    "vidya": _vidya,
+    "frama": _frama,
+    "aroon": _aroon,
+    "trix": _trix,
+    "ultimate_osc": _ultimate_osc,
+    "vortex": _vortex,
+    "emv": _emv,
+    "mass_index": _mass_index,
+    "kst": _kst,
+    "coppock": _coppock,
+}
+
+
+def build_ta_plan(
+    indicator_params: list[dict],
+    columns: Iterable[str],
+    keys: Iterable[str] = DEFAULT_KEYS,
+) -> TAPlan:
+    """Compile dim_indicators rows into one plan.
+
+    Args:
+        indicator_params: Rows as returned by ``TAFeature.load_indicator_params``
+            (indicator_type, indicator_name, params).
+        columns: Columns of the source frame. Indicators whose inputs are
+            missing (e.g. volume) are skipped with a warning.
+        keys: Group columns.
+
+    Returns:
+        TAPlan with one output per indicator column, in TAFeature order.
+    """
+    plan = TAPlan(columns, keys)
+    for ind in indicator_params:
+        builder = _BUILDERS.get(ind["indicator_type"])
+        if builder is None:
+            continue
+        try:
+            builder(plan, ind["params"])
+        except KeyError as e:
+            logger.warning("Skipping %s: %s", ind["indicator_name"], e)
+    return plan
+
+
+def compute_ta_polars(
+    df: pd.DataFrame,
+    indicator_params: list[dict],
+    keys: Iterable[str] = DEFAULT_KEYS,
+    ts_col: str = "ts",
+) -> pd.DataFrame:
+    """Compute every indicator for every group in one lazy Polars query.
+
+    Args:
+        df: Multi-asset OHLCV frame (null handling already applied).
+        indicator_params: Active dim_indicators rows.
+        keys: Group columns.
+        ts_col: Timestamp column (tz restored to UTC on the way back).
+
+    Returns:
+        ``df`` sorted by (keys, ts) with the indicator columns appended.
+    """
+    keys = list(keys)
+    plan = build_ta_plan(indicator_params, df.columns, keys)
+    lf = pandas_to_polars_df(df, ts_col).lazy()
+    out = plan.apply(lf, ts_col).collect()
+    return polars_to_pandas_df(out, ts_col)
@@ -0,0 +1,78 @@
+"""
+Trailing-window sums from block-anchored cumulative sums.
+
+Shared by the vectorized rolling kernels (rolling_ols, microstructure): every
+row's trailing window is summed in O(1) from cumulative sums that restart
+every ``block`` rows, so no running total grows beyond one block and the
+differences stay well conditioned on long series.
+
+Windows never cross group boundaries when ``groups`` is given (contiguous
+labels, e.g. asset ids of a frame sorted by id).
+
+Public API:
+    window_starts(n_rows, window, groups=None) -> np.ndarray
+    block_window_sums(a, starts, block, weighted=False)
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+__all__ = ["block_window_sums", "window_starts"]
+
+
+def window_starts(n_rows: int, window: int, groups=None) -> np.ndarray:
+    """First row index of each row's trailing window (clipped at group start)."""
+    idx = np.arange(n_rows)
+    starts = np.maximum(idx - window + 1, 0)
+    if groups is not None:
+        g = np.asarray(groups)
+        if len(g) != n_rows:
+            raise ValueError("groups must have one label per row")
+        new = np.ones(n_rows, dtype=bool)
+        new[1:] = g[1:] != g[:-1]
+        group_start = np.maximum.accumulate(np.where(new, idx, 0))
+        starts = np.maximum(starts, group_start)
+    return starts
+
+
+def block_window_sums(
+    a: np.ndarray, starts: np.ndarray, block: int, weighted: bool = False
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Sum a[s..t] (and sum (i - s) * a[i]) for every row t with start s.
+
+    ``a`` is (rows, columns); ``starts`` comes from window_starts.
+    Cumulative sums restart every ``block`` rows (block >= window), so each
+    window spans at most two blocks.  The second output is None unless
+    ``weighted``.
+    """
+    n, k = a.shape
+    pad = (-n) % block
+    t = np.arange(n)
+    nb = (n + pad) // block
+
+    def _cum(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        xp = np.zeros((n + pad, k))
+        xp[:n] = x
+        c = np.cumsum(xp.reshape(nb, block, k), axis=1)
+        return c.reshape(n + pad, k)[:n], c[:, -1, :]
+
+    sb, tb = starts // block, t // block
+    cross = (sb < tb)[:, None]
+    at_block_start = (starts % block == 0)[:, None]
+
+    c, c_end = _cum(a)
+    c_prev = np.where(at_block_start, 0.0, c[starts - 1])
+    first = np.where(cross, c_end[sb], c) - c_prev
+    total = first + np.where(cross, c, 0.0)
+    if not weighted:
+        return total, None
+
+    local = (t - tb * block).astype(float)[:, None]
+    ci, ci_end = _cum(local * a)
+    ci_prev = np.where(at_block_start, 0.0, ci[starts - 1])
+    ci_first = np.where(cross, ci_end[sb], ci) - ci_prev
+    off_s = (starts - sb * block).astype(float)[:, None]
+    off_t = (tb * block - starts).astype(float)[:, None]
+    k_sum = (ci_first - off_s * first) + np.where(cross, ci + off_t * c, 0.0)
+    return total, k_sum
@@ -29,14 +29,16 @@ Comparison with triple barrier
 
 Performance note
 ----------------
-The naive O(n * L) loop is slow for large series (>10K bars).  For
-production, apply trend scanning only on CUSUM-filtered events:
+All (start, L) t-values are computed in one batch from cumulative sums over
+a strided (starts x look_forward_window) path matrix -- no regression call
+per window.  Applying trend scanning only on CUSUM-filtered events still
+cuts the work further:
 
     from ta_lab2.labeling.cusum_filter import cusum_filter
     t_events = cusum_filter(close, threshold)
     labels = trend_scanning_labels(close, t_events=t_events)
 
-This reduces n by 80-95% and makes the computation tractable.
+This reduces n by 80-95%.
 
 Downstream compatibility
 ------------------------
@@ -51,7 +53,6 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
-from scipy.stats import linregress
 
 
 # ---------------------------------------------------------------------------
@@ -107,70 +108,96 @@ def trend_scanning_labels(
             f"min_sample_length ({min_sample_length})"
         )
 
-    log_close = np.log(price_series)
+    log_close = np.log(price_series.to_numpy(dtype=float))
     idx = price_series.index
     n = len(idx)
 
     # Determine which start positions to evaluate
     if t_events is not None:
         # Only positions corresponding to t_events
-        positions = [
-            i
-            for i, ts in enumerate(idx)
-            if ts in t_events and i + min_sample_length <= n
-        ]
+        positions = np.flatnonzero(idx.isin(t_events))
+        positions = positions[positions + min_sample_length <= n]
     else:
         # Every bar that has at least min_sample_length bars ahead
-        positions = list(range(n - min_sample_length + 1))
+        positions = np.arange(max(n - min_sample_length + 1, 0))
 
-    records: list[dict] = []
-
-    for i in positions:
-        max_abs_t = -1.0
-        best_t_val = 0.0
-        best_end_idx = i + min_sample_length - 1
-
-        # Upper bound of window: cannot exceed series length
-        max_L = min(look_forward_window, n - i)
-
-        for L in range(min_sample_length, max_L + 1):
-            y = log_close.iloc[i : i + L].values
-            x = np.arange(L, dtype=float)
-
-            result = linregress(x, y)
-            slope = result.slope
-            stderr = result.stderr
-
-            # t-value of slope = slope / stderr
-            t_val = slope / stderr if stderr > 1e-15 else 0.0
-
-            abs_t = abs(t_val)
-            if abs_t > max_abs_t:
-                max_abs_t = abs_t
-                best_t_val = t_val
-                best_end_idx = i + L - 1
-
-        t1_ts = idx[best_end_idx]
-        bin_label = int(np.sign(best_t_val)) if max_abs_t > min_tvalue_threshold else 0
-
-        records.append(
-            {
-                "t0": idx[i],
-                "t1": t1_ts,
-                "tvalue": best_t_val,
-                "bin": bin_label,
-            }
-        )
-
-    if not records:
+    if len(positions) == 0:
         return pd.DataFrame(
             columns=["t1", "tvalue", "bin"],
             index=pd.DatetimeIndex([], tz=getattr(idx, "tz", None)),
         )
 
-    df = pd.DataFrame(records).set_index("t0")
-    df.index.name = None
-    return df[["t1", "tvalue", "bin"]]
+    tvals = _scan_tvalues(log_close, positions, min_sample_length, look_forward_window)
+
+    # Window with the maximum |t| (first on ties); windows past the end of
+    # the series are NaN and never selected.
+    abs_t = np.abs(tvals)
+    best = np.argmax(np.where(np.isnan(abs_t), -np.inf, abs_t), axis=1)
+    rows = np.arange(len(positions))
+    best_t_val = tvals[rows, best]
+    max_abs_t = abs_t[rows, best]
+
+    best_end_idx = positions + min_sample_length - 1 + best
+    bin_label = np.where(
+        max_abs_t > min_tvalue_threshold, np.sign(best_t_val), 0.0
+    ).astype(np.int64)
+
+    df = pd.DataFrame(
+        {
+            "t1": idx[best_end_idx],
+            "tvalue": best_t_val,
+            "bin": bin_label,
+        },
+        index=pd.DatetimeIndex(idx[positions], freq=None, name=None),
+    )
+    return df
+
+
+def _scan_tvalues(
+    log_close: np.ndarray,
+    positions: np.ndarray,
+    min_len: int,
+    max_len: int,
+) -> np.ndarray:
+    """OLS slope t-values of y ~ x for every start position and window length.
+
+    Row r holds windows [p, p + L - 1] for p = positions[r] and
+    L = min_len .. max_len (columns); windows running past the end of the
+    series are NaN.  Uses the slope / stderr definition of
+    ``scipy.stats.linregress`` (t = 0 when stderr <= 1e-15, e.g. an exact
+    line or a flat window, and when the window contains NaN).
+
+    All lengths come from cumulative sums along each row of a strided
+    (positions x max_len) path, anchored at the window's first price so the
+    sums stay small and well conditioned.
+    """
+    n = len(log_close)
+    padded = np.concatenate([log_close, np.full(max_len, np.nan)])
+    paths = np.lib.stride_tricks.sliding_window_view(padded, max_len)[positions]
+    y = paths - paths[:, :1]
+
+    k = np.arange(max_len, dtype=float)
+    s_y = np.cumsum(y, axis=1)
+    s_yy = np.cumsum(y * y, axis=1)
+    s_ky = np.cumsum(y * k, axis=1)
+
+    lengths = np.arange(min_len, max_len + 1, dtype=float)
+    cols = np.arange(min_len - 1, max_len)
+    s_y, s_yy, s_ky = s_y[:, cols], s_yy[:, cols], s_ky[:, cols]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ss_x = lengths * (lengths * lengths - 1.0) / 12.0
+        ss_xy = s_ky - (lengths - 1.0) / 2.0 * s_y
+        ss_yy = np.maximum(s_yy - s_y * s_y / lengths, 0.0)
+        slope = ss_xy / ss_x
+        r = np.where(ss_yy > 0.0, ss_xy / np.sqrt(ss_x * ss_yy), 0.0)
+        r = np.clip(r, -1.0, 1.0)
+        stderr = np.sqrt((1.0 - r * r) * ss_yy / ss_x / (lengths - 2.0))
+        tvals = np.where(stderr > 1e-15, slope / stderr, 0.0)
+
+    # Windows past the end of the series are not candidates
+    tvals[positions[:, None] + lengths[None, :] > n] = np.nan
+    return tvals
 
 
 # ---------------------------------------------------------------------------
@@ -40,7 +40,9 @@ Notes
   of variable bar density around weekends/holidays.
 - CRITICAL: On Windows, series.values on tz-aware datetime Series returns
   tz-NAIVE numpy.datetime64. Use get_t1_series() or .tolist() to preserve tz.
-- Performance: correctness-first Python loop over events, vectorized search per event.
+- Performance: all events are labeled in one batch -- price paths are a strided
+  (events x num_bars) view of close and the first touch is an argmax over the
+  barrier-hit mask, so there is no Python loop per event.
 """
 
 from __future__ import annotations
@@ -172,127 +174,86 @@ def apply_triple_barriers(
     Use get_t1_series(result) to extract the t1_series for PurgedKFoldSplitter.
     Do NOT use result['t1'].values -- on Windows this strips tz-awareness.
     """
-    # Build vertical barriers for all events
-    t1_vertical = add_vertical_barrier(t_events, close, num_bars=num_bars)
+    # Positions of events in the price index (-1 = not in index)
+    t_events = pd.DatetimeIndex(t_events)
+    t0_pos = close.index.get_indexer(t_events)
 
-    pt_mult = pt_sl[0]
-    sl_mult = pt_sl[1]
+    # Skip events not in the price index or where target vol is unavailable
+    vol = target.reindex(t_events).to_numpy(dtype=float)
+    keep = (t0_pos >= 0) & ~np.isnan(vol)
+    t0_pos = t0_pos[keep]
+    vol = vol[keep]
 
-    records: list[dict] = []
-    valid_t0_list: list = []
-
-    for t0 in t_events:
-        # Skip events not in the price index
-        if t0 not in close.index:
-            continue
-
-        # Skip events where target vol is not available
-        if t0 not in target.index or pd.isna(target.loc[t0]):
-            continue
-
-        vol = float(target.loc[t0])
-        entry_price = float(close.loc[t0])
-
-        # Vertical barrier timestamp
-        if t0 not in t1_vertical.index:
-            continue
-        t1_vert = t1_vertical.loc[t0]
-
-        # Determine side for meta-labeling (default: treat as long)
-        if side_prediction is not None and t0 in side_prediction.index:
-            side = int(side_prediction.loc[t0])
-        else:
-            side = 1  # Default: long
-
-        # Compute barrier levels
-        if side == 1:
-            # Long: upper = profit target, lower = stop loss
-            upper = entry_price * (1.0 + pt_mult * vol) if pt_mult > 0 else np.inf
-            lower = entry_price * (1.0 - sl_mult * vol) if sl_mult > 0 else -np.inf
-        else:
-            # Short: lower = profit target, upper = stop loss
-            upper = entry_price * (1.0 + sl_mult * vol) if sl_mult > 0 else np.inf
-            lower = entry_price * (1.0 - pt_mult * vol) if pt_mult > 0 else -np.inf
-
-        # Extract price path from t0 to t1_vert (inclusive)
-        path = close.loc[t0:t1_vert]
-
-        # Search for first barrier touch
-        hit_t1 = t1_vert
-        hit_bin = 0
-        hit_type = "vb"
-
-        for ts, price in path.items():
-            if ts == t0:
-                continue  # skip entry bar itself
-            if side == 1:
-                if price >= upper:
-                    hit_t1 = ts
-                    hit_bin = 1
-                    hit_type = "pt"
-                    break
-                if price <= lower:
-                    hit_t1 = ts
-                    hit_bin = -1
-                    hit_type = "sl"
-                    break
-            else:
-                # Short: lower hit = profit, upper hit = stop
-                if price <= lower:
-                    hit_t1 = ts
-                    hit_bin = 1
-                    hit_type = "pt"
-                    break
-                if price >= upper:
-                    hit_t1 = ts
-                    hit_bin = -1
-                    hit_type = "sl"
-                    break
-
-        # Compute return at barrier hit
-        hit_price = float(close.loc[hit_t1]) if hit_t1 in close.index else np.nan
-        if np.isfinite(entry_price) and entry_price > 0 and np.isfinite(hit_price):
-            ret = np.log(hit_price / entry_price)
-        else:
-            ret = np.nan
-
-        records.append(
-            {
-                "t1": hit_t1,
-                "ret": ret,
-                "bin": hit_bin,
-                "barrier_type": hit_type,
-            }
-        )
-        valid_t0_list.append(t0)
-
-    if not records:
+    if len(t0_pos) == 0:
         idx = pd.DatetimeIndex([], tz="UTC")
         return pd.DataFrame(columns=["t1", "ret", "bin", "barrier_type"], index=idx)
 
-    # Build tz-aware UTC index using tolist() to preserve tz
-    # (avoids Windows numpy.datetime64 tz-strip pitfall when using .values)
-    idx = (
-        pd.DatetimeIndex(valid_t0_list).tz_localize("UTC")
-        if (len(valid_t0_list) > 0 and pd.DatetimeIndex(valid_t0_list).tz is None)
-        else pd.DatetimeIndex(valid_t0_list)
-    )
-
-    result = pd.DataFrame(records, index=idx)
+    prices = close.to_numpy(dtype=float)
+    entry_price = prices[t0_pos]
 
-    # Ensure t1 column is tz-aware UTC
-    # Use tolist() on any existing tz-aware series to avoid tz-strip via .values
-    t1_vals = [r["t1"] for r in records]
-    result["t1"] = (
-        pd.DatetimeIndex(t1_vals).tz_localize("UTC")
-        if (len(t1_vals) > 0 and pd.DatetimeIndex(t1_vals).tz is None)
-        else pd.DatetimeIndex(t1_vals)
-    )
+    # Vertical barrier: num_bars bars later, clamped to the last bar
+    t1_vert_pos = np.minimum(t0_pos + num_bars, len(prices) - 1)
 
-    # Typed columns
-    result["bin"] = result["bin"].astype("int8")
+    # Determine side for meta-labeling (default: treat as long)
+    side = np.ones(len(t0_pos), dtype=np.int64)
+    if side_prediction is not None:
+        has_side = t_events[keep].isin(side_prediction.index)
+        if has_side.any():
+            raw = side_prediction.reindex(t_events[keep][has_side]).to_numpy()
+            side[has_side] = [int(v) for v in raw]
+    is_long = side == 1
 
-    return result
+    # Compute barrier levels
+    # Long: upper = profit target, lower = stop loss
+    # Short: lower = profit target, upper = stop loss
+    pt_mult = pt_sl[0]
+    sl_mult = pt_sl[1]
+    up_mult = np.where(is_long, pt_mult, sl_mult)
+    dn_mult = np.where(is_long, sl_mult, pt_mult)
+    with np.errstate(invalid="ignore", over="ignore"):
+        upper = np.where(up_mult > 0, entry_price * (1.0 + up_mult * vol), np.inf)
+        lower = np.where(dn_mult > 0, entry_price * (1.0 - dn_mult * vol), -np.inf)
+
+    # Price paths after the entry bar, one row per event: bar k of row e is
+    # position t0 + 1 + k, masked beyond the vertical barrier.
+    width = max(int(num_bars), 1)
+    padded = np.concatenate([prices, np.full(width, np.nan)])
+    paths = np.lib.stride_tricks.sliding_window_view(padded, width)[t0_pos + 1]
+    in_path = np.arange(width)[None, :] < (t1_vert_pos - t0_pos)[:, None]
+
+    # First barrier touch (NaN prices never touch)
+    with np.errstate(invalid="ignore"):
+        up_hit = (paths >= upper[:, None]) & in_path
+        dn_hit = (paths <= lower[:, None]) & in_path
+    any_hit = up_hit | dn_hit
+    touched = any_hit.any(axis=1)
+    first = np.argmax(any_hit, axis=1)
+    rows = np.arange(len(t0_pos))
+
+    # The upper check runs first for longs, the lower check first for shorts
+    profit = np.where(is_long, up_hit[rows, first], dn_hit[rows, first])
+    hit_bin = np.where(touched, np.where(profit, 1, -1), 0).astype("int8")
+    barrier_type = np.where(touched, np.where(profit, "pt", "sl"), "vb").astype(object)
+    hit_pos = np.where(touched, t0_pos + 1 + first, t1_vert_pos)
+
+    # Compute return at barrier hit
+    hit_price = prices[hit_pos]
+    ok = np.isfinite(entry_price) & (entry_price > 0) & np.isfinite(hit_price)
+    ret = np.full(len(t0_pos), np.nan)
+    ret[ok] = np.log(hit_price[ok] / entry_price[ok])
+
+    # Build tz-aware UTC index / t1 column
+    idx = pd.DatetimeIndex(t_events[keep], freq=None, name=None)
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+    t1 = pd.DatetimeIndex(close.index[hit_pos], freq=None, name=None)
+    if t1.tz is None:
+        t1 = t1.tz_localize("UTC")
+
+    return pd.DataFrame(
+        {"t1": t1, "ret": ret, "bin": hit_bin, "barrier_type": barrier_type},
+        index=idx,
+    )
 
 
 def get_bins(triple_barrier_df: pd.DataFrame, close: pd.Series) -> pd.DataFrame:
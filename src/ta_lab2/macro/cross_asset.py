@@ -31,10 +31,13 @@ from datetime import date
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from ta_lab2.macro.rolling_corr import RollingCorrEngine, avg_pairwise_corr
+
 try:
     import yaml  # type: ignore[import-untyped]
 except ImportError:  # pragma: no cover
@@ -387,76 +390,57 @@ def compute_cross_asset_corr(
     returns_wide.index = pd.to_datetime(returns_wide.index)
     returns_wide = returns_wide.sort_index()
 
-    # --- XAGG-01: BTC/ETH 30d rolling correlation ---
+    # --- XAGG-01/02: one streaming pass over the return panel ---
+    # The engine correlates every asset with the BTC/ETH columns (XAGG-01)
+    # and carries per-asset window sums for the all-pairs average (XAGG-02).
     btc_id, eth_id = _lookup_btc_eth_ids(engine)
     btc_col = str(btc_id)
     eth_col = str(eth_id)
 
-    btc_eth_corr: pd.Series = pd.Series(dtype=float, name="btc_eth_corr_30d")
-    if btc_col in returns_wide.columns and eth_col in returns_wide.columns:
-        btc_eth_corr = (
-            returns_wide[btc_col]
-            .rolling(window=window, min_periods=_CORR_MIN_PERIODS)
-            .corr(returns_wide[eth_col])
-            .rename("btc_eth_corr_30d")
-        )
-    else:
+    all_dates = returns_wide.index
+    n_assets_series = returns_wide.notna().sum(axis=1).rename("n_assets")
+    panel = returns_wide.to_numpy(dtype=float)
+
+    has_pair = btc_col in returns_wide.columns and eth_col in returns_wide.columns
+    if not has_pair:
         logger.warning(
             "BTC (id=%s) or ETH (id=%s) not found in returns -- XAGG-01 will be NULL",
             btc_col,
             eth_col,
         )
-        btc_eth_corr = pd.Series(
-            [None] * len(returns_wide),
-            index=returns_wide.index,
-            name="btc_eth_corr_30d",
-        )
-
-    # --- XAGG-02: Average pairwise 30d rolling correlation ---
-    # Compute rolling correlation matrix, extract upper triangle mean per date.
-    n_assets_series = returns_wide.notna().sum(axis=1).rename("n_assets")
-
-    avg_pairwise: List[Optional[float]] = []
-    all_dates = returns_wide.index
-
-    for i, dt in enumerate(all_dates):
-        # Slice the window of rows ending at this date
-        window_slice = returns_wide.iloc[max(0, i - avg_window + 1) : i + 1]
-
-        # Minimum: need at least min_assets and _CORR_MIN_PERIODS rows
-        n_valid = window_slice.shape[0]
-        if n_valid < _CORR_MIN_PERIODS:
-            avg_pairwise.append(None)
-            continue
-
-        # Drop columns with any NaN in this window to get stable pairwise corr
-        valid_cols = window_slice.dropna(axis=1, how="any").columns
-        if len(valid_cols) < min_assets:
-            avg_pairwise.append(None)
-            continue
-
-        corr_mat = window_slice[valid_cols].corr()
-        # Extract upper triangle (k=1 excludes diagonal)
-        import numpy as np
-
-        upper_tri = corr_mat.values[np.triu_indices_from(corr_mat.values, k=1)]
-        if len(upper_tri) == 0:
-            avg_pairwise.append(None)
-        else:
-            avg_pairwise.append(float(np.nanmean(upper_tri)))
-
-    avg_pairwise_series = pd.Series(
-        avg_pairwise, index=all_dates, name="avg_pairwise_corr_30d"
-    )
+    btc_idx = returns_wide.columns.get_loc(btc_col) if has_pair else 0
+    eth_idx = returns_wide.columns.get_loc(eth_col) if has_pair else 0
+    shared_pass = has_pair and window == avg_window
+
+    btc_eth_corr = np.full(len(all_dates), np.nan)
+    avg_pairwise = np.full(len(all_dates), np.nan)
+    for snap in RollingCorrEngine(
+        panel,
+        avg_window,
+        y=panel[:, [eth_idx]],
+        min_periods=_CORR_MIN_PERIODS,
+    ):
+        # Minimum: need _CORR_MIN_PERIODS rows and min_assets complete columns
+        if snap.rows >= _CORR_MIN_PERIODS:
+            avg_pairwise[snap.t] = avg_pairwise_corr(snap, min_assets)
+        if shared_pass:
+            btc_eth_corr[snap.t] = snap.corr[btc_idx, 0]
+
+    if has_pair and not shared_pass:
+        for snap in RollingCorrEngine(
+            panel[:, [btc_idx]],
+            window,
+            y=panel[:, [eth_idx]],
+            min_periods=_CORR_MIN_PERIODS,
+        ):
+            btc_eth_corr[snap.t] = snap.corr[0, 0]
 
     # --- Assemble result DataFrame ---
     result = pd.DataFrame(
         {
             "date": all_dates,
-            "btc_eth_corr_30d": btc_eth_corr.values
-            if len(btc_eth_corr) == len(all_dates)
-            else [None] * len(all_dates),
-            "avg_pairwise_corr_30d": avg_pairwise_series.values,
+            "btc_eth_corr_30d": btc_eth_corr,
+            "avg_pairwise_corr_30d": avg_pairwise,
             "n_assets": n_assets_series.values,
         }
     )
@@ -1070,69 +1054,56 @@ def compute_crypto_macro_corr(
     crypto_aligned = crypto_wide.reindex(all_index)
 
     # --- Compute 60d rolling correlations per (asset, macro_var) ---
-    all_corr_rows: List[Dict[str, Any]] = []
-
+    # One streaming pass: every asset against every macro variable.
     asset_ids = crypto_wide.columns.tolist()
+    var_labels = list(macro_aligned)
+    macro_panel = np.column_stack([macro_aligned[v].to_numpy() for v in var_labels])
+    corr = np.stack(
+        [
+            snap.corr
+            for snap in RollingCorrEngine(
+                crypto_aligned.to_numpy(dtype=float),
+                corr_window,
+                y=macro_panel,
+                min_periods=_CORR_MIN_PERIODS,
+            )
+        ]
+    )  # (dates, assets, macro_vars)
+
+    # Shift by 1 day for prev_corr_60d
+    prev = np.full_like(corr, np.nan)
+    prev[1:] = corr[:-1]
+
+    # Sign-flip detection (NaN comparisons are False: no prev -> no flip)
+    went_positive = (prev < -sign_flip_threshold) & (corr > sign_flip_threshold)
+    went_negative = (prev > sign_flip_threshold) & (corr < -sign_flip_threshold)
+    flip = went_positive | went_negative
+
+    # Regime label
+    regime = np.where(
+        flip,
+        "flipping",
+        np.where(np.abs(corr) > sign_flip_threshold, "correlated", "decorrelated"),
+    )
 
-    for asset_id in asset_ids:
-        asset_returns = crypto_aligned[asset_id]
-
-        for var_label, macro_series in macro_aligned.items():
-            # 60d rolling Pearson correlation
-            roll_corr = asset_returns.rolling(
-                window=corr_window, min_periods=_CORR_MIN_PERIODS
-            ).corr(macro_series)
-
-            # Shift by 1 day for prev_corr_60d
-            prev_corr = roll_corr.shift(1)
-
-            # Process each date
-            for dt in all_index:
-                corr_val = _to_python(roll_corr.get(dt))
-                prev_val = _to_python(prev_corr.get(dt))
-
-                if corr_val is None:
-                    continue
-
-                # Sign-flip detection
-                flip = False
-                if prev_val is not None:
-                    went_positive = (
-                        prev_val < -sign_flip_threshold
-                        and corr_val > sign_flip_threshold
-                    )
-                    went_negative = (
-                        prev_val > sign_flip_threshold
-                        and corr_val < -sign_flip_threshold
-                    )
-                    flip = went_positive or went_negative
-
-                # Regime label
-                if flip:
-                    regime = "flipping"
-                elif abs(corr_val) > sign_flip_threshold:
-                    regime = "correlated"
-                else:
-                    regime = "decorrelated"
-
-                all_corr_rows.append(
-                    {
-                        "date": dt.date() if hasattr(dt, "date") else dt,
-                        "asset_id": int(asset_id),
-                        "macro_var": var_label,
-                        "window": corr_window,
-                        "corr_60d": corr_val,
-                        "prev_corr_60d": prev_val,
-                        "sign_flip_flag": flip,
-                        "corr_regime": regime,
-                    }
-                )
-
-    if not all_corr_rows:
+    # Rows ordered asset -> macro_var -> date, skipping undefined correlations
+    a_idx, v_idx, t_idx = np.nonzero(~np.isnan(corr.transpose(1, 2, 0)))
+    if len(t_idx) == 0:
         logger.warning("No correlation rows computed for XAGG-04")
         return empty_corr, empty_regime
 
-    corr_df = pd.DataFrame(all_corr_rows)
+    corr_df = pd.DataFrame(
+        {
+            "date": all_index.date[t_idx],
+            "asset_id": np.asarray(asset_ids, dtype=np.int64)[a_idx],
+            "macro_var": np.asarray(var_labels, dtype=object)[v_idx],
+            "window": corr_window,
+            "corr_60d": corr[t_idx, a_idx, v_idx],
+            "prev_corr_60d": prev[t_idx, a_idx, v_idx],
+            "sign_flip_flag": flip[t_idx, a_idx, v_idx],
+            "corr_regime": regime[t_idx, a_idx, v_idx],
+        }
+    )
     logger.info(
         "XAGG-04: computed %d correlation rows for %d assets x %d macro vars",
         len(corr_df),
@@ -1144,17 +1115,22 @@ def compute_crypto_macro_corr(
     # Per date: if ANY sign_flip_flag -> 'flipping'
     # elif majority 'correlated' -> 'correlated'
     # else -> 'decorrelated'
-    regime_rows: List[Dict[str, Any]] = []
-    for dt, day_df in corr_df.groupby("date"):
-        if day_df["sign_flip_flag"].any():
-            label = "flipping"
-        else:
-            n_total = len(day_df)
-            n_corr = (day_df["corr_regime"] == "correlated").sum()
-            label = "correlated" if n_corr > (n_total / 2) else "decorrelated"
-        regime_rows.append({"date": dt, "crypto_macro_corr": label})
-
-    regime_df = pd.DataFrame(regime_rows)
+    by_date = corr_df.assign(is_corr=corr_df["corr_regime"].eq("correlated")).groupby(
+        "date"
+    )
+    any_flip = by_date["sign_flip_flag"].any()
+    n_corr = by_date["is_corr"].sum()
+    n_total = by_date.size()
+    regime_df = pd.DataFrame(
+        {
+            "date": any_flip.index,
+            "crypto_macro_corr": np.where(
+                any_flip.to_numpy(),
+                "flipping",
+                np.where(n_corr > (n_total / 2), "correlated", "decorrelated"),
+            ),
+        }
+    )
     logger.info("XAGG-04: computed %d macro_regime label rows", len(regime_df))
 
     # --- Send Telegram sign-flip alerts ---------------------------------
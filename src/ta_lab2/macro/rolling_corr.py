@@ -0,0 +1,215 @@
+"""rolling_corr.py
+
+Streaming rolling correlation engine for the cross-asset aggregates
+(XAGG-01, XAGG-02, XAGG-04).
+
+Walks a (T x N) panel once against a (T x K) set of target columns,
+maintaining windowed counts, sums, sums of squares and cross-products for
+every (x, y) column pair plus per-column sums of x.  Each date adds the new
+row and subtracts the row leaving the window, so a date costs O(N x K) for
+the pairs and O(window x N) for the all-pairs average -- instead of a fresh
+DataFrame.corr() over the window.  The sums are rebuilt from the raw window every ``window`` rows so
+add/subtract round-off cannot accumulate over long histories.
+
+NaN handling is pairwise-complete, matching pandas
+``a.rolling(window, min_periods).corr(b)``: a pair only uses rows where both
+values are present and needs ``min_periods`` such rows.
+``CorrWindow.x_complete`` flags columns with no NaN anywhere in the window,
+for full-window statistics such as the XAGG-02 average pairwise correlation.
+
+Public API:
+    RollingCorrEngine(x, window, y=None, min_periods=2)  -- iterate -> CorrWindow
+    CorrWindow                                           -- per-date snapshot
+    avg_pairwise_corr(snapshot, min_assets=2)            -- mean corr, all x pairs
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator
+
+import numpy as np
+
+# Variance below this fraction of the raw sum of squares is treated as zero
+# (constant series), so round-off does not produce spurious correlations.
+_VAR_EPS = 1e-12
+
+
+@dataclass(frozen=True)
+class CorrWindow:
+    """State of the window ending at row ``t``.
+
+    corr is the (N, K) pairwise-complete correlation of x against y, NaN where
+    a pair has fewer than min_periods complete rows or zero variance.
+    x_window is the window's x rows (centred, NaN as 0); x_sum / x_sumsq are
+    per-column sums over it -- together enough for full-window statistics
+    over the complete columns without an (N, N) matrix.
+    """
+
+    t: int
+    rows: int
+    corr: np.ndarray
+    x_complete: np.ndarray
+    y_complete: np.ndarray
+    x_sum: np.ndarray
+    x_sumsq: np.ndarray
+    x_window: np.ndarray
+
+
+def _as_panel(values) -> np.ndarray:
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 1:
+        arr = arr[:, None]
+    if arr.ndim != 2:
+        raise ValueError(f"expected a 1-D or 2-D panel, got shape {arr.shape}")
+    # Correlation is shift-invariant; centring keeps the sums well conditioned.
+    present = ~np.isnan(arr)
+    count = present.sum(axis=0)
+    center = np.where(present, arr, 0.0).sum(axis=0) / np.maximum(count, 1)
+    return arr - center
+
+
+def _masked(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    mask = (~np.isnan(arr)).astype(float)
+    return np.where(mask > 0, arr, 0.0), mask
+
+
+class RollingCorrEngine:
+    """Pairwise-complete rolling correlation of a panel against target columns.
+
+    Parameters
+    ----------
+    x:
+        (T, N) array-like, rows in time order.
+    window:
+        Rows per window (the trailing ``window`` rows, fewer at the start).
+    y:
+        (T, K) panel on the same rows whose columns every x column is
+        correlated with.  Defaults to x itself (an (N, N) matrix per date --
+        pass a column subset instead for large panels).
+    min_periods:
+        Minimum complete rows per pair for a non-NaN correlation.
+
+    Iterating yields one CorrWindow per row.
+    """
+
+    def __init__(
+        self,
+        x,
+        window: int,
+        y=None,
+        min_periods: int = 2,
+    ) -> None:
+        self.window = int(window)
+        if self.window < 1:
+            raise ValueError(f"window must be >= 1, got {window}")
+        self.min_periods = max(2, int(min_periods))
+        self._x = _as_panel(x)
+        self._y = self._x if y is None else _as_panel(y)
+        if len(self._y) != len(self._x):
+            raise ValueError("x and y must have the same number of rows")
+
+    def __len__(self) -> int:
+        return len(self._x)
+
+    # ------------------------------------------------------------------
+    # Windowed sums
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _sums(x0, mx, y0, my, sign) -> list[np.ndarray]:
+        """Signed sums over the given rows.
+
+        Returns [nan_x, sum_x, sumsq_x, nan_y, n, sx, sxx, sy, syy, sxy]:
+        per-column vectors for x and y, then (N, K) pair matrices where
+        n[i, j] counts rows with both x_i and y_j present and sx[i, j] sums
+        x_i over those rows (likewise sxx, sy, syy, sxy).  ``sign`` (+1/-1
+        per row) lets one call add the entering row and drop the leaving one.
+        """
+        wx = x0 * sign
+        wmx = mx * sign
+        return [
+            (sign - wmx).sum(axis=0),
+            wx.sum(axis=0),
+            (wx * x0).sum(axis=0),
+            (sign - my * sign).sum(axis=0),
+            wmx.T @ my,
+            wx.T @ my,
+            (wx * x0).T @ my,
+            wmx.T @ y0,
+            wmx.T @ (y0 * y0),
+            wx.T @ y0,
+        ]
+
+    def __iter__(self) -> Iterator[CorrWindow]:
+        x0, mx = _masked(self._x)
+        y0, my = _masked(self._y)
+        w = self.window
+        add_drop = np.array([[1.0], [-1.0]])
+        sums: list[np.ndarray] = []
+        for t in range(len(x0)):
+            lo = max(0, t - w + 1)
+            if t % w == 0:
+                # Periodic rebuild from the raw window bounds round-off drift.
+                rows = slice(lo, t + 1)
+                sign = np.ones((t + 1 - lo, 1))
+                sums = self._sums(x0[rows], mx[rows], y0[rows], my[rows], sign)
+            else:
+                idx = [t] if t < w else [t, t - w]
+                delta = self._sums(
+                    x0[idx], mx[idx], y0[idx], my[idx], add_drop[: len(idx)]
+                )
+                sums = [s + d for s, d in zip(sums, delta)]
+            yield self._snapshot(t, lo, sums, x0)
+
+    def _snapshot(
+        self, t: int, lo: int, sums: list[np.ndarray], x0: np.ndarray
+    ) -> CorrWindow:
+        nan_x, sum_x, sumsq_x, nan_y, n, sx, sxx, sy, syy, sxy = sums
+        with np.errstate(all="ignore"):
+            vx = sxx - sx * sx / n
+            vy = syy - sy * sy / n
+            corr = (sxy - sx * sy / n) / np.sqrt(vx * vy)
+        bad = (
+            (n < self.min_periods)
+            | (vx <= _VAR_EPS * sxx)
+            | (vy <= _VAR_EPS * syy)
+            | ~np.isfinite(corr)
+        )
+        corr[bad] = np.nan
+        np.clip(corr, -1.0, 1.0, out=corr)
+        return CorrWindow(
+            t=t,
+            rows=t - lo + 1,
+            corr=corr,
+            x_complete=nan_x < 0.5,
+            y_complete=nan_y < 0.5,
+            x_sum=sum_x,
+            x_sumsq=sumsq_x,
+            x_window=x0[lo : t + 1],
+        )
+
+
+def avg_pairwise_corr(snapshot: CorrWindow, min_assets: int = 2) -> float:
+    """Mean upper-triangle correlation over the window's complete columns.
+
+    Same value as ``window.dropna(axis=1).corr()`` followed by a nanmean of
+    the upper triangle, but via the identity
+    sum_ij corr_ij = |X d|^2 - (d . s)^2 / m  (d_i = 1 / sd_i), which costs
+    O(rows x N) instead of an (N, N) matrix.  Returns NaN with fewer than
+    ``min_assets`` complete columns or fewer than two non-constant ones.
+    """
+    complete = snapshot.x_complete
+    if int(complete.sum()) < max(2, min_assets):
+        return float("nan")
+    m = float(snapshot.rows)
+    var = snapshot.x_sumsq - snapshot.x_sum**2 / m
+    live = complete & (var > _VAR_EPS * snapshot.x_sumsq)
+    k = int(live.sum())
+    if k < 2:
+        return float("nan")
+    d = np.zeros_like(var)
+    d[live] = 1.0 / np.sqrt(var[live])
+    z = snapshot.x_window @ d
+    total = z @ z - (d @ snapshot.x_sum) ** 2 / m
+    return float((total - k) / (k * (k - 1)))
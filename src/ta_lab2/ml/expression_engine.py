@@ -32,6 +32,7 @@ from typing import Any
 import numpy as np
 import pandas as pd
 
+from ta_lab2.features.rolling_ols import rolling_slope, rolling_wma
 
 # ---------------------------------------------------------------------------
 # Operator implementations
@@ -40,37 +41,12 @@ import pandas as pd
 
 def _wma(series: pd.Series, n: int) -> pd.Series:
     """Weighted moving average: weights are 1, 2, ..., n (linear)."""
-    n = int(n)
-    weights = np.arange(1, n + 1, dtype=float)
-
-    def _apply_wma(window: np.ndarray) -> float:
-        if len(window) < n:
-            valid = weights[-len(window) :]
-            return float(np.dot(window, valid) / valid.sum())
-        return float(np.dot(window, weights) / weights.sum())
-
-    return series.rolling(window=n, min_periods=1).apply(_apply_wma, raw=True)
+    return rolling_wma(series, int(n), min_periods=1)
 
 
 def _slope(series: pd.Series, n: int) -> pd.Series:
     """Linear regression slope over rolling window of n bars."""
-    n = int(n)
-    x = np.arange(n, dtype=float)
-    x_mean = x.mean()
-    x_denom = ((x - x_mean) ** 2).sum()
-
-    def _apply_slope(window: np.ndarray) -> float:
-        if len(window) < n:
-            xi = np.arange(len(window), dtype=float)
-            xi_mean = xi.mean()
-            xi_denom = ((xi - xi_mean) ** 2).sum()
-            if xi_denom == 0:
-                return float("nan")
-            return float(np.dot(window - window.mean(), xi - xi_mean) / xi_denom)
-        y_mean = window.mean()
-        return float(np.dot(window - y_mean, x - x_mean) / x_denom)
-
-    return series.rolling(window=n, min_periods=2).apply(_apply_slope, raw=True)
+    return rolling_slope(series, int(n), min_periods=2)
 
 
 # ---------------------------------------------------------------------------
@@ -12,6 +12,7 @@ Usage:
     from ta_lab2.observability import (
         TracingContext,
         MetricsCollector,
+        BufferedMetricsCollector,
         HealthChecker,
         WorkflowStateTracker,
         AlertThresholdChecker,
@@ -30,6 +31,10 @@ Usage:
     metrics.gauge("memory_usage_mb", value=512.5)
     metrics.histogram("task_duration_ms", value=1234)
 
+    # Buffered metrics for hot loops (bulk flush every 10s)
+    with BufferedMetricsCollector(engine, flush_interval_sec=10) as buffered:
+        buffered.histogram("bar_latency_ms", value=0.8)
+
     # Health checks
     health = HealthChecker(engine, memory_client=mem_client)
     liveness = health.liveness()  # Simple process check
@@ -62,7 +67,11 @@ from ta_lab2.observability.alerts import (
     check_all_thresholds,
 )
 from ta_lab2.observability.health import HealthChecker, HealthStatus
-from ta_lab2.observability.metrics import Metric, MetricsCollector
+from ta_lab2.observability.metrics import (
+    BufferedMetricsCollector,
+    Metric,
+    MetricsCollector,
+)
 from ta_lab2.observability.storage import (
     WorkflowStateTracker,
     ensure_observability_tables,
@@ -82,6 +91,7 @@ __all__ = [
     "generate_correlation_id",
     # Metrics
     "MetricsCollector",
+    "BufferedMetricsCollector",
     "Metric",
     # Health
     "HealthChecker",
@@ -5,8 +5,13 @@ Provides:
 - Metric dataclass for metric data
 - MetricsCollector for recording and querying metrics
 - counter(), gauge(), histogram() convenience methods
+- BufferedMetricsCollector: in-memory aggregation with background bulk flush
 
 Metrics are stored in observability.metrics table (partitioned by month).
+BufferedMetricsCollector instead writes per-interval rollups (counters summed,
+gauges last/min/max, histograms as mergeable sketches) to
+observability.metric_rollups, so hot loops can be instrumented without a
+database round trip per sample.
 
 Usage:
     from ta_lab2.observability.metrics import MetricsCollector
@@ -25,17 +30,27 @@ Usage:
     # Query metrics
     recent = collector.query("task_duration_ms", hours=24)
     p95 = collector.get_percentile("task_duration_ms", percentile=0.95, hours=24)
+
+    # Buffered: record() only touches memory; a daemon thread flushes rollups
+    with BufferedMetricsCollector(engine, flush_interval_sec=10) as buffered:
+        for item in batch:
+            buffered.histogram("item_latency_ms", value=elapsed_ms)
+        p99 = buffered.get_percentile("item_latency_ms", percentile=0.99)
 """
 
 from __future__ import annotations
 
+import json
 import logging
+import threading
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
 
 from sqlalchemy import Engine, text
 
+from ta_lab2.observability.sketch import HistogramSketch
+
 logger = logging.getLogger(__name__)
 
 
@@ -357,3 +372,384 @@ class MetricsCollector:
             logger.error(f"Failed to calculate percentile for {name}: {e}")
 
         return None
+
+
+# =============================================================================
+# Buffered Metrics Collector
+# =============================================================================
+
+
+@dataclass
+class MetricRollup:
+    """
+    In-memory aggregate of one metric/labels series over one time bucket.
+
+    Attributes:
+        name: Metric name
+        metric_type: 'counter', 'gauge', or 'histogram'
+        labels: Label dict shared by all samples
+        bucket_start: Start of the rollup interval (UTC)
+        count: Number of samples
+        total: Sum of sample values (counter value)
+        min: Smallest sample
+        max: Largest sample
+        last: Most recent sample (gauge value)
+        sketch: Quantile sketch (histograms only)
+    """
+
+    name: str
+    metric_type: str
+    labels: dict[str, Any]
+    bucket_start: datetime
+    count: int = 0
+    total: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    last: Optional[float] = None
+    sketch: Optional[HistogramSketch] = None
+
+    def add(self, value: float) -> None:
+        """Fold one sample into the rollup."""
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last = value
+        if self.sketch is not None:
+            self.sketch.add(value)
+
+    def merge(self, other: MetricRollup) -> None:
+        """Fold another rollup of the same key (other is the more recent)."""
+        if other.count == 0:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.last = other.last
+        if self.sketch is not None and other.sketch is not None:
+            self.sketch.merge(other.sketch)
+
+
+class BufferedMetricsCollector(MetricsCollector):
+    """
+    MetricsCollector that aggregates in memory and flushes in bulk.
+
+    record()/counter()/gauge()/histogram() only update an in-memory rollup
+    keyed by (name, type, labels, time bucket) under a lock.  A daemon thread
+    calls flush() every ``flush_interval_sec``, writing all pending rollups to
+    observability.metric_rollups in one executemany transaction.  A failed
+    flush keeps the rollups buffered for the next attempt.
+
+    Query methods read the rollup table and include not-yet-flushed data.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        flush_interval_sec: float = 10.0,
+        bucket_seconds: int = 60,
+        relative_accuracy: float = 0.01,
+        autostart: bool = True,
+    ):
+        """
+        Initialize buffered collector.
+
+        Args:
+            engine: SQLAlchemy engine
+            flush_interval_sec: Seconds between background flushes
+            bucket_seconds: Rollup interval length (default 1 minute)
+            relative_accuracy: Histogram sketch relative error bound
+            autostart: Start the background flusher immediately
+        """
+        super().__init__(engine)
+        self.flush_interval_sec = flush_interval_sec
+        self.bucket_seconds = int(bucket_seconds)
+        self.relative_accuracy = relative_accuracy
+        self._buffer: dict[tuple, MetricRollup] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if autostart:
+            self.start()
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background flusher thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="metrics-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the flusher thread and flush remaining rollups."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval_sec + 5.0)
+            self._thread = None
+        self.flush()
+
+    def __enter__(self) -> BufferedMetricsCollector:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_sec):
+            try:
+                self.flush()
+            except Exception as e:  # keep the flusher alive
+                logger.error(f"Background metrics flush failed: {e}")
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def _bucket_start(self, ts: datetime) -> datetime:
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        epoch = int(ts.timestamp())
+        return datetime.fromtimestamp(
+            epoch - epoch % self.bucket_seconds, tz=timezone.utc
+        )
+
+    def _new_rollup(
+        self, name: str, metric_type: str, labels: dict[str, Any], bucket: datetime
+    ) -> MetricRollup:
+        sketch = (
+            HistogramSketch(self.relative_accuracy)
+            if metric_type == "histogram"
+            else None
+        )
+        return MetricRollup(name, metric_type, dict(labels), bucket, sketch=sketch)
+
+    def record(self, metric: Metric) -> None:
+        """
+        Aggregate a metric into the in-memory buffer (no database I/O).
+
+        Args:
+            metric: Metric to record
+        """
+        labels_key = json.dumps(metric.labels, sort_keys=True, default=str)
+        bucket = self._bucket_start(metric.timestamp)
+        key = (metric.name, metric.metric_type, labels_key, bucket)
+        value = float(metric.value)
+        with self._lock:
+            rollup = self._buffer.get(key)
+            if rollup is None:
+                rollup = self._new_rollup(
+                    metric.name, metric.metric_type, metric.labels, bucket
+                )
+                self._buffer[key] = rollup
+            rollup.add(value)
+
+    def pending(self) -> int:
+        """Number of rollups waiting to be flushed."""
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        Write all pending rollups in one bulk insert.
+
+        Returns:
+            Number of rollup rows written (0 if nothing pending or on failure)
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, {}
+            if not batch:
+                return 0
+
+            query = text(
+                """
+                INSERT INTO observability.metric_rollups
+                    (metric_name, metric_type, bucket_start, bucket_seconds, labels,
+                     sample_count, value_sum, value_min, value_max, value_last,
+                     sketch)
+                VALUES
+                    (:metric_name, :metric_type, :bucket_start, :bucket_seconds,
+                     CAST(:labels AS jsonb), :sample_count, :value_sum,
+                     :value_min, :value_max, :value_last, CAST(:sketch AS jsonb))
+            """
+            )
+            params = [
+                {
+                    "metric_name": r.name,
+                    "metric_type": r.metric_type,
+                    "bucket_start": r.bucket_start,
+                    "bucket_seconds": self.bucket_seconds,
+                    "labels": json.dumps(r.labels, default=str) if r.labels else None,
+                    "sample_count": r.count,
+                    "value_sum": r.total,
+                    "value_min": r.min,
+                    "value_max": r.max,
+                    "value_last": r.last,
+                    "sketch": json.dumps(r.sketch.to_dict()) if r.sketch else None,
+                }
+                for r in batch.values()
+            ]
+
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(query, params)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(params)} metric rollups: {e}")
+                # Re-buffer: merge the failed batch under anything recorded since
+                with self._lock:
+                    for key, rollup in batch.items():
+                        newer = self._buffer.get(key)
+                        if newer is not None:
+                            rollup.merge(newer)
+                        self._buffer[key] = rollup
+                return 0
+
+            logger.debug(f"Flushed {len(params)} metric rollups")
+            return len(params)
+
+    # -------------------------------------------------------------------------
+    # Queries (pre-aggregated)
+    # -------------------------------------------------------------------------
+
+    def query_rollups(
+        self,
+        name: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        labels: Optional[dict[str, Any]] = None,
+        metric_type: Optional[str] = None,
+    ) -> list[MetricRollup]:
+        """
+        Read rollups for a metric, including not-yet-flushed buffer entries.
+
+        Args:
+            name: Metric name
+            start_time: Earliest time covered; the bucket containing it is
+                included (None = no lower bound)
+            end_time: Latest bucket_start (None = no upper bound)
+            labels: Optional label filters (rollup labels must contain them)
+            metric_type: Optional type filter
+
+        Returns:
+            List of MetricRollup (one per stored row / buffered key)
+        """
+        conditions = ["metric_name = :name"]
+        params: dict[str, Any] = {"name": name}
+        # One boundary rule for stored rows and the buffer
+        start_bucket = self._bucket_start(start_time) if start_time else None
+        end_time = self._as_utc(end_time) if end_time else None
+
+        if start_bucket:
+            conditions.append("bucket_start >= :start_time")
+            params["start_time"] = start_bucket
+
+        if end_time:
+            conditions.append("bucket_start <= :end_time")
+            params["end_time"] = end_time
+
+        if labels:
+            conditions.append("labels @> CAST(:labels AS jsonb)")
+            params["labels"] = json.dumps(labels, default=str)
+
+        if metric_type:
+            conditions.append("metric_type = :metric_type")
+            params["metric_type"] = metric_type
+
+        where_clause = " AND ".join(conditions)
+
+        query = text(
+            f"""
+            SELECT metric_type, labels, bucket_start, sample_count, value_sum,
+                   value_min, value_max, value_last, sketch
+            FROM observability.metric_rollups
+            WHERE {where_clause}
+            ORDER BY bucket_start, flushed_at
+        """
+        )
+
+        rollups: list[MetricRollup] = []
+
+        try:
+            with self.engine.connect() as conn:
+                for row in conn.execute(query, params):
+                    sketch = row[8]
+                    if isinstance(sketch, str):
+                        sketch = json.loads(sketch)
+                    rollups.append(
+                        MetricRollup(
+                            name=name,
+                            metric_type=row[0],
+                            labels=row[1] or {},
+                            bucket_start=row[2],
+                            count=int(row[3]),
+                            total=float(row[4] or 0.0),
+                            min=row[5],
+                            max=row[6],
+                            last=row[7],
+                            sketch=HistogramSketch.from_dict(sketch)
+                            if sketch
+                            else None,
+                        )
+                    )
+        except Exception as e:
+            logger.error(f"Failed to query metric rollups for {name}: {e}")
+
+        def _pending_match(r: MetricRollup) -> bool:
+            if r.name != name or (metric_type and r.metric_type != metric_type):
+                return False
+            if start_bucket and r.bucket_start < start_bucket:
+                return False
+            if end_time and r.bucket_start > end_time:
+                return False
+            return not labels or all(r.labels.get(k) == v for k, v in labels.items())
+
+        with self._lock:
+            pending = [r for r in self._buffer.values() if _pending_match(r)]
+        for r in pending:
+            copy = self._new_rollup(r.name, r.metric_type, r.labels, r.bucket_start)
+            copy.merge(r)
+            rollups.append(copy)
+
+        return rollups
+
+    @staticmethod
+    def _as_utc(ts: datetime) -> datetime:
+        return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+    def get_percentile(
+        self,
+        name: str,
+        percentile: float = 0.5,
+        hours: int = 24,
+        labels: Optional[dict[str, Any]] = None,
+    ) -> Optional[float]:
+        """
+        Estimate a histogram percentile by merging rollup sketches.
+
+        Accuracy is bounded by the sketch relative accuracy (default 1%).
+
+        Args:
+            name: Metric name
+            percentile: Percentile to estimate (0.0-1.0, default 0.5 = median)
+            hours: Time window in hours (default 24)
+            labels: Optional label filters
+
+        Returns:
+            Percentile estimate or None if no data
+        """
+        start_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        merged = HistogramSketch(self.relative_accuracy)
+        for rollup in self.query_rollups(
+            name, start_time=start_time, labels=labels, metric_type="histogram"
+        ):
+            if rollup.sketch is not None:
+                merged.merge(rollup.sketch)
+        return merged.quantile(percentile)
@@ -0,0 +1,235 @@
+"""
+Mergeable quantile sketch for histogram metrics.
+
+Provides:
+- HistogramSketch: log-bucketed histogram with bounded relative error
+
+Values are counted in logarithmic buckets (DDSketch-style): bucket i covers
+(gamma^(i-1), gamma^i] with gamma = (1 + a) / (1 - a), so any quantile is
+returned within relative accuracy ``a`` of a true sample value.  Sketches
+merge by adding bucket counts, which makes them suitable for pre-aggregating
+per-interval rollups and combining them at query time.
+
+Usage:
+    from ta_lab2.observability.sketch import HistogramSketch
+
+    sketch = HistogramSketch(relative_accuracy=0.01)
+    sketch.add(12.5)
+    sketch.add_many(latencies_ms)
+    p95 = sketch.quantile(0.95)
+
+    other = HistogramSketch.from_dict(row["sketch"])
+    sketch.merge(other)
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+
+class HistogramSketch:
+    """
+    Log-bucketed quantile sketch (positive, negative and zero values).
+
+    Attributes:
+        relative_accuracy: Relative error bound of quantile estimates
+        max_buckets: Bucket budget per sign; lowest buckets collapse beyond it
+        count: Number of values added
+        total: Sum of values added
+        min: Smallest value added (None if empty)
+        max: Largest value added (None if empty)
+    """
+
+    # Values with |v| below this are counted as zero
+    MIN_INDEXABLE = 1e-12
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError(
+                f"relative_accuracy must be in (0, 1), got {relative_accuracy}"
+            )
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self._gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._pos: dict[int, int] = {}
+        self._neg: dict[int, int] = {}
+        self._zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def _index(self, magnitude: float) -> int:
+        return int(math.ceil(math.log(magnitude) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        # Midpoint (in relative terms) of (gamma^(i-1), gamma^i]
+        return 2.0 * self._gamma**index / (self._gamma + 1.0)
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+        Add a value (optionally with a repeat count).
+
+        Args:
+            value: Observed value (NaN is ignored)
+            count: Number of occurrences
+        """
+        value = float(value)
+        if count <= 0 or math.isnan(value):
+            return
+        if value > self.MIN_INDEXABLE:
+            idx = self._index(value)
+            self._pos[idx] = self._pos.get(idx, 0) + count
+        elif value < -self.MIN_INDEXABLE:
+            idx = self._index(-value)
+            self._neg[idx] = self._neg.get(idx, 0) + count
+        else:
+            self._zero += count
+        self._update_stats(count, value * count, value, value)
+        self._collapse()
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """
+        Add many values at once (vectorized bucketing).
+
+        Args:
+            values: Iterable or array of observed values (NaNs are ignored)
+        """
+        if not hasattr(values, "__len__"):
+            values = list(values)
+        arr = np.asarray(values, dtype=float).ravel()
+        arr = arr[~np.isnan(arr)]
+        if len(arr) == 0:
+            return
+        for store, mags in (
+            (self._pos, arr[arr > self.MIN_INDEXABLE]),
+            (self._neg, -arr[arr < -self.MIN_INDEXABLE]),
+        ):
+            if len(mags):
+                idx = np.ceil(np.log(mags) / self._log_gamma).astype(np.int64)
+                keys, counts = np.unique(idx, return_counts=True)
+                for k, c in zip(keys.tolist(), counts.tolist()):
+                    store[k] = store.get(k, 0) + c
+        self._zero += int((np.abs(arr) <= self.MIN_INDEXABLE).sum())
+        self._update_stats(len(arr), float(arr.sum()), arr.min(), arr.max())
+        self._collapse()
+
+    def _update_stats(self, n: int, total: float, lo: float, hi: float) -> None:
+        self.count += n
+        self.total += total
+        self.min = float(lo) if self.min is None else min(self.min, float(lo))
+        self.max = float(hi) if self.max is None else max(self.max, float(hi))
+
+    def _collapse(self) -> None:
+        # Fold the smallest-magnitude buckets together (accuracy is kept for
+        # the large values that the upper percentiles care about).
+        for store in (self._pos, self._neg):
+            excess = len(store) - self.max_buckets
+            if excess > 0:
+                keys = sorted(store)
+                target = keys[excess]
+                store[target] += sum(store.pop(k) for k in keys[:excess])
+
+    # -------------------------------------------------------------------------
+    # Merge / query
+    # -------------------------------------------------------------------------
+
+    def merge(self, other: HistogramSketch) -> None:
+        """
+        Merge another sketch into this one.
+
+        Raises:
+            ValueError: If the sketches use different relative accuracies
+        """
+        if other.count == 0:
+            return
+        if not math.isclose(other.relative_accuracy, self.relative_accuracy):
+            raise ValueError(
+                "Cannot merge sketches with different relative accuracy: "
+                f"{self.relative_accuracy} vs {other.relative_accuracy}"
+            )
+        for mine, theirs in ((self._pos, other._pos), (self._neg, other._neg)):
+            for k, c in theirs.items():
+                mine[k] = mine.get(k, 0) + c
+        self._zero += other._zero
+        self._update_stats(other.count, other.total, other.min, other.max)
+        self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-quantile (0.0-1.0).
+
+        Returns:
+            Estimated value (clamped to the observed min/max) or None if empty
+        """
+        if self.count == 0:
+            return None
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(f"quantile must be in [0, 1], got {q}")
+        if q == 0.0:
+            return self.min
+        if q == 1.0:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        estimate = self.max
+        for idx in sorted(self._neg, reverse=True):
+            seen += self._neg[idx]
+            if seen > rank:
+                estimate = -self._value(idx)
+                break
+        else:
+            seen += self._zero
+            if seen > rank:
+                estimate = 0.0
+            else:
+                for idx in sorted(self._pos):
+                    seen += self._pos[idx]
+                    if seen > rank:
+                        estimate = self._value(idx)
+                        break
+        return min(max(estimate, self.min), self.max)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean of added values, or None if empty."""
+        return self.total / self.count if self.count else None
+
+    # -------------------------------------------------------------------------
+    # Serialization (JSONB-compatible)
+    # -------------------------------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "pos": {str(k): v for k, v in self._pos.items()},
+            "neg": {str(k): v for k, v in self._neg.items()},
+            "zero": self._zero,
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> HistogramSketch:
+        """Deserialize a sketch produced by to_dict()."""
+        sketch = cls(relative_accuracy=float(data["relative_accuracy"]))
+        sketch._pos = {int(k): int(v) for k, v in data.get("pos", {}).items()}
+        sketch._neg = {int(k): int(v) for k, v in data.get("neg", {}).items()}
+        sketch._zero = int(data.get("zero", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.total = float(data.get("sum", 0.0))
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
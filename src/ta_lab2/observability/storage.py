@@ -45,6 +45,7 @@ def ensure_observability_tables(engine: Engine) -> None:
     - observability schema
     - workflow_state table
     - metrics table (partitioned)
+    - metric_rollups table (BufferedMetricsCollector)
     - spans table
     - alerts table
 
@@ -74,8 +75,14 @@ def ensure_observability_tables(engine: Engine) -> None:
     with engine.begin() as conn:
         # Execute statement by statement (PostgreSQL doesn't support multiple statements in text())
         for statement in sql.split(";"):
-            statement = statement.strip()
-            if statement and not statement.startswith("--"):
+            # Drop comment-only lines so a statement preceded by a comment
+            # block is still executed
+            statement = "\n".join(
+                line
+                for line in statement.splitlines()
+                if not line.strip().startswith("--")
+            ).strip()
+            if statement:
                 conn.execute(text(statement))
 
     logger.info("Observability schema created successfully")
@@ -22,12 +22,18 @@ from ta_lab2.risk.margin_monitor import (
     load_margin_tiers,
 )
 from ta_lab2.risk.override_manager import OverrideInfo, OverrideManager
-from ta_lab2.risk.risk_engine import RiskCheckResult, RiskEngine, RiskLimits
+from ta_lab2.risk.risk_engine import (
+    RiskCheckResult,
+    RiskEngine,
+    RiskLimits,
+    RiskStateSnapshot,
+)
 
 __all__ = [
     "RiskEngine",
     "RiskCheckResult",
     "RiskLimits",
+    "RiskStateSnapshot",
     "activate_kill_switch",
     "re_enable_trading",
     "get_kill_switch_status",
@@ -15,6 +15,11 @@ Limits are hot-reloaded from dim_risk_limits on each check_order() call.
 State (kill switch, circuit breaker, tail risk) is read from dim_risk_state.
 Macro gate state is read from dim_macro_gate_state via MacroGateEvaluator.
 
+For batches, load_snapshot() reads all of that state once into a
+RiskStateSnapshot; check_order(snapshot=...) and check_orders() then run the
+gates in memory against that one consistent view (DB access is limited to
+risk event inserts and circuit breaker auto-resets).
+
 Usage:
     from sqlalchemy import create_engine
     from ta_lab2.risk import RiskEngine
@@ -34,6 +39,9 @@ Usage:
         # use result.adjusted_quantity
         ...
 
+    # Many orders, one state read, one risk_events insert
+    results = re.check_orders([order_kwargs_1, order_kwargs_2])
+
 To enable macro gates, inject a MacroGateEvaluator::
 
     from ta_lab2.risk import RiskEngine, MacroGateEvaluator
@@ -48,10 +56,11 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
@@ -142,6 +151,49 @@ class RiskCheckResult:
     blocked_reason: Optional[str] = None
 
 
+@dataclass
+class RiskStateSnapshot:
+    """
+    Point-in-time copy of every piece of state read by check_order().
+
+    Built by RiskEngine.load_snapshot(). Orders checked against the same
+    snapshot see one consistent view of kill switch, tail risk, macro gates,
+    circuit breakers, limits and perp margin, with no per-order DB reads.
+    """
+
+    version: int
+    """RiskEngine state version the snapshot was loaded at."""
+
+    loaded_at: float
+    """time.monotonic() at load."""
+
+    trading_state: Optional[str]
+    """dim_risk_state.trading_state (None if the row is missing -> halted)."""
+
+    tail_risk_state: Optional[str]
+    """dim_risk_state.tail_risk_state."""
+
+    cb_tripped: dict
+    """Circuit breaker key -> ISO trip timestamp (dim_risk_state.cb_breaker_tripped_at)."""
+
+    limits_rows: list
+    """All dim_risk_limits rows, most specific first (same columns as _load_limits)."""
+
+    macro_gate: tuple
+    """(state, size_mult) from the macro gate evaluator."""
+
+    perp_positions: Optional[dict]
+    """strategy_id -> latest non-flat perp_positions row (None if table unavailable)."""
+
+    margin_tiers: dict = field(default_factory=dict)
+    """(venue, symbol) -> margin tiers, filled lazily by the margin gate."""
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since the snapshot was loaded."""
+        return time.monotonic() - self.loaded_at
+
+
 # ---------------------------------------------------------------------------
 # RiskEngine
 # ---------------------------------------------------------------------------
@@ -208,14 +260,24 @@ class RiskEngine:
                    asset_id=asset_id,
                )
 
-    The executor must NOT cache the kill switch state -- check_order() reads fresh
-    state on every call, ensuring CLI-triggered halts take effect immediately.
+        5. To check many orders per cycle, load one snapshot and reuse it::
+
+               snapshot = risk.load_snapshot()
+               results = risk.check_orders(orders, snapshot=snapshot)
+
+    The executor must NOT cache the kill switch state across cycles --
+    check_order() without a snapshot reads fresh state on every call, and a
+    snapshot should live no longer than one executor cycle, so CLI-triggered
+    halts take effect on the next cycle at the latest.  State changes made
+    through this RiskEngine bump its version: check_order() then swaps a
+    behind snapshot for a reloaded one mid-cycle.
     """
 
     def __init__(
         self,
         engine: Engine,
         macro_gate_evaluator: Optional["MacroGateEvaluator"] = None,
+        snapshot_max_age: float = 1.0,
     ) -> None:
         """
         Initialise RiskEngine.
@@ -225,9 +287,15 @@ class RiskEngine:
             macro_gate_evaluator: Optional MacroGateEvaluator instance for Gate 1.7.
                 When None (default), Gate 1.7 is a no-op -- all existing behaviour
                 is preserved (backward compatible).
+            snapshot_max_age: Seconds a cached snapshot is served by
+                get_snapshot() before it is reloaded (default 1.0).
         """
         self._engine = engine
         self._macro_gate_evaluator = macro_gate_evaluator
+        self._snapshot_max_age = snapshot_max_age
+        self._snapshot: Optional[RiskStateSnapshot] = None
+        self._state_version = 0
+        self._event_buffer: Optional[list] = None
 
     # ------------------------------------------------------------------
     # Public API
@@ -242,6 +310,7 @@ class RiskEngine:
         strategy_id: int,
         current_position_value: Decimal,
         portfolio_value: Decimal,
+        snapshot: Optional[RiskStateSnapshot] = None,
     ) -> RiskCheckResult:
         """
         Run order through all risk gates.
@@ -268,14 +337,22 @@ class RiskEngine:
             strategy_id: Strategy ID generating the signal.
             current_position_value: Current position notional for this asset.
             portfolio_value: Total portfolio notional value.
+            snapshot: Optional RiskStateSnapshot to evaluate against instead of
+                reading state from the database. A snapshot taken before a
+                state change made through this RiskEngine (its version is
+                behind) is replaced by get_snapshot().
 
         Returns:
             RiskCheckResult with allowed flag, adjusted_quantity, and blocked_reason.
         """
+        if snapshot is not None and snapshot.version != self._state_version:
+            # e.g. a circuit breaker tripped earlier in the same executor cycle
+            snapshot = self.get_snapshot()
+
         order_notional = order_qty * fill_price
 
         # Gate 1: Kill switch -- fast exit before any DB reads
-        if self._is_halted():
+        if self._is_halted(snapshot=snapshot):
             self._log_event(
                 event_type="kill_switch_activated",
                 trigger_source="system",
@@ -290,7 +367,9 @@ class RiskEngine:
             )
 
         # Gate 1.5: Tail risk state
-        tail_state, size_mult = self.check_tail_risk_state(asset_id, strategy_id)
+        tail_state, size_mult = self.check_tail_risk_state(
+            asset_id, strategy_id, snapshot=snapshot
+        )
         if tail_state == "flatten":
             self._log_event(
                 event_type="tail_risk_escalated",
@@ -313,7 +392,7 @@ class RiskEngine:
             logger.info("Tail risk REDUCE: buy order quantity halved to %s", order_qty)
 
         # Gate 1.7: Macro gates (no-op when macro_gate_evaluator is None)
-        macro_state, macro_size_mult = self._check_macro_gates()
+        macro_state, macro_size_mult = self._check_macro_gates(snapshot=snapshot)
         if macro_state == "flatten":
             self._log_event(
                 event_type="macro_stress_gate_triggered",
@@ -342,7 +421,7 @@ class RiskEngine:
         # Gate 2: Circuit breaker
         cb_key = f"{asset_id}:{strategy_id}"
         if self._is_circuit_breaker_tripped(
-            cb_key, asset_id=asset_id, strategy_id=strategy_id
+            cb_key, asset_id=asset_id, strategy_id=strategy_id, snapshot=snapshot
         ):
             return RiskCheckResult(
                 allowed=False,
@@ -350,7 +429,9 @@ class RiskEngine:
             )
 
         # Gate 3: Load limits (hot-reload)
-        limits = self._load_limits(asset_id=asset_id, strategy_id=strategy_id)
+        limits = self._load_limits(
+            asset_id=asset_id, strategy_id=strategy_id, snapshot=snapshot
+        )
 
         # Gates 3-4 only apply to buy orders (sells reduce exposure)
         if order_side.lower() == "buy":
@@ -439,6 +520,7 @@ class RiskEngine:
                 strategy_id=strategy_id,
                 order_side=order_side,
                 limits=limits,
+                snapshot=snapshot,
             )
             if margin_result in ("critical", "buffer"):
                 reason = (
@@ -459,10 +541,168 @@ class RiskEngine:
             adjusted_quantity=order_qty,
         )
 
+    def check_orders(
+        self,
+        orders: Sequence[Mapping[str, Any]],
+        snapshot: Optional[RiskStateSnapshot] = None,
+    ) -> list[RiskCheckResult]:
+        """
+        Run a batch of orders through all risk gates against one snapshot.
+
+        Each order is evaluated exactly as check_order() would, but state is
+        read once (load_snapshot()) instead of per order, and the risk events
+        raised by the batch are inserted in a single statement at the end.
+        Orders are independent: each carries its own current_position_value
+        and portfolio_value, as with check_order().
+
+        Args:
+            orders: Mappings of check_order() keyword arguments (order_qty,
+                order_side, fill_price, asset_id, strategy_id,
+                current_position_value, portfolio_value).
+            snapshot: Snapshot to evaluate against. Defaults to a fresh
+                load_snapshot().
+
+        Returns:
+            One RiskCheckResult per order, in input order.
+        """
+        if not orders:
+            return []
+        if snapshot is None:
+            snapshot = self.load_snapshot()
+
+        self._event_buffer = []
+        try:
+            return [self.check_order(**order, snapshot=snapshot) for order in orders]
+        finally:
+            events, self._event_buffer = self._event_buffer, None
+            self._insert_events(events)
+
+    def load_snapshot(self) -> RiskStateSnapshot:
+        """
+        Read all state used by check_order() into a new RiskStateSnapshot.
+
+        Costs a handful of queries regardless of how many orders are later
+        checked against it. The snapshot is also cached for get_snapshot().
+        """
+        version = self._state_version
+        with self._engine.connect() as conn:
+            state_row = conn.execute(
+                text(
+                    """
+                SELECT trading_state, tail_risk_state, cb_breaker_tripped_at
+                FROM dim_risk_state
+                WHERE state_id = 1
+                """
+                )
+            ).fetchone()
+            limits_rows = conn.execute(
+                text(
+                    """
+                SELECT
+                    max_position_pct,
+                    max_portfolio_pct,
+                    daily_loss_pct_threshold,
+                    cb_consecutive_losses_n,
+                    cb_loss_threshold_pct,
+                    cb_cooldown_hours,
+                    allow_overrides,
+                    asset_id,
+                    strategy_id,
+                    margin_alert_threshold,
+                    liquidation_kill_threshold
+                FROM dim_risk_limits
+                ORDER BY
+                    (CASE WHEN asset_id IS NOT NULL THEN 1 ELSE 0 END) +
+                    (CASE WHEN strategy_id IS NOT NULL THEN 1 ELSE 0 END) DESC
+                """
+                )
+            ).fetchall()
+
+        perp_positions: Optional[dict] = None
+        try:
+            with self._engine.connect() as conn:
+                perp_rows = conn.execute(
+                    text(
+                        """
+                    SELECT DISTINCT ON (strategy_id)
+                        strategy_id,
+                        venue,
+                        symbol,
+                        allocated_margin,
+                        leverage,
+                        margin_mode,
+                        side,
+                        mark_price,
+                        quantity,
+                        avg_entry_price
+                    FROM perp_positions
+                    WHERE side != 'flat'
+                    ORDER BY strategy_id, updated_at DESC
+                    """
+                    )
+                ).fetchall()
+            perp_positions = {row[0]: tuple(row[1:]) for row in perp_rows}
+        except Exception as exc:
+            logger.debug(
+                "load_snapshot: perp_positions query failed (table may not exist): %s",
+                exc,
+            )
+
+        if state_row is None:
+            logger.warning("dim_risk_state has no row -- treating as halted for safety")
+
+        snapshot = RiskStateSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            trading_state=state_row[0] if state_row else None,
+            tail_risk_state=state_row[1] if state_row else None,
+            cb_tripped=json.loads(state_row[2] or "{}") if state_row else {},
+            limits_rows=list(limits_rows),
+            macro_gate=self._check_macro_gates(),
+            perp_positions=perp_positions,
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> RiskStateSnapshot:
+        """
+        Return the cached snapshot, reloading it when stale or invalidated.
+
+        A cached snapshot is reused only while no state change has been made
+        through this RiskEngine since it was loaded (see invalidate_snapshot())
+        and it is at most ``max_age`` seconds old.
+
+        Args:
+            max_age: Maximum age in seconds (default: snapshot_max_age from
+                the constructor). Pass 0 to force a reload.
+        """
+        max_age = self._snapshot_max_age if max_age is None else max_age
+        cached = self._snapshot
+        if (
+            cached is not None
+            and cached.version == self._state_version
+            and cached.age_seconds <= max_age
+        ):
+            return cached
+        return self.load_snapshot()
+
+    def invalidate_snapshot(self) -> None:
+        """
+        Mark cached snapshots as stale.
+
+        Called automatically after every state change made through this
+        RiskEngine (circuit breaker updates, tail risk transitions, daily loss
+        kill switch). Call it explicitly after changing risk state elsewhere,
+        e.g. after activate_kill_switch() from the same process.
+        """
+        self._state_version += 1
+        self._snapshot = None
+
     def check_tail_risk_state(
         self,
         asset_id: Optional[int] = None,
         strategy_id: Optional[int] = None,
+        snapshot: Optional[RiskStateSnapshot] = None,
     ) -> tuple[str, float]:
         """
         Read tail_risk_state from dim_risk_state.
@@ -475,15 +715,21 @@ class RiskEngine:
         Args:
             asset_id:    Unused (reserved for future asset-specific tail risk).
             strategy_id: Unused (reserved for future strategy-specific tail risk).
+            snapshot:    Read the state from this snapshot instead of the DB.
 
         Returns:
             Tuple of (state_string, size_multiplier_float).
         """
-        with self._engine.connect() as conn:
-            row = conn.execute(
-                text("SELECT tail_risk_state FROM dim_risk_state WHERE state_id = 1")
-            ).fetchone()
-        if row is None or row[0] == "normal":
+        if snapshot is not None:
+            row = (snapshot.tail_risk_state,)
+        else:
+            with self._engine.connect() as conn:
+                row = conn.execute(
+                    text(
+                        "SELECT tail_risk_state FROM dim_risk_state WHERE state_id = 1"
+                    )
+                ).fetchone()
+        if row is None or row[0] is None or row[0] == "normal":
             return ("normal", 1.0)
         if row[0] == "reduce":
             return ("reduce", 0.5)
@@ -721,6 +967,7 @@ class RiskEngine:
                         },
                     )
 
+            self.invalidate_snapshot()
             event_type = "tail_risk_escalated" if is_escalation else "tail_risk_cleared"
             self._log_event(
                 event_type=event_type,
@@ -827,6 +1074,7 @@ class RiskEngine:
                 ),
                 trigger_source="daily_loss_stop",
             )
+            self.invalidate_snapshot()
             return True
 
         return False
@@ -903,6 +1151,7 @@ class RiskEngine:
                 {"cb_losses": json.dumps(cb_losses)},
             )
             conn.commit()
+        self.invalidate_snapshot()
 
         # Trip if N consecutive losses reached
         if is_loss and new_count >= limits.cb_consecutive_losses_n:
@@ -1003,6 +1252,7 @@ class RiskEngine:
                 },
             )
             conn.commit()
+        self.invalidate_snapshot()
 
         self._log_event(
             event_type="circuit_breaker_reset",
@@ -1014,13 +1264,16 @@ class RiskEngine:
         )
         logger.info("Circuit breaker reset for key=%s by operator=%s", cb_key, operator)
 
-    def _check_macro_gates(self) -> tuple[str, float]:
+    def _check_macro_gates(
+        self, snapshot: Optional[RiskStateSnapshot] = None
+    ) -> tuple[str, float]:
         """
         Gate 1.7: Read aggregate macro gate state for per-order checks.
 
         Delegates to MacroGateEvaluator.check_order_gates() when an evaluator
         is injected. Returns ('normal', 1.0) when no evaluator is present,
-        preserving backward compatibility.
+        preserving backward compatibility. With a snapshot, returns the state
+        captured at load time.
 
         Returns:
             (state, size_multiplier):
@@ -1028,6 +1281,8 @@ class RiskEngine:
               ('reduce', mult) -- scale buy order quantity by mult
               ('flatten', 0.0) -- block all new orders
         """
+        if snapshot is not None:
+            return snapshot.macro_gate
         if self._macro_gate_evaluator is None:
             return ("normal", 1.0)
         try:
@@ -1043,8 +1298,10 @@ class RiskEngine:
     # Private helpers
     # ------------------------------------------------------------------
 
-    def _is_halted(self) -> bool:
+    def _is_halted(self, snapshot: Optional[RiskStateSnapshot] = None) -> bool:
         """Return True if kill switch is active (trading_state = 'halted')."""
+        if snapshot is not None:
+            return snapshot.trading_state in (None, "halted")
         with self._engine.connect() as conn:
             row = conn.execute(
                 text("SELECT trading_state FROM dim_risk_state WHERE state_id = 1")
@@ -1059,25 +1316,31 @@ class RiskEngine:
         cb_key: str,
         asset_id: Optional[int] = None,
         strategy_id: Optional[int] = None,
+        snapshot: Optional[RiskStateSnapshot] = None,
     ) -> bool:
         """
         Return True if circuit breaker is currently tripped for this key.
 
         Auto-resets breaker if cooldown_hours have elapsed since it was tripped.
         """
-        limits = self._load_limits(asset_id=asset_id, strategy_id=strategy_id)
+        limits = self._load_limits(
+            asset_id=asset_id, strategy_id=strategy_id, snapshot=snapshot
+        )
 
-        with self._engine.connect() as conn:
-            row = conn.execute(
-                text(
-                    "SELECT cb_breaker_tripped_at FROM dim_risk_state WHERE state_id = 1"
-                )
-            ).fetchone()
+        if snapshot is not None:
+            cb_tripped: dict = dict(snapshot.cb_tripped)
+        else:
+            with self._engine.connect() as conn:
+                row = conn.execute(
+                    text(
+                        "SELECT cb_breaker_tripped_at FROM dim_risk_state WHERE state_id = 1"
+                    )
+                ).fetchone()
 
-        if row is None:
-            return False
+            if row is None:
+                return False
 
-        cb_tripped: dict = json.loads(row[0] or "{}")
+            cb_tripped = json.loads(row[0] or "{}")
         tripped_at_str = cb_tripped.get(cb_key)
 
         if tripped_at_str is None:
@@ -1123,6 +1386,10 @@ class RiskEngine:
                     },
                 )
                 conn.commit()
+            self.invalidate_snapshot()
+            if snapshot is not None:
+                # Later orders checked against this snapshot see the reset
+                snapshot.cb_tripped.pop(cb_key, None)
             return False
 
         return True
@@ -1131,6 +1398,7 @@ class RiskEngine:
         self,
         asset_id: Optional[int] = None,
         strategy_id: Optional[int] = None,
+        snapshot: Optional[RiskStateSnapshot] = None,
     ) -> RiskLimits:
         """
         Load risk limits from dim_risk_limits with specificity ordering.
@@ -1144,7 +1412,11 @@ class RiskEngine:
         Returns the most specific matching row, or hardcoded defaults if no DB row found.
         Handles NULL values for new columns (margin_alert_threshold,
         liquidation_kill_threshold) gracefully by falling back to dataclass defaults.
+        With a snapshot, the same resolution runs over the snapshot's rows.
         """
+        if snapshot is not None:
+            return self._limits_from_snapshot(snapshot, asset_id, strategy_id)
+
         rows = []
         with self._engine.connect() as conn:
             result = conn.execute(
@@ -1180,7 +1452,36 @@ class RiskEngine:
             logger.debug("No dim_risk_limits row found -- using hardcoded defaults")
             return RiskLimits()
 
-        row = rows[0]
+        return self._limits_from_row(rows[0])
+
+    def _limits_from_snapshot(
+        self,
+        snapshot: RiskStateSnapshot,
+        asset_id: Optional[int],
+        strategy_id: Optional[int],
+    ) -> RiskLimits:
+        """Most specific matching limits row of a snapshot (see _load_limits)."""
+        best = None
+        best_rank = -1
+        for row in snapshot.limits_rows:
+            row_asset, row_strategy = row[7], row[8]
+            if row_asset is not None and (asset_id is None or row_asset != asset_id):
+                continue
+            if row_strategy is not None and (
+                strategy_id is None or row_strategy != strategy_id
+            ):
+                continue
+            rank = (row_asset is not None) + (row_strategy is not None)
+            if rank > best_rank:
+                best, best_rank = row, rank
+        if best is None:
+            logger.debug("No dim_risk_limits row found -- using hardcoded defaults")
+            return RiskLimits()
+        return self._limits_from_row(best)
+
+    @staticmethod
+    def _limits_from_row(row) -> RiskLimits:
+        """Build RiskLimits from a dim_risk_limits row (_load_limits column order)."""
         # Columns 9 and 10 are the new margin threshold columns (may be NULL on older rows)
         _defaults = RiskLimits()
         margin_alert = (
@@ -1209,6 +1510,7 @@ class RiskEngine:
         strategy_id: int,
         order_side: str,
         limits: RiskLimits,
+        snapshot: Optional[RiskStateSnapshot] = None,
     ) -> Optional[str]:
         """
         Gate 1.6: Margin/liquidation check for perpetual futures positions.
@@ -1227,6 +1529,8 @@ class RiskEngine:
             strategy_id: Strategy ID for position lookup.
             order_side:  "buy" or "sell".
             limits:      Loaded RiskLimits (contains threshold values).
+            snapshot:    Read the perp position (and cache margin tiers) here
+                         instead of querying per order.
 
         Returns:
             "critical" -- blocks order (margin <= liquidation_kill_threshold)
@@ -1239,36 +1543,41 @@ class RiskEngine:
             return None
 
         # Query perp_positions for any active position for this strategy
-        try:
-            with self._engine.connect() as conn:
-                pos_row = conn.execute(
-                    text(
+        if snapshot is not None:
+            if snapshot.perp_positions is None:
+                return None
+            pos_row = snapshot.perp_positions.get(strategy_id)
+        else:
+            try:
+                with self._engine.connect() as conn:
+                    pos_row = conn.execute(
+                        text(
+                            """
+                        SELECT
+                            venue,
+                            symbol,
+                            allocated_margin,
+                            leverage,
+                            margin_mode,
+                            side,
+                            mark_price,
+                            quantity,
+                            avg_entry_price
+                        FROM perp_positions
+                        WHERE strategy_id = :strategy_id
+                          AND side != 'flat'
+                        ORDER BY updated_at DESC
+                        LIMIT 1
                         """
-                    SELECT
-                        venue,
-                        symbol,
-                        allocated_margin,
-                        leverage,
-                        margin_mode,
-                        side,
-                        mark_price,
-                        quantity,
-                        avg_entry_price
-                    FROM perp_positions
-                    WHERE strategy_id = :strategy_id
-                      AND side != 'flat'
-                    ORDER BY updated_at DESC
-                    LIMIT 1
-                    """
-                    ),
-                    {"strategy_id": strategy_id},
-                ).fetchone()
-        except Exception as exc:
-            logger.debug(
-                "Gate 1.6: perp_positions query failed (table may not exist): %s",
-                exc,
-            )
-            return None
+                        ),
+                        {"strategy_id": strategy_id},
+                    ).fetchone()
+            except Exception as exc:
+                logger.debug(
+                    "Gate 1.6: perp_positions query failed (table may not exist): %s",
+                    exc,
+                )
+                return None
 
         if pos_row is None:
             # No perp position -- gate passes (spot-only or no active position)
@@ -1308,7 +1617,13 @@ class RiskEngine:
             load_margin_tiers,
         )
 
-        tiers = load_margin_tiers(self._engine, venue=venue, symbol=symbol)
+        if snapshot is not None:
+            tiers = snapshot.margin_tiers.get((venue, symbol))
+            if tiers is None:
+                tiers = load_margin_tiers(self._engine, venue=venue, symbol=symbol)
+                snapshot.margin_tiers[(venue, symbol)] = tiers
+        else:
+            tiers = load_margin_tiers(self._engine, venue=venue, symbol=symbol)
 
         entry_price = (
             _Decimal(str(avg_entry_price)) if avg_entry_price is not None else None
@@ -1420,6 +1735,18 @@ class RiskEngine:
             logger.debug("Could not compute portfolio value from positions: %s", exc)
         return None
 
+    _INSERT_EVENT_SQL = text(
+        """
+        INSERT INTO risk_events (
+            event_type, trigger_source, reason, operator,
+            asset_id, strategy_id, order_id, metadata
+        ) VALUES (
+            :event_type, :trigger_source, :reason, :operator,
+            :asset_id, :strategy_id, :order_id, :metadata
+        )
+        """
+    )
+
     def _log_event(
         self,
         event_type: str,
@@ -1434,35 +1761,39 @@ class RiskEngine:
         """
         Insert an immutable risk event into risk_events.
 
+        Inside check_orders() events are buffered and inserted together when
+        the batch completes.
+
         Failures are logged but never propagated -- the risk check result takes precedence.
         """
+        params = {
+            "event_type": event_type,
+            "trigger_source": trigger_source,
+            "reason": reason,
+            "operator": operator,
+            "asset_id": asset_id,
+            "strategy_id": strategy_id,
+            "order_id": order_id,
+            "metadata": json.dumps(metadata) if metadata else None,
+        }
+        if self._event_buffer is not None:
+            self._event_buffer.append(params)
+            return
+        self._insert_events([params])
+
+    def _insert_events(self, events: list) -> None:
+        """Insert risk_events rows in one statement (failures logged, not raised)."""
+        if not events:
+            return
         try:
             with self._engine.connect() as conn:
                 conn.execute(
-                    text(
-                        """
-                    INSERT INTO risk_events (
-                        event_type, trigger_source, reason, operator,
-                        asset_id, strategy_id, order_id, metadata
-                    ) VALUES (
-                        :event_type, :trigger_source, :reason, :operator,
-                        :asset_id, :strategy_id, :order_id, :metadata
-                    )
-                    """
-                    ),
-                    {
-                        "event_type": event_type,
-                        "trigger_source": trigger_source,
-                        "reason": reason,
-                        "operator": operator,
-                        "asset_id": asset_id,
-                        "strategy_id": strategy_id,
-                        "order_id": order_id,
-                        "metadata": json.dumps(metadata) if metadata else None,
-                    },
+                    self._INSERT_EVENT_SQL, events[0] if len(events) == 1 else events
                 )
                 conn.commit()
         except Exception as exc:
             logger.warning(
-                "Failed to log risk event (event_type=%s): %s", event_type, exc
+                "Failed to log risk event (event_type=%s): %s",
+                ", ".join(sorted({e["event_type"] for e in events})),
+                exc,
             )
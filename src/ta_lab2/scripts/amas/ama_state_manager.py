@@ -41,6 +41,9 @@ from typing import Optional
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ProgrammingError
+
+from ta_lab2.db.psycopg_helpers import is_undefined_object
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +66,38 @@ CREATE TABLE IF NOT EXISTS {state_table} (
 """
 
 
+# Recursion checkpoints for --from-state refreshes. One row per
+# (id, venue_id, tf, indicator, params_hash): the flat state vector from
+# ama_computations.ama_state() at the last canonical row (ckpt_ts), plus a
+# checkpoint_fingerprint (row count and row-hash sum up to it) of the source
+# bars to detect restatements.
+_RECURSION_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS {recursion_table} (
+    id               INTEGER            NOT NULL,
+    venue_id         SMALLINT           NOT NULL DEFAULT 1,
+    tf               TEXT               NOT NULL,
+    indicator        TEXT               NOT NULL,
+    params_hash      TEXT               NOT NULL,
+    ckpt_ts          TIMESTAMPTZ        NOT NULL,
+    state_vec        DOUBLE PRECISION[] NOT NULL,
+    src_hash         TEXT               NOT NULL,
+    updated_at       TIMESTAMPTZ        NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, venue_id, tf, indicator, params_hash)
+);
+"""
+
+
+def recursion_table_for(state_table: str) -> str:
+    """
+    Derive the recursion-checkpoint table name from a watermark state table.
+
+    ama_multi_tf_state -> ama_multi_tf_recursion_state
+    """
+    if state_table.endswith("_state"):
+        return state_table[: -len("_state")] + "_recursion_state"
+    return state_table + "_recursion"
+
+
 # =============================================================================
 # AMAStateManager
 # =============================================================================
@@ -78,6 +113,7 @@ class AMAStateManager:
     - Save/update state after a successful refresh run
     - Load all states for a given asset (for bulk incremental decisions)
     - Clear state for --full-rebuild scenarios
+    - Persist recursion checkpoints (state vectors) for --from-state refreshes
 
     Thread-safety: Not thread-safe. Create separate instances per thread/worker.
 
@@ -99,6 +135,7 @@ class AMAStateManager:
         """
         self.engine = engine
         self.state_table = state_table
+        self.recursion_table = recursion_table_for(state_table)
 
     # =========================================================================
     # DDL
@@ -115,6 +152,17 @@ class AMAStateManager:
             conn.execute(text(ddl))
         logger.debug("Ensured state table: %s", self.state_table)
 
+    def ensure_recursion_table(self) -> None:
+        """
+        Create the recursion-checkpoint table if it does not already exist.
+
+        Idempotent — safe to call on every refresh run.
+        """
+        ddl = _RECURSION_TABLE_DDL.format(recursion_table=self.recursion_table)
+        with self.engine.begin() as conn:
+            conn.execute(text(ddl))
+        logger.debug("Ensured recursion table: %s", self.recursion_table)
+
     # =========================================================================
     # Load
     # =========================================================================
@@ -316,6 +364,159 @@ class AMAStateManager:
             "save_states_batch: %s — %d rows upserted", self.state_table, len(states)
         )
 
+    # =========================================================================
+    # Recursion checkpoints (--from-state)
+    # =========================================================================
+
+    def load_recursion_states(self, asset_id: int, venue_id: int = 1) -> dict:
+        """
+        Load recursion checkpoints for an asset, grouped by TF.
+
+        Args:
+            asset_id: Asset primary key.
+            venue_id: Venue identifier (FK to dim_venues). Default 1 (CMC_AGG).
+
+        Returns:
+            {tf: {(indicator, params_hash): {"ckpt_ts", "state_vec", "src_hash"}}}.
+            Empty dict if no checkpoints exist or the table is absent.
+        """
+        sql = text(
+            f"""
+            SELECT tf, indicator, params_hash, ckpt_ts, state_vec, src_hash
+            FROM {self.recursion_table}
+            WHERE id = :id AND venue_id = :venue_id
+            """
+        )
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    sql, {"id": asset_id, "venue_id": venue_id}
+                ).fetchall()
+        except ProgrammingError as exc:
+            if not is_undefined_object(exc):
+                raise
+            logger.debug(
+                "load_recursion_states: could not query %s — %s",
+                self.recursion_table,
+                exc,
+            )
+            return {}
+
+        states: dict = {}
+        for tf, indicator, params_hash, ckpt_ts, state_vec, src_hash in rows:
+            states.setdefault(tf, {})[(indicator, params_hash)] = {
+                "ckpt_ts": pd.Timestamp(ckpt_ts),
+                "state_vec": list(state_vec),
+                "src_hash": src_hash,
+            }
+        return states
+
+    def load_resume_context(
+        self,
+        output_table: str,
+        asset_id: int,
+        venue_id: int = 1,
+        alignment_source: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Load the last two written AMA rows per roll group at/before each checkpoint.
+
+        These rows let d1/d2 (per roll group) and d1_roll/d2_roll (unified
+        timeline) continue across the resume boundary.
+
+        Args:
+            output_table: Schema-qualified AMA output table.
+            asset_id: Asset primary key.
+            venue_id: Venue identifier (FK to dim_venues). Default 1 (CMC_AGG).
+            alignment_source: Scope for _u tables (None for siloed tables).
+
+        Returns:
+            DataFrame with tf, indicator, params_hash, ts, roll, ama.
+        """
+        alignment_filter = ""
+        params: dict = {"id": asset_id, "venue_id": venue_id}
+        if alignment_source:
+            alignment_filter = "AND a.alignment_source = :alignment_source"
+            params["alignment_source"] = alignment_source
+
+        sql = text(
+            f"""
+            SELECT tf, indicator, params_hash, ts, roll, ama
+            FROM (
+                SELECT
+                    a.tf, a.indicator, a.params_hash, a.ts, a.roll, a.ama,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY a.tf, a.indicator, a.params_hash, a.roll
+                        ORDER BY a.ts DESC
+                    ) AS rn
+                FROM {output_table} a
+                JOIN {self.recursion_table} s
+                  ON s.id = a.id
+                 AND s.venue_id = a.venue_id
+                 AND s.tf = a.tf
+                 AND s.indicator = a.indicator
+                 AND s.params_hash = a.params_hash
+                WHERE a.id = :id
+                  AND a.venue_id = :venue_id
+                  AND a.ts <= s.ckpt_ts
+                  {alignment_filter}
+            ) x
+            WHERE rn <= 2
+            """
+        )
+        try:
+            with self.engine.connect() as conn:
+                return pd.read_sql(sql, conn, params=params)
+        except Exception as exc:
+            logger.debug(
+                "load_resume_context: could not query %s for id=%s — %s",
+                output_table,
+                asset_id,
+                exc,
+            )
+            return pd.DataFrame(
+                columns=["tf", "indicator", "params_hash", "ts", "roll", "ama"]
+            )
+
+    def save_recursion_states(self, checkpoints: list[dict]) -> None:
+        """
+        Batch upsert recursion checkpoints in a single DB round-trip.
+
+        Each dict must have keys: id, venue_id, tf, indicator, params_hash,
+        ckpt_ts, state_vec, src_hash.
+
+        Args:
+            checkpoints: Checkpoint dicts (BaseAMAFeature.checkpoints).
+        """
+        if not checkpoints:
+            return
+        sql = text(
+            f"""
+            INSERT INTO {self.recursion_table}
+                (id, venue_id, tf, indicator, params_hash,
+                 ckpt_ts, state_vec, src_hash, updated_at)
+            VALUES
+                (:id, :venue_id, :tf, :indicator, :params_hash,
+                 :ckpt_ts, :state_vec, :src_hash, NOW())
+            ON CONFLICT (id, venue_id, tf, indicator, params_hash) DO UPDATE SET
+                ckpt_ts    = EXCLUDED.ckpt_ts,
+                state_vec  = EXCLUDED.state_vec,
+                src_hash   = EXCLUDED.src_hash,
+                updated_at = NOW()
+            """
+        )
+        rows = [
+            {**c, "ckpt_ts": pd.Timestamp(c["ckpt_ts"]).to_pydatetime()}
+            for c in checkpoints
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(sql, rows)
+        logger.debug(
+            "save_recursion_states: %s — %d rows upserted",
+            self.recursion_table,
+            len(rows),
+        )
+
     # =========================================================================
     # Clear (full-rebuild)
     # =========================================================================
@@ -361,6 +562,20 @@ class AMAStateManager:
             with self.engine.begin() as conn:
                 result = conn.execute(sql, params)
                 deleted = result.rowcount
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        text(
+                            f"DELETE FROM {self.recursion_table} WHERE {where_clause}"
+                        ),
+                        params,
+                    )
+            except Exception as exc:
+                logger.debug(
+                    "clear_state: no recursion checkpoints cleared from %s — %s",
+                    self.recursion_table,
+                    exc,
+                )
             logger.debug(
                 "clear_state: deleted %d rows from %s for id=%s tf=%s indicator=%s",
                 deleted,
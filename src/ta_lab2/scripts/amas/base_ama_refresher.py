@@ -7,6 +7,7 @@ Template Method Pattern for all AMA table refresh scripts:
 - ID and TF resolution
 - Parallel asset processing with NullPool workers
 - Incremental watermark-based refresh
+- --from-state: resume AMA recursions from persisted checkpoints
 
 Subclasses implement:
 - get_feature_class(): Return the concrete BaseAMAFeature subclass to use
@@ -158,9 +159,6 @@ def _ama_worker(task: AMAWorkerTask) -> int:
         total_rows = 0
         state_updates: list[dict] = []
 
-        # Preload ALL bars for this asset in 1 query (avoids per-TF DB queries)
-        feature.preload_all_bars(engine, task.asset_id, task.venue_id)
-
         # Load ALL states for this asset in 1 query (instead of per-param-set per-TF)
         if not task.full_rebuild:
             all_states = state_manager.load_all_states(task.asset_id, task.venue_id)
@@ -168,9 +166,50 @@ def _ama_worker(task: AMAWorkerTask) -> int:
         else:
             all_states = pd.DataFrame()
 
+        # --from-state: resume recursions from persisted checkpoints. Each TF
+        # falls back to a full recompute when a checkpoint is missing or the
+        # source bars were restated at or before it.
+        from_state = task.extra_config.get("from_state", False) and not (
+            task.full_rebuild
+        )
+        recursion_states: dict = {}
+        resume_context = pd.DataFrame()
+        resumable: dict = {}
+        if from_state:
+            recursion_states = state_manager.load_recursion_states(
+                task.asset_id, task.venue_id
+            )
+            if recursion_states:
+                resume_context = state_manager.load_resume_context(
+                    f"{task.output_schema}.{task.output_table}",
+                    task.asset_id,
+                    task.venue_id,
+                    alignment_source=task.alignment_source,
+                )
+                resumable = feature.resumable_tfs(
+                    engine,
+                    task.asset_id,
+                    task.venue_id,
+                    task.param_sets,
+                    recursion_states,
+                    resume_context,
+                )
+
+        # Preload ALL bars for this asset in 1 query (avoids per-TF DB queries);
+        # resumable TFs load only the bars from their checkpoint on.
+        feature.preload_all_bars(
+            engine,
+            task.asset_id,
+            task.venue_id,
+            since={tf: ckpt_ts for tf, (ckpt_ts, _) in resumable.items()},
+        )
+
         for tf_spec in tf_specs:
             # Determine start_ts from state (or None for full history)
-            if task.full_rebuild:
+            src_range = None
+            if tf_spec.tf in resumable:
+                start_ts, src_range = resumable[tf_spec.tf]
+            elif task.full_rebuild or from_state:
                 start_ts = None
             else:
                 tf_states = (
@@ -212,6 +251,13 @@ def _ama_worker(task: AMAWorkerTask) -> int:
                 param_sets=task.param_sets,
                 start_ts=start_ts,
                 venue_id=task.venue_id,
+                resume_states=recursion_states.get(tf_spec.tf),
+                context=(
+                    resume_context[resume_context["tf"] == tf_spec.tf]
+                    if not resume_context.empty
+                    else None
+                ),
+                src_range=src_range,
             )
 
             if df.empty:
@@ -256,6 +302,7 @@ def _ama_worker(task: AMAWorkerTask) -> int:
 
         # Batch upsert all state watermarks in 1 DB call
         state_manager.save_states_batch(state_updates)
+        state_manager.save_recursion_states(feature.checkpoints)
 
         _logger.info(
             "asset_id=%s: wrote %d rows across %d TFs",
@@ -421,6 +468,16 @@ Examples:
             default=False,
             help="Clear state and recompute full history (default: incremental).",
         )
+        p.add_argument(
+            "--from-state",
+            action="store_true",
+            default=False,
+            help=(
+                "Resume KAMA/DEMA/TEMA/HMA recursions from persisted checkpoints "
+                "and compute only new bars. Falls back to full recompute per TF "
+                "when bars before the checkpoint were restated."
+            ),
+        )
         p.add_argument(
             "--dry-run",
             action="store_true",
@@ -520,6 +577,7 @@ Examples:
         # Ensure state table exists
         state_manager = AMAStateManager(engine, state_table)
         state_manager.ensure_state_table()
+        state_manager.ensure_recursion_table()
 
         # Populate dim_ama_params (idempotent seed)
         populate_dim_ama_params(engine)
@@ -580,6 +638,7 @@ Examples:
                 bars_table=self.get_bars_table(),
                 tf_subset=tf_subset,
                 full_rebuild=getattr(args, "full_rebuild", False),
+                extra_config={"from_state": getattr(args, "from_state", False)},
                 venue_id=venue_id,
                 alignment_source=self.get_alignment_source(),
             )
@@ -46,11 +46,11 @@ from sqlalchemy.pool import NullPool
 from ta_lab2.analysis.ic import (
     _NON_FEATURE_COLS,
     batch_compute_ic,
-    compute_ic_by_regime,
     load_regimes_for_asset,
     save_ic_results,
 )
 from ta_lab2.analysis.multiple_testing import log_trials_to_registry
+from ta_lab2.analysis.panel_ic import panel_ic_by_regime
 from ta_lab2.scripts.refresh_utils import resolve_db_url
 from ta_lab2.scripts.sync_utils import get_columns, table_exists
 from ta_lab2.time.dim_timeframe import DimTimeframe
@@ -404,6 +404,43 @@ def _rows_from_ic_df(
     return rows
 
 
+def _regime_ic_df(
+    features_df: pd.DataFrame,
+    feature_cols: list[str],
+    close_series: pd.Series,
+    regimes_df: pd.DataFrame,
+    regime_col: str,
+    train_start: pd.Timestamp,
+    train_end: pd.Timestamp,
+    *,
+    horizons: list[int],
+    return_types: list[str],
+    rolling_window: int,
+    tf_days_nominal: int,
+) -> pd.DataFrame:
+    """
+    Regime-conditional IC for all feature columns of one asset in one pass.
+
+    Same rows as calling compute_ic_by_regime() per feature (with a
+    ``feature`` column), via the panel IC engine.
+    """
+    index = features_df.index
+    return panel_ic_by_regime(
+        features_df[feature_cols].to_numpy(dtype=float)[None],
+        close_series.reindex(index).to_numpy(dtype=float)[None],
+        index,
+        regimes_df[regime_col].reindex(index).to_numpy(dtype=object)[None],
+        train_start,
+        train_end,
+        regime_col=regime_col,
+        feature_names=feature_cols,
+        horizons=horizons,
+        return_types=return_types,
+        rolling_window=rolling_window,
+        tf_days_nominal=tf_days_nominal,
+    ).drop(columns="asset_id")
+
+
 # ---------------------------------------------------------------------------
 # Module-level worker function (must be picklable for Windows `spawn`)
 # ---------------------------------------------------------------------------
@@ -518,41 +555,38 @@ def _ic_worker(task: ICWorkerTask) -> dict:
             # Regime breakdown
             if run_regime and regimes_df is not None and not regimes_df.empty:
                 for regime_col_name in ["trend_state", "vol_state"]:
-                    for feat_col in valid_feature_cols:
-                        try:
-                            regime_ic_df = compute_ic_by_regime(
-                                features_df[feat_col],
-                                close_series,
-                                regimes_df,
-                                train_start,
-                                train_end,
-                                horizons=horizons,
-                                return_types=return_types,
-                                rolling_window=task.rolling_window,
-                                tf_days_nominal=task.tf_days_nominal,
-                                regime_col=regime_col_name,
-                            )
-                            if not regime_ic_df.empty:
-                                regime_ic_df["feature"] = feat_col
-                                all_ic_rows.extend(
-                                    _rows_from_ic_df(
-                                        regime_ic_df,
-                                        task.asset_id,
-                                        task.tf,
-                                        train_start,
-                                        train_end,
-                                        task.tf_days_nominal,
-                                    )
-                                )
-                        except Exception as exc:
-                            _logger.warning(
-                                "Regime IC failed for asset_id=%d tf=%s feat=%s regime=%s: %s",
+                    try:
+                        regime_ic_df = _regime_ic_df(
+                            features_df,
+                            valid_feature_cols,
+                            close_series,
+                            regimes_df,
+                            regime_col_name,
+                            train_start,
+                            train_end,
+                            horizons=horizons,
+                            return_types=return_types,
+                            rolling_window=task.rolling_window,
+                            tf_days_nominal=task.tf_days_nominal,
+                        )
+                        all_ic_rows.extend(
+                            _rows_from_ic_df(
+                                regime_ic_df,
                                 task.asset_id,
                                 task.tf,
-                                feat_col,
-                                regime_col_name,
-                                exc,
+                                train_start,
+                                train_end,
+                                task.tf_days_nominal,
                             )
+                        )
+                    except Exception as exc:
+                        _logger.warning(
+                            "Regime IC failed for asset_id=%d tf=%s regime=%s: %s",
+                            task.asset_id,
+                            task.tf,
+                            regime_col_name,
+                            exc,
+                        )
 
             # Persist
             n_written = 0
@@ -963,41 +997,38 @@ def _run_features_sweep(
                 # Regime breakdown for BTC/ETH 1D
                 if run_regime and regimes_df is not None and not regimes_df.empty:
                     for regime_col_name in ["trend_state", "vol_state"]:
-                        for feat_col in valid_feature_cols:
-                            try:
-                                regime_ic_df = compute_ic_by_regime(
-                                    features_df[feat_col],
-                                    close_series,
-                                    regimes_df,
-                                    train_start,
-                                    train_end,
-                                    horizons=horizons,
-                                    return_types=return_types,
-                                    rolling_window=rolling_window,
-                                    tf_days_nominal=tf_days_nominal,
-                                    regime_col=regime_col_name,
-                                )
-                                if not regime_ic_df.empty:
-                                    regime_ic_df["feature"] = feat_col
-                                    all_ic_rows.extend(
-                                        _rows_from_ic_df(
-                                            regime_ic_df,
-                                            asset_id,
-                                            tf,
-                                            train_start,
-                                            train_end,
-                                            tf_days_nominal,
-                                        )
-                                    )
-                            except Exception as exc:
-                                logger.warning(
-                                    "Regime IC failed for asset_id=%d tf=%s feat=%s regime_col=%s: %s",
+                        try:
+                            regime_ic_df = _regime_ic_df(
+                                features_df,
+                                valid_feature_cols,
+                                close_series,
+                                regimes_df,
+                                regime_col_name,
+                                train_start,
+                                train_end,
+                                horizons=horizons,
+                                return_types=return_types,
+                                rolling_window=rolling_window,
+                                tf_days_nominal=tf_days_nominal,
+                            )
+                            all_ic_rows.extend(
+                                _rows_from_ic_df(
+                                    regime_ic_df,
                                     asset_id,
                                     tf,
-                                    feat_col,
-                                    regime_col_name,
-                                    exc,
+                                    train_start,
+                                    train_end,
+                                    tf_days_nominal,
                                 )
+                            )
+                        except Exception as exc:
+                            logger.warning(
+                                "Regime IC failed for asset_id=%d tf=%s regime_col=%s: %s",
+                                asset_id,
+                                tf,
+                                regime_col_name,
+                                exc,
+                            )
 
                 # Persist results
                 n_written = 0
@@ -697,6 +697,7 @@ def _run_phase82_bakeoff(engine: Any, args: Any) -> None:
         exchange=args.exchange,
         overwrite=args.overwrite,
         cpcv_top_n=getattr(args, "cpcv_top_n", 0),
+        batch_params=getattr(args, "batch_params", False),
     )
 
     # --- Dry run: show combination count and exit ---
@@ -1049,6 +1050,13 @@ def main() -> None:
         help="Run CPCV only on top N param sets by PKF Sharpe "
         "(0=all, -1=skip CPCV entirely).",
     )
+    parser.add_argument(
+        "--batch-params",
+        action="store_true",
+        help="Evaluate all param sets of a strategy in one multi-column "
+        "portfolio per fold and cost scenario (vectorbt when installed, "
+        "else the native engine, as without this flag).",
+    )
 
     # Logging
     parser.add_argument(
@@ -442,6 +442,7 @@ def _run_mass_backtest(engine: Any, args: Any) -> None:
         exchange=exchange if exchange != "all" else "kraken",  # registry key for label
         overwrite=args.overwrite,
         cpcv_top_n=args.cpcv_top_n,
+        batch_params=args.batch_params,
     )
 
     # --- Iterate strategies ---
@@ -660,6 +661,15 @@ def main() -> None:
             "(0=all, -1=skip CPCV, default=3)."
         ),
     )
+    parser.add_argument(
+        "--batch-params",
+        action="store_true",
+        help=(
+            "Evaluate all param sets of a strategy in one multi-column "
+            "portfolio per fold and cost scenario (vectorbt when installed, "
+            "else the native engine, as without this flag)."
+        ),
+    )
 
     # Overwrite
     parser.add_argument(
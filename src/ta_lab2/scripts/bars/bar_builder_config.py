@@ -30,6 +30,8 @@ class BarBuilderConfig:
         log_file: Optional log file path
         tz: Timezone for calendar builders (None for non-calendar)
         extra_config: Variant-specific configuration (alignment_type, etc.)
+        fused_returns: If True, also write returns_bars_multi_tf_u rows from
+            the bars just written (see scripts.returns.fused_returns)
     """
 
     db_url: str
@@ -45,6 +47,7 @@ class BarBuilderConfig:
     log_file: str | None = None
     tz: str | None = None
     extra_config: dict[str, Any] | None = None
+    fused_returns: bool = False
 
     def __post_init__(self):
         """Ensure extra_config is a dict (not None)."""
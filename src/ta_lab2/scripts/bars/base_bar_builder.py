@@ -50,8 +50,20 @@ from ta_lab2.scripts.bars.common_snapshot_contract import (
     ensure_state_table,
     ensure_bar_table_exists,
     load_state,
+    upsert_bars,
     create_bar_builder_argument_parser,
 )
+from ta_lab2.scripts.returns.fused_returns import run_fused_stage
+
+# ON CONFLICT key of the unified multi-TF bars table (price_bars_multi_tf_u)
+UNIFIED_BAR_CONFLICT_COLS = (
+    "id",
+    "tf",
+    "bar_seq",
+    "venue_id",
+    "timestamp",
+    "alignment_source",
+)
 
 
 # =============================================================================
@@ -498,6 +510,43 @@ class BaseBarBuilder(ABC):
             self.logger.error(f"Failed to create table {table_name}: {e}")
             raise
 
+    def _upsert_bars(
+        self,
+        bars: pd.DataFrame,
+        *,
+        keep_rejects: bool = False,
+        rejects_table: Optional[str] = None,
+    ) -> None:
+        """
+        Upsert bars into the unified output table.
+
+        With config.fused_returns, the frame as written is also handed to the
+        fused returns stage for this builder's ALIGNMENT_SOURCE, so
+        returns_bars_multi_tf_u is filled without re-reading the bars table.
+
+        Args:
+            bars: Bar snapshots (alignment_source and venue_id already set)
+            keep_rejects: If True, log OHLC violations before repair
+            rejects_table: Table name for rejects
+        """
+        written = upsert_bars(
+            bars,
+            db_url=self.config.db_url,
+            bars_table=self.get_output_table_name(),
+            conflict_cols=UNIFIED_BAR_CONFLICT_COLS,
+            keep_rejects=keep_rejects,
+            rejects_table=rejects_table,
+        )
+        if self.config.fused_returns and not written.empty:
+            run_fused_stage(
+                "bars",
+                self.engine,
+                written,
+                getattr(self, "ALIGNMENT_SOURCE", None),
+                source_table=self.get_output_table_name(),
+                log=self.logger,
+            )
+
     # =========================================================================
     # CLI Integration
     # =========================================================================
@@ -536,6 +585,7 @@ class BaseBarBuilder(ABC):
             default_tz=default_tz,
             include_tz=include_tz,
             include_fail_on_gaps=False,
+            include_fused_returns=getattr(cls, "ALIGNMENT_SOURCE", None) is not None,
         )
 
     @classmethod
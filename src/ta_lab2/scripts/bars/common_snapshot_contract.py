@@ -25,6 +25,8 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
+from ta_lab2.db.binary_copy import bulk_upsert
+
 
 # =============================================================================
 # 0) Table Creation DDL (CREATE TABLE IF NOT EXISTS)
@@ -914,7 +916,7 @@ def convert_nat_to_none(df: pd.DataFrame, cols: Iterable[str]) -> pd.DataFrame:
 
 def _default_timestamp_cols_for_output(df: pd.DataFrame) -> list[str]:
     """
-    Reasonable default list for NaT->None conversion:
+    Reasonable default list of columns staged as timestamptz:
     all timestamp-like required columns that exist in df.
     """
     candidates = [
@@ -942,26 +944,31 @@ def upsert_bars(
     timestamp_cols: Sequence[str] | None = None,
     keep_rejects: bool = False,
     rejects_table: str | None = None,
-) -> None:
+) -> pd.DataFrame:
     """
     Standard bar-table write pipeline (shared):
     - normalize schema
     - log OHLC violations (if keep_rejects=True)
     - enforce output invariants (OHLC sanity, bad time_low fix)
-    - NaT -> None for timestamp cols
-    - executemany upsert
+    - coerce timestamp cols to UTC timestamps (NaT is written as NULL)
+    - one row per conflict key (last wins)
+    - binary COPY upsert (ta_lab2.db.binary_copy); ingested_at is set to
+      now() on insert and whenever a conflicting row's values change
 
     Args:
         df: DataFrame with bar data
         db_url: Database URL
         bars_table: Target bars table name
         conflict_cols: Columns for ON CONFLICT clause
-        timestamp_cols: Columns to convert NaT to None
+        timestamp_cols: Columns staged as timestamptz (NaT -> NULL)
         keep_rejects: If True, log OHLC violations before repair
         rejects_table: Table name for rejects (required if keep_rejects=True)
+
+    Returns:
+        The frame as written (normalized, repaired, UTC timestamps)
     """
     if df.empty:
-        return
+        return df
 
     # Filter to only valid schema columns FIRST
     valid_cols = [
@@ -1044,15 +1051,23 @@ def upsert_bars(
 
     if timestamp_cols is None:
         timestamp_cols = _default_timestamp_cols_for_output(df2)
-    df2 = convert_nat_to_none(df2, timestamp_cols)
-
-    cols = list(df2.columns)
-    sql = text(make_upsert_sql(bars_table, cols, conflict_cols=conflict_cols))
-    payload = df2.to_dict("records")
-
-    e = get_engine(db_url)
-    with e.begin() as c:
-        c.execute(sql, payload)
+    df2 = df2.copy()
+    for c in timestamp_cols:
+        if c in df2.columns:
+            df2[c] = pd.to_datetime(df2[c], utc=True)
+
+    # One row per conflict key (last wins), as the per-row upsert it replaced
+    key_cols = [c for c in conflict_cols if c in df2.columns]
+    df2 = df2.drop_duplicates(subset=key_cols, keep="last")
+
+    bulk_upsert(
+        get_engine(db_url),
+        bars_table,
+        df2,
+        conflict_cols,
+        stamp_cols=("ingested_at",),
+    )
+    return df2
 
 
 # =============================================================================
@@ -1225,6 +1240,7 @@ def create_bar_builder_argument_parser(
     default_tz: str = "America/New_York",
     include_tz: bool = True,
     include_fail_on_gaps: bool = False,
+    include_fused_returns: bool = False,
 ) -> argparse.ArgumentParser:
     """
     Create standard argument parser for bar builders.
@@ -1240,6 +1256,7 @@ def create_bar_builder_argument_parser(
         default_tz: Default timezone for calendar builders
         include_tz: Add --tz flag (for calendar builders)
         include_fail_on_gaps: Add --fail-on-internal-gaps (for anchored builders)
+        include_fused_returns: Add --fused-returns (for multi-TF builders)
 
     Returns:
         Configured ArgumentParser with standard bar builder arguments
@@ -1317,6 +1334,17 @@ def create_bar_builder_argument_parser(
             help="Fail if missing-days occur in the interior of a window.",
         )
 
+    # Optional fused returns stage (for multi-TF builders)
+    if include_fused_returns:
+        ap.add_argument(
+            "--fused-returns",
+            action="store_true",
+            help=(
+                "Also write returns_bars_multi_tf_u rows from the bars in memory "
+                "(advances the returns watermarks in the same pass)."
+            ),
+        )
+
     # Legacy compatibility flag
     ap.add_argument(
         "--parallel",
@@ -81,7 +81,6 @@ from ta_lab2.scripts.bars.common_snapshot_contract import (
     upsert_state,
     resolve_num_processes,
     # Shared write pipeline
-    upsert_bars,
     enforce_ohlc_sanity,
     # Bar builder DB utilities
     load_daily_prices_for_id,
@@ -545,6 +544,7 @@ class MultiTFBarBuilder(BaseBarBuilder):
             num_processes=resolve_num_processes(args.num_processes),
             log_level=getattr(args, "log_level", "INFO"),
             extra_config={"venue_ids": getattr(args, "venue_ids", None)},
+            fused_returns=getattr(args, "fused_returns", False),
         )
 
         return cls(config=config, engine=engine, timeframes=timeframes)
@@ -1290,21 +1290,9 @@ class MultiTFBarBuilder(BaseBarBuilder):
             conn.execute(q, params)
 
     def _upsert_bars(self, bars: pd.DataFrame) -> None:
-        """Upsert bars to database."""
-        upsert_bars(
-            bars,
-            db_url=self.config.db_url,
-            bars_table=self.get_output_table_name(),
-            conflict_cols=(
-                "id",
-                "tf",
-                "bar_seq",
-                "venue_id",
-                "timestamp",
-                "alignment_source",
-            ),
-            keep_rejects=_KEEP_REJECTS,
-            rejects_table=_REJECTS_TABLE,
+        """Upsert bars to database (module-level reject logging settings)."""
+        super()._upsert_bars(
+            bars, keep_rejects=_KEEP_REJECTS, rejects_table=_REJECTS_TABLE
         )
 
     def _update_state(
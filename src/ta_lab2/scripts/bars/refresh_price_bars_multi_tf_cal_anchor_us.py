@@ -40,7 +40,6 @@ from ta_lab2.scripts.bars.common_snapshot_contract import (
     ensure_state_table,
     load_state,
     upsert_state,
-    upsert_bars,
     load_daily_prices_for_id,
     delete_bars_for_id_tf,
     get_coverage_n_days,
@@ -301,19 +300,7 @@ class AnchorCalendarUSBarBuilder(BaseBarBuilder):
                     )
                 bars_pd["alignment_source"] = self.ALIGNMENT_SOURCE
                 bars_pd["venue_id"] = bars_pd.get("venue_id", 1)
-                upsert_bars(
-                    bars_pd,
-                    db_url=self.config.db_url,
-                    bars_table=self.get_output_table_name(),
-                    conflict_cols=(
-                        "id",
-                        "tf",
-                        "bar_seq",
-                        "venue_id",
-                        "timestamp",
-                        "alignment_source",
-                    ),
-                )
+                self._upsert_bars(bars_pd)
                 total_rows += len(bars_pd)
 
                 # Update state per (tf, venue_id)
@@ -514,19 +501,7 @@ class AnchorCalendarUSBarBuilder(BaseBarBuilder):
             bars["venue_id"] = venue_id
             bars["alignment_source"] = self.ALIGNMENT_SOURCE
 
-            upsert_bars(
-                bars,
-                db_url=self.config.db_url,
-                bars_table=self.get_output_table_name(),
-                conflict_cols=(
-                    "id",
-                    "tf",
-                    "bar_seq",
-                    "venue_id",
-                    "timestamp",
-                    "alignment_source",
-                ),
-            )
+            self._upsert_bars(bars)
             self._update_state(
                 id_, spec.tf, bars, daily_min_ts, daily_max_ts, venue_id=venue_id
             )
@@ -546,19 +521,7 @@ class AnchorCalendarUSBarBuilder(BaseBarBuilder):
         bars["venue_id"] = venue_id
         bars["alignment_source"] = self.ALIGNMENT_SOURCE
 
-        upsert_bars(
-            bars,
-            db_url=self.config.db_url,
-            bars_table=self.get_output_table_name(),
-            conflict_cols=(
-                "id",
-                "tf",
-                "bar_seq",
-                "venue_id",
-                "timestamp",
-                "alignment_source",
-            ),
-        )
+        self._upsert_bars(bars)
         self._update_state(
             id_, spec.tf, bars, daily_min_ts, daily_max_ts, venue_id=venue_id
         )
@@ -921,6 +884,7 @@ class AnchorCalendarUSBarBuilder(BaseBarBuilder):
             tz=args.tz if hasattr(args, "tz") else DEFAULT_TZ,
             num_processes=1,  # Anchor builders use single process for now
             log_level=getattr(args, "log_level", "INFO"),
+            fused_returns=getattr(args, "fused_returns", False),
         )
 
         return cls(
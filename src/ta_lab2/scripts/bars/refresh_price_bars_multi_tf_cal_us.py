@@ -52,7 +52,6 @@ from ta_lab2.scripts.bars.common_snapshot_contract import (
     ensure_state_table,
     load_state,
     upsert_state,
-    upsert_bars,
     load_daily_prices_for_id,
     delete_bars_for_id_tf,
     get_coverage_n_days,
@@ -338,19 +337,7 @@ class CalendarUSBarBuilder(BaseBarBuilder):
                     )
                 bars_pd["alignment_source"] = self.ALIGNMENT_SOURCE
                 bars_pd["venue_id"] = bars_pd.get("venue_id", 1)
-                upsert_bars(
-                    bars_pd,
-                    db_url=self.config.db_url,
-                    bars_table=self.get_output_table_name(),
-                    conflict_cols=(
-                        "id",
-                        "tf",
-                        "bar_seq",
-                        "venue_id",
-                        "timestamp",
-                        "alignment_source",
-                    ),
-                )
+                self._upsert_bars(bars_pd)
                 total_rows += len(bars_pd)
 
                 # Update state per (tf, venue_id)
@@ -550,19 +537,7 @@ class CalendarUSBarBuilder(BaseBarBuilder):
             bars["venue_id"] = venue_id
             bars["alignment_source"] = self.ALIGNMENT_SOURCE
 
-            upsert_bars(
-                bars,
-                db_url=self.config.db_url,
-                bars_table=self.get_output_table_name(),
-                conflict_cols=(
-                    "id",
-                    "tf",
-                    "bar_seq",
-                    "venue_id",
-                    "timestamp",
-                    "alignment_source",
-                ),
-            )
+            self._upsert_bars(bars)
             self._update_state(
                 id_, spec.tf, bars, daily_min_ts, daily_max_ts, venue_id=venue_id
             )
@@ -593,19 +568,7 @@ class CalendarUSBarBuilder(BaseBarBuilder):
             bars["venue_id"] = venue_id
             bars["alignment_source"] = self.ALIGNMENT_SOURCE
 
-            upsert_bars(
-                bars,
-                db_url=self.config.db_url,
-                bars_table=self.get_output_table_name(),
-                conflict_cols=(
-                    "id",
-                    "tf",
-                    "bar_seq",
-                    "venue_id",
-                    "timestamp",
-                    "alignment_source",
-                ),
-            )
+            self._upsert_bars(bars)
             self._update_state(
                 id_, spec.tf, bars, daily_min_ts, daily_max_ts, venue_id=venue_id
             )
@@ -637,19 +600,7 @@ class CalendarUSBarBuilder(BaseBarBuilder):
         bars["alignment_source"] = self.ALIGNMENT_SOURCE
 
         # Upsert only the new/updated bars (no DELETE of historical bars)
-        upsert_bars(
-            bars,
-            db_url=self.config.db_url,
-            bars_table=self.get_output_table_name(),
-            conflict_cols=(
-                "id",
-                "tf",
-                "bar_seq",
-                "venue_id",
-                "timestamp",
-                "alignment_source",
-            ),
-        )
+        self._upsert_bars(bars)
         self._update_state(
             id_, spec.tf, bars, daily_min_ts, daily_max_ts, venue_id=venue_id
         )
@@ -1078,6 +1029,7 @@ class CalendarUSBarBuilder(BaseBarBuilder):
             tz=args.tz if hasattr(args, "tz") else DEFAULT_TZ,
             num_processes=1,  # Calendar builders use single process for now
             log_level=getattr(args, "log_level", "INFO"),
+            fused_returns=getattr(args, "fused_returns", False),
         )
 
         return cls(
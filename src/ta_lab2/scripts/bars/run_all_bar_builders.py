@@ -463,6 +463,11 @@ Available builders:
         action="store_true",
         help="Print commands without executing",
     )
+    p.add_argument(
+        "--no-change-log",
+        action="store_true",
+        help="Do not record per-asset bar changes in asset_change_log",
+    )
 
     args = p.parse_args(argv)
 
@@ -531,6 +536,17 @@ Available builders:
     # Print summary
     all_success = print_summary(results)
 
+    # Record per-asset bar changes for downstream dirty tracking.  Runs even
+    # after a partial failure: whatever was written is real.  Best-effort.
+    if results and not args.no_change_log:
+        try:
+            from ta_lab2.scripts.change_log import record_bar_changes
+
+            changed = record_bar_changes(args.db_url)
+            print(f"\n[CHANGE LOG] {len(changed)} ID(s) with changed bars")
+        except Exception as e:
+            print(f"\n[WARN] Could not record bar change log: {e}")
+
     return 0 if all_success else 1
 
 
@@ -6,6 +6,8 @@ This script copies 1D rows from price_bars_1d into the unified _u table so
 downstream consumers (EMAs, features, etc.) see all timeframes in one place.
 
 Uses INSERT ... ON CONFLICT DO UPDATE to upsert — safe to run repeatedly.
+ingested_at is set to now() on insert and when a row's OHLCV changes, so the
+bar change log (scripts/change_log.py) sees synced restatements.
 
 Usage:
     python -m ta_lab2.scripts.bars.sync_1d_to_multi_tf_u
@@ -26,7 +28,7 @@ from ta_lab2.scripts.bars.common_snapshot_contract import resolve_db_url, get_en
 log = logging.getLogger(__name__)
 
 SYNC_SQL = """
-INSERT INTO price_bars_multi_tf_u (
+INSERT INTO price_bars_multi_tf_u AS t (
     id, timestamp, tf, tf_days, bar_seq, alignment_source,
     pos_in_bar, count_days, count_days_remaining,
     time_open_bar, time_close_bar,
@@ -60,7 +62,7 @@ SELECT
     repaired_high, repaired_low,
     repaired_open, repaired_close,
     repaired_volume, repaired_market_cap,
-    src_name, src_load_ts, src_file, ingested_at, venue_id
+    src_name, src_load_ts, src_file, now(), venue_id
 FROM price_bars_1d
 {where_clause}
 ON CONFLICT (id, tf, bar_seq, venue_id, timestamp, alignment_source) DO UPDATE SET
@@ -70,7 +72,12 @@ ON CONFLICT (id, tf, bar_seq, venue_id, timestamp, alignment_source) DO UPDATE S
     close = EXCLUDED.close,
     volume = EXCLUDED.volume,
     market_cap = EXCLUDED.market_cap,
-    src_load_ts = EXCLUDED.src_load_ts
+    src_load_ts = EXCLUDED.src_load_ts,
+    ingested_at = CASE
+        WHEN (t.open, t.high, t.low, t.close, t.volume, t.market_cap)
+             IS DISTINCT FROM (EXCLUDED.open, EXCLUDED.high, EXCLUDED.low,
+                               EXCLUDED.close, EXCLUDED.volume, EXCLUDED.market_cap)
+        THEN now() ELSE t.ingested_at END
 """
 
 
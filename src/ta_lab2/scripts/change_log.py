@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""
+Per-asset bar change log and per-stage watermarks (dirty tracking).
+
+The bar builders record one fingerprint per (id, venue_id, tf,
+alignment_source) key of price_bars_multi_tf_u in public.asset_change_log.
+Only the bars re-ingested since the previous recording (ingested_at above
+the log's MAX(max_ingested_at)) are read: their md5 over the ordered OHLCV
+rows, row count and max timestamp.  A key's change_seq is bumped only when
+that range hash differs from the one stored by the previous recording, so a
+builder that rewrites the same tail with identical bars does not mark the
+asset dirty; rewriting a different range counts as a change (a false
+positive only costs a recompute).  No run reads a key's full history.
+
+Every bar upsert (upsert_bars via binary_copy's stamp_cols, and
+sync_1d_to_multi_tf_u) sets ingested_at = now() on insert and whenever a
+conflicting row's values change, so a bar restated in place is re-ingested
+and seen here.
+
+Deleted bars are out of scope: a DELETE leaves ingested_at untouched, so it
+is never seen.  The builders only delete as part of a full rebuild, which
+re-ingests the key and is recorded as a change.
+
+Downstream stages keep their own high-water mark per asset in
+public.stage_watermark.  An asset is dirty for a stage when any of its keys
+has a change_seq above the stage's watermark (or the stage never ran for it).
+Watermarks advance to the change_seq snapshot taken when the dirty set was
+computed -- changes recorded while the stage runs stay dirty for next time.
+
+Public API:
+    record_bar_changes(db_url, run_id=None) -> list[int]
+    dirty_ids(db_url, stage, ids=None) -> ChangeSet
+    advance_watermarks(db_url, stage, change_set) -> int
+    split_dirty(ids, latest_seq, watermarks) -> tuple[list[int], list[int]]
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+
+from sqlalchemy import create_engine, text
+
+logger = logging.getLogger(__name__)
+
+# Fingerprint of the bars re-ingested since the last recording, upserted in
+# one statement.  Only rows past the ingested_at cursor are aggregated.
+# change_seq and changed_at only move when the range hash differs, so
+# RETURNING (changed_at = checked_at) flags real changes (now() is constant
+# per txn).
+_RECORD_SQL = text(
+    """
+    WITH since AS (
+        SELECT COALESCE(MAX(max_ingested_at), '-infinity'::timestamptz) AS ts
+        FROM public.asset_change_log
+    ),
+    fp AS (
+        SELECT
+            b.id, b.venue_id, b.tf, b.alignment_source,
+            MAX(b."timestamp") AS max_ts,
+            COUNT(*) AS n_range_bars,
+            md5(string_agg(
+                concat_ws('|', b."timestamp", b.bar_seq, b."open", b.high,
+                          b.low, b."close", b.volume, b.is_partial_end),
+                ',' ORDER BY b."timestamp", b.bar_seq
+            )) AS content_hash,
+            MAX(b.ingested_at) AS max_ingested_at
+        FROM public.price_bars_multi_tf_u b, since
+        WHERE b.ingested_at > since.ts
+        GROUP BY b.id, b.venue_id, b.tf, b.alignment_source
+    )
+    INSERT INTO public.asset_change_log AS l
+        (id, venue_id, tf, alignment_source, max_ts, n_range_bars,
+         content_hash, max_ingested_at, change_seq, run_id, changed_at,
+         checked_at)
+    SELECT
+        id, venue_id, tf, alignment_source, max_ts, n_range_bars,
+        content_hash, max_ingested_at, nextval('public.asset_change_seq'),
+        :run_id, now(), now()
+    FROM fp
+    ON CONFLICT (id, venue_id, tf, alignment_source) DO UPDATE SET
+        change_seq = CASE WHEN l.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                          THEN EXCLUDED.change_seq ELSE l.change_seq END,
+        run_id     = CASE WHEN l.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                          THEN EXCLUDED.run_id ELSE l.run_id END,
+        changed_at = CASE WHEN l.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                          THEN EXCLUDED.changed_at ELSE l.changed_at END,
+        max_ts          = GREATEST(l.max_ts, EXCLUDED.max_ts),
+        n_range_bars    = EXCLUDED.n_range_bars,
+        content_hash    = EXCLUDED.content_hash,
+        max_ingested_at = EXCLUDED.max_ingested_at,
+        checked_at      = EXCLUDED.checked_at
+    RETURNING id, (changed_at = checked_at) AS changed
+    """
+)
+
+
+@dataclass
+class ChangeSet:
+    """Dirty ids for one stage plus the change_seq snapshot to advance to.
+
+    ``ids`` is None when dirty tracking is unavailable (no change log yet):
+    callers should then process the full requested universe.
+    """
+
+    stage: str
+    ids: list[int] | None
+    seqs: dict[int, int] = field(default_factory=dict)
+    n_clean: int = 0
+
+
+def split_dirty(
+    ids: list[int],
+    latest_seq: dict[int, int],
+    watermarks: dict[int, int],
+) -> tuple[list[int], list[int]]:
+    """Split ids into (dirty, clean).
+
+    latest_seq: id -> highest change_seq over the id's bar keys (absent = no
+        bars recorded, nothing to compute).
+    watermarks: id -> change_seq the stage last completed (absent = never).
+    """
+    dirty: list[int] = []
+    clean: list[int] = []
+    for id_ in ids:
+        seq = latest_seq.get(id_)
+        if seq is None:
+            clean.append(id_)
+        elif id_ not in watermarks or seq > watermarks[id_]:
+            dirty.append(id_)
+        else:
+            clean.append(id_)
+    return dirty, clean
+
+
+def record_bar_changes(db_url: str, run_id: str | None = None) -> list[int]:
+    """Fingerprint newly ingested bar ranges and return ids that changed.
+
+    Raises on DB errors (callers treat recording as best-effort).
+    """
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+        rows = conn.execute(_RECORD_SQL, {"run_id": run_id}).fetchall()
+    changed = sorted({r[0] for r in rows if r[1]})
+    logger.info(
+        "asset_change_log: %d key(s) re-checked, %d id(s) changed",
+        len(rows),
+        len(changed),
+    )
+    return changed
+
+
+def dirty_ids(db_url: str, stage: str, ids: list[int] | None = None) -> ChangeSet:
+    """Ids with bar changes since ``stage`` last advanced its watermarks.
+
+    ``ids`` None means every id in the change log.  Returns a ChangeSet with
+    ids=None if the change log is missing or empty.
+    """
+    engine = create_engine(db_url)
+    where = "" if ids is None else "WHERE id = ANY(:ids)"
+    seq_sql = text(
+        f"""
+        SELECT id, MAX(change_seq)
+        FROM public.asset_change_log
+        {where}
+        GROUP BY id
+        """
+    )
+    wm_sql = text(
+        """
+        SELECT id, last_change_seq
+        FROM public.stage_watermark
+        WHERE stage = :stage
+        """
+    )
+    try:
+        with engine.connect() as conn:
+            latest = dict(conn.execute(seq_sql, {"ids": ids}).fetchall())
+            marks = dict(conn.execute(wm_sql, {"stage": stage}).fetchall())
+    except Exception as exc:
+        logger.warning("Change log unavailable (%s) -- processing all ids", exc)
+        return ChangeSet(stage=stage, ids=None)
+    if not latest:
+        return ChangeSet(stage=stage, ids=None)
+
+    universe = ids if ids is not None else sorted(latest)
+    dirty, clean = split_dirty(universe, latest, marks)
+    return ChangeSet(
+        stage=stage,
+        ids=dirty,
+        seqs={id_: latest[id_] for id_ in dirty},
+        n_clean=len(clean),
+    )
+
+
+def advance_watermarks(db_url: str, stage: str, change_set: ChangeSet) -> int:
+    """Mark ``change_set``'s ids as processed by ``stage``.  Returns row count."""
+    if not change_set.seqs:
+        return 0
+    engine = create_engine(db_url)
+    sql = text(
+        """
+        INSERT INTO public.stage_watermark (stage, id, last_change_seq, updated_at)
+        SELECT :stage, u.id, u.seq, now()
+        FROM unnest(CAST(:ids AS INTEGER[]), CAST(:seqs AS BIGINT[])) AS u(id, seq)
+        ON CONFLICT (stage, id) DO UPDATE SET
+            last_change_seq = GREATEST(
+                public.stage_watermark.last_change_seq, EXCLUDED.last_change_seq
+            ),
+            updated_at = EXCLUDED.updated_at
+        """
+    )
+    ids = list(change_set.seqs)
+    with engine.begin() as conn:
+        conn.execute(
+            sql,
+            {"stage": stage, "ids": ids, "seqs": [change_set.seqs[i] for i in ids]},
+        )
+    return len(ids)
@@ -1353,6 +1353,14 @@ If you see "too many clients already" errors:
             action="store_true",
             help="Ignore state and run full history refresh",
         )
+        p.add_argument(
+            "--fused-returns",
+            action="store_true",
+            help=(
+                "Also write returns_ema_multi_tf_u rows from the EMA frames in "
+                "memory (advances the returns watermarks in the same pass)"
+            ),
+        )
         p.add_argument(
             "--num-processes",
             type=int,
@@ -12,6 +12,10 @@ Unified State Schema (PRIMARY KEY: id, tf, period):
 - last_time_close, last_canonical_ts: Latest EMA timestamps
 - updated_at: Last update timestamp
 
+Recursion checkpoints (RECURSION_STATE_SCHEMA, --from-state): the
+ema/ema_bar values at the last canonical bar per (id, venue_id, tf, period)
+so refreshes can resume the recursion instead of recomputing full history.
+
 Usage:
     from ta_lab2.scripts.emas.ema_state_manager import EMAStateManager, EMAStateConfig
 
@@ -39,6 +43,9 @@ from typing import Optional
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ProgrammingError
+
+from ta_lab2.db.psycopg_helpers import is_undefined_object
 
 
 # =============================================================================
@@ -73,6 +80,9 @@ class EMAStateConfig:
     alignment_source: Optional[str] = (
         None  # When set, scopes bar_metadata CTE to this alignment_source
     )
+    recursion_table: Optional[str] = (
+        None  # --from-state checkpoints; default derived from state_table
+    )
 
 
 # =============================================================================
@@ -104,6 +114,28 @@ CREATE TABLE IF NOT EXISTS {schema}.{table} (
 """
 
 
+# Recursion checkpoints for --from-state refreshes: (ema, ema_bar) at the last
+# on-grid canonical bar per (id, venue_id, tf, period), plus a
+# checkpoint_fingerprint (row counts and row-hash sums up to it) of the daily +
+# bar series to detect upstream restatements.
+RECURSION_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {schema}.{table} (
+    id                  INTEGER             NOT NULL,
+    venue_id            SMALLINT            NOT NULL DEFAULT 1,
+    tf                  TEXT                NOT NULL,
+    period              INTEGER             NOT NULL,
+    tf_days             INTEGER             NULL,
+    ckpt_ts             TIMESTAMPTZ         NOT NULL,
+    ema                 DOUBLE PRECISION    NOT NULL,
+    ema_bar             DOUBLE PRECISION    NOT NULL,
+    src_hash            TEXT                NOT NULL,
+    updated_at          TIMESTAMPTZ         NOT NULL DEFAULT now(),
+
+    PRIMARY KEY (id, venue_id, tf, period)
+);
+"""
+
+
 class EMAStateManager:
     """
     Manages state tables for incremental EMA refreshes.
@@ -141,6 +173,109 @@ class EMAStateManager:
         with self.engine.begin() as conn:
             conn.execute(text(sql))
 
+    @property
+    def recursion_table(self) -> str:
+        """Recursion checkpoint table (ema_multi_tf_state -> ema_multi_tf_recursion_state)."""
+        if self.config.recursion_table:
+            return self.config.recursion_table
+        table = self.config.state_table
+        if table.endswith("_state"):
+            return table[: -len("_state")] + "_recursion_state"
+        return table + "_recursion"
+
+    def ensure_recursion_table(self) -> None:
+        """Create the recursion checkpoint table if it doesn't exist (idempotent)."""
+        sql = RECURSION_STATE_SCHEMA.format(
+            schema=self.config.state_schema,
+            table=self.recursion_table,
+        )
+        with self.engine.begin() as conn:
+            conn.execute(text(sql))
+
+    def load_recursion_state(
+        self, id_: int, venue_id: Optional[int] = 1
+    ) -> pd.DataFrame:
+        """
+        Load recursion checkpoints for one asset (all TFs and periods).
+
+        Args:
+            id_: Cryptocurrency ID
+            venue_id: Venue ID (default 1 = CMC_AGG); None loads every venue
+
+        Returns:
+            DataFrame with id, venue_id, tf, period, ckpt_ts, ema, ema_bar,
+            src_hash. Empty if the table doesn't exist or holds no rows.
+
+        Raises:
+            sqlalchemy.exc.DBAPIError: Any error other than a missing table
+                or column (connection failures, permissions, ...).
+        """
+        sql = text(
+            f"""
+            SELECT id, venue_id, tf, period, ckpt_ts, ema, ema_bar, src_hash
+            FROM {self.config.state_schema}.{self.recursion_table}
+            WHERE id = :id
+              AND (CAST(:venue_id AS SMALLINT) IS NULL OR venue_id = :venue_id)
+            """
+        )
+        try:
+            with self.engine.connect() as conn:
+                return pd.read_sql(sql, conn, params={"id": id_, "venue_id": venue_id})
+        except ProgrammingError as exc:
+            if not is_undefined_object(exc):
+                raise
+            return pd.DataFrame(
+                columns=[
+                    "id",
+                    "venue_id",
+                    "tf",
+                    "period",
+                    "ckpt_ts",
+                    "ema",
+                    "ema_bar",
+                    "src_hash",
+                ]
+            )
+
+    def save_recursion_state(self, checkpoints: list[dict]) -> int:
+        """
+        Upsert recursion checkpoints (MultiTFEMAFeature.checkpoints).
+
+        Args:
+            checkpoints: Dicts with id, venue_id, tf, period, tf_days, ckpt_ts,
+                ema, ema_bar, src_hash
+
+        Returns:
+            Number of checkpoint rows upserted
+        """
+        if not checkpoints:
+            return 0
+
+        sql = text(
+            f"""
+            INSERT INTO {self.config.state_schema}.{self.recursion_table}
+                (id, venue_id, tf, period, tf_days,
+                 ckpt_ts, ema, ema_bar, src_hash, updated_at)
+            VALUES
+                (:id, :venue_id, :tf, :period, :tf_days,
+                 :ckpt_ts, :ema, :ema_bar, :src_hash, now())
+            ON CONFLICT (id, venue_id, tf, period) DO UPDATE SET
+                tf_days    = EXCLUDED.tf_days,
+                ckpt_ts    = EXCLUDED.ckpt_ts,
+                ema        = EXCLUDED.ema,
+                ema_bar    = EXCLUDED.ema_bar,
+                src_hash   = EXCLUDED.src_hash,
+                updated_at = EXCLUDED.updated_at
+            """
+        )
+        rows = [
+            {**c, "ckpt_ts": pd.Timestamp(c["ckpt_ts"]).to_pydatetime()}
+            for c in checkpoints
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(sql, rows)
+        return len(rows)
+
     def load_state(
         self,
         *,
@@ -33,6 +33,7 @@ from ta_lab2.scripts.emas.base_ema_refresher import (
 from ta_lab2.scripts.emas.ema_state_manager import EMAStateConfig
 from ta_lab2.scripts.emas.ema_computation_orchestrator import WorkerTask
 from ta_lab2.scripts.emas.logging_config import get_worker_logger
+from ta_lab2.scripts.returns.fused_returns import run_fused_stage
 
 
 # Default EMA periods
@@ -128,6 +129,15 @@ def _process_id_worker(task: WorkerTask) -> int:
             df_out = pd.concat(all_results, ignore_index=True)
             df_out = df_out.replace({np.nan: None})
             feature.write_to_db(df_out)
+            if task.extra_config.get("fused_returns", False):
+                run_fused_stage(
+                    "ema",
+                    engine,
+                    df_out,
+                    alignment_source,
+                    source_table=f"{schema}.{out_table}",
+                    log=logger,
+                )
             n = len(df_out)
         else:
             n = 0
@@ -332,6 +342,7 @@ class CalAnchorEMARefresher(BaseEMARefresher):
                 "alpha_schema": args.alpha_schema,
                 "alpha_table": args.alpha_table,
                 "alignment_source": alignment_source,
+                "fused_returns": getattr(args, "fused_returns", False),
             },
         )
 
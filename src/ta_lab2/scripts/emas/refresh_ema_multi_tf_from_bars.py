@@ -15,6 +15,18 @@ Fast-path (Phase 108-02):
       ema_new = close * alpha + ema_prev * (1 - alpha)
 - Falls back to full recompute for stale watermarks or --no-fast-path.
 - Typical speedup: ~59 min -> ~2-3 min for daily incremental runs.
+
+Resume from state (--from-state):
+- Every full computation records a recursion checkpoint per
+  (id, venue_id, tf, period): ema/ema_bar at the last canonical bar plus a
+  fingerprint of the daily + bar rows up to it -- row counts and sums of
+  per-row content hashes (ema_multi_tf_recursion_state).
+- With --from-state Postgres recomputes those ranges at each checkpoint, so
+  a row inserted, deleted or restated anywhere before it is caught without
+  shipping the history. Valid checkpoints load only the rows from the
+  checkpoint on and the batch kernels resume from the stored state. A
+  restated history, a missing period or a moved canonical row falls back to
+  full recompute for that (id, tf).
 """
 
 from __future__ import annotations
@@ -34,6 +46,7 @@ from ta_lab2.scripts.emas.base_ema_refresher import (
 from ta_lab2.scripts.emas.ema_state_manager import EMAStateConfig, EMAStateManager
 from ta_lab2.scripts.emas.ema_computation_orchestrator import WorkerTask
 from ta_lab2.scripts.emas.logging_config import get_worker_logger
+from ta_lab2.scripts.returns.fused_returns import run_fused_stage
 from ta_lab2.time.dim_timeframe import list_tfs
 
 
@@ -451,6 +464,8 @@ def _process_id_worker(task: WorkerTask) -> int:
         out_table = task.extra_config.get("out_table", "ema_multi_tf_u")
         alignment_source = task.extra_config.get("alignment_source", "multi_tf")
         no_fast_path = task.extra_config.get("no_fast_path", False)
+        fused_returns = task.extra_config.get("fused_returns", False)
+        from_state = task.extra_config.get("from_state", False)
         fast_path_threshold = task.extra_config.get(
             "fast_path_threshold_days", FAST_PATH_THRESHOLD_DAYS
         )
@@ -467,16 +482,19 @@ def _process_id_worker(task: WorkerTask) -> int:
             alignment_source=alignment_source,
         )
 
+        state_config = EMAStateConfig(
+            state_schema=out_schema,
+            state_table=task.extra_config.get("state_table", "ema_multi_tf_state"),
+        )
+        state_mgr = EMAStateManager(engine, state_config)
+
         # ------------------------------------------------------------------
         # Fast-path dispatch: check watermark recency
+        # (--from-state supersedes it: resumes exactly from checkpoints)
         # ------------------------------------------------------------------
-        if not no_fast_path:
-            state_config = EMAStateConfig(
-                state_schema=out_schema,
-                state_table=task.extra_config.get("state_table", "ema_multi_tf_state"),
-            )
-            state_mgr = EMAStateManager(engine, state_config)
-
+        if from_state:
+            logger.info(f"from-state: resuming recursions for id={task.id_}")
+        elif not no_fast_path:
             if state_mgr.is_watermark_recent(
                 task.id_, threshold_days=fast_path_threshold
             ):
@@ -523,6 +541,15 @@ def _process_id_worker(task: WorkerTask) -> int:
                             bars_table=bars_table,
                         )
                         feature_write.write_to_db(df_fast)
+                        if fused_returns:
+                            run_fused_stage(
+                                "ema",
+                                engine,
+                                df_fast,
+                                alignment_source,
+                                source_table=f"{out_schema}.{out_table}",
+                                log=logger,
+                            )
                         total_rows = len(df_fast)
                         engine.dispose()
                         logger.info(
@@ -552,7 +579,7 @@ def _process_id_worker(task: WorkerTask) -> int:
             logger.info(f"full-recompute: --no-fast-path for id={task.id_}")
 
         # ------------------------------------------------------------------
-        # Full recompute path (original logic, unchanged)
+        # Full recompute path (resumes per (id, tf) under --from-state)
         # ------------------------------------------------------------------
         feature = MultiTFEMAFeature(
             engine=engine,
@@ -561,6 +588,11 @@ def _process_id_worker(task: WorkerTask) -> int:
             bars_table=bars_table,
             tf_subset=task.tf_subset,
         )
+        if from_state:
+            # The feature computes every venue of the id, so load all of them
+            feature.set_resume_state(
+                state_mgr.load_recursion_state(task.id_, venue_id=None)
+            )
         df_daily = feature.load_source_data([task.id_], start=task.start, end=task.end)
         if df_daily.empty:
             engine.dispose()
@@ -585,11 +617,32 @@ def _process_id_worker(task: WorkerTask) -> int:
             df_out = pd.concat(all_results, ignore_index=True)
             df_out = df_out.replace({np.nan: None})
             feature.write_to_db(df_out)
+            if fused_returns:
+                run_fused_stage(
+                    "ema",
+                    engine,
+                    df_out,
+                    alignment_source,
+                    source_table=f"{out_schema}.{out_table}",
+                    log=logger,
+                )
             total_rows = len(df_out)
         else:
             total_rows = 0
 
+        # Checkpoints are saved after the write so a failed write never
+        # leaves state pointing past the persisted rows.
+        if feature.checkpoints:
+            state_mgr.ensure_recursion_table()
+            state_mgr.save_recursion_state(feature.checkpoints)
+
         engine.dispose()
+        if from_state:
+            logger.info(
+                f"from-state: id={task.id_} resumed "
+                f"{len(feature.resumed_keys)}/{len(tf_specs)} TFs "
+                "(others recomputed in full)"
+            )
         logger.info(f"Completed EMA computation for id={task.id_}: {total_rows} rows")
         return total_rows
 
@@ -617,6 +670,9 @@ class MultiTFEMARefresher(BaseEMARefresher):
     - When watermark is recent (< fast_path_threshold_days), loads only the last
       EMA value per (tf, period) and computes forward.
     - Disable with --no-fast-path or --full-refresh.
+
+    Resume from state:
+    - --from-state resumes from recursion checkpoints (see module docstring).
     """
 
     DEFAULT_PERIODS = DEFAULT_PERIODS
@@ -742,6 +798,18 @@ class MultiTFEMARefresher(BaseEMARefresher):
             ),
         )
 
+        p.add_argument(
+            "--from-state",
+            action="store_true",
+            default=False,
+            dest="from_state",
+            help=(
+                "Resume EMA recursions from persisted checkpoints and write only "
+                "rows after them. Falls back to full recompute per (id, tf) when "
+                "upstream bars were restated."
+            ),
+        )
+
         return p
 
     @classmethod
@@ -800,9 +868,12 @@ class MultiTFEMARefresher(BaseEMARefresher):
             args, "fast_path_threshold_days", FAST_PATH_THRESHOLD_DAYS
         )
 
-        # --full-refresh implicitly disables fast-path
+        from_state = getattr(args, "from_state", False)
+
+        # --full-refresh implicitly disables fast-path and resume-from-state
         if args.full_refresh:
             no_fast_path = True
+            from_state = False
 
         # Create final config with loaded IDs and periods
         final_config = EMARefresherConfig(
@@ -830,6 +901,8 @@ class MultiTFEMARefresher(BaseEMARefresher):
                 "state_table": args.state_table,
                 "no_fast_path": no_fast_path,
                 "fast_path_threshold_days": fast_path_threshold_days,
+                "from_state": from_state,
+                "fused_returns": getattr(args, "fused_returns", False),
             },
         )
 
@@ -0,0 +1,208 @@
+"""
+benchmark_bulk_write.py
+
+Benchmark the binary COPY bulk writer (ta_lab2.db.binary_copy) against the
+write paths it replaced, on a scratch table in a local Postgres:
+
+  csv          df.to_csv -> StringIO -> COPY csv -> INSERT ... ON CONFLICT
+               (the former BaseEMAFeature.write_to_db path)
+  executemany  INSERT ... ON CONFLICT via SQLAlchemy executemany
+               (the former upsert_bars path)
+  binary       bulk_upsert(): binary COPY -> INSERT ... ON CONFLICT
+
+The frame is EMA-shaped (ids x tfs x periods x days).  Each method writes into
+an empty table and then upserts the same rows again, so both the insert and
+the conflict-update path are timed.
+
+Usage:
+    python -m ta_lab2.scripts.etl.benchmark_bulk_write
+    python -m ta_lab2.scripts.etl.benchmark_bulk_write --rows 500000 --repeat 3
+    python -m ta_lab2.scripts.etl.benchmark_bulk_write --methods csv binary
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from ta_lab2.db.binary_copy import bulk_upsert
+from ta_lab2.scripts.bars.common_snapshot_contract import make_upsert_sql
+from ta_lab2.scripts.refresh_utils import resolve_db_url
+
+BENCH_TABLE = "public._bulk_write_benchmark"
+PK_COLS = ["id", "venue_id", "ts", "tf", "period"]
+METHODS = ("csv", "executemany", "binary")
+
+_DDL = f"""
+CREATE TABLE {BENCH_TABLE} (
+    id          integer NOT NULL,
+    venue_id    smallint NOT NULL,
+    ts          timestamptz NOT NULL,
+    tf          text NOT NULL,
+    period      integer NOT NULL,
+    tf_days     integer,
+    ema         double precision,
+    ema_bar     double precision,
+    d1          double precision,
+    d2          double precision,
+    roll        boolean,
+    PRIMARY KEY (id, venue_id, ts, tf, period)
+)
+"""
+
+
+def make_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic EMA-shaped frame with roughly ``n_rows`` rows."""
+    rng = np.random.default_rng(seed)
+    periods = [9, 10, 21, 50, 100, 200]
+    tfs = ["1D", "7D", "30D"]
+    n_days = max(1, n_rows // (len(periods) * len(tfs)))
+    ts = pd.date_range("2015-01-01", periods=n_days, freq="D", tz="UTC")
+
+    grid = pd.MultiIndex.from_product(
+        [tfs, periods, ts], names=["tf", "period", "ts"]
+    ).to_frame(index=False)
+    n = len(grid)
+    ema = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    d1 = np.diff(ema, prepend=np.nan)
+    return pd.DataFrame(
+        {
+            "id": 1,
+            "venue_id": 1,
+            "ts": grid["ts"],
+            "tf": grid["tf"],
+            "period": grid["period"],
+            "tf_days": grid["tf"].str.rstrip("D").astype(int),
+            "ema": ema,
+            "ema_bar": ema * (1.0 + rng.normal(0.0, 1e-3, n)),
+            "d1": d1,
+            "d2": np.diff(d1, prepend=np.nan),
+            "roll": rng.random(n) < 0.8,
+        }
+    )
+
+
+def _write_csv(engine, df: pd.DataFrame) -> int:
+    cols = list(df.columns)
+    col_list = ", ".join(cols)
+    update = ", ".join(f"{c} = EXCLUDED.{c}" for c in cols if c not in PK_COLS)
+    raw_conn = engine.raw_connection()
+    try:
+        cur = raw_conn.cursor()
+        cur.execute(
+            f"CREATE TEMP TABLE _bench_staging (LIKE {BENCH_TABLE} INCLUDING DEFAULTS) "
+            "ON COMMIT DROP"
+        )
+        buf = io.StringIO()
+        df.to_csv(buf, index=False, header=False, na_rep="\\N")
+        nbytes = len(buf.getvalue().encode("utf-8"))
+        buf.seek(0)
+        cur.copy_expert(
+            f"COPY _bench_staging ({col_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+            buf,
+        )
+        cur.execute(
+            f"INSERT INTO {BENCH_TABLE} ({col_list}) SELECT {col_list} FROM _bench_staging "
+            f"ON CONFLICT ({', '.join(PK_COLS)}) DO UPDATE SET {update}"
+        )
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+    return nbytes
+
+
+def _write_executemany(engine, df: pd.DataFrame) -> int:
+    sql = text(make_upsert_sql(BENCH_TABLE, list(df.columns), conflict_cols=PK_COLS))
+    payload = df.astype(object).where(df.notna(), None).to_dict("records")
+    with engine.begin() as conn:
+        conn.execute(sql, payload)
+    return 0
+
+
+def _write_binary(engine, df: pd.DataFrame) -> int:
+    return bulk_upsert(engine, BENCH_TABLE, df, PK_COLS).bytes
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "executemany": _write_executemany,
+    "binary": _write_binary,
+}
+
+
+def run_benchmark(
+    engine, df: pd.DataFrame, methods: list[str], repeat: int
+) -> pd.DataFrame:
+    """
+    Time each method on ``df``.
+
+    Args:
+        engine: SQLAlchemy engine for the scratch database.
+        df: Frame to write.
+        methods: Subset of METHODS to run.
+        repeat: Runs per method; the best run is reported.
+
+    Returns:
+        One row per (method, phase) with seconds, rows/s and payload MB.
+    """
+    results = []
+    for method in methods:
+        writer = _WRITERS[method]
+        for phase in ("insert", "upsert"):
+            best, nbytes = float("inf"), 0
+            for _ in range(repeat):
+                if phase == "insert":
+                    with engine.begin() as conn:
+                        conn.execute(text(f"TRUNCATE {BENCH_TABLE}"))
+                t0 = time.perf_counter()
+                nbytes = writer(engine, df)
+                best = min(best, time.perf_counter() - t0)
+            results.append(
+                {
+                    "method": method,
+                    "phase": phase,
+                    "rows": len(df),
+                    "seconds": best,
+                    "rows_per_sec": len(df) / best,
+                    "payload_mb": nbytes / 1e6 if nbytes else np.nan,
+                }
+            )
+    return pd.DataFrame(results)
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    p.add_argument("--db-url", default=None, help="Target DB (default: resolved)")
+    p.add_argument("--rows", type=int, default=200_000, help="Approximate rows")
+    p.add_argument("--repeat", type=int, default=3, help="Runs per method")
+    p.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    args = p.parse_args(argv)
+
+    engine = create_engine(resolve_db_url(args.db_url))
+    df = make_frame(args.rows)
+    print(f"Benchmarking {len(df):,} rows x {len(df.columns)} cols -> {BENCH_TABLE}")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(_DDL))
+    try:
+        report = run_benchmark(engine, df, args.methods, args.repeat)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+    print(report.to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,7 @@ from typing import Optional
 import pandas as pd
 from sqlalchemy import Engine, text
 
+from ta_lab2.db.binary_copy import copy_upsert
 from ta_lab2.features.feature_utils import (
     apply_null_strategy,
     add_zscore as add_zscore_util,
@@ -326,7 +327,7 @@ class BaseFeature(ABC):
 
     def write_to_db(self, df: pd.DataFrame) -> int:
         """
-        Write feature results to database using scoped DELETE + INSERT.
+        Write feature results to database using scoped DELETE + binary COPY.
 
         Deletes existing rows for (ids, tf) batch, then inserts new data.
         Filters DataFrame columns to match the actual DB table columns
@@ -372,17 +373,8 @@ class BaseFeature(ABC):
                 ),
                 {"ids": ids, "tf": tf, "as_": alignment_source, "venue_ids": venue_ids},
             )
-
-        # Insert
-        df.to_sql(
-            self.config.output_table,
-            self.engine,
-            schema=self.config.output_schema,
-            if_exists="append",
-            index=False,
-            method="multi",
-            chunksize=10000,
-        )
+            # Insert via binary COPY in the same transaction as the DELETE
+            copy_upsert(conn.connection, fq_table, df)
 
         return len(df)
 
@@ -12,6 +12,7 @@ Historical snapshots are preserved via computed_at in the PK.
 Usage:
     python -m ta_lab2.scripts.features.codependence_feature --ids 1,52,1027 --tf 1D
     python -m ta_lab2.scripts.features.codependence_feature --all --tf 1D --window 252
+    python -m ta_lab2.scripts.features.codependence_feature --all --tf 1D --workers 8
     python -m ta_lab2.scripts.features.codependence_feature --all --tf 1D --dry-run
 """
 
@@ -30,12 +31,7 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
-from ta_lab2.features.microstructure import (
-    distance_correlation,
-    pairwise_mi,
-    quantile_encode,
-    variation_of_information,
-)
+from ta_lab2.features.codependence import codependence_panel, pair_codependence
 
 logger = logging.getLogger(__name__)
 
@@ -152,6 +148,7 @@ def compute_codependence(x: np.ndarray, y: np.ndarray) -> dict:
     """Compute all codependence metrics between two return series.
 
     Aligns x and y to common non-NaN indices before computing metrics.
+    Thin wrapper over ``features.codependence.pair_codependence``.
 
     Parameters
     ----------
@@ -166,52 +163,7 @@ def compute_codependence(x: np.ndarray, y: np.ndarray) -> dict:
         Keys: pearson_corr, distance_corr, mutual_info, variation_of_info,
         n_obs. All values are float or NaN if insufficient overlap.
     """
-    x = np.asarray(x, dtype=np.float64)
-    y = np.asarray(y, dtype=np.float64)
-
-    # Align to shortest
-    min_len = min(len(x), len(y))
-    x = x[-min_len:]
-    y = y[-min_len:]
-
-    # Common non-NaN mask
-    mask = ~(np.isnan(x) | np.isnan(y))
-    n_obs = int(mask.sum())
-
-    if n_obs < 30:
-        return {
-            "pearson_corr": np.nan,
-            "distance_corr": np.nan,
-            "mutual_info": np.nan,
-            "variation_of_info": np.nan,
-            "n_obs": n_obs,
-        }
-
-    x_clean = x[mask]
-    y_clean = y[mask]
-
-    # 1. Pearson correlation
-    corr_matrix = np.corrcoef(x_clean, y_clean)
-    pearson = float(corr_matrix[0, 1])
-
-    # 2. Distance correlation (from microstructure library)
-    dcorr = distance_correlation(x_clean, y_clean)
-
-    # 3. Mutual information (continuous, k-NN estimator)
-    mi = pairwise_mi(x_clean, y_clean)
-
-    # 4. Variation of information (requires discrete encoding)
-    x_enc = quantile_encode(x_clean, n_bins=10)
-    y_enc = quantile_encode(y_clean, n_bins=10)
-    vi = variation_of_information(x_enc, y_enc)
-
-    return {
-        "pearson_corr": pearson,
-        "distance_corr": dcorr,
-        "mutual_info": mi,
-        "variation_of_info": vi,
-        "n_obs": n_obs,
-    }
+    return pair_codependence(x, y, n_bins=10, min_obs=30)
 
 
 # ---------------------------------------------------------------------------
@@ -225,9 +177,14 @@ def refresh_codependence(
     tf: str = "1D",
     window_bars: int = 252,
     dry_run: bool = False,
+    workers: int = 1,
 ) -> int:
     """Compute pairwise codependence for all asset pairs and write to DB.
 
+    Pairs are computed by ``features.codependence.codependence_panel``:
+    per-asset preprocessing is done once, distance covariance is
+    O(n log n), and pair blocks fan out over ``workers`` processes.
+
     Parameters
     ----------
     engine : Engine
@@ -240,6 +197,8 @@ def refresh_codependence(
         Number of bars for the rolling window.
     dry_run : bool
         If True, compute but do not write to DB.
+    workers : int
+        Process-pool size for the pair computation (1 = in-process).
 
     Returns
     -------
@@ -270,36 +229,24 @@ def refresh_codependence(
     # 3. Single computed_at for the entire batch
     computed_at = datetime.now(timezone.utc)
 
-    # 4. Process pairs SEQUENTIALLY (avoid OOM from distance matrices)
-    results: list[dict] = []
-    for i, (id_a, id_b) in enumerate(pairs):
-        metrics = compute_codependence(series[id_a], series[id_b])
-
-        results.append(
-            {
-                "id_a": id_a,
-                "id_b": id_b,
-                "tf": tf,
-                "window_bars": window_bars,
-                "computed_at": computed_at,
-                "pearson_corr": metrics["pearson_corr"],
-                "distance_corr": metrics["distance_corr"],
-                "mutual_info": metrics["mutual_info"],
-                "variation_of_info": metrics["variation_of_info"],
-                "n_obs": metrics["n_obs"],
-            }
-        )
-
-        if (i + 1) % 100 == 0 or (i + 1) == n_pairs:
-            logger.info(
-                "  progress: %d/%d pairs (%.1f%%)",
-                i + 1,
-                n_pairs,
-                100.0 * (i + 1) / n_pairs,
-            )
+    # 4. Compute all pairs (process pool over pair blocks)
+    metrics = codependence_panel(series, pairs, workers=workers)
 
     # 5. Build DataFrame
-    df = pd.DataFrame(results)
+    df = pd.DataFrame(
+        {
+            "id_a": metrics["id_a"],
+            "id_b": metrics["id_b"],
+            "tf": tf,
+            "window_bars": window_bars,
+            "computed_at": computed_at,
+            "pearson_corr": metrics["pearson_corr"],
+            "distance_corr": metrics["distance_corr"],
+            "mutual_info": metrics["mutual_info"],
+            "variation_of_info": metrics["variation_of_info"],
+            "n_obs": metrics["n_obs"],
+        }
+    )
     n_rows = len(df)
 
     if n_rows == 0:
@@ -362,6 +309,7 @@ def main(argv: list[str] | None = None) -> int:
     Example usage:
         python -m ta_lab2.scripts.features.codependence_feature --ids 1,52,1027 --tf 1D
         python -m ta_lab2.scripts.features.codependence_feature --all --tf 1D --window 252
+        python -m ta_lab2.scripts.features.codependence_feature --all --tf 1D --workers 8
         python -m ta_lab2.scripts.features.codependence_feature --all --dry-run
     """
     parser = argparse.ArgumentParser(
@@ -398,6 +346,12 @@ def main(argv: list[str] | None = None) -> int:
         metavar="N",
         help="Number of bars for the rolling computation window.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes for pair blocks. Default: min(6, cpu_count()).",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -461,6 +415,7 @@ def main(argv: list[str] | None = None) -> int:
             tf=args.tf,
             window_bars=args.window,
             dry_run=args.dry_run,
+            workers=args.workers or min(6, os.cpu_count() or 1),
         )
     except Exception as exc:
         logger.error("Codependence refresh FAILED: %s", exc, exc_info=True)
@@ -41,18 +41,8 @@ from ta_lab2.features.indicators import (
     bollinger,
     atr,
     adx,
-    rsi_polars,
-    macd_polars,
-    stoch_kd_polars,
-    bollinger_polars,
-    atr_polars,
-    adx_polars,
-)
-from ta_lab2.features.polars_feature_ops import (
-    polars_sorted_groupby,
-    pandas_to_polars_df,
-    polars_to_pandas_df,
 )
+from ta_lab2.features.ta_plan import compute_ta_polars
 
 
 # =============================================================================
@@ -192,9 +182,10 @@ class TAFeature(BaseFeature):
            - Call corresponding indicators.py function
            - Add columns to result
 
-        When use_polars=True: only the 6 core indicators (rsi, macd, stoch, bb,
-        atr, adx) are computed via the polars path.  Phase 103 extended indicators
-        fall through to the same pandas helpers as before.
+        When use_polars=True: all indicators (core and Phase 103 extended) are
+        compiled into one Polars lazy plan over the whole frame, grouped with
+        over("id", "venue_id"); shared inputs such as close EMAs and the true
+        range are computed once. Values match the pandas path.
 
         Args:
             df_source: Source data with OHLCV (null handling already applied)
@@ -210,167 +201,10 @@ class TAFeature(BaseFeature):
 
         if self.config.use_polars:
             # ------------------------------------------------------------------
-            # Polars-accelerated path for core 6 indicators
+            # Polars path: every indicator for every (id, venue_id) group in
+            # one lazy query (see features/ta_plan.py)
             # ------------------------------------------------------------------
-            # Capture indicator_params before defining closure to avoid late-binding
-            _indicator_params = indicator_params
-
-            def _compute_ta_single_group(df_id: pd.DataFrame) -> pd.DataFrame:
-                """Compute TA indicators for one (id, venue_id) group via polars."""
-                # Convert to polars for core indicators
-                pl_df = pandas_to_polars_df(df_id)
-
-                for ind in _indicator_params:
-                    ind_type = ind["indicator_type"]
-                    ind_name = ind["indicator_name"]
-                    params = ind["params"]
-
-                    try:
-                        if ind_type == "rsi":
-                            period = params.get("period", 14)
-                            pl_df = rsi_polars(
-                                pl_df,
-                                period=period,
-                                price_col="close",
-                                out_col=f"rsi_{period}",
-                            )
-
-                        elif ind_type == "macd":
-                            fast = params.get("fast", 12)
-                            slow = params.get("slow", 26)
-                            signal = params.get("signal", 9)
-                            out_cols_m = (
-                                f"macd_{fast}_{slow}",
-                                f"macd_signal_{signal}",
-                                f"macd_hist_{fast}_{slow}_{signal}",
-                            )
-                            pl_df = macd_polars(
-                                pl_df,
-                                fast=fast,
-                                slow=slow,
-                                signal=signal,
-                                price_col="close",
-                                out_cols=out_cols_m,
-                            )
-
-                        elif ind_type == "stoch":
-                            k = params.get("k", 14)
-                            d = params.get("d", 3)
-                            out_cols_s = (f"stoch_k_{k}", f"stoch_d_{d}")
-                            pl_df = stoch_kd_polars(
-                                pl_df,
-                                k=k,
-                                d=d,
-                                out_cols=out_cols_s,
-                            )
-
-                        elif ind_type == "bb":
-                            window = params.get("window", 20)
-                            n_sigma = params.get("n_sigma", 2.0)
-                            sigma_str = (
-                                str(int(n_sigma))
-                                if n_sigma == int(n_sigma)
-                                else str(n_sigma)
-                            )
-                            out_cols_b = (
-                                f"bb_ma_{window}",
-                                f"bb_up_{window}_{sigma_str}",
-                                f"bb_lo_{window}_{sigma_str}",
-                                f"bb_width_{window}",
-                            )
-                            pl_df = bollinger_polars(
-                                pl_df,
-                                window=window,
-                                price_col="close",
-                                n_sigma=n_sigma,
-                                out_cols=out_cols_b,
-                            )
-
-                        elif ind_type == "atr":
-                            period = params.get("period", 14)
-                            pl_df = atr_polars(
-                                pl_df,
-                                period=period,
-                                out_col=f"atr_{period}",
-                            )
-
-                        elif ind_type == "adx":
-                            period = params.get("period", 14)
-                            pl_df = adx_polars(
-                                pl_df,
-                                period=period,
-                                out_col=f"adx_{period}",
-                            )
-
-                        else:
-                            # Phase 103 extended indicators: fall back to pandas
-                            # Convert back to pandas, apply, convert forward again
-                            df_tmp = polars_to_pandas_df(pl_df)
-                            id_val_inner = (
-                                df_tmp["id"].iloc[0] if "id" in df_tmp.columns else "?"
-                            )
-                            try:
-                                if ind_type == "ichimoku":
-                                    self._compute_ichimoku(df_tmp, params)
-                                elif ind_type == "willr":
-                                    self._compute_willr(df_tmp, params)
-                                elif ind_type == "keltner":
-                                    self._compute_keltner(df_tmp, params)
-                                elif ind_type == "cci":
-                                    self._compute_cci(df_tmp, params)
-                                elif ind_type == "elder_ray":
-                                    self._compute_elder_ray(df_tmp, params)
-                                elif ind_type == "force_index":
-                                    self._compute_force_index(df_tmp, params)
-                                elif ind_type == "vwap":
-                                    self._compute_vwap(df_tmp, params)
-                                elif ind_type == "cmf":
-                                    self._compute_cmf(df_tmp, params)
-                                elif ind_type == "chaikin_osc":
-                                    self._compute_chaikin_osc(df_tmp, params)
-                                elif ind_type == "hurst":
-                                    self._compute_hurst(df_tmp, params)
-                                elif ind_type == "vidya":
-                                    self._compute_vidya(df_tmp, params)
-                                elif ind_type == "frama":
-                                    self._compute_frama(df_tmp, params)
-                                elif ind_type == "aroon":
-                                    self._compute_aroon(df_tmp, params)
-                                elif ind_type == "trix":
-                                    self._compute_trix(df_tmp, params)
-                                elif ind_type == "ultimate_osc":
-                                    self._compute_ultimate_osc(df_tmp, params)
-                                elif ind_type == "vortex":
-                                    self._compute_vortex(df_tmp, params)
-                                elif ind_type == "emv":
-                                    self._compute_emv(df_tmp, params)
-                                elif ind_type == "mass_index":
-                                    self._compute_mass_index(df_tmp, params)
-                                elif ind_type == "kst":
-                                    self._compute_kst(df_tmp, params)
-                                elif ind_type == "coppock":
-                                    self._compute_coppock(df_tmp, params)
-                            except Exception as e_inner:
-                                print(
-                                    f"Warning: Failed to compute {ind_name} "
-                                    f"for id={id_val_inner}: {e_inner}"
-                                )
-                            # Re-sync pl_df from updated df_tmp
-                            pl_df = pandas_to_polars_df(df_tmp)
-
-                    except Exception as e:
-                        id_val_inner = "?"
-                        print(
-                            f"Warning: Failed to compute {ind_name} "
-                            f"for id={id_val_inner}: {e}"
-                        )
-                        continue
-
-                return polars_to_pandas_df(pl_df)
-
-            df_result = polars_sorted_groupby(
-                df_source, ["id", "venue_id"], "ts", _compute_ta_single_group
-            )
+            df_result = compute_ta_polars(df_source, indicator_params)
 
         else:
             # ------------------------------------------------------------------
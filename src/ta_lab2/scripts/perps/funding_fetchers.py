@@ -38,6 +38,15 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+# Default endpoints; the fetchers take ``base_url=`` to target a mirror or
+# a local mock server.
+BINANCE_FUNDING_URL = "https://fapi.binance.com/fapi/v1/fundingRate"
+HYPERLIQUID_INFO_URL = "https://api.hyperliquid.xyz/info"
+BYBIT_FUNDING_URL = "https://api.bybit.com/v5/market/funding/history"
+DYDX_FUNDING_URL = "https://indexer.dydx.trade/v4/historicalFunding"
+AEVO_FUNDING_URL = "https://api.aevo.xyz/funding-history"
+ASTER_FUNDING_URL = "https://fapi.asterdex.com/fapi/v1/fundingRate"
+
 
 # ---------------------------------------------------------------------------
 # Data model
@@ -80,6 +89,9 @@ def fetch_binance_funding(
     start_ms: Optional[int] = None,
     end_ms: Optional[int] = None,
     limit: int = 1000,
+    *,
+    base_url: str = BINANCE_FUNDING_URL,
+    raise_errors: bool = False,
 ) -> List[FundingRateRow]:
     """
     Fetch Binance perpetual funding rate history.
@@ -95,11 +107,13 @@ def fetch_binance_funding(
         start_ms: Start time in milliseconds UTC (None = earliest available)
         end_ms: End time in milliseconds UTC (None = now)
         limit: Max rows per request (max 1000)
+        base_url: Endpoint URL (default the public venue API)
+        raise_errors: Re-raise request errors instead of returning []
 
     Returns:
         List of FundingRateRow with venue='binance', tf='8h'
     """
-    url = "https://fapi.binance.com/fapi/v1/fundingRate"
+    url = base_url
     params: dict = {"symbol": symbol, "limit": limit}
     if start_ms is not None:
         params["startTime"] = start_ms
@@ -110,6 +124,8 @@ def fetch_binance_funding(
         resp = requests.get(url, params=params, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
+        if raise_errors:
+            raise
         logger.warning("fetch_binance_funding error for %s: %s", symbol, exc)
         return []
 
@@ -150,6 +166,9 @@ def fetch_hyperliquid_funding(
     coin: str = "BTC",
     start_ms: int = 0,
     end_ms: Optional[int] = None,
+    *,
+    base_url: str = HYPERLIQUID_INFO_URL,
+    raise_errors: bool = False,
 ) -> List[FundingRateRow]:
     """
     Fetch Hyperliquid perpetual funding rate history.
@@ -164,11 +183,13 @@ def fetch_hyperliquid_funding(
         coin: Base asset symbol (e.g. 'BTC', 'ETH')
         start_ms: Start time in milliseconds UTC
         end_ms: End time in milliseconds UTC (optional)
+        base_url: Endpoint URL (default the public venue API)
+        raise_errors: Re-raise request errors instead of returning []
 
     Returns:
         List of FundingRateRow with venue='hyperliquid', tf='1h'
     """
-    url = "https://api.hyperliquid.xyz/info"
+    url = base_url
     payload: dict = {"type": "fundingHistory", "coin": coin, "startTime": start_ms}
     if end_ms is not None:
         payload["endTime"] = end_ms
@@ -177,6 +198,8 @@ def fetch_hyperliquid_funding(
         resp = requests.post(url, json=payload, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
+        if raise_errors:
+            raise
         logger.warning("fetch_hyperliquid_funding error for %s: %s", coin, exc)
         return []
 
@@ -211,6 +234,9 @@ def fetch_bybit_funding(
     symbol: str = "BTCUSDT",
     start_ms: Optional[int] = None,
     end_ms: Optional[int] = None,
+    *,
+    base_url: str = BYBIT_FUNDING_URL,
+    raise_errors: bool = False,
 ) -> List[FundingRateRow]:
     """
     Fetch Bybit perpetual funding rate history.
@@ -228,11 +254,13 @@ def fetch_bybit_funding(
         symbol: Trading pair symbol (e.g. 'BTCUSDT')
         start_ms: Start time in milliseconds UTC (only used when end_ms also provided)
         end_ms: End time in milliseconds UTC
+        base_url: Endpoint URL (default the public venue API)
+        raise_errors: Re-raise request errors instead of returning []
 
     Returns:
         List of FundingRateRow with venue='bybit', tf='8h'
     """
-    url = "https://api.bybit.com/v5/market/funding/history"
+    url = base_url
     params: dict = {"category": "linear", "symbol": symbol, "limit": 200}
 
     # CRITICAL: Must not pass startTime alone -- Bybit returns error
@@ -247,6 +275,8 @@ def fetch_bybit_funding(
         resp = requests.get(url, params=params, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
+        if raise_errors:
+            raise
         logger.warning("fetch_bybit_funding error for %s: %s", symbol, exc)
         return []
 
@@ -281,6 +311,9 @@ def fetch_dydx_funding(
     market: str = "BTC-USD",
     before_or_at: Optional[str] = None,
     limit: int = 100,
+    *,
+    base_url: str = DYDX_FUNDING_URL,
+    raise_errors: bool = False,
 ) -> List[FundingRateRow]:
     """
     Fetch dYdX v4 perpetual funding rate history.
@@ -297,11 +330,13 @@ def fetch_dydx_funding(
         market: Market identifier (e.g. 'BTC-USD', 'ETH-USD')
         before_or_at: ISO datetime string cursor for pagination (e.g. '2024-01-01T00:00:00Z')
         limit: Max rows per request (max 100)
+        base_url: Endpoint URL (default the public venue API)
+        raise_errors: Re-raise request errors instead of returning []
 
     Returns:
         List of FundingRateRow with venue='dydx', tf='1h'
     """
-    url = f"https://indexer.dydx.trade/v4/historicalFunding/{market}"
+    url = f"{base_url}/{market}"
     params: dict = {"limit": limit}
     if before_or_at is not None:
         params["effectiveBeforeOrAt"] = before_or_at
@@ -310,6 +345,8 @@ def fetch_dydx_funding(
         resp = requests.get(url, params=params, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
+        if raise_errors:
+            raise
         logger.warning("fetch_dydx_funding error for %s: %s", market, exc)
         return []
 
@@ -345,6 +382,9 @@ def fetch_aevo_funding(
     start_ns: int = 0,
     end_ns: Optional[int] = None,
     limit: int = 50,
+    *,
+    base_url: str = AEVO_FUNDING_URL,
+    raise_errors: bool = False,
 ) -> List[FundingRateRow]:
     """
     Fetch Aevo perpetual funding rate history.
@@ -365,11 +405,13 @@ def fetch_aevo_funding(
         start_ns: Start time in nanoseconds UTC
         end_ns: End time in nanoseconds UTC (optional)
         limit: Max rows per request (max 50)
+        base_url: Endpoint URL (default the public venue API)
+        raise_errors: Re-raise request errors instead of returning []
 
     Returns:
         List of FundingRateRow with venue='aevo', tf='1h'
     """
-    url = "https://api.aevo.xyz/funding-history"
+    url = base_url
     params: dict = {
         "instrument_name": instrument,
         "start_time": start_ns,
@@ -382,6 +424,8 @@ def fetch_aevo_funding(
         resp = requests.get(url, params=params, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
+        if raise_errors:
+            raise
         logger.warning("fetch_aevo_funding error for %s: %s", instrument, exc)
         return []
 
@@ -419,6 +463,9 @@ def fetch_aster_funding(
     start_ms: Optional[int] = None,
     end_ms: Optional[int] = None,
     limit: int = 1000,
+    *,
+    base_url: str = ASTER_FUNDING_URL,
+    raise_errors: bool = False,
 ) -> List[FundingRateRow]:
     """
     Fetch Aster perpetual funding rate history.
@@ -434,11 +481,13 @@ def fetch_aster_funding(
         start_ms: Start time in milliseconds UTC
         end_ms: End time in milliseconds UTC
         limit: Max rows per request (max 1000)
+        base_url: Endpoint URL (default the public venue API)
+        raise_errors: Re-raise request errors instead of returning []
 
     Returns:
         List of FundingRateRow with venue='aster', tf='8h'
     """
-    url = "https://fapi.asterdex.com/fapi/v1/fundingRate"
+    url = base_url
     params: dict = {"symbol": symbol, "limit": limit}
     if start_ms is not None:
         params["startTime"] = start_ms
@@ -449,6 +498,8 @@ def fetch_aster_funding(
         resp = requests.get(url, params=params, timeout=30)
         resp.raise_for_status()
     except requests.RequestException as exc:
+        if raise_errors:
+            raise
         logger.warning("fetch_aster_funding error for %s: %s", symbol, exc)
         return []
 
@@ -38,6 +38,10 @@ Design decisions:
       from exchange APIs (not CMC) and should run independently to avoid blocking
       the main CMC pipeline on exchange API failures.
     - NullPool: Matches project pattern for one-shot script DB connections.
+    - Concurrent backfill (default): every venue/symbol history is cut into
+      page-sized windows and fetched by connectivity.backfill -- per-venue
+      token buckets and workers, bulk upserts, resumable watermarks in
+      public.backfill_watermarks. --serial runs the original per-venue loops.
     - Watermark: SELECT MAX(ts) per (venue, symbol, tf) -- None triggers full backfill.
     - Daily rollup: Resamples sub-day rates to UTC day; upserted as tf='1d'.
     - Cross-venue fallback: Returns cross-venue average within +/- 30 min window.
@@ -46,6 +50,7 @@ Design decisions:
 from __future__ import annotations
 
 import argparse
+import functools
 import logging
 import time
 from datetime import datetime, timezone
@@ -55,6 +60,11 @@ import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.pool import NullPool
 
+from ta_lab2.connectivity.backfill import (
+    BackfillJob,
+    DbWatermarks,
+    run_backfill,
+)
 from ta_lab2.scripts.perps.funding_fetchers import (
     FundingRateRow,
     fetch_aevo_funding,
@@ -98,6 +108,23 @@ _DYDX_EPOCH_ISO = "2023-10-28T00:00:00Z"
 _AEVO_EPOCH_NS = 1_693_526_400 * 1_000_000_000  # 2023-09-01 00:00:00 UTC
 # Aster approximate launch (2023)
 _ASTER_EPOCH_MS = 1_672_531_200_000  # 2023-01-01 00:00:00 UTC
+# Bybit USDT linear perpetuals (Mar 2020)
+_BYBIT_EPOCH_MS = 1_583_020_800_000  # 2020-03-01 00:00:00 UTC
+# dYdX v4 mainnet launch, as _DYDX_EPOCH_ISO
+_DYDX_EPOCH_MS = 1_698_451_200_000  # 2023-10-28 00:00:00 UTC
+
+# Concurrent backfill: (page_limit, step_ms, newest_first, epoch_ms) per venue.
+# newest_first venues return the latest rows of a [start, end] window first.
+_BACKFILL_SPECS: dict[str, tuple[int, int, bool, int]] = {
+    "binance": (1000, _MS_PER_8H, False, _BINANCE_BTC_EPOCH_MS),
+    "hyperliquid": (500, _MS_PER_1H, False, _HYPERLIQUID_EPOCH_MS),
+    "bybit": (200, _MS_PER_8H, True, _BYBIT_EPOCH_MS),
+    "dydx": (_DYDX_LIMIT, _MS_PER_1H, True, _DYDX_EPOCH_MS),
+    "aevo": (_AEVO_LIMIT, _MS_PER_1H, False, _AEVO_EPOCH_NS // 1_000_000),
+    "aster": (1000, _MS_PER_8H, False, _ASTER_EPOCH_MS),
+}
+# Settlements newer than this are left for the next run (publication lag).
+_BACKFILL_LAG_MS = 5 * 60 * 1000
 
 # Supported venues for --all
 ALL_VENUES = ["binance", "hyperliquid", "bybit", "dydx", "aevo", "aster", "lighter"]
@@ -810,6 +837,163 @@ def ingest_venue_full(
     return total
 
 
+# ---------------------------------------------------------------------------
+# Concurrent backfill
+# ---------------------------------------------------------------------------
+
+
+def _funding_fetch(venue: str, exchange_symbol: str, base_url: Optional[str] = None):
+    """Single-request fetch(lo_ms, hi_ms) for a venue, raising on HTTP errors."""
+    kw: dict = {"raise_errors": True}
+    if base_url:
+        kw["base_url"] = base_url
+
+    if venue == "binance":
+        return lambda lo, hi: fetch_binance_funding(exchange_symbol, lo, hi, 1000, **kw)
+    if venue == "aster":
+        return lambda lo, hi: fetch_aster_funding(exchange_symbol, lo, hi, 1000, **kw)
+    if venue == "hyperliquid":
+        return lambda lo, hi: fetch_hyperliquid_funding(exchange_symbol, lo, hi, **kw)
+    if venue == "bybit":
+        # CRITICAL: always both startTime and endTime
+        return lambda lo, hi: fetch_bybit_funding(exchange_symbol, lo, hi, **kw)
+    if venue == "dydx":
+        # cursor only: newest <= hi; rows before lo are dropped by the engine
+        return lambda lo, hi: fetch_dydx_funding(
+            exchange_symbol,
+            before_or_at=datetime.fromtimestamp(hi / 1000, tz=timezone.utc)
+            .isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            limit=_DYDX_LIMIT,
+            **kw,
+        )
+    if venue == "aevo":
+        return lambda lo, hi: fetch_aevo_funding(
+            exchange_symbol, lo * 1_000_000, hi * 1_000_000, _AEVO_LIMIT, **kw
+        )
+    raise ValueError(f"No windowed funding fetcher for venue '{venue}'")
+
+
+def _row_ts_ms(row: FundingRateRow) -> int:
+    return round(row.ts.timestamp() * 1000)
+
+
+def build_funding_jobs(
+    venues: List[str],
+    symbols: List[str],
+    write,
+    watermarks,
+    *,
+    engine=None,
+    base_urls: Optional[dict[str, str]] = None,
+    end_ms: Optional[int] = None,
+) -> List[BackfillJob]:
+    """
+    Build one BackfillJob per (venue, symbol).
+
+    Jobs without a backfill watermark yet start after the latest stored
+    funding_rates row (when ``engine`` is given) or at the venue epoch.
+
+    Args:
+        venues: Venue names (lighter and unknown venues are skipped)
+        symbols: Base asset symbols ('BTC', 'ETH')
+        write: Bulk upsert shared by all jobs, write(rows) -> n_inserted
+        watermarks: Backfill watermark store (DbWatermarks / MemoryWatermarks)
+        engine: SQLAlchemy engine for the funding_rates MAX(ts) fallback
+        base_urls: Optional venue -> endpoint override (mirrors, mock servers)
+        end_ms: Last settlement to fetch (default: now minus publication lag);
+            the watermark stops at the newest settlement actually fetched
+
+    Returns:
+        List of BackfillJob
+    """
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    end_ms = end_ms if end_ms is not None else now_ms - _BACKFILL_LAG_MS
+    jobs: List[BackfillJob] = []
+
+    for venue in venues:
+        if venue not in _BACKFILL_SPECS:
+            logger.info("venue=%s: no windowed history endpoint -- skipped", venue)
+            continue
+        page_limit, step_ms, newest_first, epoch_ms = _BACKFILL_SPECS[venue]
+        tf = VENUE_TF[venue]
+
+        for symbol_base in symbols:
+            exchange_symbol = VENUE_SYMBOLS.get(venue, {}).get(symbol_base, symbol_base)
+            start_ms = epoch_ms
+            if (
+                engine is not None
+                and watermarks.get((venue, "funding", symbol_base, tf)) is None
+            ):
+                wm = get_watermark(engine, venue, symbol_base, tf)
+                if wm is not None:
+                    start_ms = int(wm.timestamp() * 1000) + 1
+
+            jobs.append(
+                BackfillJob(
+                    venue=venue,
+                    dataset="funding",
+                    symbol=symbol_base,
+                    tf=tf,
+                    step_ms=step_ms,
+                    start_ms=start_ms,
+                    end_ms=end_ms,
+                    page_limit=page_limit,
+                    fetch=_funding_fetch(
+                        venue, exchange_symbol, (base_urls or {}).get(venue)
+                    ),
+                    ts_ms=_row_ts_ms,
+                    write=write,
+                    newest_first=newest_first,
+                )
+            )
+
+    return jobs
+
+
+def backfill_funding_rates(
+    engine,
+    venues: List[str],
+    symbols: List[str],
+    *,
+    workers_per_venue: int = 4,
+    base_urls: Optional[dict[str, str]] = None,
+) -> int:
+    """
+    Fetch all venues and symbols concurrently and upsert into funding_rates.
+
+    Args:
+        engine: SQLAlchemy engine
+        venues: Venue names
+        symbols: Base asset symbols
+        workers_per_venue: Concurrent requests per venue
+        base_urls: Optional venue -> endpoint override
+
+    Returns:
+        Total rows inserted
+    """
+    watermarks = DbWatermarks(engine)
+    # one callable for every job: writes through the shared staging table are
+    # serialised by the engine
+    write = functools.partial(upsert_funding_rates, engine)
+    jobs = build_funding_jobs(
+        venues, symbols, write, watermarks, engine=engine, base_urls=base_urls
+    )
+    results = run_backfill(jobs, watermarks, workers_per_venue=workers_per_venue)
+
+    for r in results:
+        logger.info(
+            "venue=%s symbol=%s requests=%d fetched=%d inserted=%d%s",
+            r.venue,
+            r.symbol,
+            r.requests,
+            r.rows_fetched,
+            r.rows_written,
+            f" failed_windows={r.failed_windows} ({r.error})" if r.error else "",
+        )
+    return sum(r.rows_written for r in results)
+
+
 # ---------------------------------------------------------------------------
 # CLI entry point
 # ---------------------------------------------------------------------------
@@ -851,6 +1035,17 @@ def main() -> None:
             "Safe to run without a DB connection."
         ),
     )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Use the sequential per-venue loops instead of the concurrent backfill.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent requests per venue for the concurrent backfill (default: 4).",
+    )
     parser.add_argument(
         "--rollup",
         action="store_true",
@@ -919,12 +1114,17 @@ def main() -> None:
     )
 
     grand_total = 0
-    for venue in venues:
-        try:
-            n = ingest_venue_full(engine, venue, symbols, dry_run=args.dry_run)
-            grand_total += n
-        except Exception as exc:
-            logger.warning("venue=%s ingest failed: %s -- continuing", venue, exc)
+    if not args.dry_run and not args.serial:
+        grand_total = backfill_funding_rates(
+            engine, venues, symbols, workers_per_venue=args.workers
+        )
+    else:
+        for venue in venues:
+            try:
+                n = ingest_venue_full(engine, venue, symbols, dry_run=args.dry_run)
+                grand_total += n
+            except Exception as exc:
+                logger.warning("venue=%s ingest failed: %s -- continuing", venue, exc)
 
     logger.info("Ingest complete. Total inserted: %d", grand_total)
 
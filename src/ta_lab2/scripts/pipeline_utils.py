@@ -121,6 +121,8 @@ class ComponentResult:
     duration_sec: float
     returncode: int
     error_message: str | None = None
+    # Not run because an upstream gate held it back (success is False)
+    blocked: bool = False
 
 
 # ---------------------------------------------------------------------------
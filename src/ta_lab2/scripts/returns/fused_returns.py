@@ -0,0 +1,740 @@
+from __future__ import annotations
+
+r"""
+fused_returns.py
+
+Fused returns stage: EMA / bar returns computed from the frame a refresher
+has just written, instead of re-reading the 55M-row source tables.
+
+The standalone scripts (refresh_returns_ema_multi_tf*.py and
+refresh_returns_bars_multi_tf*.py) run after the EMA refreshers and bar
+builders, scan ema_multi_tf_u / price_bars_multi_tf_u back from each id's
+global watermark and derive every column with LAG() OVER (PARTITION BY ...).
+With --fused-returns the refreshers hand the frame they wrote to
+write_fused_ema_returns() / write_fused_bar_returns() instead:
+
+  - The dual-LAG semantics of the SQL are evaluated with NumPy over the
+    sorted frame: unified LAG over the whole key timeline for the _roll
+    columns, LAG within the roll=FALSE partition for the canonical columns,
+    the first row of each timeline dropped, then delta2 / delta_ret_* as a
+    second LAG over the surviving first-pass values.
+  - The only read is a seed of at most two unified and two canonical source
+    rows per key just before the frame starts (one LATERAL query per call).
+  - Rows newer than each key's watermark in the standalone script's state
+    table are binary-COPY upserted into returns_*_multi_tf_u, and the
+    watermark is advanced (GREATEST, as in the scripts) in the same
+    transaction.
+
+Watermark consistency: a key is fused only when its returns watermark
+already covers every source row before the frame (or the frame starts at
+the beginning of the key's history).  Keys whose watermark lags behind are
+left untouched -- neither written nor advanced -- and the standalone script
+fills the gap on its next run exactly as before.  The standalone scripts
+stay the source of truth for --full-refresh and for backfills.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ta_lab2.db.binary_copy import copy_upsert
+from ta_lab2.scripts.returns import refresh_returns_bars_multi_tf as _bars_script
+from ta_lab2.scripts.returns import refresh_returns_ema_multi_tf as _ema_script
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMA_SOURCE = "public.ema_multi_tf_u"
+DEFAULT_BARS_SOURCE = "public.price_bars_multi_tf_u"
+
+# alignment_source -> (returns table, state table of the standalone script)
+EMA_RETURNS_TABLES: Dict[str, Tuple[str, str]] = {
+    "multi_tf": (
+        "public.returns_ema_multi_tf_u",
+        "public.returns_ema_multi_tf_state",
+    ),
+    "multi_tf_cal_us": (
+        "public.returns_ema_multi_tf_u",
+        "public.returns_ema_multi_tf_cal_us_state",
+    ),
+    "multi_tf_cal_iso": (
+        "public.returns_ema_multi_tf_u",
+        "public.returns_ema_multi_tf_cal_iso_state",
+    ),
+    "multi_tf_cal_anchor_us": (
+        "public.returns_ema_multi_tf_u",
+        "public.returns_ema_multi_tf_cal_anchor_us_state",
+    ),
+    "multi_tf_cal_anchor_iso": (
+        "public.returns_ema_multi_tf_u",
+        "public.returns_ema_multi_tf_cal_anchor_iso_state",
+    ),
+}
+
+BAR_RETURNS_TABLES: Dict[str, Tuple[str, str]] = {
+    "multi_tf": (
+        "public.returns_bars_multi_tf_u",
+        "public.returns_bars_multi_tf_state",
+    ),
+    "multi_tf_cal_us": (
+        "public.returns_bars_multi_tf_u",
+        "public.returns_bars_multi_tf_cal_us_state",
+    ),
+    "multi_tf_cal_iso": (
+        "public.returns_bars_multi_tf_u",
+        "public.returns_bars_multi_tf_cal_iso_state",
+    ),
+    "multi_tf_cal_anchor_us": (
+        "public.returns_bars_multi_tf_u",
+        "public.returns_bars_multi_tf_cal_anchor_us_state",
+    ),
+    "multi_tf_cal_anchor_iso": (
+        "public.returns_bars_multi_tf_u",
+        "public.returns_bars_multi_tf_cal_anchor_iso_state",
+    ),
+}
+
+EMA_KEYS: Tuple[str, ...] = ("id", "venue_id", "tf", "period")
+BAR_KEYS: Tuple[str, ...] = ("id", "venue_id", "tf")
+
+EMA_VALUE_COLS = list(_ema_script._VALUE_COLS)
+BAR_VALUE_COLS = list(_bars_script._VALUE_COLS)
+
+# Seed lookback per key: two canonical rows are at most ~2 bars back, so three
+# bars plus a week of slack bounds the LATERAL scan without losing context.
+SEED_BARS = 3
+SEED_SLACK_DAYS = 7
+
+_ENSURED: set[Tuple[str, str]] = set()
+
+
+# ---------------------------------------------------------------------------
+# Window kernels (sorted frame + per-row group codes)
+# ---------------------------------------------------------------------------
+
+
+def _group_codes(df: pd.DataFrame, keys: Tuple[str, ...]) -> np.ndarray:
+    return df.groupby(list(keys), sort=False).ngroup().to_numpy()
+
+
+def _lag(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """LAG(values) OVER (PARTITION BY codes) on rows already sorted by ts."""
+    out = np.full(len(values), np.nan)
+    if len(values) > 1:
+        out[1:] = values[:-1]
+        out[1:][codes[1:] != codes[:-1]] = np.nan
+    return out
+
+
+def _lag_canonical(
+    values: np.ndarray, codes: np.ndarray, canonical: np.ndarray
+) -> np.ndarray:
+    """LAG within the roll=FALSE partition; NaN on roll rows."""
+    out = np.full(len(values), np.nan)
+    idx = np.flatnonzero(canonical)
+    out[idx] = _lag(values[idx], codes[idx])
+    return out
+
+
+def _first_pass(
+    x: np.ndarray, prev: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """delta1, ret_arith, ret_log with the SQL NULL / zero / sign guards."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta1 = x - prev
+        ret_arith = np.where(prev != 0, x / prev - 1.0, np.nan)
+        ret_log = np.where((prev > 0) & (x > 0), np.log(x / prev), np.nan)
+    return delta1, ret_arith, ret_log
+
+
+def _day_numbers(ts: pd.Series) -> np.ndarray:
+    days = ts.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy("datetime64[D]")
+    return days.astype(np.int64).astype(float)
+
+
+def _nullable_int(values: np.ndarray) -> pd.Series:
+    return pd.Series(values).astype("Int64")
+
+
+def _second_pass(
+    out: Dict[str, np.ndarray],
+    pairs: list[Tuple[str, str]],
+    codes: np.ndarray,
+    canonical: np.ndarray,
+) -> None:
+    """Add delta2 / delta_ret_* columns: value - LAG(value) over kept rows."""
+    for src, dst in pairs:
+        v = out[src]
+        if dst.endswith("_roll"):
+            out[dst] = v - _lag(v, codes)
+        else:
+            out[dst] = v - _lag_canonical(v, codes, canonical)
+
+
+def _base_cols(base: list[str], keys: Tuple[str, ...]) -> list[str]:
+    return base + [k for k in keys if k not in base]
+
+
+def ema_returns_frame(
+    df: pd.DataFrame, keys: Tuple[str, ...] = EMA_KEYS
+) -> pd.DataFrame:
+    """
+    Returns columns for EMA rows, matching refresh_returns_ema_multi_tf.py.
+
+    Args:
+        df: EMA rows (id, venue_id, tf, period, ts, tf_days, roll, ema,
+            ema_bar) covering one or more keys.  ts must be tz-aware.
+        keys: Timeline key (LAG partition); add alignment_source to compute
+            several alignments in one pass.
+
+    Returns:
+        One row per input row that has a predecessor on its key timeline,
+        with id, venue_id, ts, tf, tf_days, period, roll, any extra key
+        columns and EMA_VALUE_COLS.
+    """
+    df = df.sort_values([*keys, "ts"], kind="mergesort").reset_index(drop=True)
+    codes = _group_codes(df, keys)
+    canonical = ~df["roll"].to_numpy(dtype=bool)
+
+    keep = np.zeros(len(df), dtype=bool)
+    keep[1:] = codes[1:] == codes[:-1]
+
+    out: Dict[str, np.ndarray] = {}
+    day = _day_numbers(df["ts"])
+    out["gap_days"] = day - _lag_canonical(day, codes, canonical)
+    out["gap_days_roll"] = day - _lag(day, codes)
+
+    pairs = []
+    for src in ("ema", "ema_bar"):
+        x = df[src].to_numpy(dtype=float)
+        for suffix, prev in (
+            (f"_{src}_roll", _lag(x, codes)),
+            (f"_{src}", _lag_canonical(x, codes, canonical)),
+        ):
+            d1, ra, rl = _first_pass(x, prev)
+            out[f"delta1{suffix}"] = d1
+            out[f"ret_arith{suffix}"] = ra
+            out[f"ret_log{suffix}"] = rl
+            pairs += [
+                (f"delta1{suffix}", f"delta2{suffix}"),
+                (f"ret_arith{suffix}", f"delta_ret_arith{suffix}"),
+                (f"ret_log{suffix}", f"delta_ret_log{suffix}"),
+            ]
+
+    out = {k: v[keep] for k, v in out.items()}
+    _second_pass(out, pairs, codes[keep], canonical[keep])
+
+    base = ["id", "venue_id", "ts", "tf", "tf_days", "period", "roll"]
+    res = df.loc[keep, _base_cols(base, keys)].reset_index(drop=True)
+    for col in EMA_VALUE_COLS:
+        if col in ("gap_days", "gap_days_roll"):
+            res[col] = _nullable_int(out[col])
+        else:
+            res[col] = out[col]
+    return res
+
+
+def bar_returns_frame(
+    df: pd.DataFrame, keys: Tuple[str, ...] = BAR_KEYS
+) -> pd.DataFrame:
+    """
+    Returns columns for bar snapshots, matching refresh_returns_bars_multi_tf.py.
+
+    Args:
+        df: Bar rows (id, venue_id, tf, timestamp, roll or is_partial_end,
+            close, high, low, bar_seq plus the passthrough columns tf_days,
+            pos_in_bar, count_days, count_days_remaining, time_close,
+            time_close_bar, time_open_bar) for one or more keys.
+        keys: Timeline key (LAG partition); add alignment_source to compute
+            several alignments in one pass.
+
+    Returns:
+        One row per input row whose previous close on the key timeline is
+        not NULL, with id, venue_id, timestamp, tf, roll, any extra key
+        columns and BAR_VALUE_COLS.
+    """
+    if "roll" not in df.columns:
+        df = df.rename(columns={"is_partial_end": "roll"})
+    df = df.sort_values([*keys, "timestamp"], kind="mergesort").reset_index(drop=True)
+    codes = _group_codes(df, keys)
+    canonical = ~df["roll"].to_numpy(dtype=bool)
+
+    close = df["close"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    bar_seq = df["bar_seq"].to_numpy(dtype=float, na_value=np.nan)
+
+    prev_close_u = _lag(close, codes)
+    keep = ~np.isnan(prev_close_u)
+
+    out: Dict[str, np.ndarray] = {}
+    out["gap_bars"] = bar_seq - _lag_canonical(bar_seq, codes, canonical)
+
+    pairs = []
+    hl = high - low
+    for suffix, prev in (
+        ("_roll", prev_close_u),
+        ("", _lag_canonical(close, codes, canonical)),
+    ):
+        d1, ra, rl = _first_pass(close, prev)
+        has_prev = ~np.isnan(prev)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tr = np.fmax(np.fmax(hl, np.abs(high - prev)), np.abs(low - prev))
+            out[f"delta1{suffix}"] = d1
+            out[f"ret_arith{suffix}"] = ra
+            out[f"ret_log{suffix}"] = rl
+            out[f"range{suffix}"] = np.where(has_prev, hl, np.nan)
+            out[f"range_pct{suffix}"] = np.where(
+                has_prev & (close != 0), hl / close, np.nan
+            )
+            out[f"true_range{suffix}"] = np.where(has_prev, tr, np.nan)
+            out[f"true_range_pct{suffix}"] = np.where(
+                has_prev & (close != 0), tr / close, np.nan
+            )
+        pairs += [
+            (f"delta1{suffix}", f"delta2{suffix}"),
+            (f"ret_arith{suffix}", f"delta_ret_arith{suffix}"),
+            (f"ret_log{suffix}", f"delta_ret_log{suffix}"),
+        ]
+
+    out = {k: v[keep] for k, v in out.items()}
+    _second_pass(out, pairs, codes[keep], canonical[keep])
+
+    base = ["id", "venue_id", "timestamp", "tf", "roll"]
+    res = df.loc[keep, _base_cols(base, keys)].reset_index(drop=True)
+    for col in BAR_VALUE_COLS:
+        if col == "gap_bars":
+            res[col] = _nullable_int(out[col])
+        elif col in out:
+            res[col] = out[col]
+        else:
+            res[col] = df.loc[keep, col].reset_index(drop=True)
+    return res
+
+
+# ---------------------------------------------------------------------------
+# Frame preparation
+# ---------------------------------------------------------------------------
+
+
+def _prepare_ema(df: pd.DataFrame) -> pd.DataFrame:
+    out = df[["id", "venue_id", "tf", "period", "ts", "tf_days", "roll"]].copy()
+    out["ts"] = pd.to_datetime(out["ts"], utc=True)
+    out["roll"] = out["roll"].astype(bool)
+    for col in ("ema", "ema_bar"):
+        out[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
+    if "alignment_source" in df.columns:
+        out["alignment_source"] = df["alignment_source"]
+    return out
+
+
+_BAR_PASSTHROUGH_TS = ("time_close", "time_close_bar", "time_open_bar")
+
+
+def _prepare_bars(df: pd.DataFrame) -> pd.DataFrame:
+    cols = [
+        "id",
+        "venue_id",
+        "tf",
+        "timestamp",
+        "tf_days",
+        "bar_seq",
+        "pos_in_bar",
+        "count_days",
+        "count_days_remaining",
+        *_BAR_PASSTHROUGH_TS,
+    ]
+    out = df.reindex(columns=cols).copy()
+    out["roll"] = df["is_partial_end"].astype(bool)
+    for col in ("timestamp", *_BAR_PASSTHROUGH_TS):
+        out[col] = pd.to_datetime(out[col], utc=True)
+    for col in ("close", "high", "low"):
+        out[col] = pd.to_numeric(df[col], errors="coerce").astype(float)
+    if "alignment_source" in df.columns:
+        out["alignment_source"] = df["alignment_source"]
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Shared write path
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ReturnsSpec:
+    """Column layout and SQL fragments of one returns family (EMA or bars)."""
+
+    keys: Tuple[str, ...]
+    key_types: Tuple[str, ...]
+    ts_col: str
+    ts_sql: str
+    roll_sql: str
+    seed_select: str
+    state_ts_col: str
+    conflict_cols: Tuple[str, ...]
+    prepare: Callable[[pd.DataFrame], pd.DataFrame]
+    compute: Callable[..., pd.DataFrame]
+    ensure: Callable[[Engine, str, str], None]
+
+
+EMA_SPEC = ReturnsSpec(
+    keys=EMA_KEYS,
+    key_types=("bigint", "smallint", "text", "integer"),
+    ts_col="ts",
+    ts_sql="ts",
+    roll_sql="roll",
+    seed_select="s.ts, s.tf_days, s.roll, s.ema, s.ema_bar",
+    state_ts_col="last_ts",
+    conflict_cols=("id", "venue_id", "ts", "tf", "period", "alignment_source"),
+    prepare=_prepare_ema,
+    compute=ema_returns_frame,
+    ensure=_ema_script._ensure_tables,
+)
+
+BAR_SPEC = ReturnsSpec(
+    keys=BAR_KEYS,
+    key_types=("integer", "smallint", "text"),
+    ts_col="timestamp",
+    ts_sql='"timestamp"',
+    roll_sql="is_partial_end",
+    seed_select=(
+        's."timestamp", s.tf_days, s.bar_seq, s.pos_in_bar, s.count_days,'
+        " s.count_days_remaining, s.time_close, s.time_close_bar,"
+        " s.time_open_bar, s.is_partial_end AS roll, s.close, s.high, s.low"
+    ),
+    state_ts_col="last_timestamp",
+    conflict_cols=("id", "timestamp", "tf", "venue_id", "alignment_source"),
+    prepare=_prepare_bars,
+    compute=bar_returns_frame,
+    ensure=_bars_script._ensure_tables,
+)
+
+
+def _key_arrays(spec: ReturnsSpec, keys_df: pd.DataFrame) -> dict:
+    params = {c: keys_df[c].tolist() for c in spec.keys}
+    for c in ("first_ts", "lo_ts"):
+        params[c] = [
+            None if pd.isna(v) else v.to_pydatetime() for v in keys_df[c].tolist()
+        ]
+    return params
+
+
+def _load_watermarks(
+    engine: Engine, spec: ReturnsSpec, state_table: str, ids: list[int]
+) -> pd.DataFrame:
+    sql = text(
+        f"SELECT {', '.join(spec.keys)}, {spec.state_ts_col} AS wm"
+        f" FROM {state_table} WHERE id = ANY(:ids)"
+    )
+    with engine.connect() as cxn:
+        wm = pd.read_sql(sql, cxn, params={"ids": ids})
+    wm["wm"] = pd.to_datetime(wm["wm"], utc=True)
+    return wm
+
+
+def _load_seed(
+    engine: Engine,
+    spec: ReturnsSpec,
+    source_table: str,
+    alignment_source: str,
+    keys_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """Last two unified and two canonical source rows before each key's frame."""
+    arrays = ", ".join(
+        f"CAST(:{c} AS {t}[])" for c, t in zip(spec.keys, spec.key_types)
+    )
+    key_cols = ", ".join(spec.keys)
+    match = " AND ".join(f"s.{c} = k.{c}" for c in spec.keys)
+
+    def branch(extra: str) -> str:
+        return f"""
+        SELECT {", ".join(f"k.{c}" for c in spec.keys)}, x.*
+        FROM k
+        CROSS JOIN LATERAL (
+            SELECT {spec.seed_select}
+            FROM {source_table} s
+            WHERE {match}
+              AND s.alignment_source = :alignment_source
+              AND s.{spec.ts_sql} < k.first_ts
+              AND (k.lo_ts IS NULL OR s.{spec.ts_sql} >= k.lo_ts)
+              {extra}
+            ORDER BY s.{spec.ts_sql} DESC
+            LIMIT 2
+        ) x"""
+
+    sql = text(
+        f"""
+        WITH k AS (
+            SELECT * FROM unnest(
+                {arrays},
+                CAST(:first_ts AS timestamptz[]),
+                CAST(:lo_ts AS timestamptz[])
+            ) AS k({key_cols}, first_ts, lo_ts)
+        )
+        {branch("")}
+        UNION
+        {branch(f"AND s.{spec.roll_sql} = FALSE")}
+        """
+    )
+    params = _key_arrays(spec, keys_df)
+    params["alignment_source"] = alignment_source
+    with engine.connect() as cxn:
+        seed = pd.read_sql(sql, cxn, params=params)
+    if seed.empty:
+        return seed
+    return spec.prepare(seed.rename(columns={"roll": spec.roll_sql}))
+
+
+def upsert_returns_state(
+    cxn, spec: ReturnsSpec, state_table: str, out: pd.DataFrame
+) -> None:
+    """
+    Advance the watermarks of the keys in ``out`` to their newest written row.
+
+    Same upsert as the standalone scripts' state CTE: last_ts /
+    last_timestamp only moves forward (GREATEST).  Runs on the caller's
+    SQLAlchemy connection so it commits together with the returns rows.
+    """
+    keys = list(spec.keys)
+    state = out.groupby(keys, as_index=False).agg(last_at=(spec.ts_col, "max"))
+    params = {c: state[c].tolist() for c in keys}
+    params["last_at"] = [v.to_pydatetime() for v in state["last_at"]]
+    arrays = ", ".join(
+        f"CAST(:{c} AS {t}[])" for c, t in zip(spec.keys, spec.key_types)
+    )
+    key_cols = ", ".join(keys)
+    sql = text(
+        f"""
+        INSERT INTO {state_table} ({key_cols}, {spec.state_ts_col}, updated_at)
+        SELECT {key_cols}, last_at, now()
+        FROM unnest({arrays}, CAST(:last_at AS timestamptz[]))
+            AS u({key_cols}, last_at)
+        ON CONFLICT ({key_cols}) DO UPDATE SET
+            {spec.state_ts_col} = GREATEST(
+                EXCLUDED.{spec.state_ts_col}, {state_table}.{spec.state_ts_col}
+            ),
+            updated_at = now();
+        """
+    )
+    cxn.execute(sql, params)
+
+
+def _seed_tf_days(keys_df: pd.DataFrame) -> pd.Series:
+    """
+    tf_days behind each key's seed lookback.
+
+    A NULL tf_days falls back to the longest tf_days of the same id, so the
+    window can only grow; an id with no tf_days at all raises instead of
+    silently shrinking the canonical LAG context.
+    """
+    tf_days = pd.to_numeric(keys_df["tf_days"], errors="coerce").astype(float)
+    tf_days = tf_days.fillna(tf_days.groupby(keys_df["id"]).transform("max"))
+    missing = tf_days.isna()
+    if missing.any():
+        ids = sorted(int(i) for i in keys_df.loc[missing, "id"].unique())
+        raise ValueError(f"tf_days is NULL for every row of id(s) {ids}")
+    return tf_days
+
+
+def _write_fused(
+    engine: Engine,
+    df: pd.DataFrame,
+    spec: ReturnsSpec,
+    alignment_source: str,
+    source_table: str,
+    tables: Dict[str, Tuple[str, str]],
+) -> int:
+    if df is None or df.empty:
+        return 0
+    if alignment_source not in tables:
+        raise ValueError(
+            f"No returns tables for alignment_source={alignment_source!r}; "
+            f"expected one of {sorted(tables)}"
+        )
+    out_table, state_table = tables[alignment_source]
+    if (out_table, state_table) not in _ENSURED:
+        spec.ensure(engine, out_table, state_table)
+        _ENSURED.add((out_table, state_table))
+
+    keys = list(spec.keys)
+    ts = spec.ts_col
+    frame = spec.prepare(df)
+    for c in keys:
+        if c != "tf":
+            frame[c] = frame[c].astype(np.int64)
+
+    keys_df = frame.groupby(keys, as_index=False).agg(
+        first_ts=(ts, "min"), tf_days=("tf_days", "max")
+    )
+    ids = sorted(int(i) for i in keys_df["id"].unique())
+    wm = _load_watermarks(engine, spec, state_table, ids)
+    for c in keys:
+        if c != "tf":
+            wm[c] = wm[c].astype(np.int64)
+    keys_df = keys_df.merge(wm, on=keys, how="left")
+
+    lookback = pd.to_timedelta(
+        _seed_tf_days(keys_df) * SEED_BARS + SEED_SLACK_DAYS, unit="D"
+    )
+    keys_df["lo_ts"] = (keys_df["first_ts"] - lookback).where(keys_df["wm"].notna())
+
+    seed = _load_seed(engine, spec, source_table, alignment_source, keys_df)
+    if not seed.empty:
+        for c in keys:
+            if c != "tf":
+                seed[c] = seed[c].astype(np.int64)
+        last_seed = seed.groupby(keys, as_index=False).agg(last_seed=(ts, "max"))
+        keys_df = keys_df.merge(last_seed, on=keys, how="left")
+    else:
+        keys_df["last_seed"] = pd.Series(
+            pd.NaT, index=keys_df.index, dtype="datetime64[ns, UTC]"
+        )
+
+    # Fuse a key only if its watermark covers every source row before the frame
+    new_key = keys_df["wm"].isna() & keys_df["last_seed"].isna()
+    covered = keys_df["wm"].notna() & (
+        (keys_df["last_seed"].notna() & (keys_df["last_seed"] <= keys_df["wm"]))
+        | (keys_df["last_seed"].isna() & (keys_df["wm"] >= keys_df["lo_ts"]))
+    )
+    fusable = keys_df.loc[new_key | covered, keys + ["first_ts", "wm"]]
+    n_skipped = len(keys_df) - len(fusable)
+    if n_skipped:
+        logger.info(
+            "fused returns (%s): %d/%d keys behind their watermark; "
+            "left for the standalone returns refresh",
+            alignment_source,
+            n_skipped,
+            len(keys_df),
+        )
+    if fusable.empty:
+        return 0
+
+    frame = frame.merge(fusable[keys], on=keys)
+    if not seed.empty:
+        seed = seed.merge(fusable[keys], on=keys)
+        frame = pd.concat([seed, frame], ignore_index=True)
+
+    out = spec.compute(frame).merge(fusable, on=keys)
+    emit = (out[ts] >= out["first_ts"]) & (out["wm"].isna() | (out[ts] > out["wm"]))
+    out = out.loc[emit].drop(columns=["first_ts", "wm"]).reset_index(drop=True)
+    if out.empty:
+        return 0
+    out["ingested_at"] = pd.Timestamp.now(tz="UTC")
+    out["alignment_source"] = alignment_source
+
+    with engine.begin() as cxn:
+        copy_upsert(cxn.connection, out_table, out, spec.conflict_cols)
+        upsert_returns_state(cxn, spec, state_table, out)
+    return len(out)
+
+
+# ---------------------------------------------------------------------------
+# Public entry points
+# ---------------------------------------------------------------------------
+
+
+def write_fused_ema_returns(
+    engine: Engine,
+    df: pd.DataFrame,
+    alignment_source: str,
+    *,
+    source_table: Optional[str] = None,
+) -> int:
+    """
+    Write EMA returns for a just-written EMA frame and advance the watermarks.
+
+    Args:
+        engine: SQLAlchemy engine.
+        df: EMA rows as written to source_table (id, venue_id, tf, period,
+            ts, tf_days, roll, ema, ema_bar); NULLs may be None or NaN.
+        alignment_source: Alignment of the rows (selects the state table).
+        source_table: EMA table the rows were written to; seeds the LAGs.
+
+    Returns:
+        Number of returns rows written.
+    """
+    return _write_fused(
+        engine,
+        df,
+        EMA_SPEC,
+        alignment_source,
+        source_table or DEFAULT_EMA_SOURCE,
+        EMA_RETURNS_TABLES,
+    )
+
+
+def write_fused_bar_returns(
+    engine: Engine,
+    df: pd.DataFrame,
+    alignment_source: str,
+    *,
+    source_table: Optional[str] = None,
+) -> int:
+    """
+    Write bar returns for a just-written bar frame and advance the watermarks.
+
+    Args:
+        engine: SQLAlchemy engine.
+        df: Bar snapshots as written to source_table (the frame returned by
+            upsert_bars()).
+        alignment_source: Alignment of the rows (selects the state table).
+        source_table: Bars table the rows were written to; seeds the LAGs.
+
+    Returns:
+        Number of returns rows written.
+    """
+    return _write_fused(
+        engine,
+        df,
+        BAR_SPEC,
+        alignment_source,
+        source_table or DEFAULT_BARS_SOURCE,
+        BAR_RETURNS_TABLES,
+    )
+
+
+def run_fused_stage(
+    kind: str,
+    engine: Engine,
+    df: pd.DataFrame,
+    alignment_source: Optional[str],
+    *,
+    source_table: Optional[str] = None,
+    log: Optional[logging.Logger] = None,
+) -> int:
+    """
+    Fused stage as called from the refreshers: never fails the source write.
+
+    The EMA / bar rows are already committed when this runs, and a failed
+    fused write rolls back without touching the watermarks, so the error is
+    logged and the standalone returns refresh picks the rows up instead.
+
+    Args:
+        kind: "ema" or "bars".
+        engine: SQLAlchemy engine.
+        df: Frame just written to source_table.
+        alignment_source: Alignment of the rows; None skips the stage.
+        source_table: Table the rows were written to.
+        log: Logger for the outcome (default: this module's logger).
+
+    Returns:
+        Number of returns rows written (0 on skip or failure).
+    """
+    log = log or logger
+    if not alignment_source:
+        return 0
+    writer = write_fused_ema_returns if kind == "ema" else write_fused_bar_returns
+    try:
+        n = writer(engine, df, alignment_source, source_table=source_table)
+    except Exception as e:
+        log.warning(
+            f"fused {kind} returns failed for {alignment_source}: {e}; "
+            "left for the standalone returns refresh"
+        )
+        return 0
+    log.info(f"fused {kind} returns: {n} rows ({alignment_source})")
+    return n
@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+r"""
+refresh_returns_multi_tf_u.py
+
+One returns engine for every alignment variant of the unified EMA and bar
+tables.
+
+Replaces running the near-identical per-variant scripts one after another
+(refresh_returns_{ema,bars}_multi_tf.py and their _cal_us / _cal_iso /
+_cal_anchor_us / _cal_anchor_iso siblings), each of which re-reads the same
+id from the source table for its own alignment_source:
+
+  - Per id, ema_multi_tf_u / price_bars_multi_tf_u is read ONCE for all
+    requested alignments (alignment_source = ANY(...)).  Each key is scoped
+    to the rows after its watermark plus the LAG context before it: every
+    row of the preceding week (unified LAGs) and the canonical rows of the
+    preceding three bars (canonical LAGs).
+  - Returns for every alignment are computed in a single NumPy pass with
+    the fused_returns kernels, partitioned by (alignment_source, id,
+    venue_id, tf[, period]) -- the dual-LAG semantics of the SQL scripts.
+  - All returns rows of the id (EMA and bars, every alignment) and the
+    per-alignment watermarks are written in ONE transaction: binary COPY
+    into returns_ema_multi_tf_u / returns_bars_multi_tf_u, GREATEST upserts
+    into the standalone scripts' state tables.
+  - Ids run across a process pool (--workers).
+
+Sources: every alignment is read from the unified tables, which are
+authoritative.  For EMAs this is also what the per-variant scripts read.
+For bars it is not: the per-variant cal bar scripts still read the legacy
+price_bars_multi_tf_cal_* tables and write the same returns and state
+tables, so do not alternate this engine with them for the cal bar
+alignments -- a watermark advanced from one source would skip rows of the
+other.  run_daily_refresh.py --unified-returns runs this engine in place of
+the per-variant returns scripts.
+
+Usage:
+    python -m ta_lab2.scripts.returns.refresh_returns_multi_tf_u --ids all
+    python -m ta_lab2.scripts.returns.refresh_returns_multi_tf_u --ids 1,52 --families ema
+    python -m ta_lab2.scripts.returns.refresh_returns_multi_tf_u --ids all \
+        --alignments multi_tf_cal_us,multi_tf_cal_iso --workers 6
+    python -m ta_lab2.scripts.returns.refresh_returns_multi_tf_u --ids 1 --full-refresh
+
+Spyder run example:
+runfile(
+  r"C:\Users\asafi\Downloads\ta_lab2\src\ta_lab2\scripts\returns\refresh_returns_multi_tf_u.py",
+  wdir=r"C:\Users\asafi\Downloads\ta_lab2",
+  args="--ids all --workers 6"
+)
+"""
+
+import argparse
+import os
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+
+from ta_lab2.db.binary_copy import copy_upsert
+from ta_lab2.scripts.returns.fused_returns import (
+    BAR_RETURNS_TABLES,
+    BAR_SPEC,
+    DEFAULT_BARS_SOURCE,
+    DEFAULT_EMA_SOURCE,
+    EMA_RETURNS_TABLES,
+    EMA_SPEC,
+    SEED_BARS,
+    SEED_SLACK_DAYS,
+    ReturnsSpec,
+    upsert_returns_state,
+)
+
+ALIGNMENTS: List[str] = list(EMA_RETURNS_TABLES)
+
+# Every row this many days before a watermark is loaded for the unified LAGs;
+# further back only canonical rows (SEED_BARS bars + slack) are loaded.
+_DENSE_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Family:
+    name: str
+    spec: ReturnsSpec
+    source_table: str
+    out_table: str
+    state_tables: Dict[str, str]  # alignment_source -> state table
+
+
+FAMILIES: Dict[str, Family] = {
+    "ema": Family(
+        name="ema",
+        spec=EMA_SPEC,
+        source_table=DEFAULT_EMA_SOURCE,
+        out_table="public.returns_ema_multi_tf_u",
+        state_tables={a: t[1] for a, t in EMA_RETURNS_TABLES.items()},
+    ),
+    "bars": Family(
+        name="bars",
+        spec=BAR_SPEC,
+        source_table=DEFAULT_BARS_SOURCE,
+        out_table="public.returns_bars_multi_tf_u",
+        state_tables={a: t[1] for a, t in BAR_RETURNS_TABLES.items()},
+    ),
+}
+
+
+@dataclass(frozen=True)
+class RunnerConfig:
+    db_url: str
+    families: Tuple[str, ...]
+    alignments: Tuple[str, ...]
+    full_refresh: bool
+    venue_id: Optional[int] = None
+
+
+def _print(msg: str) -> None:
+    print(f"[ret_multi_tf_u] {msg}", flush=True)
+
+
+def _get_engine(db_url: str) -> Engine:
+    return create_engine(db_url, future=True)
+
+
+def _parse_ids(ids_arg: str) -> Optional[List[int]]:
+    s = ids_arg.strip().lower()
+    if s == "all":
+        return None
+    return [int(x.strip()) for x in ids_arg.split(",") if x.strip()]
+
+
+def _parse_choice(arg: str, choices: List[str], what: str) -> Tuple[str, ...]:
+    if arg.strip().lower() == "all":
+        return tuple(choices)
+    picked = tuple(x.strip() for x in arg.split(",") if x.strip())
+    unknown = sorted(set(picked) - set(choices))
+    if unknown:
+        raise SystemExit(f"ERROR: unknown {what} {unknown}; choose from {choices}")
+    return picked
+
+
+def _venue_filter(cfg: RunnerConfig, alias: str = "") -> str:
+    if cfg.venue_id is None:
+        return ""
+    return f"AND {alias}venue_id = :venue_id"
+
+
+def _load_ids(engine: Engine, cfg: RunnerConfig, ids: Optional[List[int]]) -> List[int]:
+    """Distinct ids present in any requested family / alignment."""
+    id_filter = "AND id = ANY(:ids)" if ids is not None else ""
+    sql = text(
+        "\nUNION\n".join(
+            f"""
+            SELECT DISTINCT id::bigint AS id
+            FROM {FAMILIES[f].source_table}
+            WHERE alignment_source = ANY(:alignments) {id_filter} {_venue_filter(cfg)}
+            """
+            for f in cfg.families
+        )
+        + "\nORDER BY 1;"
+    )
+    params: dict = {"alignments": list(cfg.alignments)}
+    if ids is not None:
+        params["ids"] = ids
+    if cfg.venue_id is not None:
+        params["venue_id"] = cfg.venue_id
+    with engine.begin() as cxn:
+        rows = cxn.execute(sql, params).fetchall()
+    return [int(r[0]) for r in rows]
+
+
+# ---------------------------------------------------------------------------
+# Per-id load + compute
+# ---------------------------------------------------------------------------
+
+
+def _source_sql(fam: Family, cfg: RunnerConfig) -> str:
+    """One read of the id's source rows for every alignment, windowed per key.
+
+    A key with NULL tf_days has no bar length to size its canonical window
+    with, so all of its canonical rows before the watermark are read.
+    """
+    spec = fam.spec
+    key_cols = [k for k in spec.keys if k != "id"]
+    select_keys = ", ".join(f"s.{k}" for k in spec.keys)
+
+    if cfg.full_refresh:
+        return f"""
+        SELECT s.alignment_source, {select_keys}, {spec.seed_select},
+               CAST(NULL AS timestamptz) AS wm
+        FROM {fam.source_table} s
+        WHERE s.id = :id
+          AND s.alignment_source = ANY(:alignments) {_venue_filter(cfg, "s.")}
+        """
+
+    wm_union = "\n            UNION ALL\n".join(
+        f"SELECT CAST('{a}' AS text) AS alignment_source, {', '.join(key_cols)},"
+        f" {spec.state_ts_col} AS wm FROM {fam.state_tables[a]} WHERE id = :id"
+        for a in cfg.alignments
+    )
+    on = " AND ".join(f"wm.{c} = s.{c}" for c in ["alignment_source", *key_cols])
+    ts = f"s.{spec.ts_sql}"
+    return f"""
+        WITH wm AS (
+            {wm_union}
+        )
+        SELECT s.alignment_source, {select_keys}, {spec.seed_select}, wm.wm
+        FROM {fam.source_table} s
+        LEFT JOIN wm ON {on}
+        WHERE s.id = :id
+          AND s.alignment_source = ANY(:alignments) {_venue_filter(cfg, "s.")}
+          AND (
+            wm.wm IS NULL
+            OR {ts} >= wm.wm - make_interval(days => :dense_days)
+            OR (
+              s.{spec.roll_sql} = FALSE
+              AND (
+                s.tf_days IS NULL
+                OR {ts} >= wm.wm - make_interval(
+                    days => :seed_bars * s.tf_days + :slack_days
+                )
+              )
+            )
+          )
+        """
+
+
+def _compute_family(
+    engine: Engine, fam: Family, cfg: RunnerConfig, id_: int
+) -> pd.DataFrame:
+    """Returns rows past each key's watermark, for all alignments of one family."""
+    spec = fam.spec
+    params: dict = {
+        "id": id_,
+        "alignments": list(cfg.alignments),
+        "dense_days": _DENSE_DAYS,
+        "seed_bars": SEED_BARS,
+        "slack_days": SEED_SLACK_DAYS,
+    }
+    if cfg.venue_id is not None:
+        params["venue_id"] = cfg.venue_id
+    with engine.connect() as cxn:
+        raw = pd.read_sql(text(_source_sql(fam, cfg)), cxn, params=params)
+    if raw.empty:
+        return raw
+
+    wm = pd.to_datetime(raw.pop("wm"), utc=True)
+    frame = spec.prepare(raw.rename(columns={"roll": spec.roll_sql}))
+    keys = ["alignment_source", *spec.keys]
+    frame["wm"] = wm
+    key_wm = frame.groupby(keys, as_index=False)["wm"].first()
+
+    out = spec.compute(frame.drop(columns=["wm"]), tuple(keys))
+    out = out.merge(key_wm, on=keys)
+    emit = out["wm"].isna() | (out[spec.ts_col] > out["wm"])
+    out = out.loc[emit].drop(columns=["wm"]).reset_index(drop=True)
+    out["ingested_at"] = pd.Timestamp.now(tz="UTC")
+    return out
+
+
+def _delete_id(cxn, fam: Family, cfg: RunnerConfig, id_: int) -> None:
+    params: dict = {"id": id_, "alignments": list(cfg.alignments)}
+    if cfg.venue_id is not None:
+        params["venue_id"] = cfg.venue_id
+    cxn.execute(
+        text(
+            f"DELETE FROM {fam.out_table} WHERE id = :id"
+            f" AND alignment_source = ANY(:alignments) {_venue_filter(cfg)}"
+        ),
+        params,
+    )
+    for a in cfg.alignments:
+        cxn.execute(
+            text(
+                f"DELETE FROM {fam.state_tables[a]} WHERE id = :id {_venue_filter(cfg)}"
+            ),
+            params,
+        )
+
+
+def _run_one_id(engine: Engine, cfg: RunnerConfig, id_: int) -> int:
+    """Compute every family / alignment for one id and write them in one txn.
+
+    Returns the number of returns rows written.
+    """
+    outputs = [
+        (FAMILIES[f], _compute_family(engine, FAMILIES[f], cfg, id_))
+        for f in cfg.families
+    ]
+    n = sum(len(out) for _, out in outputs)
+    if n == 0 and not cfg.full_refresh:
+        return 0
+
+    with engine.begin() as cxn:
+        for fam, out in outputs:
+            if cfg.full_refresh:
+                _delete_id(cxn, fam, cfg, id_)
+            if out.empty:
+                continue
+            copy_upsert(cxn.connection, fam.out_table, out, fam.spec.conflict_cols)
+            for alignment, part in out.groupby("alignment_source"):
+                upsert_returns_state(cxn, fam.spec, fam.state_tables[alignment], part)
+    return n
+
+
+def _run_one_id_mp(cfg: RunnerConfig, id_: int) -> Tuple[int, int]:
+    """Multiprocessing-safe wrapper. Returns (id_, rows written)."""
+    engine = create_engine(cfg.db_url, poolclass=NullPool, future=True)
+    try:
+        return (id_, _run_one_id(engine, cfg, id_))
+    finally:
+        engine.dispose()
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(
+        description=(
+            "Returns engine for every alignment of ema_multi_tf_u and "
+            "price_bars_multi_tf_u (one read, one pass, one write per id)."
+        )
+    )
+    p.add_argument(
+        "--db-url",
+        default=os.getenv("TARGET_DB_URL", ""),
+        help="Postgres DB URL (or set TARGET_DB_URL).",
+    )
+    p.add_argument("--ids", default="all", help="Comma-separated ids, or 'all'.")
+    p.add_argument(
+        "--families",
+        default="all",
+        help="Comma list of ema,bars or 'all' (default).",
+    )
+    p.add_argument(
+        "--alignments",
+        default="all",
+        help=f"Comma list of alignment_source values or 'all' ({','.join(ALIGNMENTS)}).",
+    )
+    p.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Delete and recompute returns + state for the selected ids/alignments.",
+    )
+    p.add_argument(
+        "--venue-id",
+        type=int,
+        default=None,
+        help="Filter to a specific venue_id (e.g. 2 for HL). Default: all venues.",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of parallel workers (default 1 = sequential).",
+    )
+
+    args = p.parse_args()
+
+    db_url = args.db_url.strip()
+    if not db_url:
+        raise SystemExit(
+            "ERROR: Missing DB URL. Provide --db-url or set TARGET_DB_URL."
+        )
+
+    cfg = RunnerConfig(
+        db_url=db_url,
+        families=_parse_choice(args.families, list(FAMILIES), "families"),
+        alignments=_parse_choice(args.alignments, ALIGNMENTS, "alignments"),
+        full_refresh=bool(args.full_refresh),
+        venue_id=args.venue_id,
+    )
+    _print(
+        f"Runner config: ids={args.ids}, families={','.join(cfg.families)}, "
+        f"alignments={','.join(cfg.alignments)}, full_refresh={cfg.full_refresh}"
+    )
+
+    engine = _get_engine(cfg.db_url)
+    for f in cfg.families:
+        fam = FAMILIES[f]
+        for a in cfg.alignments:
+            fam.spec.ensure(engine, fam.out_table, fam.state_tables[a])
+
+    asset_ids = _load_ids(engine, cfg, _parse_ids(args.ids))
+    _print(f"Resolved ids={len(asset_ids)}")
+    if not asset_ids:
+        _print("No IDs found. Done.")
+        return
+
+    total = 0
+    if args.workers > 1:
+        _print(f"Running {len(asset_ids)} IDs with {args.workers} workers.")
+        with Pool(processes=args.workers) as pool:
+            for done_id, n in pool.imap_unordered(
+                partial(_run_one_id_mp, cfg), asset_ids
+            ):
+                total += n
+                _print(f"  id={done_id} rows={n}")
+    else:
+        for i, id_ in enumerate(asset_ids, start=1):
+            n = _run_one_id(engine, cfg, id_)
+            total += n
+            _print(f"id={id_} ({i}/{len(asset_ids)}) rows={n}")
+
+    _print(f"Done. {total} returns rows written.")
+
+
+if __name__ == "__main__":
+    main()
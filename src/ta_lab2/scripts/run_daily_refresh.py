@@ -68,6 +68,12 @@ Usage:
     # Use 8 parallel processes for bar builders
     python run_daily_refresh.py --all --ids all -n 8
 
+    # Run independent stages concurrently (stage DAG) + critical-path report
+    python run_daily_refresh.py --all --ids all --parallel --max-db-conns 16
+
+    # Only refresh EMAs/AMAs/returns for assets whose bars changed
+    python run_daily_refresh.py --all --ids all --changed-only
+
     # Dry run
     python run_daily_refresh.py --all --ids 1 --dry-run
 """
@@ -75,12 +81,14 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
 import sys
 import time
 from pathlib import Path
 
 from ta_lab2.scripts.alembic_utils import check_migration_status
+from ta_lab2.scripts.change_log import advance_watermarks, dirty_ids
 from ta_lab2.scripts.pipeline_utils import (
     KILL_SWITCH_FILE,
     STAGE_ORDER,
@@ -128,6 +136,11 @@ from ta_lab2.scripts.refresh_utils import (
     parse_ids,
     resolve_db_url,
 )
+from ta_lab2.scripts.stage_dag import (
+    StageScheduler,
+    build_stages,
+    format_timing_report,
+)
 
 
 def run_bar_builders(
@@ -558,14 +571,48 @@ def _run_returns_subprocess(
         )
 
 
-def run_returns_bars(args, db_url: str) -> ComponentResult:
+def _ids_arg(args, ids: list[int] | None) -> str:
+    """--ids value for a subprocess: explicit ids, else the CLI --ids string."""
+    return args.ids if ids is None else ",".join(str(i) for i in ids)
+
+
+def _run_unified_returns(
+    args, db_url: str, ids: list[int] | None, family: str, timeout: int
+) -> ComponentResult:
+    """Run one family of refresh_returns_multi_tf_u for every alignment.
+
+    Used with --unified-returns: the single-pass engine reads each id once for
+    all alignment_source values instead of once per per-variant script.
+    """
+    cmd = [
+        sys.executable,
+        "-m",
+        "ta_lab2.scripts.returns.refresh_returns_multi_tf_u",
+        "--ids",
+        _ids_arg(args, ids),
+        "--families",
+        family,
+        "--db-url",
+        db_url,
+    ]
+    if args.num_processes:
+        cmd.extend(["--workers", str(args.num_processes)])
+    label = "bar returns" if family == "bars" else "EMA returns"
+    return _run_returns_subprocess(label, cmd, timeout, args)
+
+
+def run_returns_bars(
+    args, db_url: str, ids: list[int] | None = None
+) -> ComponentResult:
     """Run bar returns refresh via subprocess."""
+    if getattr(args, "unified_returns", False):
+        return _run_unified_returns(args, db_url, ids, "bars", TIMEOUT_RETURNS_BARS)
     cmd = [
         sys.executable,
         "-m",
         "ta_lab2.scripts.returns.refresh_returns_bars_multi_tf",
         "--ids",
-        args.ids,
+        _ids_arg(args, ids),
         "--db-url",
         db_url,
     ]
@@ -574,28 +621,30 @@ def run_returns_bars(args, db_url: str) -> ComponentResult:
     return _run_returns_subprocess("bar returns", cmd, TIMEOUT_RETURNS_BARS, args)
 
 
-def run_returns_ema(args, db_url: str) -> ComponentResult:
+def run_returns_ema(args, db_url: str, ids: list[int] | None = None) -> ComponentResult:
     """Run EMA returns refresh via subprocess."""
+    if getattr(args, "unified_returns", False):
+        return _run_unified_returns(args, db_url, ids, "ema", TIMEOUT_RETURNS_EMA)
     cmd = [
         sys.executable,
         "-m",
         "ta_lab2.scripts.returns.refresh_returns_ema_multi_tf",
         "--ids",
-        args.ids,
+        _ids_arg(args, ids),
     ]
     if args.num_processes:
         cmd.extend(["--workers", str(args.num_processes)])
     return _run_returns_subprocess("EMA returns", cmd, TIMEOUT_RETURNS_EMA, args)
 
 
-def run_returns_ama(args, db_url: str) -> ComponentResult:
+def run_returns_ama(args, db_url: str, ids: list[int] | None = None) -> ComponentResult:
     """Run AMA returns refresh via subprocess."""
     cmd = [
         sys.executable,
         "-m",
         "ta_lab2.scripts.amas.refresh_returns_ama",
         "--ids",
-        args.ids,
+        _ids_arg(args, ids),
         "--all-tfs",
         "--source",
         "all",
@@ -2953,6 +3002,341 @@ def run_ic_staleness_check_stage(args, db_url: str) -> ComponentResult:
         )
 
 
+# Stages that read only bar-derived inputs and can be scoped to the ids whose
+# bars changed (asset_change_log).  Regimes/signals also read macro state that
+# changes for every asset; features keep their own feature_refresh_state skip.
+CHANGE_TRACKED_STAGES = ("returns_bars", "emas", "returns_ema", "amas", "returns_ama")
+
+
+def _run_change_tracked(
+    args,
+    db_url: str,
+    stage: str,
+    ids: list[int] | None,
+    runner,
+) -> ComponentResult:
+    """Call ``runner(ids)``, narrowed to dirty ids when --changed-only is set.
+
+    Without a change log (table missing or empty) the full id list is used.
+    The stage's watermarks advance only after a successful, non-dry run.
+    """
+    if not getattr(args, "changed_only", False):
+        return runner(ids)
+
+    change_set = dirty_ids(db_url, stage, ids)
+    if change_set.ids is None:
+        print(f"\n[CHANGED-ONLY] {stage}: no change log yet -- processing all IDs")
+        return runner(ids)
+
+    print(
+        f"\n[CHANGED-ONLY] {stage}: {len(change_set.ids)} ID(s) with changed bars, "
+        f"{change_set.n_clean} unchanged skipped"
+    )
+    if not change_set.ids:
+        return ComponentResult(
+            component=stage, success=True, duration_sec=0.0, returncode=0
+        )
+
+    result = runner(change_set.ids)
+    if result.success and not args.dry_run:
+        try:
+            advance_watermarks(db_url, stage, change_set)
+        except Exception as exc:  # noqa: BLE001
+            print(f"[WARN] Could not advance {stage} watermarks: {exc}")
+    return result
+
+
+def _ids_for_emas(
+    args, db_url: str, parsed_ids: list[int] | None, run_bars: bool
+) -> list[int] | None:
+    """Return the IDs to refresh EMAs/AMAs for, dropping IDs with stale bars.
+
+    The check is skipped with --skip-stale-check or when bars are refreshed
+    in the same run.
+    """
+    ids_for_emas = parsed_ids
+
+    # Skip stale check when bars were just refreshed (--all mode)
+    skip_stale = args.skip_stale_check or run_bars
+
+    if not skip_stale:
+        print(f"\n{'=' * 70}")
+        print("CHECKING BAR FRESHNESS")
+        print(f"{'=' * 70}")
+
+        fresh_ids, stale_ids = get_fresh_ids(db_url, parsed_ids, args.staleness_hours)
+
+        if stale_ids:
+            print(f"\n[WARNING] {len(stale_ids)} ID(s) have stale bars:")
+            print(f"  Stale IDs: {stale_ids}")
+
+            print("\n[INFO] Consider running with --all to refresh bars first")
+
+            # Filter to fresh IDs only
+            ids_for_emas = fresh_ids
+            print(f"\n[INFO] Running EMAs for {len(fresh_ids)} ID(s) with fresh bars")
+        else:
+            print(
+                f"\n[OK] All {len(fresh_ids) if fresh_ids else 'requested'} ID(s) have fresh bars"
+            )
+    elif run_bars:
+        print("\n[INFO] Skipping bar freshness check (bars just refreshed)")
+
+    return ids_for_emas
+
+
+def _run_stages_parallel(
+    args,
+    db_url: str,
+    parsed_ids: list[int] | None,
+    enabled: dict[str, bool],
+    pipeline_run_id: str | None,
+    pipeline_start_time: float,
+    results: list[tuple[str, ComponentResult]],
+) -> int | None:
+    """Run the enabled stages through the DAG scheduler (--parallel).
+
+    Keeps the sequential semantics: VM syncs, macro gates/alerts, the signal
+    gate and IC staleness only warn; a signal-gate block skips the executor
+    without stopping the pipeline; a stats FAIL is always terminal.
+
+    Appends to ``results`` in completion order.  Returns an exit code when
+    the run must end early (1 = failure, 2 = kill switch), else None.
+    """
+    ids_for_emas = parsed_ids
+    if enabled["emas"] or enabled["amas"]:
+        ids_for_emas = _ids_for_emas(args, db_url, parsed_ids, enabled["bars"])
+    ids_for_amas = ids_for_emas if enabled["emas"] else parsed_ids
+
+    gate_results: dict[str, ComponentResult] = {}
+
+    def _signals() -> ComponentResult:
+        signal_result = run_signal_refreshes(args, db_url)
+        # Push fresh signals to Oracle VM for executor consumption (non-blocking)
+        if signal_result.success and not args.dry_run:
+            try:
+                from ta_lab2.scripts.etl.sync_signals_to_vm import sync_signals
+
+                print("\n[SYNC] Pushing signals to VM...")
+                sync_signals(dry_run=False)
+                print("[SYNC] Signal push to VM complete")
+            except Exception as exc:  # noqa: BLE001
+                print(f"\n[WARN] Signal push to VM failed: {exc}")
+        return signal_result
+
+    def _signal_gate() -> ComponentResult:
+        gate_results["gate"] = run_signal_validation_gate(args, db_url)
+        return gate_results["gate"]
+
+    def _executor() -> ComponentResult:
+        gate = gate_results.get("gate")
+        if gate is not None and not gate.success:
+            print("\n[GATE] Skipping executor -- signal validation gate blocked")
+            return ComponentResult(
+                component="executor",
+                success=False,
+                duration_sec=0.0,
+                returncode=2,
+                error_message="Blocked by signal validation gate",
+                blocked=True,
+            )
+        return run_paper_executor_stage(args, db_url)
+
+    runners = {
+        "sync_fred_vm": lambda: run_sync_fred_vm(args),
+        "sync_hl_vm": lambda: run_sync_hl_vm(args),
+        "sync_cmc_vm": lambda: run_sync_cmc_vm(args),
+        "bars": lambda: run_bar_builders(args, db_url, parsed_ids),
+        "returns_bars": lambda: _run_change_tracked(
+            args,
+            db_url,
+            "returns_bars",
+            parsed_ids,
+            lambda ids: run_returns_bars(args, db_url, ids),
+        ),
+        "emas": lambda: _run_change_tracked(
+            args,
+            db_url,
+            "emas",
+            ids_for_emas,
+            lambda ids: run_ema_refreshers(args, db_url, ids),
+        ),
+        "returns_ema": lambda: _run_change_tracked(
+            args,
+            db_url,
+            "returns_ema",
+            parsed_ids,
+            lambda ids: run_returns_ema(args, db_url, ids),
+        ),
+        "amas": lambda: _run_change_tracked(
+            args,
+            db_url,
+            "amas",
+            ids_for_amas,
+            lambda ids: run_ama_refreshers(args, db_url, ids),
+        ),
+        "returns_ama": lambda: _run_change_tracked(
+            args,
+            db_url,
+            "returns_ama",
+            parsed_ids,
+            lambda ids: run_returns_ama(args, db_url, ids),
+        ),
+        "desc_stats": lambda: run_desc_stats_refresher(args, db_url, parsed_ids),
+        "macro_features": lambda: run_macro_features(args),
+        "macro_regimes": lambda: run_macro_regimes(args),
+        "macro_analytics": lambda: run_macro_analytics(args),
+        "cross_asset_agg": lambda: run_cross_asset_agg(args),
+        "macro_gates": lambda: run_evaluate_macro_gates(args),
+        "macro_alerts": lambda: run_macro_alerts(args),
+        "regimes": lambda: run_regime_refresher(args, db_url, parsed_ids),
+        "features": lambda: run_feature_refresh_stage(args, db_url),
+        "garch": lambda: run_garch_forecasts(args, db_url),
+        "signals": _signals,
+        "signal_validation_gate": _signal_gate,
+        "ic_staleness_check": lambda: run_ic_staleness_check_stage(args, db_url),
+        "calibrate_stops": lambda: run_calibrate_stops_stage(args, db_url),
+        "portfolio": lambda: run_portfolio_refresh_stage(args, db_url),
+        "executor": _executor,
+        "drift_monitor": lambda: run_drift_monitor_stage(args, db_url),
+        "stats": lambda: run_stats_runners(args, db_url),
+    }
+    runners = {name: fn for name, fn in runners.items() if enabled.get(name)}
+
+    warnings = {
+        "sync_fred_vm": "FRED VM sync failed -- continuing with existing local data",
+        "sync_hl_vm": "Hyperliquid VM sync failed -- continuing with existing local data",
+        "sync_cmc_vm": "CMC VM sync failed -- continuing with existing local data",
+        "ic_staleness_check": "IC staleness check detected decay -- check dim_ic_weight_overrides",
+    }
+    blocking = {
+        name: False
+        for name in (
+            "sync_fred_vm",
+            "sync_hl_vm",
+            "sync_cmc_vm",
+            "macro_gates",
+            "macro_alerts",
+            "signal_validation_gate",
+            "ic_staleness_check",
+        )
+    }
+    # A gate block is reported as a failed executor but does not stop the run
+    blocking["executor"] = lambda r: not r.blocked
+
+    def _on_start(name: str):
+        return _log_stage_start(db_url, pipeline_run_id, name)
+
+    def _on_complete(name: str, slid, result: ComponentResult) -> None:
+        results.append((name, result))
+        _log_stage_complete(
+            db_url, slid, result.success, result.duration_sec, result.error_message
+        )
+        if not result.success:
+            if name in warnings:
+                print(f"\n[WARN] {warnings[name]}")
+            elif name == "signal_validation_gate":
+                print(
+                    "\n[GATE] Signal validation gate BLOCKED execution -- anomalies detected"
+                )
+                print(
+                    "[GATE] Signals held back from executor. Review signal_anomaly_log."
+                )
+
+    killed = False
+
+    def _should_stop() -> bool:
+        nonlocal killed
+        killed = killed or _maybe_kill(
+            db_url, pipeline_run_id, results, pipeline_start_time
+        )
+        return killed
+
+    scheduler = StageScheduler(
+        build_stages(runners, blocking=blocking, workers=args.num_processes),
+        cpu_budget=args.max_cpu,
+        db_budget=args.max_db_conns,
+        continue_on_error=args.continue_on_error,
+        on_start=_on_start,
+        on_complete=_on_complete,
+        should_stop=_should_stop,
+    )
+    report = scheduler.run()
+    print(f"\n{format_timing_report(report)}")
+
+    if killed:
+        return 2
+    stats_result = report.timings.get("stats")
+    if stats_result is not None and not stats_result.result.success:
+        print(
+            "\n[PIPELINE GATE] Stats runners reported FAIL -- data quality check failed"
+        )
+        print("Review stats tables for specific failures before using this data")
+        # Don't check continue_on_error -- stats FAIL is always terminal
+        return 1
+    if report.stopped:
+        failed = [n for n, r in report.results if scheduler.stages[n].is_fatal(r)]
+        print(f"\n[STOPPED] {', '.join(failed)} failed, stopping execution")
+        print("(Use --continue-on-error to run remaining components)")
+        return 1
+    return None
+
+
+def _finalize_run(
+    args,
+    db_url: str,
+    pipeline_run_id: str | None,
+    pipeline_start_time: float,
+    results: list[tuple[str, ComponentResult]],
+) -> int:
+    """Send the completion alert, print the summary and close the run log."""
+    # Phase 87: Pipeline completion alert -- after stats, before summary.
+    # Sends daily digest via Telegram (INFO if all green, WARNING if any failures).
+    # Non-blocking: failure to send alert never stops the pipeline.
+    if not args.dry_run and results:
+        _slid = _log_stage_start(db_url, pipeline_run_id, "pipeline_alerts")
+        alert_result = run_pipeline_completion_alert(args, db_url, results)
+        results.append(("pipeline_alerts", alert_result))
+        _log_stage_complete(
+            db_url,
+            _slid,
+            alert_result.success,
+            alert_result.duration_sec,
+            alert_result.error_message,
+        )
+
+    # Print combined summary
+    if not args.dry_run:
+        all_success = print_combined_summary(results)
+
+        # Phase 87: Update pipeline_run_log with completion details
+        if pipeline_run_id:
+            stages_completed = [name for name, r in results if r.success]
+            total_duration = time.perf_counter() - pipeline_start_time
+            overall_status = "complete" if all_success else "failed"
+            error_msg: str | None = (
+                "; ".join(
+                    f"{name}: {r.error_message}"
+                    for name, r in results
+                    if not r.success and r.error_message
+                )
+                or None
+            )
+            _complete_pipeline_run(
+                db_url,
+                pipeline_run_id,
+                overall_status,
+                stages_completed,
+                total_duration,
+                error_msg,
+            )
+
+        return 0 if all_success else 1
+    else:
+        print(f"\n[DRY RUN] Would have executed {len(results)} component(s)")
+        return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     """Main entry point."""
     p = argparse.ArgumentParser(
@@ -3005,6 +3389,9 @@ Examples:
   # Use 8 parallel processes for bar builders
   python run_daily_refresh.py --all --ids all -n 8
 
+  # Run independent stages concurrently (stage DAG)
+  python run_daily_refresh.py --all --ids all --parallel
+
   # Skip bar freshness check for EMAs
   python run_daily_refresh.py --emas --ids all --skip-stale-check
 
@@ -3318,6 +3705,50 @@ Examples:
         help="Skip IC staleness check in --all mode",
     )
 
+    p.add_argument(
+        "--changed-only",
+        action="store_true",
+        help=(
+            "Scope bar-derived stages ("
+            + ", ".join(CHANGE_TRACKED_STAGES)
+            + ") to IDs whose bars changed since each stage's last successful "
+            "run (asset_change_log / stage_watermark)"
+        ),
+    )
+
+    p.add_argument(
+        "--unified-returns",
+        action="store_true",
+        help=(
+            "Run bar and EMA returns through refresh_returns_multi_tf_u (one "
+            "read per id for every alignment_source) instead of the "
+            "per-variant returns scripts"
+        ),
+    )
+
+    # Parallel DAG scheduling (see stage_dag.py)
+    p.add_argument(
+        "--parallel",
+        action="store_true",
+        help=(
+            "Run independent stages concurrently following the stage dependency "
+            "graph (e.g. macro/FRED stages alongside bars/EMAs), and print a "
+            "critical-path timing report"
+        ),
+    )
+    p.add_argument(
+        "--max-cpu",
+        type=int,
+        default=os.cpu_count() or 4,
+        help="CPU slot budget shared by concurrent stages with --parallel (default: CPU count)",
+    )
+    p.add_argument(
+        "--max-db-conns",
+        type=int,
+        default=12,
+        help="DB connection budget shared by concurrent stages with --parallel (default: 12)",
+    )
+
     args = p.parse_args(argv)
 
     # --from-stage implicitly enables --all and sets starting point
@@ -3574,6 +4005,54 @@ Examples:
             )
             _fire_dead_man_alert(db_url)
 
+    paper_start = getattr(args, "paper_start", None)
+    if args.parallel:
+        if run_drift and not paper_start:
+            print("\n[WARN] Drift monitoring SKIPPED: --paper-start not provided")
+        enabled = {
+            "sync_fred_vm": run_sync_vms,
+            "sync_hl_vm": run_sync_vms,
+            "sync_cmc_vm": run_sync_vms,
+            "bars": run_bars,
+            "returns_bars": run_returns_bars_flag,
+            "emas": run_emas,
+            "returns_ema": run_returns_ema_flag,
+            "amas": run_amas,
+            "returns_ama": run_returns_ama_flag,
+            "desc_stats": run_desc_stats,
+            "macro_features": run_macro,
+            "macro_regimes": run_macro_regimes_flag,
+            "macro_analytics": run_macro_analytics_flag,
+            "cross_asset_agg": run_cross_asset_agg_flag,
+            "macro_gates": run_macro_regimes_flag,
+            "macro_alerts": run_macro_regimes_flag,
+            "regimes": run_regimes,
+            "features": run_features,
+            "garch": run_garch,
+            "signals": run_signals,
+            "signal_validation_gate": run_signal_gate,
+            "ic_staleness_check": run_ic_staleness,
+            "calibrate_stops": run_calibrate_stops,
+            "portfolio": run_portfolio,
+            "executor": run_executor,
+            "drift_monitor": bool(run_drift and paper_start),
+            "stats": run_stats,
+        }
+        rc = _run_stages_parallel(
+            args,
+            db_url,
+            parsed_ids,
+            enabled,
+            pipeline_run_id,
+            pipeline_start_time,
+            results,
+        )
+        if rc is not None:
+            return rc
+        return _finalize_run(
+            args, db_url, pipeline_run_id, pipeline_start_time, results
+        )
+
     # Sync VM data first (before any computations that depend on it)
     # Non-blocking: sync failures don't stop the pipeline (local data is
     # still usable, just potentially stale). Warns instead.
@@ -3648,7 +4127,13 @@ Examples:
     # Run bar returns if requested (after bars, before EMAs)
     if run_returns_bars_flag:
         _slid = _log_stage_start(db_url, pipeline_run_id, "returns_bars")
-        ret_bars_result = run_returns_bars(args, db_url)
+        ret_bars_result = _run_change_tracked(
+            args,
+            db_url,
+            "returns_bars",
+            parsed_ids,
+            lambda ids: run_returns_bars(args, db_url, ids),
+        )
         results.append(("returns_bars", ret_bars_result))
         _log_stage_complete(
             db_url,
@@ -3665,41 +4150,16 @@ Examples:
 
     # Run EMAs if requested
     if run_emas:
-        # Check bar freshness first (unless --skip-stale-check)
-        ids_for_emas = parsed_ids
-
-        # Skip stale check when bars were just refreshed (--all mode)
-        skip_stale = args.skip_stale_check or run_bars
-
-        if not skip_stale:
-            print(f"\n{'=' * 70}")
-            print("CHECKING BAR FRESHNESS")
-            print(f"{'=' * 70}")
-
-            fresh_ids, stale_ids = get_fresh_ids(
-                db_url, parsed_ids, args.staleness_hours
-            )
-
-            if stale_ids:
-                print(f"\n[WARNING] {len(stale_ids)} ID(s) have stale bars:")
-                print(f"  Stale IDs: {stale_ids}")
-
-                print("\n[INFO] Consider running with --all to refresh bars first")
-
-                # Filter to fresh IDs only
-                ids_for_emas = fresh_ids
-                print(
-                    f"\n[INFO] Running EMAs for {len(fresh_ids)} ID(s) with fresh bars"
-                )
-            else:
-                print(
-                    f"\n[OK] All {len(fresh_ids) if fresh_ids else 'requested'} ID(s) have fresh bars"
-                )
-        elif run_bars:
-            print("\n[INFO] Skipping bar freshness check (bars just refreshed)")
+        ids_for_emas = _ids_for_emas(args, db_url, parsed_ids, run_bars)
 
         _slid = _log_stage_start(db_url, pipeline_run_id, "emas")
-        ema_result = run_ema_refreshers(args, db_url, ids_for_emas)
+        ema_result = _run_change_tracked(
+            args,
+            db_url,
+            "emas",
+            ids_for_emas,
+            lambda ids: run_ema_refreshers(args, db_url, ids),
+        )
         results.append(("emas", ema_result))
         _log_stage_complete(
             db_url,
@@ -3719,7 +4179,13 @@ Examples:
     # Run EMA returns if requested (after EMAs, before AMAs)
     if run_returns_ema_flag:
         _slid = _log_stage_start(db_url, pipeline_run_id, "returns_ema")
-        ret_ema_result = run_returns_ema(args, db_url)
+        ret_ema_result = _run_change_tracked(
+            args,
+            db_url,
+            "returns_ema",
+            parsed_ids,
+            lambda ids: run_returns_ema(args, db_url, ids),
+        )
         results.append(("returns_ema", ret_ema_result))
         _log_stage_complete(
             db_url,
@@ -3739,7 +4205,13 @@ Examples:
         # Use same IDs as EMAs when running --all (fresh bar IDs); otherwise use parsed_ids
         ids_for_amas = ids_for_emas if run_emas else parsed_ids
         _slid = _log_stage_start(db_url, pipeline_run_id, "amas")
-        ama_result = run_ama_refreshers(args, db_url, ids_for_amas)
+        ama_result = _run_change_tracked(
+            args,
+            db_url,
+            "amas",
+            ids_for_amas,
+            lambda ids: run_ama_refreshers(args, db_url, ids),
+        )
         results.append(("amas", ama_result))
         _log_stage_complete(
             db_url,
@@ -3759,7 +4231,13 @@ Examples:
     # Run AMA returns if requested (after AMAs, before desc_stats)
     if run_returns_ama_flag:
         _slid = _log_stage_start(db_url, pipeline_run_id, "returns_ama")
-        ret_ama_result = run_returns_ama(args, db_url)
+        ret_ama_result = _run_change_tracked(
+            args,
+            db_url,
+            "returns_ama",
+            parsed_ids,
+            lambda ids: run_returns_ama(args, db_url, ids),
+        )
         results.append(("returns_ama", ret_ama_result))
         _log_stage_complete(
             db_url,
@@ -4106,6 +4584,7 @@ Examples:
                         duration_sec=0.0,
                         returncode=2,
                         error_message="Blocked by signal validation gate",
+                        blocked=True,
                     ),
                 )
             )
@@ -4137,7 +4616,6 @@ Examples:
     # --paper-start is OPTIONAL: if not provided, drift stage is silently skipped
     # even when --drift or --all is used. This allows --all to work without
     # requiring --paper-start every time.
-    paper_start = getattr(args, "paper_start", None)
     if run_drift and paper_start:
         _slid = _log_stage_start(db_url, pipeline_run_id, "drift_monitor")
         drift_result = run_drift_monitor_stage(args, db_url)
@@ -4188,51 +4666,7 @@ Examples:
             # Don't check continue_on_error -- stats FAIL is always terminal
             return 1
 
-    # Phase 87: Pipeline completion alert -- after stats, before summary.
-    # Sends daily digest via Telegram (INFO if all green, WARNING if any failures).
-    # Non-blocking: failure to send alert never stops the pipeline.
-    if not args.dry_run and results:
-        _slid = _log_stage_start(db_url, pipeline_run_id, "pipeline_alerts")
-        alert_result = run_pipeline_completion_alert(args, db_url, results)
-        results.append(("pipeline_alerts", alert_result))
-        _log_stage_complete(
-            db_url,
-            _slid,
-            alert_result.success,
-            alert_result.duration_sec,
-            alert_result.error_message,
-        )
-
-    # Print combined summary
-    if not args.dry_run:
-        all_success = print_combined_summary(results)
-
-        # Phase 87: Update pipeline_run_log with completion details
-        if pipeline_run_id:
-            stages_completed = [name for name, r in results if r.success]
-            total_duration = time.perf_counter() - pipeline_start_time
-            overall_status = "complete" if all_success else "failed"
-            error_msg: str | None = (
-                "; ".join(
-                    f"{name}: {r.error_message}"
-                    for name, r in results
-                    if not r.success and r.error_message
-                )
-                or None
-            )
-            _complete_pipeline_run(
-                db_url,
-                pipeline_run_id,
-                overall_status,
-                stages_completed,
-                total_duration,
-                error_msg,
-            )
-
-        return 0 if all_success else 1
-    else:
-        print(f"\n[DRY RUN] Would have executed {len(results)} component(s)")
-        return 0
+    return _finalize_run(args, db_url, pipeline_run_id, pipeline_start_time, results)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,523 @@
+"""
+Declarative stage dependency graph and parallel scheduler for the daily refresh.
+
+Provides:
+- DAILY_STAGE_DEPS: which stages each daily-refresh stage reads from
+- POOLED_STAGES / STAGE_RESOURCES / stage_resources: (cpu slots, DB
+  connections) each stage holds while running, scaled by -n for the stages
+  that run a worker pool
+- Stage dataclass and StageScheduler: runs every stage whose dependencies have
+  finished, concurrently, within a global CPU and DB-connection budget
+- critical_path / format_timing_report: the dependency chain that actually
+  bounded wall time, with per-stage wait and slack
+
+Stages are the existing ``run_*`` component functions of run_daily_refresh;
+each blocks on its own subprocess, so a thread per running stage is enough.
+
+Dependency direction (same rule as pipeline_utils):
+    stage_dag.py  (imports: stdlib, pipeline_utils)
+        ^
+    run_daily_refresh.py
+
+DO NOT import from run_daily_refresh.py here.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from ta_lab2.scripts.pipeline_utils import ComponentResult
+
+# ---------------------------------------------------------------------------
+# Daily refresh dependency graph
+# ---------------------------------------------------------------------------
+# Edges follow the tables each stage reads, not the legacy sequential order:
+# macro/FRED stages only need the FRED sync, AMAs read bars (not EMAs),
+# desc_stats and GARCH read bar returns.  Stage names match STAGE_ORDER, with
+# sync_vms split into its three independent syncs.
+DAILY_STAGE_DEPS: dict[str, tuple[str, ...]] = {
+    "sync_fred_vm": (),
+    "sync_hl_vm": (),
+    "sync_cmc_vm": (),
+    "bars": ("sync_hl_vm", "sync_cmc_vm"),
+    "returns_bars": ("bars",),
+    "emas": ("bars",),
+    "returns_ema": ("emas",),
+    "amas": ("bars",),
+    "returns_ama": ("amas",),
+    "desc_stats": ("returns_bars",),
+    "macro_features": ("sync_fred_vm",),
+    "macro_regimes": ("macro_features",),
+    "macro_analytics": ("macro_regimes",),
+    # funding_rates arrive with the Hyperliquid sync
+    "cross_asset_agg": ("returns_bars", "macro_analytics", "sync_hl_vm"),
+    "macro_gates": ("macro_regimes",),
+    "macro_alerts": ("macro_regimes",),
+    "regimes": (
+        "emas",
+        "amas",
+        "desc_stats",
+        "macro_regimes",
+        "macro_analytics",
+        "cross_asset_agg",
+    ),
+    "features": ("regimes", "returns_bars", "returns_ema", "returns_ama"),
+    "garch": ("returns_bars", "features"),
+    "signals": ("features", "garch", "regimes"),
+    "signal_validation_gate": ("signals",),
+    "ic_staleness_check": ("signals",),
+    "calibrate_stops": ("signals",),
+    "portfolio": ("signals", "calibrate_stops"),
+    "executor": ("portfolio", "signal_validation_gate"),
+    "drift_monitor": ("executor",),
+    # stats audits every table written above: runs last
+    "stats": (
+        "returns_bars",
+        "returns_ema",
+        "returns_ama",
+        "desc_stats",
+        "macro_gates",
+        "macro_alerts",
+        "ic_staleness_check",
+        "drift_monitor",
+        "executor",
+    ),
+}
+
+# Stages whose subprocess runs a worker pool sized by run_daily_refresh's
+# -n/--num-processes.  Each worker holds one CPU slot and one DB connection;
+# the value is the script's own default pool, used when -n is not given.
+POOLED_STAGES: dict[str, int] = {
+    "bars": 6,
+    "returns_bars": 1,
+    "emas": 4,
+    "returns_ema": 1,
+    "amas": 4,
+    "returns_ama": 10,
+    "desc_stats": 4,
+}
+
+# (cpu slots, DB connections) of stages not sized by -n.  Anything above the
+# scheduler budget is clipped so a heavy stage can still run alone.
+STAGE_RESOURCES: dict[str, tuple[int, int]] = {
+    "sync_fred_vm": (1, 1),
+    "sync_hl_vm": (1, 1),
+    "sync_cmc_vm": (1, 1),
+    "features": (6, 6),
+    "garch": (4, 2),
+}
+_DEFAULT_RESOURCES = (1, 1)
+
+
+def stage_resources(name: str, workers: int | None = None) -> tuple[int, int]:
+    """(cpu slots, DB connections) stage ``name`` holds while running.
+
+    ``workers`` is the configured -n; pooled stages hold one slot and one
+    connection per worker (their script default when None).
+    """
+    if name in POOLED_STAGES:
+        n = max(1, int(workers or POOLED_STAGES[name]))
+        return n, n
+    return STAGE_RESOURCES.get(name, _DEFAULT_RESOURCES)
+
+
+# ---------------------------------------------------------------------------
+# Stage / run records
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Stage:
+    """One schedulable stage.
+
+    Attributes:
+        name: Stage name (key of the dependency graph).
+        run: Zero-arg callable returning the stage's ComponentResult.
+        deps: Names of stages that must finish first.  Dependencies that are
+            not part of this run are ignored (already satisfied).
+        cpu: CPU slots held while running.
+        db_conns: DB connections held while running.
+        blocking: Whether a failed result stops the pipeline (unless
+            continue_on_error).  Either a bool or a predicate on the result,
+            for stages whose failure is sometimes soft (e.g. an executor
+            skipped by the signal gate).  Non-blocking stages only warn.
+    """
+
+    name: str
+    run: Callable[[], ComponentResult]
+    deps: tuple[str, ...] = ()
+    cpu: int = 1
+    db_conns: int = 1
+    blocking: bool | Callable[[ComponentResult], bool] = True
+
+    def is_fatal(self, result: ComponentResult) -> bool:
+        if result.success:
+            return False
+        return self.blocking(result) if callable(self.blocking) else self.blocking
+
+
+@dataclass
+class StageTiming:
+    """Wall-clock record of one stage (seconds relative to scheduler start)."""
+
+    name: str
+    ready: float  # all dependencies finished
+    start: float
+    end: float
+    result: ComponentResult
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def wait(self) -> float:
+        """Time spent ready but queued for CPU/DB budget."""
+        return self.start - self.ready
+
+
+@dataclass
+class DagRunReport:
+    """Outcome of a StageScheduler run."""
+
+    timings: dict[str, StageTiming]
+    deps: dict[str, tuple[str, ...]]
+    skipped: dict[str, str] = field(default_factory=dict)  # name -> reason
+    stopped: bool = False  # halted early (failure or should_stop)
+    wall_sec: float = 0.0
+
+    @property
+    def results(self) -> list[tuple[str, ComponentResult]]:
+        """(name, result) in completion order, as run_daily_refresh collects."""
+        ordered = sorted(self.timings.values(), key=lambda t: t.end)
+        return [(t.name, t.result) for t in ordered]
+
+    @property
+    def serial_sec(self) -> float:
+        return sum(t.duration for t in self.timings.values())
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+
+def build_stages(
+    runners: dict[str, Callable[[], ComponentResult]],
+    deps: dict[str, tuple[str, ...]] = DAILY_STAGE_DEPS,
+    blocking: dict[str, bool | Callable[[ComponentResult], bool]] | None = None,
+    workers: int | None = None,
+) -> list[Stage]:
+    """Stages for ``runners`` (name -> callable) wired with ``deps``.
+
+    ``blocking`` overrides Stage.blocking per stage (default True).
+    Resources come from stage_resources(name, workers), ``workers`` being
+    the -n passed to the stage subprocesses.
+    """
+    blocking = blocking or {}
+    unknown = set(runners) - set(deps)
+    if unknown:
+        raise ValueError(f"stages missing from dependency graph: {sorted(unknown)}")
+    stages = []
+    for name, fn in runners.items():
+        cpu, db = stage_resources(name, workers)
+        stages.append(
+            Stage(
+                name=name,
+                run=fn,
+                deps=tuple(d for d in deps[name] if d in runners),
+                cpu=cpu,
+                db_conns=db,
+                blocking=blocking.get(name, True),
+            )
+        )
+    return stages
+
+
+class StageScheduler:
+    """Run stages as soon as their dependencies finish, within resource budgets.
+
+    Ready stages launch in priority order -- longest remaining dependency
+    chain first (by ``estimates`` seconds, default 1 per stage) -- whenever
+    enough CPU slots and DB connections are free.
+
+    Args:
+        stages: Stages to run; deps must form a DAG over these stages.
+        cpu_budget: Total CPU slots shared by running stages.
+        db_budget: Total DB connections shared by running stages.
+        continue_on_error: Keep launching stages after a blocking failure,
+            dependents included -- same as the sequential --continue-on-error.
+            Otherwise no new stage starts once one fails (running stages
+            finish) and the rest are reported as skipped.
+        on_start: Called as ``on_start(name)`` on the stage's thread before
+            it runs; its return value is passed to on_complete.
+        on_complete: Called as ``on_complete(name, token, result)``.
+        should_stop: Polled after every completion; True stops launching new
+            stages (running ones finish).
+        estimates: Optional expected seconds per stage for prioritisation.
+    """
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        cpu_budget: int,
+        db_budget: int,
+        continue_on_error: bool = False,
+        on_start: Callable[[str], object] | None = None,
+        on_complete: Callable[[str, object, ComponentResult], None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+        estimates: dict[str, float] | None = None,
+    ) -> None:
+        self.stages = {s.name: s for s in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("duplicate stage names")
+        self.cpu_budget = max(1, int(cpu_budget))
+        self.db_budget = max(1, int(db_budget))
+        self.continue_on_error = continue_on_error
+        self.on_start = on_start
+        self.on_complete = on_complete
+        self.should_stop = should_stop
+        self._order = _topological_order(
+            {
+                n: tuple(d for d in s.deps if d in self.stages)
+                for n, s in self.stages.items()
+            }
+        )
+        self._priority = _chain_lengths(
+            {n: self.stages[n].deps for n in self._order}, estimates or {}
+        )
+
+    def _cost(self, stage: Stage) -> tuple[int, int]:
+        return min(stage.cpu, self.cpu_budget), min(stage.db_conns, self.db_budget)
+
+    def run(self) -> DagRunReport:
+        deps = {
+            n: tuple(d for d in s.deps if d in self.stages)
+            for n, s in self.stages.items()
+        }
+        pending = set(self.stages)
+        done: set[str] = set()
+        ready_at: dict[str, float] = {}
+        timings: dict[str, StageTiming] = {}
+        skipped: dict[str, str] = {}
+        running: dict[Future, tuple[str, float]] = {}
+        free_cpu, free_db = self.cpu_budget, self.db_budget
+        stopped = False
+        stop_reason = "pipeline stopped"
+        t0 = time.perf_counter()
+        lock = threading.Lock()
+
+        def _now() -> float:
+            return time.perf_counter() - t0
+
+        def _call(stage: Stage) -> tuple[float, float, ComponentResult]:
+            token = self.on_start(stage.name) if self.on_start else None
+            start = _now()
+            try:
+                result = stage.run()
+            except Exception as exc:  # noqa: BLE001
+                result = ComponentResult(
+                    component=stage.name,
+                    success=False,
+                    duration_sec=_now() - start,
+                    returncode=-1,
+                    error_message=f"{type(exc).__name__}: {exc}",
+                )
+            end = _now()
+            if self.on_complete:
+                with lock:
+                    self.on_complete(stage.name, token, result)
+            return start, end, result
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, len(self.stages)), thread_name_prefix="stage"
+        ) as pool:
+            while pending or running:
+                if not stopped:
+                    ready = [n for n in pending if all(d in done for d in deps[n])]
+                    for n in ready:
+                        ready_at.setdefault(n, _now())
+                    ready.sort(key=lambda n: (-self._priority[n], self._order.index(n)))
+                    for n in ready:
+                        cpu, db = self._cost(self.stages[n])
+                        if cpu <= free_cpu and db <= free_db:
+                            free_cpu -= cpu
+                            free_db -= db
+                            pending.discard(n)
+                            running[pool.submit(_call, self.stages[n])] = (
+                                n,
+                                ready_at[n],
+                            )
+                elif pending:
+                    for n in sorted(pending):
+                        skipped[n] = stop_reason
+                    pending.clear()
+
+                if not running:
+                    if pending:  # unreachable unless deps reference a cycle
+                        raise RuntimeError(
+                            f"stages cannot be scheduled: {sorted(pending)}"
+                        )
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name, ready = running.pop(fut)
+                    start, end, result = fut.result()
+                    cpu, db = self._cost(self.stages[name])
+                    free_cpu += cpu
+                    free_db += db
+                    timings[name] = StageTiming(name, ready, start, end, result)
+                    done.add(name)
+                    if (
+                        self.stages[name].is_fatal(result)
+                        and not self.continue_on_error
+                        and not stopped
+                    ):
+                        stopped = True
+                        stop_reason = f"'{name}' failed"
+                if not stopped and self.should_stop and self.should_stop():
+                    stopped = True
+                    stop_reason = "stop requested"
+
+        return DagRunReport(
+            timings=timings,
+            deps=deps,
+            skipped=skipped,
+            stopped=stopped,
+            wall_sec=_now(),
+        )
+
+
+def _topological_order(deps: dict[str, tuple[str, ...]]) -> list[str]:
+    order: list[str] = []
+    state: dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(n: str) -> None:
+        if state.get(n) == 2:
+            return
+        if state.get(n) == 1:
+            raise ValueError(f"dependency cycle through stage '{n}'")
+        state[n] = 1
+        for d in deps[n]:
+            visit(d)
+        state[n] = 2
+        order.append(n)
+
+    for n in deps:
+        visit(n)
+    return order
+
+
+def _chain_lengths(
+    deps: dict[str, tuple[str, ...]], estimates: dict[str, float]
+) -> dict[str, float]:
+    """Longest estimated path from each stage to a sink (inclusive)."""
+    children: dict[str, list[str]] = {n: [] for n in deps}
+    for n, ds in deps.items():
+        for d in ds:
+            children[d].append(n)
+    length: dict[str, float] = {}
+    for n in reversed(_topological_order(deps)):
+        tail = max((length[c] for c in children[n]), default=0.0)
+        length[n] = estimates.get(n, 1.0) + tail
+    return length
+
+
+# ---------------------------------------------------------------------------
+# Critical path report
+# ---------------------------------------------------------------------------
+
+
+def critical_path(report: DagRunReport) -> list[StageTiming]:
+    """Chain of stages that bounded the run's wall time.
+
+    Walks back from the last stage to finish, each step following the
+    dependency that finished last (the one that released it).
+    """
+    if not report.timings:
+        return []
+    node = max(report.timings.values(), key=lambda t: t.end)
+    path = [node]
+    while True:
+        deps = [
+            report.timings[d]
+            for d in report.deps.get(node.name, ())
+            if d in report.timings
+        ]
+        if not deps:
+            break
+        node = max(deps, key=lambda t: t.end)
+        path.append(node)
+    return path[::-1]
+
+
+def slack(report: DagRunReport) -> dict[str, float]:
+    """Seconds each stage could have been delayed without extending the run."""
+    if not report.timings:
+        return {}
+    children: dict[str, list[str]] = {n: [] for n in report.timings}
+    for n in report.timings:
+        for d in report.deps.get(n, ()):
+            if d in children:
+                children[d].append(n)
+    finish = max(t.end for t in report.timings.values())
+    latest_end: dict[str, float] = {}
+    for n in reversed(
+        _topological_order(
+            {
+                n: tuple(d for d in report.deps.get(n, ()) if d in report.timings)
+                for n in report.timings
+            }
+        )
+    ):
+        kids = children[n]
+        latest_end[n] = min(
+            (latest_end[c] - report.timings[c].duration for c in kids),
+            default=finish,
+        )
+    return {n: latest_end[n] - t.end for n, t in report.timings.items()}
+
+
+def format_timing_report(report: DagRunReport) -> str:
+    """Human-readable timing table plus critical path."""
+    lines = [
+        f"{'=' * 70}",
+        "STAGE TIMING (parallel DAG)",
+        f"{'=' * 70}",
+        (
+            f"Wall time: {report.wall_sec:.1f}s | "
+            f"serial sum: {report.serial_sec:.1f}s | "
+            f"speedup: {report.serial_sec / report.wall_sec if report.wall_sec else 0.0:.2f}x"
+        ),
+        "",
+        f"{'stage':<24}{'start':>9}{'end':>9}{'dur':>9}{'wait':>8}{'slack':>9}  status",
+    ]
+    sl = slack(report)
+    for t in sorted(report.timings.values(), key=lambda t: t.start):
+        status = "ok" if t.result.success else "FAILED"
+        lines.append(
+            f"{t.name:<24}{t.start:>9.1f}{t.end:>9.1f}{t.duration:>9.1f}"
+            f"{t.wait:>8.1f}{sl.get(t.name, 0.0):>9.1f}  {status}"
+        )
+    for name, reason in report.skipped.items():
+        lines.append(f"{name:<24}{'':>44}  skipped ({reason})")
+
+    path = critical_path(report)
+    lines += ["", "Critical path:"]
+    lines.append(
+        "  " + " -> ".join(f"{t.name} ({t.duration:.1f}s)" for t in path)
+        if path
+        else "  (no stages ran)"
+    )
+    if path:
+        busy = sum(t.duration for t in path)
+        lines.append(
+            f"  chain busy {busy:.1f}s of {report.wall_sec:.1f}s wall "
+            f"({report.wall_sec - busy:.1f}s queued/overhead)"
+        )
+    return "\n".join(lines)
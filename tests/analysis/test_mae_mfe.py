@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/ta_lab2/analysis/mae_mfe.py.
+
+Reference values come from slicing close_series per trade
+(``close.loc[entry:exit]``), the definition the vectorized path replaces.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.analysis.mae_mfe import _range_min_max, compute_mae_mfe
+
+RNG = np.random.default_rng(42)
+
+
+@pytest.fixture(scope="module")
+def close():
+    idx = pd.date_range("2021-01-01", periods=500, freq="D")
+    values = 100 * np.exp(np.cumsum(RNG.normal(0, 0.02, len(idx))))
+    values[200:205] = np.nan
+    return pd.Series(values, index=idx)
+
+
+def _random_trades(close, n=300):
+    idx = close.index
+    entry = idx[RNG.integers(0, len(idx), n)]
+    exit_ = entry + pd.to_timedelta(RNG.integers(0, 60, n), "D")
+    trades = pd.DataFrame(
+        {
+            "entry_ts": entry.tz_localize("UTC"),
+            "exit_ts": exit_,
+            "entry_price": RNG.uniform(80, 120, n),
+            "direction": RNG.choice(["long", "SHORT"], n),
+        }
+    )
+    trades.loc[::25, "exit_ts"] = pd.NaT
+    return trades
+
+
+def _reference(trades, close):
+    mae, mfe = [], []
+    for row in trades.itertuples():
+        if pd.isnull(row.exit_ts):
+            mae.append(np.nan)
+            mfe.append(np.nan)
+            continue
+        window = close.loc[row.entry_ts.tz_localize(None) : row.exit_ts]
+        px = row.entry_price
+        if row.direction.lower() == "long":
+            mae.append(window.min() / px - 1.0)
+            mfe.append(window.max() / px - 1.0)
+        else:
+            mae.append(px / window.max() - 1.0)
+            mfe.append(px / window.min() - 1.0)
+    return np.array(mae), np.array(mfe)
+
+
+class TestRangeMinMax:
+    def test_matches_slices(self):
+        values = RNG.standard_normal(257)
+        values[[3, 50, 51, 52]] = np.nan
+        start = RNG.integers(0, 257, 1000)
+        stop = start + 1 + RNG.integers(0, 257 - start)
+        mins, maxs = _range_min_max(values, start, stop)
+        for i in range(len(start)):
+            window = values[start[i] : stop[i]]
+            if np.isnan(window).all():
+                assert np.isnan(mins[i]) and np.isnan(maxs[i])
+            else:
+                assert mins[i] == np.nanmin(window)
+                assert maxs[i] == np.nanmax(window)
+
+
+class TestComputeMaeMfe:
+    def test_matches_per_trade_slices(self, close):
+        trades = _random_trades(close)
+        result = compute_mae_mfe(trades, close)
+        mae, mfe = _reference(trades, close)
+        np.testing.assert_allclose(result["mae"], mae, rtol=1e-14)
+        np.testing.assert_allclose(result["mfe"], mfe, rtol=1e-14)
+        assert "mae" not in trades.columns
+
+    def test_window_is_inclusive(self, close):
+        trades = pd.DataFrame(
+            {
+                "entry_ts": [close.index[10], close.index[10]],
+                "exit_ts": [close.index[10], close.index[12]],
+                "entry_price": [close.iloc[10]] * 2,
+                "direction": ["long", "long"],
+            }
+        )
+        result = compute_mae_mfe(trades, close)
+        assert result.loc[0, "mae"] == pytest.approx(0.0)
+        expected = close.iloc[10:13].max() / close.iloc[10] - 1.0
+        assert result.loc[1, "mfe"] == pytest.approx(expected)
+
+    def test_missing_windows_are_none(self, close):
+        trades = pd.DataFrame(
+            {
+                "entry_ts": [close.index[-1] + pd.Timedelta(days=5)],
+                "exit_ts": [close.index[-1] + pd.Timedelta(days=9)],
+                "entry_price": [100.0],
+                "direction": ["long"],
+            }
+        )
+        result = compute_mae_mfe(trades, close)
+        assert result.loc[0, "mae"] is None
+        assert result.loc[0, "mfe"] is None
+
+    def test_multi_asset(self, close):
+        trades = _random_trades(close).assign(asset_id=RNG.choice([1, 52, 99], 300))
+        other = close * 0.5
+        by_dict = compute_mae_mfe(trades, {1: close, 52: other})
+        by_multiindex = compute_mae_mfe(trades, pd.concat({1: close, 52: other}))
+        pd.testing.assert_frame_equal(by_dict, by_multiindex)
+
+        for asset_id, series in ((1, close), (52, other)):
+            mask = trades["asset_id"] == asset_id
+            mae, _ = _reference(trades[mask], series)
+            np.testing.assert_allclose(by_dict.loc[mask, "mae"], mae, rtol=1e-14)
+        assert by_dict.loc[trades["asset_id"] == 99, "mae"].isna().all()
+
+    def test_multi_asset_requires_asset_id(self, close):
+        trades = _random_trades(close, n=5)
+        with pytest.raises(ValueError, match="asset_id"):
+            compute_mae_mfe(trades, {1: close})
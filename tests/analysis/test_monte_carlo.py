@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for src/ta_lab2/analysis/monte_carlo.py.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.analysis.monte_carlo import (
+    bootstrap_indices,
+    bootstrap_metrics,
+    monte_carlo_many,
+    monte_carlo_returns,
+    monte_carlo_trades,
+)
+
+RNG = np.random.default_rng(42)
+
+
+def _loop_sharpes(values, n_samples, seed):
+    """Reference: one rng.choice() resample per iteration."""
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(n_samples):
+        sample = rng.choice(values, size=len(values), replace=True)
+        std = sample.std(ddof=1)
+        if std != 0:
+            out.append(sample.mean() / std * math.sqrt(365))
+    return np.array(out)
+
+
+class TestMonteCarloReturns:
+    def test_matches_per_sample_loop(self):
+        returns = pd.Series(RNG.normal(5e-4, 0.02, 400))
+        result = monte_carlo_returns(returns, n_samples=500, seed=7)
+        ref = _loop_sharpes(returns.to_numpy(), 500, 7)
+        assert result["mc_sharpe_lo"] == np.percentile(ref, 2.5)
+        assert result["mc_sharpe_hi"] == np.percentile(ref, 97.5)
+        assert result["mc_sharpe_median"] == np.median(ref)
+        assert result["mc_n_samples"] == 500
+
+    def test_trades_skip_zero_std_samples(self):
+        # Binary-exact values so all-equal resamples have std exactly 0
+        trades = pd.DataFrame({"pnl_pct": [50.0] * 9 + [250.0, np.nan]})
+        result = monte_carlo_trades(trades, n_samples=300, seed=1)
+        ref = _loop_sharpes(np.array([0.5] * 9 + [2.5]), 300, 1)
+        assert result["mc_n_samples"] == len(ref) < 300
+        assert result["n_trades"] == 10
+
+    def test_too_few_observations(self):
+        result = monte_carlo_returns(pd.Series(RNG.normal(size=10)))
+        assert result["mc_sharpe_lo"] is None
+
+    def test_block_method_widens_ci_for_trending_returns(self):
+        # Strongly autocorrelated returns: i.i.d. resampling understates risk
+        returns = pd.Series(
+            np.repeat(RNG.normal(0.0, 0.02, 50), 10) + RNG.normal(0, 1e-3, 500)
+        )
+        iid = monte_carlo_returns(returns, n_samples=2000)
+        block = monte_carlo_returns(
+            returns, n_samples=2000, method="stationary", block_size=10
+        )
+        iid_width = iid["mc_sharpe_hi"] - iid["mc_sharpe_lo"]
+        block_width = block["mc_sharpe_hi"] - block["mc_sharpe_lo"]
+        assert block_width > 1.5 * iid_width
+
+
+class TestBootstrapIndices:
+    @pytest.mark.parametrize("method", ["iid", "block", "stationary"])
+    def test_shape_and_range(self, method):
+        idx = bootstrap_indices(37, 500, method=method, block_size=4, seed=3)
+        assert idx.shape == (500, 37)
+        assert idx.min() >= 0 and idx.max() < 37
+
+    def test_block_structure(self):
+        idx = bootstrap_indices(100, 200, method="block", block_size=5, seed=0)
+        steps = np.diff(idx, axis=1) % 100
+        # Consecutive within each block of 5
+        assert (steps[:, [0, 1, 2, 3, 5, 6, 7, 8]] == 1).all()
+
+    def test_stationary_mean_block_length(self):
+        idx = bootstrap_indices(500, 400, method="stationary", block_size=8, seed=0)
+        breaks = (np.diff(idx, axis=1) % 500 != 1).mean()
+        assert breaks == pytest.approx(1 / 8, rel=0.05)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError, match="method"):
+            bootstrap_indices(10, 10, method="jackknife")
+
+
+class TestBootstrapMetrics:
+    def test_matches_equity_curve(self):
+        values = RNG.normal(1e-3, 0.03, 120)
+        dist = bootstrap_metrics(values, n_samples=50, seed=5)
+        idx = bootstrap_indices(120, 50, seed=5)
+        for i in (0, 17, 49):
+            sample = values[idx[i]]
+            equity = np.cumprod(np.r_[1.0, 1.0 + sample])
+            mdd = (equity / np.maximum.accumulate(equity) - 1.0).min()
+            cagr = equity[-1] ** (365 / 120) - 1.0
+            sharpe = sample.mean() / sample.std(ddof=1) * math.sqrt(365)
+            assert dist["max_drawdown"][i] == pytest.approx(mdd, rel=1e-12)
+            assert dist["cagr"][i] == pytest.approx(cagr, rel=1e-12)
+            assert dist["sharpe"][i] == pytest.approx(sharpe, rel=1e-12)
+
+
+class TestMonteCarloMany:
+    def test_batch_matches_single_calls(self):
+        strategies = {
+            f"s{i}": RNG.normal(3e-4, 0.02, n) for i, n in enumerate([200] * 4 + [90])
+        }
+        strategies["short"] = RNG.normal(size=5)
+        table = monte_carlo_many(
+            strategies, n_samples=800, method="stationary", block_size=4
+        )
+        assert list(table.index) == list(strategies)
+        assert pd.isna(table.loc["short", "mc_sharpe_lo"])
+
+        for key in ("s2", "s4"):
+            alone = monte_carlo_many(
+                {key: strategies[key]},
+                n_samples=800,
+                method="stationary",
+                block_size=4,
+            )
+            pd.testing.assert_frame_equal(alone, table.loc[[key]], check_dtype=False)
+            single = monte_carlo_returns(
+                pd.Series(strategies[key]),
+                n_samples=800,
+                method="stationary",
+                block_size=4,
+            )
+            assert table.loc[key, "mc_sharpe_lo"] == pytest.approx(
+                single["mc_sharpe_lo"], rel=1e-12
+            )
+
+        row = table.loc["s0"]
+        assert row["mc_max_dd_lo"] <= row["mc_max_dd_median"] <= 0
+        assert row["mc_cagr_lo"] <= row["mc_cagr_median"] <= row["mc_cagr_hi"]
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the panel IC engine (src/ta_lab2/analysis/panel_ic.py).
+
+The per-asset functions in ic.py are the reference: every panel statistic
+must match them asset by asset.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats
+
+from ta_lab2.analysis.ic import (
+    compute_feature_turnover,
+    compute_forward_returns,
+    compute_ic,
+    compute_ic_by_regime,
+    compute_rolling_ic,
+)
+from ta_lab2.analysis.panel_ic import (
+    panel_compute_ic,
+    panel_forward_returns,
+    panel_ic_by_regime,
+    rolling_rank_ic,
+)
+
+_STAT_COLS = ["ic", "ic_t_stat", "ic_p_value", "ic_ir", "ic_ir_t_stat", "turnover"]
+
+
+@pytest.fixture(scope="module")
+def panel():
+    """3 assets x 400 daily bars x 4 features; asset 1 starts late."""
+    rng = np.random.default_rng(42)
+    n_assets, n_bars = 3, 400
+    idx = pd.date_range("2022-01-01", periods=n_bars, freq="D", tz="UTC")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_assets, n_bars)), axis=1))
+    feats = rng.standard_normal((n_assets, n_bars, 4))
+    feats[..., 1] = np.round(feats[..., 1], 1)  # ties
+    # Predictive feature: next-bar return plus noise
+    fwd1 = np.r_[close[0, 1:] / close[0, :-1] - 1.0, np.nan]
+    feats[0, :, 2] = fwd1 + rng.normal(0, 0.02, n_bars)
+    feats[2, 50:60, 3] = np.nan
+    close[1, :80] = np.nan
+    feats[1, :80] = np.nan
+    return {
+        "idx": idx,
+        "close": close,
+        "feats": feats,
+        "names": ["f_a", "f_b", "f_c", "f_d"],
+    }
+
+
+def _asset_frames(panel, a):
+    present = ~np.isnan(panel["close"][a])
+    idx = panel["idx"][present]
+    feats = pd.DataFrame(panel["feats"][a][present], index=idx, columns=panel["names"])
+    close = pd.Series(panel["close"][a][present], index=idx)
+    return feats, close
+
+
+def _reference_table(panel, a, start, end, **kwargs):
+    feats, close = _asset_frames(panel, a)
+    parts = [
+        compute_ic(feats[col], close, start, end, **kwargs).assign(feature=col)
+        for col in panel["names"]
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+
+class TestPanelComputeIC:
+    def test_matches_compute_ic_per_asset(self, panel):
+        idx = panel["idx"]
+        starts = [idx[0], idx[80], idx[20]]
+        ends = [idx[-1], idx[-1], idx[300]]
+        result = panel_compute_ic(
+            panel["feats"],
+            panel["close"],
+            idx,
+            starts,
+            ends,
+            asset_ids=[1, 2, 3],
+            feature_names=panel["names"],
+            horizons=[1, 5, 20],
+            rolling_window=30,
+        )
+        assert len(result) == 3 * 4 * 3 * 2
+        for a, asset_id in enumerate([1, 2, 3]):
+            got = result[result["asset_id"] == asset_id].reset_index(drop=True)
+            ref = _reference_table(
+                panel, a, starts[a], ends[a], horizons=[1, 5, 20], rolling_window=30
+            )
+            assert list(got["feature"]) == list(ref["feature"])
+            assert list(got["horizon"]) == list(ref["horizon"])
+            np.testing.assert_array_equal(got["n_obs"], ref["n_obs"])
+            for col in _STAT_COLS:
+                np.testing.assert_allclose(
+                    got[col].astype(float), ref[col].astype(float), rtol=1e-9
+                )
+
+    def test_predictive_feature_has_positive_ic(self, panel):
+        idx = panel["idx"]
+        result = panel_compute_ic(
+            panel["feats"][:1],
+            panel["close"][:1],
+            idx,
+            idx[0],
+            idx[-1],
+            feature_names=panel["names"],
+            horizons=[1],
+            return_types=["arith"],
+        )
+        assert result.set_index("feature").loc["f_c", "ic"] > 0.5
+
+    def test_feature_chunking_is_invisible(self, panel):
+        idx = panel["idx"]
+        kwargs = dict(horizons=[1, 10], rolling_window=21)
+        whole = panel_compute_ic(
+            panel["feats"], panel["close"], idx, idx[0], idx[-1], **kwargs
+        )
+        chunked = panel_compute_ic(
+            panel["feats"],
+            panel["close"],
+            idx,
+            idx[0],
+            idx[-1],
+            feature_chunk=1,
+            **kwargs,
+        )
+        pd.testing.assert_frame_equal(whole, chunked)
+
+    def test_non_ns_timestamps(self, panel):
+        # a second-resolution index (e.g. from Arrow / parquet) must not be
+        # compared as raw int64 against the ns train window
+        idx = panel["idx"]
+        kwargs = dict(horizons=[1, 5], rolling_window=21)
+        ref = panel_compute_ic(
+            panel["feats"], panel["close"], idx, idx[20], idx[300], **kwargs
+        )
+        got = panel_compute_ic(
+            panel["feats"],
+            panel["close"],
+            idx.as_unit("s"),
+            idx[20],
+            idx[300],
+            **kwargs,
+        )
+        pd.testing.assert_frame_equal(got, ref)
+
+    def test_empty_features(self, panel):
+        idx = panel["idx"]
+        result = panel_compute_ic(
+            np.empty((3, len(idx), 0)), panel["close"], idx, idx[0], idx[-1]
+        )
+        assert result.empty
+
+    def test_pearson_matches_scipy(self, panel):
+        idx = panel["idx"]
+        feats = panel["feats"].copy()
+        feats[..., 3] += 1e6  # large level: needs the demeaned kernel
+        feats[2, :, 1] = 0.5  # constant
+        result = panel_compute_ic(
+            feats,
+            panel["close"],
+            idx,
+            idx[0],
+            idx[-1],
+            feature_names=panel["names"],
+            horizons=[1, 5],
+            rolling_window=30,
+            method="pearson",
+        )
+        fwd = panel_forward_returns(panel["close"], horizons=[1, 5])
+        for row in result.itertuples():
+            a, j = row.asset_id, panel["names"].index(row.feature)
+            r = ["arith", "log"].index(row.return_type)
+            x, y = feats[a, :, j], fwd[r, [1, 5].index(row.horizon), a]
+            ok = ~(np.isnan(x) | np.isnan(y))
+            assert row.n_obs == ok.sum()
+            if a == 2 and j == 1:
+                assert np.isnan(row.ic)
+                continue
+            expected = scipy.stats.pearsonr(x[ok], y[ok]).statistic
+            assert row.ic == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+            roll = pd.Series(x).rolling(30).corr(pd.Series(y))
+            roll = roll[np.isfinite(roll)]
+            assert row.ic_ir == pytest.approx(
+                roll.mean() / roll.std(), rel=1e-6, abs=1e-9
+            )
+
+    def test_unknown_method_rejected(self, panel):
+        idx = panel["idx"]
+        with pytest.raises(ValueError, match="method"):
+            panel_compute_ic(
+                panel["feats"], panel["close"], idx, idx[0], idx[-1], method="kendall"
+            )
+
+    def test_shape_validation(self, panel):
+        idx = panel["idx"]
+        with pytest.raises(ValueError, match="n_features"):
+            panel_compute_ic(panel["close"], panel["close"], idx, idx[0], idx[-1])
+        with pytest.raises(ValueError, match="per-asset"):
+            panel_compute_ic(panel["feats"], panel["close"], idx, [idx[0]], idx[-1])
+
+
+class TestPanelKernels:
+    def test_forward_returns(self, panel):
+        fwd = panel_forward_returns(panel["close"], horizons=[1, 3])
+        assert fwd.shape == (2, 2, 3, len(panel["idx"]))
+        close = pd.Series(panel["close"][1], index=panel["idx"])
+        np.testing.assert_allclose(
+            fwd[1, 1, 1], compute_forward_returns(close, 3, log=True), rtol=1e-12
+        )
+
+    def test_rolling_rank_ic(self, panel):
+        feats, close = _asset_frames(panel, 2)
+        fwd = compute_forward_returns(close, 5)
+        got = rolling_rank_ic(feats.to_numpy(), fwd.to_numpy()[:, None], window=40)
+        for j, col in enumerate(panel["names"]):
+            ref, _, _ = compute_rolling_ic(feats[col], fwd, window=40)
+            np.testing.assert_allclose(got[:, j], ref, rtol=1e-9, atol=1e-12)
+
+    def test_turnover_matches(self, panel):
+        idx = panel["idx"]
+        result = panel_compute_ic(
+            panel["feats"], panel["close"], idx, idx[0], idx[-1], horizons=[1]
+        )
+        feats, _ = _asset_frames(panel, 2)
+        got = result[(result["asset_id"] == 2) & (result["return_type"] == "arith")]
+        expected = [compute_feature_turnover(feats[c]) for c in panel["names"]]
+        np.testing.assert_allclose(got["turnover"], expected, rtol=1e-12)
+
+
+class TestPanelICByRegime:
+    def test_matches_compute_ic_by_regime(self, panel):
+        rng = np.random.default_rng(7)
+        idx = panel["idx"]
+        labels = rng.choice(
+            ["Up", "Down", "Flat"], size=(3, len(idx)), p=[0.5, 0.46, 0.04]
+        )
+        labels = labels.astype(object)
+        labels[:, ::9] = None
+        result = panel_ic_by_regime(
+            panel["feats"],
+            panel["close"],
+            idx,
+            labels,
+            idx[0],
+            idx[-1],
+            asset_ids=[1, 2, 3],
+            feature_names=panel["names"],
+            horizons=[1, 5],
+            rolling_window=30,
+        )
+        # Sparse "Flat" regime is skipped everywhere
+        assert set(result["regime_label"]) == {"Up", "Down"}
+        for a, asset_id in enumerate([1, 2, 3]):
+            feats, close = _asset_frames(panel, a)
+            regimes = pd.DataFrame({"trend_state": labels[a]}, index=idx)
+            ref = pd.concat(
+                [
+                    compute_ic_by_regime(
+                        feats[col],
+                        close,
+                        regimes,
+                        idx[0],
+                        idx[-1],
+                        horizons=[1, 5],
+                        rolling_window=30,
+                    ).assign(feature=col)
+                    for col in panel["names"]
+                ],
+                ignore_index=True,
+            )
+            got = result[result["asset_id"] == asset_id].reset_index(drop=True)
+            assert list(got["regime_label"]) == list(ref["regime_label"])
+            assert list(got["feature"]) == list(ref["feature"])
+            np.testing.assert_array_equal(got["n_obs"], ref["n_obs"])
+            for col in _STAT_COLS:
+                np.testing.assert_allclose(
+                    got[col].astype(float), ref[col].astype(float), rtol=1e-9
+                )
+
+    def test_falls_back_to_full_sample(self, panel):
+        idx = panel["idx"]
+        labels = np.full((3, len(idx)), None, dtype=object)
+        labels[:, :10] = "Up"  # too sparse to evaluate
+        result = panel_ic_by_regime(
+            panel["feats"],
+            panel["close"],
+            idx,
+            labels,
+            idx[0],
+            idx[-1],
+            regime_col="vol_state",
+            horizons=[1],
+        )
+        assert set(result["regime_label"]) == {"all"}
+        assert set(result["regime_col"]) == {"vol_state"}
+        assert len(result) == 3 * 4 * 2
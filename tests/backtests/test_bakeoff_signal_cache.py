@@ -0,0 +1,127 @@
+"""Tests for SignalCache memoization in the bake-off orchestrator."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.backtests.bakeoff_orchestrator import (
+    BakeoffConfig,
+    SignalCache,
+    build_t1_series,
+    run_cpcv_backtest,
+    run_purged_kfold_backtest,
+)
+from ta_lab2.backtests.costs import KRAKEN_COST_MATRIX
+
+RNG = np.random.default_rng(42)
+
+
+def _price_frame(n: int = 400) -> pd.DataFrame:
+    idx = pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC")
+    close = 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, n)))
+    return pd.DataFrame({"close": close}, index=idx)
+
+
+class _CountingSignal:
+    """EMA-cross signal that counts how often it is generated."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, df: pd.DataFrame, fast: int = 5, slow: int = 20):
+        self.calls += 1
+        f = df["close"].ewm(span=fast, adjust=False).mean()
+        s = df["close"].ewm(span=slow, adjust=False).mean()
+        above = f > s
+        entries = above & ~above.shift(1, fill_value=False)
+        exits = ~above & above.shift(1, fill_value=False)
+        return entries, exits, None
+
+
+class TestSignalCache:
+    def test_generates_once_per_params_and_data(self) -> None:
+        df = _price_frame()
+        fn = _CountingSignal()
+        cache = SignalCache()
+
+        first = cache.get(df, fn, {"fast": 5, "slow": 20})
+        again = cache.get(df, fn, {"slow": 20, "fast": 5})  # key order irrelevant
+        assert fn.calls == 1
+        assert again is first
+        cache.get(df, fn, {"fast": 10, "slow": 20})
+        assert fn.calls == 2
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_changed_data_misses(self) -> None:
+        df = _price_frame()
+        fn = _CountingSignal()
+        cache = SignalCache()
+        cache.get(df, fn, {})
+        cache.get(df.copy(), fn, {})  # same content, new object -> hit
+        assert fn.calls == 1
+
+        restated = df.copy()
+        restated.iloc[10, 0] *= 1.01
+        cache.get(restated, fn, {})
+        assert fn.calls == 2
+
+    def test_lru_bound(self) -> None:
+        df = _price_frame()
+        fn = _CountingSignal()
+        cache = SignalCache(max_entries=1)
+        cache.get(df, fn, {"fast": 3})
+        cache.get(df, fn, {"fast": 4})
+        cache.get(df, fn, {"fast": 3})
+        assert fn.calls == 3
+
+    def test_failure_is_cached_and_reraised(self) -> None:
+        calls = []
+
+        def broken(df):
+            calls.append(1)
+            raise ValueError("missing column")
+
+        cache = SignalCache()
+        df = _price_frame()
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                cache.get(df, broken, {})
+        assert len(calls) == 1
+
+
+class TestBacktestsShareSignals:
+    CONFIG = BakeoffConfig(n_folds=5, embargo_bars=5, cpcv_n_test_splits=2)
+
+    def test_results_identical_with_shared_cache(self) -> None:
+        pytest.importorskip("vectorbt")
+        df = _price_frame()
+        t1 = build_t1_series(df.index)
+        costs = KRAKEN_COST_MATRIX[:3]
+
+        uncached = _CountingSignal()
+        expected = [
+            run_purged_kfold_backtest(df, uncached, {}, t1, c, self.CONFIG)
+            for c in costs
+        ]
+        # Without a shared cache: one generation per call (not per fold)
+        assert uncached.calls == len(costs)
+
+        cached = _CountingSignal()
+        cache = SignalCache()
+        got = [
+            run_purged_kfold_backtest(
+                df, cached, {}, t1, c, self.CONFIG, signal_cache=cache
+            )
+            for c in costs
+        ]
+        run_cpcv_backtest(df, cached, {}, t1, costs[0], self.CONFIG, signal_cache=cache)
+        assert cached.calls == 1
+
+        for e, g in zip(expected, got):
+            assert g["sharpe_mean"] == e["sharpe_mean"]
+            assert g["trade_count_total"] == e["trade_count_total"]
+            assert [fm.oos_returns for fm in g["fold_metrics"]] == [
+                fm.oos_returns for fm in e["fold_metrics"]
+            ]
@@ -0,0 +1,304 @@
+"""Parity of the native signal engine with vectorbt, plus its vbt-free extras."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.analysis.stop_simulator import simulate_time_stop, sweep_stops
+from ta_lab2.analysis.vol_sizer import (
+    compute_comparison_metrics,
+    run_vol_sized_backtest,
+)
+from ta_lab2.backtests.funding_adjuster import align_funding_rates
+from ta_lab2.backtests.signal_engine import NativePortfolio, simulate_signals
+
+RNG = np.random.default_rng(42)
+
+N_BARS, N_COLS = 300, 16
+
+
+def _ohlc(n: int = N_BARS):
+    close = 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, n)))
+    open_ = np.r_[100.0, close[:-1]] * np.exp(RNG.normal(0.0, 0.005, n))
+    high = np.maximum(open_, close) * np.exp(np.abs(RNG.normal(0.0, 0.01, n)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(RNG.normal(0.0, 0.01, n)))
+    return close, open_, high, low
+
+
+def _signals():
+    entries = RNG.random((N_BARS, N_COLS)) < 0.06
+    exits = RNG.random((N_BARS, N_COLS)) < 0.06
+    size = RNG.uniform(0.5, 20.0, (N_BARS, N_COLS))
+    return entries, exits, size
+
+
+def _assert_parity(r, pf) -> None:
+    np.testing.assert_allclose(r.value, pf.value().to_numpy(), rtol=1e-10)
+    np.testing.assert_allclose(r.cash, pf.cash().to_numpy(), rtol=1e-10, atol=1e-9)
+    np.testing.assert_allclose(r.position, pf.assets().to_numpy(), atol=1e-10)
+    np.testing.assert_array_equal(r.trade_count, pf.trades.count().to_numpy())
+
+    exp = pf.trades.records_readable.sort_values(
+        ["Column", "Entry Timestamp"], kind="stable"
+    )
+    got = r.trades
+    np.testing.assert_array_equal(got["col"], exp["Column"])
+    np.testing.assert_array_equal(got["entry_idx"], exp["Entry Timestamp"])
+    np.testing.assert_array_equal(got["exit_idx"], exp["Exit Timestamp"])
+    for field, col in (
+        ("size", "Size"),
+        ("entry_price", "Avg Entry Price"),
+        ("entry_fees", "Entry Fees"),
+        ("exit_fees", "Exit Fees"),
+        ("pnl", "PnL"),
+        ("return", "Return"),
+    ):
+        np.testing.assert_allclose(got[field], exp[col], rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(
+        np.where(got["direction"] == 0, "Long", "Short"), exp["Direction"]
+    )
+
+
+class TestFixedFixtureParity:
+    """Reference values recorded from vectorbt 0.28.1; runs without vectorbt."""
+
+    CLOSE = np.array(
+        [100.0, 102.0, 99.0, 105.0, 103.0, 98.0, 101.0, 104.0, 100.0, 97.0]
+    )
+    ENTRIES = np.array([1, 0, 0, 0, 1, 0, 0, 1, 0, 0], dtype=bool)
+    EXITS = np.array([0, 0, 1, 0, 0, 0, 1, 0, 0, 1], dtype=bool)
+    KW = dict(size=2.0, fees=0.001, slippage=0.0005, sl_stop=0.04, init_cash=1000.0)
+
+    # direction -> (value, position, (entry_idx, exit_idx, "Long"/"Short", pnl))
+    EXPECTED = {
+        "longonly": (
+            [999.6999, 1003.6999, 997.402999, 997.402999, 997.093896,
+             986.897896, 986.897896, 986.585792, 978.585792, 972.391792],
+            [2, 2, 0, 0, 2, 0, 0, 2, 2, 0],
+            [(0, 2, "Long", -2.597001), (4, 5, "Long", -10.505103),
+             (7, 9, "Long", -14.506104)],
+        ),
+        "shortonly": (
+            [999.7001, 995.7001, 1001.403001, 1001.403001, 1001.094104,
+             1011.094104, 1004.791003, 1004.479107, 1012.479107, 1018.18801],
+            [-2, -2, 0, 0, -2, -2, 0, -2, -2, 0],
+            [(0, 2, "Short", 1.403001), (4, 6, "Short", 3.388002),
+             (7, 9, "Short", 13.397007)],
+        ),
+        "both": (
+            [999.6999, 1003.6999, 997.106098, 984.896098, 984.586995,
+             974.390995, 974.088096, 967.463888, 959.463888, 953.269888],
+            [2, 2, -2, 0, 2, 0, -2, 2, 2, 0],
+            [(0, 2, "Long", -2.597001), (2, 3, "Short", -12.506901),
+             (4, 5, "Long", -10.505103), (6, 7, "Short", -6.615003),
+             (7, 9, "Long", -14.506104)],
+        ),
+    }  # fmt: skip
+
+    @pytest.mark.parametrize("direction", ["longonly", "shortonly", "both"])
+    def test_matches_recorded_vectorbt_run(self, direction) -> None:
+        value, position, trades = self.EXPECTED[direction]
+        r = simulate_signals(
+            self.CLOSE,
+            self.ENTRIES,
+            self.EXITS,
+            direction=direction,
+            record_trades=True,
+            **self.KW,
+        )
+        np.testing.assert_allclose(r.value[:, 0], value, atol=1e-6)
+        np.testing.assert_allclose(r.position[:, 0], position, atol=1e-12)
+        t = r.trades
+        assert list(zip(t["entry_idx"], t["exit_idx"])) == [x[:2] for x in trades]
+        assert list(np.where(t["direction"] == 0, "Long", "Short")) == [
+            x[2] for x in trades
+        ]
+        np.testing.assert_allclose(t["pnl"], [x[3] for x in trades], atol=1e-6)
+
+    def test_vol_sized_backtest_keeps_direction(self) -> None:
+        idx = pd.date_range("2024-01-01", periods=len(self.CLOSE), freq="D", tz="UTC")
+        price = pd.Series(self.CLOSE, index=idx)
+        pf = run_vol_sized_backtest(
+            price,
+            pd.Series(self.ENTRIES, index=idx),
+            pd.Series(self.EXITS, index=idx),
+            pd.Series(0.02, index=idx),
+            vol_type="realized",
+            risk_budget=0.01,
+            engine="native",
+            direction="shortonly",
+        )
+        assert (pf.assets().to_numpy() < 0).any()
+        assert (pf.assets().to_numpy() <= 0).all()
+
+
+class TestVectorbtParity:
+    @pytest.mark.parametrize("direction", ["longonly", "shortonly", "both"])
+    @pytest.mark.parametrize(
+        "stops",
+        [
+            {},
+            {"sl_stop": 0.05},
+            {"sl_stop": 0.05, "sl_trail": True},
+            {"sl_stop": 0.04, "tp_stop": 0.08},
+        ],
+    )
+    @pytest.mark.parametrize("use_ohlc", [False, True])
+    def test_signals_and_stops(self, direction, stops, use_ohlc) -> None:
+        vbt = pytest.importorskip("vectorbt")
+        close, open_, high, low = _ohlc()
+        entries, exits, size = _signals()
+        kw = dict(direction=direction, fees=0.002, slippage=0.001, **stops)
+        ohlc = dict(open=open_, high=high, low=low) if use_ohlc else {}
+
+        pf = vbt.Portfolio.from_signals(
+            pd.Series(close),
+            entries=entries,
+            exits=exits,
+            size=size,
+            init_cash=1_000.0,
+            freq="D",
+            **kw,
+            **{k: v[:, None] for k, v in ohlc.items()},
+        )
+        r = simulate_signals(
+            close, entries, exits, size, record_trades=True, **kw, **ohlc
+        )
+        _assert_parity(r, pf)
+
+    def test_explicit_long_short_signals(self) -> None:
+        vbt = pytest.importorskip("vectorbt")
+        close, *_ = _ohlc()
+        le, lx, size = _signals()
+        se, sx, _ = _signals()
+        pf = vbt.Portfolio.from_signals(
+            pd.Series(close),
+            entries=le,
+            exits=lx,
+            short_entries=se,
+            short_exits=sx,
+            size=size,
+            fees=0.001,
+            init_cash=1_000.0,
+            freq="D",
+        )
+        r = simulate_signals(
+            close, le, lx, size, short_entries=se, short_exits=sx, fees=0.001,
+            record_trades=True,
+        )  # fmt: skip
+        _assert_parity(r, pf)
+
+    def test_all_cash_stops_per_column(self) -> None:
+        vbt = pytest.importorskip("vectorbt")
+        close, *_ = _ohlc()
+        entries, exits, _ = _signals()
+        sl = np.linspace(0.01, 0.15, N_COLS)
+        trail = np.arange(N_COLS) % 2 == 0
+        pf = vbt.Portfolio.from_signals(
+            pd.Series(close),
+            entries=entries,
+            exits=exits,
+            sl_stop=sl[None, :],
+            sl_trail=trail[None, :],
+            fees=0.0016,
+            init_cash=1_000.0,
+            freq="D",
+        )
+        r = simulate_signals(
+            close, entries, exits, fees=0.0016, sl_stop=sl, sl_trail=trail,
+            record_trades=True,
+        )  # fmt: skip
+        _assert_parity(r, pf)
+        np.testing.assert_allclose(r.max_drawdown(), pf.max_drawdown().to_numpy())
+        np.testing.assert_allclose(r.sharpe_ratio(), pf.sharpe_ratio().to_numpy())
+
+
+class TestNativeExtras:
+    def test_time_stop_exits_after_n_bars(self) -> None:
+        close = np.linspace(100.0, 120.0, 12)
+        entries = np.zeros(12, bool)
+        entries[[1, 8]] = True
+        r = simulate_signals(close, entries, np.zeros(12, bool), time_stop=3)
+        held = r.position[:, 0] > 0
+        assert held.tolist() == [
+            False, True, True, True, False, False, False, False,
+            True, True, True, False,
+        ]  # fmt: skip
+        assert r.trade_count.tolist() == [2]
+
+    def test_funding_charged_on_open_notional(self) -> None:
+        close = np.array([100.0, 100.0, 110.0, 110.0])
+        entries = np.array([True, False, False, False])
+        exits = np.array([False, False, True, False])
+        rate = 0.001
+        long = simulate_signals(close, entries, exits, funding_rate=rate)
+        # 10 units held at the close of bars 0 and 1 (exit fills before funding)
+        assert long.funding_paid[0] == pytest.approx(10 * 100.0 * rate * 2)
+        assert long.value[-1, 0] == pytest.approx(1_100.0 - 2.0)
+
+        short = simulate_signals(
+            close, entries, exits, 10.0, direction="shortonly", funding_rate=rate
+        )
+        assert short.funding_paid[0] == pytest.approx(-2.0)
+        assert short.value[-1, 0] == pytest.approx(900.0 + 2.0)
+
+    def test_align_funding_rates_ffill(self) -> None:
+        bars = pd.date_range("2024-01-01", periods=4, freq="D", tz="UTC")
+        rates = pd.Series(
+            [0.01, 0.02], index=pd.to_datetime(["2024-01-01 08:00", "2024-01-02 16:00"])
+        )
+        aligned = align_funding_rates(rates, bars)
+        np.testing.assert_allclose(aligned, [np.nan, 0.01, 0.02, 0.02])
+
+    def test_all_cash_short(self) -> None:
+        close = np.array([100.0, 80.0, 80.0])
+        r = simulate_signals(
+            close, np.array([True, False, False]), np.array([False, True, False]),
+            direction="shortonly",
+        )  # fmt: skip
+        assert r.position[0, 0] == pytest.approx(-10.0)
+        assert r.value[-1, 0] == pytest.approx(1_200.0)
+
+
+class TestAnalysisWrappers:
+    def _inputs(self):
+        idx = pd.date_range("2022-01-01", periods=N_BARS, freq="D", tz="UTC")
+        close, *_ = _ohlc()
+        price = pd.Series(close, index=idx)
+        fast = price.ewm(span=5, adjust=False).mean()
+        slow = price.ewm(span=20, adjust=False).mean()
+        above = fast > slow
+        entries = above & ~above.shift(1, fill_value=False)
+        exits = ~above & above.shift(1, fill_value=False)
+        return price, entries, exits
+
+    def test_sweep_stops_native_matches_vbt(self) -> None:
+        pytest.importorskip("vectorbt")
+        price, entries, exits = self._inputs()
+        native = sweep_stops(price, entries, exits, engine="native")
+        ref = sweep_stops(price, entries, exits, engine="vbt")
+        assert len(native) == 16
+        pd.testing.assert_frame_equal(native, ref, rtol=1e-9)
+
+    def test_time_stop_returns_native_portfolio(self) -> None:
+        price, entries, exits = self._inputs()
+        pf = simulate_time_stop(price, entries, exits, 5, engine="native")
+        assert isinstance(pf, NativePortfolio)
+        assert pf.trades.count() >= entries.sum()
+        assert pf.value().index.tz is None
+
+    def test_vol_sized_backtest_native_matches_vbt(self) -> None:
+        pytest.importorskip("vectorbt")
+        price, entries, exits = self._inputs()
+        vol = price.pct_change().rolling(20).std().bfill()
+        kw = dict(vol_type="realized", risk_budget=0.01, sl_stop=0.05)
+        native = run_vol_sized_backtest(
+            price, entries, exits, vol, engine="native", **kw
+        )
+        ref = run_vol_sized_backtest(price, entries, exits, vol, engine="vbt", **kw)
+        np.testing.assert_allclose(native.value(), ref.value(), rtol=1e-10)
+        got = compute_comparison_metrics(native)
+        exp = compute_comparison_metrics(ref)
+        assert got == pytest.approx(exp, rel=1e-9, nan_ok=True)
@@ -0,0 +1,273 @@
+"""Tests for the column-batched signal engine and the batched sweep paths."""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.backtests import bakeoff_orchestrator, vbt_runner
+from ta_lab2.backtests.bakeoff_orchestrator import (
+    BakeoffConfig,
+    _batch_cv_results,
+    build_t1_series,
+    cost_scenario_label,
+    run_cpcv_backtest,
+    run_cpcv_backtest_batch,
+    run_purged_kfold_backtest,
+    run_purged_kfold_backtest_batch,
+)
+from ta_lab2.backtests.costs import KRAKEN_COST_MATRIX, CostModel
+from ta_lab2.backtests.signal_engine import (
+    simulate_batch,
+    simulate_signals,
+    stack_signals,
+)
+from ta_lab2.backtests.vbt_runner import CostModel as RunnerCost
+from ta_lab2.backtests.vbt_runner import Split, sweep_grid
+
+RNG = np.random.default_rng(42)
+
+
+def _price_frame(n: int = 400) -> pd.DataFrame:
+    idx = pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC")
+    close = 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, n)))
+    return pd.DataFrame({"close": close}, index=idx)
+
+
+def _ema_cross(df: pd.DataFrame, fast: int = 5, slow: int = 20, unit: float = 0.0):
+    f = df["close"].ewm(span=fast, adjust=False).mean()
+    s = df["close"].ewm(span=slow, adjust=False).mean()
+    above = f > s
+    entries = above & ~above.shift(1, fill_value=False)
+    exits = ~above & above.shift(1, fill_value=False)
+    size = pd.Series(unit, index=df.index) if unit > 0 else None
+    return entries, exits, size
+
+
+GRID = [
+    {"fast": 5, "slow": 20},
+    {"fast": 10, "slow": 30},
+    {"fast": 3, "slow": 12, "unit": 2.5},
+    {"fast": 8, "slow": 50},
+]
+
+
+class TestSimulateSignals:
+    def test_all_cash_round_trip(self) -> None:
+        close = np.array([10.0, 11.0, 12.0, 9.0])
+        entries = np.array([True, False, False, False])
+        exits = np.array([False, False, True, False])
+        r = simulate_signals(close, entries, exits, fees=0.01)
+
+        units = 1000.0 / 1.01 / 10.0
+        cash = units * 12.0 * 0.99
+        np.testing.assert_allclose(
+            r.value[:, 0], [units * 10.0, units * 11.0, cash, cash]
+        )
+        assert r.trade_count.tolist() == [1]
+        assert r.position[-1, 0] == 0.0
+        assert r.returns[0, 0] == pytest.approx(units * 10.0 / 1000.0 - 1.0)
+
+    def test_conflicting_and_nan_size_ignored(self) -> None:
+        close = np.full(3, 10.0)
+        both = np.array([True, False, False])
+        r = simulate_signals(close, both, both)
+        assert r.trade_count.tolist() == [0]
+
+        r = simulate_signals(
+            close, np.array([True, True, False]), np.zeros(3, bool), [np.nan, 5.0, 1.0]
+        )
+        assert r.position[:, 0].tolist() == [0.0, 5.0, 5.0]
+
+    def test_shape_validation(self) -> None:
+        with pytest.raises(ValueError):
+            simulate_signals(np.ones(3), np.zeros((3, 2), bool), np.zeros((3, 3), bool))
+
+    def test_stack_signals_shifts_and_fills_size(self) -> None:
+        df = _price_frame(30)
+        sigs = [_ema_cross(df, **p) for p in GRID]
+        e, x, sz = stack_signals(sigs, np.arange(10, 30), shift=1)
+        assert e.shape == x.shape == sz.shape == (20, len(GRID))
+        assert not e[0].any()
+        np.testing.assert_array_equal(e[1:, 0], sigs[0][0].iloc[10:29].to_numpy())
+        assert np.isinf(sz[:, 0]).all() and (sz[:, 2] == 2.5).all()
+
+
+class TestVectorbtParity:
+    @pytest.mark.parametrize("fees,slippage", [(0.0, 0.0), (0.0026, 0.001)])
+    def test_random_signals_match_vectorbt(self, fees, slippage) -> None:
+        vbt = pytest.importorskip("vectorbt")
+        n_bars, n_cols = 300, 25
+        close = pd.Series(100.0 * np.exp(np.cumsum(RNG.normal(0, 0.02, n_bars))))
+        entries = RNG.random((n_bars, n_cols)) < 0.06
+        exits = RNG.random((n_bars, n_cols)) < 0.06
+        size = np.where(
+            RNG.random((n_bars, n_cols)) < 0.3,
+            RNG.uniform(0.5, 20.0, (n_bars, n_cols)),
+            np.inf,
+        )
+        size[RNG.random((n_bars, n_cols)) < 0.05] = np.nan
+
+        pf = vbt.Portfolio.from_signals(
+            close,
+            entries=entries,
+            exits=exits,
+            size=size,
+            fees=fees,
+            slippage=slippage,
+            init_cash=1_000.0,
+            freq="D",
+        )
+        cost = CostModel(fee_bps=fees * 1e4, slippage_bps=slippage * 1e4)
+        r = simulate_batch(close, entries, exits, size, cost, engine="numba")
+
+        np.testing.assert_allclose(r.value, pf.value().to_numpy(), rtol=1e-12)
+        np.testing.assert_allclose(r.returns, pf.returns().to_numpy(), atol=1e-14)
+        np.testing.assert_allclose(r.position, pf.assets().to_numpy(), rtol=1e-12)
+        np.testing.assert_array_equal(r.trade_count, pf.trades.count().to_numpy())
+
+
+class TestBatchedSweepGrid:
+    SPLITS = [
+        Split(
+            "is",
+            pd.Timestamp("2020-01-01", tz="UTC"),
+            pd.Timestamp("2020-08-31", tz="UTC"),
+        ),
+        Split(
+            "oos",
+            pd.Timestamp("2020-09-01", tz="UTC"),
+            pd.Timestamp("2021-02-03", tz="UTC"),
+        ),
+    ]
+    COST = RunnerCost(fee_bps=10, slippage_bps=5)
+
+    @pytest.mark.parametrize("engine", ["vbt", "numba"])
+    def test_batched_matches_loop(self, engine) -> None:
+        pytest.importorskip("vectorbt")
+        df = _price_frame()
+        loop = sweep_grid(df, _ema_cross, GRID, self.SPLITS, self.COST)
+        batch = sweep_grid(
+            df, _ema_cross, GRID, self.SPLITS, self.COST, batched=True, engine=engine
+        )
+        assert [(r.split, r.params) for r in batch.rows] == [
+            (r.split, r.params) for r in loop.rows
+        ]
+        for b, u in zip(batch.rows, loop.rows):
+            assert b.trades == u.trades
+            for field in (
+                "total_return",
+                "cagr",
+                "mdd",
+                "mar",
+                "sharpe",
+                "equity_last",
+            ):
+                assert getattr(b, field) == pytest.approx(getattr(u, field), rel=1e-9)
+
+
+def _record_engines(monkeypatch, module) -> list:
+    """Patch module.simulate_batch to log the engine and run natively."""
+    seen: list[str] = []
+
+    def spy(*args, engine: str = "auto", **kwargs):
+        seen.append(engine)
+        return simulate_batch(*args, engine="numba", **kwargs)
+
+    monkeypatch.setattr(module, "simulate_batch", spy)
+    return seen
+
+
+@pytest.mark.parametrize("installed, expected", [(False, "numba"), (True, "vbt")])
+def test_batch_engine_follows_single_path(monkeypatch, installed, expected) -> None:
+    # without an explicit engine the batch paths pick what the per-param
+    # paths pick: vectorbt when importable, else the native engine
+    df = _price_frame()
+    for module in (vbt_runner, bakeoff_orchestrator):
+        monkeypatch.setattr(module, "vbt", object() if installed else None)
+    seen = _record_engines(monkeypatch, vbt_runner)
+    sweep_grid(
+        df, _ema_cross, GRID, TestBatchedSweepGrid.SPLITS, RunnerCost(), batched=True
+    )
+    assert seen == [expected] * 2
+
+    seen = _record_engines(monkeypatch, bakeoff_orchestrator)
+    config = BakeoffConfig(n_folds=3, embargo_bars=5)
+    run_purged_kfold_backtest_batch(
+        df, _ema_cross, GRID, build_t1_series(df.index), KRAKEN_COST_MATRIX[0], config
+    )
+    assert seen == [expected] * config.n_folds
+
+
+class TestBatchedBakeoff:
+    CONFIG = BakeoffConfig(n_folds=5, embargo_bars=5, cpcv_n_test_splits=2)
+
+    def test_batch_matches_per_param_runs(self) -> None:
+        pytest.importorskip("vectorbt")
+        df = _price_frame()
+        t1 = build_t1_series(df.index)
+        funded = next(c for c in KRAKEN_COST_MATRIX if c.funding_bps_day > 0)
+
+        for cost in (KRAKEN_COST_MATRIX[0], funded):
+            for single_fn, batch_fn in (
+                (run_purged_kfold_backtest, run_purged_kfold_backtest_batch),
+                (run_cpcv_backtest, run_cpcv_backtest_batch),
+            ):
+                batch = batch_fn(df, _ema_cross, GRID, t1, cost, self.CONFIG)
+                assert len(batch) == len(GRID)
+                for params, got in zip(GRID, batch):
+                    exp = single_fn(df, _ema_cross, params, t1, cost, self.CONFIG)
+                    assert got["trade_count_total"] == exp["trade_count_total"]
+                    assert got["sharpe_mean"] == pytest.approx(exp["sharpe_mean"])
+                    assert got["pbo_prob"] == pytest.approx(
+                        exp["pbo_prob"], nan_ok=True
+                    )
+                    for g, e in zip(got["fold_metrics"], exp["fold_metrics"]):
+                        assert (g.fold_idx, g.test_start, g.test_end) == (
+                            e.fold_idx,
+                            e.test_start,
+                            e.test_end,
+                        )
+                        np.testing.assert_allclose(g.oos_returns, e.oos_returns)
+
+    def test_failed_signal_yields_empty_result(self) -> None:
+        df = _price_frame()
+        t1 = build_t1_series(df.index)
+        grid = [{"fast": 5, "slow": 20}, {"bogus": 1}]
+        res = run_purged_kfold_backtest_batch(
+            df, _ema_cross, grid, t1, KRAKEN_COST_MATRIX[0], self.CONFIG
+        )
+        assert len(res[0]["fold_metrics"]) == self.CONFIG.n_folds
+        assert res[1]["fold_metrics"] == []
+
+    def test_existing_jobs_skipped_only_without_overwrite(self) -> None:
+        df = _price_frame()
+        t1 = build_t1_series(df.index)
+        cost = KRAKEN_COST_MATRIX[0]
+        label = cost_scenario_label(cost)
+        grid = [{"fast": 5, "slow": 20}, {"fast": 10, "slow": 40}]
+        done = json.dumps(grid[0], sort_keys=True)
+        existing = {("ema", done, label, "purged_kfold")}
+
+        def run(config: BakeoffConfig) -> set:
+            out = _batch_cv_results(
+                df,
+                _ema_cross,
+                [(p, cost) for p in grid],
+                t1,
+                config,
+                None,
+                "purged_kfold",
+                strategy_name="ema",
+                existing_keys=existing,
+            )
+            return {pj for pj, _ in out}
+
+        assert done not in run(self.CONFIG)
+        assert len(run(self.CONFIG)) == 1
+        overwrite = dataclasses.replace(self.CONFIG, overwrite=True)
+        assert done in run(overwrite) and len(run(overwrite)) == 2
@@ -0,0 +1,416 @@
+"""Tests for the binary COPY bulk writer (ta_lab2.db.binary_copy).
+
+The encoder is checked by decoding its PGCOPY output back into Python values;
+copy_upsert is checked against a recording cursor for the SQL it issues, and
+against a real Postgres when TARGET_DB_URL/DATABASE_URL is set.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.db.binary_copy import (
+    CopyStats,
+    bulk_upsert,
+    copy_upsert,
+    encode_copy_binary,
+    staging_types,
+)
+
+RNG = np.random.default_rng(42)
+
+_PG_EPOCH = datetime(2000, 1, 1)
+_FMT = {"int2": "!h", "int4": "!i", "int8": "!q", "float4": "!f", "float8": "!d"}
+
+
+def _decode(payload: bytes, types: list[str]) -> list[tuple]:
+    """Minimal PGCOPY binary decoder for the types the writer emits."""
+    assert payload[:11] == b"PGCOPY\n\xff\r\n\x00"
+    pos = 19
+    rows = []
+    while True:
+        (nfields,) = struct.unpack_from("!h", payload, pos)
+        pos += 2
+        if nfields == -1:
+            assert pos == len(payload)
+            return rows
+        assert nfields == len(types)
+        row = []
+        for typ in types:
+            (length,) = struct.unpack_from("!i", payload, pos)
+            pos += 4
+            if length == -1:
+                row.append(None)
+                continue
+            raw = payload[pos : pos + length]
+            pos += length
+            if typ in _FMT:
+                row.append(struct.unpack(_FMT[typ], raw)[0])
+            elif typ == "bool":
+                row.append(raw == b"\x01")
+            elif typ == "text":
+                row.append(raw.decode("utf-8"))
+            elif typ in ("timestamp", "timestamptz"):
+                us = struct.unpack("!q", raw)[0]
+                ts = _PG_EPOCH + timedelta(microseconds=us)
+                row.append(ts.replace(tzinfo=timezone.utc) if typ[-1] == "z" else ts)
+            elif typ == "date":
+                row.append(
+                    _PG_EPOCH.date() + timedelta(days=struct.unpack("!i", raw)[0])
+                )
+            else:
+                raise AssertionError(f"unexpected type {typ}")
+        rows.append(tuple(row))
+
+
+def _roundtrip(df: pd.DataFrame, chunk_rows: int = 50_000) -> list[tuple]:
+    types = list(staging_types(df).values())
+    payload = b"".join(bytes(c) for c in encode_copy_binary(df, chunk_rows))
+    return _decode(payload, types)
+
+
+class TestStagingTypes:
+    def test_dtype_mapping(self) -> None:
+        df = pd.DataFrame(
+            {
+                "i16": np.array([1], dtype=np.int16),
+                "i32": np.array([1], dtype=np.int32),
+                "i64": [1],
+                "nullable": pd.array([1], dtype="Int64"),
+                "f32": np.array([1.0], dtype=np.float32),
+                "f64": [1.0],
+                "flag": [True],
+                "label": ["1D"],
+                "ts": pd.to_datetime(["2024-01-01"], utc=True),
+                "naive": pd.to_datetime(["2024-01-01"]),
+                "day": [date(2024, 1, 1)],
+                "obj_float": pd.Series([1.5], dtype=object),
+            }
+        )
+        assert staging_types(df) == {
+            "i16": "int2",
+            "i32": "int4",
+            "i64": "int8",
+            "nullable": "int8",
+            "f32": "float4",
+            "f64": "float8",
+            "flag": "bool",
+            "label": "text",
+            "ts": "timestamptz",
+            "naive": "timestamp",
+            "day": "date",
+            "obj_float": "float8",
+        }
+
+    def test_timedelta_rejected(self) -> None:
+        with pytest.raises(TypeError):
+            staging_types(pd.DataFrame({"d": pd.to_timedelta([1], unit="D")}))
+
+
+class TestEncoder:
+    def test_roundtrip_values_and_nulls(self) -> None:
+        ts = pd.to_datetime(
+            ["2024-03-01 12:00:00.123456", None, "1999-12-31 00:00:00.000000"], utc=True
+        )
+        df = pd.DataFrame(
+            {
+                "id": [1, 2, 3],
+                "x": [1.25, np.nan, -3.5],
+                "n": pd.array([7, None, -1], dtype="Int64"),
+                "flag": pd.array([True, None, False], dtype="boolean"),
+                "tf": ["1D", None, "7D_CAL_ISO"],
+                "ts": ts,
+                "day": [date(2024, 1, 2), None, date(1990, 5, 6)],
+            }
+        )
+        rows = _roundtrip(df)
+        assert rows == [
+            (
+                1,
+                1.25,
+                7,
+                True,
+                "1D",
+                datetime(2024, 3, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+                date(2024, 1, 2),
+            ),
+            (2, None, None, None, None, None, None),
+            (
+                3,
+                -3.5,
+                -1,
+                False,
+                "7D_CAL_ISO",
+                datetime(1999, 12, 31, tzinfo=timezone.utc),
+                date(1990, 5, 6),
+            ),
+        ]
+
+    def test_chunking_preserves_rows(self) -> None:
+        n = 1_003
+        labels = np.array(["1D", "7D", "héllo", ""], dtype=object)
+        df = pd.DataFrame(
+            {
+                "id": np.arange(n),
+                "v": RNG.normal(size=n),
+                "tf": labels[RNG.integers(0, 4, n)],
+            }
+        )
+        chunks = list(encode_copy_binary(df, chunk_rows=100))
+        assert len(chunks) == 2 + 11  # header + 11 chunks + trailer
+        rows = _roundtrip(df, chunk_rows=100)
+        assert [r[0] for r in rows] == list(range(n))
+        np.testing.assert_array_equal([r[1] for r in rows], df["v"].to_numpy())
+        assert [r[2] for r in rows] == df["tf"].tolist()
+
+    def test_all_null_text_column(self) -> None:
+        df = pd.DataFrame({"a": [1, 2], "b": [None, None]})
+        assert _roundtrip(df) == [(1, None), (2, None)]
+
+    def test_empty_frame(self) -> None:
+        df = pd.DataFrame({"a": pd.Series([], dtype=np.int64)})
+        assert _roundtrip(df) == []
+
+    def test_chunk_rows_must_be_positive(self) -> None:
+        with pytest.raises(ValueError):
+            encode_copy_binary(pd.DataFrame({"a": [1]}), chunk_rows=0)
+
+
+class _RecordingCursor:
+    """psycopg2-shaped cursor that records SQL and drains COPY input."""
+
+    def __init__(self, target_types: dict[str, str]):
+        self.sql: list[str] = []
+        self.copied = b""
+        self.rowcount = -1
+        self._target_types = target_types
+        self._result: list[tuple] = []
+
+    def execute(self, sql, params=None):
+        self.sql.append(" ".join(sql.split()))
+        if "pg_attribute" in sql:
+            self._result = list(self._target_types.items())
+        elif sql.lstrip().startswith("INSERT"):
+            self.rowcount = 2
+
+    def fetchall(self):
+        return self._result
+
+    def copy_expert(self, sql, file, size=8192):
+        self.sql.append(sql)
+        while chunk := file.read(size):
+            self.copied += chunk
+
+    def close(self):
+        pass
+
+
+class _RecordingConn:
+    def __init__(self, cursor: _RecordingCursor):
+        self._cursor = cursor
+
+    def cursor(self):
+        return self._cursor
+
+
+class TestCopyUpsert:
+    DF = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "tf": ["1D", "1D"],
+            "payload": ['{"a": 1}', None],
+            "v": [1.0, 2.0],
+        }
+    )
+    TYPES = {"id": "integer", "tf": "text", "payload": "jsonb", "v": "numeric"}
+
+    def test_sql_and_stats(self) -> None:
+        cur = _RecordingCursor(self.TYPES)
+        stats = copy_upsert(_RecordingConn(cur), "public.t", self.DF, ["id", "tf"])
+
+        staging = re.match(r"CREATE TEMP TABLE (\w+) ", cur.sql[0]).group(1)
+        assert staging.startswith("_bulk_copy_staging_")
+        assert cur.sql[0].startswith(
+            f"CREATE TEMP TABLE {staging} "
+            '("id" int8, "tf" text, "payload" text, "v" float8)'
+        )
+        assert cur.sql[1].startswith(
+            f'COPY {staging} ("id", "tf", "payload", "v") FROM STDIN'
+        )
+        assert "FORMAT binary" in cur.sql[1]
+        insert = next(s for s in cur.sql if s.startswith("INSERT"))
+        assert insert.startswith(
+            'INSERT INTO "public"."t" ("id", "tf", "payload", "v")'
+        )
+        # text staged into a jsonb column needs an explicit cast; numbers don't
+        assert f'SELECT "id", "tf", "payload"::jsonb, "v" FROM {staging}' in insert
+        assert cur.sql[-1] == f"DROP TABLE {staging}"
+        assert insert.endswith(
+            'ON CONFLICT ("id", "tf") DO UPDATE SET '
+            '"payload" = EXCLUDED."payload", "v" = EXCLUDED."v"'
+        )
+        assert _decode(cur.copied, ["int8", "text", "text", "float8"]) == [
+            (1, "1D", '{"a": 1}', 1.0),
+            (2, "1D", None, 2.0),
+        ]
+        assert isinstance(stats, CopyStats)
+        assert stats.rows == 2
+        assert stats.bytes == len(cur.copied)
+        assert stats.affected == 2
+
+    def test_plain_insert_and_do_nothing(self) -> None:
+        cur = _RecordingCursor(self.TYPES)
+        copy_upsert(_RecordingConn(cur), "public.t", self.DF)
+        insert = next(s for s in cur.sql if s.startswith("INSERT"))
+        assert "ON CONFLICT" not in insert
+
+        cur = _RecordingCursor(self.TYPES)
+        copy_upsert(_RecordingConn(cur), "public.t", self.DF, ["id"], update_cols=[])
+        insert = next(s for s in cur.sql if s.startswith("INSERT"))
+        assert insert.endswith('ON CONFLICT ("id") DO NOTHING')
+
+    def test_duplicate_conflict_keys_are_collapsed(self) -> None:
+        df = pd.concat([self.DF, self.DF.assign(v=[10.0, 20.0])], ignore_index=True)
+        cur = _RecordingCursor(self.TYPES)
+        stats = copy_upsert(_RecordingConn(cur), "public.t", df, ["id", "tf"])
+        rows = _decode(cur.copied, ["int8", "text", "text", "float8"])
+        assert [r[3] for r in rows] == [10.0, 20.0]  # DO UPDATE: last row wins
+        assert stats.rows == 2
+
+        cur = _RecordingCursor(self.TYPES)
+        copy_upsert(_RecordingConn(cur), "public.t", df, ["id"], update_cols=[])
+        rows = _decode(cur.copied, ["int8", "text", "text", "float8"])
+        assert [r[3] for r in rows] == [1.0, 2.0]  # DO NOTHING: first row wins
+
+    def test_staging_table_is_unique_per_call(self) -> None:
+        names = set()
+        for _ in range(2):
+            cur = _RecordingCursor(self.TYPES)
+            copy_upsert(_RecordingConn(cur), "public.t", self.DF, ["id", "tf"])
+            names.add(cur.sql[0].split()[3])
+        assert len(names) == 2
+
+    def test_stamp_cols_set_on_insert_and_changing_update(self) -> None:
+        cur = _RecordingCursor({**self.TYPES, "ingested_at": "timestamptz"})
+        df = self.DF.assign(ingested_at=pd.Timestamp("2020-01-01", tz="UTC"))
+        copy_upsert(
+            _RecordingConn(cur),
+            "public.t",
+            df,
+            ["id", "tf"],
+            stamp_cols=["ingested_at"],
+        )
+        # The frame's ingested_at is never copied: now() is used instead
+        assert "ingested_at" not in cur.sql[0]
+        insert = next(s for s in cur.sql if s.startswith("INSERT"))
+        assert insert.startswith(
+            'INSERT INTO "public"."t" AS _t ("id", "tf", "payload", "v", "ingested_at") '
+            'SELECT "id", "tf", "payload"::jsonb, "v", now() FROM'
+        )
+        assert insert.endswith(
+            'DO UPDATE SET "payload" = EXCLUDED."payload", "v" = EXCLUDED."v", '
+            '"ingested_at" = now() '
+            'WHERE ROW(_t."payload", _t."v") IS DISTINCT FROM '
+            'ROW(EXCLUDED."payload", EXCLUDED."v")'
+        )
+
+    def test_identifiers_are_quoted(self) -> None:
+        df = pd.DataFrame({"Id": [1], 'odd"name': [2.0], "select": ["x"]})
+        cur = _RecordingCursor({})
+        copy_upsert(_RecordingConn(cur), "My Schema.T", df, ["Id"])
+        assert cur.sql[0].endswith(
+            '("Id" int8, "odd""name" float8, "select" text) ON COMMIT DROP'
+        )
+        assert '("Id", "odd""name", "select") FROM STDIN' in cur.sql[1]
+        insert = next(s for s in cur.sql if s.startswith("INSERT"))
+        assert insert.startswith(
+            'INSERT INTO "My Schema"."T" ("Id", "odd""name", "select") '
+            'SELECT "Id", "odd""name", "select" FROM'
+        )
+        assert insert.endswith(
+            'ON CONFLICT ("Id") DO UPDATE SET '
+            '"odd""name" = EXCLUDED."odd""name", "select" = EXCLUDED."select"'
+        )
+
+    def test_empty_frame_skips_db(self) -> None:
+        stats = copy_upsert(None, "public.t", self.DF.iloc[:0], ["id"])
+        assert stats.rows == 0 and stats.affected == 0
+
+
+def test_bulk_upsert_roundtrip_postgres(database_engine) -> None:
+    """End-to-end upsert against a real Postgres (skipped without a DB URL)."""
+    from sqlalchemy import text
+
+    table = "public._binary_copy_test"
+    with database_engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(
+            text(
+                f"CREATE TABLE {table} (id integer, tf text, ts timestamptz, "
+                "v double precision, PRIMARY KEY (id, tf))"
+            )
+        )
+    try:
+        ts = pd.to_datetime(["2024-01-01", "2024-01-02"], utc=True)
+        df = pd.DataFrame(
+            {"id": [1, 2], "tf": ["1D", "1D"], "ts": ts, "v": [1.0, None]}
+        )
+        bulk_upsert(database_engine, table, df, ["id", "tf"])
+        stats = bulk_upsert(
+            database_engine, table, df.assign(v=[3.0, 4.0]), ["id", "tf"]
+        )
+        assert stats.affected == 2
+        with database_engine.connect() as conn:
+            got = conn.execute(text(f"SELECT id, ts, v FROM {table} ORDER BY id")).all()
+        assert [(r[0], r[2]) for r in got] == [(1, 3.0), (2, 4.0)]
+        assert got[0][1] == ts[0].to_pydatetime()
+    finally:
+        with database_engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+def test_stamp_cols_track_in_place_restatement_postgres(database_engine) -> None:
+    """Restating a row in place re-stamps it; identical rewrites do not."""
+    from sqlalchemy import text
+
+    table = "public._binary_copy_stamp_test"
+    with database_engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(
+            text(
+                f"CREATE TABLE {table} (id integer PRIMARY KEY, v double precision, "
+                "ingested_at timestamptz)"
+            )
+        )
+
+    def stamps() -> dict:
+        with database_engine.connect() as conn:
+            rows = conn.execute(text(f"SELECT id, ingested_at FROM {table}")).all()
+        return dict(rows)
+
+    try:
+        df = pd.DataFrame({"id": [1, 2], "v": [1.0, 2.0]})
+        bulk_upsert(database_engine, table, df, ["id"], stamp_cols=["ingested_at"])
+        first = stamps()
+        assert all(ts is not None for ts in first.values())
+
+        stats = bulk_upsert(
+            database_engine,
+            table,
+            df.assign(v=[1.0, 2.5]),
+            ["id"],
+            stamp_cols=["ingested_at"],
+        )
+        assert stats.affected == 1  # the unchanged row is not touched
+        second = stamps()
+        assert second[1] == first[1]
+        assert second[2] > first[2]
+    finally:
+        with database_engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
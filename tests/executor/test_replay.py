@@ -0,0 +1,173 @@
+"""
+Unit tests for the tick recorder and the offline replay harness.
+
+No network or database required: ticks are recorded to a temporary
+directory and replayed through PriceCache into a ReplayStopMonitor backed by
+a LocalOrderStore.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from ta_lab2.executor.price_cache import PriceCache
+from ta_lab2.executor.replay import LocalOrderStore, ReplayDriver, ReplayStopMonitor
+from ta_lab2.executor.tick_recorder import (
+    TICK_DTYPE,
+    VENUES,
+    TickRecorder,
+    load_ticks,
+    read_ticks,
+)
+from ta_lab2.executor.ws_feeds import FeedHub
+
+# 2026-03-01 23:59:58 UTC: the session crosses midnight
+T0 = datetime(2026, 3, 1, 23, 59, 58, tzinfo=timezone.utc).timestamp()
+
+
+def _order(order_id: str, asset_id: int, side: str, stop=None, tp=None) -> dict:
+    return {
+        "order_id": order_id,
+        "asset_id": asset_id,
+        "side": side,
+        "stop_price": None if stop is None else Decimal(stop),
+        "tp_price": None if tp is None else Decimal(tp),
+        "quantity": Decimal("2"),
+        "avg_cost_basis": Decimal("100"),
+        "exchange": "paper",
+        "strategy_id": 0,
+    }
+
+
+@pytest.fixture()
+def session(tmp_path):
+    """BTC path 100 -> 95 -> 85 -> 125 and ETH 10 -> 12 over 4 seconds."""
+    path = [100.0, 98.0, 95.0, 89.0, 85.0, 90.0, 110.0, 125.0]
+    with TickRecorder(tmp_path, chunk_records=3) as rec:
+        for i, px in enumerate(path):
+            rec.record("BTC", px, asset_id=1, venue="kraken", ts=T0 + 0.5 * i)
+            rec.record("ETH", 10.0 + 0.25 * i, 2, "coinbase", ts=T0 + 0.5 * i + 0.1)
+        rec.record("DOGE", 0.2, venue="hyperliquid", ts=T0 + 3.9)
+    return tmp_path
+
+
+class TestTickRecorder:
+    def test_roundtrip_across_day_files(self, session) -> None:
+        files = sorted(p.name for p in session.glob("ticks_*.bin"))
+        assert files == ["ticks_20260301.bin", "ticks_20260302.bin"]
+        first = read_ticks(session / files[0])
+        assert first.dtype == TICK_DTYPE and len(first) == 8  # ts < T0 + 2
+        # close() truncates to the committed records
+        assert (session / files[0]).stat().st_size == 32 * (1 + 8)
+
+        ticks = load_ticks(session)
+        assert len(ticks) == 17
+        assert (np.diff(ticks["ts"]) >= 0).all()
+        btc = ticks[ticks["symbol"] == b"BTC"]
+        np.testing.assert_array_equal(btc["price"][:3], [100.0, 98.0, 95.0])
+        assert set(btc["asset_id"]) == {1}
+        assert VENUES[btc["venue"][0]] == "kraken"
+        doge = ticks[-1]
+        assert doge["symbol"] == b"DOGE" and doge["asset_id"] == -1
+
+        window = load_ticks(session, start=T0 + 1.0, end=T0 + 2.0)
+        assert len(window) == 4
+
+    def test_reopen_appends(self, session) -> None:
+        with TickRecorder(session) as rec:
+            rec.record("BTC", 1.0, asset_id=1, ts=T0 + 4.0)
+        assert len(load_ticks(session)) == 18
+
+    def test_feed_hub_records_normalised_ticks(self, tmp_path) -> None:
+        with TickRecorder(tmp_path) as rec:
+            hub = FeedHub(
+                PriceCache(),
+                asset_symbols={1: "BTC"},
+                kraken_symbols=["BTC/USD"],
+                recorder=rec,
+            )
+            hub.ingest(
+                "kraken",
+                {
+                    "channel": "ticker",
+                    "data": [
+                        {"symbol": "BTC/USD", "last": 95000.5},
+                    ],
+                },
+            )
+            hub.ingest(
+                "hyperliquid",
+                {
+                    "channel": "allMids",
+                    "data": {
+                        "mids": {"BTC": "95001", "kPEPE": "0.01"},
+                    },
+                },
+            )
+        ticks = load_ticks(tmp_path)
+        assert list(ticks["symbol"]) == [b"BTC", b"BTC", b"KPEPE"]
+        # Only the primary venue (Hyperliquid) writes the asset's slot
+        assert list(ticks["asset_id"]) == [-1, 1, -1]
+        assert [VENUES[v] for v in ticks["venue"]] == [
+            "kraken",
+            "hyperliquid",
+            "hyperliquid",
+        ]
+
+        cache = PriceCache()
+        ReplayDriver(ticks, cache).run()
+        assert cache.get(1) == Decimal("95001.0")
+        assert cache.get("kraken:BTC") == Decimal("95000.5")
+
+
+class TestReplay:
+    def _run(self, session, speed=None):
+        cache = PriceCache()
+        store = LocalOrderStore(
+            [
+                _order("stop", 1, "buy", stop="90", tp="120"),
+                _order("tp", 2, "sell", tp="9.5"),
+            ]
+        )
+        monitor = ReplayStopMonitor(cache, store, symbol_map={1: "BTC", 2: "ETH"})
+        stats = ReplayDriver(load_ticks(session), cache, speed=speed).run(monitor)
+        return cache, store, stats
+
+    def test_max_speed_is_deterministic(self, session) -> None:
+        cache, store, stats = self._run(session)
+        assert stats.n_ticks == 17 and stats.n_triggers == 1
+        assert store.fills == [
+            {
+                "order_id": "stop",
+                "asset_id": 1,
+                "trigger_type": "STOP",
+                "price": Decimal("89.0"),
+                "fill_price": Decimal("89.0") * Decimal("0.9995"),
+                "quantity": Decimal("2"),
+            }
+        ]
+        # Short ETH take-profit at 9.5 is never reached (ETH 10 -> 11.75)
+        assert [o["order_id"] for o in store.open_orders()] == ["tp"]
+        assert stats.trigger_latency["count"] == 1
+        assert cache.get(1) == Decimal("125.0")
+        assert cache.get("DOGE") == Decimal("0.2")
+
+        _, again, _ = self._run(session)
+        assert again.fills == store.fills
+
+    def test_paced_replay(self, session) -> None:
+        start = time.perf_counter()
+        _, store, stats = self._run(session, speed=20.0)
+        elapsed = time.perf_counter() - start
+        assert stats.session_seconds == pytest.approx(3.9)
+        assert elapsed >= 3.9 / 20.0
+        assert len(store.fills) == 1
+
+    def test_rejects_bad_speed(self, session) -> None:
+        with pytest.raises(ValueError, match="speed"):
+            ReplayDriver(load_ticks(session), PriceCache(), speed=0)
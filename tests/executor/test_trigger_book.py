@@ -0,0 +1,164 @@
+"""
+Unit tests for TriggerBook, PriceCache tick publishing and the event-driven
+StopMonitor trigger path.
+
+No database required: StopMonitor's DB load and trigger execution are
+replaced on the instance.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from ta_lab2.executor.price_cache import PriceCache
+from ta_lab2.executor.stop_monitor import StopMonitor
+from ta_lab2.executor.trigger_book import LatencyTracker, TriggerBook
+
+
+def _order(order_id: str, asset_id: int, side: str, stop=None, tp=None) -> dict:
+    return {
+        "order_id": order_id,
+        "asset_id": asset_id,
+        "side": side,
+        "stop_price": None if stop is None else Decimal(stop),
+        "tp_price": None if tp is None else Decimal(tp),
+        "quantity": Decimal("1"),
+        "avg_cost_basis": Decimal("100"),
+        "exchange": "paper",
+        "strategy_id": 0,
+    }
+
+
+# ---------------------------------------------------------------------------
+# TriggerBook
+# ---------------------------------------------------------------------------
+
+
+class TestTriggerBook:
+    def test_long_and_short_levels_fire_on_cross_only(self) -> None:
+        book = TriggerBook()
+        book.add("long", "BTC", True, Decimal("90"), Decimal("110"))
+        book.add("short", "BTC", False, Decimal("105"), Decimal("80"))
+        assert len(book) == 4
+
+        assert book.on_price("BTC", 100.0) == []
+        assert book.on_price("ETH", 1.0) == []
+
+        fired = book.on_price("BTC", 105.0)  # short stop (>= 105)
+        assert [(t.order_id, t.trigger_type) for t in fired] == [("short", "STOP")]
+        assert len(book) == 2  # both short levels removed
+
+        fired = book.on_price("BTC", 90.0)  # long stop (<= 90), inclusive
+        assert [(t.order_id, t.trigger_type, t.level) for t in fired] == [
+            ("long", "STOP", Decimal("90"))
+        ]
+        assert len(book) == 0
+
+    def test_gap_fires_all_crossed_levels_once_per_group(self) -> None:
+        book = TriggerBook()
+        for i, stop in enumerate(("99", "95", "91")):
+            book.add(f"o{i}", "BTC", True, Decimal(stop), None, group=i)
+        book.add("dup", "BTC", True, Decimal("98"), None, group=0)
+
+        fired = book.on_price("BTC", 94.0)
+        assert sorted(t.order_id for t in fired) == ["o0", "o1"]
+        assert [t.order_id for t in book.on_price("BTC", 50.0)] == ["o2"]
+
+    def test_stop_wins_over_tp_in_same_group(self) -> None:
+        book = TriggerBook()
+        book.add("tp", "BTC", True, None, Decimal("100"), group=1)
+        book.add("sl", "BTC", False, Decimal("100"), None, group=1)
+        fired = book.on_price("BTC", 101.0)
+        assert [(t.order_id, t.trigger_type) for t in fired] == [("sl", "STOP")]
+
+    def test_remove_group_and_symbols(self) -> None:
+        book = TriggerBook()
+        book.add("a", "BTC", True, Decimal("90"), None, group=1)
+        book.add("b", "ETH", True, Decimal("9"), None, group=2)
+        book.remove_group(1)
+        assert book.symbols() == ["ETH"]
+        assert book.on_price("BTC", 1.0) == []
+
+
+class TestLatencyTracker:
+    def test_snapshot(self) -> None:
+        tracker = LatencyTracker(window=4)
+        assert tracker.snapshot() == {"count": 0}
+        for s in (0.001, 0.002, 0.003, 0.004, 0.010):
+            tracker.record(s)
+        snap = tracker.snapshot()
+        assert snap["count"] == 5
+        assert snap["last_ms"] == 10.0
+        assert snap["max_ms"] == 10.0
+        assert snap["p50_ms"] == 3.0  # window holds the last 4 samples
+
+
+# ---------------------------------------------------------------------------
+# PriceCache tick publishing
+# ---------------------------------------------------------------------------
+
+
+class TestPriceCacheSubscribe:
+    def test_listeners_receive_ticks_and_errors_are_contained(self) -> None:
+        cache = PriceCache()
+        seen = []
+
+        def bad(sym, px, t):
+            raise RuntimeError("boom")
+
+        cache.subscribe(bad)
+        cache.subscribe(lambda sym, px, t: seen.append((sym, px)))
+        cache.update("BTC", 95000.5)
+        assert seen == [("BTC", Decimal("95000.5"))]
+        assert cache.get("BTC") == Decimal("95000.5")
+
+        cache.unsubscribe(bad)
+        cache.update("BTC", 1.0)
+        assert len(seen) == 2
+
+
+# ---------------------------------------------------------------------------
+# StopMonitor event path
+# ---------------------------------------------------------------------------
+
+
+def _monitor(orders: list[dict], cache: PriceCache):
+    monitor = StopMonitor(engine=None, price_cache=cache, poll_interval_secs=0.01)
+    monitor._symbol_map = {1: "BTC", 2: "ETH"}
+    monitor._load_open_stop_tp_orders = lambda: list(orders)
+    fired = []
+    monitor._trigger_stop_tp = lambda order, price, symbol, kind: fired.append(
+        (order["order_id"], price, symbol, kind)
+    )
+    cache.subscribe(monitor._on_tick)
+    return monitor, fired
+
+
+class TestStopMonitorEvents:
+    def test_tick_crossing_level_triggers_once(self) -> None:
+        cache = PriceCache()
+        orders = [
+            _order("o1", 1, "buy", stop="90", tp="120"),
+            _order("o2", 2, "sell", stop="11"),
+        ]
+        monitor, fired = _monitor(orders, cache)
+        monitor._maybe_refresh_orders()
+
+        cache.update("BTC", 95.0)
+        cache.update("ETH", 10.0)
+        assert monitor._process_triggers(timeout=0.01) == 0
+
+        cache.update("BTC", 89.5)
+        cache.update("BTC", 89.0)  # level already consumed
+        assert monitor._process_triggers(timeout=0.01) == 1
+        assert fired == [("o1", Decimal("89.5"), "BTC", "STOP")]
+        assert monitor.latency_stats()["count"] == 1
+
+    def test_refresh_sweeps_already_crossed_levels(self) -> None:
+        cache = PriceCache()
+        cache.update("ETH", 12.0)
+        monitor, fired = _monitor([_order("o2", 2, "sell", stop="11")], cache)
+        monitor._maybe_refresh_orders()
+        assert monitor._process_triggers(timeout=0.01) == 1
+        assert fired == [("o2", Decimal("12.0"), "ETH", "STOP")]
+        assert monitor.latency_stats() == {"count": 0}  # sweep, not a tick
@@ -0,0 +1,275 @@
+"""
+Unit tests for the array-backed PriceCache and the single-loop FeedHub.
+
+No network required: venue messages are fed to ``FeedHub.ingest`` directly,
+and the connection loop runs against an in-memory fake ``connect``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from ta_lab2.executor.price_cache import PriceCache
+from ta_lab2.executor.ws_feeds import FeedHub, normalize_symbol, split_symbol
+
+# ---------------------------------------------------------------------------
+# PriceCache
+# ---------------------------------------------------------------------------
+
+
+class TestPriceCache:
+    def test_bind_aliases_symbol_and_asset(self) -> None:
+        cache = PriceCache()
+        cache.update("ETH", 3000.25)  # priced before binding: slot is kept
+        cache.bind("ETH", 2)
+        assert cache.get(2) == Decimal("3000.25")
+        cache.update(2, 3001.0)
+        assert cache.get("ETH") == Decimal("3001.0")
+        assert cache.asset_id("ETH") == 2
+        assert cache.all_symbols() == ["ETH"]
+        assert len(cache) == 1
+
+        cache.bind("BTC", 1)
+        with pytest.raises(ValueError, match="different slots"):
+            cache.bind("ETH", 1)
+
+    def test_unpriced_and_stale(self) -> None:
+        cache = PriceCache()
+        cache.bind("SOL", 5)
+        assert cache.get("SOL") is None
+        assert cache.get_with_age(5) == (None, float("inf"))
+        assert cache.is_stale("SOL")
+        assert len(cache) == 0
+
+        cache.update("SOL", 150.0)
+        price, age = cache.get_with_age("SOL")
+        assert price == Decimal("150.0") and 0.0 <= age < 5.0
+        assert cache.stale_symbols(max_age_seconds=60) == []
+        assert cache.stale_symbols(max_age_seconds=-1) == ["SOL"]
+
+    def test_history_ring(self) -> None:
+        cache = PriceCache(history=4)
+        ts, px = cache.history("BTC")
+        assert ts.size == px.size == 0
+        for p in (1.0, 2.0, 3.0):
+            cache.update("BTC", p)
+        np.testing.assert_array_equal(cache.history("BTC")[1], [1.0, 2.0, 3.0])
+        for p in (4.0, 5.0, 6.0):
+            cache.update("BTC", p)
+        ts, px = cache.history("BTC")
+        np.testing.assert_array_equal(px, [3.0, 4.0, 5.0, 6.0])
+        assert (np.diff(ts) >= 0).all()
+
+    def test_growth_keeps_prices_and_history(self) -> None:
+        cache = PriceCache(history=2, capacity=2)
+        for i in range(9):
+            cache.update(f"S{i}", float(i))
+            cache.update(f"S{i}", float(i) + 0.5)
+        assert len(cache) == 9
+        assert cache.get("S0") == Decimal("0.5")
+        np.testing.assert_array_equal(cache.history("S1")[1], [1.0, 1.5])
+        np.testing.assert_array_equal(cache.history("S8")[1], [8.0, 8.5])
+
+    def test_growth_keeps_concurrent_writes(self) -> None:
+        cache = PriceCache(capacity=1)
+        slot = cache.slot("BTC")
+        done = threading.Event()
+        last = []
+
+        def _writer() -> None:
+            i = 0
+            while not done.is_set():
+                i += 1
+                cache.update_slot(slot, float(i))
+            last.append(float(i))
+
+        t = threading.Thread(target=_writer)
+        t.start()
+        for i in range(2000):  # ~11 doublings while the writer runs
+            cache.slot(f"S{i}")
+        done.set()
+        t.join()
+        assert cache.get_float("BTC") == last[0]
+
+    def test_listener_gets_slot_name_and_float(self) -> None:
+        cache = PriceCache()
+        cache.bind("BTC", 1)
+        seen = []
+        cache.subscribe(lambda sym, px, t: seen.append((sym, px)))
+        cache.update(1, 95000.5)
+        assert seen == [("BTC", 95000.5)]
+        assert isinstance(seen[0][1], float)
+
+
+# ---------------------------------------------------------------------------
+# FeedHub
+# ---------------------------------------------------------------------------
+
+
+def _hl(**mids: str) -> dict:
+    return {"channel": "allMids", "data": {"mids": mids}}
+
+
+def _kraken(symbol: str, last: float) -> dict:
+    return {
+        "channel": "ticker",
+        "type": "update",
+        "data": [{"symbol": symbol, "last": last}],
+    }
+
+
+def _coinbase(product_id: str, price: str, timestamp: str) -> dict:
+    return {
+        "channel": "ticker",
+        "timestamp": timestamp,
+        "events": [
+            {"type": "update", "tickers": [{"product_id": product_id, "price": price}]}
+        ],
+    }
+
+
+class TestFeedHub:
+    @pytest.mark.parametrize(
+        ("raw", "base"),
+        [("BTC", "BTC"), ("BTC/USD", "BTC"), ("XBT/USD", "BTC"), ("eth-usd", "ETH")],
+    )
+    def test_normalize_symbol(self, raw: str, base: str) -> None:
+        assert normalize_symbol(raw) == base
+
+    def test_split_symbol(self) -> None:
+        assert split_symbol("BTC") == ("BTC", None)
+        assert split_symbol("XBT/EUR") == ("BTC", "EUR")
+        assert split_symbol("eth-usdc") == ("ETH", "USDC")
+
+    def test_primary_venue_owns_the_asset_slot(self) -> None:
+        cache = PriceCache()
+        hub = FeedHub(
+            cache,
+            asset_symbols={1: "BTC", 2: "ETH"},
+            kraken_symbols=["BTC/USD"],
+            coinbase_product_ids=["BTC-USD"],
+        )
+        assert hub.venues == ["hyperliquid", "kraken", "coinbase"]
+        assert hub.primary_venue == "hyperliquid"
+
+        assert hub.ingest("hyperliquid", _hl(BTC="95000.5", ETH="3000", DOGE="0.2"))
+        assert cache.get(1) == Decimal("95000.5")
+        hub.ingest("kraken", _kraken("BTC/USD", 95001.0))
+        hub.ingest("coinbase", _coinbase("BTC-USD", "95002.25", "2026-01-01T00:00:00Z"))
+        assert cache.get(1) == cache.get("BTC") == Decimal("95000.5")
+        assert cache.get("kraken:BTC") == Decimal("95001.0")
+        assert cache.get("coinbase:BTC") == Decimal("95002.25")
+        assert hub.ingest("kraken", {"channel": "heartbeat"}) == 0
+
+        # Unmapped symbols are cached under their base ticker
+        assert cache.get("DOGE") == Decimal("0.2")
+        assert sorted(cache.all_symbols()) == [
+            "BTC",
+            "DOGE",
+            "ETH",
+            "coinbase:BTC",
+            "kraken:BTC",
+        ]
+
+        m = hub.metrics()
+        assert m["hyperliquid"]["ticks"] == 3
+        assert m["hyperliquid"]["unmapped"] == 1
+        assert m["kraken"]["messages"] == 2 and m["kraken"]["ticks"] == 1
+        assert m["coinbase"]["lag"]["count"] == 1
+        assert m["coinbase"]["last_tick_age_s"] < 5.0
+
+    def test_other_quotes_and_perps_leave_usd_spot_alone(self) -> None:
+        cache = PriceCache()
+        hub = FeedHub(
+            cache,
+            asset_symbols={1: "BTC"},
+            kraken_symbols=["BTC/USD", "BTC/EUR"],
+            primary_venue="kraken",
+        )
+        hub.ingest("kraken", _kraken("BTC/USD", 95000.0))
+        assert hub.ingest("kraken", _kraken("BTC/EUR", 88000.0)) == 0
+        hub.ingest("hyperliquid", _hl(BTC="95100"))
+        hub.ingest("hyperliquid", _hl(**{"PURR/USDC": "0.2"}))
+
+        assert cache.get(1) == Decimal("95000.0")
+        assert cache.get("hyperliquid:BTC") == Decimal("95100.0")
+        assert cache.get("BTC/EUR") is None and cache.get("PURR") is None
+        m = hub.metrics()
+        assert m["kraken"]["rejected"] == 1 and m["kraken"]["ticks"] == 1
+        assert m["hyperliquid"]["rejected"] == 1
+
+    def test_unknown_primary_venue_raises(self) -> None:
+        with pytest.raises(ValueError, match="primary_venue"):
+            FeedHub(PriceCache(), primary_venue="kraken")
+
+    def test_lag_from_exchange_timestamp(self) -> None:
+        hub = FeedHub(PriceCache(), hyperliquid=False, coinbase_product_ids=["X"])
+        sent = time.time() - 0.25
+        stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sent))
+        frac = f"{sent % 1:.9f}"[2:]  # nanosecond precision, as Coinbase sends
+        hub.ingest("coinbase", _coinbase("BTC-USD", "1", f"{stamp}.{frac}Z"))
+        lag = hub.metrics()["coinbase"]["lag"]
+        assert 200.0 < lag["last_ms"] < 5000.0
+
+    def test_rate_per_sec(self) -> None:
+        hub = FeedHub(PriceCache(), rate_window=10)
+        hub._sample_rates(now=100.0)
+        for _ in range(20):
+            hub.ingest("hyperliquid", _hl(BTC="1", ETH="2"))
+        hub._sample_rates(now=102.0)
+        assert hub.metrics()["hyperliquid"]["rate_per_sec"] == 20.0
+        hub._sample_rates(now=150.0)  # window drops the old samples
+        assert hub.metrics()["hyperliquid"]["rate_per_sec"] == 0.0
+
+    def test_run_multiplexes_venues_on_one_loop(self) -> None:
+        cache = PriceCache()
+        hub = FeedHub(cache, asset_symbols={1: "BTC"}, kraken_symbols=["BTC/USD"])
+        sent: dict[str, list[str]] = {}
+        frames = {
+            "hyperliquid": [json.dumps(_hl(BTC="10")), "not json"],
+            "kraken": [json.dumps(_kraken("BTC/USD", 11.0))],
+        }
+
+        class _FakeSocket:
+            def __init__(self, url: str, venue: str) -> None:
+                self.url, self.venue = url, venue
+
+            async def send(self, msg: str) -> None:
+                sent.setdefault(self.venue, []).append(msg)
+
+            async def __aiter__(self):
+                for frame in frames[self.venue]:
+                    await asyncio.sleep(0)
+                    yield frame
+
+        def fake_connect(url: str):
+            venue = "kraken" if "kraken" in url else "hyperliquid"
+
+            async def _connections():
+                yield _FakeSocket(url, venue)
+
+            return _connections()
+
+        async def _main() -> None:
+            task = asyncio.ensure_future(hub.run(connect=fake_connect))
+            for _ in range(50):
+                await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(_main())
+        assert json.loads(sent["hyperliquid"][0])["subscription"]["type"] == "allMids"
+        assert json.loads(sent["kraken"][0])["params"]["symbol"] == ["BTC/USD"]
+        assert cache.get(1) in (Decimal("10.0"), Decimal("11.0"))
+        m = hub.metrics()
+        assert m["hyperliquid"]["errors"] == 1
+        assert m["kraken"]["ticks"] == 1
+        assert m["kraken"]["reconnects"] == 1
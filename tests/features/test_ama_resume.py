@@ -0,0 +1,206 @@
+"""Resume-from-state tests for AMA recursions.
+
+resume_ama() continued from ama_state() must reproduce compute_ama() over the
+full history exactly, and BaseAMAFeature.compute_for_asset_tf() resumed from
+checkpoints must emit the same rows (incl. derivatives) as a full recompute.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.features.ama.ama_computations import ama_state, compute_ama, resume_ama
+from ta_lab2.features.ama.ama_multi_timeframe import MultiTFAMAFeature
+from ta_lab2.features.ama.ama_params import ALL_AMA_PARAMS
+from ta_lab2.features.ama.base_ama_feature import AMAFeatureConfig
+
+RNG = np.random.default_rng(42)
+
+CASES = [
+    ("KAMA", {"er_period": 10, "fast_period": 2, "slow_period": 30}),
+    ("KAMA", {"er_period": 1, "fast_period": 2, "slow_period": 30}),
+    ("DEMA", {"period": 9}),
+    ("TEMA", {"period": 21}),
+    ("HMA", {"period": 21}),
+]
+
+
+def _close(n: int) -> np.ndarray:
+    close = 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, n)))
+    close[[50, 51, 200]] = np.nan
+    return close
+
+
+class TestResumeAMA:
+    @pytest.mark.parametrize("indicator,params", CASES)
+    @pytest.mark.parametrize("split", [0, 3, 15, 60, 249])
+    def test_matches_full_history(self, indicator, params, split) -> None:
+        close = _close(300)
+        full_ama, full_er = compute_ama(pd.Series(close), indicator, params)
+
+        state = ama_state(close[:split], indicator, params)
+        ama1, er1, state = resume_ama(close[split:250], indicator, params, state)
+        ama2, er2, _ = resume_ama(close[250:], indicator, params, state)
+
+        np.testing.assert_array_equal(
+            np.concatenate([ama1, ama2]), full_ama.to_numpy()[split:]
+        )
+        if full_er is None:
+            assert er1 is None and er2 is None
+        else:
+            np.testing.assert_array_equal(
+                np.concatenate([er1, er2]), full_er.to_numpy()[split:]
+            )
+
+    def test_unknown_indicator_raises(self) -> None:
+        with pytest.raises(ValueError):
+            ama_state(np.ones(5), "SMA", {})
+        with pytest.raises(ValueError):
+            resume_ama(np.ones(5), "SMA", {}, np.zeros(1))
+
+
+def _row_hash(ts: pd.Series, close: np.ndarray) -> np.ndarray:
+    """Stand-in for ROW_HASH_SQL: 32-bit hash of (ts, close) per row."""
+    raw = [
+        hashlib.md5(struct.pack("<qd", t, c)).digest()[:4]
+        for t, c in zip(pd.DatetimeIndex(ts).as_unit("us").asi8, close)
+    ]
+    return np.array([int.from_bytes(r, "big") for r in raw], dtype=np.int64)
+
+
+class _InMemoryAMAFeature(MultiTFAMAFeature):
+    """MultiTFAMAFeature reading bars (and checkpoint ranges) from a frame."""
+
+    def __init__(self, table: pd.DataFrame) -> None:
+        super().__init__(
+            engine=None,
+            config=AMAFeatureConfig(
+                param_sets=list(ALL_AMA_PARAMS[:6]),
+                output_schema="public",
+                output_table="ama_multi_tf",
+            ),
+        )
+        self.table = table
+
+    def preload_all_bars(self, engine, asset_id, venue_id=1, since=None) -> None:
+        self._bars_since = dict(since or {})
+        keep = pd.Series(True, index=self.table.index)
+        for tf, ts in self._bars_since.items():
+            keep &= (self.table["tf"] != tf) | (self.table["ts"] >= ts)
+        self._bars_cache = self.table[keep].reset_index(drop=True)
+
+    def _read_checkpoint_ranges(self, engine, asset_id, venue_id, ckpts):
+        out = {}
+        for tf, ckpt_ts in ckpts.items():
+            rows = self.table[(self.table["tf"] == tf) & (self.table["ts"] <= ckpt_ts)]
+            at_ckpt = rows[(rows["ts"] == ckpt_ts) & ~rows["roll"]]
+            if not at_ckpt.empty:
+                out[tf] = (len(rows), int(rows["row_hash"].sum()))
+        return out
+
+
+class TestComputeForAssetTfResume:
+    @staticmethod
+    def _bars(n: int, close: np.ndarray) -> pd.DataFrame:
+        ts = pd.date_range("2021-01-01", periods=n, freq="D", tz="UTC")
+        # Partial-bar snapshots (roll=True) between weekly canonical rows
+        roll = (np.arange(n) % 7) != 6
+        return pd.DataFrame(
+            {
+                "id": 1,
+                "venue_id": 1,
+                "ts": ts,
+                "tf": "7D",
+                "tf_days": 7,
+                "roll": roll,
+                "close": close[:n],
+                "is_partial_end": roll,
+                "row_hash": _row_hash(ts, close[:n]),
+            }
+        )
+
+    def _run(self, n, close, states=None, context=None):
+        """Mirror the refresher's --from-state flow for one (asset, TF)."""
+        feature = _InMemoryAMAFeature(self._bars(n, close))
+        resumable = (
+            feature.resumable_tfs(
+                None, 1, 1, feature.config.param_sets, {"7D": states}, context
+            )
+            if states
+            else {}
+        )
+        feature.preload_all_bars(
+            None, 1, 1, since={tf: ts for tf, (ts, _) in resumable.items()}
+        )
+        start_ts, src_range = resumable.get("7D", (None, None))
+        out = feature.compute_for_asset_tf(
+            engine=None,
+            asset_id=1,
+            tf="7D",
+            tf_days=7,
+            param_sets=feature.config.param_sets,
+            start_ts=start_ts,
+            resume_states=states,
+            context=context,
+            src_range=src_range,
+        )
+        return feature, out
+
+    @staticmethod
+    def _states_and_context(feature, out_prev):
+        states = {(c["indicator"], c["params_hash"]): c for c in feature.checkpoints}
+        ckpt_ts = feature.checkpoints[0]["ckpt_ts"]
+        prior = out_prev[out_prev["ts"] <= ckpt_ts].sort_values("ts")
+        context = prior.groupby(
+            ["indicator", "params_hash", "roll"], group_keys=False
+        ).tail(2)
+        return states, context, ckpt_ts
+
+    def test_resumed_rows_match_full_recompute(self) -> None:
+        close = 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, 320)))
+        first, out_first = self._run(250, close)
+        states, context, ckpt_ts = self._states_and_context(first, out_first)
+
+        resumed, out_resumed = self._run(320, close, states, context)
+        full, out_full = self._run(320, close)
+
+        # Only the bars from the checkpoint on are loaded
+        assert resumed._bars_cache["ts"].min() == ckpt_ts
+        assert out_resumed["ts"].min() > ckpt_ts
+        keys = ["indicator", "params_hash", "ts"]
+        expected = (
+            out_full[out_full["ts"] > ckpt_ts].sort_values(keys).reset_index(drop=True)
+        )
+        got = out_resumed.sort_values(keys).reset_index(drop=True)
+        cols = ["ama", "er", "d1", "d2", "d1_roll", "d2_roll", "roll"]
+        pd.testing.assert_frame_equal(got[keys + cols], expected[keys + cols])
+
+        # The new checkpoints carry the same fingerprint as a full run's
+        assert [c["src_hash"] for c in resumed.checkpoints] == [
+            c["src_hash"] for c in full.checkpoints
+        ]
+        for got_ckpt, full_ckpt in zip(resumed.checkpoints, full.checkpoints):
+            np.testing.assert_allclose(got_ckpt["state_vec"], full_ckpt["state_vec"])
+
+    def test_restated_interior_bar_falls_back_to_full(self) -> None:
+        close = 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, 320)))
+        first, out_first = self._run(250, close)
+        states, context, _ = self._states_and_context(first, out_first)
+
+        # A bar well before the checkpoint is restated in place
+        restated = close.copy()
+        restated[20] *= 0.99
+        feature, out = self._run(320, restated, states, context)
+        _, out_full = self._run(320, restated)
+
+        assert feature._bars_since == {}
+        keys = ["indicator", "params_hash", "ts"]
+        pd.testing.assert_frame_equal(
+            out.sort_values(keys).reset_index(drop=True),
+            out_full.sort_values(keys).reset_index(drop=True),
+        )
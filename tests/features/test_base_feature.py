@@ -434,14 +434,16 @@ class TestWriteToDB:
         feature = self.create_feature()
         df = pd.DataFrame()
 
-        with patch.object(pd.DataFrame, "to_sql") as mock_to_sql:
+        with patch(
+            "ta_lab2.scripts.features.base_feature.copy_upsert"
+        ) as mock_copy_upsert:
             result = feature.write_to_db(df)
 
             assert result == 0
-            assert not mock_to_sql.called
+            assert not mock_copy_upsert.called
 
-    def test_write_to_db_calls_to_sql(self):
-        """Test that non-empty df calls pandas to_sql correctly."""
+    def test_write_to_db_calls_copy_upsert(self):
+        """Test that non-empty df is bulk-copied into the output table."""
         feature = self.create_feature()
         df = pd.DataFrame(
             {
@@ -452,15 +454,18 @@ class TestWriteToDB:
 
         with (
             patch.object(feature, "_ensure_output_table"),
-            patch.object(pd.DataFrame, "to_sql", return_value=2) as mock_to_sql,
+            patch.object(feature, "_get_table_columns", return_value=set()),
+            patch(
+                "ta_lab2.scripts.features.base_feature.copy_upsert"
+            ) as mock_copy_upsert,
         ):
             result = feature.write_to_db(df)
 
-            assert mock_to_sql.called
-            # Verify to_sql called with correct parameters
-            call_kwargs = mock_to_sql.call_args[1]
-            assert call_kwargs["schema"] == "public"
-            assert call_kwargs["if_exists"] == "append"
-            assert call_kwargs["index"] is False
+            assert mock_copy_upsert.called
+            # Plain INSERT (no conflict key) into the configured table
+            args = mock_copy_upsert.call_args[0]
+            assert args[1] == "public.test_table"
+            pd.testing.assert_frame_equal(args[2], df)
+            assert len(args) == 3
 
             assert result == 2
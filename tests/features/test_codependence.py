@@ -0,0 +1,150 @@
+"""Tests for the panel codependence engine (features/codependence.py)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.metrics import mutual_info_score
+
+from ta_lab2.features.codependence import (
+    _encoded_mi,
+    codependence_panel,
+    pair_codependence,
+    prepare_series,
+)
+from ta_lab2.features.microstructure import (
+    distance_correlation,
+    distance_covariance,
+    pairwise_mi,
+    quantile_encode,
+    variation_of_information,
+)
+
+
+def _ref_dcov(x: np.ndarray, y: np.ndarray) -> float:
+    """O(n^2) double-centred distance covariance (the original algorithm)."""
+    a = np.abs(x[:, None] - x[None, :])
+    b = np.abs(y[:, None] - y[None, :])
+    A = a - a.mean(axis=1, keepdims=True) - a.mean(axis=0, keepdims=True) + a.mean()
+    B = b - b.mean(axis=1, keepdims=True) - b.mean(axis=0, keepdims=True) + b.mean()
+    return float((A * B).mean())
+
+
+def _ref_pair(x: np.ndarray, y: np.ndarray) -> dict:
+    """The per-pair computation compute_codependence used to run."""
+    n = min(len(x), len(y))
+    x, y = x[-n:], y[-n:]
+    mask = ~(np.isnan(x) | np.isnan(y))
+    xc, yc = x[mask], y[mask]
+    dcor2 = _ref_dcov(xc, yc) / np.sqrt(_ref_dcov(xc, xc) * _ref_dcov(yc, yc))
+    return {
+        "pearson_corr": float(np.corrcoef(xc, yc)[0, 1]),
+        "distance_corr": float(np.sqrt(max(dcor2, 0.0))),
+        "mutual_info": pairwise_mi(xc, yc),
+        "variation_of_info": variation_of_information(
+            quantile_encode(xc), quantile_encode(yc)
+        ),
+        "n_obs": int(mask.sum()),
+    }
+
+
+def _panel(seed: int = 7) -> dict[int, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    base = rng.standard_normal(252) * 0.02
+    series = {
+        1: base,
+        2: 0.5 * base + 0.01 * rng.standard_normal(252),
+        3: base**2 + 0.001 * rng.standard_normal(252),
+        4: np.round(rng.standard_normal(252) * 0.02, 3),  # heavy ties
+        5: rng.standard_normal(180) * 0.02,  # shorter history
+    }
+    gappy = rng.standard_normal(252) * 0.02
+    gappy[[10, 50, 51, 200]] = np.nan
+    series[6] = gappy
+    series[7] = rng.standard_normal(20)  # too short: NaN metrics
+    return series
+
+
+class TestFastDistanceCovariance:
+    @pytest.mark.parametrize("n", [2, 3, 17, 252, 600])
+    def test_matches_quadratic_reference(self, n: int) -> None:
+        rng = np.random.default_rng(n)
+        x = rng.standard_normal(n) * 0.02
+        y = np.round(x**2 + 0.01 * rng.standard_normal(n), 4)
+        assert distance_covariance(x, y) == pytest.approx(_ref_dcov(x, y), rel=1e-9)
+        assert distance_covariance(y, y) == pytest.approx(_ref_dcov(y, y), rel=1e-9)
+
+    def test_distance_correlation_unchanged(self) -> None:
+        rng = np.random.default_rng(3)
+        x = rng.standard_normal(300)
+        y = np.sin(x) + 0.2 * rng.standard_normal(300)
+        ref = np.sqrt(_ref_dcov(x, y) / np.sqrt(_ref_dcov(x, x) * _ref_dcov(y, y)))
+        assert distance_correlation(x, y) == pytest.approx(ref, rel=1e-9)
+
+    def test_constant_series_is_zero(self) -> None:
+        x = np.ones(50)
+        y = np.arange(50.0)
+        assert distance_correlation(x, y) == 0.0
+
+
+class TestPairCodependence:
+    def test_matches_reference(self) -> None:
+        series = _panel()
+        for a, b in [(1, 2), (1, 3), (2, 4), (1, 5), (3, 6)]:
+            got = pair_codependence(series[a], series[b])
+            ref = _ref_pair(series[a], series[b])
+            assert got["n_obs"] == ref["n_obs"]
+            for key in ("pearson_corr", "distance_corr", "mutual_info"):
+                assert got[key] == pytest.approx(ref[key], rel=1e-9, abs=1e-12)
+            assert got["variation_of_info"] == pytest.approx(
+                ref["variation_of_info"], abs=1e-12
+            )
+
+    def test_insufficient_overlap_is_nan(self) -> None:
+        series = _panel()
+        got = pair_codependence(series[1], series[7])
+        assert got["n_obs"] == 20
+        assert np.isnan(got["distance_corr"])
+
+    def test_encoded_mi_matches_sklearn(self) -> None:
+        rng = np.random.default_rng(11)
+        x = rng.standard_normal(200)
+        y = x + rng.standard_normal(200)
+        pa, pb = prepare_series(x), prepare_series(y)
+        assert _encoded_mi(pa.codes, pb.codes, 10) == pytest.approx(
+            mutual_info_score(pa.codes, pb.codes), abs=1e-12
+        )
+
+
+class TestCodependencePanel:
+    def test_matches_pairwise(self) -> None:
+        series = _panel()
+        df = codependence_panel(series, block_size=4)
+        assert len(df) == 21
+        assert list(zip(df["id_a"], df["id_b"])) == sorted(
+            (a, b) for a in series for b in series if a < b
+        )
+        for row in df.itertuples():
+            ref = pair_codependence(series[row.id_a], series[row.id_b])
+            assert row.n_obs == ref["n_obs"]
+            np.testing.assert_allclose(
+                [row.pearson_corr, row.distance_corr, row.variation_of_info],
+                [ref["pearson_corr"], ref["distance_corr"], ref["variation_of_info"]],
+                rtol=1e-12,
+                atol=1e-14,
+            )
+
+    def test_process_pool_matches_in_process(self) -> None:
+        series = _panel()
+        serial = codependence_panel(series, block_size=5)
+        pooled = codependence_panel(series, block_size=5, workers=2)
+        assert serial.equals(pooled)
+
+    def test_explicit_pairs_and_empty(self) -> None:
+        series = _panel()
+        df = codependence_panel(series, [(3, 1), (2, 6)])
+        assert list(df["id_a"]) == [3, 2]
+        assert df.loc[0, "distance_corr"] == pytest.approx(
+            pair_codependence(series[3], series[1])["distance_corr"]
+        )
+        assert codependence_panel(series, []).empty
@@ -0,0 +1,358 @@
+"""Parity tests for the batch EMA kernels in polars_ema_operations.
+
+The (n_bars x n_periods) kernels must reproduce the per-period reference
+implementations (compute_bar_ema_numpy / compute_dual_ema_numpy) and the
+Polars derivative helpers column for column. Resuming from a checkpoint must
+reproduce the tail of a full computation exactly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import struct
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pytest
+
+from ta_lab2.features.m_tf.base_ema_feature import EMAFeatureConfig, TFSpec
+from ta_lab2.features.m_tf.ema_multi_timeframe import MultiTFEMAFeature
+from ta_lab2.features.m_tf.polars_ema_operations import (
+    add_dual_derivatives_polars,
+    compute_bar_ema_matrix,
+    compute_bar_ema_numpy,
+    compute_dual_ema_matrix,
+    compute_dual_ema_numpy,
+    compute_ema_batch,
+    positions_on_grid,
+    resume_ema_batch,
+)
+
+RNG = np.random.default_rng(42)
+PERIODS = [2, 3, 5, 9, 20, 50]
+
+
+def _random_walk(n: int) -> np.ndarray:
+    return 100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.02, n)))
+
+
+class TestBarEMAMatrix:
+    def test_matches_per_period_reference(self) -> None:
+        close = _random_walk(300)
+        out = compute_bar_ema_matrix(close, PERIODS)
+        assert out.shape == (300, len(PERIODS))
+        for j, p in enumerate(PERIODS):
+            ref = compute_bar_ema_numpy(close, period=p, min_periods=p)
+            np.testing.assert_allclose(out[:, j], ref, rtol=1e-12, equal_nan=True)
+
+    def test_nan_gaps_delay_seed_and_carry_forward(self) -> None:
+        close = _random_walk(120)
+        close[[1, 4, 40, 41, 90]] = np.nan
+        out = compute_bar_ema_matrix(close, PERIODS, min_periods=[3] * len(PERIODS))
+        for j, p in enumerate(PERIODS):
+            ref = compute_bar_ema_numpy(close, period=p, min_periods=3)
+            np.testing.assert_allclose(out[:, j], ref, rtol=1e-12, equal_nan=True)
+
+    def test_short_series_is_all_nan(self) -> None:
+        out = compute_bar_ema_matrix(np.arange(4, dtype=float), [5, 10])
+        assert np.isnan(out).all()
+
+    def test_min_periods_length_mismatch_raises(self) -> None:
+        with pytest.raises(ValueError):
+            compute_bar_ema_matrix(np.ones(10), [2, 3], min_periods=[2])
+
+
+class TestDualEMAMatrix:
+    def test_matches_per_period_reference(self) -> None:
+        n, tf_days = 400, 7
+        close = _random_walk(n)
+        canon_pos = np.arange(tf_days - 1, n, tf_days)
+        mask = np.zeros(n, dtype=bool)
+        mask[canon_pos] = True
+
+        bar_ema = compute_bar_ema_matrix(close[canon_pos], PERIODS)
+        canon_vals = np.full((n, len(PERIODS)), np.nan)
+        canon_vals[canon_pos] = bar_ema
+        alpha_daily = np.array([2.0 / (tf_days * p + 1.0) for p in PERIODS])
+        alpha_bar = np.array([2.0 / (p + 1.0) for p in PERIODS])
+
+        ema_bar, ema = compute_dual_ema_matrix(
+            close, mask, canon_vals, alpha_daily, alpha_bar
+        )
+        for j in range(len(PERIODS)):
+            ref_bar, ref_ema = compute_dual_ema_numpy(
+                close, mask, canon_vals[:, j], alpha_daily[j], alpha_bar[j]
+            )
+            np.testing.assert_allclose(ema_bar[:, j], ref_bar, equal_nan=True)
+            np.testing.assert_allclose(ema[:, j], ref_ema, equal_nan=True)
+
+
+class TestEMABatch:
+    def test_off_grid_bars_feed_recursion_but_not_grid(self) -> None:
+        grid_close = _random_walk(60)
+        bar_close = _random_walk(12)
+        bar_pos = np.array([-1, -1, 4, 9, 14, 19, 24, 29, 34, 39, 44, -1])
+
+        batch = compute_ema_batch(grid_close, bar_close, bar_pos, [3, 5], [0.1, 0.05])
+        expected_mask = np.zeros(60, dtype=bool)
+        expected_mask[[4, 9, 14, 19, 24, 29, 34, 39, 44]] = True
+        np.testing.assert_array_equal(batch.canonical_mask, expected_mask)
+
+        bar_ema = compute_bar_ema_numpy(bar_close, period=3)
+        # period 3 seeds at bar index 2 (grid row 4); ema_bar snaps there
+        assert batch.first_valid[0] == 4
+        assert batch.ema_bar[4, 0] == pytest.approx(bar_ema[2])
+        assert batch.ema[4, 0] == pytest.approx(bar_ema[2])
+
+    def test_unseeded_period_reports_minus_one(self) -> None:
+        batch = compute_ema_batch(
+            _random_walk(30), _random_walk(4), np.arange(4) * 7, [2, 10], [0.1, 0.1]
+        )
+        assert batch.first_valid[0] >= 0
+        assert batch.first_valid[1] == -1
+        assert np.isnan(batch.ema_bar[:, 1]).all()
+
+    def test_derivatives_match_polars(self) -> None:
+        n, tf_days = 90, 5
+        grid_close = _random_walk(n)
+        canon_pos = np.arange(tf_days - 1, n, tf_days)
+        batch = compute_ema_batch(
+            grid_close,
+            grid_close[canon_pos],
+            canon_pos,
+            [3],
+            [2.0 / (tf_days * 3 + 1.0)],
+            with_derivatives=True,
+        )
+        fv = int(batch.first_valid[0])
+        roll = ~batch.canonical_mask[fv:]
+        pl_df = add_dual_derivatives_polars(
+            pl.DataFrame(
+                {
+                    "ema": batch.ema[fv:, 0],
+                    "ema_bar": batch.ema_bar[fv:, 0],
+                    "roll": roll,
+                    "roll_bar": roll,
+                }
+            )
+        )
+        for col, mat in batch.derivatives.items():
+            expected = pl_df[col].to_numpy().astype(float)
+            np.testing.assert_allclose(mat[fv:, 0][1:], expected[1:], equal_nan=True)
+
+
+def test_positions_on_grid() -> None:
+    grid = np.array([10, 20, 30, 40], dtype=np.int64)
+    ts = np.array([5, 20, 35, 40, 50], dtype=np.int64)
+    np.testing.assert_array_equal(positions_on_grid(grid, ts), [-1, 1, -1, 3, -1])
+    assert (positions_on_grid(np.array([], dtype=np.int64), ts) == -1).all()
+
+
+class TestResumeEMABatch:
+    def test_resume_matches_full_tail(self) -> None:
+        n, tf_days = 300, 7
+        grid_close = _random_walk(n)
+        canon_pos = np.arange(tf_days - 1, n, tf_days)
+        alpha_daily = [2.0 / (tf_days * p + 1.0) for p in PERIODS]
+        full = compute_ema_batch(
+            grid_close, grid_close[canon_pos], canon_pos, PERIODS, alpha_daily
+        )
+
+        # Checkpoint at the 40th canonical bar (all periods seeded by then)
+        k = 39
+        row = int(canon_pos[k])
+        new_pos = canon_pos[k + 1 :] - (row + 1)
+        resumed = resume_ema_batch(
+            grid_close[row + 1 :],
+            grid_close[canon_pos[k + 1 :]],
+            new_pos,
+            PERIODS,
+            alpha_daily,
+            ema0=full.ema[row],
+            ema_bar0=full.ema_bar[row],
+        )
+        np.testing.assert_array_equal(resumed.ema, full.ema[row + 1 :])
+        np.testing.assert_array_equal(resumed.ema_bar, full.ema_bar[row + 1 :])
+        np.testing.assert_array_equal(
+            resumed.canonical_mask, full.canonical_mask[row + 1 :]
+        )
+
+    def test_empty_tail(self) -> None:
+        resumed = resume_ema_batch(
+            np.array([]),
+            np.array([]),
+            np.array([], dtype=np.int64),
+            [3],
+            [0.1],
+            ema0=[1.0],
+            ema_bar0=[1.0],
+        )
+        assert resumed.ema.shape == (0, 1)
+        assert resumed.first_valid[0] == -1
+
+    def test_state_length_mismatch_raises(self) -> None:
+        with pytest.raises(ValueError):
+            resume_ema_batch(
+                np.ones(3),
+                np.ones(1),
+                np.array([2]),
+                [3, 5],
+                [0.1, 0.1],
+                ema0=[1.0],
+                ema_bar0=[1.0],
+            )
+
+
+def _row_hash(ts, close) -> np.ndarray:
+    """Stand-in for ROW_HASH_SQL: 32-bit hash of (ts, close) per row."""
+    raw = [
+        hashlib.md5(struct.pack("<qd", t, c)).digest()[:4]
+        for t, c in zip(pd.DatetimeIndex(ts).as_unit("us").asi8, close)
+    ]
+    return np.array([int.from_bytes(r, "big") for r in raw], dtype=np.int64)
+
+
+def _keep_since(df: pd.DataFrame, ts_col: str, since) -> pd.DataFrame:
+    keep = pd.Series(True, index=df.index)
+    for (asset_id, venue_id), ts in (since or {}).items():
+        mine = (df["id"] == asset_id) & (df["venue_id"] == venue_id)
+        keep &= ~mine | (df[ts_col] >= ts)
+    return df[keep].reset_index(drop=True)
+
+
+class _InMemoryEMAFeature(MultiTFEMAFeature):
+    """MultiTFEMAFeature reading daily rows and bars from frames."""
+
+    def __init__(self, daily: pd.DataFrame, bars: pd.DataFrame) -> None:
+        super().__init__(
+            engine=None,
+            config=EMAFeatureConfig(
+                periods=[3, 5, 10], output_schema="public", output_table="t"
+            ),
+        )
+        self.daily, self.bars = daily, bars
+
+    def _read_daily(self, ids, end, since=None):
+        return _keep_since(self.daily, "ts", since)
+
+    def _read_bar_closes(self, ids, end, since=None, tf=None):
+        return _keep_since(self.bars, "time_close", since)
+
+    def _read_checkpoint_ranges(self, ckpts):
+        out = []
+        for c in ckpts.itertuples(index=False):
+            ts = pd.Timestamp(c.ckpt_i8, tz="UTC")
+            d = self.daily[self.daily["ts"] <= ts]
+            b = self.bars[(self.bars["tf"] == c.tf) & (self.bars["time_close"] <= ts)]
+            if d["ts"].iloc[-1] == ts and b["time_close"].iloc[-1] == ts:
+                out.append(
+                    (c.id, c.venue_id, c.tf, len(d), d["row_hash"].sum())
+                    + (len(b), b["row_hash"].sum())
+                )
+        return pd.DataFrame(
+            out,
+            columns=["id", "venue_id", "tf", "n_daily", "s_daily", "n_bars", "s_bars"],
+        )
+
+
+class TestMultiTFEMAFeatureResume:
+    """compute_emas_for_tf resumed from checkpoints == full recompute tail."""
+
+    TF = TFSpec(tf="7D", tf_days=7)
+
+    @staticmethod
+    def _data(n: int, close: np.ndarray) -> tuple[pd.DataFrame, pd.DataFrame]:
+        ts = pd.date_range("2020-01-01", periods=n, freq="D", tz="UTC")
+        daily = pd.DataFrame(
+            {
+                "id": 1,
+                "venue_id": 1,
+                "ts": ts,
+                "close": close[:n],
+                "row_hash": _row_hash(ts, close[:n]),
+            }
+        )
+        idx = np.arange(6, n, 7)
+        bars = pd.DataFrame(
+            {
+                "id": 1,
+                "venue_id": 1,
+                "tf": "7D",
+                "bar_seq": np.arange(1, idx.size + 1),
+                "time_close": ts[idx],
+                "close_bar": close[idx],
+                "row_hash": _row_hash(ts[idx], close[idx]),
+            }
+        )
+        return daily, bars
+
+    def _feature(
+        self, n: int, close: np.ndarray, state: pd.DataFrame | None = None
+    ) -> tuple[MultiTFEMAFeature, pd.DataFrame]:
+        """Mirror the refresher's --from-state flow for one id."""
+        feature = _InMemoryEMAFeature(*self._data(n, close))
+        feature.set_resume_state(state)
+        daily = feature.load_source_data([1])
+        feature.preload_bar_closes([1])
+        out = feature.compute_emas_for_tf(daily, self.TF, [3, 5, 10])
+        return feature, out
+
+    def test_resume_loads_and_writes_only_tail_and_matches_full(self) -> None:
+        close = _random_walk(260)
+        first, _ = self._feature(200, close)
+        state = pd.DataFrame(first.checkpoints)
+        assert len(state) == 3
+        ckpt_ts = state["ckpt_ts"].iloc[0]
+
+        resumed, out_resumed = self._feature(260, close, state)
+        full, out_full = self._feature(260, close)
+        assert resumed.resumed_keys == {(1, 1, "7D")}
+        # Only source rows from the checkpoint on are loaded
+        assert resumed._daily_data_cache["ts"].min() == ckpt_ts
+        assert resumed._bar_closes_cache["time_close"].min() == ckpt_ts
+        assert (out_resumed["ts"] > ckpt_ts).all()
+
+        expected = out_full[out_full["ts"] > ckpt_ts].reset_index(drop=True)
+        pd.testing.assert_frame_equal(
+            out_resumed.reset_index(drop=True), expected, check_exact=True
+        )
+        # Checkpoint advances to the last canonical bar of the longer history,
+        # with the same fingerprint a full run records
+        got = pd.DataFrame(resumed.checkpoints)
+        assert got["ckpt_ts"].iloc[0] > ckpt_ts
+        pd.testing.assert_frame_equal(got, pd.DataFrame(full.checkpoints))
+
+    def test_restated_interior_bar_falls_back_to_full(self) -> None:
+        close = _random_walk(260)
+        first, _ = self._feature(200, close)
+        state = pd.DataFrame(first.checkpoints)
+
+        # A day well before the checkpoint is restated in place
+        restated = close.copy()
+        restated[20] *= 1.01
+        resumed, out = self._feature(260, restated, state)
+        _, out_full = self._feature(260, restated)
+        assert resumed.resumed_keys == set()
+        assert resumed._since == {}
+        pd.testing.assert_frame_equal(out, out_full)
+
+    def test_tf_without_checkpoint_reloads_full_history(self) -> None:
+        close = _random_walk(260)
+        first, _ = self._feature(200, close)
+        state = pd.DataFrame(first.checkpoints)
+
+        resumed = _InMemoryEMAFeature(*self._data(260, close))
+        resumed.set_resume_state(state)
+        daily = resumed.load_source_data([1])
+        resumed.preload_bar_closes([1])
+        # Daily rows start at the 7D checkpoint; 14D (synthetic bars) has none
+        tf14 = TFSpec(tf="14D", tf_days=14)
+        out = resumed.compute_emas_for_tf(daily, tf14, [3, 5])
+
+        full = _InMemoryEMAFeature(*self._data(260, close))
+        daily_full = full.load_source_data([1])
+        full.preload_bar_closes([1])
+        pd.testing.assert_frame_equal(
+            out, full.compute_emas_for_tf(daily_full, tf14, [3, 5])
+        )
@@ -13,6 +13,8 @@ from ta_lab2.features.feature_utils import (
     add_zscore,
     validate_min_data_points,
     flag_outliers,
+    checkpoint_fingerprint,
+    source_range,
 )
 
 
@@ -311,3 +313,29 @@ class TestFlagOutliers:
 
         assert outliers.index.tolist() == ["a", "b", "c", "d"]
         assert outliers["d"] == True  # Outlier at index 'd' (value 100)
+
+
+# =============================================================================
+# Checkpoint Fingerprint Tests
+# =============================================================================
+
+
+class TestCheckpointFingerprint:
+    HASHES = np.array([17, 3, 99, 4_000_000_000, 5, 8], dtype=np.int64)
+
+    def test_range_extends_incrementally(self):
+        head = source_range(self.HASHES[:4])
+        assert source_range(self.HASHES[4:], head) == source_range(self.HASHES)
+        assert source_range(np.array([], dtype=np.int64), head) == head
+
+    def test_detects_interior_restatement_and_inserted_rows(self):
+        fp = checkpoint_fingerprint(source_range(self.HASHES))
+        restated = self.HASHES.copy()
+        restated[1] += 1
+        assert checkpoint_fingerprint(source_range(restated)) != fp
+        inserted = np.insert(self.HASHES, 2, 0)
+        assert checkpoint_fingerprint(source_range(inserted)) != fp
+
+    def test_multiple_series_are_order_sensitive(self):
+        a, b = source_range(self.HASHES[:3]), source_range(self.HASHES[3:])
+        assert checkpoint_fingerprint(a, b) != checkpoint_fingerprint(b, a)
@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import numpy as np
 import pytest
+import scipy.stats
 
 from ta_lab2.features.microstructure import (
     _adf_tstat,
@@ -305,6 +306,117 @@ class TestEntropy:
         assert lempel_ziv_complexity([]) == 0
 
 
+# =========================================================
+# Batched Kernel Tests (window-by-window references, 2-D panels)
+# =========================================================
+
+
+def _ref_ols_slope(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """Per-window linregress slope (the pre-vectorization loop)."""
+    out = np.full(len(x), np.nan)
+    for t in range(window, len(x)):
+        xs, ys = x[t - window + 1 : t + 1], y[t - window + 1 : t + 1]
+        mask = ~(np.isnan(xs) | np.isnan(ys))
+        if mask.sum() >= 3 and np.ptp(xs[mask]) > 0:
+            out[t] = scipy.stats.linregress(xs[mask], ys[mask]).slope
+    return out
+
+
+class TestBatchedKernels:
+    """Vectorized kernels match per-window references and accept panels."""
+
+    @pytest.fixture()
+    def panel(self) -> dict:
+        rng = np.random.default_rng(42)
+        n = 400
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (3, n)), axis=1))
+        volume = rng.uniform(1e6, 1e7, (3, n))
+        close[0, n // 3] = np.nan
+        volume[1, n // 4 : n // 4 + 5] = 0.0
+        close[2, n // 2 : n // 2 + 25] = close[2, n // 2 - 1]  # flat stretch
+        return {"close": close, "volume": volume}
+
+    def test_frac_diff_ffd_matches_dot_loop(self) -> None:
+        series = np.log(100 + np.cumsum(RNG.standard_normal(300)) + 50)
+        w = ffd_weights(0.45)
+        width = len(w)
+        expected = np.full(len(series), np.nan)
+        for t in range(width - 1, len(series)):
+            expected[t] = np.dot(w, series[t - width + 1 : t + 1][::-1])
+        np.testing.assert_allclose(frac_diff_ffd(series, d=0.45), expected, rtol=1e-12)
+
+    def test_lambdas_match_linregress(self, panel: dict) -> None:
+        for i in range(3):
+            close, volume = panel["close"][i], panel["volume"][i]
+            dp = np.r_[np.nan, np.diff(close)]
+            sign = np.sign(dp)
+            np.testing.assert_allclose(
+                kyle_lambda(close, volume, window=20),
+                _ref_ols_slope(sign * volume, dp, 20),
+                rtol=1e-8,
+            )
+            np.testing.assert_allclose(
+                hasbrouck_lambda(close, volume, window=20),
+                _ref_ols_slope(sign * np.sqrt(np.abs(close * volume)), dp, 20),
+                rtol=1e-8,
+            )
+
+    def test_flat_window_is_nan(self, panel: dict) -> None:
+        """All-identical regressor values (no price change) yield NaN."""
+        n = panel["close"].shape[1]
+        k = kyle_lambda(panel["close"][2], panel["volume"][2], window=20)
+        assert np.all(np.isnan(k[n // 2 + 20 : n // 2 + 25]))
+
+    def test_rolling_adf_matches_adf_tstat(self) -> None:
+        series = np.cumsum(RNG.standard_normal(250))
+        for lags in (1, 2):
+            result = rolling_adf(series, window=40, lags=lags)
+            for t in (40, 123, 249):
+                expected = _adf_tstat(series[t - 39 : t + 1], lags=lags)
+                assert result[t] == pytest.approx(expected, rel=1e-8)
+
+    def test_rolling_entropy_matches_scalar_functions(self) -> None:
+        rets = np.round(RNG.standard_normal(200), 1)  # ties -> duplicate edges
+        rets[120] = np.nan
+        sh, lz = rolling_entropy(rets, window=30, n_bins=8)
+        for t in (30, 110, 130, 199):
+            chunk = rets[t - 29 : t + 1]
+            enc = quantile_encode(chunk[~np.isnan(chunk)], n_bins=8)
+            assert sh[t] == pytest.approx(shannon_entropy(enc), abs=1e-12)
+            assert lz[t] == lempel_ziv_complexity(enc.tolist()) / np.log2(30)
+
+    def test_rolling_entropy_chunks_match_single_pass(self, monkeypatch) -> None:
+        import ta_lab2.features.microstructure as ms
+
+        rets = RNG.standard_normal((2, 150))
+        rets[1, 70] = np.nan
+        expected = rolling_entropy(rets, window=20, n_bins=5)
+        monkeypatch.setattr(ms, "_CHUNK_ELEMS", 2 * 20 * 7)  # 7 windows per chunk
+        chunked = rolling_entropy(rets, window=20, n_bins=5)
+        for got, want in zip(chunked, expected):
+            np.testing.assert_array_equal(got, want)
+
+    def test_panel_rows_match_single_series(self, panel: dict) -> None:
+        close, volume = panel["close"], panel["volume"]
+        log_close = np.log(close)
+        for fn in (amihud_lambda, kyle_lambda, hasbrouck_lambda):
+            both = fn(close, volume, window=20)
+            assert both.shape == close.shape
+            for i in range(3):
+                np.testing.assert_allclose(both[i], fn(close[i], volume[i], 20))
+        adf = rolling_adf(log_close, window=63)
+        ffd = frac_diff_ffd(log_close, d=0.4)
+        sh, lz = rolling_entropy(np.diff(log_close, axis=1), window=50)
+        for i in range(3):
+            np.testing.assert_allclose(adf[i], rolling_adf(log_close[i], 63))
+            np.testing.assert_allclose(ffd[i], frac_diff_ffd(log_close[i], 0.4))
+            sh_i, lz_i = rolling_entropy(np.diff(log_close[i]), window=50)
+            np.testing.assert_allclose(sh[i], sh_i)
+            np.testing.assert_allclose(lz[i], lz_i)
+        d = find_min_d(close[1:])
+        assert d.tolist() == [find_min_d(c) for c in close[1:]]
+
+
 # =========================================================
 # Codependence Tests (Section 5: Non-Linear Codependence)
 # =========================================================
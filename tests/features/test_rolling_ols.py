@@ -0,0 +1,110 @@
+"""Tests for the cumulative-sum rolling OLS / WMA kernel (features/rolling_ols.py)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from ta_lab2.features.cross_timeframe import _compute_slope
+from ta_lab2.features.rolling_ols import rolling_ols, rolling_slope, rolling_wma
+from ta_lab2.ml.expression_engine import evaluate_expression
+
+RNG = np.random.default_rng(42)
+
+
+def _ref_slope(series: pd.Series, n: int) -> pd.Series:
+    """Previous per-window implementation (rolling.apply)."""
+
+    def f(w: np.ndarray) -> float:
+        x = np.arange(len(w), dtype=float)
+        return float(np.dot(w - w.mean(), x - x.mean()) / ((x - x.mean()) ** 2).sum())
+
+    return series.rolling(n, min_periods=2).apply(f, raw=True)
+
+
+def _ref_wma(series: pd.Series, n: int, min_periods: int) -> pd.Series:
+    weights = np.arange(1, n + 1, dtype=float)
+
+    def f(w: np.ndarray) -> float:
+        v = weights[-len(w) :]
+        return float(np.dot(w, v) / v.sum())
+
+    return series.rolling(n, min_periods=min_periods).apply(f, raw=True)
+
+
+def _series(n: int = 2_000, scale: float = 1.0) -> pd.Series:
+    s = pd.Series(scale * np.exp(np.cumsum(RNG.normal(0.0, 0.02, n))))
+    s.iloc[[3, n // 5, n // 5 + 1, 3 * n // 4]] = np.nan
+    return s
+
+
+class TestParityWithRollingApply:
+    @pytest.mark.parametrize("scale", [1.0, 60_000.0])
+    @pytest.mark.parametrize("n", [2, 5, 21])
+    def test_slope(self, scale, n) -> None:
+        s = _series(scale=scale)
+        pd.testing.assert_series_equal(
+            rolling_slope(s, n), _ref_slope(s, n), rtol=1e-9, atol=1e-12 * scale
+        )
+
+    @pytest.mark.parametrize("min_periods", [1, 10])
+    def test_wma(self, min_periods) -> None:
+        s = _series(scale=100.0)
+        pd.testing.assert_series_equal(
+            rolling_wma(s, 10, min_periods), _ref_wma(s, 10, min_periods), rtol=1e-10
+        )
+
+    def test_expression_engine_operators(self) -> None:
+        df = pd.DataFrame({"close": _series(300)})
+        got = evaluate_expression("Slope($close, 7)", df)
+        pd.testing.assert_series_equal(
+            got, _ref_slope(df["close"], 7), check_names=False, rtol=1e-9
+        )
+
+
+class TestRollingOLS:
+    def test_stats_match_linregress(self) -> None:
+        y = _series(200).to_numpy()
+        out = rolling_ols(y, 20)
+        t = 120
+        lr = stats.linregress(np.arange(20), y[t - 19 : t + 1])
+        assert out.slope[t] == pytest.approx(lr.slope, rel=1e-9)
+        assert out.intercept[t] == pytest.approx(lr.intercept, rel=1e-9)
+        assert out.r2[t] == pytest.approx(lr.rvalue**2, rel=1e-9)
+        assert out.tstat[t] == pytest.approx(lr.slope / lr.stderr, rel=1e-8)
+
+    def test_many_columns_match_single_column(self) -> None:
+        frame = pd.DataFrame({f"c{j}": _series(500) for j in range(6)})
+        both = rolling_ols(frame, 14)
+        for col in frame:
+            single = rolling_ols(frame[col], 14)
+            np.testing.assert_allclose(both.slope[col], single.slope, rtol=1e-12)
+            np.testing.assert_allclose(both.tstat[col], single.tstat, rtol=1e-10)
+
+    def test_groups_restart_windows(self) -> None:
+        a, b = _series(50), _series(70)
+        stacked = pd.concat([a, b], ignore_index=True)
+        groups = np.r_[np.zeros(50), np.ones(70)]
+        got = rolling_slope(stacked, 10, groups=groups).to_numpy()
+        np.testing.assert_allclose(got[:50], _ref_slope(a, 10), rtol=1e-9)
+        np.testing.assert_allclose(got[50:], _ref_slope(b, 10), rtol=1e-9)
+
+    def test_ctf_slope_grouped(self) -> None:
+        s = _series(80)
+        ids = np.repeat([1, 2], 40)
+        got = _compute_slope(s, 5, ids)
+        assert np.isnan(got.iloc[40])  # first bar of asset 2
+        np.testing.assert_allclose(
+            got.iloc[40:], _ref_slope(s.iloc[40:].reset_index(drop=True), 5)
+        )
+
+    def test_edge_cases(self) -> None:
+        assert rolling_slope(np.array([]), 5).shape == (0,)
+        flat = rolling_ols(np.full(10, 3.0), 4)
+        assert np.allclose(flat.slope[1:], 0.0)
+        assert np.isnan(flat.r2[5])
+        line = rolling_ols(np.arange(10.0), 4)
+        assert np.allclose(line.r2[3:], 1.0)
+        assert np.isinf(line.tstat[5])
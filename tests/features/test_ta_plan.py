@@ -0,0 +1,179 @@
+"""Tests for the whole-frame Polars TA plan (features/ta_plan.py)."""
+
+from __future__ import annotations
+
+import dataclasses
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.features.ta_plan import build_ta_plan, compute_ta_polars
+from ta_lab2.scripts.features.ta_feature import TAConfig, TAFeature
+
+_EXTENDED = [
+    "ichimoku",
+    "willr",
+    "keltner",
+    "cci",
+    "elder_ray",
+    "force_index",
+    "vwap",
+    "cmf",
+    "chaikin_osc",
+    "hurst",
+    "vidya",
+    "frama",
+    "aroon",
+    "trix",
+    "ultimate_osc",
+    "vortex",
+    "emv",
+    "mass_index",
+    "kst",
+    "coppock",
+]
+
+
+def _indicators() -> list[dict]:
+    feature = TAFeature(MagicMock(), TAConfig(load_indicators_from_db=False))
+    params = feature._get_default_indicators()
+    params += [
+        {"indicator_type": t, "indicator_name": t, "params": {}} for t in _EXTENDED
+    ]
+    params += [
+        {
+            "indicator_type": "frama",
+            "indicator_name": "frama_15",
+            "params": {"period": 15},
+        },
+        {
+            "indicator_type": "hurst",
+            "indicator_name": "hurst_30",
+            "params": {"window": 30, "max_lag": 10},
+        },
+        {
+            "indicator_type": "bb",
+            "indicator_name": "bb_10_1.5",
+            "params": {"window": 10, "n_sigma": 1.5},
+        },
+    ]
+    return params
+
+
+def _frame(seed: int = 0, n: int = 300) -> pd.DataFrame:
+    """Shuffled multi-(id, venue) OHLCV with flat bars, a gap and a short group."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for id_ in (1, 2, 5):
+        for venue in (1, 3):
+            m = n if id_ != 5 else 40
+            c = 100 * np.exp(np.cumsum(rng.standard_normal(m) * 0.02))
+            h = c * (1 + np.abs(rng.standard_normal(m)) * 0.01)
+            lo = c * (1 - np.abs(rng.standard_normal(m)) * 0.01)
+            h[5:8] = lo[5:8] = c[5:8]  # zero-range bars
+            c[20:23] = c[19]  # flat closes
+            v = rng.uniform(1e5, 1e6, m)
+            v[30] = 0.0
+            df = pd.DataFrame(
+                {
+                    "id": id_,
+                    "venue_id": venue,
+                    "ts": pd.date_range("2022-01-01", periods=m, freq="D", tz="UTC"),
+                    "open": c,
+                    "high": h,
+                    "low": lo,
+                    "close": c,
+                    "volume": v,
+                }
+            )
+            df.loc[50:52, "close"] = np.nan
+            parts.append(df)
+    return pd.concat(parts, ignore_index=True).sample(frac=1, random_state=1)
+
+
+def _features(use_polars: bool, params: list[dict]) -> TAFeature:
+    config = dataclasses.replace(
+        TAConfig(load_indicators_from_db=False), use_polars=use_polars
+    )
+    feature = TAFeature(MagicMock(), config)
+    feature.load_indicator_params = lambda: params
+    return feature
+
+
+def _assert_frames_match(ref: pd.DataFrame, got: pd.DataFrame) -> None:
+    assert list(got.columns) == list(ref.columns)
+    ref = ref.reset_index(drop=True)
+    got = got.reset_index(drop=True)
+    for col in ("id", "venue_id", "ts"):
+        assert (got[col] == ref[col]).all()
+    for col in ref.columns:
+        if col in ("id", "venue_id", "ts", "tf", "tf_days", "alignment_source"):
+            continue
+        np.testing.assert_allclose(
+            got[col].to_numpy(float),
+            ref[col].to_numpy(float),
+            rtol=1e-9,
+            atol=1e-9,
+            err_msg=col,
+        )
+
+
+class TestTAPlan:
+    def test_matches_pandas_path(self) -> None:
+        params = _indicators()
+        df = _frame()
+        ref = _features(False, params).compute_features(
+            df.sort_values(["id", "venue_id", "ts"]).reset_index(drop=True)
+        )
+        got = _features(True, params).compute_features(df)
+        assert "coppock" in got.columns and "frama_16" in got.columns
+        _assert_frames_match(ref, got)
+
+    def test_missing_volume_skips_volume_indicators(self) -> None:
+        params = _indicators()
+        df = _frame().drop(columns="volume")
+        ref = _features(False, params).compute_features(
+            df.sort_values(["id", "venue_id", "ts"]).reset_index(drop=True)
+        )
+        got = _features(True, params).compute_features(df)
+        assert "cmf_20" not in got.columns
+        _assert_frames_match(ref, got)
+
+    def test_shared_nodes_computed_once(self) -> None:
+        params = [
+            {"indicator_type": "atr", "indicator_name": "atr", "params": {}},
+            {"indicator_type": "adx", "indicator_name": "adx", "params": {}},
+            {"indicator_type": "vortex", "indicator_name": "vortex", "params": {}},
+        ]
+        plan = build_ta_plan(params, ["high", "low", "close"])
+        tr_nodes = [n for layer in plan._layers for n in layer if n.endswith(":tr")]
+        assert tr_nodes == ["__ta:tr"]
+        alone = build_ta_plan(params[:1], ["high", "low", "close"])
+        assert plan.n_nodes < 3 * alone.n_nodes + 10
+
+    def test_duplicate_output_keeps_position(self) -> None:
+        params = [
+            {"indicator_type": "macd", "indicator_name": "a", "params": {}},
+            {"indicator_type": "rsi", "indicator_name": "r", "params": {}},
+            {"indicator_type": "macd", "indicator_name": "b", "params": {"fast": 8}},
+        ]
+        plan = build_ta_plan(params, ["close"])
+        assert list(plan.outputs) == [
+            "macd_12_26",
+            "macd_signal_9",
+            "macd_hist_12_26_9",
+            "rsi_14",
+            "macd_8_26",
+            "macd_hist_8_26_9",
+        ]
+
+    @pytest.mark.parametrize("n", [1, 5])
+    def test_groups_shorter_than_windows(self, n: int) -> None:
+        df = _frame(n=60)
+        df = df[df.groupby(["id", "venue_id"]).cumcount() < n]
+        out = compute_ta_polars(df, _indicators())
+        assert len(out) == len(df)
+        assert out["rsi_14"].isna().all() or n > 1
+        assert out["hurst_100"].isna().all()
@@ -0,0 +1,34 @@
+"""Tests for the block-anchored trailing-window sums (features/window_sums.py)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ta_lab2.features.window_sums import block_window_sums, window_starts
+
+RNG = np.random.default_rng(42)
+
+
+def test_window_starts_clip_at_group_boundaries() -> None:
+    assert window_starts(5, 3).tolist() == [0, 0, 0, 1, 2]
+    groups = [1, 1, 1, 2, 2, 2, 2]
+    assert window_starts(7, 3, groups).tolist() == [0, 0, 0, 3, 3, 3, 4]
+    with pytest.raises(ValueError, match="one label per row"):
+        window_starts(3, 2, [1, 2])
+
+
+@pytest.mark.parametrize("block", [4, 5, 13])
+def test_block_window_sums_match_direct_sums(block: int) -> None:
+    a = RNG.standard_normal((40, 3))
+    starts = window_starts(40, 4, np.repeat([1, 2], 20))
+    total, k_sum = block_window_sums(a, starts, block, weighted=True)
+    for t, s in enumerate(starts):
+        w = a[s : t + 1]
+        np.testing.assert_allclose(total[t], w.sum(axis=0), atol=1e-12)
+        k = np.arange(len(w), dtype=float)[:, None]
+        np.testing.assert_allclose(k_sum[t], (k * w).sum(axis=0), atol=1e-12)
+
+    unweighted, none = block_window_sums(a, starts, block)
+    assert none is None
+    np.testing.assert_array_equal(unweighted, total)
@@ -0,0 +1,118 @@
+"""Tests for the batched triple-barrier and trend-scanning labelers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import linregress
+
+from ta_lab2.labeling.trend_scanning import trend_scanning_labels
+from ta_lab2.labeling.triple_barrier import apply_triple_barriers, get_daily_vol
+
+RNG = np.random.default_rng(42)
+
+
+def _close(n: int = 600) -> pd.Series:
+    idx = pd.date_range("2022-01-01", periods=n, freq="D", tz="UTC")
+    close = pd.Series(100.0 * np.exp(np.cumsum(RNG.normal(0.0, 0.03, n))), index=idx)
+    close.iloc[[n // 7, n // 7 + 1, n // 2]] = np.nan
+    return close
+
+
+def _ref_first_touch(close, t0, upper, lower, num_bars, side):
+    """Per-event walk over the path (the previous implementation)."""
+    pos = close.index.get_loc(t0)
+    end = min(pos + num_bars, len(close) - 1)
+    for p in range(pos + 1, end + 1):
+        price = close.iloc[p]
+        first, second = (price >= upper, price <= lower)
+        if side != 1:
+            first, second = second, first
+        if first:
+            return close.index[p], 1
+        if second:
+            return close.index[p], -1
+    return close.index[end], 0
+
+
+class TestTripleBarrier:
+    @pytest.mark.parametrize("pt_sl", [[1.0, 1.0], [2.0, 0.0], [0.0, 1.5]])
+    @pytest.mark.parametrize("num_bars", [0, 5, 30])
+    def test_matches_per_event_walk(self, pt_sl, num_bars) -> None:
+        close = _close()
+        vol = get_daily_vol(close, span=20)
+        events = close.index[RNG.choice(len(close), 150, replace=False)].sort_values()
+        side = pd.Series(RNG.choice([-1, 1], len(events)), index=events)
+
+        out = apply_triple_barriers(close, events, pt_sl, vol, num_bars, side)
+        expected = events[vol.reindex(events).notna().to_numpy()]
+        assert out.index.equals(expected)
+        assert out["bin"].dtype == np.int8
+
+        for t0, row in out.iterrows():
+            entry, v, s = close[t0], vol[t0], side[t0]
+            up_m, dn_m = (pt_sl[0], pt_sl[1]) if s == 1 else (pt_sl[1], pt_sl[0])
+            upper = entry * (1.0 + up_m * v) if up_m > 0 else np.inf
+            lower = entry * (1.0 - dn_m * v) if dn_m > 0 else -np.inf
+            t1, b = _ref_first_touch(close, t0, upper, lower, num_bars, s)
+            assert row["t1"] == t1
+            assert row["bin"] == b
+            assert row["barrier_type"] == {1: "pt", -1: "sl", 0: "vb"}[b]
+            hit = close[t1]
+            if np.isfinite(hit) and np.isfinite(entry):
+                assert row["ret"] == np.log(hit / entry)
+            else:
+                assert np.isnan(row["ret"])
+
+    def test_events_outside_index_or_without_vol_dropped(self) -> None:
+        close = _close(50)
+        vol = get_daily_vol(close, span=10)
+        late = pd.DatetimeIndex([pd.Timestamp("2030-01-01", tz="UTC")])
+        events = close.index[[0, 10, 20]].append(late)
+        out = apply_triple_barriers(close, events, [1.0, 1.0], vol, 5)
+        assert list(out.index) == list(close.index[[10, 20]])  # t0=0 has no vol
+        empty = apply_triple_barriers(close, late, [1.0, 1.0], vol, 5)
+        assert empty.empty and str(empty.index.tz) == "UTC"
+
+
+class TestTrendScanning:
+    @staticmethod
+    def _reference(close, lf, ms, positions):
+        y_all = np.log(close.to_numpy())
+        out = []
+        for i in positions:
+            best, best_abs, best_end = 0.0, -1.0, i + ms - 1
+            for L in range(ms, min(lf, len(y_all) - i) + 1):
+                with np.errstate(all="ignore"):
+                    res = linregress(np.arange(L, dtype=float), y_all[i : i + L])
+                t = res.slope / res.stderr if res.stderr > 1e-15 else 0.0
+                if abs(t) > best_abs:
+                    best, best_abs, best_end = t, abs(t), i + L - 1
+            out.append((close.index[best_end], best))
+        return out
+
+    @pytest.mark.parametrize("lf,ms", [(20, 5), (8, 3), (5, 5)])
+    def test_matches_linregress_scan(self, lf, ms) -> None:
+        close = _close(250)
+        out = trend_scanning_labels(close, lf, ms, min_tvalue_threshold=2.0)
+        assert len(out) == len(close) - ms + 1
+        ref = self._reference(close, lf, ms, range(len(out)))
+        assert list(out["t1"]) == [t1 for t1, _ in ref]
+        np.testing.assert_allclose(out["tvalue"], [t for _, t in ref], rtol=1e-6)
+        expected_bin = np.where(np.abs(out["tvalue"]) > 2.0, np.sign(out["tvalue"]), 0)
+        np.testing.assert_array_equal(out["bin"], expected_bin)
+
+    def test_t_events_subset(self) -> None:
+        close = _close(120)
+        events = close.index[[3, 50, 117, 119]]
+        out = trend_scanning_labels(close, 10, 3, t_events=events)
+        assert list(out.index) == list(close.index[[3, 50, 117]])  # 119: < 3 bars
+        full = trend_scanning_labels(close, 10, 3)
+        pd.testing.assert_frame_equal(out, full.loc[out.index])
+
+    def test_invalid_lengths(self) -> None:
+        with pytest.raises(ValueError):
+            trend_scanning_labels(_close(20), 10, 1)
+        with pytest.raises(ValueError):
+            trend_scanning_labels(_close(20), 3, 5)
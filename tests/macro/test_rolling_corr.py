@@ -0,0 +1,80 @@
+"""Tests for the streaming rolling correlation engine (macro/rolling_corr.py)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# ta_lab2.macro imports the HMM classifier at package level.
+pytest.importorskip("hmmlearn")
+
+from ta_lab2.macro.rolling_corr import RollingCorrEngine, avg_pairwise_corr  # noqa: E402
+
+RNG = np.random.default_rng(42)
+
+
+def _panel(t: int = 400, n: int = 12) -> np.ndarray:
+    x = RNG.normal(0.0, 0.03, (t, n)) + RNG.normal(0.0, 0.02, (t, 1))
+    x[RNG.random((t, n)) < 0.05] = np.nan
+    x[:60, 2] = np.nan  # late listing
+    return x
+
+
+class TestPairwiseCorr:
+    def test_matches_pandas_rolling_corr(self) -> None:
+        x = _panel()
+        frame = pd.DataFrame(x)
+        snaps = list(RollingCorrEngine(x, 30, y=x[:, [0, 2]], min_periods=10))
+        assert len(snaps) == len(x)
+        for i in range(x.shape[1]):
+            for k, j in enumerate([0, 2]):
+                ref = frame[i].rolling(30, min_periods=10).corr(frame[j]).to_numpy()
+                got = np.array([s.corr[i, k] for s in snaps])
+                np.testing.assert_allclose(got, ref, atol=1e-12)
+
+    def test_cross_panel_with_sparse_macro(self) -> None:
+        x = _panel(300, 4)
+        y = RNG.normal(size=(300, 2))
+        y[RNG.random((300, 2)) < 0.3] = np.nan  # weekends / holidays
+        snaps = list(RollingCorrEngine(x, 60, y=y, min_periods=10))
+        ref = pd.Series(x[:, 1]).rolling(60, min_periods=10).corr(pd.Series(y[:, 1]))
+        got = np.array([s.corr[1, 1] for s in snaps])
+        np.testing.assert_allclose(got, ref.to_numpy(), atol=1e-12)
+
+    def test_constant_window_is_nan(self) -> None:
+        x = _panel(120, 3)
+        x[40:90, 1] = 0.01
+        snaps = list(RollingCorrEngine(x, 20, min_periods=10))
+        assert np.isnan(snaps[80].corr[0, 1])
+        assert not np.isnan(snaps[80].corr[0, 2])
+
+
+class TestAvgPairwiseCorr:
+    def test_matches_dataframe_corr_on_complete_columns(self) -> None:
+        x = _panel()
+        x[100:200, 5] = 0.0  # zero variance: excluded like DataFrame.corr NaN
+        frame = pd.DataFrame(x)
+        for snap in RollingCorrEngine(x, 30, y=x[:, :1], min_periods=10):
+            window = frame.iloc[max(0, snap.t - 29) : snap.t + 1]
+            cols = window.dropna(axis=1, how="any").columns
+            got = avg_pairwise_corr(snap, min_assets=3)
+            if len(cols) < 3:
+                assert np.isnan(got)
+                continue
+            c = window[cols].corr().to_numpy()
+            assert got == pytest.approx(
+                np.nanmean(c[np.triu_indices_from(c, k=1)]), abs=1e-12, nan_ok=True
+            )
+
+    def test_min_assets(self) -> None:
+        x = _panel(50, 3)
+        snap = list(RollingCorrEngine(x, 10, y=x[:, :1]))[-1]
+        assert np.isnan(avg_pairwise_corr(snap, min_assets=4))
+
+
+def test_validates_inputs() -> None:
+    with pytest.raises(ValueError):
+        RollingCorrEngine(np.zeros((5, 2)), 0)
+    with pytest.raises(ValueError):
+        RollingCorrEngine(np.zeros((5, 2)), 3, y=np.zeros((4, 1)))
@@ -0,0 +1,187 @@
+"""Tests for buffered metrics collection and histogram sketches."""
+
+import json
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.observability
+class TestHistogramSketch:
+    """Tests for HistogramSketch."""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Quantile estimates stay within the configured relative error."""
+        from ta_lab2.observability.sketch import HistogramSketch
+
+        values = np.random.default_rng(42).lognormal(3.0, 1.0, 20_000)
+        sketch = HistogramSketch(relative_accuracy=0.01)
+        sketch.add_many(values)
+
+        for q in (0.1, 0.5, 0.95, 0.99):
+            exact = np.quantile(values, q, method="lower")
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.021)
+        assert sketch.quantile(0.0) == values.min()
+        assert sketch.quantile(1.0) == values.max()
+        assert sketch.count == len(values)
+
+    def test_merge_and_roundtrip(self):
+        """Merged sketches equal one sketch over all values; JSON roundtrip."""
+        from ta_lab2.observability.sketch import HistogramSketch
+
+        values = np.random.default_rng(7).normal(0.0, 5.0, 2_000)
+        whole, a, b = (HistogramSketch() for _ in range(3))
+        whole.add_many(values)
+        for v in values[:700]:
+            a.add(v)
+        b.add_many(values[700:])
+        a.merge(HistogramSketch.from_dict(json.loads(json.dumps(b.to_dict()))))
+
+        assert a.to_dict()["pos"] == whole.to_dict()["pos"]
+        assert a.to_dict()["neg"] == whole.to_dict()["neg"]
+        assert a.quantile(0.5) == whole.quantile(0.5)
+        assert a.total == pytest.approx(whole.total)
+
+    def test_bucket_budget(self):
+        """Bucket count is capped; the largest values keep their accuracy."""
+        from ta_lab2.observability.sketch import HistogramSketch
+
+        sketch = HistogramSketch(relative_accuracy=0.01, max_buckets=64)
+        sketch.add_many(np.geomspace(1e-6, 1e6, 5_000))
+        assert len(sketch.to_dict()["pos"]) <= 64
+        assert sketch.quantile(0.999) == pytest.approx(1e6, rel=0.05)
+
+
+@pytest.mark.observability
+@pytest.mark.mocked_deps
+class TestBufferedMetricsCollector:
+    """Tests for BufferedMetricsCollector."""
+
+    @staticmethod
+    def _collector(mocker, **kwargs):
+        from ta_lab2.observability.metrics import BufferedMetricsCollector
+
+        engine = mocker.MagicMock()
+        kwargs.setdefault("autostart", False)
+        return engine, BufferedMetricsCollector(engine, **kwargs)
+
+    def test_record_does_not_touch_database(self, mocker):
+        """Samples aggregate in memory until flush()."""
+        engine, collector = self._collector(mocker)
+
+        for i in range(1_000):
+            collector.counter("rows_processed", value=2, stage="emas")
+            collector.histogram("latency_ms", value=float(i), stage="emas")
+
+        engine.begin.assert_not_called()
+        assert collector.pending() == 2
+
+    def test_flush_writes_one_bulk_batch(self, mocker):
+        """flush() issues a single executemany with aggregated rollups."""
+        engine, collector = self._collector(mocker)
+        ts = datetime(2026, 3, 1, 12, 0, 30, tzinfo=timezone.utc)
+
+        from ta_lab2.observability.metrics import Metric
+
+        for v in (1.0, 2.0, 3.0):
+            collector.record(Metric("rows", v, "counter", ts, {"id": 1}))
+        for v in (5.0, 7.0):
+            collector.record(Metric("depth", v, "gauge", ts))
+        collector.histogram("latency_ms", value=10.0)
+
+        assert collector.flush() == 3
+        conn = engine.begin.return_value.__enter__.return_value
+        assert conn.execute.call_count == 1
+        params = {p["metric_name"]: p for p in conn.execute.call_args[0][1]}
+
+        assert params["rows"]["value_sum"] == 6.0
+        assert params["rows"]["sample_count"] == 3
+        assert params["rows"]["bucket_start"] == ts.replace(second=0)
+        assert json.loads(params["rows"]["labels"]) == {"id": 1}
+        assert params["depth"]["value_last"] == 7.0
+        assert params["depth"]["value_min"] == 5.0
+        assert json.loads(params["latency_ms"]["sketch"])["count"] == 1
+        assert collector.pending() == 0
+        assert collector.flush() == 0
+
+    def test_failed_flush_keeps_rollups(self, mocker):
+        """A DB error re-buffers the batch, merged with newer samples."""
+        engine, collector = self._collector(mocker)
+        engine.begin.side_effect = RuntimeError("db down")
+
+        collector.counter("errors", value=1)
+        assert collector.flush() == 0
+        collector.counter("errors", value=2)
+
+        rollups = collector.query_rollups("errors")
+        assert [r.total for r in rollups] == [3.0]
+
+    def test_query_bounds_match_for_stored_and_pending(self, mocker):
+        """start_time is floored to its bucket for the DB query and the buffer."""
+        from ta_lab2.observability.metrics import Metric
+
+        engine, collector = self._collector(mocker)
+        bucket = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+        collector.record(Metric("rows", 1.0, "counter", bucket.replace(second=5)))
+        collector.record(Metric("rows", 2.0, "counter", bucket.replace(minute=1)))
+        conn = engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value = []
+
+        rollups = collector.query_rollups(
+            "rows",
+            start_time=bucket.replace(second=40),
+            end_time=datetime(2026, 3, 1, 12, 0, 59),  # naive = UTC
+        )
+        params = conn.execute.call_args[0][1]
+        assert params["start_time"] == bucket
+        assert params["end_time"] == bucket.replace(second=59)
+        # the buffered rollup of the same bucket is kept, the later one is not
+        assert [(r.bucket_start, r.total) for r in rollups] == [(bucket, 1.0)]
+
+    def test_percentile_merges_stored_and_pending_sketches(self, mocker):
+        """get_percentile combines flushed rollup rows with the buffer."""
+        from ta_lab2.observability.sketch import HistogramSketch
+
+        engine, collector = self._collector(mocker)
+        stored = HistogramSketch()
+        stored.add_many(np.arange(1.0, 101.0))
+        row = (
+            "histogram",
+            {},
+            datetime.now(timezone.utc),
+            stored.count,
+            stored.total,
+            stored.min,
+            stored.max,
+            100.0,
+            stored.to_dict(),
+        )
+        conn = engine.connect.return_value.__enter__.return_value
+        conn.execute.return_value = [row]
+
+        for v in np.arange(101.0, 201.0):
+            collector.histogram("latency_ms", value=v)
+
+        assert collector.get_percentile("latency_ms", 0.5) == pytest.approx(
+            100.0, rel=0.02
+        )
+        assert collector.get_percentile("latency_ms", 1.0) == 200.0
+
+    def test_background_flusher(self, mocker):
+        """The daemon thread flushes on its interval; close() drains."""
+        engine, collector = self._collector(
+            mocker, flush_interval_sec=0.05, autostart=True
+        )
+        collector.gauge("queue_depth", value=3)
+
+        deadline = time.time() + 2.0
+        while collector.pending() and time.time() < deadline:
+            time.sleep(0.01)
+        assert collector.pending() == 0
+        engine.begin.assert_called()
+
+        collector.gauge("queue_depth", value=4)
+        collector.close()
+        assert collector.pending() == 0
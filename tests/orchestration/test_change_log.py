@@ -0,0 +1,89 @@
+"""
+Unit tests for per-asset dirty tracking (scripts/change_log.py) and the
+--changed-only stage wrapper in run_daily_refresh.
+
+No database required: the DB-facing change_log calls are replaced on the
+run_daily_refresh module.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import ta_lab2.scripts.run_daily_refresh as rdr
+from ta_lab2.scripts.bars.sync_1d_to_multi_tf_u import SYNC_SQL
+from ta_lab2.scripts.change_log import ChangeSet, split_dirty
+from ta_lab2.scripts.pipeline_utils import ComponentResult
+
+
+class TestSplitDirty:
+    def test_new_changed_and_unchanged_ids(self) -> None:
+        latest = {1: 10, 2: 20, 3: 30}
+        marks = {1: 10, 2: 15}
+        dirty, clean = split_dirty([1, 2, 3, 4], latest, marks)
+        assert dirty == [2, 3]  # 2 changed since watermark, 3 never processed
+        assert clean == [1, 4]  # 1 up to date, 4 has no bars
+
+
+class TestRunChangeTracked:
+    def _patch(self, monkeypatch, change_set: ChangeSet):
+        advanced = []
+        monkeypatch.setattr(rdr, "dirty_ids", lambda db, stage, ids: change_set)
+        monkeypatch.setattr(
+            rdr,
+            "advance_watermarks",
+            lambda db, stage, cs: advanced.append((stage, dict(cs.seqs))),
+        )
+        return advanced
+
+    @staticmethod
+    def _runner(calls: list, ok: bool = True):
+        def run(ids):
+            calls.append(ids)
+            return ComponentResult("emas", ok, 0.1, 0 if ok else 1)
+
+        return run
+
+    def test_runs_dirty_ids_and_advances_on_success(self, monkeypatch) -> None:
+        cs = ChangeSet("emas", ids=[2, 3], seqs={2: 20, 3: 30}, n_clean=2)
+        advanced = self._patch(monkeypatch, cs)
+        calls: list = []
+        args = argparse.Namespace(changed_only=True, dry_run=False)
+
+        result = rdr._run_change_tracked(args, "db", "emas", None, self._runner(calls))
+        assert result.success
+        assert calls == [[2, 3]]
+        assert advanced == [("emas", {2: 20, 3: 30})]
+
+    def test_failure_keeps_watermarks(self, monkeypatch) -> None:
+        cs = ChangeSet("emas", ids=[2], seqs={2: 20})
+        advanced = self._patch(monkeypatch, cs)
+        args = argparse.Namespace(changed_only=True, dry_run=False)
+        rdr._run_change_tracked(args, "db", "emas", None, self._runner([], ok=False))
+        assert advanced == []
+
+    def test_nothing_dirty_skips_stage(self, monkeypatch) -> None:
+        self._patch(monkeypatch, ChangeSet("emas", ids=[], n_clean=5))
+        calls: list = []
+        args = argparse.Namespace(changed_only=True, dry_run=False)
+        result = rdr._run_change_tracked(args, "db", "emas", [1], self._runner(calls))
+        assert result.success and calls == []
+
+    def test_no_change_log_or_flag_runs_full_list(self, monkeypatch) -> None:
+        self._patch(monkeypatch, ChangeSet("emas", ids=None))
+        calls: list = []
+        on = argparse.Namespace(changed_only=True, dry_run=False)
+        off = argparse.Namespace(changed_only=False, dry_run=False)
+        rdr._run_change_tracked(on, "db", "emas", [1, 2], self._runner(calls))
+        rdr._run_change_tracked(off, "db", "emas", None, self._runner(calls))
+        assert calls == [[1, 2], None]
+
+
+class TestSyncStampsIngestedAt:
+    def test_sync_sets_ingested_at_instead_of_copying_it(self) -> None:
+        sql = " ".join(SYNC_SQL.split())
+        # inserts stamp now(); the source row's ingested_at is not copied
+        assert "src_file, now(), venue_id FROM price_bars_1d" in sql
+        # in-place restatements of OHLCV re-stamp the synced row
+        assert "ingested_at = CASE WHEN (t.open, t.high" in sql
+        assert "THEN now() ELSE t.ingested_at END" in sql
@@ -0,0 +1,233 @@
+"""
+Unit tests for the daily-refresh stage DAG scheduler (scripts/stage_dag.py).
+
+Stages are fake callables returning ComponentResult; no subprocesses or DB.
+Overlap is forced with barriers and events rather than sleeps, so nothing
+depends on wall-clock timing.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from ta_lab2.scripts.pipeline_utils import STAGE_ORDER, ComponentResult
+from ta_lab2.scripts.stage_dag import (
+    DAILY_STAGE_DEPS,
+    POOLED_STAGES,
+    DagRunReport,
+    Stage,
+    StageScheduler,
+    StageTiming,
+    build_stages,
+    critical_path,
+    format_timing_report,
+    stage_resources,
+)
+
+_TIMEOUT = 5.0  # only reached when the scheduler fails to overlap stages
+
+
+class _Tracker:
+    """Records concurrency while fake stages run."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running: set[str] = set()
+        self.max_running = 0
+        self.order: list[str] = []
+
+    def stage(self, name: str, ok: bool = True, wait=None):
+        """Fake stage; ``wait`` (e.g. a barrier's wait) runs while it is live."""
+
+        def run() -> ComponentResult:
+            with self.lock:
+                self.running.add(name)
+                self.max_running = max(self.max_running, len(self.running))
+                self.order.append(name)
+            if wait is not None:
+                wait()
+            with self.lock:
+                self.running.discard(name)
+            return ComponentResult(name, ok, 0.0, 0 if ok else 1)
+
+        return run
+
+
+def _timing(name: str, start: float, end: float) -> StageTiming:
+    return StageTiming(name, start, start, end, ComponentResult(name, True, 0.0, 0))
+
+
+class TestDailyGraph:
+    def test_graph_covers_stage_order_and_is_acyclic(self) -> None:
+        expected = (set(STAGE_ORDER) - {"sync_vms", "pipeline_alerts"}) | {
+            "sync_fred_vm",
+            "sync_hl_vm",
+            "sync_cmc_vm",
+            "macro_gates",
+            "macro_alerts",
+        }
+        assert set(DAILY_STAGE_DEPS) == expected
+        stages = build_stages({n: lambda: None for n in DAILY_STAGE_DEPS})
+        StageScheduler(stages, 4, 4)  # raises on cycles
+
+    def test_macro_chain_independent_of_emas(self) -> None:
+        def ancestors(name: str) -> set[str]:
+            out: set[str] = set()
+            for d in DAILY_STAGE_DEPS[name]:
+                out |= {d} | ancestors(d)
+            return out
+
+        assert "emas" not in ancestors("macro_analytics")
+        assert "bars" not in ancestors("macro_regimes")
+        assert {"emas", "macro_regimes"} <= ancestors("regimes")
+
+
+class TestStageScheduler:
+    def test_independent_stages_run_concurrently(self) -> None:
+        t = _Tracker()
+        meet = threading.Barrier(3, timeout=_TIMEOUT)  # a, b, c must overlap
+        stages = [
+            Stage("a", t.stage("a", wait=meet.wait)),
+            Stage("b", t.stage("b", wait=meet.wait)),
+            Stage("c", t.stage("c", wait=meet.wait)),
+            Stage("d", t.stage("d"), deps=("a", "b", "c")),
+        ]
+        report = StageScheduler(stages, cpu_budget=8, db_budget=8).run()
+        assert all(r.success for _, r in report.results)
+        assert t.max_running == 3
+        assert t.order[-1] == "d"
+        assert [n for n, _ in report.results][-1] == "d"
+        d = report.timings["d"]
+        assert d.ready >= max(report.timings[n].end for n in "abc")
+
+    def test_budgets_limit_concurrency(self) -> None:
+        t = _Tracker()
+        pair = threading.Barrier(2, timeout=_TIMEOUT)  # runs in pairs of two
+        stages = [
+            Stage(n, t.stage(n, wait=pair.wait), cpu=1, db_conns=2) for n in "abcd"
+        ]
+        report = StageScheduler(stages, cpu_budget=8, db_budget=4).run()
+        assert all(r.success for _, r in report.results)
+        assert t.max_running == 2
+
+        t = _Tracker()
+        stages = [Stage(n, t.stage(n), cpu=10) for n in "ab"]  # clipped to budget
+        report = StageScheduler(stages, cpu_budget=4, db_budget=4).run()
+        assert t.max_running == 1
+        assert len(report.timings) == 2
+
+    def test_blocking_failure_stops_new_stages(self) -> None:
+        t = _Tracker()
+        slow_started = threading.Event()
+        bad_done = threading.Event()
+
+        def slow_wait() -> None:
+            slow_started.set()
+            bad_done.wait(_TIMEOUT)
+
+        stages = [
+            Stage(
+                "bad",
+                t.stage("bad", ok=False, wait=lambda: slow_started.wait(_TIMEOUT)),
+            ),
+            Stage("after", t.stage("after"), deps=("bad",)),
+            Stage("slow", t.stage("slow", wait=slow_wait)),
+        ]
+        report = StageScheduler(
+            stages,
+            4,
+            4,
+            on_complete=lambda n, tok, r: bad_done.set() if n == "bad" else None,
+        ).run()
+        assert report.stopped
+        assert "after" in report.skipped
+        # slow was running when bad failed: allowed to finish
+        assert report.timings["slow"].result.success
+        assert report.timings["slow"].end >= report.timings["bad"].end
+
+    def test_continue_on_error_and_non_blocking(self) -> None:
+        t = _Tracker()
+        stages = [
+            Stage("bad", t.stage("bad", ok=False)),
+            Stage("after", t.stage("after"), deps=("bad",)),
+            Stage("warn", t.stage("warn", ok=False), blocking=False),
+            Stage("after_warn", t.stage("after_warn"), deps=("warn",)),
+        ]
+        report = StageScheduler(stages, 4, 4, continue_on_error=True).run()
+        assert not report.stopped
+        assert set(report.timings) == {"bad", "after", "warn", "after_warn"}
+
+        report = StageScheduler(stages[2:], 4, 4).run()
+        assert not report.stopped and not report.skipped
+
+    def test_exception_becomes_failed_result(self) -> None:
+        def boom() -> ComponentResult:
+            raise RuntimeError("boom")
+
+        report = StageScheduler([Stage("x", boom)], 1, 1).run()
+        result = report.timings["x"].result
+        assert not result.success
+        assert "boom" in result.error_message
+
+    def test_should_stop_and_callbacks(self) -> None:
+        t = _Tracker()
+        seen: list[tuple[str, str]] = []
+        stages = [
+            Stage("a", t.stage("a")),
+            Stage("b", t.stage("b"), deps=("a",)),
+        ]
+        report = StageScheduler(
+            stages,
+            1,
+            1,
+            on_start=lambda n: f"token-{n}",
+            on_complete=lambda n, tok, r: seen.append((n, tok)),
+            should_stop=lambda: True,
+        ).run()
+        assert seen == [("a", "token-a")]
+        assert report.skipped == {"b": "stop requested"}
+
+    def test_cycle_rejected(self) -> None:
+        stages = [
+            Stage("a", lambda: None, deps=("b",)),
+            Stage("b", lambda: None, deps=("a",)),
+        ]
+        with pytest.raises(ValueError, match="cycle"):
+            StageScheduler(stages, 1, 1)
+
+
+class TestStageResources:
+    def test_pooled_stages_follow_workers(self) -> None:
+        assert stage_resources("bars", 3) == (3, 3)
+        assert stage_resources("returns_ama", 2) == (2, 2)
+        assert stage_resources("emas") == (POOLED_STAGES["emas"],) * 2
+        # not sized by -n
+        assert stage_resources("garch", 16) == (4, 2)
+        assert stage_resources("signals", 16) == (1, 1)
+
+        stages = build_stages({"bars": lambda: None, "garch": lambda: None}, workers=2)
+        assert {s.name: (s.cpu, s.db_conns) for s in stages} == {
+            "bars": (2, 2),
+            "garch": (4, 2),
+        }
+
+
+class TestCriticalPath:
+    def test_follows_last_finishing_dependency(self) -> None:
+        report = DagRunReport(
+            timings={
+                "fast": _timing("fast", 0.0, 1.0),
+                "slow": _timing("slow", 0.0, 10.0),
+                "mid": _timing("mid", 1.0, 3.0),
+                "join": _timing("join", 10.0, 11.0),
+            },
+            deps={"fast": (), "slow": (), "mid": ("fast",), "join": ("mid", "slow")},
+            wall_sec=11.0,
+        )
+        assert [s.name for s in critical_path(report)] == ["slow", "join"]
+
+        text = format_timing_report(report)
+        assert "Critical path:" in text
+        assert "slow (10.0s) -> join (1.0s)" in text
@@ -774,3 +774,165 @@ class TestCircuitBreakerCooldownAutoReset:
         )
 
         assert result.allowed is True
+
+
+# ---------------------------------------------------------------------------
+# TestRiskStateSnapshot
+# ---------------------------------------------------------------------------
+
+
+def _limits_row(max_position_pct, asset_id=None, strategy_id=None):
+    row = list(_default_limits_row()[0])
+    row[0] = Decimal(str(max_position_pct))
+    row[7] = asset_id
+    row[8] = strategy_id
+    return tuple(row)
+
+
+def _snapshot_engine(
+    trading_state="active",
+    tail_risk_state="normal",
+    cb_tripped="{}",
+    limits_rows=None,
+    perp_rows=None,
+) -> MagicMock:
+    """Mock engine serving one load_snapshot(); later executes return None."""
+    engine = _make_engine(
+        [
+            (trading_state, tail_risk_state, cb_tripped),
+            limits_rows if limits_rows is not None else _default_limits_row(),
+            perp_rows or [],
+        ]
+        + [None] * 10
+    )
+    return engine
+
+
+def _order(**overrides):
+    order = dict(
+        order_qty=Decimal("0.01"),
+        order_side="buy",
+        fill_price=Decimal("50000"),
+        asset_id=1,
+        strategy_id=1,
+        current_position_value=Decimal("0"),
+        portfolio_value=Decimal("100000"),
+    )
+    order.update(overrides)
+    return order
+
+
+class TestRiskStateSnapshot:
+    """Snapshot-based checks: one state read, gates evaluated in memory."""
+
+    def test_snapshot_orders_need_no_db_reads(self):
+        mock_engine = _snapshot_engine()
+        conn = mock_engine.connect.return_value.__enter__.return_value
+        engine = RiskEngine(mock_engine)
+
+        snapshot = engine.load_snapshot()
+        reads = conn.execute.call_count
+        assert reads == 3
+
+        for _ in range(5):
+            result = engine.check_order(**_order(), snapshot=snapshot)
+            assert result.allowed is True
+            assert result.adjusted_quantity == Decimal("0.01")
+        assert conn.execute.call_count == reads
+
+    def test_scaling_matches_live_path(self):
+        """Position cap scaling is identical with and without a snapshot."""
+        engine = RiskEngine(_snapshot_engine())
+        snapshot = engine.load_snapshot()
+        engine._log_event = MagicMock()
+        result = engine.check_order(
+            **_order(order_qty=Decimal("0.5"), current_position_value=Decimal("10000")),
+            snapshot=snapshot,
+        )
+        # cap = 15000, available = 5000 -> 0.1 BTC at 50000
+        assert result.allowed is True
+        assert result.adjusted_quantity == Decimal("0.10000000")
+
+    def test_limits_resolved_by_specificity(self):
+        rows = [
+            _limits_row(0.05, asset_id=1, strategy_id=1),
+            _limits_row(0.08, asset_id=2),
+            _limits_row(0.10, strategy_id=7),
+            _limits_row(0.20),
+        ]
+        engine = RiskEngine(_snapshot_engine(limits_rows=rows))
+        snapshot = engine.load_snapshot()
+
+        def pct(asset_id, strategy_id):
+            limits = engine._load_limits(asset_id, strategy_id, snapshot=snapshot)
+            return limits.max_position_pct
+
+        assert pct(1, 1) == 0.05
+        assert pct(2, 3) == 0.08
+        assert pct(3, 7) == 0.10
+        assert pct(3, 3) == 0.20
+        assert pct(None, None) == 0.20
+
+    def test_check_orders_batches_events(self):
+        """A halted snapshot blocks every order; events go in one insert."""
+        mock_engine = _snapshot_engine(trading_state="halted")
+        conn = mock_engine.connect.return_value.__enter__.return_value
+        engine = RiskEngine(mock_engine)
+
+        results = engine.check_orders([_order(asset_id=i) for i in range(1, 5)])
+
+        assert [r.allowed for r in results] == [False] * 4
+        assert all("Kill switch" in r.blocked_reason for r in results)
+        # 3 snapshot reads + 1 executemany insert
+        assert conn.execute.call_count == 4
+        inserted = conn.execute.call_args[0][1]
+        assert [e["asset_id"] for e in inserted] == [1, 2, 3, 4]
+        assert engine._event_buffer is None
+
+    def test_snapshot_gates(self):
+        tripped = json.dumps({"1:1": datetime.now(timezone.utc).isoformat()})
+        engine = RiskEngine(
+            _snapshot_engine(tail_risk_state="reduce", cb_tripped=tripped)
+        )
+        engine._log_event = MagicMock()
+        snapshot = engine.load_snapshot()
+
+        blocked = engine.check_order(**_order(), snapshot=snapshot)
+        assert blocked.allowed is False
+        assert "Circuit breaker" in blocked.blocked_reason
+
+        halved = engine.check_order(
+            **_order(order_qty=Decimal("0.02"), strategy_id=2), snapshot=snapshot
+        )
+        assert halved.adjusted_quantity == Decimal("0.01000000")
+
+    def test_get_snapshot_cache_and_invalidation(self):
+        engine = RiskEngine(_snapshot_engine(), snapshot_max_age=60.0)
+        first = engine.get_snapshot()
+        assert engine.get_snapshot() is first
+
+        engine.invalidate_snapshot()
+        engine._engine = _snapshot_engine()
+        second = engine.get_snapshot()
+        assert second is not first
+        assert second.version == first.version + 1
+
+        engine._engine = _snapshot_engine()
+        assert engine.get_snapshot(max_age=0.0) is not second
+
+    def test_check_order_reloads_snapshot_behind_engine_state(self):
+        engine = RiskEngine(_snapshot_engine(), snapshot_max_age=60.0)
+        stale = engine.load_snapshot()
+        assert engine.check_order(**_order(), snapshot=stale).allowed is True
+
+        # Kill switch set through the engine after the cycle's snapshot
+        engine.invalidate_snapshot()
+        engine._engine = _snapshot_engine(trading_state="halted")
+        engine._log_event = MagicMock()
+        for _ in range(2):
+            result = engine.check_order(**_order(), snapshot=stale)
+            assert result.allowed is False
+            assert "Kill switch" in result.blocked_reason
+        # reloaded once, then served from the cache
+        conn = engine._engine.connect.return_value.__enter__.return_value
+        assert conn.execute.call_count == 3
@@ -0,0 +1,354 @@
+"""
+Tests for the concurrent history backfill engine (connectivity/backfill.py).
+
+A local ThreadingHTTPServer emulates the paginated endpoints used by the
+backfill -- Binance spot klines and futures funding (oldest first, startTime/
+endTime windows) and Bybit funding (newest first, 200 rows per page) -- so
+the real adapters and fetchers run end to end without network access.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from ta_lab2.connectivity.backfill import (
+    BackfillJob,
+    MemoryWatermarks,
+    kline_job,
+    run_backfill,
+)
+from ta_lab2.connectivity.binance import BinanceExchange
+from ta_lab2.scripts.perps.refresh_funding_rates import (
+    _BINANCE_BTC_EPOCH_MS,
+    _BYBIT_EPOCH_MS,
+    _MS_PER_8H,
+    build_funding_jobs,
+)
+
+_HOUR_MS = 3_600_000
+_KLINE_T0 = 1_600_000_000_000 // _HOUR_MS * _HOUR_MS
+
+
+# ---------------------------------------------------------------------------
+# Mock exchange server
+# ---------------------------------------------------------------------------
+
+
+class _MockExchange(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.klines = [_KLINE_T0 + i * _HOUR_MS for i in range(3500)]
+        self.funding: dict[str, list[int]] = {}
+        self.delay = 0.0
+        self.fail_status = 0  # status for requests matching fail_start
+        self.fail_start: set[int] = set()
+        self.throttle = 0  # next N requests answer 429
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _MockExchange
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:
+        srv = self.server
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        start = int(q.get("startTime", 0))
+        end = int(q.get("endTime", 2**62))
+        with srv.lock:
+            srv.requests += 1
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            throttled = srv.throttle > 0
+            srv.throttle -= throttled
+        try:
+            time.sleep(srv.delay)
+            if throttled:
+                return self._send(429, {"msg": "Too many requests"})
+            if start in srv.fail_start:
+                return self._send(srv.fail_status, {"msg": "injected failure"})
+
+            if url.path == "/api/v3/klines":
+                ts = [t for t in srv.klines if start <= t <= end][: int(q["limit"])]
+                return self._send(200, [[t, "1", "2", "0.5", "1.5", "10"] for t in ts])
+
+            if url.path == "/fapi/v1/fundingRate":
+                ts = [t for t in srv.funding["binance"] if start <= t <= end]
+                ts = ts[: int(q["limit"])]
+                return self._send(
+                    200,
+                    [
+                        {"fundingTime": t, "fundingRate": "0.0001", "markPrice": "1"}
+                        for t in ts
+                    ],
+                )
+
+            if url.path == "/v5/market/funding/history":
+                ts = [t for t in srv.funding["bybit"] if start <= t <= end]
+                ts = sorted(ts, reverse=True)[: int(q["limit"])]
+                rows = [
+                    {"fundingRateTimestamp": str(t), "fundingRate": "0.0002"}
+                    for t in ts
+                ]
+                return self._send(200, {"result": {"list": rows}})
+
+            return self._send(404, {"msg": "not found"})
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+
+@pytest.fixture
+def mock_exchange():
+    server = _MockExchange()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class _Sink:
+    """Collects written rows; write() mimics an ON CONFLICT DO NOTHING upsert."""
+
+    def __init__(self, ts_ms):
+        self.ts_ms = ts_ms
+        self.rows: dict = {}
+        self.calls = 0
+
+    def write(self, rows: list) -> int:
+        self.calls += 1
+        new = {(getattr(r, "venue", None), self.ts_ms(r)): r for r in rows}
+        n = len(new.keys() - self.rows.keys())
+        self.rows.update(new)
+        return n
+
+
+def _binance_kline_job(server, sink, **kw) -> BackfillJob:
+    exchange = BinanceExchange(BASE_URL=server.url)
+    return kline_job(
+        exchange,
+        "binance",
+        "BTC/USDT",
+        "1h",
+        start_ms=_KLINE_T0,
+        end_ms=server.klines[-1],
+        write=sink.write,
+        **kw,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Pagination
+# ---------------------------------------------------------------------------
+
+
+class TestPagination:
+    @pytest.mark.parametrize("newest_first", [False, True])
+    def test_full_pages_continue_within_window(self, newest_first: bool) -> None:
+        # two rows per declared step: every 10-step window needs two pages
+        data = list(range(0, 100_000, 500))
+        calls = []
+
+        def fetch(lo: int, hi: int) -> list:
+            calls.append((lo, hi))
+            rows = [t for t in data if lo <= t <= hi]
+            return rows[-10:] if newest_first else rows[:10]
+
+        sink = _Sink(lambda t: t)
+        job = BackfillJob(
+            venue="mock",
+            dataset="ticks",
+            symbol="X",
+            tf="1s",
+            step_ms=1000,
+            start_ms=0,
+            end_ms=data[-1],
+            page_limit=10,
+            fetch=fetch,
+            ts_ms=lambda t: t,
+            write=sink.write,
+            newest_first=newest_first,
+        )
+        (result,) = run_backfill(
+            [job], MemoryWatermarks(), rate_limits={"mock": (1000, 1.0)}
+        )
+
+        assert sorted(t for _, t in sink.rows) == data
+        assert result.rows_fetched == len(data)
+        # two full pages per window, no empty probe once a window is covered
+        assert result.requests == len(calls) == 2 * len(job.windows(0))
+        assert result.watermark_ms == data[-1]
+
+    def test_kline_history_against_mock_server(self, mock_exchange) -> None:
+        mock_exchange.delay = 0.05
+        sink = _Sink(lambda r: r[0] * 1000)
+        watermarks = MemoryWatermarks()
+        (result,) = run_backfill(
+            [_binance_kline_job(mock_exchange, sink)], watermarks, flush_rows=1500
+        )
+
+        assert sorted(t for _, t in sink.rows) == mock_exchange.klines
+        assert result.rows_written == 3500
+        assert result.requests == 4  # 1000-bar windows
+        assert mock_exchange.max_in_flight > 1
+        assert sink.calls < result.requests + 1
+        assert (
+            watermarks.get(("binance", "klines", "BTC/USDT", "1h"))
+            == (mock_exchange.klines[-1])
+        )
+
+    def test_unpageable_venue_rejected(self) -> None:
+        with pytest.raises(ValueError, match="bitstamp"):
+            kline_job(None, "bitstamp", "BTC/USD", "1h", 0, write=len)
+
+
+# ---------------------------------------------------------------------------
+# Failures, resume and rate limits
+# ---------------------------------------------------------------------------
+
+
+class TestResilience:
+    def test_throttled_requests_are_retried(self, mock_exchange) -> None:
+        mock_exchange.throttle = 3
+        sink = _Sink(lambda r: r[0] * 1000)
+        (result,) = run_backfill(
+            [_binance_kline_job(mock_exchange, sink)],
+            MemoryWatermarks(),
+            backoff=0.01,
+        )
+        assert result.error is None
+        assert result.requests == 4 + 3
+        assert len(sink.rows) == 3500
+
+    def test_failed_window_resumes_from_watermark(self, mock_exchange) -> None:
+        klines = mock_exchange.klines
+        mock_exchange.fail_status = 400  # not retried
+        mock_exchange.fail_start = {klines[2000]}
+        sink = _Sink(lambda r: r[0] * 1000)
+        watermarks = MemoryWatermarks()
+        key = ("binance", "klines", "BTC/USDT", "1h")
+
+        (first,) = run_backfill([_binance_kline_job(mock_exchange, sink)], watermarks)
+        assert first.failed_windows == 1
+        assert first.error is not None
+        assert watermarks.get(key) == klines[2000] - 1
+        # the window after the gap is still written
+        assert len(sink.rows) == 2500
+
+        mock_exchange.fail_start = set()
+        mock_exchange.requests = 0
+        (second,) = run_backfill([_binance_kline_job(mock_exchange, sink)], watermarks)
+        assert second.error is None
+        assert mock_exchange.requests == 2
+        assert watermarks.get(key) == klines[-1]
+        assert sorted(t for _, t in sink.rows) == klines
+
+        (third,) = run_backfill([_binance_kline_job(mock_exchange, sink)], watermarks)
+        assert third.requests == 0
+
+    def test_rate_limit_is_respected(self, mock_exchange) -> None:
+        sink = _Sink(lambda r: r[0] * 1000)
+        t0 = time.monotonic()
+        (result,) = run_backfill(
+            [_binance_kline_job(mock_exchange, sink)],
+            MemoryWatermarks(),
+            # 1 token, 4 per second: 4 requests need >= 0.75 s
+            rate_limits={"binance:klines": (1, 0.25)},
+        )
+        assert result.requests == 4
+        assert time.monotonic() - t0 >= 0.7
+
+
+# ---------------------------------------------------------------------------
+# Funding rate jobs
+# ---------------------------------------------------------------------------
+
+
+class TestFundingJobs:
+    def test_binance_and_bybit_funding_history(self, mock_exchange) -> None:
+        end_ms = _BINANCE_BTC_EPOCH_MS + 2500 * _MS_PER_8H
+        mock_exchange.funding = {
+            "binance": list(range(_BINANCE_BTC_EPOCH_MS, end_ms + 1, _MS_PER_8H)),
+            "bybit": list(range(_BYBIT_EPOCH_MS, end_ms + 1, _MS_PER_8H)),
+        }
+        sink = _Sink(lambda r: round(r.ts.timestamp() * 1000))
+        watermarks = MemoryWatermarks()
+        jobs = build_funding_jobs(
+            ["binance", "bybit", "lighter"],
+            ["BTC"],
+            sink.write,
+            watermarks,
+            base_urls={
+                "binance": f"{mock_exchange.url}/fapi/v1/fundingRate",
+                "bybit": f"{mock_exchange.url}/v5/market/funding/history",
+            },
+            end_ms=end_ms,
+        )
+        assert [j.venue for j in jobs] == ["binance", "bybit"]
+
+        results = run_backfill(jobs, watermarks, backoff=0.01)
+
+        for venue in ("binance", "bybit"):
+            got = sorted(t for v, t in sink.rows if v == venue)
+            assert got == mock_exchange.funding[venue]
+        assert {r.venue: r.watermark_ms for r in results} == {
+            "binance": end_ms,
+            "bybit": end_ms,
+        }
+        row = next(r for (v, _), r in sink.rows.items() if v == "bybit")
+        assert (row.symbol, row.tf, row.funding_rate) == ("BTC", "8h", 0.0002)
+
+    def test_unpublished_boundary_settlement_is_retried(self, mock_exchange) -> None:
+        # end_ms is a settlement time the venue has not published yet
+        end_ms = _BINANCE_BTC_EPOCH_MS + 1500 * _MS_PER_8H
+        published = list(range(_BINANCE_BTC_EPOCH_MS, end_ms, _MS_PER_8H))
+        mock_exchange.funding = {"binance": list(published)}
+        sink = _Sink(lambda r: round(r.ts.timestamp() * 1000))
+        watermarks = MemoryWatermarks()
+
+        def jobs():
+            return build_funding_jobs(
+                ["binance"],
+                ["BTC"],
+                sink.write,
+                watermarks,
+                base_urls={"binance": f"{mock_exchange.url}/fapi/v1/fundingRate"},
+                end_ms=end_ms,
+            )
+
+        (first,) = run_backfill(jobs(), watermarks, backoff=0.01)
+        assert first.watermark_ms == published[-1]
+
+        mock_exchange.funding["binance"].append(end_ms)
+        mock_exchange.requests = 0
+        (second,) = run_backfill(jobs(), watermarks, backoff=0.01)
+        assert mock_exchange.requests == 1
+        assert second.watermark_ms == end_ms
+        assert sorted(t for _, t in sink.rows) == published + [end_ms]
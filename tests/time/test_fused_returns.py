@@ -0,0 +1,475 @@
+"""
+test_fused_returns.py
+
+Unit tests for the fused returns kernels (scripts/returns/fused_returns.py):
+the NumPy dual-LAG evaluation must reproduce the SQL semantics of
+refresh_returns_ema_multi_tf.py / refresh_returns_bars_multi_tf.py, and a
+two-unified + two-canonical seed must be enough context for the tail.
+
+The multi-alignment engine (refresh_returns_multi_tf_u.py) must emit, from
+its windowed source read, exactly the rows a full recompute emits past each
+key's watermark.
+
+Run:
+    pytest tests/time/test_fused_returns.py -v
+"""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ta_lab2.scripts.returns import refresh_returns_multi_tf_u as engine_mod
+from ta_lab2.scripts.returns.fused_returns import (
+    EMA_KEYS,
+    EMA_SPEC,
+    EMA_VALUE_COLS,
+    _seed_tf_days,
+    bar_returns_frame,
+    ema_returns_frame,
+)
+
+
+def _days(n: int, start: str = "2025-01-01") -> pd.DatetimeIndex:
+    return pd.date_range(start, periods=n, freq="D", tz="UTC")
+
+
+def _ema_frame(roll, ema, *, tf="7D", period=10, id_=1, start="2025-01-01"):
+    n = len(ema)
+    return pd.DataFrame(
+        {
+            "id": id_,
+            "venue_id": 1,
+            "tf": tf,
+            "period": period,
+            "ts": _days(n, start),
+            "tf_days": 7,
+            "roll": roll,
+            "ema": ema,
+            "ema_bar": [v * 2 for v in ema],
+        }
+    )
+
+
+def test_ema_unified_and_canonical_lags():
+    df = _ema_frame(
+        roll=[False, True, True, False, True],
+        ema=[10.0, 11.0, 12.0, 13.0, 14.0],
+    )
+    out = ema_returns_frame(df)
+
+    # first row of the timeline has no predecessor and is dropped
+    assert len(out) == 4
+    assert list(out["ts"]) == list(df["ts"][1:])
+
+    assert np.allclose(out["delta1_ema_roll"], [1.0, 1.0, 1.0, 1.0])
+    assert np.allclose(out["delta2_ema_roll"].iloc[1:], [0.0, 0.0, 0.0])
+    assert np.isnan(out["delta2_ema_roll"].iloc[0])
+    assert list(out["gap_days_roll"]) == [1, 1, 1, 1]
+
+    # canonical columns only on roll=False rows, lagged to the previous
+    # roll=False row (day 1 -> day 4)
+    canon = out[~out["roll"]]
+    assert len(canon) == 1
+    assert canon["delta1_ema"].iloc[0] == pytest.approx(3.0)
+    assert canon["ret_arith_ema"].iloc[0] == pytest.approx(0.3)
+    assert canon["ret_log_ema"].iloc[0] == pytest.approx(np.log(1.3))
+    assert canon["gap_days"].iloc[0] == 3
+    # only one kept canonical row -> no second-pass predecessor
+    assert np.isnan(canon["delta2_ema"].iloc[0])
+
+    rolled = out[out["roll"]]
+    assert rolled["delta1_ema"].isna().all()
+    assert rolled["gap_days"].isna().all()
+
+
+def test_ema_return_guards():
+    df = _ema_frame(roll=[False, False, False], ema=[0.0, 2.0, -1.0])
+    out = ema_returns_frame(df)
+
+    # prev == 0: no arithmetic return; prev <= 0 or value <= 0: no log return
+    assert np.isnan(out["ret_arith_ema"].iloc[0])
+    assert np.isnan(out["ret_log_ema"].iloc[0])
+    assert out["ret_arith_ema"].iloc[1] == pytest.approx(-1.5)
+    assert np.isnan(out["ret_log_ema"].iloc[1])
+    assert out["delta2_ema"].iloc[1] == pytest.approx(-3.0 - 2.0)
+
+
+def test_ema_keys_are_partitioned_and_input_order_ignored():
+    a = _ema_frame(roll=[False, True, False], ema=[1.0, 2.0, 4.0], period=10)
+    b = _ema_frame(roll=[False, False, False], ema=[5.0, 6.0, 7.0], period=20)
+    mixed = pd.concat([a, b]).sample(frac=1.0, random_state=0)
+
+    out = ema_returns_frame(mixed)
+    expected = pd.concat([ema_returns_frame(a), ema_returns_frame(b)])
+
+    key_order = [*EMA_KEYS, "ts"]
+    out = out.sort_values(key_order).reset_index(drop=True)
+    expected = expected.sort_values(key_order).reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected)
+
+
+def test_ema_alignments_computed_in_one_pass():
+    # refresh_returns_multi_tf_u.py computes every alignment_source at once
+    us = _ema_frame(roll=[False, True, False], ema=[1.0, 2.0, 4.0])
+    iso = _ema_frame(roll=[False, False, True], ema=[3.0, 5.0, 6.0])
+    us["alignment_source"] = "multi_tf_cal_us"
+    iso["alignment_source"] = "multi_tf_cal_iso"
+
+    keys = ("alignment_source", *EMA_KEYS)
+    out = ema_returns_frame(pd.concat([us, iso]), keys)
+    expected = pd.concat([ema_returns_frame(us, keys), ema_returns_frame(iso, keys)])
+
+    key_order = [*keys, "ts"]
+    out = out.sort_values(key_order).reset_index(drop=True)
+    expected = expected.sort_values(key_order).reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected)
+    assert set(out["alignment_source"]) == {"multi_tf_cal_us", "multi_tf_cal_iso"}
+
+
+def _seed(history: pd.DataFrame, split: pd.Timestamp) -> pd.DataFrame:
+    """Last two unified and two canonical rows before split, per key."""
+    parts = []
+    for _, g in history[history["ts"] < split].groupby(list(EMA_KEYS)):
+        g = g.sort_values("ts")
+        parts += [g.tail(2), g[~g["roll"]].tail(2)]
+    return pd.concat(parts).drop_duplicates()
+
+
+def test_ema_seed_reproduces_full_history_tail():
+    rng = np.random.default_rng(7)
+    frames = []
+    for period in (9, 21):
+        n = 60
+        roll = rng.random(n) < 0.7
+        ema = 100.0 + np.cumsum(rng.normal(0, 1, n))
+        frames.append(_ema_frame(roll=roll, ema=ema, period=period))
+    history = pd.concat(frames, ignore_index=True)
+    split = history["ts"].iloc[40]
+
+    full = ema_returns_frame(history)
+    full_tail = full[full["ts"] >= split]
+
+    tail = history[history["ts"] >= split]
+    fused = ema_returns_frame(pd.concat([_seed(history, split), tail]))
+    fused_tail = fused[fused["ts"] >= split]
+
+    key_order = [*EMA_KEYS, "ts"]
+    cols = key_order + EMA_VALUE_COLS
+    pd.testing.assert_frame_equal(
+        fused_tail[cols].sort_values(key_order).reset_index(drop=True),
+        full_tail[cols].sort_values(key_order).reset_index(drop=True),
+    )
+
+
+def _bar_frame(close, high, low, *, roll=None, tf="7D", id_=1):
+    n = len(close)
+    ts = _days(n)
+    return pd.DataFrame(
+        {
+            "id": id_,
+            "venue_id": 1,
+            "tf": tf,
+            "timestamp": ts,
+            "tf_days": 7,
+            "bar_seq": np.arange(1, n + 1),
+            "pos_in_bar": 7,
+            "count_days": 7,
+            "count_days_remaining": 0,
+            "time_close": ts,
+            "time_close_bar": ts,
+            "time_open_bar": ts - pd.Timedelta(days=6),
+            "is_partial_end": roll if roll is not None else [False] * n,
+            "close": close,
+            "high": high,
+            "low": low,
+        }
+    )
+
+
+def test_bar_range_and_true_range():
+    df = _bar_frame(
+        close=[10.0, 11.0, 9.0],
+        high=[10.5, 12.0, 10.0],
+        low=[9.5, 10.0, 8.0],
+    )
+    out = bar_returns_frame(df)
+
+    assert len(out) == 2
+    assert list(out["range"]) == pytest.approx([2.0, 2.0])
+    assert out["range_pct"].iloc[0] == pytest.approx(2.0 / 11.0)
+    # GREATEST(high - low, |high - prev_close|, |low - prev_close|)
+    assert list(out["true_range"]) == pytest.approx([2.0, 3.0])
+    assert out["true_range_pct"].iloc[1] == pytest.approx(3.0 / 9.0)
+    assert list(out["gap_bars"]) == [1, 1]
+    assert out["delta2"].iloc[1] == pytest.approx((9.0 - 11.0) - (11.0 - 10.0))
+    assert list(out["bar_seq"]) == [2, 3]
+
+
+def test_bar_rows_after_null_close_are_dropped():
+    df = _bar_frame(
+        close=[np.nan, 11.0, 12.0],
+        high=[10.5, 12.0, 13.0],
+        low=[9.5, 10.0, 11.0],
+    )
+    out = bar_returns_frame(df)
+
+    # prev_close_u IS NULL on day 2 -> excluded, like the SQL calc CTE
+    assert list(out["bar_seq"]) == [3]
+    assert out["delta1_roll"].iloc[0] == pytest.approx(1.0)
+    assert np.isnan(out["delta2_roll"].iloc[0])
+
+
+def test_bar_roll_rows_have_no_canonical_columns():
+    df = _bar_frame(
+        close=[10.0, 10.5, 11.0, 12.0],
+        high=[10.0, 11.0, 11.0, 12.0],
+        low=[9.0, 10.0, 10.0, 11.0],
+        roll=[False, True, True, False],
+    )
+    out = bar_returns_frame(df)
+
+    rolled = out[out["roll"]]
+    assert rolled["delta1"].isna().all()
+    assert rolled["gap_bars"].isna().all()
+    assert rolled["range_roll"].notna().all()
+
+    canon = out[~out["roll"]]
+    assert canon["delta1"].iloc[0] == pytest.approx(2.0)
+    assert canon["gap_bars"].iloc[0] == 3
+
+
+def test_seed_lookback_uses_longest_tf_days_of_the_id():
+    keys_df = pd.DataFrame(
+        {"id": [1, 1, 2], "tf": ["7D", "30D", "7D"], "tf_days": [7, None, 7]}
+    )
+    assert list(_seed_tf_days(keys_df)) == [7.0, 7.0, 7.0]
+
+    keys_df.loc[2, "tf_days"] = None
+    with pytest.raises(ValueError, match=r"id\(s\) \[2\]"):
+        _seed_tf_days(keys_df)
+
+
+# ---------------------------------------------------------------------------
+# Multi-alignment engine: windowed source read + watermark emit filter
+# ---------------------------------------------------------------------------
+
+_ENGINE_KEYS = ["alignment_source", *EMA_KEYS]
+_N_DAYS = 120
+
+
+def _engine_history() -> pd.DataFrame:
+    """Daily EMA rows for two alignments x (7D, tf_days=7) / (30D, tf_days NULL)."""
+    rng = np.random.default_rng(11)
+    frames = []
+    for alignment in ("multi_tf", "multi_tf_cal_us"):
+        for tf, tf_days, bar in (("7D", 7.0, 7), ("30D", np.nan, 30)):
+            roll = np.arange(_N_DAYS) % bar != bar - 1
+            ema = 100.0 + np.cumsum(rng.normal(0, 1, _N_DAYS))
+            f = _ema_frame(roll=roll, ema=ema, tf=tf)
+            f["tf_days"] = tf_days
+            f["alignment_source"] = alignment
+            frames.append(f)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _engine_watermarks() -> pd.DataFrame:
+    """Per-key watermarks; the cal_us 30D key has none yet (new key)."""
+    ts = _days(_N_DAYS)
+    return pd.DataFrame(
+        {
+            "alignment_source": ["multi_tf", "multi_tf", "multi_tf_cal_us"],
+            "id": 1,
+            "venue_id": 1,
+            "tf": ["7D", "30D", "7D"],
+            "period": 10,
+            "wm": [ts[80], ts[100], ts[60]],
+        }
+    )
+
+
+def _source_window(history: pd.DataFrame, wm: pd.DataFrame, params: dict):
+    """Rows the incremental _source_sql predicate selects (mirror of its WHERE)."""
+    df = history.merge(wm, on=_ENGINE_KEYS, how="left")
+    dense = df["ts"] >= df["wm"] - pd.Timedelta(days=params["dense_days"])
+    canon_days = params["seed_bars"] * df["tf_days"] + params["slack_days"]
+    canon = ~df["roll"] & (
+        df["tf_days"].isna() | (df["ts"] >= df["wm"] - pd.to_timedelta(canon_days, "D"))
+    )
+    return df[df["wm"].isna() | dense | canon].reset_index(drop=True)
+
+
+def _window_days(window: pd.DataFrame) -> dict:
+    """Day offsets (from the first history day) of the selected rows, per key."""
+    day = (window["ts"] - _days(1)[0]).dt.days
+    return {
+        (a, tf): set(day[(window["alignment_source"] == a) & (window["tf"] == tf)])
+        for a, tf in window[["alignment_source", "tf"]].drop_duplicates().values
+    }
+
+
+def _check_window_branches(window: pd.DataFrame) -> None:
+    got = _window_days(window)
+    # 7D key, wm = day 80: every row of the dense week, canonical rows back
+    # to SEED_BARS * 7 + SEED_SLACK_DAYS = 28 days
+    assert got[("multi_tf", "7D")] == set(range(73, _N_DAYS)) | {55, 62, 69}
+    # tf_days NULL, wm = day 100: all canonical rows before the dense week
+    assert got[("multi_tf", "30D")] == set(range(93, _N_DAYS)) | {29, 59, 89}
+    # no watermark: the whole key
+    assert got[("multi_tf_cal_us", "30D")] == set(range(_N_DAYS))
+
+
+def _expected_engine_output(history: pd.DataFrame, wm: pd.DataFrame):
+    """Full recompute of every key, filtered to ts > watermark."""
+    full = ema_returns_frame(history, tuple(_ENGINE_KEYS))
+    full = full.merge(wm, on=_ENGINE_KEYS, how="left")
+    return full[full["wm"].isna() | (full["ts"] > full["wm"])].drop(columns="wm")
+
+
+def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+    cols = [*_ENGINE_KEYS, "ts", "tf_days", "roll", *EMA_VALUE_COLS]
+    return df[cols].sort_values([*_ENGINE_KEYS, "ts"]).reset_index(drop=True)
+
+
+def _engine_cfg(**kw) -> engine_mod.RunnerConfig:
+    return engine_mod.RunnerConfig(
+        db_url="unused",
+        families=("ema",),
+        alignments=("multi_tf", "multi_tf_cal_us"),
+        full_refresh=False,
+        **kw,
+    )
+
+
+class _HistoryEngine:
+    """Engine whose read_sql (patched below) serves the synthetic history."""
+
+    def connect(self):
+        return nullcontext(self)
+
+
+def _serve_window(monkeypatch, history: pd.DataFrame, wm: pd.DataFrame) -> list:
+    reads: list[tuple[str, dict]] = []
+
+    def read_sql(sql, cxn, params):
+        reads.append((str(sql), params))
+        return _source_window(history, wm, params)
+
+    monkeypatch.setattr(pd, "read_sql", read_sql)
+    return reads
+
+
+def test_engine_source_window_keeps_lag_context(monkeypatch):
+    history, wm = _engine_history(), _engine_watermarks()
+    reads = _serve_window(monkeypatch, history, wm)
+    engine_mod._compute_family(
+        _HistoryEngine(), engine_mod.FAMILIES["ema"], _engine_cfg(), 1
+    )
+
+    ((sql, params),) = reads
+    assert params["dense_days"] == engine_mod._DENSE_DAYS
+    assert (params["seed_bars"], params["slack_days"]) == (3, 7)
+    assert "s.tf_days IS NULL" in sql
+    _check_window_branches(_source_window(history, wm, params))
+
+
+def test_engine_incremental_matches_full_recompute(monkeypatch):
+    history, wm = _engine_history(), _engine_watermarks()
+    _serve_window(monkeypatch, history, wm)
+    out = engine_mod._compute_family(
+        _HistoryEngine(), engine_mod.FAMILIES["ema"], _engine_cfg(), 1
+    )
+
+    # wm emit filter: nothing at or before a key's watermark
+    merged = out.merge(wm, on=_ENGINE_KEYS, how="left")
+    assert (merged["wm"].isna() | (merged["ts"] > merged["wm"])).all()
+    new_key = out[(out["alignment_source"] == "multi_tf_cal_us") & (out["tf"] == "30D")]
+    assert len(new_key) == _N_DAYS - 1
+    assert out["ingested_at"].notna().all()
+
+    expected = _expected_engine_output(history, wm)
+    pd.testing.assert_frame_equal(_sorted(out), _sorted(expected))
+
+
+def test_engine_source_sql_postgres(database_engine):
+    """_source_sql windows a real table like the mirror (skipped without a DB)."""
+    from sqlalchemy import text
+
+    source = "public._ret_u_source_test"
+    states = {
+        a: f"public._ret_u_state_{a}_test" for a in ("multi_tf", "multi_tf_cal_us")
+    }
+    fam = engine_mod.Family(
+        name="ema",
+        spec=EMA_SPEC,
+        source_table=source,
+        out_table="public._ret_u_unused_test",
+        state_tables=states,
+    )
+    history, wm = _engine_history(), _engine_watermarks()
+    try:
+        with database_engine.begin() as cxn:
+            cxn.execute(text(f"DROP TABLE IF EXISTS {source}"))
+            cxn.execute(
+                text(
+                    f"CREATE TABLE {source} (alignment_source text, id bigint, "
+                    "venue_id smallint, tf text, period integer, ts timestamptz, "
+                    "tf_days integer, roll boolean, ema double precision, "
+                    "ema_bar double precision)"
+                )
+            )
+            for a, table in states.items():
+                cxn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+                cxn.execute(
+                    text(
+                        f"CREATE TABLE {table} (id bigint, venue_id smallint, "
+                        "tf text, period integer, last_ts timestamptz)"
+                    )
+                )
+                rows = wm[wm["alignment_source"] == a]
+                rows.drop(columns="alignment_source").rename(
+                    columns={"wm": "last_ts"}
+                ).to_sql(
+                    table.split(".")[1],
+                    cxn,
+                    schema="public",
+                    if_exists="append",
+                    index=False,
+                )
+            history.to_sql(
+                source.split(".")[1],
+                cxn,
+                schema="public",
+                if_exists="append",
+                index=False,
+            )
+
+        cfg = _engine_cfg()
+        params = {
+            "id": 1,
+            "alignments": list(cfg.alignments),
+            "dense_days": engine_mod._DENSE_DAYS,
+            "seed_bars": 3,
+            "slack_days": 7,
+        }
+        with database_engine.connect() as cxn:
+            raw = pd.read_sql(
+                text(engine_mod._source_sql(fam, cfg)), cxn, params=params
+            )
+        raw["ts"] = pd.to_datetime(raw["ts"], utc=True)
+        _check_window_branches(raw)
+        assert _window_days(raw) == _window_days(_source_window(history, wm, params))
+
+        out = engine_mod._compute_family(database_engine, fam, cfg, 1)
+        pd.testing.assert_frame_equal(
+            _sorted(out),
+            _sorted(_expected_engine_output(history, wm)),
+            check_dtype=False,
+        )
+    finally:
+        with database_engine.begin() as cxn:
+            for table in (source, *states.values()):
+                cxn.execute(text(f"DROP TABLE IF EXISTS {table}"))